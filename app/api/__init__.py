@@ -21,6 +21,7 @@ from app.api.diagnostic import router as diagnostic_router
 from app.api.dropbox import router as dropbox_router
 from app.api.dropbox_imports import router as dropbox_imports_router
 from app.api.duplicates import router as duplicates_router
+from app.api.events import router as events_router
 from app.api.files import router as files_router
 from app.api.google_drive import router as google_drive_router
 from app.api.i18n import router as i18n_router
@@ -89,6 +90,7 @@ router.include_router(settings_router)
 router.include_router(url_upload_router)
 router.include_router(search_router)
 router.include_router(queue_router)
+router.include_router(events_router)
 router.include_router(review_queue_router)
 router.include_router(saved_searches_router)
 router.include_router(similarity_router)
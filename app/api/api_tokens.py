@@ -22,6 +22,7 @@ from sqlalchemy.orm import Session
 
 from app.database import get_db
 from app.models import ApiToken
+from app.utils.api_token_cache import notify_tokens_changed
 from app.utils.user_scope import get_current_owner_id
 
 logger = logging.getLogger(__name__)
@@ -274,6 +275,7 @@ async def revoke_or_delete_token(
         except Exception:
             db.rollback()
             raise
+        notify_tokens_changed()
         logger.info("API token revoked: id=%s owner=%s", token_id, owner_id)
         return {"detail": "Token revoked"}
 
@@ -284,6 +286,7 @@ async def revoke_or_delete_token(
     except Exception:
         db.rollback()
         raise
+    notify_tokens_changed()
     logger.info("API token permanently deleted: id=%s owner=%s", token_id, owner_id)
     return {"detail": "Token deleted"}
 
@@ -317,5 +320,6 @@ async def reactivate_token(
         db.rollback()
         raise
 
+    notify_tokens_changed()
     logger.info("API token reactivated: id=%s owner=%s", token_id, owner_id)
     return _token_to_dict(db_token)
@@ -35,6 +35,7 @@ from app.models import AutomationHook
 from app.utils.automation_hooks import SAMPLE_PAYLOADS
 from app.utils.filename_utils import sanitize_filename
 from app.utils.webhook import VALID_EVENTS
+from app.utils.webhook_registry import notify_subscriptions_changed
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/automation", tags=["automation"])
@@ -197,6 +198,7 @@ def subscribe_hook(body: HookSubscribe, db: DbSession, user: AuthUser) -> dict[s
         db.rollback()
         raise
 
+    notify_subscriptions_changed()
     logger.info("Automation hook %d created (type=%s) for events %s", hook.id, hook.hook_type, body.events)
     return _hook_to_response(hook)
 
@@ -222,6 +224,7 @@ def unsubscribe_hook(hook_id: int, db: DbSession, user: AuthUser) -> None:
         db.rollback()
         raise
 
+    notify_subscriptions_changed()
     logger.info("Automation hook %d deleted", hook_id)
 
 
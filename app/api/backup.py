@@ -5,7 +5,7 @@ Provides REST endpoints for:
 - Listing existing backups
 - Triggering a manual backup
 - Downloading a backup archive
-- Restoring from an uploaded backup file
+- Restoring from an uploaded backup file or a local incremental snapshot
 - Deleting a backup record
 - Running retention cleanup
 """
@@ -127,6 +127,13 @@ async def download_backup(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Local archive file is not available (may have been pruned)",
         )
+    from app.tasks.backup_tasks import _is_snapshot
+
+    if _is_snapshot(rec.filename):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Incremental snapshots are stored as chunks and cannot be downloaded; restore them instead.",
+        )
     return FileResponse(
         path=rec.local_path,
         filename=rec.filename,
@@ -248,6 +255,56 @@ async def restore_backup(
     return {"status": "restored", "filename": file.filename}
 
 
+@router.post("/{backup_id}/restore")
+async def restore_snapshot_backup(
+    backup_id: int,
+    _admin: AdminUser,
+    include_documents: bool = False,
+    db: Session = Depends(get_db),
+) -> dict:
+    """Restore the database from a local incremental snapshot.
+
+    **Warning**: This overwrites the current database contents.  With
+    ``include_documents=true`` the ``original`` and ``processed`` document
+    trees are rebuilt from the snapshot as well.
+    """
+    from pathlib import Path
+
+    from app.tasks.backup_tasks import _is_snapshot, restore_snapshot
+
+    rec = db.get(BackupRecord, backup_id)
+    if rec is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Backup not found")
+    if not _is_snapshot(rec.filename):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Only incremental snapshots can be restored in place; upload full archives via /restore.",
+        )
+    if not rec.local_path or not os.path.exists(rec.local_path):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Snapshot manifest is not available (may have been pruned)",
+        )
+
+    filename = rec.filename
+    manifest_path = Path(rec.local_path)
+    db.close()
+    try:
+        result = restore_snapshot(manifest_path, include_documents=include_documents)
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+    except FileNotFoundError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Database client binary not found ({exc})",
+        ) from exc
+    except RuntimeError as exc:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(exc)) from exc
+
+    logger.info(f"Database restored from snapshot: {filename}")
+    return {"status": "restored", "filename": filename, **result}
+
+
 @router.delete("/{backup_id}")
 async def delete_backup(
     backup_id: int,
@@ -22,6 +22,7 @@ from app.utils.classification_rules import (
     RULE_TYPE_FILENAME,
     RULE_TYPE_METADATA,
 )
+from app.utils.rule_sets import RULE_KIND_CLASSIFICATION, notify_rules_changed
 
 logger = logging.getLogger(__name__)
 
@@ -214,6 +215,7 @@ async def create_rule(request: Request, body: RuleCreate, db: DbSession) -> dict
         db.rollback()
         raise
 
+    notify_rules_changed(RULE_KIND_CLASSIFICATION, rule.owner_id)
     logger.info("Classification rule created: id=%s, user=%s", rule.id, user_id)
     return {
         "id": rule.id,
@@ -286,6 +288,7 @@ async def update_rule(request: Request, rule_id: int, body: RuleUpdate, db: DbSe
         db.rollback()
         raise
 
+    notify_rules_changed(RULE_KIND_CLASSIFICATION, rule.owner_id)
     logger.info("Classification rule updated: id=%s, user=%s", rule.id, user_id)
     return {
         "id": rule.id,
@@ -315,6 +318,7 @@ async def delete_rule(request: Request, rule_id: int, db: DbSession) -> None:
     if rule.owner_id != user_id and not _is_admin(request):
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Cannot delete this rule")
 
+    rule_owner_id = rule.owner_id
     try:
         db.delete(rule)
         db.commit()
@@ -322,4 +326,5 @@ async def delete_rule(request: Request, rule_id: int, db: DbSession) -> None:
         db.rollback()
         raise
 
+    notify_rules_changed(RULE_KIND_CLASSIFICATION, rule_owner_id)
     logger.info("Classification rule deleted: id=%s, user=%s", rule_id, user_id)
@@ -0,0 +1,163 @@
+"""Per-user server-sent event stream for live UI updates.
+
+``GET /api/events/stream`` replaces the background polling of the
+notification badge, the files-page queue banner and the processing status
+on the file detail page.  The stream subscribes to the caller's Redis
+pub/sub channel and the broadcast channel (see :mod:`app.utils.live_events`)
+and emits:
+
+* ``unread_count`` – ``{"count": n}``, on connect and whenever the caller's
+  notifications change,
+* ``queue`` – ``{"total_pending": n}``, on connect and when the queue or a
+  processing step changed (recomputed at most once per
+  :data:`QUEUE_REFRESH_SECONDS` per process, however many pages are open),
+* ``file_status`` – ``{"file_id", "step_name", "status"}``, forwarded as is.
+
+Counts are only queried when an event says they may have changed, and only
+sent when they did.  If Redis is unreachable the endpoint answers 503 and
+pages keep polling.
+"""
+
+import asyncio
+import json
+import logging
+import time
+from collections.abc import AsyncIterator
+from typing import Any
+
+import redis.asyncio as aioredis
+from fastapi import APIRouter, HTTPException, Request, status
+from fastapi.responses import StreamingResponse
+
+from app.api.queue import STREAM_KEEPALIVE_SECONDS, count_pending
+from app.auth import require_login
+from app.config import settings
+from app.database import SessionLocal
+from app.utils.live_events import (
+    BROADCAST_CHANNEL,
+    EVENT_FILE_STATUS,
+    EVENT_NOTIFICATIONS,
+    EVENT_QUEUE,
+    live_events_enabled,
+    parse_event,
+    user_channel,
+)
+from app.utils.user_notification import count_unread_notifications
+from app.utils.user_scope import get_current_owner_id
+
+logger = logging.getLogger(__name__)
+router = APIRouter(prefix="/events", tags=["events"])
+
+#: Minimum seconds between two pending-count queries in one process.
+QUEUE_REFRESH_SECONDS = 2.0
+
+_pending_cache: tuple[float, int] | None = None
+
+
+def _frame(event: str, data: dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
+
+
+def _unread_count(owner_id: str) -> int:
+    with SessionLocal() as db:
+        return count_unread_notifications(db, owner_id)
+
+
+def _pending_count() -> tuple[float, int]:
+    """Return ``(checked_at, pending count)``, shared by every stream of this process for a short while."""
+    global _pending_cache
+    now = time.monotonic()
+    if _pending_cache is None or now - _pending_cache[0] >= QUEUE_REFRESH_SECONDS:
+        with SessionLocal() as db:
+            _pending_cache = (now, count_pending(db))
+    return _pending_cache
+
+
+async def _live_events(request: Request, pubsub: Any, owner_id: str | None) -> AsyncIterator[str]:
+    """Yield server-sent events for *owner_id* until the client disconnects."""
+    _, pending = await asyncio.to_thread(_pending_count)
+    yield _frame(EVENT_QUEUE, {"total_pending": pending})
+    unread: int | None = None
+    if owner_id:
+        unread = await asyncio.to_thread(_unread_count, owner_id)
+        yield _frame("unread_count", {"count": unread})
+
+    # Time of the oldest queue change not yet reflected in ``pending``.
+    queue_changed_at: float | None = None
+    last_sent = time.monotonic()
+    try:
+        while not await request.is_disconnected():
+            message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+            parsed = parse_event(message["data"]) if message else None
+            frames: list[str] = []
+            if parsed is not None:
+                event, data = parsed
+                if event == EVENT_FILE_STATUS:
+                    frames.append(_frame(EVENT_FILE_STATUS, data))
+                if event in (EVENT_FILE_STATUS, EVENT_QUEUE) and queue_changed_at is None:
+                    queue_changed_at = time.monotonic()
+                if event == EVENT_NOTIFICATIONS and owner_id:
+                    count = await asyncio.to_thread(_unread_count, owner_id)
+                    if count != unread:
+                        unread = count
+                        frames.append(_frame("unread_count", {"count": count}))
+
+            if queue_changed_at is not None:
+                checked_at, count = await asyncio.to_thread(_pending_count)
+                if checked_at >= queue_changed_at:
+                    queue_changed_at = None
+                if count != pending:
+                    pending = count
+                    frames.append(_frame(EVENT_QUEUE, {"total_pending": count}))
+
+            now = time.monotonic()
+            if frames:
+                last_sent = now
+                for frame in frames:
+                    yield frame
+            elif now - last_sent >= STREAM_KEEPALIVE_SECONDS:
+                last_sent = now
+                yield ": keep-alive\n\n"
+    finally:
+        await pubsub.aclose()
+
+
+@router.get("/stream")
+@require_login
+async def stream_events(request: Request) -> StreamingResponse:
+    """Stream live badge, queue and file-status updates as server-sent events.
+
+    Returns 503 when live events are disabled or Redis is unreachable, so
+    the browser falls back to polling.
+    """
+    owner_id = get_current_owner_id(request)
+    if getattr(settings, "multi_user_enabled", False) is True and not owner_id:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated")
+    if not live_events_enabled():
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Live events are disabled")
+
+    channels = [BROADCAST_CHANNEL] + ([user_channel(owner_id)] if owner_id else [])
+    client = aioredis.Redis.from_url(settings.redis_url, decode_responses=True, socket_connect_timeout=2)
+    pubsub = client.pubsub()
+    try:
+        await pubsub.subscribe(*channels)
+    except Exception as exc:  # noqa: BLE001 - any Redis failure means "poll instead"
+        logger.warning("Live event stream unavailable: %s", exc)
+        await pubsub.aclose()
+        await client.aclose()
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Live events are unavailable"
+        ) from exc
+
+    async def _events() -> AsyncIterator[str]:
+        try:
+            async for frame in _live_events(request, pubsub, owner_id):
+                yield frame
+        finally:
+            await client.aclose()
+
+    return StreamingResponse(
+        _events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -15,7 +15,7 @@ from typing import Annotated, List, Literal, Optional, cast
 import aiofiles
 from fastapi import APIRouter, Depends, File, HTTPException, Query, Request, UploadFile, status
 from fastapi.responses import StreamingResponse
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
 from sqlalchemy import asc, desc
 from sqlalchemy.orm import Session
 
@@ -27,14 +27,18 @@ from app.models import BulkOperation, FileProcessingStep, FileRecord, PrivacyRul
 from app.tasks.convert_to_pdf import convert_to_pdf
 from app.tasks.process_document import process_document
 from app.utils.allowed_types import ALLOWED_EXTENSIONS, ALLOWED_MIME_TYPES, IMAGE_MIME_TYPES
+from app.utils.audit_service import record_events_from_request
+from app.utils.blocking_io import run_blocking
 from app.utils.file_operations import hash_file
 from app.utils.file_privacy import apply_privacy_decision, queue_privacy_reconciliation
 from app.utils.file_queries import apply_status_filter
 from app.utils.file_status import get_files_processing_status
 from app.utils.filename_utils import sanitize_filename
 from app.utils.input_validation import validate_search_query, validate_sort_field, validate_sort_order
+from app.utils.llm_cache import purge_llm_cache_for_files
 from app.utils.preview_media import safe_preview_media_type
 from app.utils.privacy_rules import SINGLE_USER_PRIVACY_OWNER, match_rule_to_file
+from app.utils.usage_counters import adjust_usage_for_records
 from app.utils.user_scope import (
     apply_owner_filter,
     get_current_owner_id,
@@ -87,6 +91,25 @@ class FilePrivacyRequest(BaseModel):
     is_private: bool
 
 
+#: Maximum number of hashes accepted by one ``/files/check-hashes`` request.
+MAX_HASH_CHECK = 1000
+
+
+class HashCheckRequest(BaseModel):
+    """SHA-256 digests a client is about to upload."""
+
+    hashes: list[str] = Field(..., min_length=1, max_length=MAX_HASH_CHECK)
+
+    @field_validator("hashes")
+    @classmethod
+    def _hex_digests(cls, hashes: list[str]) -> list[str]:
+        normalized = [value.strip().lower() for value in hashes]
+        invalid = [value for value in normalized if len(value) != 64 or not all(c in "0123456789abcdef" for c in value)]
+        if invalid:
+            raise ValueError(f"Not SHA-256 hex digests: {invalid[:5]}")
+        return normalized
+
+
 def _bulk_action_status(
     action: str,
     updated_count: int,
@@ -621,6 +644,23 @@ def set_file_privacy(request: Request, file_id: int, body: FilePrivacyRequest, d
     return {"file_id": file_record.id, "is_private": file_record.is_private}
 
 
+def _audit_deletions(db: Session, request: Request, file_ids: list[int], bulk_operation_id: str | None = None) -> None:
+    """Write one ``document.delete`` audit event per deleted file in a single INSERT."""
+    details = {"bulk_operation_id": bulk_operation_id} if bulk_operation_id else None
+    try:
+        record_events_from_request(
+            db,
+            request,
+            (
+                {"action": "document.delete", "resource_type": "document", "resource_id": file_id, "details": details}
+                for file_id in file_ids
+            ),
+        )
+    except Exception:
+        db.rollback()
+        logger.warning("Failed to write document deletion audit events", exc_info=True)
+
+
 @router.delete("/files/{file_id}")
 @require_login
 def delete_file_record(request: Request, file_id: int, db: DbSession):
@@ -660,10 +700,13 @@ def delete_file_record(request: Request, file_id: int, db: DbSession):
         # the authoritative record disappears. Owner scope is retained in the
         # Qdrant delete filter as defense in depth.
         _delete_vector_chunks([file_record])
+        purge_llm_cache_for_files(db, [file_id])
 
         # Delete the record
+        adjust_usage_for_records(db, [file_record], -1)
         db.delete(file_record)
         db.commit()
+        _audit_deletions(db, request, [file_id])
 
         return {
             "status": "success",
@@ -729,11 +772,14 @@ def bulk_delete_files(request: Request, file_ids: List[int], db: DbSession):
         logger.info(f"Bulk deleting {deleted_count} file records: IDs={deleted_ids}")
 
         _delete_vector_chunks(file_records)
+        purge_llm_cache_for_files(db, deleted_ids)
 
         # Delete the selected records in one statement after access checks.
+        adjust_usage_for_records(db, file_records, -1)
         query.delete(synchronize_session=False)
 
         db.commit()
+        _audit_deletions(db, request, deleted_ids, bulk_operation_id=operation.id)
 
         return {
             "status": "success",
@@ -978,6 +1024,26 @@ def bulk_assign_pipeline_to_files(request: Request, body: BulkPipelineAssignment
 
         db.commit()
 
+        try:
+            from app.utils.webhook import dispatch_webhook_events
+
+            dispatch_webhook_events(
+                (
+                    "document.routed",
+                    {
+                        "file_id": file_record.id,
+                        "filename": file_record.original_filename,
+                        "pipeline_id": file_record.pipeline_id,
+                        "assignment_source": file_record.pipeline_assignment_source,
+                        "routing_rule_id": file_record.pipeline_routing_rule_id,
+                        "reason": file_record.pipeline_assignment_reason,
+                    },
+                )
+                for file_record in file_records
+            )
+        except Exception as webhook_exc:
+            logger.warning("Failed to dispatch document.routed webhooks after bulk route: %s", webhook_exc)
+
         logger.info("Bulk pipeline assignment updated %d files to pipeline=%r", len(updated_ids), body.pipeline_id)
         return {
             "status": "success",
@@ -1038,10 +1104,11 @@ def bulk_tag_files(request: Request, body: BulkTagRequest, db: DbSession):
         db.commit()
 
         try:
-            from app.utils.webhook import dispatch_webhook_event
+            from app.utils.webhook import dispatch_webhook_events
 
-            for file_record in file_records:
-                dispatch_webhook_event(
+            # One Celery message per endpoint instead of one per document.
+            dispatch_webhook_events(
+                (
                     "document.metadata_updated",
                     {
                         "file_id": file_record.id,
@@ -1050,6 +1117,8 @@ def bulk_tag_files(request: Request, body: BulkTagRequest, db: DbSession):
                         "mode": body.mode,
                     },
                 )
+                for file_record in file_records
+            )
         except Exception as webhook_exc:
             logger.warning("Failed to dispatch document.metadata_updated webhook after bulk tag: %s", webhook_exc)
 
@@ -1794,11 +1863,22 @@ def download_file(
         raise HTTPException(status_code=500, detail=f"Error downloading file: {str(e)}")
 
 
+def _remove_if_exists(path: str) -> None:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
 async def _save_upload_file_chunks(file: UploadFile, target_path: str, max_size: int) -> int:
-    """Save an uploaded file in chunks and enforce the maximum size limit."""
+    """Save an uploaded file in chunks and enforce the maximum size limit.
+
+    Reads and writes never block the event loop: the body is streamed with
+    aiofiles and cleanup runs on the upload I/O pool.
+    """
     try:
         written_size = 0
-        with open(target_path, "wb") as f:
+        async with aiofiles.open(target_path, "wb") as f:
             chunk_size = 65536  # 64 KB chunks
             while True:
                 chunk = await file.read(chunk_size)
@@ -1806,21 +1886,19 @@ async def _save_upload_file_chunks(file: UploadFile, target_path: str, max_size:
                     break
                 written_size += len(chunk)
                 if written_size > max_size:
-                    # Exceeded limit mid-stream; clean up and reject
-                    f.close()
-                    os.remove(target_path)
+                    # Exceeded limit mid-stream; the cleanup below removes the partial file
                     raise HTTPException(
                         status_code=413,
                         detail=f"File too large: exceeded {max_size} bytes during upload. "
                         f"See SECURITY_AUDIT.md for configuration details.",
                     )
-                f.write(chunk)
+                await f.write(chunk)
         return written_size
     except HTTPException:
+        await run_blocking(_remove_if_exists, target_path)
         raise
     except Exception as e:
-        if os.path.exists(target_path):
-            os.remove(target_path)
+        await run_blocking(_remove_if_exists, target_path)
         raise HTTPException(status_code=500, detail=f"Failed to save file: {e}")
 
 
@@ -1867,6 +1945,31 @@ def _check_for_exact_duplicate(
     return None
 
 
+@router.post("/files/check-hashes")
+@require_login
+def check_upload_hashes(request: Request, body: HashCheckRequest, db: DbSession):
+    """Report which SHA-256 digests the server already holds for the caller.
+
+    Bulk uploaders call this before transferring files: a digest listed in
+    ``known`` would be rejected as an exact duplicate by ``/ui-upload``, so
+    it does not need to be sent.  Matching follows the upload duplicate
+    check: original (non-duplicate) records, scoped to the uploading owner in
+    multi-user mode.
+
+    Returns:
+        ``{"known": {sha256: file_id}, "deduplication_enabled": bool}``
+    """
+    query = db.query(FileRecord.filehash, FileRecord.id).filter(
+        FileRecord.filehash.in_(set(body.hashes)), FileRecord.is_duplicate.is_(False)
+    )
+    if settings.multi_user_enabled:
+        query = query.filter(FileRecord.owner_id == get_document_upload_owner_id(request))
+    known: dict[str, int] = {}
+    for filehash, file_id in query.order_by(FileRecord.id.asc()):
+        known.setdefault(filehash, file_id)
+    return {"known": known, "deduplication_enabled": bool(settings.enable_deduplication)}
+
+
 @router.post("/ui-upload")
 @require_login
 async def ui_upload(
@@ -1917,49 +2020,56 @@ async def ui_upload(
     # Enforce subscription tier upload quotas (multi-user mode only) BEFORE writing the file
     # so that users who have exceeded their quota do not waste bandwidth or disk I/O.
     if settings.multi_user_enabled and upload_owner_id:
-        from app.utils.subscription import QuotaExceeded, check_upload_allowed, get_user_tier_id
-
-        tier_id = get_user_tier_id(db, upload_owner_id)
-        try:
-            check_upload_allowed(db, upload_owner_id, tier_id)
-        except QuotaExceeded as qe:
-            raise HTTPException(
-                status_code=status.HTTP_402_PAYMENT_REQUIRED,
-                detail=str(qe),
-            )
+        await run_blocking(_enforce_upload_quota, db, upload_owner_id)
 
     # Read file in chunks to avoid loading the entire body into memory at once,
     # enforcing the size limit during the read so memory usage stays bounded.
-    try:
-        written_size = 0
-        async with aiofiles.open(target_path, "wb") as f:
-            chunk_size = 65536  # 64 KB chunks
-            while True:
-                chunk = await file.read(chunk_size)
-                if not chunk:
-                    break
-                written_size += len(chunk)
-                if written_size > max_size:
-                    # Exceeded limit mid-stream; clean up and reject
-                    await f.close()
-                    os.remove(target_path)
-                    raise HTTPException(
-                        status_code=413,
-                        detail=f"File too large: exceeded {max_size} bytes during upload. "
-                        f"See SECURITY_AUDIT.md for configuration details.",
-                    )
-                await f.write(chunk)
-    except HTTPException:
-        raise
-    except Exception as e:
-        if os.path.exists(target_path):
-            os.remove(target_path)
-        raise HTTPException(status_code=500, detail=f"Failed to save file: {e}")
+    file_size = await _save_upload_file_chunks(file, target_path, max_size)
 
     # Log the mapping between original and safe filename
     logger.info(f"Saved uploaded file '{safe_filename}' as '{target_filename}'")
-    file_size = written_size
 
+    # Hashing, the duplicate query, PDF splitting and the broker round-trip
+    # all block, so they run on the upload I/O pool.
+    return await run_blocking(
+        _queue_saved_upload,
+        request,
+        db,
+        target_path,
+        target_filename,
+        safe_filename,
+        file_size,
+        upload_owner_id,
+    )
+
+
+def _enforce_upload_quota(db: Session, owner_id: str) -> None:
+    """Raise 402 when *owner_id* has exhausted their subscription tier's upload quota."""
+    from app.utils.subscription import QuotaExceeded, check_upload_allowed, get_user_tier_id
+
+    tier_id = get_user_tier_id(db, owner_id)
+    try:
+        check_upload_allowed(db, owner_id, tier_id)
+    except QuotaExceeded as qe:
+        raise HTTPException(
+            status_code=status.HTTP_402_PAYMENT_REQUIRED,
+            detail=str(qe),
+        )
+
+
+def _queue_saved_upload(
+    request: Request,
+    db: Session,
+    target_path: str,
+    target_filename: str,
+    safe_filename: str,
+    file_size: int,
+    upload_owner_id: str | None,
+) -> dict:
+    """Reject exact duplicates, split oversized PDFs and enqueue a saved upload.
+
+    Blocking; ``ui_upload`` runs it on the upload I/O pool.
+    """
     # ── Early duplicate rejection ──────────────────────────────────────────
     # Check for exact duplicates (same SHA-256 hash) BEFORE enqueuing a
     # processing task.  When deduplication is enabled and the file already
@@ -2106,6 +2216,7 @@ def claim_file(request: Request, file_id: int, db: DbSession):
     file_record.owner_id = owner_id
     file_record.tenant_id = tenant_id
     file_record.tribe_id = tribe_id
+    adjust_usage_for_records(db, [file_record], 1)
     try:
         db.commit()
     except Exception as e:
@@ -2150,6 +2261,7 @@ def bulk_claim_files(request: Request, file_ids: list[int], db: DbSession):
             claimed.append(rec.id)
         else:
             skipped.append({"file_id": rec.id, "reason": "already owned"})
+    adjust_usage_for_records(db, [rec for rec in file_records if rec.id in claimed], 1)
 
     try:
         db.commit()
@@ -2233,6 +2345,7 @@ def assign_owner(
 
     for file_record in assignable:
         file_record.owner_id = owner_id
+    adjust_usage_for_records(db, assignable, 1)
     updated = len(assignable)
 
     try:
@@ -1,23 +1,43 @@
-"""Authenticated, idempotent machine-to-machine document intake."""
+"""Authenticated, idempotent machine-to-machine document intake.
 
+Documents arrive either as one multipart body (``POST /intake/documents``)
+or through the resumable upload protocol under ``/intake/uploads``, modelled
+on tus 1.0: the client creates an upload, sends the bytes as ``PATCH``
+chunks at the current ``Upload-Offset`` (asking with ``HEAD`` after a
+dropped connection), then finalizes it.  Chunks stream straight to a
+partial file while the SHA-256 is updated incrementally, and the upload
+state lives in the ``resumable_uploads`` table so any web worker can carry
+on.  Finalizing feeds the same ``DocumentIntake`` idempotency ledger as the
+multipart endpoint.
+"""
+
+import hashlib
 import hmac
 import json
 import logging
 import os
+import threading
 import uuid
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
 from typing import Annotated, Any
 
-from fastapi import APIRouter, Depends, File, Form, Header, HTTPException, Request, UploadFile, status
+import aiofiles
+from fastapi import APIRouter, Depends, File, Form, Header, HTTPException, Request, Response, UploadFile, status
+from pydantic import BaseModel, Field
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
+from starlette.requests import ClientDisconnect
 
 from app.config import settings
 from app.database import get_db
 from app.middleware.upload_rate_limit import require_upload_rate_limit
-from app.models import DocumentIntake
+from app.models import DocumentIntake, ResumableUpload
 from app.tasks.convert_to_pdf import convert_to_pdf
 from app.tasks.process_document import process_document
 from app.utils.allowed_types import ALLOWED_EXTENSIONS, ALLOWED_MIME_TYPES
+from app.utils.blocking_io import run_blocking
 from app.utils.filename_utils import sanitize_filename
 from app.utils.user_scope import get_current_owner_id
 
@@ -25,6 +45,33 @@ logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/intake", tags=["document-intake"])
 DbSession = Annotated[Session, Depends(get_db)]
 
+TUS_VERSION = "1.0.0"
+CHUNK_CONTENT_TYPE = "application/offset+octet-stream"
+#: Incremental hashers kept in memory; uploads beyond this rebuild theirs from the partial file.
+_HASHER_CACHE_SIZE = 256
+
+# upload id -> (offset, sha256 state) for chunks this process received.
+_hashers: "OrderedDict[str, tuple[int, Any]]" = OrderedDict()
+_hashers_lock = threading.Lock()
+# Uploads with a chunk being written by this process (event-loop only).
+_writing: set[str] = set()
+
+
+class ResumableUploadCreate(BaseModel):
+    """Announcement of a document to be sent in chunks."""
+
+    filename: str = Field(..., min_length=1, max_length=255)
+    upload_length: int = Field(..., ge=1, description="Total size of the document in bytes.")
+    source: str = Field(..., min_length=1, max_length=100)
+    idempotency_key: str = Field(..., min_length=8, max_length=255)
+    content_type: str | None = Field(default=None, max_length=255)
+    metadata_json: str | None = None
+    sha256: str | None = Field(
+        default=None,
+        pattern="^[0-9a-fA-F]{64}$",
+        description="Optional digest of the whole document, verified when the upload is finalized.",
+    )
+
 
 def _authenticate_intake(request: Request, shared_secret: str | None) -> tuple[str, str | None]:
     """Return durable principal and optional FileRecord owner identifiers."""
@@ -56,21 +103,95 @@ def _serialize_intake(intake: DocumentIntake, *, duplicate: bool = False) -> dic
     }
 
 
+def _validate_document(filename: str | None, content_type: str | None, metadata_json: str | None) -> tuple[str, str]:
+    """Return the sanitized filename and normalized content type, or raise 415/422."""
+    safe_filename = sanitize_filename(os.path.basename(filename or "document")) or "document"
+    extension = os.path.splitext(safe_filename)[1].lower()
+    content_type = (content_type or "").split(";", 1)[0].strip().lower()
+    supported_type = extension in ALLOWED_EXTENSIONS if extension else content_type in ALLOWED_MIME_TYPES
+    if not supported_type:
+        raise HTTPException(status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE, detail="Unsupported document type")
+    if metadata_json:
+        try:
+            parsed_metadata = json.loads(metadata_json)
+        except json.JSONDecodeError as exc:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="metadata_json is invalid"
+            ) from exc
+        if not isinstance(parsed_metadata, dict):
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="metadata_json must be an object"
+            )
+    return safe_filename, content_type
+
+
+def _intake_path(intake: DocumentIntake) -> str:
+    extension = os.path.splitext(intake.original_filename)[1].lower()
+    return os.path.join(settings.workdir, f"intake_{intake.id}_{uuid.uuid4().hex}{extension}")
+
+
+def _remove_if_exists(path: str) -> None:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
 async def _save_upload(file: UploadFile, target_path: str) -> int:
     temporary_path = f"{target_path}.part"
     written = 0
     try:
-        with open(temporary_path, "wb") as output:
+        async with aiofiles.open(temporary_path, "wb") as output:
             while chunk := await file.read(64 * 1024):
                 written += len(chunk)
                 if written > settings.max_upload_size:
                     raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail="File too large")
-                output.write(chunk)
-        os.replace(temporary_path, target_path)
+                await output.write(chunk)
+        await run_blocking(os.replace, temporary_path, target_path)
         return written
     finally:
-        if os.path.exists(temporary_path):
-            os.remove(temporary_path)
+        await run_blocking(_remove_if_exists, temporary_path)
+
+
+def _find_intake(db: Session, principal_id: str, idempotency_key: str) -> DocumentIntake | None:
+    return (
+        db.query(DocumentIntake)
+        .filter(
+            DocumentIntake.principal_id == principal_id,
+            DocumentIntake.idempotency_key == idempotency_key,
+        )
+        .first()
+    )
+
+
+def _reserve_intake(db: Session, intake: DocumentIntake) -> DocumentIntake | None:
+    """Insert *intake*; return the concurrent winner instead if the idempotency key was taken meanwhile."""
+    db.add(intake)
+    try:
+        db.commit()
+        db.refresh(intake)
+        return None
+    except IntegrityError:
+        db.rollback()
+        existing = _find_intake(db, intake.principal_id, intake.idempotency_key)
+        if existing is None:
+            raise
+        return existing
+
+
+def _mark_queued(db: Session, intake: DocumentIntake, target_path: str, task_id: str) -> None:
+    intake.local_path = target_path
+    intake.task_id = task_id
+    intake.state = "queued"
+    db.commit()
+    db.refresh(intake)
+
+
+def _mark_failed(db: Session, intake: DocumentIntake, target_path: str, error: str) -> None:
+    _remove_if_exists(target_path)
+    intake.state = "failed"
+    intake.error = error
+    db.commit()
 
 
 def _queue_document(
@@ -112,34 +233,13 @@ async def intake_document(
     """Store a document atomically and queue the normal ingestion pipeline."""
     principal_id, owner_id = _authenticate_intake(request, x_docuelevate_intake_secret)
 
-    existing = (
-        db.query(DocumentIntake)
-        .filter(
-            DocumentIntake.principal_id == principal_id,
-            DocumentIntake.idempotency_key == idempotency_key,
-        )
-        .first()
-    )
+    # Database, disk and broker calls run on the upload I/O pool so a slow
+    # volume or database never stalls the event loop.
+    existing = await run_blocking(_find_intake, db, principal_id, idempotency_key)
     if existing:
         return _serialize_intake(existing, duplicate=True)
 
-    safe_filename = sanitize_filename(os.path.basename(file.filename or "document")) or "document"
-    extension = os.path.splitext(safe_filename)[1].lower()
-    content_type = (file.content_type or "").split(";", 1)[0].strip().lower()
-    supported_type = extension in ALLOWED_EXTENSIONS if extension else content_type in ALLOWED_MIME_TYPES
-    if not supported_type:
-        raise HTTPException(status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE, detail="Unsupported document type")
-    if metadata_json:
-        try:
-            parsed_metadata = json.loads(metadata_json)
-        except json.JSONDecodeError as exc:
-            raise HTTPException(
-                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="metadata_json is invalid"
-            ) from exc
-        if not isinstance(parsed_metadata, dict):
-            raise HTTPException(
-                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="metadata_json must be an object"
-            )
+    safe_filename, content_type = _validate_document(file.filename, file.content_type, metadata_json)
 
     intake = DocumentIntake(
         principal_id=principal_id,
@@ -148,40 +248,19 @@ async def intake_document(
         original_filename=safe_filename,
         metadata_json=metadata_json,
     )
-    db.add(intake)
-    try:
-        db.commit()
-        db.refresh(intake)
-    except IntegrityError:
-        db.rollback()
-        existing = (
-            db.query(DocumentIntake)
-            .filter(
-                DocumentIntake.principal_id == principal_id,
-                DocumentIntake.idempotency_key == idempotency_key,
-            )
-            .one()
-        )
+    existing = await run_blocking(_reserve_intake, db, intake)
+    if existing:
         return _serialize_intake(existing, duplicate=True)
 
-    target_name = f"intake_{intake.id}_{uuid.uuid4().hex}{extension}"
-    target_path = os.path.join(settings.workdir, target_name)
+    target_path = _intake_path(intake)
     try:
         await _save_upload(file, target_path)
-        task = _queue_document(target_path, safe_filename, content_type, owner_id)
-        intake.local_path = target_path
-        intake.task_id = task.id
-        intake.state = "queued"
-        db.commit()
-        db.refresh(intake)
+        task = await run_blocking(_queue_document, target_path, safe_filename, content_type, owner_id)
+        await run_blocking(_mark_queued, db, intake, target_path, task.id)
         logger.info("Document intake %s queued task %s from %s", intake.id, task.id, source)
         return _serialize_intake(intake)
     except Exception as exc:
-        if os.path.exists(target_path):
-            os.remove(target_path)
-        intake.state = "failed"
-        intake.error = type(exc).__name__
-        db.commit()
+        await run_blocking(_mark_failed, db, intake, target_path, type(exc).__name__)
         raise
 
 
@@ -201,3 +280,463 @@ def get_intake_status(
     if not intake:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Intake not found")
     return _serialize_intake(intake)
+
+
+# ---------------------------------------------------------------------------
+# Resumable uploads
+# ---------------------------------------------------------------------------
+
+
+def _aware(value: datetime) -> datetime:
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value
+
+
+def _upload_expiry() -> datetime:
+    return datetime.now(timezone.utc) + timedelta(hours=settings.resumable_upload_expiry_hours)
+
+
+def _upload_headers(upload: ResumableUpload) -> dict[str, str]:
+    return {
+        "Tus-Resumable": TUS_VERSION,
+        "Upload-Offset": str(upload.upload_offset),
+        "Upload-Length": str(upload.upload_length),
+        "Upload-Expires": format_datetime(_aware(upload.expires_at).astimezone(timezone.utc), usegmt=True),
+        "Cache-Control": "no-store",
+    }
+
+
+def _serialize_upload(upload: ResumableUpload, intake: DocumentIntake | None = None) -> dict[str, Any]:
+    return {
+        "upload_id": upload.id,
+        "idempotency_key": upload.idempotency_key,
+        "source": upload.source,
+        "filename": upload.original_filename,
+        "state": upload.state,
+        "upload_offset": upload.upload_offset,
+        "upload_length": upload.upload_length,
+        "sha256": upload.sha256,
+        "expires_at": upload.expires_at,
+        "intake": _serialize_intake(intake) if intake else None,
+    }
+
+
+def _find_upload(db: Session, principal_id: str, upload_id: str) -> ResumableUpload | None:
+    return (
+        db.query(ResumableUpload)
+        .filter(ResumableUpload.id == upload_id, ResumableUpload.principal_id == principal_id)
+        .first()
+    )
+
+
+def _require_writable(upload: ResumableUpload | None) -> ResumableUpload:
+    """Return *upload* if chunks may still be written to it, else raise 404/409/410."""
+    if upload is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Upload not found")
+    if upload.state == "failed" or (
+        upload.state == "uploading" and _aware(upload.expires_at) <= datetime.now(timezone.utc)
+    ):
+        raise HTTPException(status_code=status.HTTP_410_GONE, detail="Upload expired or failed; start a new one")
+    if upload.state != "uploading":
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=f"Upload is {upload.state}")
+    return upload
+
+
+def _discard_upload(db: Session, upload: ResumableUpload) -> None:
+    _remove_if_exists(upload.local_path)
+    db.delete(upload)
+    db.commit()
+
+
+def _start_upload(
+    db: Session, principal_id: str, body: ResumableUploadCreate, filename: str, content_type: str
+) -> tuple[ResumableUpload, bool]:
+    """Return ``(upload, created)``: the unfinished upload for the idempotency key, or a new one."""
+    upload = (
+        db.query(ResumableUpload)
+        .filter(ResumableUpload.principal_id == principal_id, ResumableUpload.idempotency_key == body.idempotency_key)
+        .first()
+    )
+    if upload is not None:
+        try:
+            _require_writable(upload)
+        except HTTPException as exc:
+            # Expired, failed and orphaned completed uploads make way for a fresh one.
+            if exc.status_code != status.HTTP_410_GONE and upload.state != "completed":
+                raise
+            _discard_upload(db, upload)
+        else:
+            if upload.upload_length != body.upload_length:
+                raise HTTPException(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail="An unfinished upload with this idempotency key has a different length",
+                )
+            return upload, False
+
+    upload_id = str(uuid.uuid4())
+    upload_dir = os.path.join(settings.workdir, "resumable_uploads")
+    os.makedirs(upload_dir, exist_ok=True)
+    upload = ResumableUpload(
+        id=upload_id,
+        principal_id=principal_id,
+        idempotency_key=body.idempotency_key,
+        source=body.source,
+        original_filename=filename,
+        content_type=content_type or None,
+        metadata_json=body.metadata_json,
+        upload_length=body.upload_length,
+        upload_offset=0,
+        expected_sha256=body.sha256.lower() if body.sha256 else None,
+        local_path=os.path.join(upload_dir, f"{upload_id}.part"),
+        expires_at=_upload_expiry(),
+    )
+    with open(upload.local_path, "wb"):
+        pass
+    db.add(upload)
+    try:
+        db.commit()
+    except IntegrityError:
+        # A concurrent request created the upload for this key first.
+        db.rollback()
+        _remove_if_exists(upload.local_path)
+        winner = (
+            db.query(ResumableUpload)
+            .filter(
+                ResumableUpload.principal_id == principal_id,
+                ResumableUpload.idempotency_key == body.idempotency_key,
+            )
+            .first()
+        )
+        if winner is None:
+            raise
+        return winner, False
+    db.refresh(upload)
+    return upload, True
+
+
+def _resume_hasher(upload_id: str, path: str, offset: int) -> Any:
+    """Return the SHA-256 state after the first *offset* bytes, rebuilding it from disk when not cached."""
+    with _hashers_lock:
+        cached = _hashers.get(upload_id)
+        if cached and cached[0] == offset:
+            return cached[1].copy()
+    hasher = hashlib.sha256()
+    remaining = offset
+    with open(path, "rb") as handle:
+        while remaining and (block := handle.read(min(1024 * 1024, remaining))):
+            hasher.update(block)
+            remaining -= len(block)
+    if remaining:
+        raise OSError(f"Partial upload {upload_id} is shorter than its recorded offset")
+    return hasher
+
+
+def _remember_hasher(upload_id: str, offset: int, hasher: Any) -> None:
+    with _hashers_lock:
+        _hashers[upload_id] = (offset, hasher)
+        _hashers.move_to_end(upload_id)
+        while len(_hashers) > _HASHER_CACHE_SIZE:
+            _hashers.popitem(last=False)
+
+
+def _forget_hasher(upload_id: str) -> None:
+    with _hashers_lock:
+        _hashers.pop(upload_id, None)
+
+
+def _advance_offset(db: Session, upload: ResumableUpload, new_offset: int) -> bool:
+    """Move the offset forward unless another worker wrote a chunk meanwhile."""
+    updated = (
+        db.query(ResumableUpload)
+        .filter(
+            ResumableUpload.id == upload.id,
+            ResumableUpload.state == "uploading",
+            ResumableUpload.upload_offset == upload.upload_offset,
+        )
+        .update(
+            {ResumableUpload.upload_offset: new_offset, ResumableUpload.expires_at: _upload_expiry()},
+            synchronize_session=False,
+        )
+    )
+    db.commit()
+    db.refresh(upload)
+    return bool(updated)
+
+
+async def _write_chunk(request: Request, upload: ResumableUpload, hasher: Any) -> int:
+    """Stream the request body into the partial file at the upload offset; return the bytes written.
+
+    Bytes received before a client disconnect are kept, so the client
+    resumes from wherever the connection dropped.
+    """
+    limit = min(upload.upload_length - upload.upload_offset, settings.resumable_upload_max_chunk_size)
+    written = 0
+    async with aiofiles.open(upload.local_path, "r+b") as output:
+        await output.seek(upload.upload_offset)
+        try:
+            async for chunk in request.stream():
+                if written + len(chunk) > limit:
+                    raise HTTPException(
+                        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                        detail="Chunk exceeds the upload length or RESUMABLE_UPLOAD_MAX_CHUNK_SIZE",
+                    )
+                await output.write(chunk)
+                hasher.update(chunk)
+                written += len(chunk)
+        except ClientDisconnect:
+            logger.info("Client disconnected from upload %s after %d bytes", upload.id, written)
+    return written
+
+
+def _claim_for_finalize(
+    db: Session, principal_id: str, upload_id: str
+) -> tuple[ResumableUpload, DocumentIntake | None]:
+    """Mark a complete upload as finalizing, or return the intake of an already finalized one."""
+    upload = _find_upload(db, principal_id, upload_id)
+    if upload is not None and upload.state == "completed":
+        intake = db.get(DocumentIntake, upload.intake_id) if upload.intake_id else None
+        if intake is None:
+            raise HTTPException(status_code=status.HTTP_410_GONE, detail="Upload intake no longer exists")
+        return upload, intake
+    upload = _require_writable(upload)
+    if upload.upload_offset != upload.upload_length:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT, detail="Upload is incomplete", headers=_upload_headers(upload)
+        )
+    claimed = (
+        db.query(ResumableUpload)
+        .filter(
+            ResumableUpload.id == upload.id,
+            ResumableUpload.state == "uploading",
+            ResumableUpload.upload_offset == ResumableUpload.upload_length,
+        )
+        .update(
+            {ResumableUpload.state: "finalizing", ResumableUpload.expires_at: _upload_expiry()},
+            synchronize_session=False,
+        )
+    )
+    db.commit()
+    db.refresh(upload)
+    if not claimed:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=f"Upload is {upload.state}")
+    return upload, None
+
+
+def _move_upload(upload: ResumableUpload, target_path: str) -> None:
+    # A chunk that lost a race may have left bytes beyond the recorded length.
+    os.truncate(upload.local_path, upload.upload_length)
+    os.replace(upload.local_path, target_path)
+
+
+def _close_upload(
+    db: Session, upload: ResumableUpload, state: str, *, intake: DocumentIntake | None = None, sha256: str | None = None
+) -> None:
+    _remove_if_exists(upload.local_path)
+    upload.state = state
+    upload.intake_id = intake.id if intake else None
+    upload.sha256 = sha256
+    # Completed uploads are kept for a while so a retried finalize gets the same answer.
+    upload.expires_at = _upload_expiry()
+    db.commit()
+
+
+def _release_failed_finalize(db: Session, upload: ResumableUpload) -> None:
+    """Fail an upload whose finalize raised, unless a step already closed it."""
+    db.rollback()
+    if upload.state == "finalizing":
+        _close_upload(db, upload, "failed")
+
+
+def _cancel_upload(db: Session, principal_id: str, upload_id: str) -> bool:
+    upload = _find_upload(db, principal_id, upload_id)
+    if upload is None:
+        return False
+    if upload.state == "finalizing":
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Upload is finalizing")
+    _discard_upload(db, upload)
+    return True
+
+
+@router.post("/uploads", status_code=status.HTTP_201_CREATED)
+async def create_upload(
+    body: ResumableUploadCreate,
+    request: Request,
+    response: Response,
+    db: DbSession,
+    x_docuelevate_intake_secret: str | None = Header(default=None),
+    _rate_ok: None = Depends(require_upload_rate_limit),
+) -> dict[str, Any]:
+    """Start a resumable upload, or return the unfinished one for the same idempotency key.
+
+    Answers 201 with a ``Location`` header for a new upload and 200 when an
+    existing upload is resumed.  If the idempotency key was already used for
+    a finished intake, ``intake`` is set and nothing needs to be sent.
+    """
+    principal_id, _owner_id = _authenticate_intake(request, x_docuelevate_intake_secret)
+    existing = await run_blocking(_find_intake, db, principal_id, body.idempotency_key)
+    if existing:
+        response.status_code = status.HTTP_200_OK
+        return {"upload_id": None, "state": "completed", "intake": _serialize_intake(existing, duplicate=True)}
+
+    safe_filename, content_type = _validate_document(body.filename, body.content_type, body.metadata_json)
+    if body.upload_length > settings.max_upload_size:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail="File too large")
+
+    upload, created = await run_blocking(_start_upload, db, principal_id, body, safe_filename, content_type)
+    response.status_code = status.HTTP_201_CREATED if created else status.HTTP_200_OK
+    response.headers.update(_upload_headers(upload))
+    response.headers["Location"] = f"{request.url.path.rstrip('/')}/{upload.id}"
+    return _serialize_upload(upload)
+
+
+@router.head("/uploads/{upload_id}")
+def get_upload_offset(
+    upload_id: str,
+    request: Request,
+    db: DbSession,
+    x_docuelevate_intake_secret: str | None = Header(default=None),
+) -> Response:
+    """Report the current ``Upload-Offset`` so a client can resume after a dropped connection."""
+    principal_id, _owner_id = _authenticate_intake(request, x_docuelevate_intake_secret)
+    upload = _find_upload(db, principal_id, upload_id)
+    if not upload:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Upload not found")
+    return Response(status_code=status.HTTP_200_OK, headers=_upload_headers(upload))
+
+
+@router.get("/uploads/{upload_id}")
+def get_upload_status(
+    upload_id: str,
+    request: Request,
+    db: DbSession,
+    x_docuelevate_intake_secret: str | None = Header(default=None),
+) -> dict[str, Any]:
+    principal_id, _owner_id = _authenticate_intake(request, x_docuelevate_intake_secret)
+    upload = _find_upload(db, principal_id, upload_id)
+    if not upload:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Upload not found")
+    intake = db.get(DocumentIntake, upload.intake_id) if upload.intake_id else None
+    return _serialize_upload(upload, intake)
+
+
+@router.patch("/uploads/{upload_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def upload_chunk(
+    upload_id: str,
+    request: Request,
+    db: DbSession,
+    upload_offset: int = Header(..., ge=0),
+    content_type: str | None = Header(default=None),
+    x_docuelevate_intake_secret: str | None = Header(default=None),
+) -> Response:
+    """Append the request body to the upload at ``Upload-Offset``.
+
+    Answers 204 with the new ``Upload-Offset``, or 409 with the current one
+    when the client's offset is stale.
+    """
+    principal_id, _owner_id = _authenticate_intake(request, x_docuelevate_intake_secret)
+    if (content_type or "").split(";", 1)[0].strip().lower() != CHUNK_CONTENT_TYPE:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE, detail=f"Chunks must be sent as {CHUNK_CONTENT_TYPE}"
+        )
+    upload = _require_writable(await run_blocking(_find_upload, db, principal_id, upload_id))
+    if upload_offset != upload.upload_offset:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Upload-Offset does not match the upload",
+            headers=_upload_headers(upload),
+        )
+    declared = request.headers.get("content-length", "")
+    if declared.isdigit() and upload_offset + int(declared) > upload.upload_length:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail="Chunk exceeds upload length")
+    if upload_id in _writing:
+        raise HTTPException(status_code=status.HTTP_423_LOCKED, detail="Another chunk is being written")
+
+    _writing.add(upload_id)
+    try:
+        hasher = await run_blocking(_resume_hasher, upload.id, upload.local_path, upload.upload_offset)
+        written = await _write_chunk(request, upload, hasher)
+        if written:
+            if not await run_blocking(_advance_offset, db, upload, upload_offset + written):
+                raise HTTPException(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail="Another chunk was written concurrently",
+                    headers=_upload_headers(upload),
+                )
+            _remember_hasher(upload.id, upload.upload_offset, hasher)
+    finally:
+        _writing.discard(upload_id)
+    return Response(status_code=status.HTTP_204_NO_CONTENT, headers=_upload_headers(upload))
+
+
+@router.post("/uploads/{upload_id}/finalize", status_code=status.HTTP_202_ACCEPTED)
+async def finalize_upload(
+    upload_id: str,
+    request: Request,
+    db: DbSession,
+    x_docuelevate_intake_secret: str | None = Header(default=None),
+) -> dict[str, Any]:
+    """Verify a complete upload and queue it through the document intake ledger.
+
+    Retrying a finalize that already succeeded returns the same intake with
+    ``duplicate`` set.
+    """
+    principal_id, owner_id = _authenticate_intake(request, x_docuelevate_intake_secret)
+    upload, finished = await run_blocking(_claim_for_finalize, db, principal_id, upload_id)
+    if finished is not None:
+        return {**_serialize_intake(finished, duplicate=True), "sha256": upload.sha256}
+
+    # The upload is claimed: whatever fails from here on must release it,
+    # or finalize, cancel and the idempotency key stay blocked by "finalizing".
+    try:
+        hasher = await run_blocking(_resume_hasher, upload.id, upload.local_path, upload.upload_length)
+        _forget_hasher(upload.id)
+        sha256 = hasher.hexdigest()
+        if upload.expected_sha256 and sha256 != upload.expected_sha256:
+            await run_blocking(_close_upload, db, upload, "failed", sha256=sha256)
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="Uploaded content does not match sha256"
+            )
+
+        intake = DocumentIntake(
+            principal_id=principal_id,
+            idempotency_key=upload.idempotency_key,
+            source=upload.source,
+            original_filename=upload.original_filename,
+            metadata_json=upload.metadata_json,
+        )
+        existing = await run_blocking(_reserve_intake, db, intake)
+        if existing:
+            await run_blocking(_close_upload, db, upload, "completed", intake=existing, sha256=sha256)
+            return {**_serialize_intake(existing, duplicate=True), "sha256": sha256}
+
+        target_path = _intake_path(intake)
+        try:
+            await run_blocking(_move_upload, upload, target_path)
+            task = await run_blocking(
+                _queue_document, target_path, upload.original_filename, upload.content_type, owner_id
+            )
+            await run_blocking(_mark_queued, db, intake, target_path, task.id)
+        except Exception as exc:
+            await run_blocking(_mark_failed, db, intake, target_path, type(exc).__name__)
+            await run_blocking(_close_upload, db, upload, "failed", sha256=sha256)
+            raise
+        await run_blocking(_close_upload, db, upload, "completed", intake=intake, sha256=sha256)
+    except Exception:
+        await run_blocking(_release_failed_finalize, db, upload)
+        raise
+    logger.info("Resumable upload %s queued intake %s (task %s)", upload.id, intake.id, task.id)
+    return {**_serialize_intake(intake), "sha256": sha256}
+
+
+@router.delete("/uploads/{upload_id}", status_code=status.HTTP_204_NO_CONTENT)
+def cancel_upload(
+    upload_id: str,
+    request: Request,
+    db: DbSession,
+    x_docuelevate_intake_secret: str | None = Header(default=None),
+) -> Response:
+    """Abandon an upload and delete its partial file."""
+    principal_id, _owner_id = _authenticate_intake(request, x_docuelevate_intake_secret)
+    if not _cancel_upload(db, principal_id, upload_id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Upload not found")
+    _forget_hasher(upload_id)
+    return Response(status_code=status.HTTP_204_NO_CONTENT, headers={"Tus-Resumable": TUS_VERSION})
@@ -0,0 +1,42 @@
+"""
+Prometheus scrape endpoint.
+
+``GET /metrics`` returns the metrics described in :mod:`app.utils.metrics`
+in the Prometheus text format.  It answers 404 unless ``METRICS_ENABLED`` is
+set, and requires ``Authorization: Bearer <METRICS_TOKEN>`` when a token is
+configured.
+"""
+
+import hmac
+
+from fastapi import APIRouter, HTTPException, Request, status
+from fastapi.responses import Response
+
+from app.config import settings
+from app.utils.metrics import metrics_enabled, render_latest
+
+router = APIRouter(tags=["metrics"])
+
+
+@router.get("/metrics", include_in_schema=False)
+def prometheus_metrics(request: Request) -> Response:
+    """Return the Prometheus exposition of this host's web and worker processes.
+
+    Runs in the threadpool because collecting queue depths is a blocking
+    Redis round-trip.
+    """
+    if not metrics_enabled():
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+
+    token = getattr(settings, "metrics_token", None)
+    if isinstance(token, str) and token:
+        scheme, _, supplied = request.headers.get("Authorization", "").partition(" ")
+        if scheme.lower() != "bearer" or not hmac.compare_digest(supplied.encode(), token.encode()):
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid metrics token",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+
+    body, content_type = render_latest()
+    return Response(content=body, media_type=content_type)
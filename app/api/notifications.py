@@ -15,7 +15,8 @@ from sqlalchemy.orm import Session
 
 from app.database import get_db
 from app.models import InAppNotification, UserNotificationPreference, UserNotificationTarget
-from app.utils.user_notification import USER_EVENT_LABELS
+from app.utils.live_events import EVENT_NOTIFICATIONS, publish_event
+from app.utils.user_notification import USER_EVENT_LABELS, count_unread_notifications
 from app.utils.user_scope import get_current_owner_id
 
 logger = logging.getLogger(__name__)
@@ -162,12 +163,7 @@ async def unread_count(
     db: DbSession,
 ) -> dict[str, int]:
     """Return the number of unread in-app notifications."""
-    count = (
-        db.query(InAppNotification)
-        .filter(InAppNotification.owner_id == owner_id, InAppNotification.is_read == False)  # noqa: E712
-        .count()
-    )
-    return {"count": count}
+    return {"count": count_unread_notifications(db, owner_id)}
 
 
 @router.post("/inbox/{notification_id}/read", status_code=status.HTTP_200_OK)
@@ -190,6 +186,7 @@ async def mark_read(
     except Exception:
         db.rollback()
         raise
+    publish_event(EVENT_NOTIFICATIONS, owner_id=owner_id)
     return {"detail": "Marked as read"}
 
 
@@ -208,6 +205,7 @@ async def mark_all_read(
     except Exception:
         db.rollback()
         raise
+    publish_event(EVENT_NOTIFICATIONS, owner_id=owner_id)
     return {"detail": "All notifications marked as read"}
 
 
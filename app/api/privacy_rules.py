@@ -14,6 +14,7 @@ from app.database import get_db
 from app.models import FileRecord, PrivacyDecisionAudit, PrivacyRuleModel
 from app.utils.file_privacy import apply_privacy_decision, queue_privacy_reconciliation
 from app.utils.privacy_rules import SINGLE_USER_PRIVACY_OWNER, VALID_RULE_TYPES, match_rule_to_file
+from app.utils.rule_sets import RULE_KIND_PRIVACY, notify_rules_changed
 from app.utils.user_scope import get_current_owner_id
 
 router = APIRouter(prefix="/privacy-rules", tags=["privacy"])
@@ -123,6 +124,7 @@ def create_privacy_rule(request: Request, body: PrivacyRuleCreate, db: DbSession
     db.add(rule)
     db.commit()
     db.refresh(rule)
+    notify_rules_changed(RULE_KIND_PRIVACY, owner_id)
     return _serialize(rule)
 
 
@@ -166,18 +168,21 @@ def update_privacy_rule(
         rule.policy_version += 1
     db.commit()
     db.refresh(rule)
+    notify_rules_changed(RULE_KIND_PRIVACY, owner_id)
     return _serialize(rule)
 
 
 @router.delete("/{rule_id}", status_code=status.HTTP_204_NO_CONTENT)
 @require_login
 def delete_privacy_rule(request: Request, rule_id: int, db: DbSession) -> None:
-    rule = _owned_rule(db, _privacy_owner_id(request), rule_id)
+    owner_id = _privacy_owner_id(request)
+    rule = _owned_rule(db, owner_id, rule_id)
     db.query(PrivacyDecisionAudit).filter(PrivacyDecisionAudit.rule_id == rule.id).update(
         {PrivacyDecisionAudit.rule_id: None}, synchronize_session=False
     )
     db.delete(rule)
     db.commit()
+    notify_rules_changed(RULE_KIND_PRIVACY, owner_id)
 
 
 def _matching_files(
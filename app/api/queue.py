@@ -3,26 +3,40 @@ Queue monitoring API endpoints.
 
 Provides endpoints to query Celery/Redis queue statistics and
 database-level processing status for document pipeline visibility.
+Worker state comes from heartbeat snapshots published by each worker
+(:mod:`app.utils.worker_telemetry`), never from ``celery inspect``.
 """
 
+import asyncio
+import json
 import logging
+import threading
+import time
+from collections.abc import AsyncIterator
 from typing import Any
 
 import redis
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request
+from fastapi.responses import StreamingResponse
 from sqlalchemy import func
 from sqlalchemy.orm import Session
 
 from app.config import settings
-from app.database import get_db
+from app.database import SessionLocal, get_db
 from app.models import FileProcessingStep, FileRecord
+from app.utils.worker_telemetry import aggregate_snapshots, read_worker_snapshots, telemetry_interval
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/queue", tags=["queue"])
 
 # Constants
-CELERY_INSPECT_TIMEOUT = 2.0
-MAX_ARGS_DISPLAY_LENGTH = 200
+STREAM_KEEPALIVE_SECONDS = 15.0
+
+#: Seconds one statistics snapshot is shared by every stream of this process.
+STATS_CACHE_SECONDS = 5.0
+
+_stats_cache: tuple[float, str] | None = None
+_stats_lock = threading.Lock()
 
 
 def _get_redis_queue_length(redis_client: redis.Redis, queue_name: str) -> int:
@@ -42,65 +56,26 @@ def _get_redis_queue_length(redis_client: redis.Redis, queue_name: str) -> int:
         return 0
 
 
-def _get_celery_inspect_stats() -> dict[str, Any]:
-    """Query the Celery inspect API for active, reserved, and scheduled tasks.
+def _get_worker_telemetry(redis_client: redis.Redis | None) -> dict[str, Any]:
+    """Aggregate the heartbeat snapshots published by the Celery workers.
 
-    Returns:
-        Dictionary with active, reserved, and scheduled task summaries.
-    """
-    from app.celery_app import celery
+    Workers publish their state every ``WORKER_TELEMETRY_INTERVAL`` seconds
+    (see :mod:`app.utils.worker_telemetry`), so this is a single ``HGETALL``
+    instead of a broadcast ``inspect`` round-trip to every worker.
 
-    result: dict[str, Any] = {
-        "active": [],
-        "reserved": [],
-        "scheduled": [],
-        "workers_online": 0,
-    }
-
-    try:
-        inspector = celery.control.inspect(timeout=CELERY_INSPECT_TIMEOUT)
-
-        active = inspector.active() or {}
-        reserved = inspector.reserved() or {}
-        scheduled = inspector.scheduled() or {}
-
-        result["workers_online"] = len(active)
-
-        for _worker, tasks in active.items():
-            for task in tasks:
-                result["active"].append(
-                    {
-                        "id": task.get("id", ""),
-                        "name": task.get("name", "unknown"),
-                        "args": str(task.get("args", []))[:MAX_ARGS_DISPLAY_LENGTH],
-                        "started": task.get("time_start"),
-                    }
-                )
-
-        for _worker, tasks in reserved.items():
-            for task in tasks:
-                result["reserved"].append(
-                    {
-                        "id": task.get("id", ""),
-                        "name": task.get("name", "unknown"),
-                        "args": str(task.get("args", []))[:MAX_ARGS_DISPLAY_LENGTH],
-                    }
-                )
-
-        for _worker, tasks in scheduled.items():
-            for task in tasks:
-                req = task.get("request", {})
-                result["scheduled"].append(
-                    {
-                        "id": req.get("id", ""),
-                        "name": req.get("name", "unknown"),
-                        "eta": task.get("eta"),
-                    }
-                )
-    except Exception as exc:
-        logger.warning(f"Celery inspect failed (workers may be offline): {exc}")
+    Args:
+        redis_client: Connected Redis client instance, or *None* if Redis is unavailable.
 
-    return result
+    Returns:
+        Dictionary with active, reserved, and scheduled task summaries plus per-worker details.
+    """
+    snapshots: list[dict] = []
+    if redis_client is not None:
+        try:
+            snapshots = read_worker_snapshots(redis_client)
+        except Exception as exc:
+            logger.warning(f"Could not read worker telemetry: {exc}")
+    return aggregate_snapshots(snapshots)
 
 
 def _get_db_processing_summary(db: Session) -> dict[str, Any]:
@@ -200,50 +175,102 @@ def _get_db_processing_summary(db: Session) -> dict[str, Any]:
         }
 
 
-@router.get("/stats")
-def get_queue_stats(db: Session = Depends(get_db)) -> dict[str, Any]:
-    """Get comprehensive queue and processing statistics.
-
-    Returns queue lengths from Redis, Celery worker inspection data,
-    and database-level processing summaries for the document pipeline.
-
-    Returns:
-        Dictionary containing redis queue info, celery worker info,
-        and database processing summary.
-    """
-    # 1. Redis queue lengths
+def _build_queue_stats(db: Session) -> dict[str, Any]:
+    """Collect queue lengths, worker telemetry and the DB summary in one payload."""
+    # 1. Redis queue lengths and worker telemetry
     queue_lengths: dict[str, int] = {}
+    celery_stats = _get_worker_telemetry(None)
     try:
         redis_client = redis.Redis.from_url(settings.redis_url, decode_responses=True)
         for queue_name in ["document_processor", "default", "celery"]:
             queue_lengths[queue_name] = _get_redis_queue_length(redis_client, queue_name)
+        celery_stats = _get_worker_telemetry(redis_client)
         redis_client.close()
     except Exception as exc:
         logger.warning(f"Could not connect to Redis: {exc}")
 
-    total_queued = sum(queue_lengths.values())
-
-    # 2. Celery inspect
-    celery_stats = _get_celery_inspect_stats()
-
-    # 3. DB summary
+    # 2. DB summary
     db_summary = _get_db_processing_summary(db)
 
     return {
         "queues": queue_lengths,
-        "total_queued": total_queued,
+        "total_queued": sum(queue_lengths.values()),
         "celery": celery_stats,
         "db_summary": db_summary,
     }
 
 
-@router.get("/pending-count")
-def get_pending_count(db: Session = Depends(get_db)) -> dict[str, int]:
-    """Get a lightweight count of queued + in-progress items for the files page banner.
+def _build_queue_stats_with_session() -> dict[str, Any]:
+    with SessionLocal() as db:
+        return _build_queue_stats(db)
+
+
+@router.get("/stats")
+def get_queue_stats(db: Session = Depends(get_db)) -> dict[str, Any]:
+    """Get comprehensive queue and processing statistics.
+
+    Returns queue lengths from Redis, worker telemetry published by the
+    Celery workers, and database-level processing summaries for the
+    document pipeline.
 
     Returns:
-        Dictionary with total_pending count (queued in Redis + processing in DB).
+        Dictionary containing redis queue info, celery worker info,
+        and database processing summary.
+    """
+    return _build_queue_stats(db)
+
+
+def _shared_stats_payload() -> str:
+    """Return the serialized queue statistics, rebuilt at most every ``STATS_CACHE_SECONDS``.
+
+    Every open stream polls this, so the Redis reads and the DB summary run
+    once per process and interval instead of once per connected client.
     """
+    global _stats_cache
+    with _stats_lock:
+        now = time.monotonic()
+        if _stats_cache is None or now - _stats_cache[0] >= STATS_CACHE_SECONDS:
+            stats = _build_queue_stats_with_session()
+            _stats_cache = (now, json.dumps(stats, default=str, sort_keys=True))
+        return _stats_cache[1]
+
+
+async def _queue_stats_events(request: Request) -> AsyncIterator[str]:
+    """Yield a server-sent event whenever the queue statistics change."""
+    interval = telemetry_interval()
+    last_payload = None
+    last_sent = time.monotonic()
+    while not await request.is_disconnected():
+        payload = await asyncio.to_thread(_shared_stats_payload)
+        now = time.monotonic()
+        if payload != last_payload:
+            last_payload, last_sent = payload, now
+            yield f"data: {payload}\n\n"
+        elif now - last_sent >= STREAM_KEEPALIVE_SECONDS:
+            last_sent = now
+            yield ": keep-alive\n\n"
+        await asyncio.sleep(interval)
+
+
+@router.get("/stats/stream")
+async def stream_queue_stats(request: Request) -> StreamingResponse:
+    """Stream queue statistics as server-sent events.
+
+    The payload has the same shape as ``GET /queue/stats`` and is re-checked
+    once per ``WORKER_TELEMETRY_INTERVAL`` against a snapshot shared by all
+    streams of the process (refreshed at most every 5 seconds); an event is
+    only sent when it changed, with a keep-alive comment every 15 seconds
+    otherwise.
+    """
+    return StreamingResponse(
+        _queue_stats_events(request),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def count_pending(db: Session) -> int:
+    """Return queued tasks in Redis plus files with a step in progress."""
     total_pending = 0
 
     # Redis queue lengths
@@ -267,4 +294,14 @@ def get_pending_count(db: Session = Depends(get_db)) -> dict[str, int]:
     except Exception:
         logger.debug("Could not query DB for processing count")
 
-    return {"total_pending": total_pending}
+    return total_pending
+
+
+@router.get("/pending-count")
+def get_pending_count(db: Session = Depends(get_db)) -> dict[str, int]:
+    """Get a lightweight count of queued + in-progress items for the files page banner.
+
+    Returns:
+        Dictionary with total_pending count (queued in Redis + processing in DB).
+    """
+    return {"total_pending": count_pending(db)}
@@ -26,6 +26,7 @@ from app.utils.routing_engine import (
     _evaluate_condition,
     _resolve_field,
 )
+from app.utils.rule_sets import RULE_KIND_ROUTING, notify_rules_changed
 
 logger = logging.getLogger(__name__)
 
@@ -252,6 +253,7 @@ def create_routing_rule(request: Request, db: DbSession, body: RoutingRuleCreate
             detail="Failed to create routing rule",
         )
 
+    notify_rules_changed(RULE_KIND_ROUTING, rule.owner_id)
     logger.info("Routing rule created: id=%s, user=%s", rule.id, user_id)
     return _serialize_rule(rule)
 
@@ -360,6 +362,7 @@ def reorder_routing_rules(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to reorder routing rules",
         )
+    notify_rules_changed(RULE_KIND_ROUTING, user_id)
 
     ordered = sorted(rules, key=lambda r: r.position)
     return [_serialize_rule(r) for r in ordered]
@@ -436,6 +439,7 @@ def update_routing_rule(rule_id: int, request: Request, db: DbSession, body: Rou
             detail="Failed to update routing rule",
         )
 
+    notify_rules_changed(RULE_KIND_ROUTING, rule.owner_id)
     logger.info("Routing rule updated: id=%s, user=%s", rule_id, user_id)
     return _serialize_rule(rule)
 
@@ -454,6 +458,7 @@ def delete_routing_rule(rule_id: int, request: Request, db: DbSession) -> None:
     if not _can_write_rule(rule, user_id, admin):
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Cannot modify this rule")
 
+    rule_owner_id = rule.owner_id
     try:
         db.delete(rule)
         db.commit()
@@ -465,4 +470,5 @@ def delete_routing_rule(rule_id: int, request: Request, db: DbSession) -> None:
             detail="Failed to delete routing rule",
         )
 
+    notify_rules_changed(RULE_KIND_ROUTING, rule_owner_id)
     logger.info("Routing rule deleted: id=%s, user=%s", rule_id, user_id)
@@ -197,6 +197,24 @@ DEFAULT_JOBS: list[dict[str, Any]] = [
         "cron_month_of_year": "*",
         "interval_seconds": None,
     },
+    {
+        "name": "prune-llm-response-cache",
+        "display_name": "Prune LLM Response Cache",
+        "description": (
+            "Deletes cached LLM responses older than LLM_CACHE_MAX_AGE_DAYS and, least recently "
+            "used first, entries beyond LLM_CACHE_MAX_SIZE_MB. "
+            "Runs weekly on Sunday at 04:45 UTC by default."
+        ),
+        "task_name": "app.tasks.batch_tasks.prune_llm_response_cache",
+        "enabled": True,
+        "schedule_type": "cron",
+        "cron_minute": "45",
+        "cron_hour": "4",
+        "cron_day_of_week": "0",
+        "cron_day_of_month": "*",
+        "cron_month_of_year": "*",
+        "interval_seconds": None,
+    },
     {
         "name": "backfill-missing-metadata",
         "display_name": "Backfill Missing AI Metadata",
@@ -18,6 +18,7 @@ from app.config import settings
 from app.middleware.upload_rate_limit import require_upload_rate_limit
 from app.tasks.process_document import process_document
 from app.utils.allowed_types import ALLOWED_EXTENSIONS, ALLOWED_MIME_TYPES
+from app.utils.blocking_io import run_blocking
 from app.utils.filename_utils import sanitize_filename
 from app.utils.network import is_private_ip
 from app.utils.user_scope import get_document_upload_owner_id
@@ -118,9 +119,9 @@ async def verify_redirect(response: httpx.Response) -> None:
         if location:
             # Resolve relative redirects
             new_url = str(response.url.join(location))
-            # Validate the new URL
+            # Validate the new URL (hostname resolution blocks, so it runs off the event loop)
             try:
-                validate_url_safety(new_url)
+                await run_blocking(validate_url_safety, new_url)
             except HTTPException as e:
                 raise UnsafeRedirectError(
                     f"Redirect to unsafe URL blocked: {e.detail}",
@@ -128,6 +129,11 @@ async def verify_redirect(response: httpx.Response) -> None:
                 ) from e
 
 
+def _remove_if_exists(path: str) -> None:
+    if os.path.exists(path):
+        os.remove(path)
+
+
 @router.post("/process-url")
 @require_login
 async def process_url(
@@ -157,8 +163,8 @@ async def process_url(
     upload_owner_id = get_document_upload_owner_id(request)
     url = str(url_request.url)
 
-    # Validate URL safety (SSRF protection)
-    validate_url_safety(url)
+    # Validate URL safety (SSRF protection); resolving the hostname blocks, so run it off the event loop
+    await run_blocking(validate_url_safety, url)
 
     # Parse URL to extract filename if not provided
     if url_request.filename:
@@ -244,7 +250,7 @@ async def process_url(
                             if downloaded_size > max_size:
                                 # Remove partial file
                                 await f.close()
-                                os.remove(target_path)
+                                await run_blocking(os.remove, target_path)
                                 raise HTTPException(
                                     status_code=413,
                                     detail=f"File too large: exceeded {max_size} bytes during download",
@@ -252,8 +258,9 @@ async def process_url(
 
         logger.info(f"Downloaded file from URL '{url}' as '{target_filename}' ({downloaded_size} bytes)")
 
-        # Enqueue for processing
-        task = process_document.delay(
+        # Enqueue for processing (the broker round-trip blocks)
+        task = await run_blocking(
+            process_document.delay,
             target_path,
             original_filename=safe_filename,
             owner_id=upload_owner_id,
@@ -294,13 +301,13 @@ async def process_url(
     except OSError as e:
         logger.error(f"Error saving file from URL: {url} - {str(e)}")
         # Clean up partial file if it exists
-        if target_path and os.path.exists(target_path):
-            os.remove(target_path)
+        if target_path:
+            await run_blocking(_remove_if_exists, target_path)
         raise HTTPException(status_code=500, detail=f"Failed to save file: {str(e)}")
 
     except Exception as e:
         logger.exception(f"Unexpected error processing URL: {url}")
         # Clean up partial file if it exists
-        if target_path and os.path.exists(target_path):
-            os.remove(target_path)
+        if target_path:
+            await run_blocking(_remove_if_exists, target_path)
         raise HTTPException(status_code=500, detail=f"Unexpected error: {str(e)}")
@@ -22,6 +22,7 @@ from app.tasks.process_document import process_document
 from app.tasks.webhook_tasks import deliver_webhook_task
 from app.utils.user_scope import apply_owner_filter, get_current_owner_id
 from app.utils.webhook import VALID_EVENTS, WEBHOOK_PAYLOAD_VERSION
+from app.utils.webhook_registry import notify_subscriptions_changed
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/webhooks", tags=["webhooks"])
@@ -58,6 +59,9 @@ class WebhookCreate(BaseModel):
     events: list[str] = Field(..., min_length=1, description="List of events to subscribe to")
     is_active: bool = Field(default=True, description="Whether the webhook is active")
     description: str | None = Field(default=None, max_length=500, description="Optional human-readable description")
+    batch_delivery: bool = Field(default=False, description="Buffer events and POST them as JSON arrays")
+    max_concurrency: int | None = Field(default=None, ge=1, le=64, description="Concurrent requests to this endpoint")
+    rate_limit_per_minute: int | None = Field(default=None, ge=0, description="Requests per minute (0 = unlimited)")
 
 
 class WebhookUpdate(BaseModel):
@@ -68,6 +72,9 @@ class WebhookUpdate(BaseModel):
     events: list[str] | None = Field(default=None, min_length=1)
     is_active: bool | None = None
     description: str | None = Field(default=None, max_length=500)
+    batch_delivery: bool | None = None
+    max_concurrency: int | None = Field(default=None, ge=1, le=64)
+    rate_limit_per_minute: int | None = Field(default=None, ge=0)
 
 
 class WebhookResponse(BaseModel):
@@ -79,6 +86,9 @@ class WebhookResponse(BaseModel):
     is_active: bool
     description: str | None
     has_secret: bool
+    batch_delivery: bool
+    max_concurrency: int | None
+    rate_limit_per_minute: int | None
 
     model_config = {"from_attributes": True}
 
@@ -150,6 +160,9 @@ def _to_response(cfg: WebhookConfig) -> dict[str, Any]:
         "is_active": cfg.is_active,
         "description": cfg.description,
         "has_secret": cfg.secret is not None and len(cfg.secret) > 0,
+        "batch_delivery": bool(cfg.batch_delivery),
+        "max_concurrency": cfg.max_concurrency,
+        "rate_limit_per_minute": cfg.rate_limit_per_minute,
     }
 
 
@@ -369,6 +382,9 @@ def create_webhook(body: WebhookCreate, db: DbSession, _admin: AdminUser) -> dic
         events=json.dumps(sorted(body.events)),
         is_active=body.is_active,
         description=body.description,
+        batch_delivery=body.batch_delivery,
+        max_concurrency=body.max_concurrency,
+        rate_limit_per_minute=body.rate_limit_per_minute,
     )
     try:
         db.add(cfg)
@@ -378,6 +394,7 @@ def create_webhook(body: WebhookCreate, db: DbSession, _admin: AdminUser) -> dic
         db.rollback()
         raise
 
+    notify_subscriptions_changed()
     logger.info("Webhook %d created for events %s", cfg.id, body.events)
     return _to_response(cfg)
 
@@ -400,6 +417,13 @@ def update_webhook(webhook_id: int, body: WebhookUpdate, db: DbSession, _admin:
         cfg.is_active = body.is_active
     if body.description is not None:
         cfg.description = body.description
+    if body.batch_delivery is not None:
+        cfg.batch_delivery = body.batch_delivery
+    # An explicit null resets a limit to the global default.
+    if "max_concurrency" in body.model_fields_set:
+        cfg.max_concurrency = body.max_concurrency
+    if "rate_limit_per_minute" in body.model_fields_set:
+        cfg.rate_limit_per_minute = body.rate_limit_per_minute
 
     try:
         db.commit()
@@ -408,6 +432,7 @@ def update_webhook(webhook_id: int, body: WebhookUpdate, db: DbSession, _admin:
         db.rollback()
         raise
 
+    notify_subscriptions_changed()
     logger.info("Webhook %d updated", cfg.id)
     return _to_response(cfg)
 
@@ -426,6 +451,7 @@ def delete_webhook(webhook_id: int, db: DbSession, _admin: AdminUser) -> None:
         db.rollback()
         raise
 
+    notify_subscriptions_changed()
     logger.info("Webhook %d deleted", cfg.id)
 
 
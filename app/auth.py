@@ -344,6 +344,25 @@ def get_current_user(request: Request):
     return session_user
 
 
+def _bearer_client_ip(request: Request) -> str | None:
+    """Return the client IP for API token usage tracking (honours X-Forwarded-For)."""
+    client_ip = request.headers.get("x-forwarded-for", "").split(",")[0].strip()
+    if not client_ip and request.client:
+        client_ip = request.client.host
+    return client_ip or None
+
+
+def _api_token_user(owner_id: str, token_id: int) -> dict:
+    """Build a synthetic user dict that mimics the session user format."""
+    return {
+        "id": owner_id,
+        "email": owner_id,
+        "preferred_username": owner_id,
+        "is_admin": False,
+        "_api_token_id": token_id,
+    }
+
+
 def _resolve_bearer_user(request: Request, db: Session) -> dict | None:
     """Resolve a user from a Bearer API token in the Authorization header.
 
@@ -351,6 +370,11 @@ def _resolve_bearer_user(request: Request, db: Session) -> dict | None:
     (last_used_at, last_used_ip) and returns a synthetic user dict compatible
     with the session user format.
 
+    Successful verifications are cached briefly (see
+    :mod:`app.utils.api_token_cache`), so repeated requests with the same
+    token skip the PBKDF2 hash and database lookup; their usage tracking is
+    written in periodic batches instead of on every request.
+
     Returns:
         A user dict or ``None`` if no valid Bearer token is present.
     """
@@ -366,6 +390,14 @@ def _resolve_bearer_user(request: Request, db: Session) -> dict | None:
 
     from app.api.api_tokens import hash_token
     from app.models import ApiToken
+    from app.utils.api_token_cache import token_digest, usage_recorder, verified_tokens
+
+    digest = token_digest(raw_token)
+    cached = verified_tokens.get(digest)
+    if cached is not None:
+        logger.debug("[AUTH] _resolve_bearer_user: cached API token id=%s owner=%s", cached.token_id, cached.owner_id)
+        usage_recorder.record(cached.token_id, _bearer_client_ip(request))
+        return _api_token_user(cached.owner_id, cached.token_id)
 
     token_hash = hash_token(raw_token)
     db_token = db.query(ApiToken).filter(ApiToken.token_hash == token_hash, ApiToken.is_active.is_(True)).first()
@@ -392,24 +424,14 @@ def _resolve_bearer_user(request: Request, db: Session) -> dict | None:
     # Update usage tracking
     try:
         db_token.last_used_at = datetime.now(timezone.utc)
-        # Extract client IP (respect X-Forwarded-For from reverse proxy)
-        client_ip = request.headers.get("x-forwarded-for", "").split(",")[0].strip()
-        if not client_ip and request.client:
-            client_ip = request.client.host
-        db_token.last_used_ip = client_ip or None
+        db_token.last_used_ip = _bearer_client_ip(request)
         db.commit()
     except Exception:
         db.rollback()
         logger.debug("Failed to update API token usage tracking for token_id=%s", db_token.id)
 
-    # Build a synthetic user dict that mimics the session user format
-    return {
-        "id": db_token.owner_id,
-        "email": db_token.owner_id,
-        "preferred_username": db_token.owner_id,
-        "is_admin": False,
-        "_api_token_id": db_token.id,
-    }
+    verified_tokens.put(digest, db_token.id, db_token.owner_id, db_token.expires_at)
+    return _api_token_user(db_token.owner_id, db_token.id)
 
 
 def get_current_user_id(request: Request) -> str:
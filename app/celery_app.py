@@ -15,6 +15,8 @@ from celery.signals import (
 from app.config import settings
 from app.utils.celery_redis_backend import assert_redis_backend_writable, is_redis_backend
 from app.utils.log_safety import restrict_sensitive_provider_logging
+from app.utils.metrics import install_celery_hooks, start_worker_metrics_server
+from app.utils.worker_telemetry import WorkerTelemetryStep
 
 logger = logging.getLogger(__name__)
 
@@ -82,6 +84,13 @@ class ResultBackendWriteabilityCheck(bootsteps.StartStopStep):
 
 celery.steps["worker"].add(ResultBackendWriteabilityCheck)
 
+# Publish a heartbeat snapshot of queue/worker state for /api/queue/stats
+# instead of answering synchronous ``inspect`` broadcasts.
+celery.steps["worker"].add(WorkerTelemetryStep)
+
+# Per-task duration histograms (no-op unless METRICS_ENABLED).
+install_celery_hooks()
+
 
 @worker_process_init.connect
 def reset_database_pool_after_fork(**kwargs):
@@ -167,6 +176,15 @@ def init_sentry_on_worker_ready(**kwargs):
     init_sentry(integrations_extra=["celery"])
 
 
+@worker_ready.connect
+def start_metrics_server_on_worker_ready(**kwargs):
+    """Expose the worker host's Prometheus metrics when METRICS_WORKER_PORT is set."""
+    try:
+        start_worker_metrics_server()
+    except Exception:
+        logger.warning("Could not start the worker metrics server", exc_info=True)
+
+
 @task_failure.connect
 def task_failure_handler(
     sender=None, task_id=None, exception=None, args=None, kwargs=None, traceback=None, einfo=None, **kw
@@ -17,6 +17,7 @@ from app.tasks.batch_tasks import (  # noqa: F401
     cleanup_temp_files,
     expire_shared_links,
     process_new_documents,
+    prune_llm_response_cache,
     prune_old_notifications,
     prune_processing_logs,
     reprocess_failed_documents,
@@ -34,6 +35,7 @@ from app.tasks.extract_metadata_with_gpt import extract_metadata_with_gpt  # noq
 from app.tasks.finalize_document_storage import finalize_document_storage  # noqa: F401
 from app.tasks.imap_tasks import pull_all_inboxes  # noqa: F401
 from app.tasks.knowledge_research import cleanup_knowledge_research_jobs, run_knowledge_research  # noqa: F401
+from app.tasks.llm_batch_tasks import poll_llm_batches  # noqa: F401
 from app.tasks.monitor_stalled_steps import monitor_stalled_steps  # noqa: F401
 
 # **Ensure all tasks are imported before Celery starts**
@@ -42,9 +44,13 @@ from app.tasks.process_with_azure_document_intelligence import process_with_azur
 from app.tasks.process_with_ocr import process_with_ocr  # noqa: F401
 from app.tasks.reconcile_file_privacy import reconcile_file_privacy  # noqa: F401
 from app.tasks.refine_text_with_gpt import refine_text_with_gpt  # noqa: F401
+from app.tasks.resumable_uploads import cleanup_expired_resumable_uploads  # noqa: F401
 from app.tasks.rotate_pdf_pages import rotate_pdf_pages  # noqa: F401
 from app.tasks.send_to_all import send_to_all_destinations  # noqa: F401
-from app.tasks.subscription_tasks import apply_pending_subscription_changes_all  # noqa: F401
+from app.tasks.subscription_tasks import (  # noqa: F401
+    apply_pending_subscription_changes_all,
+    reconcile_usage_counters,
+)
 from app.tasks.translate_to_default_language import translate_to_default_language  # noqa: F401
 
 # Import new send tasks
@@ -66,7 +72,11 @@ from app.tasks.upload_with_rclone import send_to_all_rclone_destinations, upload
 from app.tasks.uptime_kuma_tasks import ping_uptime_kuma  # noqa: F401
 from app.tasks.vector_index import index_document_vectors, reindex_document_vectors  # noqa: F401
 from app.tasks.watch_folder_tasks import scan_all_watch_folders  # noqa: F401
-from app.tasks.webhook_tasks import deliver_webhook_task  # noqa: F401
+from app.tasks.webhook_tasks import (  # noqa: F401
+    deliver_webhook_batch_task,
+    deliver_webhook_task,
+    flush_webhook_batches,
+)
 
 # Register the settings reload signal handler so workers pick up config changes
 from app.utils.settings_sync import register_settings_reload_signal
@@ -148,6 +158,34 @@ celery.conf.beat_schedule = {
         "schedule": crontab(hour="0", minute="5"),  # 00:05 UTC daily
         "options": {"expires": 3600},
     },
+    # Correct drift in the usage counters behind quota checks daily at 00:20 UTC
+    "reconcile-usage-counters": {
+        "task": "app.tasks.subscription_tasks.reconcile_usage_counters",
+        "schedule": crontab(hour="0", minute="20"),
+        "options": {"expires": 3600},
+    },
+    # Send buffered events to webhooks that opted into batched delivery
+    "flush-webhook-batches": {
+        "task": "webhook.flush_batches",
+        "schedule": float(settings.webhook_batch_interval),
+        "options": {"expires": max(1, settings.webhook_batch_interval - 1)},
+    },
+    # Poll offline LLM/embedding batches submitted by the backfills (batch mode only)
+    "poll-llm-batches": (
+        {
+            "task": "app.tasks.llm_batch_tasks.poll_llm_batches",
+            "schedule": crontab(minute="*/5"),
+            "options": {"expires": 240},
+        }
+        if settings.llm_batch_mode_enabled
+        else None
+    ),
+    # Delete partial files of abandoned resumable uploads
+    "cleanup-expired-resumable-uploads": {
+        "task": "app.tasks.resumable_uploads.cleanup_expired_resumable_uploads",
+        "schedule": crontab(minute="15"),  # Hourly
+        "options": {"expires": 3300},
+    },
     "cleanup-knowledge-research-jobs": {
         "task": "app.tasks.knowledge_research.cleanup_knowledge_research_jobs",
         "schedule": crontab(hour="3", minute="30"),
@@ -11,18 +11,24 @@ Usage::
 
 Commands
 --------
-upload      Upload one or more local files for processing.
+upload      Upload one or more local files for processing (``--resumable`` for large files on flaky links).
+bulk-upload Upload whole directories concurrently, skipping content the server already has.
 download    Download a processed (or original) file by ID.
 search      Full-text search across all documents.
 list        List documents with optional filtering.
 token       Sub-commands: create / list / revoke API tokens.
 """
 
+import hashlib
 import json
+import os
 import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from typing import Any
-from urllib.parse import unquote
+from urllib.parse import unquote, urljoin
 
 import click
 import requests
@@ -331,6 +337,82 @@ def list_files(
 # ---------------------------------------------------------------------------
 
 
+#: Attempts per file when the server answers 429/503 or the connection drops.
+_MAX_UPLOAD_ATTEMPTS = 5
+_CHUNK_CONTENT_TYPE = "application/offset+octet-stream"
+
+
+def _sha256_file(path: Path) -> str:
+    """Return the SHA-256 hex digest of *path*."""
+    with path.open("rb") as handle:
+        return hashlib.file_digest(handle, "sha256").hexdigest()
+
+
+def _resumable_upload(url: str, token: str, timeout: int, path: Path, chunk_size: int) -> dict[str, Any]:
+    """Send *path* through ``/api/intake/uploads`` in chunks and return the resulting intake.
+
+    The idempotency key is derived from the file's SHA-256, so running the
+    command again continues an interrupted upload instead of starting over,
+    and content that was already sent is not sent twice.  Dropped
+    connections and 423/429/5xx answers are retried from the offset the
+    server reports.
+    """
+    sha256 = _sha256_file(path)
+    size = path.stat().st_size
+    session = requests.Session()
+    session.headers.update(_build_headers(token))
+    resp = session.post(
+        url.rstrip("/") + "/api/intake/uploads",
+        json={
+            "filename": path.name,
+            "upload_length": size,
+            "source": "cli",
+            "idempotency_key": f"cli:{sha256}",
+            "sha256": sha256,
+        },
+        timeout=timeout,
+    )
+    created = _require_ok(resp)
+    if not isinstance(created, dict):
+        raise click.ClickException("Unexpected response from the upload endpoint")
+    if created.get("intake"):
+        return created["intake"]
+    location = urljoin(url.rstrip("/") + "/", resp.headers["Location"])
+    offset = int(created["upload_offset"])
+
+    failures = 0
+    with path.open("rb") as handle:
+        while offset < size:
+            handle.seek(offset)
+            chunk = handle.read(chunk_size)
+            try:
+                resp = session.patch(
+                    location,
+                    data=chunk,
+                    headers={"Upload-Offset": str(offset), "Content-Type": _CHUNK_CONTENT_TYPE},
+                    timeout=timeout,
+                )
+            except (requests.ConnectionError, requests.Timeout):
+                resp = None
+            if resp is not None and "Upload-Offset" in resp.headers and resp.status_code in (204, 409):
+                # 409: the server has a different offset (e.g. the last response was lost); continue from there.
+                offset = int(resp.headers["Upload-Offset"])
+                failures = 0 if resp.status_code == 204 else failures
+                continue
+            if resp is not None and resp.status_code not in (423, 429, 502, 503, 504):
+                _require_ok(resp)
+            failures += 1
+            if failures >= _MAX_UPLOAD_ATTEMPTS:
+                raise click.ClickException(f"Upload keeps failing at byte {offset}; run the command again to resume")
+            time.sleep(2**failures)
+            try:
+                offset = int(session.head(location, timeout=timeout).headers["Upload-Offset"])
+            except (requests.RequestException, KeyError, ValueError):
+                pass
+    finalized = _require_ok(session.post(location + "/finalize", timeout=timeout))
+    return finalized if isinstance(finalized, dict) else {}
+
+
 @cli.command("upload")
 @click.argument("files", nargs=-1, required=True, type=click.Path(exists=True, readable=True))
 @click.option(
@@ -339,8 +421,20 @@ def list_files(
     show_default=True,
     help="Maximum number of concurrent uploads (sequential when 1).",
 )
+@click.option(
+    "--resumable",
+    is_flag=True,
+    help="Send files in chunks through the resumable intake API; interrupted uploads continue where they stopped.",
+)
+@click.option(
+    "--chunk-size",
+    default=8,
+    show_default=True,
+    type=click.IntRange(1, 1024),
+    help="Chunk size in MiB for --resumable.",
+)
 @click.pass_context
-def upload_files(ctx: click.Context, files: tuple[str, ...], batch_size: int) -> None:
+def upload_files(ctx: click.Context, files: tuple[str, ...], batch_size: int, resumable: bool, chunk_size: int) -> None:
     """Upload one or more local files for processing.
 
     Supports glob patterns and multiple arguments for batch uploads.
@@ -351,6 +445,7 @@ def upload_files(ctx: click.Context, files: tuple[str, ...], batch_size: int) ->
       docuelevate upload report.pdf
       docuelevate upload *.pdf invoice_*.png
       docuelevate upload --batch-size 3 /scans/*.pdf
+      docuelevate upload --resumable --chunk-size 16 large-scan.pdf
     """
     token = _get_token(ctx)
     url: str = ctx.obj["url"]
@@ -363,6 +458,18 @@ def upload_files(ctx: click.Context, files: tuple[str, ...], batch_size: int) ->
     for i, file_path in enumerate(files, 1):
         path = Path(file_path)
         click.echo(f"[{i}/{len(files)}] Uploading {path.name}…", err=True)
+        if resumable:
+            try:
+                data = _resumable_upload(url, token, timeout, path, chunk_size * 1024 * 1024)
+            except (click.ClickException, requests.RequestException, OSError) as exc:
+                detail = exc.format_message() if isinstance(exc, click.ClickException) else str(exc)
+                click.echo(f"  ERROR: {detail}", err=True)
+                results.append({"file": path.name, "status": "error", "detail": detail})
+                failed += 1
+                continue
+            results.append({"file": path.name, "status": "duplicate" if data.get("duplicate") else "queued", **data})
+            click.echo(f"  OK  intake_id={data.get('intake_id', '?')} task_id={data.get('task_id', '?')}", err=True)
+            continue
         try:
             with path.open("rb") as fh:
                 resp = _api(
@@ -399,6 +506,307 @@ def upload_files(ctx: click.Context, files: tuple[str, ...], batch_size: int) ->
         sys.exit(1)
 
 
+# ---------------------------------------------------------------------------
+# bulk-upload command
+# ---------------------------------------------------------------------------
+
+_DEFAULT_MANIFEST = ".docuelevate-upload.jsonl"
+#: Hashes sent per ``/api/files/check-hashes`` request (the server accepts up to 1000).
+_HASH_CHECK_BATCH = 500
+#: Manifest statuses after which a file (at the recorded size and mtime) is never sent again.
+_DONE_STATUSES = frozenset({"uploaded", "known", "duplicate"})
+
+
+def _collect_upload_paths(paths: tuple[str, ...], recursive: bool) -> list[Path]:
+    """Expand files and directories into a sorted list of unique files (hidden files in directories are skipped)."""
+    found: set[Path] = set()
+    for raw in paths:
+        path = Path(raw)
+        if path.is_dir():
+            candidates = path.rglob("*") if recursive else path.glob("*")
+            found.update(p.resolve() for p in candidates if p.is_file() and not p.name.startswith("."))
+        elif path.is_file():
+            found.add(path.resolve())
+    return sorted(found)
+
+
+class _UploadManifest:
+    """Append-only JSONL log of bulk-upload progress.
+
+    Each line records one file version (path, size, mtime) with its SHA-256
+    and status; the last line per path wins.  A re-run skips files whose
+    version is recorded as done and reuses recorded hashes, so an
+    interrupted migration resumes where it stopped.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.entries: dict[str, dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        if path.exists():
+            for line in path.read_text(encoding="utf-8").splitlines():
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue  # a torn last line after a crash
+                if isinstance(entry, dict) and isinstance(entry.get("path"), str):
+                    self.entries[entry["path"]] = entry
+
+    def lookup(self, path: Path, stat: os.stat_result) -> dict[str, Any] | None:
+        """Return the entry for *path* if it describes the file's current version."""
+        entry = self.entries.get(str(path))
+        if entry and entry.get("size") == stat.st_size and entry.get("mtime_ns") == stat.st_mtime_ns:
+            return entry
+        return None
+
+    def record(self, path: Path, stat: os.stat_result, sha256: str, status: str, **extra: Any) -> None:
+        """Append an entry for *path* (thread-safe)."""
+        entry = {
+            "path": str(path),
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "sha256": sha256,
+            "status": status,
+            **extra,
+        }
+        line = json.dumps(entry, default=str) + "\n"
+        with self._lock:
+            self.entries[entry["path"]] = entry
+            with self.path.open("a", encoding="utf-8") as handle:
+                handle.write(line)
+
+
+class _Throughput:
+    """Thread-safe byte and file counters with a rate summary."""
+
+    def __init__(self) -> None:
+        self.started = time.monotonic()
+        self.files = 0
+        self.bytes = 0
+        self._lock = threading.Lock()
+
+    def add(self, size: int) -> None:
+        with self._lock:
+            self.files += 1
+            self.bytes += size
+
+    def rates(self) -> tuple[float, float, float]:
+        """Return ``(elapsed seconds, MB/s, files/s)``."""
+        elapsed = max(time.monotonic() - self.started, 1e-6)
+        return elapsed, self.bytes / elapsed / 1_000_000, self.files / elapsed
+
+    def describe(self) -> str:
+        _, mb_per_s, files_per_s = self.rates()
+        return f"{mb_per_s:.1f} MB/s, {files_per_s:.1f} files/s"
+
+
+def _check_known_hashes(url: str, token: str, timeout: int, hashes: list[str]) -> dict[str, int]:
+    """Return ``{sha256: file_id}`` for the *hashes* the server already holds for this token's owner.
+
+    Empty when the server has deduplication disabled: it would then accept
+    and process those contents again, so nothing may be skipped.
+    """
+    known: dict[str, int] = {}
+    for start in range(0, len(hashes), _HASH_CHECK_BATCH):
+        resp = _api(
+            "POST",
+            url,
+            "/api/files/check-hashes",
+            token,
+            timeout=timeout,
+            json={"hashes": hashes[start : start + _HASH_CHECK_BATCH]},
+        )
+        if resp.status_code == 404:
+            click.echo("Server has no hash check endpoint; uploading every file.", err=True)
+            return {}
+        payload = _require_ok(resp)
+        if not isinstance(payload, dict):
+            continue
+        if payload.get("deduplication_enabled") is False:
+            click.echo("Server deduplication is disabled; uploading every file.", err=True)
+            return {}
+        known.update(payload.get("known", {}))
+    return known
+
+
+def _post_upload(session: requests.Session, url: str, token: str, timeout: int, path: Path) -> requests.Response:
+    """POST *path* to ``/api/ui-upload``, retrying rate limits and dropped connections with backoff."""
+    for attempt in range(1, _MAX_UPLOAD_ATTEMPTS + 1):
+        try:
+            with path.open("rb") as handle:
+                resp = session.post(
+                    url.rstrip("/") + "/api/ui-upload",
+                    headers=_build_headers(token),
+                    files={"file": (path.name, handle)},
+                    timeout=timeout,
+                )
+        except (requests.ConnectionError, requests.Timeout):
+            if attempt == _MAX_UPLOAD_ATTEMPTS:
+                raise
+            time.sleep(2**attempt)
+            continue
+        if resp.status_code not in (429, 503) or attempt == _MAX_UPLOAD_ATTEMPTS:
+            return resp
+        retry_after = resp.headers.get("Retry-After", "")
+        time.sleep(float(retry_after) if retry_after.isdigit() else 2**attempt)
+    raise AssertionError("unreachable")
+
+
+def _upload_outcome(resp: requests.Response) -> tuple[str, dict[str, Any]]:
+    """Map an ``/api/ui-upload`` response to a manifest status and extra fields."""
+    try:
+        payload = resp.json()
+    except ValueError:
+        payload = {}
+    if not isinstance(payload, dict):
+        payload = {}
+    if resp.status_code >= 400:
+        return "error", {"detail": payload.get("detail") or resp.text or f"HTTP {resp.status_code}"}
+    if payload.get("status") == "duplicate":
+        return "duplicate", {"file_id": (payload.get("duplicate_of") or {}).get("original_file_id")}
+    return "uploaded", {"task_id": payload.get("task_id")}
+
+
+@cli.command("bulk-upload")
+@click.argument("paths", nargs=-1, required=True, type=click.Path(exists=True, readable=True))
+@click.option(
+    "--concurrency",
+    default=4,
+    show_default=True,
+    type=click.IntRange(1, 64),
+    help="Number of files uploaded in parallel.",
+)
+@click.option(
+    "--hash-workers",
+    default=4,
+    show_default=True,
+    type=click.IntRange(1, 64),
+    help="Number of files hashed in parallel.",
+)
+@click.option(
+    "--manifest",
+    default=_DEFAULT_MANIFEST,
+    show_default=True,
+    type=click.Path(dir_okay=False),
+    help="Progress log; files it records as done are skipped when the command is run again.",
+)
+@click.option("--recursive/--no-recursive", default=True, show_default=True, help="Descend into sub-directories.")
+@click.pass_context
+def bulk_upload(
+    ctx: click.Context,
+    paths: tuple[str, ...],
+    concurrency: int,
+    hash_workers: int,
+    manifest: str,
+    recursive: bool,
+) -> None:
+    """Upload many files or whole directories, skipping what the server already has.
+
+    Files are hashed locally in parallel, the server is asked which SHA-256
+    digests it already holds for you, and only the remaining files are
+    uploaded with bounded concurrency.  Progress is appended to a local
+    manifest, so an interrupted run can simply be started again.
+
+    Examples:
+
+    \b
+      docuelevate bulk-upload /mnt/nas/archive
+      docuelevate bulk-upload --concurrency 8 --manifest nas.jsonl /mnt/nas/archive
+    """
+    token = _get_token(ctx)
+    url: str = ctx.obj["url"]
+    fmt: str = ctx.obj["fmt"]
+    timeout: int = ctx.obj["timeout"]
+
+    log = _UploadManifest(Path(manifest))
+    counts = {"uploaded": 0, "known": 0, "duplicate": 0, "resumed": 0, "failed": 0}
+
+    # 1. Skip finished files and reuse recorded hashes.
+    candidates: list[tuple[Path, os.stat_result, str | None]] = []
+    for path in _collect_upload_paths(paths, recursive):
+        stat = path.stat()
+        entry = log.lookup(path, stat)
+        if entry and entry.get("status") in _DONE_STATUSES:
+            counts["resumed"] += 1
+        else:
+            candidates.append((path, stat, entry.get("sha256") if entry else None))
+    click.echo(f"{len(candidates)} file(s) to check, {counts['resumed']} already done.", err=True)
+
+    # 2. Hash the rest in parallel.
+    hashing = _Throughput()
+    to_hash = [(path, stat) for path, stat, sha256 in candidates if not sha256]
+    hashes = {str(path): sha256 for path, _, sha256 in candidates if sha256}
+    with ThreadPoolExecutor(max_workers=hash_workers) as pool:
+        for (path, stat), sha256 in zip(to_hash, pool.map(_sha256_file, (path for path, _ in to_hash)), strict=True):
+            hashes[str(path)] = sha256
+            log.record(path, stat, sha256, "hashed")
+            hashing.add(stat.st_size)
+    if to_hash:
+        click.echo(f"Hashed {len(to_hash)} file(s) ({hashing.describe()}).", err=True)
+
+    # 3. Ask the server which contents it already has; send identical local files once.
+    known = _check_known_hashes(url, token, timeout, sorted(set(hashes.values())))
+    pending: list[tuple[Path, os.stat_result, str]] = []
+    first_path: dict[str, Path] = {}
+    for path, stat, _ in candidates:
+        sha256 = hashes[str(path)]
+        if sha256 in known:
+            log.record(path, stat, sha256, "known", file_id=known[sha256])
+            counts["known"] += 1
+        elif sha256 in first_path:
+            log.record(path, stat, sha256, "duplicate", duplicate_of=str(first_path[sha256]))
+            counts["duplicate"] += 1
+        else:
+            first_path[sha256] = path
+            pending.append((path, stat, sha256))
+    click.echo(f"{counts['known']} already on the server, uploading {len(pending)}.", err=True)
+
+    # 4. Upload with bounded concurrency, one keep-alive session per thread.
+    sessions = threading.local()
+
+    def _upload(path: Path) -> requests.Response:
+        if not hasattr(sessions, "session"):
+            sessions.session = requests.Session()
+        return _post_upload(sessions.session, url, token, timeout, path)
+
+    uploading = _Throughput()
+    pool = ThreadPoolExecutor(max_workers=concurrency)
+    try:
+        futures = {pool.submit(_upload, path): (path, stat, sha256) for path, stat, sha256 in pending}
+        for done, future in enumerate(as_completed(futures), 1):
+            path, stat, sha256 = futures[future]
+            try:
+                status, extra = _upload_outcome(future.result())
+            except (requests.RequestException, OSError) as exc:
+                status, extra = "error", {"detail": str(exc)}
+            log.record(path, stat, sha256, status, **extra)
+            counts["failed" if status == "error" else status] += 1
+            outcome = f"ERROR {extra['detail']}" if status == "error" else status
+            uploading.add(stat.st_size)
+            click.echo(f"[{done}/{len(pending)}] {path.name}: {outcome}  ({uploading.describe()})", err=True)
+    except KeyboardInterrupt:
+        pool.shutdown(wait=False, cancel_futures=True)
+        click.echo(f"\nInterrupted; progress is saved in {manifest}.", err=True)
+        sys.exit(130)
+    pool.shutdown()
+
+    elapsed, mb_per_s, files_per_s = uploading.rates()
+    _output(
+        {
+            **counts,
+            "bytes_uploaded": uploading.bytes,
+            "seconds": round(elapsed, 1),
+            "mb_per_s": round(mb_per_s, 2),
+            "files_per_s": round(files_per_s, 2),
+            "manifest": manifest,
+        },
+        fmt,
+    )
+    if counts["failed"]:
+        click.echo(f"\n{counts['failed']} upload(s) failed; run the command again to retry them.", err=True)
+        sys.exit(1)
+
+
 # ---------------------------------------------------------------------------
 # download command
 # ---------------------------------------------------------------------------
@@ -113,6 +113,65 @@ class Settings(BaseSettings):
 
     # Azure OpenAI API version (used when ai_provider="azure")
     azure_openai_api_version: str = "2024-02-01"
+
+    # Connection pools of the shared OpenAI SDK clients (chat and embeddings).
+    llm_http_max_connections: int = Field(
+        default=20,
+        ge=1,
+        description="Maximum concurrent connections per pooled LLM/embedding client.",
+    )
+    llm_http_max_keepalive_connections: int = Field(
+        default=10,
+        ge=1,
+        description="Idle connections each pooled LLM/embedding client keeps open for reuse.",
+    )
+    llm_http_keepalive_expiry: float = Field(
+        default=60.0,
+        gt=0,
+        description="Seconds an idle pooled LLM/embedding connection is kept before it is closed.",
+    )
+
+    # Content-addressed cache of LLM pipeline-stage responses (see app/utils/llm_cache.py).
+    llm_cache_enabled: bool = Field(
+        default=True,
+        description="Reuse stored LLM responses when a pipeline stage sees identical input with the same model.",
+    )
+    llm_cache_disabled_stages: str = Field(
+        default="",
+        description=(
+            "Comma-separated pipeline stages that always call the model, e.g. "
+            "'refine_text,translate'. Stages: extract_metadata, refine_text, translate, "
+            "ocr_merge, text_quality, text_quality_compare."
+        ),
+    )
+    llm_cache_max_age_days: int = Field(
+        default=30,
+        ge=1,
+        description="Cached LLM responses older than this many days are evicted.",
+    )
+    llm_cache_max_size_mb: int = Field(
+        default=256,
+        ge=1,
+        description="Total size of cached LLM responses above which the least recently used are evicted.",
+    )
+
+    # Offline batch-API mode for metadata and embedding backfills (see app/tasks/llm_batch_tasks.py).
+    llm_batch_mode_enabled: bool = Field(
+        default=False,
+        description=(
+            "Submit metadata and embedding backfills as offline batches instead of per-document calls. "
+            "Results arrive within the provider's batch window (up to 24 hours)."
+        ),
+    )
+    llm_batch_backend: str = Field(
+        default="openai",
+        description="Batch backend: 'openai' (OpenAI-compatible Batch API) or 'local' (in-process file stand-in).",
+    )
+    llm_batch_max_requests: int = Field(
+        default=500,
+        ge=1,
+        description="Maximum documents per submitted batch (and per backfill run in batch mode).",
+    )
     workdir: str = "/workdir"
     debug: bool = False  # Default to False
 
@@ -219,6 +278,14 @@ class Settings(BaseSettings):
     azure_region: str = ""
     azure_endpoint: str = ""
     gotenberg_url: str = "http://gotenberg:3000"
+    local_image_conversion_enabled: bool = Field(
+        default=True,
+        description=(
+            "Convert raster images (JPEG, PNG, TIFF, GIF, BMP, WebP) to PDF inside the worker with img2pdf "
+            "instead of sending them to Gotenberg. JPEGs are embedded without re-encoding; multi-page TIFFs, "
+            "EXIF orientation and DPI are preserved. Images img2pdf cannot handle still fall back to Gotenberg."
+        ),
+    )
 
     # ---------------------------------------------------------------------------
     # OCR provider settings
@@ -336,6 +403,22 @@ class Settings(BaseSettings):
             "Useful for admin-configured non-standard durations."
         ),
     )
+    api_token_cache_ttl: int = Field(
+        default=60,
+        ge=0,
+        description=(
+            "Seconds a verified Bearer API token stays cached (in-process and in Redis) so repeated "
+            "requests skip PBKDF2 verification.  Revocations take effect immediately.  0 disables the cache."
+        ),
+    )
+    api_token_usage_flush_interval: int = Field(
+        default=60,
+        ge=0,
+        description=(
+            "Seconds between batched writes of API token last_used_at/last_used_ip for cached tokens.  "
+            "0 writes on every request."
+        ),
+    )
     qr_login_enabled: bool = Field(
         default=True,
         description="Enable QR code-based login for mobile device authentication (default: True).",
@@ -848,6 +931,48 @@ class Settings(BaseSettings):
     uptime_kuma_url: Optional[str] = None
     uptime_kuma_ping_interval: int = 5  # Default ping interval in minutes
 
+    # Worker telemetry (queue dashboard)
+    worker_telemetry_interval: int = Field(
+        default=5,
+        ge=1,
+        description=(
+            "Seconds between the queue/worker snapshots each Celery worker publishes to Redis.  "
+            "The queue dashboard and /api/queue/stats read these instead of broadcasting Celery inspect calls."
+        ),
+    )
+
+    # Live UI events (server-sent events fed by Redis pub/sub)
+    live_events_enabled: bool = Field(
+        default=True,
+        description=(
+            "Publish file status, notification and queue changes over Redis pub/sub and stream them to open "
+            "pages via /api/events/stream.  When disabled (or Redis is unreachable) pages fall back to polling."
+        ),
+    )
+
+    # Prometheus metrics
+    metrics_enabled: bool = Field(
+        default=False,
+        description=(
+            "Collect Prometheus metrics (task/step durations, queue depths, OCR, LLM, embedding, DB pool, "
+            "cache and HTTP latency) and serve them on GET /metrics.  Multi-process deployments must also "
+            "set PROMETHEUS_MULTIPROC_DIR."
+        ),
+    )
+    metrics_token: Optional[str] = Field(
+        default=None,
+        description="Bearer token required by GET /metrics.  When unset the endpoint is unauthenticated.",
+    )
+    metrics_worker_port: int = Field(
+        default=0,
+        ge=0,
+        le=65535,
+        description=(
+            "Port on which each Celery worker host serves its metrics for Prometheus (0 disables).  "
+            "Needed when workers do not share PROMETHEUS_MULTIPROC_DIR with the web process."
+        ),
+    )
+
     # Meilisearch settings (full-text search engine)
     # Default uses the Docker Compose / K8s service name so container-to-container
     # networking works without any extra configuration.  Override to
@@ -972,6 +1097,31 @@ class Settings(BaseSettings):
             "This is the global default; individual user IMAP accounts can override it."
         ),
     )
+    imap_uid_sync_enabled: bool = Field(
+        default=False,
+        description=(
+            "Use incremental UID-based IMAP sync. The last seen UID and UIDVALIDITY are stored per "
+            "mailbox in the database, messages are inspected via BODYSTRUCTURE in batched UID ranges, "
+            "and only allowed attachment parts are downloaded (BODY.PEEK, streamed to disk). "
+            "When disabled, whole messages are fetched and deduplicated via the processed-mail cache. "
+            "Default: False."
+        ),
+    )
+    imap_uid_fetch_batch_size: int = Field(
+        default=50,
+        ge=1,
+        le=1000,
+        description="Number of message UIDs per BODYSTRUCTURE FETCH command in UID sync mode. Default: 50.",
+    )
+    imap_poll_concurrency: int = Field(
+        default=4,
+        ge=1,
+        le=32,
+        description=(
+            "Maximum number of per-user IMAP mailboxes polled at the same time. "
+            "Each concurrent poll holds one IMAP connection. Default: 4."
+        ),
+    )
 
     # Batch processing settings
     processall_throttle_threshold: int = Field(
@@ -1121,6 +1271,40 @@ class Settings(BaseSettings):
         default=True,
         description="Enable webhook delivery for document events",
     )
+    webhook_max_concurrency_per_endpoint: int = Field(
+        default=4,
+        ge=1,
+        le=64,
+        description="Default maximum concurrent webhook requests per endpoint in each worker process",
+    )
+    webhook_rate_limit_per_minute: int = Field(
+        default=0,
+        ge=0,
+        description="Default webhook requests per minute per endpoint in each worker process (0 = unlimited)",
+    )
+    webhook_pool_max_idle_per_host: int = Field(
+        default=4,
+        ge=0,
+        le=64,
+        description="Idle keep-alive connections kept per webhook endpoint and resolved address",
+    )
+    webhook_pool_idle_timeout: int = Field(
+        default=30,
+        ge=1,
+        description="Seconds an idle keep-alive webhook connection may be reused",
+    )
+    webhook_batch_max_size: int = Field(
+        default=100,
+        ge=1,
+        le=1000,
+        description="Maximum events per POST for webhooks with batched delivery enabled",
+    )
+    webhook_batch_interval: int = Field(
+        default=10,
+        ge=1,
+        le=3600,
+        description="Seconds between flushes of buffered events for batched webhooks",
+    )
 
     # Automation hooks (Zapier / Make.com)
     automation_hooks_enabled: bool = Field(
@@ -1172,6 +1356,26 @@ class Settings(BaseSettings):
         ge=1,
         description="Number of weekly backups to retain (default 13 ≈ 3 months / 91 days).",
     )
+    backup_mode: str = Field(
+        default="full",
+        description=(
+            "Backup format. 'full' writes a complete gzip-compressed dump per backup; 'incremental' stores "
+            "deduplicated snapshots (database dump and, optionally, documents) in a content-addressed chunk store "
+            "below the backup directory. Incremental snapshots are kept locally only."
+        ),
+    )
+    backup_include_documents: bool = Field(
+        default=True,
+        description=(
+            "Include the workdir 'original' and 'processed' document trees in incremental snapshots. "
+            "Unchanged files are not re-read. Ignored for full backups."
+        ),
+    )
+    backup_compression_threads: int = Field(
+        default=0,
+        ge=0,
+        description="Threads compressing new chunks of incremental snapshots. Zero uses up to 4 CPU cores.",
+    )
     backup_adaptive_cleanup_enabled: bool = Field(
         default=True,
         description=(
@@ -1216,6 +1420,30 @@ class Settings(BaseSettings):
             " File uploads are governed by MAX_UPLOAD_SIZE instead."
         ),
     )
+    upload_io_threads: int = Field(
+        default=8,
+        ge=1,
+        le=64,
+        description=(
+            "Threads per web worker that run blocking upload work (disk writes, hashing, duplicate and quota"
+            " queries, task enqueueing) off the event loop."
+        ),
+    )
+    resumable_upload_max_chunk_size: int = Field(
+        default=67108864,  # 64MB in bytes (64 * 1024 * 1024)
+        ge=65536,
+        description=(
+            "Maximum body size in bytes of one PATCH chunk of a resumable upload (/api/intake/uploads)."
+            " The whole upload is still limited by MAX_UPLOAD_SIZE. Default: 64MB."
+        ),
+    )
+    resumable_upload_expiry_hours: int = Field(
+        default=24,
+        ge=1,
+        description=(
+            "Hours an unfinished resumable upload is kept after its last chunk before the partial file is deleted."
+        ),
+    )
 
     # Deduplication settings - prevents processing of duplicate files
     enable_deduplication: bool = Field(
@@ -1325,6 +1553,14 @@ class Settings(BaseSettings):
         le=300,
         description="Timeout for Qdrant HTTP requests.",
     )
+    vector_index_datatype: str = Field(
+        default="float32",
+        pattern="^(float32|float16)$",
+        description=(
+            "Vector datatype for newly created Qdrant collections. float16 halves vector storage and "
+            "request size at a small precision cost; existing collections keep their datatype."
+        ),
+    )
     document_intake_shared_secret: Optional[str] = Field(
         default=None,
         description=(
@@ -1421,6 +1657,33 @@ class Settings(BaseSettings):
         ),
     )
 
+    # ---------------------------------------------------------------------------
+    # Destination distribution (see app/tasks/send_to_all.py)
+    # ---------------------------------------------------------------------------
+    distribution_concurrency: int = Field(
+        default=0,
+        ge=0,
+        le=32,
+        description=(
+            "Destinations uploaded to at once by a single distribution task, which reads the file once from a"
+            " local spool. 0 queues a separate upload task per destination instead. Default: 0."
+        ),
+    )
+    distribution_destination_limits: str = Field(
+        default="",
+        description=(
+            "Per-destination caps on concurrent in-process uploads per worker process, e.g. 'email=1,sftp=2'."
+            " Only used when DISTRIBUTION_CONCURRENCY is above 0."
+        ),
+    )
+    distribution_spool_dir: Optional[str] = Field(
+        default=None,
+        description=(
+            "Directory for the per-distribution copy of the file. Defaults to /dev/shm when available, else the"
+            " system temp directory. Files are read in place when it lacks room for twice the file size."
+        ),
+    )
+
     # Processing step timeout - prevents files from getting stuck in "in_progress" state
     step_timeout: int = Field(
         default=600,
@@ -1513,7 +1776,9 @@ class Settings(BaseSettings):
     )
     audit_siem_syslog_protocol: str = Field(
         default="udp",
-        description="Protocol for syslog transport: 'udp' or 'tcp'.",
+        description=(
+            "Protocol for syslog transport: 'udp', 'tcp' or 'tls'. TCP and TLS use RFC 5425 octet-counting framing."
+        ),
     )
     audit_siem_http_url: str = Field(
         default="",
@@ -1531,6 +1796,24 @@ class Settings(BaseSettings):
         default="",
         description="Comma-separated 'Key:Value' pairs of extra headers for SIEM HTTP requests.",
     )
+    audit_siem_batch_size: int = Field(
+        default=200,
+        ge=1,
+        description="Maximum number of audit events sent to the SIEM in one syslog write or HTTP request.",
+    )
+    audit_siem_flush_interval: float = Field(
+        default=1.0,
+        gt=0,
+        description="Seconds after which a partially filled SIEM batch is sent.",
+    )
+    audit_siem_queue_size: int = Field(
+        default=10000,
+        ge=1,
+        description=(
+            "Maximum number of audit events waiting for SIEM delivery per process. "
+            "Events are dropped (and counted) while the queue is full."
+        ),
+    )
 
     # UI / Appearance
     ui_default_color_scheme: str = Field(
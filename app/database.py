@@ -51,6 +51,11 @@ else:
 engine = create_engine(DB_URL, connect_args=_connect_args, **_engine_kwargs)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Imported here because app.utils imports SessionLocal from this module.
+from app.utils.metrics import install_db_pool_hooks  # noqa: E402
+
+install_db_pool_hooks(engine)
+
 
 def init_db() -> None:
     """
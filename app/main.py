@@ -21,16 +21,19 @@ from uvicorn.middleware.proxy_headers import ProxyHeadersMiddleware
 from app.api import router as api_router
 from app.api.graphql_api import graphql_router
 from app.api.local_auth import router as local_auth_router
+from app.api.metrics import router as metrics_router
 from app.auth import router as auth_router
 from app.config import settings
 from app.database import init_db
 from app.middleware.audit_log import AuditLogMiddleware
 from app.middleware.csrf import CSRFMiddleware
+from app.middleware.metrics import MetricsMiddleware
 from app.middleware.rate_limit import create_limiter, get_rate_limit_exceeded_handler
 from app.middleware.request_size_limit import RequestSizeLimitMiddleware
 from app.middleware.security_headers import SecurityHeadersMiddleware
 from app.utils.config_validator import check_all_configs
 from app.utils.log_safety import restrict_sensitive_provider_logging
+from app.utils.metrics import mark_process_dead, metrics_enabled
 from app.utils.notification import init_apprise, notify_shutdown, notify_startup
 from app.utils.sentry import init_sentry
 
@@ -306,6 +309,9 @@ async def lifespan(app: FastAPI):
     except Exception:
         _startup_logger.exception("Error sending shutdown notification")
 
+    # Drop this worker's live gauges from the shared multi-process metrics directory
+    mark_process_dead()
+
 
 app = FastAPI(
     title="DocuElevate",
@@ -370,6 +376,8 @@ if settings.cors_enabled:
         allow_credentials=settings.cors_allow_credentials,
         allow_methods=settings.cors_allowed_methods,
         allow_headers=settings.cors_allowed_headers,
+        # Resumable upload clients read these from cross-origin responses.
+        expose_headers=["Location", "Tus-Resumable", "Upload-Offset", "Upload-Length", "Upload-Expires"],
     )
 
 # 4) Respect the X-Forwarded-* headers from reverse proxy (Traefik, Nginx)
@@ -381,6 +389,11 @@ app.add_middleware(
     allowed_hosts=[settings.external_hostname, "localhost", "127.0.0.1"],
 )
 
+# 6) HTTP latency histograms by route template (outermost, so it times the whole stack).
+#    Only installed when METRICS_ENABLED=true; see app/utils/metrics.py.
+if metrics_enabled():
+    app.add_middleware(MetricsMiddleware)
+
 # Mount the static files directory
 static_dir = pathlib.Path(__file__).parents[1] / "frontend" / "static"
 if os.path.exists(static_dir):
@@ -426,7 +439,7 @@ async def http_exception_handler(request: Request, exc: HTTPException):
     """
     # For API routes, always return JSON
     if request.url.path.startswith("/api/"):
-        return JSONResponse(status_code=exc.status_code, content={"detail": exc.detail})
+        return JSONResponse(status_code=exc.status_code, content={"detail": exc.detail}, headers=exc.headers)
 
     # For frontend routes, return appropriate HTML templates
     # Handle 404 errors with a custom template
@@ -476,3 +489,4 @@ app.include_router(auth_router)
 app.include_router(local_auth_router)
 app.include_router(api_router, prefix="/api")
 app.include_router(graphql_router, prefix="/graphql")
+app.include_router(metrics_router)
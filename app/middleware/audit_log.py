@@ -27,10 +27,9 @@ See SECURITY_AUDIT.md – Infrastructure Security section for background.
 import logging
 import re
 import time
-from typing import Callable
 
-from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
+from fastapi import Request
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 logger = logging.getLogger(__name__)
 
@@ -132,7 +131,7 @@ def get_username(request: Request) -> str:
     return str(user)
 
 
-class AuditLogMiddleware(BaseHTTPMiddleware):
+class AuditLogMiddleware:
     """
     Middleware to log HTTP requests and security-relevant events.
 
@@ -144,9 +143,12 @@ class AuditLogMiddleware(BaseHTTPMiddleware):
 
     Configuration is read from the application settings object passed at
     construction time via the ``config`` keyword argument.
+
+    The middleware is pure ASGI: it only observes the status code on the
+    ``http.response.start`` message and never wraps or buffers the body.
     """
 
-    def __init__(self, app, config) -> None:
+    def __init__(self, app: ASGIApp, config) -> None:
         """
         Initialise the audit-log middleware.
 
@@ -156,7 +158,7 @@ class AuditLogMiddleware(BaseHTTPMiddleware):
                 ``audit_logging_enabled`` and
                 ``audit_log_include_client_ip`` boolean attributes).
         """
-        super().__init__(app)
+        self.app = app
         self.enabled = config.audit_logging_enabled
         self.include_ip = config.audit_log_include_client_ip
 
@@ -165,26 +167,35 @@ class AuditLogMiddleware(BaseHTTPMiddleware):
         else:
             logger.info("Audit logging middleware disabled")
 
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         """
-        Process the request, call the next handler, then emit audit log entries.
+        Pass the request through, then emit audit log entries.
 
-        Args:
-            request: Incoming HTTP request.
-            call_next: Next middleware or route handler in the chain.
+        The logged duration covers the full response, including the body of
+        streamed responses.
 
-        Returns:
-            HTTP response (unmodified).
+        Args:
+            scope: ASGI connection scope.
+            receive: ASGI receive callable.
+            send: ASGI send callable.
         """
-        if not self.enabled:
-            return await call_next(request)
+        if scope["type"] != "http" or not self.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_and_record_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
 
         start_time = time.monotonic()
-        response = await call_next(request)
+        await self.app(scope, receive, send_and_record_status)
         duration_ms = int((time.monotonic() - start_time) * 1000)
 
-        self._log_request(request, response.status_code, duration_ms)
-        return response
+        self._log_request(Request(scope), status_code, duration_ms)
 
     # ------------------------------------------------------------------
     # Private helpers
@@ -27,11 +27,10 @@ Exempt paths (CSRF is not checked even for state-changing methods):
 
 import logging
 import secrets
-from typing import Callable
 
-from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
+from fastapi import Request
 from starlette.responses import JSONResponse, RedirectResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 logger = logging.getLogger(__name__)
 
@@ -49,7 +48,21 @@ CSRF_EXEMPT_PATHS = {
 }
 
 
-class CSRFMiddleware(BaseHTTPMiddleware):
+def _replay_body(body: bytes, receive: Receive) -> Receive:
+    """Return a receive callable that yields *body* once, then defers to *receive*."""
+    replayed = False
+
+    async def replay() -> Message:
+        nonlocal replayed
+        if not replayed:
+            replayed = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        return await receive()
+
+    return replay
+
+
+class CSRFMiddleware:
     """
     Middleware that generates and validates CSRF tokens for state-changing requests.
 
@@ -72,9 +85,13 @@ class CSRFMiddleware(BaseHTTPMiddleware):
     ----------------
     - API routes (``/api/*``):  HTTP 403 JSON response.
     - All other routes:         HTTP 302 redirect to ``/login?error=…``.
+
+    The middleware is pure ASGI.  When the token has to be read from a
+    URL-encoded form body, the buffered body is replayed to the downstream
+    application so the route handler still sees the full form.
     """
 
-    def __init__(self, app, config):
+    def __init__(self, app: ASGIApp, config):
         """
         Initialise the middleware.
 
@@ -83,7 +100,7 @@ class CSRFMiddleware(BaseHTTPMiddleware):
             config: Application settings object (``app.config.Settings``).
                     ``config.auth_enabled`` controls whether CSRF enforcement is active.
         """
-        super().__init__(app)
+        self.app = app
         self.config = config
         self.enabled = config.auth_enabled
         if self.enabled:
@@ -91,19 +108,20 @@ class CSRFMiddleware(BaseHTTPMiddleware):
         else:
             logger.info("CSRF protection middleware disabled (AUTH_ENABLED=False)")
 
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         """
         Process the request: generate/attach the token and validate it when required.
 
         Args:
-            request:   Incoming HTTP request.
-            call_next: Next middleware or route handler in the ASGI chain.
-
-        Returns:
-            HTTP response, or an error response when CSRF validation fails.
+            scope:   ASGI connection scope.
+            receive: ASGI receive callable.
+            send:    ASGI send callable.
         """
-        if not self.enabled:
-            return await call_next(request)
+        if scope["type"] != "http" or not self.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        request = Request(scope, receive)
 
         # Generate or retrieve the per-session CSRF token.
         csrf_token = request.session.get("csrf_token")
@@ -121,19 +139,28 @@ class CSRFMiddleware(BaseHTTPMiddleware):
             # injected by a cross-site request from a browser.
             auth_header = request.headers.get("authorization", "")
             if auth_header.startswith("Bearer "):
-                return await call_next(request)
+                await self.app(scope, receive, send)
+                return
 
             submitted_token = await self._get_submitted_token(request)
             if not submitted_token or not secrets.compare_digest(csrf_token, submitted_token):
                 logger.warning(f"[SECURITY] CSRF_VALIDATION_FAILED method={request.method} path={request.url.path}")
                 if request.url.path.startswith("/api/"):
-                    return JSONResponse(
+                    response = JSONResponse(
                         status_code=403,
                         content={"detail": "CSRF token missing or invalid"},
                     )
-                return RedirectResponse(url="/login?error=Invalid+request", status_code=302)
+                else:
+                    response = RedirectResponse(url="/login?error=Invalid+request", status_code=302)
+                await response(scope, receive, send)
+                return
+
+            # The form body was consumed to find the token; hand it to the route again.
+            body = getattr(request, "_body", None)
+            if body is not None:
+                receive = _replay_body(body, receive)
 
-        return await call_next(request)
+        await self.app(scope, receive, send)
 
     @staticmethod
     async def _get_submitted_token(request: Request) -> str | None:
@@ -165,15 +192,12 @@ class CSRFMiddleware(BaseHTTPMiddleware):
         logger.debug("CSRF: content_type=%r method=%s path=%s", content_type, request.method, request.url.path)
         if "application/x-www-form-urlencoded" in content_type:
             try:
-                # Cache the raw body bytes before parsing the form.  Starlette's
-                # BaseHTTPMiddleware uses _CachedRequest.wrapped_receive to relay
-                # the body to downstream handlers.  When form() is called it
-                # internally uses stream() which sets _stream_consumed=True but
-                # does NOT populate _body.  wrapped_receive then sees a consumed
-                # stream and forwards an empty body, so the auth endpoint gets
-                # form_keys=[].  Calling body() first stores the bytes in _body;
-                # wrapped_receive detects this and replays the real body to any
-                # downstream handler (e.g. the /auth endpoint).
+                # Cache the raw body bytes before parsing the form.  form()
+                # reads through stream(), which consumes the ASGI receive
+                # channel without populating _body.  Calling body() first
+                # stores the bytes in _body so that __call__ can replay the
+                # real body to the downstream handler (e.g. the /auth
+                # endpoint); otherwise it would see form_keys=[].
                 await request.body()
                 form = await request.form()
                 token = form.get("csrf_token")
@@ -0,0 +1,56 @@
+"""
+HTTP latency metrics middleware for DocuElevate.
+
+Records ``docuelevate_http_request_duration_seconds`` for every HTTP request,
+labelled by method, status code and the *route template* that handled it
+(``/api/files/{file_id}`` rather than ``/api/files/42``) so the number of
+series stays bounded.  Requests that match no route share the
+``<unmatched>`` label.
+
+Only installed when ``METRICS_ENABLED=true``; see :mod:`app.utils.metrics`.
+"""
+
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.utils.metrics import record_http_request
+
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware timing each request from arrival to the end of its response.
+
+    The route is read from ``scope["route"]`` after the application ran, which
+    FastAPI sets on the shared scope once routing has matched.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            record_http_request(
+                scope["method"],
+                getattr(route, "path", None) or UNMATCHED_ROUTE,
+                status_code,
+                time.perf_counter() - started,
+            )
@@ -11,6 +11,8 @@ Two independent limits are enforced:
   Default: 1 MB.  Configurable via the ``MAX_REQUEST_BODY_SIZE`` environment variable.
 - ``MAX_UPLOAD_SIZE``: applied to multipart/form-data (file upload) requests.
   Default: 1 GB.  Configurable via the ``MAX_UPLOAD_SIZE`` environment variable.
+- ``RESUMABLE_UPLOAD_MAX_CHUNK_SIZE``: applied to resumable upload chunks
+  (``Content-Type: application/offset+octet-stream``).  Default: 64 MB.
 
 When a request exceeds the applicable limit the middleware immediately returns
 ``HTTP 413 Request Entity Too Large`` without reading the full body, which keeps
@@ -21,29 +23,34 @@ See SECURITY_AUDIT.md – Code Security section for background.
 
 import logging
 
-from fastapi import Request
 from fastapi.responses import JSONResponse
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Receive, Scope, Send
 
 logger = logging.getLogger(__name__)
 
 
-class RequestSizeLimitMiddleware(BaseHTTPMiddleware):
+class RequestSizeLimitMiddleware:
     """
     Middleware that rejects requests whose body exceeds a configured size limit.
 
     File-upload requests (``Content-Type: multipart/form-data``) are checked
     against ``config.max_upload_size``; all other requests are checked against
-    ``config.max_request_body_size``.
+    ``config.max_request_body_size``.  Resumable upload chunks
+    (``application/offset+octet-stream``) are checked against
+    ``config.resumable_upload_max_chunk_size``.
 
     The check is performed on the ``Content-Length`` header before the body is
     read, so oversized requests are rejected without buffering the payload into
     memory.  If the client omits the ``Content-Length`` header the request is
     passed through to the normal handler (where endpoint-level checks still
     apply for file uploads).
+
+    Implemented as a pure ASGI middleware so accepted requests and their
+    responses flow through without extra tasks or buffering.
     """
 
-    def __init__(self, app, config):
+    def __init__(self, app: ASGIApp, config):
         """
         Initialize the middleware.
 
@@ -52,42 +59,50 @@ class RequestSizeLimitMiddleware(BaseHTTPMiddleware):
             config: Application settings object with ``max_request_body_size``
                     and ``max_upload_size`` attributes.
         """
-        super().__init__(app)
+        self.app = app
         self.max_body_size = config.max_request_body_size
         self.max_upload_size = config.max_upload_size
+        self.max_chunk_size = getattr(config, "resumable_upload_max_chunk_size", config.max_upload_size)
         logger.info(
             f"Request size limit middleware enabled – "
             f"body limit: {self.max_body_size} bytes, "
             f"upload limit: {self.max_upload_size} bytes"
         )
 
-    async def dispatch(self, request: Request, call_next):
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         """
         Check the ``Content-Length`` header and reject oversized requests early.
 
         Args:
-            request: Incoming HTTP request.
-            call_next: Next middleware or route handler.
-
-        Returns:
-            HTTP 413 response if the request is too large, otherwise the
-            downstream response.
+            scope: ASGI connection scope.
+            receive: ASGI receive callable.
+            send: ASGI send callable.
         """
-        content_length_header = request.headers.get("content-length")
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        content_length_header = headers.get("content-length")
         if content_length_header is not None:
             try:
                 content_length = int(content_length_header)
             except ValueError:
                 # Malformed header – let downstream handle it
-                return await call_next(request)
+                await self.app(scope, receive, send)
+                return
 
-            content_type = request.headers.get("content-type", "")
+            content_type = headers.get("content-type", "")
             is_multipart = "multipart/form-data" in content_type
 
             if is_multipart:
                 limit = self.max_upload_size
                 limit_description = "file upload"
                 config_var = "MAX_UPLOAD_SIZE"
+            elif content_type.startswith("application/offset+octet-stream"):
+                limit = self.max_chunk_size
+                limit_description = "upload chunk"
+                config_var = "RESUMABLE_UPLOAD_MAX_CHUNK_SIZE"
             else:
                 limit = self.max_body_size
                 limit_description = "request body"
@@ -99,7 +114,7 @@ class RequestSizeLimitMiddleware(BaseHTTPMiddleware):
                     f"{content_length} bytes > {limit} bytes limit "
                     f"(configure with {config_var})"
                 )
-                return JSONResponse(
+                response = JSONResponse(
                     status_code=413,
                     content={
                         "detail": (
@@ -110,5 +125,7 @@ class RequestSizeLimitMiddleware(BaseHTTPMiddleware):
                         )
                     },
                 )
+                await response(scope, receive, send)
+                return
 
-        return await call_next(request)
+        await self.app(scope, receive, send)
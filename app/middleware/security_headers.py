@@ -12,15 +12,14 @@ See docs/DeploymentGuide.md for configuration guidance.
 """
 
 import logging
-from typing import Callable
 
-from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 logger = logging.getLogger(__name__)
 
 
-class SecurityHeadersMiddleware(BaseHTTPMiddleware):
+class SecurityHeadersMiddleware:
     """
     Middleware to add security headers to HTTP responses.
 
@@ -31,9 +30,13 @@ class SecurityHeadersMiddleware(BaseHTTPMiddleware):
     - X-Content-Type-Options: Prevents MIME-sniffing attacks
 
     Headers are configurable via environment variables to support different deployment scenarios.
+
+    Implemented as a pure ASGI middleware: headers are added to the
+    ``http.response.start`` message as it passes through, so response bodies
+    (including large streamed downloads) are never buffered or re-chunked.
     """
 
-    def __init__(self, app, config):
+    def __init__(self, app: ASGIApp, config):
         """
         Initialize the security headers middleware.
 
@@ -41,7 +44,7 @@ class SecurityHeadersMiddleware(BaseHTTPMiddleware):
             app: FastAPI application instance
             config: Configuration object with security header settings
         """
-        super().__init__(app)
+        self.app = app
         self.config = config
         self.enabled = config.security_headers_enabled
 
@@ -56,32 +59,32 @@ class SecurityHeadersMiddleware(BaseHTTPMiddleware):
         else:
             logger.info("Security headers middleware disabled (likely handled by reverse proxy)")
 
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         """
-        Process the request and add security headers to the response.
+        Pass the request through and add security headers to the response start message.
 
         Args:
-            request: Incoming HTTP request
-            call_next: Next middleware or route handler
-
-        Returns:
-            HTTP response with security headers added (if enabled)
+            scope: ASGI connection scope
+            receive: ASGI receive callable
+            send: ASGI send callable
         """
-        # Process the request
-        response = await call_next(request)
+        if scope["type"] != "http" or not self.enabled:
+            await self.app(scope, receive, send)
+            return
 
-        # Add security headers if enabled
-        if self.enabled:
-            self._add_security_headers(response)
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                self._add_security_headers(MutableHeaders(scope=message))
+            await send(message)
 
-        return response
+        await self.app(scope, receive, send_with_headers)
 
-    def _add_security_headers(self, response: Response) -> None:
+    def _add_security_headers(self, headers: MutableHeaders) -> None:
         """
-        Add configured security headers to the response.
+        Add configured security headers to the response headers.
 
         Args:
-            response: HTTP response to add headers to
+            headers: Mutable response headers to add the security headers to
         """
         # Strict-Transport-Security (HSTS)
         # Forces browsers to use HTTPS for all future requests to this domain
@@ -90,7 +93,7 @@ class SecurityHeadersMiddleware(BaseHTTPMiddleware):
         # preload: Allow inclusion in browser HSTS preload lists
         if self.config.security_header_hsts_enabled:
             hsts_value = self.config.security_header_hsts_value
-            response.headers["Strict-Transport-Security"] = hsts_value
+            headers["Strict-Transport-Security"] = hsts_value
             logger.debug(f"Added HSTS header: {hsts_value}")
 
         # Content-Security-Policy (CSP)
@@ -98,7 +101,7 @@ class SecurityHeadersMiddleware(BaseHTTPMiddleware):
         # This helps prevent XSS attacks and other code injection attacks
         if self.config.security_header_csp_enabled:
             csp_value = self.config.security_header_csp_value
-            response.headers["Content-Security-Policy"] = csp_value
+            headers["Content-Security-Policy"] = csp_value
             logger.debug(f"Added CSP header: {csp_value[:50]}...")
 
         # X-Frame-Options
@@ -106,12 +109,12 @@ class SecurityHeadersMiddleware(BaseHTTPMiddleware):
         # This helps prevent clickjacking attacks
         if self.config.security_header_x_frame_options_enabled:
             x_frame_value = self.config.security_header_x_frame_options_value
-            response.headers["X-Frame-Options"] = x_frame_value
+            headers["X-Frame-Options"] = x_frame_value
             logger.debug(f"Added X-Frame-Options header: {x_frame_value}")
 
         # X-Content-Type-Options
         # Prevents browsers from MIME-sniffing responses away from declared content-type
         # This helps prevent XSS attacks based on content-type confusion
         if self.config.security_header_x_content_type_options_enabled:
-            response.headers["X-Content-Type-Options"] = "nosniff"
+            headers["X-Content-Type-Options"] = "nosniff"
             logger.debug("Added X-Content-Type-Options header: nosniff")
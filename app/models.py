@@ -13,6 +13,7 @@ from sqlalchemy import (
     String,
     Text,
     UniqueConstraint,
+    false,
     func,
     text,
     true,
@@ -132,6 +133,11 @@ class FileRecord(Base):
     # Note: duplicates are allowed so filehash is not unique
     filehash = Column(String, index=True, nullable=False)
 
+    # Dropbox-compatible block content hash (SHA-256 over 4 MiB block digests).
+    # Lets source importers skip remote objects whose bytes were already ingested
+    # for the same owner without downloading them first.  NULL for legacy rows.
+    content_hash = Column(String(64), nullable=True, index=True)
+
     # The name of the file as it was originally uploaded (if known)
     original_filename = Column(String)
 
@@ -242,6 +248,32 @@ class DocumentIntake(Base):
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
 
+class ResumableUpload(Base):
+    """Server-side state of a resumable, chunked document intake upload."""
+
+    __tablename__ = "resumable_uploads"
+    __table_args__ = (UniqueConstraint("principal_id", "idempotency_key", name="uq_resumable_upload_principal_key"),)
+
+    id = Column(String(36), primary_key=True)
+    principal_id = Column(String, nullable=False, index=True)
+    idempotency_key = Column(String(255), nullable=False)
+    source = Column(String(100), nullable=False)
+    original_filename = Column(String, nullable=False)
+    content_type = Column(String(255), nullable=True)
+    metadata_json = Column(Text, nullable=True)
+    upload_length = Column(BigInteger, nullable=False)
+    upload_offset = Column(BigInteger, nullable=False, default=0, server_default="0")
+    expected_sha256 = Column(String(64), nullable=True)
+    sha256 = Column(String(64), nullable=True)
+    local_path = Column(String, nullable=False)
+    # uploading -> finalizing -> completed | failed
+    state = Column(String(20), nullable=False, default="uploading", server_default="uploading", index=True)
+    intake_id = Column(Integer, ForeignKey("document_intakes.id", ondelete="SET NULL"), nullable=True)
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
 class DropboxImportJob(Base):
     """Progress ledger for a resumable recursive Dropbox corpus import."""
 
@@ -448,6 +480,10 @@ class WebhookConfig(Base):
     events = Column(Text, nullable=False)  # JSON list of subscribed events
     is_active = Column(Boolean, default=True, nullable=False)  # Whether the webhook is active
     description = Column(String, nullable=True)  # Optional human-readable description
+    # Buffer events and POST them as JSON arrays instead of one request per event
+    batch_delivery = Column(Boolean, default=False, server_default=false(), nullable=False)
+    max_concurrency = Column(Integer, nullable=True)  # Overrides webhook_max_concurrency_per_endpoint
+    rate_limit_per_minute = Column(Integer, nullable=True)  # Overrides webhook_rate_limit_per_minute
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
@@ -851,6 +887,104 @@ class UserImapAccount(Base):
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
 
+class UsageCounter(Base):
+    """Materialised per-owner count of processed (non-duplicate) files.
+
+    One row per ``(owner_id, period, bucket)``: ``period`` is ``lifetime``
+    (``bucket`` ``""``), ``month`` (``bucket`` ``YYYY-MM``) or ``day``
+    (``bucket`` ``YYYY-MM-DD``), all in UTC.  Rows are adjusted in the same
+    transaction that creates, deletes or re-owns a ``FileRecord`` and are
+    corrected periodically by
+    :func:`app.utils.usage_counters.reconcile_usage_counters`.
+    """
+
+    __tablename__ = "usage_counters"
+
+    owner_id = Column(String, primary_key=True)
+    period = Column(String(16), primary_key=True)
+    bucket = Column(String(10), primary_key=True, default="", server_default="")
+    count = Column(Integer, nullable=False, default=0, server_default="0")
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
+class LLMResponseCache(Base):
+    """Content-addressed store of LLM pipeline-stage responses.
+
+    ``cache_key`` is the SHA-256 of the stage, prompt template version,
+    provider, model, temperature and the exact request messages (see
+    :mod:`app.utils.llm_cache`), so identical input re-processed by the same
+    stage configuration is answered without another completion.  Rows are
+    evicted by age and by total size, least recently used first, by
+    :func:`app.tasks.batch_tasks.prune_llm_response_cache`.
+
+    ``file_id`` is the document the response was computed for; its rows are
+    deleted together with the document.
+    """
+
+    __tablename__ = "llm_response_cache"
+
+    cache_key = Column(String(64), primary_key=True)
+    file_id = Column(Integer, nullable=True, index=True)
+    stage = Column(String(64), nullable=False, index=True)
+    model = Column(String(255), nullable=False)
+    response = Column(Text, nullable=False)
+    prompt_tokens = Column(Integer, nullable=False, default=0, server_default="0")
+    completion_tokens = Column(Integer, nullable=False, default=0, server_default="0")
+    size_bytes = Column(Integer, nullable=False, default=0, server_default="0")
+    hit_count = Column(Integer, nullable=False, default=0, server_default="0")
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+    last_used_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+
+
+class LLMBatchJob(Base):
+    """One offline batch of LLM or embedding requests submitted for a backfill.
+
+    ``file_ids`` (JSON list) are the documents whose requests are in the
+    batch; they are excluded from further backfill runs while the job is
+    ``submitted`` or ``applying``.  ``status`` moves ``submitted`` →
+    ``applying`` → ``applied`` (or ``failed``); the ``applying`` claim is a
+    conditional update, so results are fanned out by exactly one poller.
+    See :mod:`app.tasks.llm_batch_tasks`.
+    """
+
+    __tablename__ = "llm_batch_jobs"
+
+    id = Column(Integer, primary_key=True)
+    kind = Column(String(32), nullable=False, index=True)  # "metadata" | "embedding"
+    backend = Column(String(32), nullable=False)  # "openai" | "local"
+    endpoint = Column(String(64), nullable=False)
+    batch_id = Column(String(255), nullable=True, unique=True)
+    status = Column(String(20), nullable=False, default="submitted", server_default="submitted", index=True)
+    file_ids = Column(Text, nullable=False, default="[]", server_default="[]")
+    request_count = Column(Integer, nullable=False, default=0, server_default="0")
+    succeeded_count = Column(Integer, nullable=False, default=0, server_default="0")
+    failed_count = Column(Integer, nullable=False, default=0, server_default="0")
+    error = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    completed_at = Column(DateTime(timezone=True), nullable=True)
+
+
+class ImapSyncState(Base):
+    """Incremental UID sync position for one IMAP mailbox folder.
+
+    ``mailbox_key`` is the identifier used by ``pull_all_inboxes`` (``imap1``,
+    ``user_<owner>_<id>``, ``integration_<owner>_<id>``).  When the server
+    reports a different ``UIDVALIDITY`` the stored position is discarded and
+    the folder is re-synced from the recent-mail window.
+    """
+
+    __tablename__ = "imap_sync_states"
+    __table_args__ = (UniqueConstraint("mailbox_key", "folder", name="uq_imap_sync_state_mailbox_folder"),)
+
+    id = Column(Integer, primary_key=True)
+    mailbox_key = Column(String(255), nullable=False, index=True)
+    folder = Column(String(255), nullable=False)
+    uid_validity = Column(BigInteger, nullable=False)
+    last_seen_uid = Column(BigInteger, nullable=False, default=0, server_default="0")
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
 class BackupRecord(Base):
     """Tracks database backup files and their retention metadata.
 
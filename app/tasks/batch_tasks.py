@@ -16,6 +16,7 @@ Maintenance / housekeeping jobs
 - ``prune_processing_logs``      – Delete old rows from ``processing_logs`` and
                                    ``settings_audit_log`` to prevent unbounded table growth.
 - ``prune_old_notifications``    – Delete old read ``in_app_notifications`` rows.
+- ``prune_llm_response_cache``   – Evict expired and least recently used cached LLM responses.
 - ``backfill_missing_metadata``  – Re-trigger AI metadata extraction for completed files
                                    that have OCR text but no ``ai_metadata``.
 - ``sync_search_index``          – Index documents in Meilisearch that have OCR text /
@@ -496,6 +497,44 @@ def prune_old_notifications(retention_days: int = _NOTIFICATION_RETENTION_DAYS)
         return {"deleted": 0, "error": str(exc)}
 
 
+# ---------------------------------------------------------------------------
+# Task: prune the LLM response cache
+# ---------------------------------------------------------------------------
+
+
+@celery.task(name="app.tasks.batch_tasks.prune_llm_response_cache")
+def prune_llm_response_cache() -> dict:
+    """
+    Evict ``llm_response_cache`` rows older than ``LLM_CACHE_MAX_AGE_DAYS``,
+    then the least recently used rows beyond ``LLM_CACHE_MAX_SIZE_MB``.
+
+    Returns:
+        A summary dict with ``expired`` and ``evicted`` counts.
+    """
+    from app.utils.llm_cache import prune_llm_cache
+
+    job_name = "prune-llm-response-cache"
+    logger.info("[batch] Starting prune_llm_response_cache")
+
+    try:
+        with SessionLocal() as db:
+            result = prune_llm_cache(db)
+            db.commit()
+
+        detail = (
+            f"Deleted {result['expired']} expired and {result['evicted']} least recently used cached LLM response(s)."
+        )
+        logger.info("[batch] prune_llm_response_cache: %s", detail)
+        _update_job_status(job_name, "success", detail)
+        return result
+
+    except Exception as exc:
+        detail = f"Error: {exc}"
+        logger.error("[batch] prune_llm_response_cache failed: %s", exc, exc_info=True)
+        _update_job_status(job_name, "failed", detail)
+        return {"expired": 0, "evicted": 0, "error": str(exc)}
+
+
 # ---------------------------------------------------------------------------
 # Task: backfill missing AI metadata
 # ---------------------------------------------------------------------------
@@ -518,13 +557,24 @@ def backfill_missing_metadata(batch_size: int = _METADATA_BACKFILL_BATCH_SIZE) -
     ``ocr_text`` are selected.  A configurable *batch_size* caps the number
     of tasks queued per run to avoid overwhelming the AI provider.
 
+    In batch mode (``LLM_BATCH_MODE_ENABLED``) up to ``LLM_BATCH_MAX_REQUESTS``
+    files are submitted as one offline batch instead; see
+    :mod:`app.tasks.llm_batch_tasks`.
+
     Args:
         batch_size: Maximum number of files to queue per run (default 50).
 
     Returns:
-        A summary dict with ``queued`` count.
+        A summary dict with ``queued`` count (and ``batch_job_id`` in batch mode).
     """
     from app.tasks.extract_metadata_with_gpt import extract_metadata_with_gpt  # avoid circular import
+    from app.tasks.llm_batch_tasks import (
+        KIND_METADATA,
+        batch_limit,
+        batch_mode_enabled,
+        files_in_open_batches,
+        submit_metadata_batch,
+    )
 
     job_name = "backfill-missing-metadata"
     logger.info("[batch] Starting backfill_missing_metadata (batch_size=%s)", batch_size)
@@ -539,16 +589,28 @@ def backfill_missing_metadata(batch_size: int = _METADATA_BACKFILL_BATCH_SIZE) -
                 .subquery()
             )
 
-            candidates = (
+            query = (
                 db.query(FileRecord)
                 .filter(FileRecord.is_duplicate.is_(False))
                 .filter(FileRecord.ocr_text.isnot(None))
                 .filter(FileRecord.ocr_text != "")
                 .filter((FileRecord.ai_metadata.is_(None)) | (FileRecord.ai_metadata == ""))
                 .filter(~FileRecord.id.in_(db.query(in_progress_file_ids.c.file_id)))
-                .limit(batch_size)
-                .all()
             )
+            if batch_mode_enabled():
+                pending = files_in_open_batches(db, KIND_METADATA)
+                if pending:
+                    query = query.filter(~FileRecord.id.in_(pending))
+                candidates = query.limit(batch_limit()).all()
+            else:
+                candidates = query.limit(batch_size).all()
+
+        if batch_mode_enabled():
+            job_id = submit_metadata_batch(candidates)
+            detail = f"Submitted {len(candidates)} document(s) for AI metadata backfill as batch job {job_id}."
+            logger.info("[batch] backfill_missing_metadata: %s", detail)
+            _update_job_status(job_name, "success", detail)
+            return {"queued": len(candidates), "batch_job_id": job_id}
 
         queued = 0
         for record in candidates:
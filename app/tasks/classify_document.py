@@ -22,15 +22,27 @@ from app.tasks.retry_config import BaseTaskWithRetry
 from app.utils import log_task_progress
 from app.utils.classification_rules import (
     ClassificationResult,
-    classify_document,
+    CompiledClassificationRules,
+    compile_classification_rules,
     db_rule_to_engine_rule,
 )
+from app.utils.rule_sets import RULE_KIND_CLASSIFICATION, rule_fingerprint, rule_set_cache
 
 logger = logging.getLogger(__name__)
 
 STEP_NAME = "classify_document"
 
 
+def _custom_rules_query(db: Any, owner_id: str | None) -> Any:
+    """Return the query selecting the enabled system rules plus *owner_id*'s own rules."""
+    query = db.query(ClassificationRuleModel).filter(ClassificationRuleModel.enabled.is_(True))
+    if owner_id:
+        return query.filter(
+            (ClassificationRuleModel.owner_id.is_(None)) | (ClassificationRuleModel.owner_id == owner_id)
+        )
+    return query.filter(ClassificationRuleModel.owner_id.is_(None))
+
+
 def _load_custom_rules(owner_id: str | None) -> list[Any]:
     """Load enabled custom classification rules from the database.
 
@@ -39,17 +51,20 @@ def _load_custom_rules(owner_id: str | None) -> list[Any]:
     (``owner_id IS NULL``) and the user's own rules are both included.
     """
     with SessionLocal() as db:
-        query = db.query(ClassificationRuleModel).filter(ClassificationRuleModel.enabled.is_(True))
-        if owner_id:
-            query = query.filter(
-                (ClassificationRuleModel.owner_id.is_(None)) | (ClassificationRuleModel.owner_id == owner_id)
-            )
-        else:
-            query = query.filter(ClassificationRuleModel.owner_id.is_(None))
-        rules = query.order_by(ClassificationRuleModel.priority.desc()).all()
+        rules = _custom_rules_query(db, owner_id).order_by(ClassificationRuleModel.priority.desc()).all()
         return [db_rule_to_engine_rule(r) for r in rules]
 
 
+def _get_rule_set(db: Any, owner_id: str | None) -> CompiledClassificationRules:
+    """Return the compiled built-in + custom rules of *owner_id*, reusing the cached set while unchanged."""
+    fingerprint = rule_fingerprint(_custom_rules_query(db, owner_id), ClassificationRuleModel)
+    return rule_set_cache(RULE_KIND_CLASSIFICATION).get(
+        owner_id,
+        fingerprint,
+        lambda: compile_classification_rules(_load_custom_rules(owner_id)),
+    )
+
+
 @celery.task(base=BaseTaskWithRetry, bind=True)
 def classify_document_task(
     self: Any,
@@ -61,7 +76,7 @@ def classify_document_task(
     This task:
     1. Loads the :class:`FileRecord` from the database.
     2. Gathers filename, OCR text, and existing AI metadata.
-    3. Loads built-in + user-defined classification rules.
+    3. Loads the compiled built-in + user-defined classification rules.
     4. Runs the classification engine.
     5. Persists the result into ``ai_metadata.classification``.
 
@@ -106,16 +121,13 @@ def classify_document_task(
                     logger.warning("Failed to parse ai_metadata for file %s, starting fresh", file_id)
                     existing_metadata = {}
 
-            # Load custom rules
+            # Load the compiled built-in + custom rules and run the engine
             effective_owner = owner_id or file_record.owner_id
-            custom_rules = _load_custom_rules(effective_owner)
-
-            # Run classification engine
-            result: ClassificationResult = classify_document(
+            rule_set = _get_rule_set(db, effective_owner)
+            result: ClassificationResult = rule_set.classify(
                 filename=filename,
                 text=text,
                 metadata=existing_metadata,
-                custom_rules=custom_rules,
             )
 
             # Persist result into ai_metadata
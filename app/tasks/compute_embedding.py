@@ -185,11 +185,21 @@ def backfill_missing_embeddings(self) -> dict:
     cached embedding and queues a :func:`compute_document_embedding`
     task for each one.  A configurable ``batch_size`` caps the number
     of tasks queued per run to avoid overwhelming the worker or the
-    embedding API.
+    embedding API.  In batch mode (``LLM_BATCH_MODE_ENABLED``) up to
+    ``LLM_BATCH_MAX_REQUESTS`` files are submitted as one offline batch
+    instead; see :mod:`app.tasks.llm_batch_tasks`.
 
     Returns:
-        A dict with the number of tasks ``queued``.
+        A dict with the number of tasks ``queued`` (and ``batch_job_id`` in batch mode).
     """
+    from app.tasks.llm_batch_tasks import (
+        KIND_EMBEDDING,
+        batch_limit,
+        batch_mode_enabled,
+        files_in_open_batches,
+        submit_embedding_batch,
+    )
+
     batch_size = settings.embedding_backfill_batch_size
     task_id = self.request.id
     logger.info("[%s] Backfill: scanning for files missing embeddings (batch_size=%d)", task_id, batch_size)
@@ -199,6 +209,21 @@ def backfill_missing_embeddings(self) -> dict:
         logger.info("[%s] Backfill skipped: AI provider '%s' is not configured", task_id, provider)
         return {"queued": 0, "status": "skipped", "detail": "AI provider is not configured"}
 
+    if batch_mode_enabled():
+        with SessionLocal() as db:
+            query = db.query(FileRecord).filter(
+                FileRecord.ocr_text.isnot(None),
+                FileRecord.ocr_text != "",
+                (FileRecord.embedding.is_(None)) | (FileRecord.embedding == ""),
+            )
+            pending = files_in_open_batches(db, KIND_EMBEDDING)
+            if pending:
+                query = query.filter(~FileRecord.id.in_(pending))
+            records = query.limit(batch_limit()).all()
+        job_id = submit_embedding_batch(records)
+        logger.info("[%s] Backfill: submitted %d embedding request(s) as batch job %s", task_id, len(records), job_id)
+        return {"queued": len(records), "batch_job_id": job_id}
+
     with SessionLocal() as db:
         candidates = (
             db.query(FileRecord.id)
@@ -15,6 +15,21 @@ from app.utils import log_task_progress
 
 logger = logging.getLogger(__name__)
 
+#: Raster formats converted inside the worker by img2pdf (SVG is vector and still goes to Gotenberg).
+LOCAL_IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".gif", ".bmp", ".tiff", ".tif", ".webp"}
+LOCAL_IMAGE_MIME_TYPES = {
+    "image/jpeg",
+    "image/png",
+    "image/gif",
+    "image/bmp",
+    "image/x-ms-bmp",
+    "image/tiff",
+    "image/webp",
+}
+
+#: Chunk size used when streaming Gotenberg's response to disk.
+STREAM_CHUNK_SIZE = 1024 * 1024
+
 
 def _normalise_magic_match(matches) -> tuple[Optional[str], Optional[str]]:
     """Normalise puremagic return shapes across supported library versions."""
@@ -137,6 +152,81 @@ def _build_filename(file_path: str, original_filename: Optional[str], file_ext:
     return base_name
 
 
+def _is_local_image(mime_type: Optional[str], file_ext: str) -> bool:
+    """Return True when the file is a raster image img2pdf can convert."""
+    if mime_type:
+        return mime_type in LOCAL_IMAGE_MIME_TYPES
+    return file_ext in LOCAL_IMAGE_EXTENSIONS
+
+
+def _convert_image_locally(file_path: str, output_path: str) -> None:
+    """
+    Convert a raster image to PDF in-process with img2pdf.
+
+    JPEG and JPEG 2000 data is embedded as-is (no re-encoding); other formats
+    are stored losslessly.  Every frame of a multi-page TIFF becomes a page,
+    the page size follows the image DPI, and a valid EXIF orientation is
+    applied as a page rotation.
+
+    Args:
+        file_path: Path to the source image.
+        output_path: Path the PDF is written to.
+
+    Raises:
+        Exception: Any img2pdf/Pillow error; the partial output is removed first.
+    """
+    import img2pdf
+
+    try:
+        with open(output_path, "wb") as out_file:
+            img2pdf.convert(file_path, outputstream=out_file, rotation=img2pdf.Rotation.ifvalid)
+    except Exception:
+        if os.path.exists(output_path):
+            os.remove(output_path)
+        raise
+
+
+def _stream_response_to_file(response: requests.Response, output_path: str) -> int:
+    """
+    Write a streamed HTTP response body to *output_path* chunk by chunk.
+
+    Args:
+        response: Response obtained with ``stream=True``.
+        output_path: Destination file path.
+
+    Returns:
+        Number of bytes written.
+    """
+    written = 0
+    with open(output_path, "wb") as out_file:
+        for chunk in response.iter_content(chunk_size=STREAM_CHUNK_SIZE):
+            if chunk:
+                out_file.write(chunk)
+                written += len(chunk)
+    return written
+
+
+def _enqueue_converted_pdf(
+    converted_file_path: str,
+    original_filename: Optional[str],
+    owner_id: Optional[str],
+    file_id: Optional[int],
+) -> None:
+    """Enqueue the converted PDF for processing, preserving the original filename if provided."""
+    if original_filename:
+        # Change extension to .pdf for the original filename
+        original_base = os.path.splitext(original_filename)[0]
+        pdf_original_filename = f"{original_base}.pdf"
+        process_document.delay(
+            converted_file_path,
+            original_filename=pdf_original_filename,
+            file_id=file_id,
+            owner_id=owner_id,
+        )
+    else:
+        process_document.delay(converted_file_path, file_id=file_id, owner_id=owner_id)
+
+
 @shared_task(bind=True)
 def convert_to_pdf(
     self,
@@ -146,7 +236,7 @@ def convert_to_pdf(
     file_id: Optional[int] = None,
 ) -> Optional[str]:
     """
-    Converts a file to PDF using Gotenberg's API.
+    Converts a file to PDF, locally for raster images and via Gotenberg's API otherwise.
     Determines the appropriate Gotenberg endpoint based on the file's MIME type.
     On success, saves the PDF locally and enqueues it for processing.
 
@@ -166,12 +256,6 @@ def convert_to_pdf(
 
     progress("convert_to_pdf", "in_progress", f"Converting file: {os.path.basename(file_path)}")
 
-    gotenberg_url = getattr(settings, "gotenberg_url", None)
-    if not gotenberg_url:
-        logger.error(f"[{task_id}] Gotenberg URL is not configured in settings.")
-        progress("convert_to_pdf", "failure", "Gotenberg URL not configured")
-        return
-
     # Try to guess the MIME type based on file content and extension
     mime_type, encoding = _detect_mime_type(file_path, original_filename)
     file_ext = _detect_extension(file_path, original_filename, mime_type)
@@ -191,6 +275,30 @@ def convert_to_pdf(
         return None
     progress("detect_file_type", "success", f"File type: {mime_type or file_ext}")
 
+    converted_file_path = os.path.splitext(file_path)[0] + ".pdf"
+
+    # Raster images (most mobile uploads) are converted in-process: no network
+    # hop, no LibreOffice start-up and no lossy re-encoding of JPEGs.
+    if settings.local_image_conversion_enabled and _is_local_image(mime_type, file_ext):
+        progress("convert_image_locally", "in_progress", "Converting image with img2pdf")
+        try:
+            _convert_image_locally(file_path, converted_file_path)
+        except Exception as e:
+            logger.warning(f"[{task_id}] Local image conversion failed for {file_path}, using Gotenberg: {e}")
+            progress("convert_image_locally", "failure", f"Falling back to Gotenberg: {e}")
+        else:
+            logger.info(f"[{task_id}] Converted image saved as PDF: {converted_file_path}")
+            progress("convert_image_locally", "success", "PDF conversion successful")
+            progress("convert_to_pdf", "success", f"Converted to PDF: {os.path.basename(converted_file_path)}")
+            _enqueue_converted_pdf(converted_file_path, original_filename, owner_id, file_id)
+            return converted_file_path
+
+    gotenberg_url = getattr(settings, "gotenberg_url", None)
+    if not gotenberg_url:
+        logger.error(f"[{task_id}] Gotenberg URL is not configured in settings.")
+        progress("convert_to_pdf", "failure", "Gotenberg URL not configured")
+        return None
+
     # Determine which Gotenberg endpoint to use
     endpoint = None
     form_data = {}
@@ -339,33 +447,27 @@ def convert_to_pdf(
         logger.info(f"[{task_id}] Converting {file_path} using endpoint: {endpoint}")
         progress("call_gotenberg", "in_progress", "Calling Gotenberg API")
 
-        # Send the conversion request to Gotenberg
-        response = requests.post(endpoint, files=files, data=form_data, timeout=settings.http_request_timeout)
+        # Send the conversion request to Gotenberg and stream the PDF to disk
+        # instead of buffering the whole response in memory.
+        response = requests.post(
+            endpoint, files=files, data=form_data, timeout=settings.http_request_timeout, stream=True
+        )
 
         if response.status_code == 200:
-            # Save the converted PDF
-            converted_file_path = os.path.splitext(file_path)[0] + ".pdf"
-            with open(converted_file_path, "wb") as out_file:
-                out_file.write(response.content)
+            try:
+                _stream_response_to_file(response, converted_file_path)
+            except Exception:
+                if os.path.exists(converted_file_path):
+                    os.remove(converted_file_path)
+                raise
+            finally:
+                response.close()
 
             logger.info(f"[{task_id}] Converted file saved as PDF: {converted_file_path}")
             progress("call_gotenberg", "success", "PDF conversion successful")
             progress("convert_to_pdf", "success", f"Converted to PDF: {os.path.basename(converted_file_path)}")
 
-            # Enqueue the PDF for further processing, preserving original filename if provided
-            if original_filename:
-                # Change extension to .pdf for the original filename
-                original_base = os.path.splitext(original_filename)[0]
-                pdf_original_filename = f"{original_base}.pdf"
-                process_document.delay(
-                    converted_file_path,
-                    original_filename=pdf_original_filename,
-                    file_id=file_id,
-                    owner_id=owner_id,
-                )
-            else:
-                process_document.delay(converted_file_path, file_id=file_id, owner_id=owner_id)
-
+            _enqueue_converted_pdf(converted_file_path, original_filename, owner_id, file_id)
             return converted_file_path
         else:
             error_msg = f"Status code: {response.status_code}"
@@ -379,3 +481,6 @@ def convert_to_pdf(
         logger.exception(f"[{task_id}] Error converting {file_path} to PDF: {e}")
         progress("convert_to_pdf", "failure", f"Exception: {str(e)}")
         return None
+    finally:
+        for upload in files.values():
+            upload[1].close()
@@ -45,6 +45,7 @@ _REDIS_PRIORITY_STEPS = range(10)
 _METADATA_PROMPT_OUTPUT_HEADROOM = 1500
 _MAX_BUDGET_RECHECK_SECONDS = 15 * 60
 _PREFETCH_THREAD_STATE = local()
+_DOWNLOAD_CHUNK_SIZE = 1024 * 1024
 _IMPORT_COORDINATOR_LOCK_TTL_SECONDS = 15 * 60
 _IMPORT_COORDINATOR_LOCK_RENEWAL_SECONDS = 60
 _IMPORT_COORDINATOR_RECOVERY_DELAY_SECONDS = 60
@@ -533,28 +534,66 @@ def _prefetch_dropbox_entry(integration_id: int, stored_credentials: str | None,
     filename = sanitize_filename(entry.name) or "document"
     extension = os.path.splitext(filename)[1].lower()
     target_path = os.path.join(settings.workdir, f"dropbox_prefetch_{integration_id}_{uuid.uuid4().hex}{extension}")
+    if (
+        not hasattr(_PREFETCH_THREAD_STATE, "client")
+        or getattr(_PREFETCH_THREAD_STATE, "stored_credentials", None) != stored_credentials
+    ):
+        _PREFETCH_THREAD_STATE.client = _dropbox_client_from_stored_credentials(stored_credentials)
+        _PREFETCH_THREAD_STATE.stored_credentials = stored_credentials
+    _download_dropbox_entry(_PREFETCH_THREAD_STATE.client, entry, target_path)
+    return target_path
+
+
+def _download_dropbox_entry(client, entry, target_path: str) -> None:
+    """Stream one Dropbox object to ``target_path`` in bounded chunks.
+
+    The body is never held in memory as a whole, so large scans cost at most
+    one chunk of RAM per concurrent download. The size limit is re-checked
+    while streaming because Dropbox listings can be stale.
+
+    Raises:
+        ValueError: If the streamed body exceeds ``max_upload_size``.
+    """
     temporary_path = f"{target_path}.part"
+    _metadata, response = client.files_download(entry.path_lower)
     try:
-        if (
-            not hasattr(_PREFETCH_THREAD_STATE, "client")
-            or getattr(_PREFETCH_THREAD_STATE, "stored_credentials", None) != stored_credentials
-        ):
-            _PREFETCH_THREAD_STATE.client = _dropbox_client_from_stored_credentials(stored_credentials)
-            _PREFETCH_THREAD_STATE.stored_credentials = stored_credentials
-        client = _PREFETCH_THREAD_STATE.client
-        _metadata, response = client.files_download(entry.path_lower)
-        content = response.content
-        if len(content) > settings.max_upload_size:
-            raise ValueError("Dropbox object exceeds the configured upload limit")
+        written = 0
         with open(temporary_path, "wb") as output:
-            output.write(content)
+            for chunk in response.iter_content(chunk_size=_DOWNLOAD_CHUNK_SIZE):
+                written += len(chunk)
+                if written > settings.max_upload_size:
+                    raise ValueError("Dropbox object exceeds the configured upload limit")
+                output.write(chunk)
         os.replace(temporary_path, target_path)
-        return target_path
     finally:
+        response.close()
         if os.path.exists(temporary_path):
             os.remove(temporary_path)
 
 
+def _entry_content_hash(entry) -> str | None:
+    """Return Dropbox's block-based content hash for an entry, if listed."""
+    value = str(getattr(entry, "content_hash", "") or "").strip().lower()
+    return value or None
+
+
+def _known_content_hashes(db, owner_id: str, entries) -> set[str]:
+    """Return the listed content hashes whose bytes were already ingested.
+
+    Matching follows ``process_document`` deduplication: hashes are scoped to
+    the owner in multi-user mode and to the shared space otherwise.
+    """
+    if not settings.enable_deduplication:
+        return set()
+    content_hashes = {content_hash for entry in entries if (content_hash := _entry_content_hash(entry))}
+    if not content_hashes:
+        return set()
+    query = db.query(FileRecord.content_hash).filter(FileRecord.content_hash.in_(content_hashes))
+    if settings.multi_user_enabled:
+        query = query.filter(FileRecord.owner_id == owner_id)
+    return {row.content_hash for row in query.distinct()}
+
+
 def _reserve_job_llm_tokens(job: DropboxImportJob, integration: UserIntegration) -> tuple[date | None, int]:
     """Apply the daily cost guard only to an initial corpus backfill."""
     if not job.is_backfill:
@@ -616,10 +655,29 @@ def _import_file(
             db.add(imported)
         return "skipped"
 
+    content_hash = _entry_content_hash(entry)
+    if content_hash and _known_content_hashes(db, job.owner_id, [entry]):
+        # The bytes are already in the archive; record the revision so later
+        # pages and watch cycles skip it without a download or pipeline run.
+        logger.info("Dropbox import skipped already ingested content %s", entry.path_display)
+        if imported is None:
+            imported = DropboxImportObject(
+                integration_id=integration.id,
+                dropbox_file_id=entry.id,
+                revision=entry.rev,
+                remote_path=entry.path_display or entry.path_lower,
+            )
+            db.add(imported)
+        imported.revision = entry.rev
+        imported.remote_path = entry.path_display or entry.path_lower
+        imported.task_id = None
+        imported.state = "duplicate"
+        db.flush()
+        return "skipped"
+
     index_only = job.is_backfill and _index_first_enabled(integration)
     reservation = (None, 0) if index_only else _reserve_job_llm_tokens(job, integration)
     target_path = os.path.join(settings.workdir, f"dropbox_{integration.id}_{uuid.uuid4().hex}{extension}")
-    temporary_path = f"{target_path}.part"
     queued = False
     try:
         if prefetched_path:
@@ -627,13 +685,11 @@ def _import_file(
                 return "failed"
             os.replace(prefetched_path, target_path)
         else:
-            _metadata, response = client.files_download(entry.path_lower)
-            content = response.content
-            if len(content) > settings.max_upload_size:
+            try:
+                _download_dropbox_entry(client, entry, target_path)
+            except ValueError:
+                logger.warning("Dropbox import skipped oversized file %s", entry.path_display)
                 return "failed"
-            with open(temporary_path, "wb") as output:
-                output.write(content)
-            os.replace(temporary_path, target_path)
 
         if intake is None:
             intake = DocumentIntake(
@@ -647,6 +703,7 @@ def _import_file(
                         "dropbox_file_id": entry.id,
                         "dropbox_revision": entry.rev,
                         "dropbox_path": entry.path_display or entry.path_lower,
+                        "dropbox_content_hash": content_hash,
                     }
                 ),
             )
@@ -703,8 +760,6 @@ def _import_file(
         queued = True
         return "queued"
     finally:
-        if os.path.exists(temporary_path):
-            os.remove(temporary_path)
         if not queued and os.path.exists(target_path):
             os.remove(target_path)
         if not queued:
@@ -820,8 +875,12 @@ def _run_dropbox_corpus_import(
                     max_workers=download_concurrency,
                     thread_name_prefix="dropbox-corpus",
                 )
-                for entry in page.entries:
-                    if not isinstance(entry, dropbox.files.FileMetadata) or not _entry_can_be_prefetched(entry):
+                file_entries = [entry for entry in page.entries if isinstance(entry, dropbox.files.FileMetadata)]
+                # One indexed lookup per page keeps known content out of the
+                # download window; _import_file re-checks each entry durably.
+                known_content_hashes = _known_content_hashes(db, job.owner_id, file_entries)
+                for entry in file_entries:
+                    if not _entry_can_be_prefetched(entry) or _entry_content_hash(entry) in known_content_hashes:
                         continue
                     try:
                         entry_key = _dropbox_file_key(entry)
@@ -7,8 +7,6 @@ import shutil
 import tempfile
 from pathlib import Path
 
-import pypdf
-
 # Import the shared Celery instance
 from app.celery_app import celery
 from app.config import settings
@@ -18,6 +16,7 @@ from app.tasks.finalize_document_storage import finalize_document_storage
 from app.tasks.retry_config import BaseTaskWithRetry
 from app.utils import get_unique_filepath_with_counter, log_task_progress
 from app.utils.filename_utils import sanitize_filename
+from app.utils.pdf_edit import apply_pdf_edits
 
 logger = logging.getLogger(__name__)
 
@@ -146,38 +145,32 @@ def embed_metadata_into_pdf(self, local_file_path: str, extracted_text: str, met
     processed_file = tmp_file.name
     tmp_file.close()
 
-    # Create a safe copy to work on
-    shutil.copy(original_file, processed_file)
-
     try:
         logger.info(f"[{task_id}] Embedding metadata into {processed_file}...")
         log_task_progress(task_id, "modify_pdf", "in_progress", "Modifying PDF metadata", file_id=file_id)
 
-        # Open the PDF and modify metadata
-        with open(processed_file, "rb") as file:
-            pdf_reader = pypdf.PdfReader(file)
-            pdf_writer = pypdf.PdfWriter()
-
-            # Copy all pages from the reader to the writer
-            for page in pdf_reader.pages:
-                pdf_writer.add_page(page)
-
-            # Set PDF metadata
-            pdf_writer.add_metadata(
-                {
-                    "/Title": metadata.get("filename", "Unknown Document"),
-                    "/Author": metadata.get("absender", "Unknown"),
-                    "/Subject": metadata.get("document_type", "Unknown"),
-                    "/Keywords": ", ".join(metadata.get("tags", [])),
-                }
-            )
-
-            # Write the modified PDF
-            with open(processed_file, "wb") as output_file:
-                pdf_writer.write(output_file)
+        # Copy the original and append the document info and XMP update in a
+        # single pass; the pages themselves are never re-serialised.
+        edit_result = apply_pdf_edits(
+            original_file,
+            processed_file,
+            info={
+                "/Title": metadata.get("filename", "Unknown Document"),
+                "/Author": metadata.get("absender", "Unknown"),
+                "/Subject": metadata.get("document_type", "Unknown"),
+                "/Keywords": ", ".join(metadata.get("tags", [])),
+            },
+        )
 
         logger.info(f"[{task_id}] Metadata embedded successfully in {processed_file}")
-        log_task_progress(task_id, "modify_pdf", "success", "PDF metadata embedded", file_id=file_id)
+        log_task_progress(
+            task_id,
+            "modify_pdf",
+            "success",
+            "PDF metadata embedded",
+            file_id=file_id,
+            detail=json.dumps(edit_result.as_detail()),
+        )
 
         # Use the suggested filename from metadata; if not provided, use the original basename.
         # SECURITY: Sanitize filename to prevent path traversal vulnerabilities
@@ -15,6 +15,7 @@ from app.tasks.retry_config import BaseTaskWithRetry
 from app.utils import log_task_progress
 from app.utils.ai_provider import get_ai_provider, is_ai_provider_configured
 from app.utils.filename_utils import VALID_FILENAME_RE
+from app.utils.llm_cache import cached_chat_completion
 
 logger = logging.getLogger(__name__)
 
@@ -76,6 +77,80 @@ def extract_json_from_text(text):
     return None
 
 
+def build_metadata_messages(metadata_text: str) -> list[dict[str, str]]:
+    """Return the chat messages asking the model for the metadata JSON of *metadata_text*."""
+    prompt = (
+        "You are a specialized document analyzer trained to extract structured metadata from documents.\n"
+        "Your task is to analyze the given text and return a well-structured JSON object.\n\n"
+        "Extract and return the following fields:\n"
+        "1. **filename**: Machine-readable filename "
+        "(YYYY-MM-DD_DescriptiveTitle, use only letters, numbers, periods, and underscores).\n"
+        '2. **empfaenger**: The recipient, or "Unknown" if not found.\n'
+        '3. **absender**: The sender, or "Unknown" if not found.\n'
+        "4. **correspondent**: The entity or company that issued the document "
+        '(shortest possible name, e.g., "Amazon" instead of "Amazon EU SARL, German branch").\n'
+        "5. **kommunikationsart**: One of [Behoerdlicher_Brief, Rechnung, Kontoauszug, Vertrag, "
+        "Quittung, Privater_Brief, Einladung, Gewerbliche_Korrespondenz, Newsletter, Werbung, Sonstiges].\n"
+        "6. **kommunikationskategorie**: One of [Amtliche_Postbehoerdliche_Dokumente, "
+        "Finanz_und_Vertragsdokumente, Geschaeftliche_Kommunikation, "
+        "Private_Korrespondenz, Sonstige_Informationen].\n"
+        "7. **document_type**: Precise classification (e.g., Invoice, Contract, Information, Unknown).\n"
+        "8. **tags**: A list of up to 4 relevant thematic keywords.\n"
+        '9. **language**: Detected document language (ISO 639-1 code, e.g., "de" or "en").\n'
+        "10. **title**: A human-readable title summarizing the document content.\n"
+        "11. **confidence_score**: A numeric value (0-100) indicating the confidence level "
+        "of the extracted metadata.\n"
+        "12. **reference_number**: Extracted invoice/order/reference number if available.\n"
+        "13. **monetary_amounts**: A list of key monetary values detected in the document.\n\n"
+        "### Important Rules:\n"
+        "- **OCR Correction**: Assume the text has been corrected for OCR errors.\n"
+        "- **Tagging**: Max 4 tags, avoiding generic or overly specific terms.\n"
+        "- **Title**: Concise, no addresses, and contains key identifying features.\n"
+        "- **Date Selection**: Prefer an explicit document-level date in the header "
+        "(such as report date, invoice date, or letter date) over line-item, due, completion, "
+        "or historical dates. Infer ambiguous numeric date order from unambiguous dates elsewhere "
+        "in the same document.\n"
+        "- **Document Parties**: Extract sender and recipient only from document-level authorship or "
+        "addressing. Do not use a report title, scope, or arbitrary person from a table as a party.\n"
+        "- **Output Language**: Maintain the document's original language.\n\n"
+        f"Extracted text:\n{metadata_text}\n\n"
+        "Return only valid JSON with no additional commentary.\n"
+    )
+    return [
+        {"role": "system", "content": "You are an intelligent document classifier."},
+        {"role": "user", "content": prompt},
+    ]
+
+
+def parse_metadata_response(content: str) -> dict | None:
+    """Parse the model's metadata JSON, or return ``None`` when the response holds none.
+
+    The suggested filename is cleared unless it matches ``VALID_FILENAME_RE``
+    so a hostile or confused response cannot introduce path traversal.
+    """
+    json_text = extract_json_from_text(content)
+    if not json_text:
+        return None
+    metadata = json.loads(json_text)
+
+    # SECURITY: Validate filename format from GPT to prevent path traversal
+    # The prompt requests filenames with only letters, numbers, periods, and underscores
+    # Enforce this constraint to prevent malicious filenames
+    suggested_filename = metadata.get("filename", "")
+    if suggested_filename:
+        # Check if filename contains only safe characters AND explicitly check for ".."
+        # Defense in depth: While the regex VALID_FILENAME_PATTERN already excludes / and \,
+        # we explicitly reject ".." to guard against:
+        # 1. Potential locale-specific \w behavior
+        # 2. Files literally named ".." which are valid but problematic
+        # 3. Future code changes that might relax the regex
+        if not VALID_FILENAME_RE.match(suggested_filename) or ".." in suggested_filename:
+            logger.warning(f"Invalid filename format from GPT: '{suggested_filename}', using fallback")
+            # Reset to empty to trigger fallback to original filename
+            metadata["filename"] = ""
+    return metadata
+
+
 @celery.task(base=BaseTaskWithRetry, bind=True)
 def extract_metadata_with_gpt(self, filename: str, cleaned_text: str, file_id: int = None):
     """
@@ -146,53 +221,18 @@ def extract_metadata_with_gpt(self, filename: str, cleaned_text: str, file_id: i
             file_id=file_id,
         )
 
-    prompt = (
-        "You are a specialized document analyzer trained to extract structured metadata from documents.\n"
-        "Your task is to analyze the given text and return a well-structured JSON object.\n\n"
-        "Extract and return the following fields:\n"
-        "1. **filename**: Machine-readable filename "
-        "(YYYY-MM-DD_DescriptiveTitle, use only letters, numbers, periods, and underscores).\n"
-        '2. **empfaenger**: The recipient, or "Unknown" if not found.\n'
-        '3. **absender**: The sender, or "Unknown" if not found.\n'
-        "4. **correspondent**: The entity or company that issued the document "
-        '(shortest possible name, e.g., "Amazon" instead of "Amazon EU SARL, German branch").\n'
-        "5. **kommunikationsart**: One of [Behoerdlicher_Brief, Rechnung, Kontoauszug, Vertrag, "
-        "Quittung, Privater_Brief, Einladung, Gewerbliche_Korrespondenz, Newsletter, Werbung, Sonstiges].\n"
-        "6. **kommunikationskategorie**: One of [Amtliche_Postbehoerdliche_Dokumente, "
-        "Finanz_und_Vertragsdokumente, Geschaeftliche_Kommunikation, "
-        "Private_Korrespondenz, Sonstige_Informationen].\n"
-        "7. **document_type**: Precise classification (e.g., Invoice, Contract, Information, Unknown).\n"
-        "8. **tags**: A list of up to 4 relevant thematic keywords.\n"
-        '9. **language**: Detected document language (ISO 639-1 code, e.g., "de" or "en").\n'
-        "10. **title**: A human-readable title summarizing the document content.\n"
-        "11. **confidence_score**: A numeric value (0-100) indicating the confidence level "
-        "of the extracted metadata.\n"
-        "12. **reference_number**: Extracted invoice/order/reference number if available.\n"
-        "13. **monetary_amounts**: A list of key monetary values detected in the document.\n\n"
-        "### Important Rules:\n"
-        "- **OCR Correction**: Assume the text has been corrected for OCR errors.\n"
-        "- **Tagging**: Max 4 tags, avoiding generic or overly specific terms.\n"
-        "- **Title**: Concise, no addresses, and contains key identifying features.\n"
-        "- **Date Selection**: Prefer an explicit document-level date in the header "
-        "(such as report date, invoice date, or letter date) over line-item, due, completion, "
-        "or historical dates. Infer ambiguous numeric date order from unambiguous dates elsewhere "
-        "in the same document.\n"
-        "- **Document Parties**: Extract sender and recipient only from document-level authorship or "
-        "addressing. Do not use a report title, scope, or arbitrary person from a table as a party.\n"
-        "- **Output Language**: Maintain the document's original language.\n\n"
-        f"Extracted text:\n{metadata_text}\n\n"
-        "Return only valid JSON with no additional commentary.\n"
-    )
+    messages = build_metadata_messages(metadata_text)
 
     try:
         logger.info(f"[{task_id}] Sending classification request for {filename}...")
         log_task_progress(task_id, "call_ai_provider", "in_progress", "Calling AI provider API", file_id=file_id)
         provider = get_ai_provider()
-        content = provider.chat_completion(
-            messages=[
-                {"role": "system", "content": "You are an intelligent document classifier."},
-                {"role": "user", "content": prompt},
-            ],
+        content = cached_chat_completion(
+            provider,
+            "extract_metadata",
+            validate=lambda text: bool(extract_json_from_text(text)),
+            file_id=file_id,
+            messages=messages,
             model=model,
             temperature=0,
         )
@@ -207,8 +247,8 @@ def extract_metadata_with_gpt(self, filename: str, cleaned_text: str, file_id: i
             detail=f"Raw classification response:\n{content}",
         )
 
-        json_text = extract_json_from_text(content)
-        if not json_text:
+        metadata = parse_metadata_response(content)
+        if metadata is None:
             logger.error(f"[{task_id}] Could not find valid JSON in GPT response for {filename}.")
             log_task_progress(
                 task_id,
@@ -220,24 +260,6 @@ def extract_metadata_with_gpt(self, filename: str, cleaned_text: str, file_id: i
             )
             return {}
 
-        metadata = json.loads(json_text)
-
-        # SECURITY: Validate filename format from GPT to prevent path traversal
-        # The prompt requests filenames with only letters, numbers, periods, and underscores
-        # Enforce this constraint to prevent malicious filenames
-        suggested_filename = metadata.get("filename", "")
-        if suggested_filename:
-            # Check if filename contains only safe characters AND explicitly check for ".."
-            # Defense in depth: While the regex VALID_FILENAME_PATTERN already excludes / and \,
-            # we explicitly reject ".." to guard against:
-            # 1. Potential locale-specific \w behavior
-            # 2. Files literally named ".." which are valid but problematic
-            # 3. Future code changes that might relax the regex
-            if not VALID_FILENAME_RE.match(suggested_filename) or ".." in suggested_filename:
-                logger.warning(f"[{task_id}] Invalid filename format from GPT: '{suggested_filename}', using fallback")
-                # Reset to empty to trigger fallback to original filename
-                metadata["filename"] = ""
-
         logger.info(f"[{task_id}] Extracted metadata: {metadata}")
         log_task_progress(
             task_id,
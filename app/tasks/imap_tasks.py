@@ -5,6 +5,10 @@ import json
 import logging
 import os
 import re
+import threading
+import uuid
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
 
 import redis
@@ -18,6 +22,8 @@ from app.utils.allowed_types import (
     DEFAULT_CATEGORIES,
     get_allowed_types_for_categories,
 )
+from app.utils.filename_utils import sanitize_filename
+from app.utils.imap import BodyPart, iter_body_parts, parse_fetch_items, stream_body_part, uid_ranges
 from app.utils.network import is_private_ip
 
 # Database session for per-user IMAP accounts (imported lazily to avoid circular imports)
@@ -93,6 +99,14 @@ LOCK_EXPIRE = 300  # Lock expires in 5 minutes
 # Local cache file for tracking processed emails
 CACHE_FILE = os.path.join(settings.workdir, "processed_mails.json")
 
+# Mailboxes are polled concurrently; the shared processed-mail cache file is
+# read-modify-written under this lock so parallel polls do not drop entries.
+_PROCESSED_EMAILS_LOCK = threading.Lock()
+
+# First UID sync (or a UIDVALIDITY reset) only looks this far back, matching
+# the window of the legacy message search.
+_UID_SYNC_INITIAL_WINDOW_DAYS = 3
+
 
 def acquire_lock():
     """Attempt to acquire a Redis-based lock. If acquired, set an expiration."""
@@ -131,6 +145,16 @@ def save_processed_emails(processed_emails):
         json.dump(processed_emails, f, indent=4)
 
 
+def _remember_processed_email(processed_emails, msg_id):
+    """Record *msg_id* in the shared cache without clobbering concurrent polls."""
+    processed_at = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S")
+    processed_emails[msg_id] = processed_at
+    with _PROCESSED_EMAILS_LOCK:
+        merged = load_processed_emails()
+        merged.update(processed_emails)
+        save_processed_emails(merged)
+
+
 def cleanup_old_entries(processed_emails):
     """Remove entries older than 7 days from the cache to avoid infinite growth."""
     seven_days_ago = datetime.now(timezone.utc) - timedelta(days=7)
@@ -165,6 +189,7 @@ def pull_all_inboxes():
         # slot is the normal fresh-install state and must not emit a warning on
         # every beat interval. Partially configured slots still flow through
         # validation so operators get an actionable warning.
+        legacy_mailboxes = []
         for mailbox in (
             {
                 "mailbox_key": "imap1",
@@ -186,9 +211,12 @@ def pull_all_inboxes():
             },
         ):
             if any(mailbox[field] for field in ("host", "username", "password")):
-                check_and_pull_mailbox(**mailbox)
+                legacy_mailboxes.append(mailbox)
             else:
                 logger.debug("Mailbox %s is not configured; skipping silently.", mailbox["mailbox_key"])
+        for error in _poll_mailboxes(legacy_mailboxes, check_and_pull_mailbox):
+            if error is not None:
+                raise error
 
         # Per-user IMAP accounts from the database
         _pull_user_imap_accounts()
@@ -202,8 +230,24 @@ def pull_all_inboxes():
         release_lock()
 
 
+def _poll_mailboxes(polls: list[dict], poll_mailbox: Callable[..., None] | None = None) -> list[BaseException | None]:
+    """Run *poll_mailbox* (default :func:`pull_inbox`) for each kwargs dict with bounded concurrency.
+
+    At most ``imap_poll_concurrency`` IMAP connections are open at a time.
+    Returns one entry per poll, in input order: ``None`` on success or the
+    exception raised by that poll.
+    """
+    if not polls:
+        return []
+    poll_mailbox = poll_mailbox or pull_inbox
+    workers = max(1, min(int(settings.imap_poll_concurrency), len(polls)))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="imap-poll") as executor:
+        futures = [executor.submit(poll_mailbox, **poll) for poll in polls]
+        return [future.exception() for future in futures]
+
+
 def _pull_user_imap_accounts() -> None:
-    """Iterate over all active per-user IMAP accounts and pull their inboxes."""
+    """Poll all active per-user IMAP accounts concurrently and record the outcome."""
     try:
         from app.models import UserImapAccount
 
@@ -211,40 +255,58 @@ def _pull_user_imap_accounts() -> None:
         try:
             accounts = db.query(UserImapAccount).filter(UserImapAccount.is_active.is_(True)).all()
             logger.info("Processing %d per-user IMAP account(s)", len(accounts))
+            # Credentials and profiles are resolved up front on this thread; only
+            # the network-bound mailbox polls run in the worker pool.
+            polls: list[tuple[object, dict | Exception]] = []
             for acct in accounts:
                 # Use a descriptive identifier for logging and processed-email cache keys
                 account_identifier = f"user_{acct.owner_id}_{acct.id}"
                 try:
-                    pull_inbox(
-                        mailbox_key=account_identifier,
-                        host=acct.host,
-                        port=acct.port,
-                        username=acct.username,
-                        password=_decrypt_imap_password(acct.password),
-                        use_ssl=acct.use_ssl,
-                        delete_after_process=acct.delete_after_process,
-                        owner_id=acct.owner_id,
-                        allowed_categories=_resolve_categories_for_profile(acct.profile_id),
+                    polls.append(
+                        (
+                            acct,
+                            {
+                                "mailbox_key": account_identifier,
+                                "host": acct.host,
+                                "port": acct.port,
+                                "username": acct.username,
+                                "password": _decrypt_imap_password(acct.password),
+                                "use_ssl": acct.use_ssl,
+                                "delete_after_process": acct.delete_after_process,
+                                "owner_id": acct.owner_id,
+                                "allowed_categories": _resolve_categories_for_profile(acct.profile_id),
+                            },
+                        )
                     )
+                except Exception as exc:  # noqa: BLE001
+                    polls.append((acct, exc))
+
+            outcomes = iter(_poll_mailboxes([poll for _acct, poll in polls if isinstance(poll, dict)]))
+            for acct, poll in polls:
+                error = poll if isinstance(poll, Exception) else next(outcomes)
+                if error is None:
                     # Record successful poll
                     acct.last_checked_at = datetime.now(timezone.utc)
                     acct.last_error = None
-                    db.commit()
-                except Exception as exc:  # noqa: BLE001
-                    error_msg = str(exc)[:_MAX_ERROR_LENGTH]
-                    logger.error(
-                        "Error pulling user IMAP account %d (%s@%s): %s",
-                        acct.id,
-                        acct.username,
-                        acct.host,
-                        error_msg,
-                    )
                     try:
-                        acct.last_checked_at = datetime.now(timezone.utc)
-                        acct.last_error = error_msg
                         db.commit()
                     except Exception:  # noqa: BLE001
                         db.rollback()
+                    continue
+                error_msg = str(error)[:_MAX_ERROR_LENGTH]
+                logger.error(
+                    "Error pulling user IMAP account %d (%s@%s): %s",
+                    acct.id,
+                    acct.username,
+                    acct.host,
+                    error_msg,
+                )
+                try:
+                    acct.last_checked_at = datetime.now(timezone.utc)
+                    acct.last_error = error_msg
+                    db.commit()
+                except Exception:  # noqa: BLE001
+                    db.rollback()
         finally:
             db.close()
     except Exception as exc:  # noqa: BLE001
@@ -281,6 +343,7 @@ def _pull_user_integration_imap() -> None:
                 .all()
             )
             logger.info("Processing %d IMAP UserIntegration(s)", len(integrations))
+            polls: list[tuple[object, dict | Exception]] = []
             for integ in integrations:
                 account_identifier = f"integration_{integ.owner_id}_{integ.id}"
                 try:
@@ -307,35 +370,50 @@ def _pull_user_integration_imap() -> None:
                         )
                         continue
 
-                    pull_inbox(
-                        mailbox_key=account_identifier,
-                        host=host,
-                        port=port,
-                        username=username,
-                        password=password,
-                        use_ssl=use_ssl,
-                        delete_after_process=delete_after,
-                        owner_id=integ.owner_id,
-                        gmail_apply_labels=gmail_labels,
-                        allowed_categories=allowed_categories,
+                    polls.append(
+                        (
+                            integ,
+                            {
+                                "mailbox_key": account_identifier,
+                                "host": host,
+                                "port": port,
+                                "username": username,
+                                "password": password,
+                                "use_ssl": use_ssl,
+                                "delete_after_process": delete_after,
+                                "owner_id": integ.owner_id,
+                                "gmail_apply_labels": gmail_labels,
+                                "allowed_categories": allowed_categories,
+                            },
+                        )
                     )
+                except Exception as exc:  # noqa: BLE001
+                    polls.append((integ, exc))
+
+            outcomes = iter(_poll_mailboxes([poll for _integ, poll in polls if isinstance(poll, dict)]))
+            for integ, poll in polls:
+                error = poll if isinstance(poll, Exception) else next(outcomes)
+                if error is None:
                     integ.last_used_at = datetime.now(timezone.utc)
                     integ.last_error = None
-                    db.commit()
-                except Exception as exc:  # noqa: BLE001
-                    error_msg = str(exc)[:_MAX_ERROR_LENGTH]
-                    logger.error(
-                        "Error pulling IMAP integration %d (owner %s): %s",
-                        integ.id,
-                        integ.owner_id,
-                        error_msg,
-                    )
                     try:
-                        integ.last_used_at = datetime.now(timezone.utc)
-                        integ.last_error = error_msg
                         db.commit()
                     except Exception:  # noqa: BLE001
                         db.rollback()
+                    continue
+                error_msg = str(error)[:_MAX_ERROR_LENGTH]
+                logger.error(
+                    "Error pulling IMAP integration %d (owner %s): %s",
+                    integ.id,
+                    integ.owner_id,
+                    error_msg,
+                )
+                try:
+                    integ.last_used_at = datetime.now(timezone.utc)
+                    integ.last_error = error_msg
+                    db.commit()
+                except Exception:  # noqa: BLE001
+                    db.rollback()
         finally:
             db.close()
     except Exception as exc:  # noqa: BLE001
@@ -390,6 +468,12 @@ def pull_inbox(
 
     For non-Gmail mailboxes, it falls back to selecting the INBOX with a SINCE/UNSEEN filter.
 
+    With ``IMAP_UID_SYNC_ENABLED`` the selected folder is synced by UID
+    instead (see :func:`_sync_mailbox_by_uid`): only messages above the last
+    UID recorded in ``imap_sync_states`` are examined (recent unread ones on
+    the first sync or after a UIDVALIDITY change), only their allowed
+    attachment parts are downloaded, and the Message-ID cache is not used.
+
     Args:
         owner_id: Optional user identifier. When provided, ingested documents are
                   attributed to this user via ``process_document`` / ``convert_to_pdf``.
@@ -423,21 +507,43 @@ def pull_inbox(
         mail.login(username, password)
 
         is_gmail_host = "gmail" in host.lower()
+        folder = "INBOX"
         if is_gmail_host:
             # For Gmail, try to select the localized All Mail folder.
             all_mail_folder = find_all_mail_folder(mail)
             if all_mail_folder:
                 logger.info("Using Gmail All Mail folder: %s", all_mail_folder)
+                folder = all_mail_folder
                 mail.select(f'"{all_mail_folder}"')
             else:
                 logger.warning("Gmail All Mail folder not found, falling back to INBOX.")
                 mail.select("INBOX")
+        else:
+            mail.select("INBOX")
+
+        if settings.imap_uid_sync_enabled:
+            _sync_mailbox_by_uid(
+                mail,
+                mailbox_key=mailbox_key,
+                folder=folder,
+                is_gmail_host=is_gmail_host,
+                gmail_apply_labels=gmail_apply_labels,
+                delete_after_process=delete_after_process,
+                owner_id=owner_id,
+                effective_mime_types=effective_mime_types,
+                effective_extensions=effective_extensions,
+            )
+            mail.close()
+            mail.logout()
+            logger.info("Finished processing mailbox %s", mailbox_key)
+            return
+
+        if is_gmail_host:
             # Use the X-GM-RAW query for Gmail.
             raw_query = "in:anywhere in:unread newer_than:3d has:attachment"
             status, search_data = mail.search(None, "X-GM-RAW", f'"{raw_query}"')
         else:
-            # For non-Gmail, select INBOX and use SINCE/UNSEEN query.
-            mail.select("INBOX")
+            # For non-Gmail, use SINCE/UNSEEN query on the selected INBOX.
             since_date = (datetime.now(timezone.utc) - timedelta(days=3)).strftime("%d-%b-%Y")
             status, search_data = mail.search(None, f"(SINCE {since_date} UNSEEN)")
 
@@ -495,8 +601,7 @@ def pull_inbox(
                 else:
                     mail.store(num, "-FLAGS", "\\Seen")
 
-            processed_emails[msg_id] = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S")
-            save_processed_emails(processed_emails)
+            _remember_processed_email(processed_emails, msg_id)
 
         if not settings.imap_readonly_mode and delete_after_process:
             mail.expunge()
@@ -551,39 +656,200 @@ def fetch_attachments_and_enqueue(
         if not filename:
             continue
 
-        # Check if it's a PDF file by extension, regardless of MIME type
-        is_pdf_by_extension = filename.lower().endswith(".pdf")
-
         mime_type = part.get_content_type()
-        file_ext = os.path.splitext(filename)[1].lower()
-
-        # Accept file if it has an allowed MIME type, an allowed extension, OR is a PDF by extension
-        if mime_type not in effective_mime_types and file_ext not in effective_extensions and not is_pdf_by_extension:
-            logger.info(
-                "Skipping attachment %s (MIME: %s, ext: %s) — not in effective allowed set",
-                filename,
-                mime_type,
-                file_ext,
-            )
+        if not _attachment_is_allowed(filename, mime_type, effective_mime_types, effective_extensions):
             continue
 
         file_path = os.path.join(settings.workdir, filename)
         with open(file_path, "wb") as f:
             f.write(part.get_payload(decode=True))
 
-        # If it's a PDF by MIME type or extension, process it directly
-        if mime_type == "application/pdf" or is_pdf_by_extension:
-            process_document.delay(file_path, owner_id=owner_id)
-            logger.info("Enqueued PDF for upload: %s (MIME: %s)", filename, mime_type)
-        elif mime_type in effective_mime_types:
-            # Other allowed files are sent for conversion
-            convert_to_pdf.delay(file_path, owner_id=owner_id)
-            logger.info("Enqueued file for conversion to PDF: %s", filename)
-
+        _enqueue_attachment(file_path, filename, mime_type, owner_id, effective_mime_types)
         has_attachment = True
     return has_attachment
 
 
+def _attachment_is_allowed(
+    filename: str,
+    mime_type: str,
+    effective_mime_types: frozenset[str],
+    effective_extensions: frozenset[str],
+) -> bool:
+    """Accept an allowed MIME type, an allowed extension, or a PDF by extension."""
+    is_pdf_by_extension = filename.lower().endswith(".pdf")
+    file_ext = os.path.splitext(filename)[1].lower()
+    if mime_type not in effective_mime_types and file_ext not in effective_extensions and not is_pdf_by_extension:
+        logger.info(
+            "Skipping attachment %s (MIME: %s, ext: %s) — not in effective allowed set",
+            filename,
+            mime_type,
+            file_ext,
+        )
+        return False
+    return True
+
+
+def _enqueue_attachment(
+    file_path: str,
+    filename: str,
+    mime_type: str,
+    owner_id: str | None,
+    effective_mime_types: frozenset[str],
+) -> None:
+    """Queue a saved attachment: PDFs go to processing, other allowed files to conversion."""
+    # If it's a PDF by MIME type or extension, process it directly
+    if mime_type == "application/pdf" or filename.lower().endswith(".pdf"):
+        process_document.delay(file_path, owner_id=owner_id)
+        logger.info("Enqueued PDF for upload: %s (MIME: %s)", filename, mime_type)
+    elif mime_type in effective_mime_types:
+        # Other allowed files are sent for conversion
+        convert_to_pdf.delay(file_path, owner_id=owner_id)
+        logger.info("Enqueued file for conversion to PDF: %s", filename)
+
+
+def _selected_uid_validity(mail) -> int | None:
+    """Return the UIDVALIDITY reported for the currently selected folder."""
+    _code, data = mail.response("UIDVALIDITY")
+    values = [value for value in data or [] if value]
+    if not values:
+        return None
+    try:
+        return int(values[-1])
+    except (TypeError, ValueError):
+        return None
+
+
+def _search_new_uids(mail, last_seen_uid: int, is_gmail_host: bool) -> list[int]:
+    """Return UIDs above *last_seen_uid*, or recent unread UIDs on a first sync."""
+    if last_seen_uid > 0:
+        criteria = [f"UID {last_seen_uid + 1}:*"]
+    else:
+        since = datetime.now(timezone.utc) - timedelta(days=_UID_SYNC_INITIAL_WINDOW_DAYS)
+        criteria = [f"SINCE {since.strftime('%d-%b-%Y')}", "UNSEEN"]
+    if is_gmail_host:
+        criteria += ["X-GM-RAW", '"has:attachment"']
+    status, data = mail.uid("SEARCH", None, *criteria)
+    if status != "OK":
+        raise imaplib.IMAP4.error(f"UID SEARCH failed: {status}")
+    raw = b" ".join(item for item in data or [] if isinstance(item, bytes))
+    # "n:*" always matches the highest UID, even when it is not above n.
+    return sorted(uid for uid in (int(token) for token in raw.split()) if uid > last_seen_uid)
+
+
+def _download_and_enqueue_part(
+    mail,
+    uid: int,
+    part: BodyPart,
+    owner_id: str | None,
+    effective_mime_types: frozenset[str],
+) -> bool:
+    """Stream one attachment part to the workdir and queue it for processing."""
+    filename = sanitize_filename(part.filename) or "attachment"
+    file_path = os.path.join(settings.workdir, f"imap_{uuid.uuid4().hex}_{filename}")
+    try:
+        stream_body_part(mail, uid, part, file_path, max_bytes=settings.max_upload_size)
+    except ValueError:
+        logger.warning("Skipping oversized attachment %s in UID %s", filename, uid)
+        if os.path.exists(file_path):
+            os.remove(file_path)
+        return False
+    except Exception:
+        if os.path.exists(file_path):
+            os.remove(file_path)
+        raise
+    _enqueue_attachment(file_path, filename, part.mime_type, owner_id, effective_mime_types)
+    return True
+
+
+def _sync_mailbox_by_uid(
+    mail,
+    *,
+    mailbox_key: str,
+    folder: str,
+    is_gmail_host: bool,
+    gmail_apply_labels: bool,
+    delete_after_process: bool,
+    owner_id: str | None,
+    effective_mime_types: frozenset[str],
+    effective_extensions: frozenset[str],
+) -> None:
+    """Ingest new attachments from the selected folder using incremental UID sync.
+
+    Only ``BODYSTRUCTURE`` is fetched for new messages (in batched UID ranges);
+    allowed attachment parts are then streamed individually with
+    ``BODY.PEEK``, so message bodies, inline images and the ``\\Seen`` flag are
+    left untouched.  The sync position is committed after every message, so
+    an interrupted poll resumes after the last message it queued instead of
+    queueing that batch's attachments again.
+    """
+    from app.models import ImapSyncState
+
+    uid_validity = _selected_uid_validity(mail)
+    if uid_validity is None:
+        raise imaplib.IMAP4.error(f"Mailbox {mailbox_key} did not report UIDVALIDITY for {folder}")
+
+    db = _get_db_session()
+    try:
+        state = (
+            db.query(ImapSyncState)
+            .filter(ImapSyncState.mailbox_key == mailbox_key, ImapSyncState.folder == folder)
+            .first()
+        )
+        if state is None:
+            state = ImapSyncState(mailbox_key=mailbox_key, folder=folder, uid_validity=uid_validity, last_seen_uid=0)
+            db.add(state)
+        elif state.uid_validity != uid_validity:
+            logger.warning("UIDVALIDITY changed for %s/%s; resyncing the recent window", mailbox_key, folder)
+            state.uid_validity = uid_validity
+            state.last_seen_uid = 0
+
+        uids = _search_new_uids(mail, int(state.last_seen_uid or 0), is_gmail_host)
+        logger.info("Found %d new message(s) in %s since UID %s", len(uids), mailbox_key, state.last_seen_uid)
+
+        modify_mailbox = not settings.imap_readonly_mode
+        deleted_any = False
+        for uid_set in uid_ranges(uids, settings.imap_uid_fetch_batch_size):
+            status, data = mail.uid("FETCH", uid_set, "(UID BODYSTRUCTURE)")
+            if status != "OK":
+                raise imaplib.IMAP4.error(f"BODYSTRUCTURE fetch failed for {mailbox_key}: {status}")
+            messages = sorted(
+                (items for items in parse_fetch_items(data) if isinstance(items.get("UID"), int)),
+                key=lambda items: items["UID"],
+            )
+            for items in messages:
+                uid = items["UID"]
+                parts = [
+                    part
+                    for part in iter_body_parts(items.get("BODYSTRUCTURE"))
+                    if part.filename
+                    and _attachment_is_allowed(
+                        part.filename, part.mime_type, effective_mime_types, effective_extensions
+                    )
+                ]
+                for part in parts:
+                    _download_and_enqueue_part(mail, uid, part, owner_id, effective_mime_types)
+
+                if parts and modify_mailbox:
+                    if is_gmail_host and gmail_apply_labels:
+                        mail.uid("STORE", str(uid), "+FLAGS", "\\Flagged")
+                        mail.uid("STORE", str(uid), "+X-GM-LABELS", "Ingested")
+                    if delete_after_process:
+                        logger.info("Deleting message UID %s from %s", uid, mailbox_key)
+                        mail.uid("STORE", str(uid), "+FLAGS", "\\Deleted")
+                        deleted_any = True
+                state.last_seen_uid = max(int(state.last_seen_uid or 0), uid)
+                db.commit()
+
+        if deleted_any:
+            mail.expunge()
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
 def email_already_has_label(mail, msg_id, label="Ingested"):
     """
     Checks if the given message (msg_id) has the specified Gmail label.
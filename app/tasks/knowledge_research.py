@@ -6,6 +6,7 @@ import logging
 import re
 import time
 from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
 from typing import Any, cast
 
@@ -25,6 +26,8 @@ _SCOPE_BATCH = 1_000
 _SEARCH_PAGE = 100
 _MAP_BATCH = 10
 _EXCERPT_CHARS = 6_000
+# Best-matching vector-index chunks sent per document instead of its full text.
+_PASSAGES_PER_DOCUMENT = 4
 _RESEARCH_DB_MAX_RETRIES = 2
 _LEXICAL_RESULTS_PER_SCOPE = 100
 _SYNTHESIS_RESERVE_SECONDS = 12
@@ -51,6 +54,17 @@ _NON_EVENT_EVIDENCE_TERMS = {
 }
 
 
+@dataclass(frozen=True)
+class _ResearchDocument:
+    """The bounded view of one document that map batches, filters and synthesis use."""
+
+    id: int
+    document_title: str | None
+    original_filename: str | None
+    excerpt: str
+    truncated: bool = False
+
+
 def _parse_json_response(value: str) -> Any:
     text = value.strip()
     fenced = re.search(r"```(?:json)?\s*(.*?)```", text, re.DOTALL | re.IGNORECASE)
@@ -138,7 +152,7 @@ def _deduplicate_evidence(items: list[dict[str, Any]]) -> list[dict[str, Any]]:
 def _filter_evidence_for_question(
     question: str,
     items: list[dict[str, Any]],
-    records: dict[int, FileRecord] | None = None,
+    records: dict[int, _ResearchDocument] | None = None,
     subject_hint: str | None = None,
 ) -> list[dict[str, Any]]:
     """Reject obvious non-events for questions that ask about actual occurrences."""
@@ -188,7 +202,7 @@ def _filter_evidence_for_question(
                         (
                             record.document_title or "",
                             record.original_filename or "",
-                            record.ocr_text or "",
+                            record.excerpt,
                         )
                     )
                 )
@@ -319,6 +333,85 @@ def _excerpt(text: str, query: str) -> str:
     return "\n…\n".join(windows)[:_EXCERPT_CHARS]
 
 
+def _passage_excerpt(payloads: list[dict[str, Any]]) -> tuple[str, bool]:
+    """Join a document's top-scoring index chunks in reading order within the excerpt budget.
+
+    Returns:
+        The excerpt and whether parts of the document were left out.
+    """
+    passages: dict[int, str] = {}
+    chunk_count = 0
+    for payload in payloads:
+        chunk_index = payload.get("chunk_index")
+        if isinstance(chunk_index, int) and chunk_index not in passages:
+            passages[chunk_index] = str(payload.get("text") or "").strip()
+            chunk_count = max(chunk_count, int(payload.get("chunk_count") or 0))
+    if not passages:
+        return "", False
+    budget = _EXCERPT_CHARS // len(passages)
+    texts = [passages[chunk_index] for chunk_index in sorted(passages)]
+    truncated = chunk_count > len(passages) or any(len(text) > budget for text in texts)
+    return "\n…\n".join(text[:budget] for text in texts), truncated
+
+
+def _passage_query_vector(plan: dict[str, Any], query: str) -> Any | None:
+    """Embed the research query once per job for passage retrieval, if the vector index is enabled."""
+    if not settings.vector_index_enabled:
+        return None
+    try:
+        from app.utils.similarity import generate_embeddings
+
+        return generate_embeddings([str(plan.get("semantic_query") or query)])[0]
+    except Exception as exc:
+        logger.info("Passage retrieval unavailable for research job: %s", exc)
+        return None
+
+
+def _load_research_documents(
+    db: Any, document_ids: list[int], question: str, query_vector: Any | None
+) -> list[_ResearchDocument]:
+    """Load bounded excerpts for one map batch.
+
+    Documents in the vector index contribute their best-matching chunks, so
+    only those passages leave Qdrant.  Only documents without indexed chunks
+    have their OCR text loaded from the database and excerpted locally.
+    """
+    rows = (
+        db.query(FileRecord.id, FileRecord.document_title, FileRecord.original_filename)
+        .filter(FileRecord.id.in_(document_ids))
+        .order_by(FileRecord.id)
+        .all()
+    )
+    found_ids = [row.id for row in rows]
+    passages: dict[int, list[dict[str, Any]]] = {}
+    if query_vector is not None and found_ids:
+        try:
+            from app.utils.vector_index import QdrantVectorIndex
+
+            passages = QdrantVectorIndex().top_passages(
+                query_vector, document_ids=found_ids, per_document=_PASSAGES_PER_DOCUMENT
+            )
+        except Exception as exc:
+            logger.info("Passage retrieval failed; excerpting full text for this batch: %s", exc)
+    unindexed = [file_id for file_id in found_ids if file_id not in passages]
+    texts: dict[int, str] = {}
+    if unindexed:
+        texts = {
+            file_id: ocr_text or ""
+            for file_id, ocr_text in db.query(FileRecord.id, FileRecord.ocr_text).filter(FileRecord.id.in_(unindexed))
+        }
+
+    documents = []
+    for row in rows:
+        if row.id in passages:
+            excerpt, truncated = _passage_excerpt(passages[row.id])
+        else:
+            text = texts.get(row.id, "")
+            excerpt, truncated = _excerpt(text, question), len(text.strip()) > _EXCERPT_CHARS
+        documents.append(_ResearchDocument(row.id, row.document_title, row.original_filename, excerpt, truncated))
+    return documents
+
+
 def _fallback_research_plan(query: str) -> dict[str, Any]:
     """Return a safe deterministic plan when the short LLM request fails."""
     from app.api.knowledge import _research_keyword_query
@@ -603,12 +696,12 @@ def _no_evidence_answer(question: str, *, index_complete: bool, analysis_truncat
     )
 
 
-def _map_batch(question: str, records: list[FileRecord], model: str) -> tuple[list[dict[str, Any]], bool]:
+def _map_batch(question: str, records: list[_ResearchDocument], model: str) -> tuple[list[dict[str, Any]], bool]:
     from app.utils.ai_provider import get_ai_provider
 
     documents = "\n\n".join(
         f"DOCUMENT_ID: {record.id}\nTITLE: {record.document_title or ''}\n"
-        f"FILENAME: {record.original_filename or ''}\nTEXT:\n{_excerpt(record.ocr_text or '', question)}"
+        f"FILENAME: {record.original_filename or ''}\nTEXT:\n{record.excerpt}"
         for record in records
     )
     prompt = (
@@ -654,7 +747,7 @@ def _map_batch(question: str, records: list[FileRecord], model: str) -> tuple[li
     allowed = {record.id for record in records}
     return (
         [item for item in evidence if isinstance(item, dict) and item.get("document_id") in allowed],
-        any(len((record.ocr_text or "").strip()) > _EXCERPT_CHARS for record in records),
+        any(record.truncated for record in records),
     )
 
 
@@ -662,7 +755,7 @@ def _synthesize(
     question: str,
     research_context: str,
     evidence: list[dict[str, Any]],
-    records: dict[int, FileRecord],
+    records: dict[int, _ResearchDocument],
     model: str,
 ) -> dict[str, Any]:
     from app.api.knowledge import _cited_sources
@@ -788,12 +881,13 @@ def run_knowledge_research(self: Any, job_id: str) -> dict[str, Any]:
                 retrieval_context,
                 plan=plan,
             )
+            query_vector = _passage_query_vector(plan, retrieval_context)
             job.total_documents = len(candidate_ids)
             job.processed_documents = 0
             db.commit()
             evidence: list[dict[str, Any]] = []
             truncated = retrieval_truncated
-            record_map: dict[int, FileRecord] = {}
+            record_map: dict[int, _ResearchDocument] = {}
             qualified_evidence_found = False
             for offset in range(0, len(candidate_ids), _MAP_BATCH):
                 elapsed = time.monotonic() - research_started
@@ -815,12 +909,13 @@ def run_knowledge_research(self: Any, job_id: str) -> dict[str, Any]:
                     job.state = "cancelled"
                     db.commit()
                     return {"state": "cancelled"}
-                batch_ids = candidate_ids[offset : offset + _MAP_BATCH]
-                records = db.query(FileRecord).filter(FileRecord.id.in_(batch_ids)).order_by(FileRecord.id).all()
                 # The immutable authorized ID snapshot is checked again before
                 # every model call; no cross-owner row can enter the prompt.
-                records = [record for record in records if record.id in accessible_set]
-                record_map.update({cast(int, record.id): record for record in records})
+                batch_ids = [
+                    file_id for file_id in candidate_ids[offset : offset + _MAP_BATCH] if file_id in accessible_set
+                ]
+                records = _load_research_documents(db, batch_ids, research_context, query_vector)
+                record_map.update({record.id: record for record in records})
                 if records:
                     batch_evidence, batch_truncated = _map_batch(research_context, records, model)
                     evidence.extend(batch_evidence)
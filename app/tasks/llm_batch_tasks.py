@@ -0,0 +1,347 @@
+"""Offline batch-API mode for metadata and embedding backfills.
+
+When ``LLM_BATCH_MODE_ENABLED`` is set, ``backfill_missing_metadata`` and
+``backfill_missing_embeddings`` hand their candidates to
+:func:`submit_metadata_batch` / :func:`submit_embedding_batch` instead of
+queueing one synchronous task per document.  Each call writes one JSONL
+request file, submits it through the configured
+:class:`~app.utils.llm_batch.BatchBackend` and records an
+:class:`~app.models.LLMBatchJob`.
+
+:func:`poll_llm_batches` (beat, every five minutes) polls outstanding jobs.
+Completed results are fanned back into the normal pipeline continuation:
+
+* metadata → the ``extract_metadata_with_gpt`` step is logged and
+  :func:`~app.tasks.embed_metadata_into_pdf.embed_metadata_into_pdf` queued,
+  exactly as ``extract_metadata_with_gpt`` does,
+* embeddings → stored on ``FileRecord.embedding`` and queued for vector
+  indexing, exactly as ``compute_document_embedding`` does.
+
+Metadata batches only use the OpenAI Batch API when ``AI_PROVIDER`` is
+``openai``; for other providers they run on the local backend, which calls
+the configured provider.
+
+Fan-out is idempotent: one poller claims a job with a conditional status
+update, and documents that gained metadata or an embedding in the meantime
+are skipped.
+"""
+
+import json
+import logging
+import os
+import tempfile
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Optional
+
+from app.celery_app import celery
+from app.config import settings
+from app.database import SessionLocal
+from app.models import FileRecord, LLMBatchJob
+from app.utils import log_task_progress
+from app.utils.llm_batch import (
+    CHAT_ENDPOINT,
+    EMBEDDINGS_ENDPOINT,
+    TERMINAL_FAILURE_STATES,
+    BatchBackend,
+    LocalBatchBackend,
+    batch_request,
+    get_batch_backend,
+    result_content,
+    result_embedding,
+    result_error,
+    write_jsonl,
+)
+
+logger = logging.getLogger(__name__)
+
+KIND_METADATA = "metadata"
+KIND_EMBEDDING = "embedding"
+
+STATUS_SUBMITTED = "submitted"
+STATUS_APPLYING = "applying"
+STATUS_APPLIED = "applied"
+STATUS_FAILED = "failed"
+
+#: A job left in ``applying`` this long (e.g. the worker died mid fan-out) is claimed again.
+_STALE_CLAIM_AFTER = timedelta(hours=1)
+
+
+def batch_mode_enabled() -> bool:
+    """Return True when backfills should be submitted as offline batches."""
+    return getattr(settings, "llm_batch_mode_enabled", False) is True
+
+
+def batch_limit() -> int:
+    """Return the maximum number of documents per batch."""
+    value = getattr(settings, "llm_batch_max_requests", 500)
+    return value if isinstance(value, int) and not isinstance(value, bool) and value > 0 else 500
+
+
+def files_in_open_batches(db: Any, kind: str) -> set[int]:
+    """Return the IDs of files whose *kind* requests are in a batch that has not been applied yet."""
+    open_ids: set[int] = set()
+    for (file_ids,) in db.query(LLMBatchJob.file_ids).filter(
+        LLMBatchJob.kind == kind,
+        LLMBatchJob.status.in_((STATUS_SUBMITTED, STATUS_APPLYING)),
+    ):
+        open_ids.update(json.loads(file_ids or "[]"))
+    return open_ids
+
+
+def _custom_id(file_id: int) -> str:
+    return f"file-{file_id}"
+
+
+def _file_id(custom_id: Any) -> Optional[int]:
+    prefix, _, value = str(custom_id or "").partition("-")
+    return int(value) if prefix == "file" and value.isdigit() else None
+
+
+def _job_task_id(job_id: int) -> str:
+    """Task ID under which processing steps applied from batch *job_id* are logged."""
+    return f"llm-batch-{job_id}"
+
+
+def _backend_for(kind: str) -> BatchBackend:
+    """Return the backend new *kind* batches are submitted to.
+
+    Embeddings always use the OpenAI credentials, as ``generate_embedding``
+    does.  Metadata requests go through ``AI_PROVIDER``, so they only use the
+    OpenAI Batch API when that provider is ``openai``.
+    """
+    provider = (getattr(settings, "ai_provider", None) or "openai").lower()
+    if kind == KIND_METADATA and provider != "openai":
+        logger.info("AI provider '%s' has no batch API; running the metadata batch locally", provider)
+        return get_batch_backend(LocalBatchBackend.name)
+    return get_batch_backend()
+
+
+def _submit(kind: str, endpoint: str, requests: list[tuple[int, dict[str, Any]]]) -> Optional[int]:
+    """Write *requests* to JSONL, submit them and record the job; return its ID."""
+    if not requests:
+        return None
+    backend = _backend_for(kind)
+    tmp_dir = os.path.join(settings.workdir, "tmp")
+    os.makedirs(tmp_dir, exist_ok=True)
+    handle, input_path = tempfile.mkstemp(prefix=f"llm_batch_{kind}_", suffix=".jsonl", dir=tmp_dir)
+    os.close(handle)
+    try:
+        write_jsonl(input_path, (batch_request(_custom_id(file_id), endpoint, body) for file_id, body in requests))
+        batch_id = backend.submit(input_path, endpoint)
+    finally:
+        os.remove(input_path)
+
+    with SessionLocal() as db:
+        job = LLMBatchJob(
+            kind=kind,
+            backend=backend.name,
+            endpoint=endpoint,
+            batch_id=batch_id,
+            status=STATUS_SUBMITTED,
+            file_ids=json.dumps([file_id for file_id, _ in requests]),
+            request_count=len(requests),
+        )
+        db.add(job)
+        db.commit()
+        logger.info("Submitted %s batch %s (%s) with %d request(s)", kind, job.id, batch_id, len(requests))
+        return job.id
+
+
+def submit_metadata_batch(records: list[FileRecord]) -> Optional[int]:
+    """Submit metadata extraction for *records* as one batch; return the job ID."""
+    from app.tasks.extract_metadata_with_gpt import _sample_text_for_metadata, build_metadata_messages
+    from app.utils.ai_provider import _resolve_temperature
+
+    model = settings.ai_model or settings.openai_model
+    temperature = _resolve_temperature(model, 0)
+    requests = []
+    for record in records:
+        metadata_text, _original, _sampled = _sample_text_for_metadata(
+            record.ocr_text, model, settings.metadata_max_input_tokens
+        )
+        body: dict[str, Any] = {"model": model, "messages": build_metadata_messages(metadata_text)}
+        if temperature is not None:
+            body["temperature"] = temperature
+        requests.append((record.id, body))
+    return _submit(KIND_METADATA, CHAT_ENDPOINT, requests)
+
+
+def submit_embedding_batch(records: list[FileRecord]) -> Optional[int]:
+    """Submit embeddings for *records* as one batch; return the job ID."""
+    from app.utils.similarity import _truncate_text_for_embedding
+
+    model = settings.embedding_model
+    requests = [
+        (
+            record.id,
+            {
+                "model": model,
+                "input": _truncate_text_for_embedding(record.ocr_text, model, settings.embedding_max_tokens),
+                "encoding_format": "base64",
+            },
+        )
+        for record in records
+    ]
+    return _submit(KIND_EMBEDDING, EMBEDDINGS_ENDPOINT, requests)
+
+
+def _apply_metadata(task_id: str, file_id: int, result: dict[str, Any]) -> Optional[bool]:
+    """Continue the pipeline for one metadata result; ``None`` means skipped."""
+    from app.tasks.embed_metadata_into_pdf import embed_metadata_into_pdf
+    from app.tasks.extract_metadata_with_gpt import parse_metadata_response
+
+    with SessionLocal() as db:
+        record = db.query(FileRecord).filter(FileRecord.id == file_id).first()
+        if record is None or record.ai_metadata:
+            return None
+        filename = record.local_filename or record.original_filename or f"file_{record.id}"
+        ocr_text = record.ocr_text
+    content = result_content(result)
+    if content is None:
+        error = result_error(result)
+        logger.warning("Batch metadata request for file %s failed: %s", file_id, error)
+        log_task_progress(
+            task_id, "extract_metadata_with_gpt", "failure", f"Batch request failed: {error}", file_id=file_id
+        )
+        return False
+    try:
+        metadata = parse_metadata_response(content)
+    except ValueError:
+        metadata = None
+    if metadata is None:
+        logger.warning("Batch metadata response for file %s contained no valid JSON", file_id)
+        log_task_progress(
+            task_id,
+            "extract_metadata_with_gpt",
+            "failure",
+            "Invalid JSON in response",
+            file_id=file_id,
+            detail=f"Could not parse valid JSON from the batch response.\nRaw response:\n{content}",
+        )
+        return False
+    log_task_progress(
+        task_id, "extract_metadata_with_gpt", "success", "Metadata extracted, queuing embed task", file_id=file_id
+    )
+    embed_metadata_into_pdf.delay(filename, ocr_text, metadata, file_id)
+    return True
+
+
+def _apply_embedding(task_id: str, file_id: int, result: dict[str, Any]) -> Optional[bool]:
+    """Store one embedding result and queue vector indexing; ``None`` means skipped."""
+    from app.tasks.compute_embedding import _queue_vector_index
+    from app.utils.step_manager import update_step_status
+
+    vector = result_embedding(result)
+    if not vector:
+        logger.warning("Batch embedding request for file %s failed: %s", file_id, result_error(result))
+        return False
+    with SessionLocal() as db:
+        record = db.query(FileRecord).filter(FileRecord.id == file_id).first()
+        if record is None or record.embedding:
+            return None
+        record.embedding = json.dumps(vector)
+        db.commit()
+        update_step_status(db, file_id, "compute_embedding", "success", completed_at=datetime.now(timezone.utc))
+    _queue_vector_index(file_id)
+    return True
+
+
+_APPLIERS: dict[str, Callable[[str, int, dict[str, Any]], Optional[bool]]] = {
+    KIND_METADATA: _apply_metadata,
+    KIND_EMBEDDING: _apply_embedding,
+}
+
+
+def _claim(job_id: int) -> bool:
+    """Move a job to ``applying`` unless another poller already did (or holds a fresh claim)."""
+    stale_before = datetime.now(timezone.utc) - _STALE_CLAIM_AFTER
+    with SessionLocal() as db:
+        claimed = (
+            db.query(LLMBatchJob)
+            .filter(
+                LLMBatchJob.id == job_id,
+                (LLMBatchJob.status == STATUS_SUBMITTED)
+                | ((LLMBatchJob.status == STATUS_APPLYING) & (LLMBatchJob.updated_at < stale_before)),
+            )
+            .update(
+                {LLMBatchJob.status: STATUS_APPLYING, LLMBatchJob.updated_at: datetime.now(timezone.utc)},
+                synchronize_session=False,
+            )
+        )
+        db.commit()
+        return claimed == 1
+
+
+def _finish(job_id: int, status: str, **values: Any) -> None:
+    with SessionLocal() as db:
+        db.query(LLMBatchJob).filter(LLMBatchJob.id == job_id).update(
+            {"status": status, "completed_at": datetime.now(timezone.utc), **values},
+            synchronize_session=False,
+        )
+        db.commit()
+
+
+def _apply_results(job_id: int, kind: str, results: list[dict[str, Any]]) -> tuple[int, int]:
+    apply = _APPLIERS[kind]
+    succeeded = failed = 0
+    for result in results:
+        file_id = _file_id(result.get("custom_id"))
+        if file_id is None:
+            failed += 1
+            continue
+        try:
+            outcome = apply(_job_task_id(job_id), file_id, result)
+        except Exception:  # noqa: BLE001 - one document must not block the rest of the batch
+            logger.exception("Applying %s batch %s result for file %s failed", kind, job_id, file_id)
+            outcome = False
+        if outcome is True:
+            succeeded += 1
+        elif outcome is False:
+            failed += 1
+    return succeeded, failed
+
+
+@celery.task(name="app.tasks.llm_batch_tasks.poll_llm_batches")
+def poll_llm_batches() -> dict:
+    """Poll outstanding batch jobs and fan completed results into the pipeline.
+
+    Returns:
+        A summary dict with ``applied``, ``failed`` and ``pending`` job counts.
+    """
+    stale_before = datetime.now(timezone.utc) - _STALE_CLAIM_AFTER
+    with SessionLocal() as db:
+        jobs = [
+            (job.id, job.kind, job.backend, job.batch_id)
+            for job in db.query(LLMBatchJob)
+            .filter(
+                (LLMBatchJob.status == STATUS_SUBMITTED)
+                | ((LLMBatchJob.status == STATUS_APPLYING) & (LLMBatchJob.updated_at < stale_before))
+            )
+            .order_by(LLMBatchJob.id)
+        ]
+
+    summary = {"applied": 0, "failed": 0, "pending": 0}
+    for job_id, kind, backend_name, batch_id in jobs:
+        try:
+            poll = get_batch_backend(backend_name).poll(batch_id)
+        except Exception as exc:  # noqa: BLE001 - transient provider errors are retried next run
+            logger.warning("Polling %s batch %s (%s) failed: %s", kind, job_id, batch_id, exc)
+            summary["pending"] += 1
+            continue
+
+        if poll.status in TERMINAL_FAILURE_STATES:
+            logger.error("%s batch %s (%s) ended as %s: %s", kind, job_id, batch_id, poll.status, poll.error)
+            _finish(job_id, STATUS_FAILED, error=f"{poll.status}: {poll.error or 'no details'}")
+            summary["failed"] += 1
+            continue
+        if poll.status != "completed":
+            summary["pending"] += 1
+            continue
+        if not _claim(job_id):
+            continue
+
+        succeeded, failed = _apply_results(job_id, kind, poll.results)
+        _finish(job_id, STATUS_APPLIED, succeeded_count=succeeded, failed_count=failed)
+        logger.info("Applied %s batch %s: %d succeeded, %d failed", kind, job_id, succeeded, failed)
+        summary["applied"] += 1
+    return summary
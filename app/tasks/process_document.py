@@ -19,7 +19,9 @@ from app.models import DocumentIntake, DropboxImportObject, FileRecord, Pipeline
 from app.tasks.extract_metadata_with_gpt import extract_metadata_with_gpt
 from app.tasks.process_with_ocr import process_with_ocr
 from app.tasks.retry_config import BaseTaskWithRetry
-from app.utils import get_unique_filepath_with_counter, hash_file, log_task_progress
+from app.utils import get_unique_filepath_with_counter, log_task_progress
+from app.utils.file_operations import hash_file_with_content_hash
+from app.utils.llm_cache import llm_cache_file
 from app.utils.pdf_security import (
     ENCRYPTED_PDF_ERROR_CODE,
     ENCRYPTED_PDF_MESSAGE,
@@ -29,6 +31,7 @@ from app.utils.pdf_security import (
 from app.utils.routing_engine import evaluate_pre_processing_routing_rules
 from app.utils.step_manager import initialize_file_steps
 from app.utils.text_quality import check_text_quality, detect_pdf_text_source
+from app.utils.usage_counters import adjust_usage
 from app.utils.workflow_plan import snapshot_workflow_plan, workflow_stage_keys
 
 if TYPE_CHECKING:
@@ -405,10 +408,10 @@ def process_document(
     if settings.enable_deduplication:
         logger.info(f"[{task_id}] Computing file hash for deduplication check...")
         log_task_progress(task_id, "check_for_duplicates", "in_progress", "Computing file hash for deduplication")
-        filehash = hash_file(original_local_file)
+        filehash, content_hash = hash_file_with_content_hash(original_local_file)
     else:
         logger.info(f"[{task_id}] Computing file hash (deduplication disabled)...")
-        filehash = hash_file(original_local_file)
+        filehash, content_hash = hash_file_with_content_hash(original_local_file)
 
     # Use provided original_filename or fall back to basename of path
     if original_filename is None:
@@ -475,6 +478,7 @@ def process_document(
                 tenant_id, tribe_id = ensure_document_scope(db, owner_id)
                 duplicate_record = FileRecord(
                     filehash=filehash,
+                    content_hash=content_hash,
                     original_filename=original_filename,
                     local_filename="",
                     file_size=file_size,
@@ -537,6 +541,7 @@ def process_document(
             tenant_id, tribe_id = ensure_document_scope(db, owner_id)
             new_record = FileRecord(
                 filehash=filehash,
+                content_hash=content_hash,
                 original_filename=original_filename,
                 local_filename="",  # Will fill in after we move it
                 file_size=file_size,
@@ -547,6 +552,7 @@ def process_document(
                 tribe_id=tribe_id,
             )
             db.add(new_record)
+            adjust_usage(db, owner_id)
             db.commit()
             db.refresh(new_record)
             logger.info(f"[{task_id}] File record created with ID: {new_record.id}")
@@ -860,7 +866,8 @@ def process_document(
             text_source = detect_pdf_text_source(new_local_path)
             logger.info(f"[{task_id}] Detected PDF text source: {text_source.value}")
 
-            quality_result = check_text_quality(extracted_text, text_source)
+            with llm_cache_file(file_id):
+                quality_result = check_text_quality(extracted_text, text_source)
             logger.info(
                 f"[{task_id}] Text quality check result: "
                 f"good={quality_result.is_good_quality}, score={quality_result.quality_score}, "
@@ -17,6 +17,9 @@ task with a multi-engine OCR pipeline that:
 
 import logging
 import os
+import time
+
+import pypdf
 
 from app.celery_app import celery
 from app.config import settings
@@ -25,12 +28,22 @@ from app.models import FileRecord
 from app.tasks.retry_config import OcrTaskWithRetry
 from app.tasks.rotate_pdf_pages import rotate_pdf_pages
 from app.utils import log_task_progress
+from app.utils.llm_cache import llm_cache_file
+from app.utils.metrics import metrics_enabled, record_ocr
 from app.utils.ocr_provider import OCRResult, embed_text_layer, get_ocr_providers, merge_ocr_results
 from app.utils.text_quality import TextSource, check_text_quality, compare_text_quality
 
 logger = logging.getLogger(__name__)
 
 
+def _pdf_page_count(path: str) -> int | None:
+    """Return the page count of *path* for the OCR throughput metric, if it is a PDF."""
+    try:
+        return len(pypdf.PdfReader(path).pages)
+    except Exception:  # noqa: BLE001
+        return None
+
+
 def _remove_index_only_ocr_artifacts(*paths: str | None) -> None:
     """Remove only OCR artifacts created inside DocuElevate's tmp directory."""
     tmp_root = os.path.realpath(os.path.join(settings.workdir, "tmp"))
@@ -182,11 +195,14 @@ def process_with_ocr(
 
         results = []
         errors = []
+        page_count = _pdf_page_count(tmp_file_path) if metrics_enabled() else None
         for provider in providers:
             pname = provider.__class__.__name__
             try:
                 logger.info(f"[{task_id}] Running {pname} on {filename}")
+                started = time.perf_counter()
                 result: OCRResult = provider.process(tmp_file_path)
+                record_ocr(provider.name, page_count, time.perf_counter() - started)
                 results.append(result)
                 logger.info(f"[{task_id}] {pname} extracted {len(result.text)} chars")
             except Exception as exc:
@@ -217,7 +233,8 @@ def process_with_ocr(
         )
 
         # Merge results (no-op when only one provider succeeded)
-        extracted_text, searchable_pdf_path, rotation_data = merge_ocr_results(results, filename)
+        with llm_cache_file(file_id):
+            extracted_text, searchable_pdf_path, rotation_data = merge_ocr_results(results, filename)
         logger.info(
             f"[{task_id}] Merged OCR text: {len(extracted_text)} chars, "
             f"pdf={'yes' if searchable_pdf_path else 'no'}, "
@@ -297,7 +314,8 @@ def process_with_ocr(
                 file_id=file_id,
             )
             try:
-                comparison = compare_text_quality(original_text, extracted_text)
+                with llm_cache_file(file_id):
+                    comparison = compare_text_quality(original_text, extracted_text)
                 comparison_detail = (
                     f"Original score: {comparison.original_score}/100, "
                     f"OCR score: {comparison.ocr_score}/100, "
@@ -386,7 +404,8 @@ def process_with_ocr(
         # so the quality AI call is always made.
         if file_id is not None:
             try:
-                quality_result = check_text_quality(final_text, TextSource.OCR_PREVIOUS)
+                with llm_cache_file(file_id):
+                    quality_result = check_text_quality(final_text, TextSource.OCR_PREVIOUS)
                 logger.info(
                     f"[{task_id}] Final text quality: score={quality_result.quality_score}/100, "
                     f"good={quality_result.is_good_quality}, feedback={quality_result.feedback!r}"
@@ -8,6 +8,7 @@ from app.config import settings
 from app.tasks.retry_config import BaseTaskWithRetry
 from app.utils import log_task_progress
 from app.utils.ai_provider import get_ai_provider
+from app.utils.llm_cache import cached_chat_completion
 
 logger = logging.getLogger(__name__)
 
@@ -24,7 +25,9 @@ def refine_text_with_gpt(self, filename: str, raw_text: str):
 
         provider = get_ai_provider()
         model = settings.ai_model or settings.openai_model
-        cleaned_text = provider.chat_completion(
+        cleaned_text = cached_chat_completion(
+            provider,
+            "refine_text",
             messages=[
                 {
                     "role": "system",
@@ -0,0 +1,35 @@
+"""Housekeeping for resumable document intake uploads."""
+
+import logging
+import os
+from datetime import datetime, timezone
+
+from app.celery_app import celery
+from app.database import SessionLocal
+from app.models import ResumableUpload
+
+logger = logging.getLogger(__name__)
+
+
+@celery.task(name="app.tasks.resumable_uploads.cleanup_expired_resumable_uploads")
+def cleanup_expired_resumable_uploads() -> dict[str, int]:
+    """Delete expired uploads and their partial files.
+
+    Finished uploads only lose the record that answers a retried finalize.
+    Claiming an upload for finalize renews its expiry, so one still
+    ``finalizing`` after it expired was abandoned by a crashed worker and is
+    reclaimed like any other.
+    """
+    now = datetime.now(timezone.utc)
+    with SessionLocal() as db:
+        expired = db.query(ResumableUpload).filter(ResumableUpload.expires_at < now).all()
+        for upload in expired:
+            try:
+                os.remove(upload.local_path)
+            except FileNotFoundError:
+                pass
+            except OSError as exc:
+                logger.warning("Could not delete partial upload %s: %s", upload.local_path, exc)
+            db.delete(upload)
+        db.commit()
+    return {"deleted": len(expired)}
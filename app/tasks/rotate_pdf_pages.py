@@ -2,13 +2,12 @@ import json
 import logging
 import os
 
-import pypdf
-
 from app.celery_app import celery
 from app.config import settings
 from app.tasks.extract_metadata_with_gpt import extract_metadata_with_gpt
 from app.tasks.retry_config import BaseTaskWithRetry
 from app.utils import log_task_progress
+from app.utils.pdf_edit import apply_pdf_edits
 
 logger = logging.getLogger(__name__)
 
@@ -116,41 +115,31 @@ def rotate_pdf_pages(self, filename: str, extracted_text: str, rotation_data=Non
             f"Rotating {len(normalized_rotation_data)} pages",
             file_id=file_id,
         )
+        # Collect the page rotations, then apply them in a single pass that
+        # appends an incremental update instead of rewriting every page.
+        rotations = {}
+        for page_idx, detected_angle in sorted(normalized_rotation_data.items()):
+            if abs(detected_angle) == 0:
+                continue
+            rotation_angle = determine_rotation_angle(detected_angle)
+            if rotation_angle > 0:
+                rotations[page_idx] = rotation_angle
+            else:
+                logger.info(
+                    f"[{task_id}] Page {page_idx + 1} had detected angle {detected_angle}° "
+                    "but determined it doesn't need rotation"
+                )
+
+        edit_result = apply_pdf_edits(pdf_path, rotations=rotations, update_xmp=False) if rotations else None
         applied_rotations = {}
-
-        # Load the PDF
-        with open(pdf_path, "rb") as file:
-            pdf_reader = pypdf.PdfReader(file)
-            pdf_writer = pypdf.PdfWriter()
-
-            # Process each page
-            for page_idx in range(len(pdf_reader.pages)):
-                page = pdf_reader.pages[page_idx]
-
-                # Apply rotation if this page has rotation data
-                if page_idx in normalized_rotation_data and abs(normalized_rotation_data[page_idx]) > 0:
-                    detected_angle = normalized_rotation_data[page_idx]
-                    rotation_angle = determine_rotation_angle(detected_angle)
-
-                    if rotation_angle > 0:
-                        # pypdf uses clockwise rotation in 90-degree increments
-                        page.rotate(rotation_angle)
-                        logger.info(
-                            f"[{task_id}] Page {page_idx + 1} rotated by {rotation_angle}° "
-                            f"(from detected {detected_angle}°)"
-                        )
-                        applied_rotations[str(page_idx)] = rotation_angle
-                    else:
-                        logger.info(
-                            f"[{task_id}] Page {page_idx + 1} had detected angle {detected_angle}° "
-                            "but determined it doesn't need rotation"
-                        )
-
-                pdf_writer.add_page(page)
-
-            # Save the rotated PDF
-            with open(pdf_path, "wb") as output_file:
-                pdf_writer.write(output_file)
+        if edit_result is not None:
+            for page_idx, rotation_angle in edit_result.applied_rotations.items():
+                logger.info(
+                    f"[{task_id}] Page {page_idx + 1} rotated by {rotation_angle}° "
+                    f"(from detected {normalized_rotation_data[page_idx]}°)"
+                )
+                applied_rotations[str(page_idx)] = rotation_angle
+            logger.info(f"[{task_id}] PDF edit for {filename}: {json.dumps(edit_result.as_detail())}")
 
         if applied_rotations:
             logger.info(
@@ -162,7 +151,10 @@ def rotate_pdf_pages(self, filename: str, extracted_text: str, rotation_data=Non
                 "(angles too small or not multiples of 90°)"
             )
 
-        rotation_detail = json.dumps({"applied_rotations": applied_rotations})
+        rotation_summary = {"applied_rotations": applied_rotations}
+        if edit_result is not None:
+            rotation_summary["pdf_edit"] = edit_result.as_detail()
+        rotation_detail = json.dumps(rotation_summary)
         log_task_progress(
             task_id,
             "apply_rotation",
@@ -2,6 +2,15 @@
 
 import logging
 import os
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+from celery.exceptions import Retry
 
 from app.celery_app import celery
 from app.config import settings
@@ -23,6 +32,7 @@ from app.tasks.upload_to_sharepoint import upload_to_sharepoint
 from app.tasks.upload_to_webdav import upload_to_webdav
 from app.utils.config_validator import get_provider_status
 from app.utils.logging import log_task_progress
+from app.utils.step_manager import update_step_status
 
 logger = logging.getLogger(__name__)
 
@@ -173,6 +183,207 @@ def get_configured_services_from_validator():
     return result
 
 
+#: Spool location used when ``DISTRIBUTION_SPOOL_DIR`` is unset and tmpfs is available.
+SHM_DIR = "/dev/shm"  # noqa: S108 - only the default; a private mkdtemp directory is used inside it
+
+#: Destinations that mirror the file's work-directory folders remotely; they are told the
+#: original path when reading a spooled copy.
+REMOTE_PATH_DESTINATIONS = frozenset({"dropbox", "nextcloud", "sftp"})
+
+_slots_lock = threading.Lock()
+_destination_slots: dict[str, tuple[int, threading.BoundedSemaphore]] = {}
+
+
+def distribution_concurrency() -> int:
+    """Return how many destinations one distribution task uploads to at once (0 = queue a task each)."""
+    value = getattr(settings, "distribution_concurrency", 0)
+    return value if isinstance(value, int) and not isinstance(value, bool) and value > 0 else 0
+
+
+def parse_destination_limits(spec: str) -> dict[str, int]:
+    """Parse ``DISTRIBUTION_DESTINATION_LIMITS`` (e.g. ``"email=1,sftp=2"``) into ``{destination: limit}``.
+
+    Malformed entries and limits below 1 are skipped with a warning.
+    """
+    limits: dict[str, int] = {}
+    for raw in (spec or "").split(","):
+        entry = raw.strip()
+        if not entry:
+            continue
+        name, _, value = entry.partition("=")
+        try:
+            limit = int(value)
+        except ValueError:
+            limit = 0
+        if not name.strip() or limit < 1:
+            logger.warning("Ignoring invalid DISTRIBUTION_DESTINATION_LIMITS entry %r", entry)
+            continue
+        limits[name.strip().lower()] = limit
+    return limits
+
+
+def _destination_slot(service_name: str) -> threading.BoundedSemaphore | None:
+    """Return the semaphore capping concurrent uploads to *service_name* in this process, if it is limited."""
+    spec = getattr(settings, "distribution_destination_limits", "")
+    limit = parse_destination_limits(spec if isinstance(spec, str) else "").get(service_name)
+    if limit is None:
+        return None
+    with _slots_lock:
+        slot = _destination_slots.get(service_name)
+        if slot is None or slot[0] != limit:
+            slot = (limit, threading.BoundedSemaphore(limit))
+            _destination_slots[service_name] = slot
+        return slot[1]
+
+
+def _spool_root() -> str:
+    configured = getattr(settings, "distribution_spool_dir", None)
+    if isinstance(configured, str) and configured:
+        return configured
+    return SHM_DIR if os.path.isdir(SHM_DIR) else tempfile.gettempdir()
+
+
+def _spool_file(file_path: str) -> tuple[str, str | None]:
+    """Copy *file_path* and its ``<stem>.json`` metadata sidecar into a private spool directory.
+
+    Every destination then reads the same local copy instead of the work
+    directory, which may be network storage.
+
+    Returns:
+        ``(path to read, spool directory to remove)``.  When the spool has
+        less than twice the file size free or cannot be written, the
+        original path is returned with ``None``.
+    """
+    root = _spool_root()
+    sidecar = os.path.splitext(file_path)[0] + ".json"
+    files = [file_path] + ([sidecar] if os.path.exists(sidecar) else [])
+    try:
+        size = sum(os.path.getsize(path) for path in files)
+        if shutil.disk_usage(root).free < 2 * size:
+            logger.info("Not enough space in %s to spool %s, reading it in place", root, file_path)
+            return file_path, None
+        spool_dir = tempfile.mkdtemp(prefix="docuelevate-spool-", dir=root)
+    except OSError as exc:
+        logger.warning("Cannot spool %s in %s, reading it in place: %s", file_path, root, exc)
+        return file_path, None
+    try:
+        for path in files:
+            shutil.copyfile(path, os.path.join(spool_dir, os.path.basename(path)))
+    except OSError as exc:
+        shutil.rmtree(spool_dir, ignore_errors=True)
+        logger.warning("Cannot spool %s in %s, reading it in place: %s", file_path, root, exc)
+        return file_path, None
+    return os.path.join(spool_dir, os.path.basename(file_path)), spool_dir
+
+
+def _upload_once(upload_task, upload_id: str, spooled_path: str, file_path: str, kwargs: dict, parent_id: str | None):
+    """Run one attempt of *upload_task* in the calling thread, reading *spooled_path*.
+
+    The request context is that of a worker-delivered task for the original
+    *file_path*, so a failed attempt goes through Celery's normal retry: the
+    task is queued on its own for *file_path* with the usual backoff and
+    retry count, and :class:`celery.exceptions.Retry` is raised here.
+    """
+    upload_task.push_request(
+        id=upload_id,
+        args=[file_path],
+        kwargs=kwargs,
+        retries=0,
+        called_directly=False,
+        is_eager=False,
+        parent_id=parent_id,
+        root_id=parent_id,
+    )
+    try:
+        return upload_task.run(spooled_path, **kwargs)
+    finally:
+        upload_task.pop_request()
+
+
+def _upload_to_destination(
+    task_id: str | None,
+    spooled_path: str,
+    file_path: str,
+    file_id: int | None,
+    service_name: str,
+    upload_task,
+    kwargs: dict,
+) -> dict:
+    """Upload to one destination once its slot is free and record the attempt's timing on its step."""
+    upload_id = str(uuid.uuid4())
+    slot = _destination_slot(service_name)
+    if slot is not None:
+        slot.acquire()
+    started_at = datetime.now(timezone.utc)
+    started = time.monotonic()
+    error = None
+    try:
+        _upload_once(upload_task, upload_id, spooled_path, file_path, kwargs, task_id)
+        status = "success"
+    except Retry as retry:
+        status, error = "pending", f"Retry queued: {retry.exc or retry}"
+    except Exception as exc:  # noqa: BLE001 - one destination must not stop the others
+        status, error = "failure", str(exc)
+    finally:
+        if slot is not None:
+            slot.release()
+    seconds = round(time.monotonic() - started, 3)
+    logger.info(f"[{task_id}] Upload to {service_name}: {status} after {seconds:.2f}s")
+
+    if file_id is not None:
+        try:
+            with SessionLocal() as db:
+                update_step_status(
+                    db,
+                    file_id,
+                    f"upload_to_{service_name}",
+                    status,
+                    error_message=error,
+                    started_at=started_at,
+                    completed_at=None if status == "pending" else datetime.now(timezone.utc),
+                )
+        except Exception as exc:  # noqa: BLE001
+            logger.warning(f"[{task_id}] Could not record timing for {service_name}: {exc}")
+
+    outcome = {"task_id": upload_id, "status": "retrying" if status == "pending" else status, "seconds": seconds}
+    if error:
+        outcome["error"] = error
+    return outcome
+
+
+def _distribute_in_process(
+    task_id: str | None, file_path: str, file_id: int | None, uploads: list[tuple], concurrency: int
+) -> dict[str, dict]:
+    """Upload *file_path* to every ``(service_name, upload_task, kwargs)`` in *uploads* from this task.
+
+    The file is spooled once and up to *concurrency* destinations upload at
+    the same time, each also bounded by its ``DISTRIBUTION_DESTINATION_LIMITS``
+    cap.  Returns the outcome of each destination.
+    """
+    if not uploads:
+        return {}
+    spooled_path, spool_dir = _spool_file(file_path)
+    try:
+        with ThreadPoolExecutor(max_workers=min(concurrency, len(uploads)), thread_name_prefix="distribute") as pool:
+            futures = {
+                service_name: pool.submit(
+                    _upload_to_destination,
+                    task_id,
+                    spooled_path,
+                    file_path,
+                    file_id,
+                    service_name,
+                    upload_task,
+                    kwargs,
+                )
+                for service_name, upload_task, kwargs in uploads
+            }
+        return {service_name: future.result() for service_name, future in futures.items()}
+    finally:
+        if spool_dir:
+            shutil.rmtree(spool_dir, ignore_errors=True)
+
+
 @celery.task(base=BaseTaskWithRetry, bind=True)
 def send_to_all_destinations(self, file_path: str, use_validator=True, file_id: int = None, folder_overrides=None):
     """
@@ -187,6 +398,11 @@ def send_to_all_destinations(self, file_path: str, use_validator=True, file_id:
                           When set, the override is passed to the upload task which uses it
                           instead of the provider's default folder.  Example:
                           {"dropbox": "/Documents/pdfa", "s3": "docs/pdfa/"}
+
+    With ``DISTRIBUTION_CONCURRENCY`` at 0 (the default) one upload task is
+    queued per destination.  Above 0 this task spools the file once and
+    uploads to the destinations itself, that many at a time; a destination
+    that fails is queued on its own to retry with the usual backoff.
     """
     task_id = self.request.id
 
@@ -299,6 +515,8 @@ def send_to_all_destinations(self, file_path: str, use_validator=True, file_id:
             use_validator = False
 
     # Process each service
+    concurrency = distribution_concurrency()
+    in_process: list[tuple] = []
     queued_count = 0
     for service in services:
         service_name = service["name"]
@@ -316,8 +534,18 @@ def send_to_all_destinations(self, file_path: str, use_validator=True, file_id:
                 logger.error(f"[{task_id}] Error checking configuration for {service_name}: {str(e)}")
                 is_configured = False
 
+        if is_configured and concurrency:
+            kwargs = {"file_id": file_id}
+            if folder_overrides and service_name in folder_overrides:
+                kwargs["folder_override"] = folder_overrides[service_name]
+            if service_name in REMOTE_PATH_DESTINATIONS:
+                kwargs["remote_source_path"] = file_path
+            in_process.append((service_name, service["upload_func"], kwargs))
+            log_task_progress(
+                task_id, f"queue_{service_name}", "success", "Uploading from the distribution task", file_id=file_id
+            )
         # Queue the upload task if service is configured
-        if is_configured:
+        elif is_configured:
             logger.info(f"[{task_id}] Queueing {file_path} for {service_name} upload")
             log_task_progress(
                 task_id, f"queue_{service_name}", "in_progress", f"Queueing upload to {service_name}", file_id=file_id
@@ -337,6 +565,21 @@ def send_to_all_destinations(self, file_path: str, use_validator=True, file_id:
                 results[f"{service_name}_error"] = str(e)
                 log_task_progress(task_id, f"queue_{service_name}", "failure", f"Failed: {str(e)}", file_id=file_id)
 
+    if concurrency:
+        destinations = _distribute_in_process(task_id, file_path, file_id, in_process, concurrency)
+        for service_name, outcome in destinations.items():
+            results[f"{service_name}_task_id"] = outcome["task_id"]
+        uploaded = sum(1 for outcome in destinations.values() if outcome["status"] == "success")
+        logger.info(f"[{task_id}] Uploaded to {uploaded} of {len(destinations)} destinations")
+        log_task_progress(
+            task_id,
+            "send_to_all_destinations",
+            "success",
+            f"Uploaded to {uploaded} of {len(destinations)} destinations",
+            file_id=file_id,
+        )
+        return {"status": "Completed", "file_path": file_path, "tasks": results, "destinations": destinations}
+
     logger.info(f"[{task_id}] Queued {queued_count} upload tasks")
     log_task_progress(task_id, "send_to_all_destinations", "success", f"Queued {queued_count} uploads", file_id=file_id)
 
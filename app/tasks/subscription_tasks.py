@@ -48,3 +48,35 @@ def apply_pending_subscription_changes_all() -> dict[str, int]:
 
     logger.info("apply_pending_subscription_changes_all: checked=%d applied=%d", checked, applied)
     return {"checked": checked, "applied": applied}
+
+
+@celery.task(name="app.tasks.subscription_tasks.reconcile_usage_counters")
+def reconcile_usage_counters() -> dict[str, int]:
+    """Correct drift in the materialised usage counters used for quota checks.
+
+    Recomputes every owner's counters from ``FileRecord`` via
+    :func:`app.utils.usage_counters.reconcile_usage_counters`.
+
+    Returns:
+        A dict with ``{"owners": <count>, "corrected": <count>, "pruned": <count>}``.
+    """
+    from app.database import SessionLocal
+    from app.utils.usage_counters import reconcile_usage_counters as reconcile
+
+    db = SessionLocal()
+    try:
+        result = reconcile(db)
+    except Exception as exc:
+        db.rollback()
+        logger.error("Error in reconcile_usage_counters: %s", exc)
+        result = {"owners": 0, "corrected": 0, "pruned": 0}
+    finally:
+        db.close()
+
+    logger.info(
+        "reconcile_usage_counters: owners=%d corrected=%d pruned=%d",
+        result["owners"],
+        result["corrected"],
+        result["pruned"],
+    )
+    return result
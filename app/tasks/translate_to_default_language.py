@@ -19,6 +19,7 @@ from app.models import FileRecord, UserProfile
 from app.tasks.retry_config import BaseTaskWithRetry
 from app.utils import log_task_progress
 from app.utils.ai_provider import get_ai_provider
+from app.utils.llm_cache import cached_chat_completion
 
 logger = logging.getLogger(__name__)
 
@@ -86,7 +87,10 @@ def translate_to_default_language(
     try:
         provider = get_ai_provider()
         model = settings.ai_model or settings.openai_model
-        translated_text = provider.chat_completion(
+        translated_text = cached_chat_completion(
+            provider,
+            "translate",
+            file_id=file_id,
             messages=[
                 {
                     "role": "system",
@@ -104,13 +104,17 @@ def get_dropbox_client():
 
 
 @celery.task(base=UploadTaskWithRetry, bind=True)
-def upload_to_dropbox(self, file_path: str, file_id: int = None, folder_override: str = None):
+def upload_to_dropbox(
+    self, file_path: str, file_id: int = None, folder_override: str = None, remote_source_path: str = None
+):
     """
     Upload a file to Dropbox.
 
     Args:
         file_path: Path to the file to upload
         file_id: Optional file ID to associate with logs
+        remote_source_path: Work-directory path the remote folder is derived from when
+            *file_path* is a spooled copy (defaults to *file_path*)
     """
     task_id = self.request.id
     logger.info(f"[{task_id}] Starting Dropbox upload: {file_path}")
@@ -149,7 +153,7 @@ def upload_to_dropbox(self, file_path: str, file_id: int = None, folder_override
 
         # Calculate remote path based on local file structure
         remote_base = folder_override if folder_override is not None else (settings.dropbox_folder or "")
-        remote_path = extract_remote_path(file_path, settings.workdir, remote_base)
+        remote_path = extract_remote_path(remote_source_path or file_path, settings.workdir, remote_base)
 
         # Get a unique path in case of collision
         remote_full_path = f"/{remote_path}"  # Dropbox paths should start with /
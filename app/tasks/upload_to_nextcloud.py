@@ -16,13 +16,17 @@ logger = logging.getLogger(__name__)
 
 
 @celery.task(base=UploadTaskWithRetry, bind=True)
-def upload_to_nextcloud(self, file_path: str, file_id: int = None, folder_override: str = None):
+def upload_to_nextcloud(
+    self, file_path: str, file_id: int = None, folder_override: str = None, remote_source_path: str = None
+):
     """
     Upload a file to Nextcloud WebDAV.
 
     Args:
         file_path: Path to the file to upload
         file_id: Optional file ID to associate with logs
+        remote_source_path: Work-directory path the remote folder is derived from when
+            *file_path* is a spooled copy (defaults to *file_path*)
     """
     task_id = self.request.id
     logger.info(f"[{task_id}] Starting Nextcloud upload: {file_path}")
@@ -63,7 +67,7 @@ def upload_to_nextcloud(self, file_path: str, file_id: int = None, folder_overri
         remote_base = (
             folder_override if folder_override is not None else (getattr(settings, "nextcloud_folder", "") or "")
         )
-        remote_path = extract_remote_path(file_path, settings.workdir, remote_base)
+        remote_path = extract_remote_path(remote_source_path or file_path, settings.workdir, remote_base)
         full_url = f"{webdav_url}/{remote_path}"
 
         # Remove any double slashes (except in http://)
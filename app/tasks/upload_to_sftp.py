@@ -15,13 +15,17 @@ logger = logging.getLogger(__name__)
 
 
 @celery.task(base=UploadTaskWithRetry, bind=True)
-def upload_to_sftp(self, file_path: str, file_id: int = None, folder_override: str = None):
+def upload_to_sftp(
+    self, file_path: str, file_id: int = None, folder_override: str = None, remote_source_path: str = None
+):
     """
     Upload a file to an SFTP server.
 
     Args:
         file_path: Path to the file to upload
         file_id: Optional file ID to associate with logs
+        remote_source_path: Work-directory path the remote folder is derived from when
+            *file_path* is a spooled copy (defaults to *file_path*)
     """
     task_id = self.request.id
     logger.info(f"[{task_id}] Starting SFTP upload: {file_path}")
@@ -96,7 +100,7 @@ def upload_to_sftp(self, file_path: str, file_id: int = None, folder_override: s
 
         # Calculate remote path based on local file structure
         remote_base = folder_override if folder_override is not None else (settings.sftp_folder or "")
-        remote_path = extract_remote_path(file_path, settings.workdir, remote_base)
+        remote_path = extract_remote_path(remote_source_path or file_path, settings.workdir, remote_base)
 
         # Ensure the remote path starts with a slash if the base folder does
         if remote_base.startswith("/") and not remote_path.startswith("/"):
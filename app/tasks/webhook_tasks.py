@@ -8,13 +8,17 @@ are automatically retried with exponential backoff (default: 60 s, 300 s,
 import json
 import logging
 from datetime import datetime, timezone
+from functools import partial
 from typing import Any
 
 from app.celery_app import celery
+from app.config import settings
 from app.database import SessionLocal
 from app.models import WebhookDeliveryAttempt
-from app.tasks.retry_config import BaseTaskWithRetry
-from app.utils.webhook import deliver_webhook_with_status
+from app.tasks.retry_config import BaseTaskWithRetry, compute_countdown
+from app.utils.webhook import WebhookThrottled, deliver_webhook_with_status
+from app.utils.webhook_batching import buffered_webhook_ids, discard_buffer, drain_buffer, flush_lock
+from app.utils.webhook_registry import registry
 
 logger = logging.getLogger(__name__)
 
@@ -71,6 +75,24 @@ def _record_delivery_attempt(
         db.close()
 
 
+def _delivery_limits(webhook_config_id: int | None) -> dict[str, int]:
+    """Return per-webhook ``max_concurrency``/``rate_limit_per_minute`` overrides."""
+    if webhook_config_id is None:
+        return {}
+    try:
+        config = registry.webhook_by_id(webhook_config_id)
+    except Exception:
+        logger.debug("Could not look up delivery limits for webhook %s", webhook_config_id, exc_info=True)
+        return {}
+    if not config:
+        return {}
+    return {
+        key: config[key]
+        for key in ("max_concurrency", "rate_limit_per_minute")
+        if isinstance(config.get(key), int) and not isinstance(config.get(key), bool)
+    }
+
+
 class WebhookDeliveryTask(BaseTaskWithRetry):
     """Retry policy plus dead-letter logging for outbound webhook delivery."""
 
@@ -141,7 +163,30 @@ def deliver_webhook_task(
         delivery_id=delivery_id,
     )
 
-    success, response_status = deliver_webhook_with_status(url, payload, secret)
+    try:
+        success, response_status = deliver_webhook_with_status(
+            url, payload, secret, **_delivery_limits(webhook_config_id)
+        )
+    except WebhookThrottled as exc:
+        # Come back when the endpoint has room instead of holding this worker,
+        # without spending one of the delivery's retries.
+        self.apply_async(
+            args=(url, payload, secret),
+            kwargs={"webhook_config_id": webhook_config_id, "delivery_id": persisted_id},
+            countdown=exc.retry_after,
+            retries=self.request.retries,
+        )
+        _record_delivery_attempt(
+            url=url,
+            payload=payload,
+            status="queued",
+            attempt_number=attempt_number,
+            task_id=task_id,
+            webhook_config_id=webhook_config_id,
+            delivery_id=persisted_id,
+        )
+        return {"status": "throttled", "url": url, "delivery_id": persisted_id}
+
     if success:
         _record_delivery_attempt(
             url=url,
@@ -167,3 +212,207 @@ def deliver_webhook_task(
         response_status=response_status,
     )
     raise RuntimeError(f"Webhook delivery to {url} failed")
+
+
+def _requeue_single_delivery(
+    url: str,
+    payload: dict[str, Any],
+    secret: str | None,
+    webhook_config_id: int | None,
+    delivery_id: int | None,
+    countdown: float | None = None,
+) -> None:
+    """Hand a failed or throttled batch item to :func:`deliver_webhook_task` for per-delivery retries."""
+    deliver_webhook_task.apply_async(
+        args=(url, payload, secret),
+        kwargs={"webhook_config_id": webhook_config_id, "delivery_id": delivery_id},
+        countdown=compute_countdown(0) if countdown is None else countdown,
+    )
+
+
+def _deliver_unless_throttled(
+    url: str, payload: dict[str, Any] | list[dict[str, Any]], secret: str | None, limits: dict[str, int]
+) -> tuple[bool, int | None, float | None]:
+    """Deliver *payload*; the last item is the retry delay when the endpoint is throttled."""
+    try:
+        success, response_status = deliver_webhook_with_status(url, payload, secret, **limits)
+    except WebhookThrottled as exc:
+        return False, None, exc.retry_after
+    return success, response_status, None
+
+
+@celery.task(bind=True, name="webhook.deliver_batch")
+def deliver_webhook_batch_task(
+    self,
+    url: str,
+    deliveries: list[dict[str, Any]],
+    secret: str | None = None,
+    batched: bool = False,
+) -> dict[str, Any]:
+    """Deliver several payloads to one endpoint from a single Celery message.
+
+    By default each delivery is POSTed separately, in order, over the pooled
+    keep-alive connection.  With *batched* set (webhooks that opted into
+    batch delivery) all payloads are sent as one JSON array.  Failed
+    deliveries are handed to :func:`deliver_webhook_task` with their
+    persisted attempt id, so retries, backoff and dead-lettering stay per
+    delivery.  Throttled deliveries come back once the endpoint has room; a
+    throttled array is re-queued whole.
+
+    Args:
+        url: Target webhook URL shared by all deliveries.
+        deliveries: Dicts with ``payload`` and optional ``webhook_config_id``
+            and ``delivery_id`` (the persisted attempt of a re-queued batch).
+        secret: Optional shared secret for HMAC-SHA256 signing.
+        batched: Send every payload in a single POST as a JSON array.
+
+    Returns:
+        A dict with the ``delivered`` and ``requeued`` counts.
+    """
+    task_id = getattr(self.request, "id", None)
+    attempts = [
+        (
+            delivery["payload"],
+            delivery.get("webhook_config_id"),
+            _record_delivery_attempt(
+                url=url,
+                payload=delivery["payload"],
+                status="running",
+                attempt_number=1,
+                task_id=task_id,
+                webhook_config_id=delivery.get("webhook_config_id"),
+                delivery_id=delivery.get("delivery_id"),
+            ),
+        )
+        for delivery in deliveries
+    ]
+    if not attempts:
+        return {"status": "completed", "url": url, "delivered": 0, "requeued": 0}
+    limits = _delivery_limits(attempts[0][1])
+
+    if batched:
+        result = _deliver_unless_throttled(url, [payload for payload, _, _ in attempts], secret, limits)
+        if result[2] is not None:
+            # Keep the array together: the whole batch comes back when the endpoint has room.
+            for payload, webhook_config_id, persisted_id in attempts:
+                _record_delivery_attempt(
+                    url=url,
+                    payload=payload,
+                    status="queued",
+                    attempt_number=1,
+                    task_id=task_id,
+                    webhook_config_id=webhook_config_id,
+                    delivery_id=persisted_id,
+                )
+            self.apply_async(
+                args=(
+                    url,
+                    [
+                        {"payload": payload, "webhook_config_id": webhook_config_id, "delivery_id": persisted_id}
+                        for payload, webhook_config_id, persisted_id in attempts
+                    ],
+                    secret,
+                ),
+                kwargs={"batched": True},
+                countdown=result[2],
+            )
+            return {"status": "throttled", "url": url, "delivered": 0, "requeued": len(attempts)}
+        results = [result] * len(attempts)
+    else:
+        results = [_deliver_unless_throttled(url, payload, secret, limits) for payload, _, _ in attempts]
+
+    delivered = 0
+    requeued = 0
+    for (payload, webhook_config_id, persisted_id), (success, response_status, retry_after) in zip(
+        attempts, results, strict=True
+    ):
+        if retry_after is not None:
+            _record_delivery_attempt(
+                url=url,
+                payload=payload,
+                status="queued",
+                attempt_number=1,
+                task_id=task_id,
+                webhook_config_id=webhook_config_id,
+                delivery_id=persisted_id,
+            )
+            _requeue_single_delivery(url, payload, secret, webhook_config_id, persisted_id, countdown=retry_after)
+            requeued += 1
+            continue
+        if success:
+            _record_delivery_attempt(
+                url=url,
+                payload=payload,
+                status="delivered",
+                attempt_number=1,
+                task_id=task_id,
+                webhook_config_id=webhook_config_id,
+                delivery_id=persisted_id,
+                response_status=response_status,
+            )
+            delivered += 1
+            continue
+
+        _record_delivery_attempt(
+            url=url,
+            payload=payload,
+            status="failed",
+            attempt_number=1,
+            task_id=task_id,
+            webhook_config_id=webhook_config_id,
+            delivery_id=persisted_id,
+            error=f"Webhook delivery to {url} failed",
+            response_status=response_status,
+        )
+        _requeue_single_delivery(url, payload, secret, webhook_config_id, persisted_id)
+        requeued += 1
+
+    logger.info("Webhook batch to %s: %d delivered, %d requeued for retry", url, delivered, requeued)
+    return {"status": "completed", "url": url, "delivered": delivered, "requeued": requeued}
+
+
+def _queue_buffered(webhook: dict[str, Any], payloads: list[dict[str, Any]]) -> None:
+    deliveries = [{"payload": payload, "webhook_config_id": webhook["id"]} for payload in payloads]
+    deliver_webhook_batch_task.delay(
+        webhook["url"], deliveries, webhook["secret"], batched=bool(webhook.get("batch_delivery"))
+    )
+
+
+@celery.task(name="webhook.flush_batches")
+def flush_webhook_batches() -> dict[str, int]:
+    """Drain buffered webhook events into batched deliveries.
+
+    Each buffer is drained in chunks of ``webhook_batch_max_size`` payloads;
+    every chunk becomes one ``webhook.deliver_batch`` message.  Webhooks with
+    batched delivery get a single JSON array, webhooks that switched back to
+    single deliveries get one POST per payload, and buffers of disabled or
+    deleted webhooks are discarded.
+
+    Returns:
+        A dict with the number of ``batches`` queued and ``events`` drained.
+    """
+    max_size = int(settings.webhook_batch_max_size)
+    batches = 0
+    events = 0
+    with flush_lock() as acquired:
+        if not acquired:
+            logger.info("Another flush is draining the webhook batch buffers; skipping")
+            return {"batches": 0, "events": 0}
+        for webhook_id in buffered_webhook_ids():
+            webhook = registry.webhook_by_id(webhook_id)
+            if webhook is None:
+                discarded = discard_buffer(webhook_id)
+                if discarded:
+                    logger.info("Discarded %d buffered event(s) of inactive webhook %s", discarded, webhook_id)
+                continue
+            while True:
+                drained = drain_buffer(webhook_id, max_size, partial(_queue_buffered, webhook))
+                if not drained:
+                    break
+                batches += 1
+                events += drained
+                if drained < max_size:
+                    break
+    if batches:
+        logger.info("Queued %d batched webhook delivery(ies) covering %d event(s)", batches, events)
+    return {"batches": batches, "events": events}
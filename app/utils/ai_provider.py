@@ -10,15 +10,24 @@ Provider selection is controlled by the ``AI_PROVIDER`` environment variable.
 See the Configuration Guide for full details on each provider's settings.
 """
 
+import asyncio
 import logging
 import re
+import time
 from abc import ABC, abstractmethod
-from typing import Any, Dict, List, Optional
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, List, Optional
 
 from app.config import settings
+from app.utils.llm_clients import get_async_openai_client, get_openai_client
+from app.utils.metrics import record_llm_request
 
 logger = logging.getLogger(__name__)
 
+#: ``usage`` objects of completions made inside :func:`capture_usage`.
+_usage_sink: ContextVar[Optional[List[Any]]] = ContextVar("llm_usage_sink", default=None)
+
 
 def _resolve_temperature(model: str, requested: float) -> Optional[float]:
     """Return a temperature value compatible with the given model, or ``None`` to omit it.
@@ -89,6 +98,58 @@ def _require_text_content(content: Optional[str]) -> str:
     return content
 
 
+@contextmanager
+def capture_usage() -> Iterator[List[Any]]:
+    """Collect the ``usage`` of every completion made in this context.
+
+    Providers return plain strings, so callers that need token counts (e.g.
+    the LLM response cache) wrap :meth:`AIProvider.chat_completion` in this
+    context manager and read the yielded list afterwards.
+    """
+    sink: List[Any] = []
+    token = _usage_sink.set(sink)
+    try:
+        yield sink
+    finally:
+        _usage_sink.reset(token)
+
+
+def _collect_usage(usage: Any) -> None:
+    sink = _usage_sink.get()
+    if sink is not None and usage is not None:
+        sink.append(usage)
+
+
+def _timed_completion(provider: str, create: Callable[..., Any], **call_kwargs: Any) -> Any:
+    """Call *create* and record its latency and token usage for *provider*."""
+    model = str(call_kwargs.get("model", ""))
+    started = time.perf_counter()
+    try:
+        response = create(**call_kwargs)
+    except Exception:
+        record_llm_request(provider, model, time.perf_counter() - started, outcome="error")
+        raise
+    usage = getattr(response, "usage", None)
+    record_llm_request(provider, model, time.perf_counter() - started, usage)
+    _collect_usage(usage)
+    return response
+
+
+async def _atimed_completion(provider: str, create: Callable[..., Any], **call_kwargs: Any) -> Any:
+    """Async twin of :func:`_timed_completion`."""
+    model = str(call_kwargs.get("model", ""))
+    started = time.perf_counter()
+    try:
+        response = await create(**call_kwargs)
+    except Exception:
+        record_llm_request(provider, model, time.perf_counter() - started, outcome="error")
+        raise
+    usage = getattr(response, "usage", None)
+    record_llm_request(provider, model, time.perf_counter() - started, usage)
+    _collect_usage(usage)
+    return response
+
+
 class AIProvider(ABC):
     """Abstract base class for AI chat completion providers.
 
@@ -121,23 +182,47 @@ class AIProvider(ABC):
             Exception: If the underlying API call fails.
         """
 
+    async def achat_completion(
+        self,
+        messages: List[Dict[str, str]],
+        model: str,
+        temperature: float = 0,
+        **kwargs: Any,
+    ) -> str:
+        """Async variant of :meth:`chat_completion` for concurrent callers.
 
-class OpenAIProvider(AIProvider):
-    """OpenAI provider using the ``openai`` Python SDK.
+        The default runs :meth:`chat_completion` in a worker thread; providers
+        with a native async client override it.
+        """
+        return await asyncio.to_thread(self.chat_completion, messages, model, temperature, **kwargs)
 
-    Also works as a drop-in for any OpenAI-compatible API endpoint, including
-    LocalAI and LM Studio.  Ollama and OpenRouter have dedicated providers with
-    sensible defaults, but this provider works for them too when a custom
-    ``base_url`` is supplied.
+
+class OpenAICompatibleProvider(AIProvider):
+    """Base class for providers served through the ``openai`` SDK.
+
+    Subclasses pass their SDK constructor arguments to ``__init__``.  Clients
+    come from the per-process registry in :mod:`app.utils.llm_clients`, so a
+    provider is cheap to create for every call while its connections stay
+    open between calls.
     """
 
-    def __init__(self, api_key: str, base_url: Optional[str] = None) -> None:
-        import openai
+    #: Provider label used in metrics.
+    name = "openai"
 
-        self._client = openai.OpenAI(
-            api_key=api_key,
-            base_url=base_url or "https://api.openai.com/v1",
-        )
+    def __init__(self, **client_options: Any) -> None:
+        self._client_options = client_options
+        self._client = get_openai_client(**client_options)
+
+    @staticmethod
+    def _call_kwargs(
+        messages: List[Dict[str, str]], model: str, temperature: float, kwargs: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        call_kwargs: Dict[str, Any] = {"model": model, "messages": messages}
+        safe_temp = _resolve_temperature(model, temperature)
+        if safe_temp is not None:
+            call_kwargs["temperature"] = safe_temp
+        call_kwargs.update(kwargs)
+        return call_kwargs
 
     def chat_completion(
         self,
@@ -146,45 +231,47 @@ class OpenAIProvider(AIProvider):
         temperature: float = 0,
         **kwargs: Any,
     ) -> str:
-        call_kwargs: Dict[str, Any] = {"model": model, "messages": messages}
-        safe_temp = _resolve_temperature(model, temperature)
-        if safe_temp is not None:
-            call_kwargs["temperature"] = safe_temp
-        call_kwargs.update(kwargs)
-        completion = self._client.chat.completions.create(**call_kwargs)
+        call_kwargs = self._call_kwargs(messages, model, temperature, kwargs)
+        completion = _timed_completion(self.name, self._client.chat.completions.create, **call_kwargs)
         _content = completion.choices[0].message.content
         return _require_text_content(_content)
 
-
-class AzureOpenAIProvider(AIProvider):
-    """Azure OpenAI provider using the ``openai`` Python SDK's Azure client."""
-
-    def __init__(self, api_key: str, azure_endpoint: str, api_version: str = "2024-02-01") -> None:
-        import openai
-
-        self._client = openai.AzureOpenAI(
-            api_key=api_key,
-            azure_endpoint=azure_endpoint,
-            api_version=api_version,
-        )
-
-    def chat_completion(
+    async def achat_completion(
         self,
         messages: List[Dict[str, str]],
         model: str,
         temperature: float = 0,
         **kwargs: Any,
     ) -> str:
-        call_kwargs: Dict[str, Any] = {"model": model, "messages": messages}
-        safe_temp = _resolve_temperature(model, temperature)
-        if safe_temp is not None:
-            call_kwargs["temperature"] = safe_temp
-        call_kwargs.update(kwargs)
-        completion = self._client.chat.completions.create(**call_kwargs)
+        client = get_async_openai_client(**self._client_options)
+        call_kwargs = self._call_kwargs(messages, model, temperature, kwargs)
+        completion = await _atimed_completion(self.name, client.chat.completions.create, **call_kwargs)
         _content = completion.choices[0].message.content
         return _require_text_content(_content)
 
 
+class OpenAIProvider(OpenAICompatibleProvider):
+    """OpenAI provider using the ``openai`` Python SDK.
+
+    Also works as a drop-in for any OpenAI-compatible API endpoint, including
+    LocalAI and LM Studio.  Ollama and OpenRouter have dedicated providers with
+    sensible defaults, but this provider works for them too when a custom
+    ``base_url`` is supplied.
+    """
+
+    def __init__(self, api_key: str, base_url: Optional[str] = None) -> None:
+        super().__init__(api_key=api_key, base_url=base_url or "https://api.openai.com/v1")
+
+
+class AzureOpenAIProvider(OpenAICompatibleProvider):
+    """Azure OpenAI provider using the ``openai`` Python SDK's Azure client."""
+
+    name = "azure"
+
+    def __init__(self, api_key: str, azure_endpoint: str, api_version: str = "2024-02-01") -> None:
+        super().__init__(api_key=api_key, azure_endpoint=azure_endpoint, api_version=api_version)
+
+
 class AnthropicProvider(AIProvider):
     """Anthropic Claude provider routed via LiteLLM.
 
@@ -211,7 +298,7 @@ class AnthropicProvider(AIProvider):
         if safe_temp is not None:
             call_kwargs["temperature"] = safe_temp
         call_kwargs.update(kwargs)
-        response = litellm.completion(**call_kwargs)
+        response = _timed_completion("anthropic", litellm.completion, **call_kwargs)
         _content = response.choices[0].message.content
         return _require_text_content(_content)
 
@@ -242,12 +329,12 @@ class GeminiProvider(AIProvider):
         if safe_temp is not None:
             call_kwargs["temperature"] = safe_temp
         call_kwargs.update(kwargs)
-        response = litellm.completion(**call_kwargs)
+        response = _timed_completion("gemini", litellm.completion, **call_kwargs)
         _content = response.choices[0].message.content
         return _require_text_content(_content)
 
 
-class OllamaProvider(AIProvider):
+class OllamaProvider(OpenAICompatibleProvider):
     """Ollama local LLM provider via its OpenAI-compatible REST API.
 
     Ollama exposes an OpenAI-compatible endpoint at ``/v1``.  Any model
@@ -263,32 +350,16 @@ class OllamaProvider(AIProvider):
     See https://ollama.com for installation and model management.
     """
 
-    def __init__(self, base_url: str = "http://localhost:11434") -> None:
-        import openai
+    name = "ollama"
 
-        self._client = openai.OpenAI(
+    def __init__(self, base_url: str = "http://localhost:11434") -> None:
+        super().__init__(
             api_key="ollama",  # Ollama does not require a real API key
             base_url=f"{base_url.rstrip('/')}/v1",
         )
 
-    def chat_completion(
-        self,
-        messages: List[Dict[str, str]],
-        model: str,
-        temperature: float = 0,
-        **kwargs: Any,
-    ) -> str:
-        call_kwargs: Dict[str, Any] = {"model": model, "messages": messages}
-        safe_temp = _resolve_temperature(model, temperature)
-        if safe_temp is not None:
-            call_kwargs["temperature"] = safe_temp
-        call_kwargs.update(kwargs)
-        completion = self._client.chat.completions.create(**call_kwargs)
-        _content = completion.choices[0].message.content
-        return _require_text_content(_content)
-
 
-class OpenRouterProvider(AIProvider):
+class OpenRouterProvider(OpenAICompatibleProvider):
     """OpenRouter AI aggregator (https://openrouter.ai).
 
     OpenRouter provides access to 100+ models from OpenAI, Anthropic, Google,
@@ -297,32 +368,13 @@ class OpenRouterProvider(AIProvider):
     ``anthropic/claude-3.5-sonnet``, ``google/gemini-pro``).
     """
 
-    def __init__(self, api_key: str, base_url: str = "https://openrouter.ai/api/v1") -> None:
-        import openai
-
-        self._client = openai.OpenAI(
-            api_key=api_key,
-            base_url=base_url,
-        )
+    name = "openrouter"
 
-    def chat_completion(
-        self,
-        messages: List[Dict[str, str]],
-        model: str,
-        temperature: float = 0,
-        **kwargs: Any,
-    ) -> str:
-        call_kwargs: Dict[str, Any] = {"model": model, "messages": messages}
-        safe_temp = _resolve_temperature(model, temperature)
-        if safe_temp is not None:
-            call_kwargs["temperature"] = safe_temp
-        call_kwargs.update(kwargs)
-        completion = self._client.chat.completions.create(**call_kwargs)
-        _content = completion.choices[0].message.content
-        return _require_text_content(_content)
+    def __init__(self, api_key: str, base_url: str = "https://openrouter.ai/api/v1") -> None:
+        super().__init__(api_key=api_key, base_url=base_url)
 
 
-class PortkeyProvider(AIProvider):
+class PortkeyProvider(OpenAICompatibleProvider):
     """Portkey AI gateway (https://portkey.ai).
 
     Portkey is an AI gateway that provides observability, caching, automatic
@@ -350,6 +402,8 @@ class PortkeyProvider(AIProvider):
     virtual key).
     """
 
+    name = "portkey"
+
     def __init__(
         self,
         api_key: str,
@@ -357,35 +411,13 @@ class PortkeyProvider(AIProvider):
         config: Optional[str] = None,
         base_url: str = "https://api.portkey.ai/v1",
     ) -> None:
-        import openai
-
         portkey_headers: Dict[str, str] = {"x-portkey-api-key": api_key}
         if virtual_key:
             portkey_headers["x-portkey-virtual-key"] = virtual_key
         if config:
             portkey_headers["x-portkey-config"] = config
 
-        self._client = openai.OpenAI(
-            api_key=api_key,
-            base_url=base_url,
-            default_headers=portkey_headers,
-        )
-
-    def chat_completion(
-        self,
-        messages: List[Dict[str, str]],
-        model: str,
-        temperature: float = 0,
-        **kwargs: Any,
-    ) -> str:
-        call_kwargs: Dict[str, Any] = {"model": model, "messages": messages}
-        safe_temp = _resolve_temperature(model, temperature)
-        if safe_temp is not None:
-            call_kwargs["temperature"] = safe_temp
-        call_kwargs.update(kwargs)
-        completion = self._client.chat.completions.create(**call_kwargs)
-        _content = completion.choices[0].message.content
-        return _require_text_content(_content)
+        super().__init__(api_key=api_key, base_url=base_url, default_headers=portkey_headers)
 
 
 class LiteLLMProvider(AIProvider):
@@ -423,7 +455,7 @@ class LiteLLMProvider(AIProvider):
         if self._api_base:
             completion_kwargs["api_base"] = self._api_base
         completion_kwargs.update(kwargs)
-        response = litellm.completion(**completion_kwargs)
+        response = _timed_completion("litellm", litellm.completion, **completion_kwargs)
         _content = response.choices[0].message.content
         return _require_text_content(_content)
 
@@ -0,0 +1,343 @@
+"""Short-lived cache of verified Bearer API tokens.
+
+API tokens are stored as PBKDF2-HMAC-SHA256 hashes (100,000 iterations), so
+verifying a presented token costs tens of milliseconds of CPU.  Integrations
+such as the mobile app and scanners present the same token thousands of times
+per minute, so each process keeps the result of a successful verification:
+
+1. **Lookup**: the presented token is reduced to a keyed HMAC-SHA256 digest
+   (:func:`token_digest`) and looked up in a bounded in-process LRU, then in
+   Redis under ``docuelevate:api_token:<digest>``.  Entries hold only the token
+   id, owner and expiry, never the token or its stored hash.
+
+2. **Invalidation**: every entry records the value of the Redis key
+   ``docuelevate:api_token_version`` at the time it was cached.
+   :func:`notify_tokens_changed` writes a new version whenever a token is
+   revoked, reactivated or deleted, so every process stops trusting its
+   entries on the next request.  Expiry is enforced from the cached
+   ``expires_at`` and entries never outlive it.
+
+3. **Usage tracking**: ``last_used_at`` / ``last_used_ip`` for cache hits are
+   buffered by :class:`TokenUsageRecorder` and written in one batch every
+   :attr:`~app.config.Settings.api_token_usage_flush_interval` seconds.
+
+Only successful verifications are cached, so new tokens work immediately and
+failed guesses always pay the full PBKDF2 cost.  While Redis is unreachable,
+in-process entries are trusted for at most :data:`UNVERIFIED_ENTRY_TTL`
+seconds.
+"""
+
+import atexit
+import hashlib
+import hmac
+import json
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import datetime, timezone
+
+import redis
+
+from app.config import settings
+from app.database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+#: Redis key holding the current API token version (opaque string).
+TOKEN_VERSION_KEY = "docuelevate:api_token_version"
+
+#: Redis key prefix for verified-token entries.
+TOKEN_CACHE_KEY_PREFIX = "docuelevate:api_token:"
+
+#: Seconds an in-process entry may be served without confirming the version in Redis.
+UNVERIFIED_ENTRY_TTL = 5.0
+
+#: Maximum number of entries kept in the in-process LRU.
+MAX_LOCAL_ENTRIES = 10_000
+
+#: Seconds to wait before reconnecting after Redis was found unavailable.
+_REDIS_RETRY_INTERVAL = 30.0
+
+_redis_client: redis.Redis | None = None
+_redis_failed_at: float | None = None
+
+
+def _get_redis() -> redis.Redis | None:
+    """Return a shared Redis client, or *None* while Redis is unavailable."""
+    global _redis_client, _redis_failed_at
+    if _redis_client is not None:
+        return _redis_client
+    if _redis_failed_at is not None and time.monotonic() - _redis_failed_at < _REDIS_RETRY_INTERVAL:
+        return None
+    try:
+        client = redis.Redis.from_url(
+            settings.redis_url,
+            decode_responses=True,
+            socket_connect_timeout=2,
+            socket_timeout=2,
+        )
+        client.ping()
+    except Exception:  # noqa: BLE001
+        logger.debug("Redis unavailable for API token cache", exc_info=True)
+        _redis_failed_at = time.monotonic()
+        return None
+    _redis_client = client
+    _redis_failed_at = None
+    return client
+
+
+def _redis_failed() -> None:
+    global _redis_client, _redis_failed_at
+    _redis_client = None
+    _redis_failed_at = time.monotonic()
+
+
+def _read_version() -> str | None:
+    """Return the published token version, ``""`` if unset, or *None* on error."""
+    client = _get_redis()
+    if client is None:
+        return None
+    try:
+        return client.get(TOKEN_VERSION_KEY) or ""
+    except Exception as exc:  # noqa: BLE001
+        logger.debug("Could not read API token version: %s", exc)
+        _redis_failed()
+        return None
+
+
+def _int_setting(name: str, default: int) -> int:
+    value = getattr(settings, name, default)
+    return value if isinstance(value, int) else default
+
+
+def token_digest(raw_token: str) -> str:
+    """Return the cache key digest for *raw_token*.
+
+    The digest is keyed with ``SESSION_SECRET`` so that cache keys in Redis
+    cannot be recomputed from a guessed token without the server secret.
+    """
+    from app.api.api_tokens import TOKEN_HASH_SALT
+
+    key = (settings.session_secret or "").encode("utf-8") + TOKEN_HASH_SALT
+    return hmac.new(key, raw_token.encode("utf-8"), hashlib.sha256).hexdigest()
+
+
+@dataclass(frozen=True)
+class VerifiedToken:
+    """Principal resolved from a successfully verified API token."""
+
+    token_id: int
+    owner_id: str
+    expires_at: float | None
+    version: str | None
+    cached_at: float
+
+    def to_json(self) -> str:
+        return json.dumps(
+            {"token_id": self.token_id, "owner_id": self.owner_id, "expires_at": self.expires_at, "v": self.version}
+        )
+
+    @classmethod
+    def from_json(cls, raw: str, cached_at: float) -> "VerifiedToken":
+        data = json.loads(raw)
+        return cls(
+            token_id=int(data["token_id"]),
+            owner_id=str(data["owner_id"]),
+            expires_at=data.get("expires_at"),
+            version=data.get("v"),
+            cached_at=cached_at,
+        )
+
+
+class VerifiedTokenCache:
+    """Thread-safe two-level (process + Redis) cache of verified tokens."""
+
+    def __init__(
+        self,
+        version_reader: Callable[[], str | None] = _read_version,
+        redis_getter: Callable[[], redis.Redis | None] = _get_redis,
+        clock: Callable[[], float] = time.time,
+        max_entries: int = MAX_LOCAL_ENTRIES,
+    ) -> None:
+        self._version_reader = version_reader
+        self._redis_getter = redis_getter
+        self._clock = clock
+        self._max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, VerifiedToken] = OrderedDict()
+
+    @property
+    def ttl(self) -> int:
+        return _int_setting("api_token_cache_ttl", 0)
+
+    def get(self, digest: str) -> VerifiedToken | None:
+        """Return the cached principal for *digest*, or *None* on a miss."""
+        ttl = self.ttl
+        if ttl <= 0:
+            return None
+        version = self._version_reader()
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is not None:
+                if self._is_valid(entry, version, now, ttl):
+                    self._entries.move_to_end(digest)
+                    return entry
+                del self._entries[digest]
+
+        if version is None:
+            return None
+        entry = self._get_shared(digest, now)
+        if entry is None or entry.version != version or not self._is_valid(entry, version, now, ttl):
+            return None
+        self._store_local(digest, entry)
+        return entry
+
+    def put(self, digest: str, token_id: int, owner_id: str, expires_at: datetime | None) -> None:
+        """Cache a successful verification of the token behind *digest*."""
+        ttl = self.ttl
+        if ttl <= 0:
+            return
+        now = self._clock()
+        expires_ts = _as_utc(expires_at).timestamp() if expires_at is not None else None
+        lifetime = ttl if expires_ts is None else min(ttl, expires_ts - now)
+        if lifetime <= 0:
+            return
+        entry = VerifiedToken(token_id, owner_id, expires_ts, self._version_reader(), now)
+        self._store_local(digest, entry)
+        if entry.version is None:
+            return
+        client = self._redis_getter()
+        if client is None:
+            return
+        try:
+            client.set(TOKEN_CACHE_KEY_PREFIX + digest, entry.to_json(), ex=max(1, int(lifetime)))
+        except Exception as exc:  # noqa: BLE001
+            logger.debug("Could not cache verified API token in Redis: %s", exc)
+            _redis_failed()
+
+    def clear(self) -> None:
+        """Drop every in-process entry."""
+        with self._lock:
+            self._entries.clear()
+
+    def _store_local(self, digest: str, entry: VerifiedToken) -> None:
+        with self._lock:
+            self._entries[digest] = entry
+            self._entries.move_to_end(digest)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def _get_shared(self, digest: str, now: float) -> VerifiedToken | None:
+        client = self._redis_getter()
+        if client is None:
+            return None
+        try:
+            raw = client.get(TOKEN_CACHE_KEY_PREFIX + digest)
+        except Exception as exc:  # noqa: BLE001
+            logger.debug("Could not read verified API token from Redis: %s", exc)
+            _redis_failed()
+            return None
+        if not raw:
+            return None
+        try:
+            return VerifiedToken.from_json(raw, cached_at=now)
+        except (ValueError, KeyError, TypeError):
+            return None
+
+    @staticmethod
+    def _is_valid(entry: VerifiedToken, version: str | None, now: float, ttl: int) -> bool:
+        age = now - entry.cached_at
+        if age >= ttl:
+            return False
+        if entry.expires_at is not None and now >= entry.expires_at:
+            return False
+        if version is None:
+            return age < UNVERIFIED_ENTRY_TTL
+        return version == entry.version
+
+
+def _as_utc(value: datetime) -> datetime:
+    return value if value.tzinfo is not None else value.replace(tzinfo=timezone.utc)
+
+
+class TokenUsageRecorder:
+    """Coalesces ``last_used_at`` / ``last_used_ip`` updates into periodic batches."""
+
+    def __init__(
+        self,
+        session_factory: Callable = SessionLocal,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._session_factory = session_factory
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._pending: dict[int, tuple[datetime, str | None]] = {}
+        self._last_flush = clock()
+
+    def record(self, token_id: int, client_ip: str | None) -> None:
+        """Remember a use of *token_id* and flush if the interval has elapsed."""
+        now = self._clock()
+        with self._lock:
+            self._pending[token_id] = (datetime.now(timezone.utc), client_ip)
+            due = now - self._last_flush >= _int_setting("api_token_usage_flush_interval", 0)
+            if due:
+                self._last_flush = now
+        if due:
+            self.flush()
+
+    def flush(self) -> int:
+        """Write all pending usage updates in one batch; return the number of tokens updated."""
+        from app.models import ApiToken
+
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return 0
+        rows = [
+            {"id": token_id, "last_used_at": used_at, "last_used_ip": ip} for token_id, (used_at, ip) in pending.items()
+        ]
+        db = self._session_factory()
+        try:
+            db.bulk_update_mappings(ApiToken, rows)
+            db.commit()
+        except Exception:
+            db.rollback()
+            logger.debug("Failed to flush API token usage for %d token(s)", len(rows), exc_info=True)
+            return 0
+        finally:
+            db.close()
+        return len(rows)
+
+    def discard(self) -> None:
+        """Drop pending updates without writing them."""
+        with self._lock:
+            self._pending.clear()
+
+
+#: Process-wide caches used by :func:`app.auth._resolve_bearer_user`.
+verified_tokens = VerifiedTokenCache()
+usage_recorder = TokenUsageRecorder()
+atexit.register(usage_recorder.flush)
+
+
+def notify_tokens_changed() -> None:
+    """Publish a new token version and drop this process's cached tokens.
+
+    Call this after committing a revocation, reactivation or deletion.
+    Redis errors are logged rather than raised; other processes then stop
+    trusting their entries within :data:`UNVERIFIED_ENTRY_TTL` seconds.
+    """
+    verified_tokens.clear()
+    client = _get_redis()
+    if client is None:
+        logger.warning("Could not publish API token change: Redis unavailable")
+        return
+    try:
+        client.set(TOKEN_VERSION_KEY, uuid.uuid4().hex)
+    except Exception as exc:  # noqa: BLE001
+        logger.warning("Could not publish API token change to Redis: %s", exc)
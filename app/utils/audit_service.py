@@ -5,26 +5,29 @@ Provides helpers to **record** audit events (append-only database writes)
 and to optionally **forward** them to external SIEM systems.
 
 Supported SIEM transports:
-* **Syslog** – RFC 5424 structured-data messages over UDP or TCP.
+* **Syslog** – RFC 5424 structured-data messages over UDP, TCP or TLS.
 * **HTTP** – JSON POST payloads compatible with Splunk HEC, Logstash
   HTTP input, Grafana Loki push API, and any generic webhook endpoint.
+
+Events are delivered in batches by the per-process
+:data:`~app.utils.siem_forwarder.siem_forwarder`; see
+:mod:`app.utils.siem_forwarder`.
 """
 
 import json
 import logging
-import re
-import socket
-import threading
+from collections.abc import Iterable, Mapping
 from datetime import datetime, timezone
 from typing import Any
 
-import httpx
 from fastapi import Request
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
 
 from app.config import settings
 from app.middleware.audit_log import get_client_ip, get_username
 from app.models import AuditLog
+from app.utils.siem_forwarder import siem_forwarder
 
 logger = logging.getLogger(__name__)
 
@@ -33,6 +36,28 @@ logger = logging.getLogger(__name__)
 # ---------------------------------------------------------------------------
 
 
+def _event_row(
+    *,
+    action: str,
+    user: str = "system",
+    resource_type: str | None = None,
+    resource_id: str | None = None,
+    ip_address: str | None = None,
+    details: dict[str, Any] | None = None,
+    severity: str = "info",
+) -> dict[str, Any]:
+    """Return the ``audit_logs`` column values for one event."""
+    return {
+        "user": user,
+        "action": action,
+        "resource_type": resource_type,
+        "resource_id": str(resource_id) if resource_id is not None else None,
+        "ip_address": ip_address,
+        "details": json.dumps(details, default=str) if details else None,
+        "severity": severity,
+    }
+
+
 def record_event(
     db: Session,
     *,
@@ -59,31 +84,56 @@ def record_event(
     Returns:
         The newly created :class:`AuditLog` row.
     """
-    details_json = json.dumps(details, default=str) if details else None
-
     entry = AuditLog(
-        user=user,
-        action=action,
-        resource_type=resource_type,
-        resource_id=str(resource_id) if resource_id is not None else None,
-        ip_address=ip_address,
-        details=details_json,
-        severity=severity,
+        **_event_row(
+            action=action,
+            user=user,
+            resource_type=resource_type,
+            resource_id=resource_id,
+            ip_address=ip_address,
+            details=details,
+            severity=severity,
+        )
     )
     db.add(entry)
     db.commit()
     db.refresh(entry)
 
-    # Fire-and-forget SIEM forwarding in a background thread so we never
-    # block the request path.
+    # Queued for the background forwarder so we never block the request path.
     if settings.audit_siem_enabled:
-        payload = _build_siem_payload(entry)
-        thread = threading.Thread(target=_forward_to_siem, args=(payload,), daemon=True)
-        thread.start()
+        siem_forwarder.submit(_build_siem_payload(entry))
 
     return entry
 
 
+def record_events(db: Session, events: Iterable[Mapping[str, Any]]) -> list[AuditLog]:
+    """Persist many audit events with one multi-row INSERT and forward them to SIEM.
+
+    Intended for bulk endpoints that would otherwise call :func:`record_event`
+    (one commit and one refresh each) thousands of times.
+
+    Args:
+        db: Active SQLAlchemy session.
+        events: Mappings with the keyword arguments of :func:`record_event`.
+
+    Returns:
+        The created :class:`AuditLog` rows, in the order of *events*.
+    """
+    rows = [_event_row(**event) for event in events]
+    if not rows:
+        return []
+    # render_nulls keeps rows with and without optional values in one statement.
+    statement = insert(AuditLog).returning(AuditLog, sort_by_parameter_order=True)
+    entries = list(db.scalars(statement, rows, execution_options={"render_nulls": True}))
+    payloads = [_build_siem_payload(entry) for entry in entries] if settings.audit_siem_enabled else []
+    db.commit()
+
+    if payloads:
+        siem_forwarder.submit_many(payloads)
+
+    return entries
+
+
 def record_event_from_request(
     db: Session,
     request: Request,
@@ -120,6 +170,27 @@ def record_event_from_request(
     )
 
 
+def record_events_from_request(
+    db: Session,
+    request: Request,
+    events: Iterable[Mapping[str, Any]],
+) -> list[AuditLog]:
+    """Batch variant of :func:`record_event_from_request` built on :func:`record_events`.
+
+    Args:
+        db: Active SQLAlchemy session.
+        request: The current HTTP request; supplies user and IP for every event.
+        events: Mappings with ``action`` and optionally ``resource_type``,
+            ``resource_id``, ``details`` and ``severity``.
+
+    Returns:
+        The created :class:`AuditLog` rows.
+    """
+    user = get_username(request)
+    ip_address = get_client_ip(request)
+    return record_events(db, ({**event, "user": user, "ip_address": ip_address} for event in events))
+
+
 def query_events(
     db: Session,
     *,
@@ -208,14 +279,6 @@ def count_events(
 # SIEM forwarding internals
 # ---------------------------------------------------------------------------
 
-_SYSLOG_FACILITY_LOCAL0 = 16
-_SYSLOG_SEVERITY_MAP = {
-    "info": 6,
-    "warning": 4,
-    "error": 3,
-    "critical": 2,
-}
-
 
 def _build_siem_payload(entry: AuditLog) -> dict[str, Any]:
     """Convert an :class:`AuditLog` row into a plain dict for SIEM delivery."""
@@ -232,100 +295,3 @@ def _build_siem_payload(entry: AuditLog) -> dict[str, Any]:
         "severity": entry.severity,
         "source": "docuelevate",
     }
-
-
-def _forward_to_siem(payload: dict[str, Any]) -> None:
-    """Route a SIEM payload to the configured transport."""
-    transport = settings.audit_siem_transport.lower()
-    try:
-        if transport == "syslog":
-            _send_syslog(payload)
-        elif transport == "http":
-            _send_http(payload)
-        else:
-            logger.warning("Unknown SIEM transport %r; skipping forwarding", transport)
-    except Exception:
-        logger.exception("Failed to forward audit event to SIEM (%s)", transport)
-
-
-def _send_syslog(payload: dict[str, Any]) -> None:
-    """Send a RFC 5424 syslog message to the configured receiver."""
-    severity_num = _SYSLOG_SEVERITY_MAP.get(payload.get("severity", "info"), 6)
-    priority = _SYSLOG_FACILITY_LOCAL0 * 8 + severity_num
-    ts = payload.get("timestamp", datetime.now(timezone.utc).isoformat())
-    hostname = socket.gethostname()
-    app_name = "docuelevate"
-    msg_id = payload.get("action", "-")
-
-    # Structured data (SD) element with key event fields.
-    sd = (
-        f'[docuelevate@0 user="{payload.get("user", "-")}" '
-        f'action="{payload.get("action", "-")}" '
-        f'resource_type="{payload.get("resource_type", "-")}" '
-        f'resource_id="{payload.get("resource_id", "-")}" '
-        f'ip="{payload.get("ip_address", "-")}"]'
-    )
-    message = json.dumps(payload, default=str)
-    syslog_msg = f"<{priority}>1 {ts} {hostname} {app_name} - {msg_id} {sd} {message}"
-
-    proto = settings.audit_siem_syslog_protocol.lower()
-    host = settings.audit_siem_syslog_host
-    port = settings.audit_siem_syslog_port
-
-    if proto == "tcp":
-        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
-            sock.settimeout(5)
-            sock.connect((host, port))
-            sock.sendall(syslog_msg.encode("utf-8"))
-    else:
-        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
-            sock.settimeout(5)
-            sock.sendto(syslog_msg.encode("utf-8"), (host, port))
-
-    logger.debug("Syslog audit event sent to %s:%s (%s)", host, port, proto)
-
-
-def _send_http(payload: dict[str, Any]) -> None:
-    """POST a JSON audit event to the configured HTTP endpoint."""
-    url = settings.audit_siem_http_url
-    if not url:
-        logger.warning("SIEM HTTP URL not configured; skipping HTTP forwarding")
-        return
-
-    headers: dict[str, str] = {"Content-Type": "application/json"}
-    token = settings.audit_siem_http_token
-    if token:
-        headers["Authorization"] = f"Bearer {token}"
-
-    # Parse custom headers (comma-separated "Key:Value" pairs).
-    # Reject headers that could override security-critical ones already set,
-    # and validate that header names contain only RFC 7230 token characters.
-    _PROTECTED_HEADERS = {"authorization", "content-type", "host"}
-    _VALID_HEADER_NAME = re.compile(r"^[A-Za-z0-9!#$%&'*+\-.^_`|~]+$")
-    raw_custom = settings.audit_siem_http_custom_headers
-    if raw_custom:
-        for raw_pair in raw_custom.split(","):
-            pair = raw_pair.strip()
-            if ":" in pair:
-                k, _, v = pair.partition(":")
-                name = k.strip()
-                if not name or not _VALID_HEADER_NAME.match(name):
-                    logger.warning("Skipping invalid SIEM custom header name: %r", name)
-                    continue
-                if name.lower() in _PROTECTED_HEADERS:
-                    logger.warning("Skipping protected SIEM custom header: %r", name)
-                    continue
-                headers[name] = v.strip()
-
-    # Wrap in Splunk HEC-style envelope when URL contains ``/services/collector``.
-    body: dict[str, Any]
-    if "/services/collector" in url:
-        body = {"event": payload, "sourcetype": "docuelevate:audit", "source": "docuelevate"}
-    else:
-        body = payload
-
-    with httpx.Client(timeout=10) as client:
-        resp = client.post(url, json=body, headers=headers)
-        resp.raise_for_status()
-
-    logger.debug("HTTP audit event forwarded to %s (status %s)", url, resp.status_code)
@@ -135,9 +135,42 @@ SAMPLE_PAYLOADS: dict[str, dict[str, Any]] = {
 # ---------------------------------------------------------------------------
 
 
+def load_hook_subscriptions(db: Any) -> dict[str, list[dict[str, Any]]]:
+    """Return active automation hooks grouped by subscribed event.
+
+    Args:
+        db: An open SQLAlchemy session.
+
+    Returns:
+        A mapping of event name to dicts with ``id``, ``target_url``,
+        ``secret``, and ``events`` keys.
+    """
+    index: dict[str, list[dict[str, Any]]] = {}
+    hooks = db.query(AutomationHook).filter(AutomationHook.is_active.is_(True)).all()
+    for hook in hooks:
+        try:
+            subscribed = json.loads(hook.events)
+        except (json.JSONDecodeError, TypeError):
+            subscribed = []
+        if not isinstance(subscribed, list):
+            continue
+        entry = {
+            "id": hook.id,
+            "target_url": hook.target_url,
+            "secret": hook.secret,
+            "events": subscribed,
+        }
+        for event in dict.fromkeys(subscribed):
+            index.setdefault(event, []).append(entry)
+    return index
+
+
 def get_active_hooks_for_event(event: str) -> list[dict[str, Any]]:
     """Return all active automation hooks subscribed to *event*.
 
+    Queries the database directly; dispatch uses the cached
+    :func:`get_cached_hooks_for_event` instead.
+
     Args:
         event: The event name to filter on.
 
@@ -147,27 +180,18 @@ def get_active_hooks_for_event(event: str) -> list[dict[str, Any]]:
     """
     db = SessionLocal()
     try:
-        hooks = db.query(AutomationHook).filter(AutomationHook.is_active.is_(True)).all()
-        result: list[dict[str, Any]] = []
-        for hook in hooks:
-            try:
-                subscribed = json.loads(hook.events)
-            except (json.JSONDecodeError, TypeError):
-                subscribed = []
-            if event in subscribed:
-                result.append(
-                    {
-                        "id": hook.id,
-                        "target_url": hook.target_url,
-                        "secret": hook.secret,
-                        "events": subscribed,
-                    }
-                )
-        return result
+        return load_hook_subscriptions(db).get(event, [])
     finally:
         db.close()
 
 
+def get_cached_hooks_for_event(event: str) -> list[dict[str, Any]]:
+    """Return active automation hooks for *event* from the per-process registry."""
+    from app.utils.webhook_registry import registry
+
+    return registry.automation_hooks_for(event)
+
+
 # ---------------------------------------------------------------------------
 # Dispatch
 # ---------------------------------------------------------------------------
@@ -190,7 +214,7 @@ def dispatch_automation_hooks(event: str, data: dict[str, Any]) -> None:
         logger.warning("Ignoring unknown automation hook event: %s", event)
         return
 
-    hooks = get_active_hooks_for_event(event)
+    hooks = get_cached_hooks_for_event(event)
     if not hooks:
         logger.debug("No active automation hooks for event %s", event)
         return
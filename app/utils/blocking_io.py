@@ -0,0 +1,49 @@
+"""Bounded thread offload for blocking work inside ``async`` endpoints.
+
+The upload and intake endpoints stream request bodies asynchronously but
+still need disk, hashing, database and Celery broker calls that block.
+Run directly in an ``async def`` handler, one slow NFS write or database
+round-trip stalls every other request on that Uvicorn worker.
+
+:func:`run_blocking` runs such calls on a dedicated pool of
+``UPLOAD_IO_THREADS`` threads.  The event loop stays responsive, and a
+burst of uploads cannot take over the thread pool Starlette uses for
+synchronous endpoints and dependencies.
+"""
+
+import asyncio
+import contextvars
+import functools
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, ParamSpec, TypeVar
+
+from app.config import settings
+
+P = ParamSpec("P")
+T = TypeVar("T")
+
+_lock = threading.Lock()
+_executor: ThreadPoolExecutor | None = None
+_executor_pid: int | None = None
+
+
+def _io_executor() -> ThreadPoolExecutor:
+    """Return this process's upload I/O pool (rebuilt after a fork)."""
+    global _executor, _executor_pid
+    with _lock:
+        if _executor is None or _executor_pid != os.getpid():
+            workers = getattr(settings, "upload_io_threads", 8)
+            _executor = ThreadPoolExecutor(
+                max_workers=workers if isinstance(workers, int) and workers > 0 else 8,
+                thread_name_prefix="upload-io",
+            )
+            _executor_pid = os.getpid()
+        return _executor
+
+
+async def run_blocking(func: Callable[P, T], /, *args: P.args, **kwargs: P.kwargs) -> T:
+    """Await ``func(*args, **kwargs)`` on the upload I/O pool, preserving context variables."""
+    call = functools.partial(contextvars.copy_context().run, func, *args, **kwargs)
+    return await asyncio.get_running_loop().run_in_executor(_io_executor(), call)
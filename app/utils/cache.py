@@ -23,6 +23,8 @@ from typing import Any
 
 import redis
 
+from app.utils.metrics import record_cache_lookup
+
 logger = logging.getLogger(__name__)
 
 #: Prefix applied to all cache keys to avoid collisions with other Redis users.
@@ -62,6 +64,7 @@ def cache_get(key: str) -> Any | None:
         return None
     try:
         raw = client.get(f"{_KEY_PREFIX}{key}")
+        record_cache_lookup(key.split(":", 1)[0], raw is not None)
         if raw is None:
             return None
         return json.loads(raw)
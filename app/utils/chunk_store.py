@@ -0,0 +1,375 @@
+"""Content-addressed chunk store used by incremental backups.
+
+An incremental snapshot is a small manifest plus a set of chunks.  Every
+chunk is stored once under its SHA-256 digest, so unchanged database pages
+and document files cost nothing in later snapshots:
+
+* Database dumps are split at content-defined line boundaries
+  (:func:`line_chunks`), so a row inserted early in a table only changes the
+  chunk it lands in instead of shifting every following chunk.
+* Document files are split into fixed-size chunks (:func:`fixed_chunks`);
+  they are written once and rarely modified, so whole-file deduplication is
+  what matters.
+
+Layout below the store root::
+
+    chunks/<first two hex digits>/<sha256>   one byte codec + payload
+    manifests/<name>.manifest.json.gz        one per snapshot
+
+Chunks are compressed on a thread pool (:class:`ChunkWriter`); ``zlib``
+releases the GIL, so compression scales with the configured threads.
+:meth:`ChunkStore.collect_garbage` deletes chunks no manifest references
+any more.  Chunks written or re-used within :data:`GC_GRACE_SECONDS` are
+kept so a snapshot that is still being written is never pruned.
+"""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+import zlib
+from collections.abc import Iterable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, BinaryIO
+
+logger = logging.getLogger(__name__)
+
+CHUNK_DIR = "chunks"
+MANIFEST_DIR = "manifests"
+MANIFEST_SUFFIX = ".manifest.json.gz"
+MANIFEST_VERSION = 1
+
+#: Chunk size for document files.
+FILE_CHUNK_SIZE = 4 * 1024 * 1024
+
+#: Bounds for content-defined database dump chunks.
+DUMP_MIN_CHUNK_SIZE = 256 * 1024
+DUMP_MAX_CHUNK_SIZE = 8 * 1024 * 1024
+
+#: A dump line whose mixed CRC-32 has this many top bits clear ends a chunk (about one cut every 4096 lines).
+DUMP_BOUNDARY_BITS = 12
+
+# CRC-32 is linear, so similar lines (``INSERT ... VALUES(41, ...)``) share
+# low bits; a Fibonacci-hashing multiply spreads every bit into the top ones.
+_FIBONACCI_MULTIPLIER = 0x9E3779B1
+
+#: Unreferenced chunks younger than this are kept by garbage collection.
+GC_GRACE_SECONDS = 6 * 3600
+
+_CODEC_RAW = b"r"
+_CODEC_ZLIB = b"z"
+
+#: Store chunks uncompressed unless zlib saves at least 5% (PDFs and images rarely compress).
+_MIN_COMPRESSION_GAIN = 0.95
+
+
+def fixed_chunks(fh: BinaryIO, size: int = FILE_CHUNK_SIZE) -> Iterator[bytes]:
+    """Yield *fh* in blocks of *size* bytes."""
+    while True:
+        block = fh.read(size)
+        if not block:
+            return
+        yield block
+
+
+def line_chunks(
+    lines: Iterable[bytes],
+    min_size: int = DUMP_MIN_CHUNK_SIZE,
+    max_size: int = DUMP_MAX_CHUNK_SIZE,
+    bits: int = DUMP_BOUNDARY_BITS,
+) -> Iterator[bytes]:
+    """Group *lines* into content-defined chunks.
+
+    A chunk ends after a line whose hash has its top *bits* clear once the chunk holds
+    at least *min_size* bytes, so boundaries depend on content rather than
+    offsets.  Chunks never exceed *max_size*; longer runs are split.
+    """
+    shift = 32 - bits
+    buffer = bytearray()
+    for line in lines:
+        buffer += line
+        while len(buffer) >= max_size:
+            yield bytes(buffer[:max_size])
+            del buffer[:max_size]
+        if len(buffer) >= min_size and not ((zlib.crc32(line) * _FIBONACCI_MULTIPLIER) & 0xFFFFFFFF) >> shift:
+            yield bytes(buffer)
+            buffer.clear()
+    if buffer:
+        yield bytes(buffer)
+
+
+class ChunkWriter:
+    """Store chunks concurrently and record what a snapshot added.
+
+    Use as a context manager; leaving the block waits for every pending write
+    and re-raises the first write error.
+    """
+
+    def __init__(self, store: ChunkStore, threads: int = 1, compression_level: int = 6) -> None:
+        self._store = store
+        self._level = compression_level
+        threads = max(1, threads)
+        self._pool = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="backup-chunks")
+        # Bound the chunks held in memory while waiting for a compression thread.
+        self._slots = threading.BoundedSemaphore(threads * 2)
+        self._futures: list[Future[int]] = []
+        self._seen: set[str] = set()
+        self.logical_bytes = 0
+        self.stored_bytes = 0
+        self.new_chunks = 0
+        self.reused_chunks = 0
+
+    def __enter__(self) -> ChunkWriter:
+        return self
+
+    def __exit__(self, exc_type: Any, exc: Any, tb: Any) -> None:
+        if exc_type is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            return
+        self.close()
+
+    def put(self, data: bytes) -> str:
+        """Store *data* unless an identical chunk exists and return its digest."""
+        digest = hashlib.sha256(data).hexdigest()
+        self.logical_bytes += len(data)
+        if digest in self._seen:
+            self.reused_chunks += 1
+            return digest
+        self._seen.add(digest)
+        path = self._store.chunk_path(digest)
+        if path.exists():
+            self.reused_chunks += 1
+            try:
+                # Refresh the mtime so a concurrent garbage collection keeps it.
+                os.utime(path)
+            except OSError:
+                pass
+            return digest
+        self._slots.acquire()
+        future = self._pool.submit(self._write, path, data)
+        future.add_done_callback(lambda _future: self._slots.release())
+        self._futures.append(future)
+        return digest
+
+    def reuse(self, entry: dict[str, Any]) -> bool:
+        """Keep the chunks of a manifest entry carried over from an earlier snapshot.
+
+        Their mtime is refreshed as in :meth:`put`, so a garbage collection
+        that runs before the new manifest is written keeps them.
+
+        Returns:
+            ``False`` when a chunk is missing; the caller must store the
+            content again.
+        """
+        for digest in entry["chunks"]:
+            if digest in self._seen:
+                continue
+            try:
+                os.utime(self._store.chunk_path(digest))
+            except FileNotFoundError:
+                return False
+            except OSError:
+                pass
+            self._seen.add(digest)
+        self.logical_bytes += entry["size"]
+        self.reused_chunks += len(entry["chunks"])
+        return True
+
+    def put_stream(self, blocks: Iterable[bytes]) -> dict[str, Any]:
+        """Store every block of one stream and return its manifest entry."""
+        whole = hashlib.sha256()
+        size = 0
+        chunks = []
+        for block in blocks:
+            whole.update(block)
+            size += len(block)
+            chunks.append(self.put(block))
+        return {"size": size, "sha256": whole.hexdigest(), "chunks": chunks}
+
+    def _write(self, path: Path, data: bytes) -> int:
+        compressed = zlib.compress(data, self._level)
+        if len(compressed) < len(data) * _MIN_COMPRESSION_GAIN:
+            blob = _CODEC_ZLIB + compressed
+        else:
+            blob = _CODEC_RAW + data
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+        try:
+            tmp.write_bytes(blob)
+            os.replace(tmp, path)
+        finally:
+            tmp.unlink(missing_ok=True)
+        return len(blob)
+
+    def close(self) -> None:
+        try:
+            for future in self._futures:
+                self.stored_bytes += future.result()
+                self.new_chunks += 1
+        finally:
+            self._futures.clear()
+            self._pool.shutdown(wait=True, cancel_futures=True)
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "logical_bytes": self.logical_bytes,
+            "stored_bytes": self.stored_bytes,
+            "new_chunks": self.new_chunks,
+            "reused_chunks": self.reused_chunks,
+        }
+
+
+class ChunkStore:
+    """A directory of content-addressed chunks and snapshot manifests."""
+
+    def __init__(self, root: Path | str) -> None:
+        self.root = Path(root)
+        self.chunk_dir = self.root / CHUNK_DIR
+        self.manifest_dir = self.root / MANIFEST_DIR
+
+    def chunk_path(self, digest: str) -> Path:
+        return self.chunk_dir / digest[:2] / digest
+
+    def writer(self, threads: int = 1, compression_level: int = 6) -> ChunkWriter:
+        return ChunkWriter(self, threads=threads, compression_level=compression_level)
+
+    def read_chunk(self, digest: str) -> bytes:
+        """Return the verified content of chunk *digest*.
+
+        Raises:
+            ValueError: If the chunk is missing or does not match its digest.
+        """
+        try:
+            blob = self.chunk_path(digest).read_bytes()
+        except FileNotFoundError as exc:
+            raise ValueError(f"Backup chunk {digest} is missing") from exc
+        codec, payload = blob[:1], blob[1:]
+        try:
+            data = zlib.decompress(payload) if codec == _CODEC_ZLIB else payload
+        except zlib.error as exc:
+            raise ValueError(f"Backup chunk {digest} is corrupt: {exc}") from exc
+        if codec not in (_CODEC_RAW, _CODEC_ZLIB) or hashlib.sha256(data).hexdigest() != digest:
+            raise ValueError(f"Backup chunk {digest} is corrupt")
+        return data
+
+    def iter_entry(self, entry: dict[str, Any]) -> Iterator[bytes]:
+        """Yield the content of a manifest entry, verifying its overall checksum at the end."""
+        whole = hashlib.sha256()
+        for digest in entry["chunks"]:
+            data = self.read_chunk(digest)
+            whole.update(data)
+            yield data
+        if whole.hexdigest() != entry["sha256"]:
+            raise ValueError("Restored content does not match the checksum recorded in the snapshot")
+
+    # -- manifests ---------------------------------------------------------
+
+    def manifest_path(self, name: str) -> Path:
+        return self.manifest_dir / name
+
+    def write_manifest(self, name: str, manifest: dict[str, Any]) -> Path:
+        """Atomically write *manifest* as ``manifests/<name>``."""
+        self.manifest_dir.mkdir(parents=True, exist_ok=True)
+        path = self.manifest_path(name)
+        tmp = path.with_name(f".{name}.partial")
+        try:
+            with gzip.open(tmp, "wt", encoding="utf-8") as fh:
+                json.dump({"version": MANIFEST_VERSION, **manifest}, fh, separators=(",", ":"))
+            os.replace(tmp, path)
+        finally:
+            tmp.unlink(missing_ok=True)
+        return path
+
+    @staticmethod
+    def load_manifest(path: Path | str) -> dict[str, Any]:
+        """Read a manifest.
+
+        Raises:
+            ValueError: If the manifest cannot be read or has an unknown version.
+        """
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as fh:
+                manifest = json.load(fh)
+        except (OSError, EOFError, json.JSONDecodeError) as exc:
+            raise ValueError(f"Cannot read snapshot manifest {Path(path).name}: {exc}") from exc
+        if not isinstance(manifest, dict) or manifest.get("version") != MANIFEST_VERSION:
+            raise ValueError(f"Unsupported snapshot manifest {Path(path).name}")
+        return manifest
+
+    def manifests(self) -> list[Path]:
+        """Return the manifest paths, oldest first (names embed a sortable timestamp)."""
+        if not self.manifest_dir.is_dir():
+            return []
+        paths = [path for path in self.manifest_dir.glob(f"*{MANIFEST_SUFFIX}") if not path.name.startswith(".")]
+        return sorted(paths, key=lambda path: (path.stat().st_mtime_ns, path.name))
+
+    def referenced_chunks(self) -> set[str]:
+        """Return the digests referenced by any manifest.
+
+        Raises:
+            ValueError: If a manifest cannot be read; collecting garbage without
+                it could delete chunks that snapshot still needs.
+        """
+        referenced: set[str] = set()
+        for path in self.manifests():
+            manifest = self.load_manifest(path)
+            database = manifest.get("database")
+            if database:
+                referenced.update(database["chunks"])
+            for entry in (manifest.get("documents") or {}).values():
+                referenced.update(entry["chunks"])
+        return referenced
+
+    # -- maintenance -------------------------------------------------------
+
+    def collect_garbage(self, grace_seconds: float = GC_GRACE_SECONDS, now: float | None = None) -> dict[str, int]:
+        """Delete chunks (and stale temp files) no manifest references.
+
+        Returns:
+            ``{"deleted": <chunks removed>, "freed_bytes": <bytes released>}``.
+        """
+        deleted = freed = 0
+        if not self.chunk_dir.is_dir():
+            return {"deleted": 0, "freed_bytes": 0}
+        referenced = self.referenced_chunks()
+        cutoff = (time.time() if now is None else now) - grace_seconds
+        for bucket in self.chunk_dir.iterdir():
+            if not bucket.is_dir():
+                continue
+            for entry in os.scandir(bucket):
+                if entry.name in referenced:
+                    continue
+                try:
+                    stat = entry.stat()
+                    if stat.st_mtime >= cutoff:
+                        continue
+                    os.remove(entry.path)
+                except FileNotFoundError:
+                    continue
+                except OSError as exc:
+                    logger.warning("Could not remove unreferenced backup chunk %s: %s", entry.name, exc)
+                    continue
+                deleted += 1
+                freed += stat.st_size
+        return {"deleted": deleted, "freed_bytes": freed}
+
+    def size_bytes(self) -> int:
+        """Return the bytes used by chunks and manifests."""
+        total = 0
+        for directory in (self.chunk_dir, self.manifest_dir):
+            if not directory.is_dir():
+                continue
+            for dirpath, _dirnames, filenames in os.walk(directory):
+                for filename in filenames:
+                    try:
+                        total += os.stat(os.path.join(dirpath, filename)).st_size
+                    except FileNotFoundError:
+                        continue
+        return total
@@ -22,9 +22,13 @@ from __future__ import annotations
 
 import logging
 import re
+from collections.abc import Iterable
 from dataclasses import dataclass, field
+from functools import lru_cache
 from typing import Any
 
+from app.utils.rule_sets import KeywordMatcher, split_keywords
+
 logger = logging.getLogger(__name__)
 
 # ---------------------------------------------------------------------------
@@ -215,78 +219,136 @@ _CONFIDENCE_BONUS_PER_EXTRA_RULE = 10
 
 
 # ---------------------------------------------------------------------------
-# Matching helpers
+# Compiled rule sets
 # ---------------------------------------------------------------------------
 
 
-def _match_filename(rule: ClassificationRule, filename: str) -> bool:
-    """Return True if *rule.pattern* (regex) matches anywhere in *filename*."""
-    if not filename:
-        return False
-    flags = 0 if rule.case_sensitive else re.IGNORECASE
-    return bool(re.search(rule.pattern, filename, flags))
+class CompiledClassificationRules:
+    """A list of rules compiled once for repeated classification.
 
+    Filename patterns are pre-compiled, all content keywords are found with a
+    single :class:`~app.utils.rule_sets.KeywordMatcher` pass per case mode,
+    and metadata rules are indexed by field so only fields that have rules
+    are looked up.
+    """
 
-def _match_content(rule: ClassificationRule, text: str) -> bool:
-    """Return True if any keyword in *rule.pattern* appears in *text*.
+    def __init__(self, rules: Iterable[ClassificationRule]) -> None:
+        # Stable sort: higher priority first, original order within a priority.
+        self.rules = sorted(rules, key=lambda r: r.priority, reverse=True)
+        self._filename_rules: list[tuple[int, re.Pattern[str]]] = []
+        self._content_rules: list[tuple[int, bool, frozenset[str]]] = []
+        self._metadata_index: dict[str, list[tuple[int, bool, str]]] = {}
+
+        keywords: dict[bool, set[str]] = {False: set(), True: set()}
+        for order, rule in enumerate(self.rules):
+            if rule.rule_type == RULE_TYPE_FILENAME:
+                try:
+                    regex = re.compile(rule.pattern, 0 if rule.case_sensitive else re.IGNORECASE)
+                except re.error:
+                    logger.warning("Skipping classification rule %r with invalid regex", rule.name)
+                    continue
+                self._filename_rules.append((order, regex))
+            elif rule.rule_type == RULE_TYPE_CONTENT:
+                rule_keywords = split_keywords(rule.pattern)
+                keywords[rule.case_sensitive].update(rule_keywords)
+                normalized = frozenset(kw if rule.case_sensitive else kw.lower() for kw in rule_keywords)
+                self._content_rules.append((order, rule.case_sensitive, normalized))
+            elif "=" in rule.pattern:
+                field_name, expected_value = rule.pattern.split("=", 1)
+                expected = expected_value.strip() if rule.case_sensitive else expected_value.strip().lower()
+                self._metadata_index.setdefault(field_name.strip(), []).append((order, rule.case_sensitive, expected))
+
+        self._keyword_matchers = {
+            case_sensitive: KeywordMatcher(values, case_sensitive) for case_sensitive, values in keywords.items()
+        }
+
+    def _matching_orders(self, filename: str, text: str, metadata: dict[str, Any] | None) -> list[int]:
+        orders: list[int] = []
+        if filename:
+            orders.extend(order for order, regex in self._filename_rules if regex.search(filename))
+
+        if text and self._content_rules:
+            found = {case_sensitive: matcher.search(text) for case_sensitive, matcher in self._keyword_matchers.items()}
+            orders.extend(
+                order
+                for order, case_sensitive, rule_keywords in self._content_rules
+                if not rule_keywords.isdisjoint(found[case_sensitive])
+            )
+
+        if metadata:
+            for field_name, entries in self._metadata_index.items():
+                actual = metadata.get(field_name)
+                if actual is None:
+                    continue
+                actual_text = str(actual)
+                actual_lower = actual_text.lower()
+                orders.extend(
+                    order
+                    for order, case_sensitive, expected in entries
+                    if (actual_text if case_sensitive else actual_lower) == expected
+                )
+        return sorted(orders)
+
+    def classify(
+        self,
+        filename: str = "",
+        text: str = "",
+        metadata: dict[str, Any] | None = None,
+    ) -> ClassificationResult:
+        """Classify a document; see :func:`classify_document`."""
+        matches = [
+            MatchedRule(
+                rule_name=rule.name,
+                rule_type=rule.rule_type,
+                category=rule.category,
+                confidence=_CONFIDENCE_MAP.get(rule.rule_type, 50),
+            )
+            for rule in (self.rules[order] for order in self._matching_orders(filename, text, metadata))
+        ]
+        return _summarize_matches(matches)
+
+
+def _summarize_matches(matches: list[MatchedRule]) -> ClassificationResult:
+    """Pick the winning category from the rules that fired."""
+    if not matches:
+        return ClassificationResult(category="unknown", confidence=0, matched_rules=[])
 
-    Keywords are separated by ``|`` (pipe).
-    """
-    if not text:
-        return False
-    keywords = [kw.strip() for kw in rule.pattern.split("|") if kw.strip()]
-    text_lower = text if rule.case_sensitive else text.lower()
-    return any((kw if rule.case_sensitive else kw.lower()) in text_lower for kw in keywords)
+    # Aggregate by category: pick the one with the most matches, then highest
+    # cumulative confidence as tiebreaker.
+    category_scores: dict[str, list[MatchedRule]] = {}
+    for m in matches:
+        category_scores.setdefault(m.category, []).append(m)
 
+    best_category = max(
+        category_scores,
+        key=lambda cat: (len(category_scores[cat]), sum(m.confidence for m in category_scores[cat])),
+    )
 
-def _match_metadata(rule: ClassificationRule, metadata: dict[str, Any] | None) -> bool:
-    """Return True if *rule.pattern* (``field=value``) matches *metadata*.
+    best_matches = category_scores[best_category]
+    base_confidence = max(m.confidence for m in best_matches)
+    bonus = min(
+        (len(best_matches) - 1) * _CONFIDENCE_BONUS_PER_EXTRA_RULE,
+        100 - base_confidence,
+    )
+    final_confidence = min(base_confidence + bonus, 100)
 
-    Pattern format: ``field_name=expected_value``.
-    """
-    if not metadata:
-        return False
-    if "=" not in rule.pattern:
-        return False
-    field_name, expected_value = rule.pattern.split("=", 1)
-    actual = metadata.get(field_name.strip())
-    if actual is None:
-        return False
-    if rule.case_sensitive:
-        return str(actual) == expected_value.strip()
-    return str(actual).lower() == expected_value.strip().lower()
-
-
-_MATCHERS: dict[str, tuple] = {
-    RULE_TYPE_FILENAME: (_match_filename, "filename"),
-    RULE_TYPE_CONTENT: (_match_content, "text"),
-    RULE_TYPE_METADATA: (_match_metadata, "metadata"),
-}
+    return ClassificationResult(
+        category=best_category,
+        confidence=final_confidence,
+        matched_rules=best_matches,
+    )
 
 
-def _evaluate_rule(
-    rule: ClassificationRule,
-    filename: str,
-    text: str,
-    metadata: dict[str, Any] | None,
-) -> MatchedRule | None:
-    """Evaluate a single rule against the document.  Return a :class:`MatchedRule` on match."""
-    entry = _MATCHERS.get(rule.rule_type)
-    if entry is None:
-        return None
+@lru_cache(maxsize=1)
+def _builtin_rule_set() -> CompiledClassificationRules:
+    return CompiledClassificationRules(BUILTIN_RULES)
 
-    matcher, arg_key = entry
-    arg_map = {"filename": filename, "text": text, "metadata": metadata}
-    matched = matcher(rule, arg_map[arg_key])
 
-    if matched:
-        return MatchedRule(
-            rule_name=rule.name,
-            rule_type=rule.rule_type,
-            category=rule.category,
-            confidence=_CONFIDENCE_MAP.get(rule.rule_type, 50),
-        )
-    return None
+def compile_classification_rules(custom_rules: list[ClassificationRule] | None = None) -> CompiledClassificationRules:
+    """Compile the built-in rules plus *custom_rules* into one rule set."""
+    if not custom_rules:
+        return _builtin_rule_set()
+    return CompiledClassificationRules([*BUILTIN_RULES, *custom_rules])
 
 
 # ---------------------------------------------------------------------------
@@ -306,6 +368,10 @@ def classify_document(
     custom for the same priority).  The category with the most rule matches
     wins; ties are broken by cumulative confidence.
 
+    Callers that classify many documents against the same rules should keep
+    the result of :func:`compile_classification_rules` and call its
+    :meth:`~CompiledClassificationRules.classify` method instead.
+
     Args:
         filename: Original filename of the document.
         text: Extracted / OCR text of the document.
@@ -316,46 +382,7 @@ def classify_document(
         A :class:`ClassificationResult` with the best matching category,
         overall confidence score, and the list of rules that fired.
     """
-    all_rules = list(BUILTIN_RULES)
-    if custom_rules:
-        all_rules.extend(custom_rules)
-
-    # Sort by priority descending (higher priority first)
-    all_rules.sort(key=lambda r: r.priority, reverse=True)
-
-    matches: list[MatchedRule] = []
-    for rule in all_rules:
-        result = _evaluate_rule(rule, filename, text, metadata)
-        if result is not None:
-            matches.append(result)
-
-    if not matches:
-        return ClassificationResult(category="unknown", confidence=0, matched_rules=[])
-
-    # Aggregate by category: pick the one with the most matches, then highest
-    # cumulative confidence as tiebreaker.
-    category_scores: dict[str, list[MatchedRule]] = {}
-    for m in matches:
-        category_scores.setdefault(m.category, []).append(m)
-
-    best_category = max(
-        category_scores,
-        key=lambda cat: (len(category_scores[cat]), sum(m.confidence for m in category_scores[cat])),
-    )
-
-    best_matches = category_scores[best_category]
-    base_confidence = max(m.confidence for m in best_matches)
-    bonus = min(
-        (len(best_matches) - 1) * _CONFIDENCE_BONUS_PER_EXTRA_RULE,
-        100 - base_confidence,
-    )
-    final_confidence = min(base_confidence + bonus, 100)
-
-    return ClassificationResult(
-        category=best_category,
-        confidence=final_confidence,
-        matched_rules=best_matches,
-    )
+    return compile_classification_rules(custom_rules).classify(filename, text, metadata)
 
 
 def db_rule_to_engine_rule(db_rule: Any) -> ClassificationRule:
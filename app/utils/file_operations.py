@@ -1,12 +1,13 @@
 import hashlib
 from pathlib import Path
 
+# Dropbox hashes content in fixed 4 MiB blocks; see
+# https://www.dropbox.com/developers/reference/content-hash
+DROPBOX_CONTENT_HASH_BLOCK_SIZE = 4 * 1024 * 1024
 
-def hash_file(filepath: str | Path, chunk_size: int = 65536) -> str:
-    """
-    Returns the SHA-256 hash of the file at 'filepath'.
-    Reads the file in chunks to handle large files efficiently.
-    """
+
+def _resolve_within_workdir(filepath: str | Path) -> Path:
+    """Resolve *filepath* and reject anything outside the configured workdir."""
     from app.config import settings
 
     filepath_obj = Path(filepath).resolve()
@@ -17,6 +18,15 @@ def hash_file(filepath: str | Path, chunk_size: int = 65536) -> str:
         filepath_obj.relative_to(workdir_obj)
     except ValueError:
         raise FileNotFoundError(f"Access denied: path traversal attempt or file outside workdir '{filepath}'")
+    return filepath_obj
+
+
+def hash_file(filepath: str | Path, chunk_size: int = 65536) -> str:
+    """
+    Returns the SHA-256 hash of the file at 'filepath'.
+    Reads the file in chunks to handle large files efficiently.
+    """
+    filepath_obj = _resolve_within_workdir(filepath)
 
     sha256 = hashlib.sha256()
     with open(filepath_obj, "rb") as f:
@@ -26,3 +36,25 @@ def hash_file(filepath: str | Path, chunk_size: int = 65536) -> str:
                 break
             sha256.update(data)
     return sha256.hexdigest()
+
+
+def hash_file_with_content_hash(filepath: str | Path) -> tuple[str, str]:
+    """
+    Returns ``(sha256, dropbox_content_hash)`` for the file at 'filepath'.
+
+    Both digests are computed in a single read pass.  The second value uses
+    Dropbox's block-based ``content_hash`` algorithm so that remote Dropbox
+    entries can be matched against ingested files before they are downloaded.
+    """
+    filepath_obj = _resolve_within_workdir(filepath)
+
+    sha256 = hashlib.sha256()
+    block_digests = hashlib.sha256()
+    with open(filepath_obj, "rb") as f:
+        while True:
+            block = f.read(DROPBOX_CONTENT_HASH_BLOCK_SIZE)
+            if not block:
+                break
+            sha256.update(block)
+            block_digests.update(hashlib.sha256(block).digest())
+    return sha256.hexdigest(), block_digests.hexdigest()
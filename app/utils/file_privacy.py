@@ -8,7 +8,8 @@ from datetime import datetime, timezone
 from sqlalchemy.orm import Session
 
 from app.models import FileRecord, PrivacyDecisionAudit, PrivacyRuleModel, SharedLink
-from app.utils.privacy_rules import PrivacyMatch, match_rule_to_file
+from app.utils.privacy_rules import CompiledPrivacyRules, PrivacyMatch, parse_metadata
+from app.utils.rule_sets import RULE_KIND_PRIVACY, rule_fingerprint, rule_set_cache
 
 logger = logging.getLogger(__name__)
 
@@ -88,26 +89,31 @@ def apply_first_matching_privacy_rule(db: Session, file_record: FileRecord) -> b
     if file_record.privacy_manual_override is not None:
         return False
     rule_owner_id = file_record.owner_id
-    rules = (
-        db.query(PrivacyRuleModel)
-        .filter(PrivacyRuleModel.owner_id == rule_owner_id, PrivacyRuleModel.enabled.is_(True))
-        .order_by(PrivacyRuleModel.priority.desc(), PrivacyRuleModel.id)
-        .all()
+    query = db.query(PrivacyRuleModel).filter(
+        PrivacyRuleModel.owner_id == rule_owner_id, PrivacyRuleModel.enabled.is_(True)
     )
-    for rule in rules:
-        match = match_rule_to_file(rule, file_record)
-        if match.matched:
-            if file_record.is_private:
-                return False
-            apply_privacy_decision(
-                db,
-                file_record,
-                is_private=True,
-                source="rule",
-                manual_override=None,
-                rule=rule,
-                match=match,
-                decision_owner_id=rule_owner_id,
-            )
-            return True
-    return False
+    rule_set = rule_set_cache(RULE_KIND_PRIVACY).get(
+        rule_owner_id,
+        rule_fingerprint(query, PrivacyRuleModel),
+        lambda: CompiledPrivacyRules(query.order_by(PrivacyRuleModel.priority.desc(), PrivacyRuleModel.id).all()),
+    )
+    hit = rule_set.first_match(
+        file_record.original_filename, file_record.ocr_text, parse_metadata(file_record.ai_metadata)
+    )
+    if hit is None or file_record.is_private:
+        return False
+    rule_id, match = hit
+    rule = db.get(PrivacyRuleModel, rule_id)
+    if rule is None:
+        return False
+    apply_privacy_decision(
+        db,
+        file_record,
+        is_private=True,
+        source="rule",
+        manual_override=None,
+        rule=rule,
+        match=match,
+        decision_owner_id=rule_owner_id,
+    )
+    return True
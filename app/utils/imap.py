@@ -1,11 +1,39 @@
+"""IMAP connection checks and protocol helpers for incremental ingestion.
+
+The helpers below let the UID-based ingestion engine in
+:mod:`app.tasks.imap_tasks` work from ``BODYSTRUCTURE`` responses instead of
+downloading complete RFC 822 messages:
+
+* :func:`parse_fetch_items` turns ``imaplib`` FETCH data (including literals)
+  into nested Python values.
+* :func:`iter_body_parts` walks a parsed ``BODYSTRUCTURE`` and yields leaf
+  parts with their IMAP section numbers, filenames and transfer encodings.
+* :func:`uid_ranges` compresses UID lists into batched ``a:b`` sets.
+* :func:`stream_body_part` downloads one part with partial ``BODY.PEEK``
+  fetches and decodes it to disk chunk by chunk.
+"""
+
+import base64
+import binascii
+import email.header
+import email.utils
 import imaplib
 import logging
+import re
+import urllib.parse
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
 from typing import Any
 
 from app.utils.network import is_private_ip
 
 logger = logging.getLogger(__name__)
 
+# Partial fetch window for streamed attachment downloads.
+BODY_PART_CHUNK_SIZE = 1024 * 1024
+
+_LITERAL_RE = re.compile(rb"\{(\d+)\}$")
+
 
 def test_imap_connection(host: str, port: int, username: str, password: str, use_ssl: bool) -> dict[str, Any]:
     """Attempt to connect and log in to the IMAP server.
@@ -32,3 +60,343 @@ def test_imap_connection(host: str, port: int, username: str, password: str, use
     except Exception as exc:  # noqa: BLE001
         logger.warning("IMAP error for %s@%s: %s", username, host, exc)
         return {"success": False, "message": "Authentication failed. Check the username, password, and TLS settings."}
+
+
+@dataclass(frozen=True)
+class BodyPart:
+    """One leaf MIME part described by an IMAP ``BODYSTRUCTURE`` response."""
+
+    section: str
+    mime_type: str
+    encoding: str
+    size: int
+    filename: str | None
+
+
+class _SexpReader:
+    """Minimal reader for the parenthesised lists in IMAP FETCH responses."""
+
+    def __init__(self, text: bytes, literals: list[bytes]) -> None:
+        self.text = text
+        self.literals = literals
+        self.pos = 0
+
+    def read_all(self) -> list[Any]:
+        values = []
+        while True:
+            self._skip_spaces()
+            if self.pos >= len(self.text):
+                return values
+            values.append(self._read_value())
+
+    def _skip_spaces(self) -> None:
+        while self.pos < len(self.text) and self.text[self.pos] in b" \r\n":
+            self.pos += 1
+
+    def _read_value(self) -> Any:
+        char = self.text[self.pos : self.pos + 1]
+        if char == b"(":
+            self.pos += 1
+            values = []
+            while True:
+                self._skip_spaces()
+                if self.pos >= len(self.text):
+                    raise ValueError("Unterminated list in IMAP response")
+                if self.text[self.pos : self.pos + 1] == b")":
+                    self.pos += 1
+                    return values
+                values.append(self._read_value())
+        if char == b")":
+            raise ValueError("Unexpected ')' in IMAP response")
+        if char == b'"':
+            return self._read_quoted()
+        if char == b"{":
+            end = self.text.index(b"}", self.pos)
+            self.pos = end + 1
+            if not self.literals:
+                raise ValueError("IMAP literal announced without data")
+            return self.literals.pop(0).decode("utf-8", errors="replace")
+        return self._read_atom()
+
+    def _read_quoted(self) -> str:
+        self.pos += 1
+        out = bytearray()
+        while self.pos < len(self.text):
+            char = self.text[self.pos]
+            if char == 0x5C:  # backslash escape
+                out.append(self.text[self.pos + 1])
+                self.pos += 2
+                continue
+            if char == 0x22:  # closing quote
+                self.pos += 1
+                return out.decode("utf-8", errors="replace")
+            out.append(char)
+            self.pos += 1
+        raise ValueError("Unterminated quoted string in IMAP response")
+
+    def _read_atom(self) -> Any:
+        start = self.pos
+        depth = 0
+        while self.pos < len(self.text):
+            char = self.text[self.pos : self.pos + 1]
+            # Section specifiers such as BODY[1.2]<0> keep their brackets intact.
+            if char == b"[":
+                depth += 1
+            elif char == b"]":
+                depth -= 1
+            elif depth == 0 and char in (b" ", b"(", b")", b'"', b"{", b"\r", b"\n"):
+                break
+            self.pos += 1
+        atom = self.text[start : self.pos].decode("ascii", errors="replace")
+        if atom.upper() == "NIL":
+            return None
+        if atom.isdigit():
+            return int(atom)
+        return atom
+
+
+def parse_fetch_items(data: Iterable[Any]) -> list[dict[str, Any]]:
+    """Parse ``imaplib`` FETCH data into one ``{ITEM: value}`` dict per message.
+
+    ``imaplib`` returns plain ``bytes`` for responses without literals and
+    ``(prefix, literal)`` tuples followed by continuation ``bytes`` otherwise.
+    Item names are upper-cased (``UID``, ``BODYSTRUCTURE``, ``BODY[2]<0>``).
+    """
+    messages: list[tuple[bytes, list[bytes]]] = []
+    for item in data or []:
+        if item is None:
+            continue
+        if isinstance(item, tuple):
+            prefix, literal = item[0], item[1]
+            if not messages or not _continues_message(messages[-1][0]):
+                messages.append((b"", []))
+            text, literals = messages[-1]
+            messages[-1] = (text + prefix, [*literals, literal])
+        elif isinstance(item, bytes):
+            if messages and _continues_message(messages[-1][0]):
+                text, literals = messages[-1]
+                messages[-1] = (text + item, literals)
+            else:
+                messages.append((item, []))
+
+    parsed: list[dict[str, Any]] = []
+    for text, literals in messages:
+        values = _SexpReader(text, list(literals)).read_all()
+        attributes = next((value for value in values if isinstance(value, list)), None)
+        if attributes is None:
+            continue
+        items: dict[str, Any] = {}
+        for index in range(0, len(attributes) - 1, 2):
+            name = attributes[index]
+            if isinstance(name, str):
+                items[name.upper()] = attributes[index + 1]
+        parsed.append(items)
+    return parsed
+
+
+def _continues_message(text: bytes) -> bool:
+    """Return whether a message's parenthesised attribute list is still open."""
+    depth = 0
+    in_quote = False
+    escaped = False
+    for char in text:
+        if in_quote:
+            if escaped:
+                escaped = False
+            elif char == 0x5C:
+                escaped = True
+            elif char == 0x22:
+                in_quote = False
+            continue
+        if char == 0x22:
+            in_quote = True
+        elif char == 0x28:
+            depth += 1
+        elif char == 0x29:
+            depth -= 1
+    return depth > 0 or bool(_LITERAL_RE.search(text.rstrip()))
+
+
+def _decode_header_value(value: str) -> str:
+    """Decode RFC 2047 encoded words, keeping the raw value when malformed."""
+    try:
+        return str(email.header.make_header(email.header.decode_header(value)))
+    except (LookupError, UnicodeError, ValueError, binascii.Error):
+        return value
+
+
+def _params_to_dict(params: Any) -> dict[str, str]:
+    if not isinstance(params, list):
+        return {}
+    result: dict[str, str] = {}
+    for index in range(0, len(params) - 1, 2):
+        key, value = params[index], params[index + 1]
+        if isinstance(key, str) and value is not None:
+            result[key.lower()] = str(value)
+    return result
+
+
+def _filename_from_params(params: dict[str, str]) -> str | None:
+    for key in ("filename*", "name*"):
+        if key in params:
+            charset, _language, text = email.utils.decode_rfc2231(params[key])
+            try:
+                return urllib.parse.unquote(text, encoding=charset or "utf-8", errors="replace")
+            except LookupError:
+                return urllib.parse.unquote(text, errors="replace")
+    for key in ("filename", "name"):
+        if params.get(key):
+            return _decode_header_value(params[key])
+    return None
+
+
+def iter_body_parts(structure: Any, section: str = "") -> Iterator[BodyPart]:
+    """Yield every leaf part of a parsed ``BODYSTRUCTURE`` with its section number."""
+    if not isinstance(structure, list) or not structure:
+        return
+    if isinstance(structure[0], list):
+        # Child parts come first; the multipart subtype and extension data follow.
+        children = []
+        for child in structure:
+            if not isinstance(child, list):
+                break
+            children.append(child)
+        for index, child in enumerate(children, start=1):
+            yield from iter_body_parts(child, f"{section}.{index}" if section else str(index))
+        return
+
+    main_type = str(structure[0] or "").lower()
+    sub_type = str(structure[1] or "").lower() if len(structure) > 1 else ""
+    body_params = _params_to_dict(structure[2] if len(structure) > 2 else None)
+    encoding = str(structure[5] or "7bit").lower() if len(structure) > 5 else "7bit"
+    size = structure[6] if len(structure) > 6 and isinstance(structure[6], int) else 0
+    # Extension data follows the type-specific fields: TEXT adds a line count,
+    # MESSAGE/RFC822 adds envelope, body and line count before MD5/disposition.
+    if main_type == "text":
+        disposition_index = 9
+    elif main_type == "message" and sub_type == "rfc822":
+        disposition_index = 11
+    else:
+        disposition_index = 8
+    disposition = structure[disposition_index] if len(structure) > disposition_index else None
+    disposition_params: dict[str, str] = {}
+    if isinstance(disposition, list) and len(disposition) > 1:
+        disposition_params = _params_to_dict(disposition[1])
+
+    yield BodyPart(
+        section=section or "1",
+        mime_type=f"{main_type}/{sub_type}",
+        encoding=encoding,
+        size=size,
+        filename=_filename_from_params(disposition_params) or _filename_from_params(body_params),
+    )
+
+
+def uid_ranges(uids: Iterable[int], batch_size: int) -> Iterator[str]:
+    """Yield IMAP UID sets covering *uids*, at most *batch_size* UIDs each.
+
+    Consecutive UIDs collapse to ``a:b`` ranges so one FETCH command covers a
+    whole batch, e.g. ``[1, 2, 3, 7]`` → ``"1:3,7"``.
+    """
+    ordered = sorted(set(uids))
+    for start in range(0, len(ordered), max(1, batch_size)):
+        batch = ordered[start : start + max(1, batch_size)]
+        spans: list[str] = []
+        span_start = previous = batch[0]
+        for uid in batch[1:]:
+            if uid == previous + 1:
+                previous = uid
+                continue
+            spans.append(f"{span_start}:{previous}" if span_start != previous else str(span_start))
+            span_start = previous = uid
+        spans.append(f"{span_start}:{previous}" if span_start != previous else str(span_start))
+        yield ",".join(spans)
+
+
+class _TransferDecoder:
+    """Incrementally decode a Content-Transfer-Encoding across chunk borders."""
+
+    def __init__(self, encoding: str) -> None:
+        self.encoding = encoding
+        self.pending = b""
+
+    def feed(self, data: bytes) -> bytes:
+        if self.encoding == "base64":
+            buffered = self.pending + b"".join(data.split())
+            usable = len(buffered) - len(buffered) % 4
+            self.pending = buffered[usable:]
+            return base64.b64decode(buffered[:usable]) if usable else b""
+        if self.encoding == "quoted-printable":
+            buffered = self.pending + data
+            cut = buffered.rfind(b"\n") + 1
+            self.pending = buffered[cut:]
+            return binascii.a2b_qp(buffered[:cut]) if cut else b""
+        return data
+
+    def flush(self) -> bytes:
+        pending, self.pending = self.pending, b""
+        if not pending:
+            return b""
+        if self.encoding == "base64":
+            return base64.b64decode(pending + b"=" * (-len(pending) % 4))
+        if self.encoding == "quoted-printable":
+            return binascii.a2b_qp(pending)
+        return pending
+
+
+def stream_body_part(
+    mail: imaplib.IMAP4,
+    uid: int,
+    part: BodyPart,
+    target_path: str,
+    *,
+    max_bytes: int,
+    chunk_size: int = BODY_PART_CHUNK_SIZE,
+) -> int:
+    """Download one body part to *target_path* using partial ``BODY.PEEK`` fetches.
+
+    ``BODY.PEEK`` leaves the ``\\Seen`` flag untouched, and each round trip
+    transfers at most *chunk_size* encoded bytes, so memory use stays bounded
+    regardless of the attachment size.  Returns the number of decoded bytes.
+
+    Raises:
+        ValueError: If the decoded part exceeds *max_bytes*.
+        imaplib.IMAP4.error: If the server rejects a fetch.
+    """
+    decoder = _TransferDecoder(part.encoding)
+    written = 0
+    offset = 0
+    with open(target_path, "wb") as output:
+        while True:
+            status, data = mail.uid("FETCH", str(uid), f"(BODY.PEEK[{part.section}]<{offset}.{chunk_size}>)")
+            if status != "OK":
+                raise imaplib.IMAP4.error(f"Partial fetch of UID {uid} section {part.section} failed: {status}")
+            chunk = _partial_body_bytes(data)
+            if not chunk:
+                break
+            decoded = decoder.feed(chunk)
+            written += len(decoded)
+            if written > max_bytes:
+                raise ValueError("IMAP attachment exceeds the configured upload limit")
+            output.write(decoded)
+            offset += len(chunk)
+            if len(chunk) < chunk_size:
+                break
+        tail = decoder.flush()
+        written += len(tail)
+        if written > max_bytes:
+            raise ValueError("IMAP attachment exceeds the configured upload limit")
+        output.write(tail)
+    return written
+
+
+def _partial_body_bytes(data: Iterable[Any]) -> bytes:
+    """Return the raw bytes of a ``BODY[...]<offset>`` FETCH response item."""
+    for item in data or []:
+        if isinstance(item, tuple) and len(item) > 1 and b"BODY[" in item[0].upper():
+            return item[1] or b""
+    for items in parse_fetch_items(data):
+        for name, value in items.items():
+            if name.startswith("BODY[") and isinstance(value, str):
+                return value.encode("utf-8")
+    return b""
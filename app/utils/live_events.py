@@ -0,0 +1,129 @@
+"""Per-user live events over Redis pub/sub.
+
+The web UI used to poll for the notification badge, the files-page queue
+banner and per-file processing status, which keeps every open tab running
+count queries whether anything changed or not.  Instead, the code paths
+that change those values publish a small event:
+
+* :func:`app.utils.step_manager.update_step_status` → ``file_status``,
+* :func:`app.utils.user_notification.create_in_app_notification` and the
+  inbox read endpoints → ``notifications``,
+* the worker telemetry heartbeat, when its task counts change → ``queue``.
+
+Events for a user go to :func:`user_channel`; events every session may see
+(queue changes, and file status in single-user mode) go to
+:data:`BROADCAST_CHANNEL`.  ``GET /api/events/stream``
+(:mod:`app.api.events`) subscribes to both and turns events into
+server-sent events; pages fall back to polling when the stream is
+unavailable.
+
+Publishing is best effort: it never raises, and after a Redis failure it
+pauses for :data:`RETRY_AFTER_FAILURE_SECONDS` so a missing broker does not
+slow down the pipeline.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any
+
+import redis
+
+from app.config import settings
+from app.models import FileRecord
+
+logger = logging.getLogger(__name__)
+
+CHANNEL_PREFIX = "docuelevate:events"
+BROADCAST_CHANNEL = f"{CHANNEL_PREFIX}:all"
+
+EVENT_FILE_STATUS = "file_status"
+EVENT_NOTIFICATIONS = "notifications"
+EVENT_QUEUE = "queue"
+
+#: Seconds to skip publishing after Redis could not be reached.
+RETRY_AFTER_FAILURE_SECONDS = 30.0
+
+_lock = threading.Lock()
+_client: redis.Redis | None = None
+_client_pid: int | None = None
+_suspended_until = 0.0
+
+
+def live_events_enabled() -> bool:
+    """Return True when state changes should be published for the event stream."""
+    return getattr(settings, "live_events_enabled", False) is True
+
+
+def user_channel(owner_id: str) -> str:
+    """Return the pub/sub channel carrying *owner_id*'s events."""
+    return f"{CHANNEL_PREFIX}:user:{owner_id}"
+
+
+def _redis() -> redis.Redis:
+    """Return this process's publishing client (rebuilt after a fork)."""
+    global _client, _client_pid
+    with _lock:
+        if _client is None or _client_pid != os.getpid():
+            _client = redis.Redis.from_url(
+                settings.redis_url,
+                decode_responses=True,
+                socket_connect_timeout=1,
+                socket_timeout=1,
+            )
+            _client_pid = os.getpid()
+        return _client
+
+
+def publish_event(event: str, data: dict[str, Any] | None = None, *, owner_id: str | None = None) -> bool:
+    """Publish *event* to *owner_id*'s channel, or to everyone when *owner_id* is ``None``.
+
+    Returns:
+        True if the event was handed to Redis, False if publishing is
+        disabled, paused after a failure, or failed.
+    """
+    global _suspended_until
+    if not live_events_enabled() or time.monotonic() < _suspended_until:
+        return False
+    message = json.dumps({"event": event, "data": data or {}}, separators=(",", ":"), default=str)
+    try:
+        _redis().publish(user_channel(owner_id) if owner_id else BROADCAST_CHANNEL, message)
+    except Exception as exc:  # noqa: BLE001 - live updates must never break the caller
+        _suspended_until = time.monotonic() + RETRY_AFTER_FAILURE_SECONDS
+        logger.debug("Could not publish live event %s: %s", event, exc)
+        return False
+    return True
+
+
+def publish_file_status(db: Any, file_id: int, step_name: str, status: str) -> None:
+    """Publish a processing-step change of *file_id* to the sessions allowed to see it.
+
+    In multi-user mode only the file owner is notified (ownerless files are
+    not announced); otherwise every session is.
+    """
+    if not live_events_enabled():
+        return
+    owner_id = None
+    if getattr(settings, "multi_user_enabled", False) is True:
+        try:
+            owner_id = db.query(FileRecord.owner_id).filter(FileRecord.id == file_id).scalar()
+        except Exception as exc:  # noqa: BLE001 - live updates must never break the caller
+            logger.debug("Could not resolve the owner of file %s for live events: %s", file_id, exc)
+            return
+        if not owner_id:
+            return
+    publish_event(EVENT_FILE_STATUS, {"file_id": file_id, "step_name": step_name, "status": status}, owner_id=owner_id)
+
+
+def parse_event(raw: Any) -> tuple[str, dict[str, Any]] | None:
+    """Decode a pub/sub message published by :func:`publish_event`."""
+    try:
+        message = json.loads(raw)
+    except (TypeError, ValueError):
+        return None
+    if not isinstance(message, dict) or not isinstance(message.get("event"), str):
+        return None
+    data = message.get("data")
+    return message["event"], data if isinstance(data, dict) else {}
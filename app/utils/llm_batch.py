@@ -0,0 +1,238 @@
+"""Offline batch submission of chat-completion and embedding requests.
+
+Backfills do not need low latency, and OpenAI-compatible batch endpoints
+process large request sets at a fraction of the synchronous price.  A batch
+is a JSONL file with one request per line::
+
+    {"custom_id": "file-42", "method": "POST", "url": "/v1/chat/completions", "body": {...}}
+
+and its results are a JSONL file in which each line carries the same
+``custom_id`` plus either ``response.body`` or ``error``.
+
+Two backends implement :class:`BatchBackend`:
+
+* :class:`OpenAIBatchBackend` uploads the file and creates a batch through
+  the pooled OpenAI client (``/v1/files`` + ``/v1/batches``).
+* :class:`LocalBatchBackend` is a file-based stand-in for tests and for
+  providers without a batch API: files live under ``<workdir>/llm_batches``
+  and the requests are executed synchronously, through the configured AI
+  provider and embedding client, the first time the batch is polled.
+
+Select the backend with ``LLM_BATCH_BACKEND``; the backfill tasks that use
+it are in :mod:`app.tasks.llm_batch_tasks`.
+"""
+
+import json
+import logging
+import os
+import uuid
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import Any, Iterable, Optional
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+CHAT_ENDPOINT = "/v1/chat/completions"
+EMBEDDINGS_ENDPOINT = "/v1/embeddings"
+
+#: Batch states reported by :meth:`BatchBackend.poll` that will not change any more.
+TERMINAL_FAILURE_STATES = frozenset({"failed", "expired", "cancelled"})
+
+
+@dataclass
+class BatchPoll:
+    """Outcome of polling one batch.
+
+    ``status`` uses the OpenAI batch vocabulary (``validating``,
+    ``in_progress``, ``finalizing``, ``completed``, ``failed``, ``expired``,
+    ``cancelled``); ``results`` is only filled once it is ``completed``.
+    """
+
+    status: str
+    results: list[dict[str, Any]] = field(default_factory=list)
+    error: Optional[str] = None
+
+
+def batch_request(custom_id: str, endpoint: str, body: dict[str, Any]) -> dict[str, Any]:
+    """Return one JSONL request line."""
+    return {"custom_id": custom_id, "method": "POST", "url": endpoint, "body": body}
+
+
+def write_jsonl(path: str, lines: Iterable[dict[str, Any]]) -> int:
+    """Write *lines* to *path* as JSONL and return how many were written."""
+    count = 0
+    with open(path, "w", encoding="utf-8") as handle:
+        for line in lines:
+            handle.write(json.dumps(line, ensure_ascii=False))
+            handle.write("\n")
+            count += 1
+    return count
+
+
+def parse_jsonl(text: str) -> list[dict[str, Any]]:
+    """Parse JSONL *text*, skipping blank lines."""
+    return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+
+def _response_body(result: dict[str, Any]) -> Optional[dict[str, Any]]:
+    response = result.get("response") or {}
+    if result.get("error") or response.get("status_code", 200) >= 400:
+        return None
+    return response.get("body")
+
+
+def result_content(result: dict[str, Any]) -> Optional[str]:
+    """Return the assistant message of a chat-completion result line, or ``None`` if it failed."""
+    body = _response_body(result)
+    try:
+        return body["choices"][0]["message"]["content"] if body else None
+    except (KeyError, IndexError, TypeError):
+        return None
+
+
+def result_embedding(result: dict[str, Any]) -> Optional[list[float]]:
+    """Return the vector of an embeddings result line, or ``None`` if it failed.
+
+    Base64-encoded vectors (requests sent with ``encoding_format="base64"``)
+    are decoded to a float list.
+    """
+    body = _response_body(result)
+    try:
+        embedding = body["data"][0]["embedding"] if body else None
+    except (KeyError, IndexError, TypeError):
+        return None
+    if isinstance(embedding, str):
+        from app.utils.similarity import _decode_embedding
+
+        return _decode_embedding(embedding).tolist()
+    return embedding
+
+
+def result_error(result: dict[str, Any]) -> Optional[str]:
+    """Return a readable error for a failed result line."""
+    error = result.get("error")
+    if error:
+        return error.get("message") if isinstance(error, dict) else str(error)
+    response = result.get("response") or {}
+    if response.get("status_code", 200) >= 400:
+        return f"HTTP {response.get('status_code')}"
+    return None
+
+
+class BatchBackend(ABC):
+    """Submits JSONL request files and reports their results."""
+
+    name: str = ""
+
+    @abstractmethod
+    def submit(self, input_path: str, endpoint: str) -> str:
+        """Submit the requests in *input_path* and return the backend's batch id."""
+
+    @abstractmethod
+    def poll(self, batch_id: str) -> BatchPoll:
+        """Return the state of *batch_id*, with results once it completed."""
+
+
+class OpenAIBatchBackend(BatchBackend):
+    """The OpenAI (or compatible) Batch API, with a 24 hour completion window."""
+
+    name = "openai"
+
+    def __init__(self, client: Any = None) -> None:
+        if client is None:
+            from app.utils.llm_clients import get_openai_client
+
+            client = get_openai_client(api_key=settings.openai_api_key, base_url=settings.openai_base_url)
+        self._client = client
+
+    def submit(self, input_path: str, endpoint: str) -> str:
+        with open(input_path, "rb") as handle:
+            uploaded = self._client.files.create(file=handle, purpose="batch")
+        batch = self._client.batches.create(input_file_id=uploaded.id, endpoint=endpoint, completion_window="24h")
+        return batch.id
+
+    def poll(self, batch_id: str) -> BatchPoll:
+        batch = self._client.batches.retrieve(batch_id)
+        if batch.status != "completed":
+            errors = getattr(getattr(batch, "errors", None), "data", None) or []
+            message = "; ".join(str(getattr(error, "message", error)) for error in errors) or None
+            return BatchPoll(status=batch.status, error=message)
+        results: list[dict[str, Any]] = []
+        for file_id in (batch.output_file_id, getattr(batch, "error_file_id", None)):
+            if file_id:
+                results.extend(parse_jsonl(self._client.files.content(file_id).text))
+        return BatchPoll(status="completed", results=results)
+
+
+class LocalBatchBackend(BatchBackend):
+    """File-based stand-in that executes a batch in-process when it is first polled."""
+
+    name = "local"
+
+    def __init__(self, directory: Optional[str] = None) -> None:
+        self.directory = directory or os.path.join(settings.workdir, "llm_batches")
+
+    def _path(self, batch_id: str, suffix: str) -> str:
+        return os.path.join(self.directory, f"{batch_id}.{suffix}.jsonl")
+
+    def submit(self, input_path: str, endpoint: str) -> str:
+        os.makedirs(self.directory, exist_ok=True)
+        batch_id = f"local_{uuid.uuid4().hex}"
+        with open(input_path, encoding="utf-8") as handle:
+            requests = parse_jsonl(handle.read())
+        write_jsonl(self._path(batch_id, "input"), requests)
+        return batch_id
+
+    def poll(self, batch_id: str) -> BatchPoll:
+        output_path = self._path(batch_id, "output")
+        if not os.path.exists(output_path):
+            input_path = self._path(batch_id, "input")
+            if not os.path.exists(input_path):
+                return BatchPoll(status="failed", error=f"Unknown local batch {batch_id}")
+            with open(input_path, encoding="utf-8") as handle:
+                requests = parse_jsonl(handle.read())
+            write_jsonl(output_path + ".part", (self._execute(request) for request in requests))
+            os.replace(output_path + ".part", output_path)
+        with open(output_path, encoding="utf-8") as handle:
+            return BatchPoll(status="completed", results=parse_jsonl(handle.read()))
+
+    @staticmethod
+    def _execute(request: dict[str, Any]) -> dict[str, Any]:
+        body = request.get("body") or {}
+        try:
+            if request.get("url") == EMBEDDINGS_ENDPOINT:
+                from app.utils.similarity import generate_embedding
+
+                vector = generate_embedding(body["input"], model=body.get("model"))
+                response_body: dict[str, Any] = {"data": [{"index": 0, "embedding": vector}]}
+            else:
+                from app.utils.ai_provider import get_ai_provider
+
+                content = get_ai_provider().chat_completion(
+                    messages=body["messages"], model=body["model"], temperature=body.get("temperature", 0)
+                )
+                response_body = {"choices": [{"index": 0, "message": {"role": "assistant", "content": content}}]}
+        except Exception as exc:  # noqa: BLE001 - one failed request must not fail the batch
+            logger.warning("Local batch request %s failed: %s", request.get("custom_id"), exc)
+            return {"custom_id": request.get("custom_id"), "response": None, "error": {"message": str(exc)}}
+        return {
+            "custom_id": request.get("custom_id"),
+            "response": {"status_code": 200, "body": response_body},
+            "error": None,
+        }
+
+
+def get_batch_backend(name: Optional[str] = None) -> BatchBackend:
+    """Return the backend named *name* (default: ``LLM_BATCH_BACKEND``).
+
+    Raises:
+        ValueError: If the name is not ``openai`` or ``local``.
+    """
+    name = (name or getattr(settings, "llm_batch_backend", "openai") or "openai").lower()
+    if name == OpenAIBatchBackend.name:
+        return OpenAIBatchBackend()
+    if name == LocalBatchBackend.name:
+        return LocalBatchBackend()
+    raise ValueError(f"Unknown LLM batch backend '{name}' (expected 'openai' or 'local')")
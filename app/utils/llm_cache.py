@@ -0,0 +1,272 @@
+"""Content-addressed cache of LLM responses for pipeline stages.
+
+Re-processing a document (retries, bulk re-runs, duplicates uploaded by
+several users) sends the very same prompt to the model again.  Stages that
+call :func:`cached_chat_completion` instead of ``provider.chat_completion``
+store each response in :class:`app.models.LLMResponseCache` under a SHA-256
+of:
+
+* the stage name and its prompt template version (:data:`STAGE_VERSIONS`),
+* the provider class, model and temperature,
+* the exact request messages (and therefore the input text).
+
+Any change to the prompt, model or sampling settings yields a new key, so a
+stale answer is never reused; bumping a stage's version in
+:data:`STAGE_VERSIONS` invalidates it explicitly when only the response
+handling changed.
+
+Every stored response belongs to the document it was computed for: callers
+pass ``file_id`` or run inside :func:`llm_cache_file`, and responses computed
+outside any document are not stored at all.  Deleting a document removes its
+entries through :func:`purge_llm_cache_for_files`, so no derived copy of its
+content outlives it.
+
+Lookups and stores are fail-open: a database error is logged and the model
+is simply called.  Entries are evicted by age and by total size (least
+recently used first) by :func:`prune_llm_cache`, which the
+``prune-llm-response-cache`` beat job runs weekly.  The cache is controlled
+by ``LLM_CACHE_ENABLED`` and per stage by ``LLM_CACHE_DISABLED_STAGES``.
+"""
+
+import hashlib
+import json
+import logging
+from collections.abc import Iterator, Sequence
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Optional
+
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models import LLMResponseCache
+from app.utils.ai_provider import AIProvider, capture_usage
+from app.utils.metrics import record_cache_lookup, record_llm_cache_savings
+
+logger = logging.getLogger(__name__)
+
+#: Prompt template version per cacheable stage.  Bump a value to invalidate
+#: that stage's entries when its prompt handling changes.
+STAGE_VERSIONS: dict[str, str] = {
+    "extract_metadata": "1",
+    "refine_text": "1",
+    "translate": "1",
+    "ocr_merge": "1",
+    "text_quality": "1",
+    "text_quality_compare": "1",
+}
+
+#: Rows deleted per statement when evicting by size.
+_DELETE_BATCH = 500
+
+#: Document whose pipeline stages are currently running (see llm_cache_file).
+_current_file: ContextVar[Optional[int]] = ContextVar("llm_cache_file", default=None)
+
+
+@contextmanager
+def llm_cache_file(file_id: Optional[int]) -> Iterator[None]:
+    """Attribute responses cached inside the block to document *file_id*.
+
+    For helpers that call :func:`cached_chat_completion` without knowing
+    which document they work on (text quality checks, OCR merging).
+    """
+    token = _current_file.set(file_id)
+    try:
+        yield
+    finally:
+        _current_file.reset(token)
+
+
+def _disabled_stages() -> frozenset[str]:
+    raw = getattr(settings, "llm_cache_disabled_stages", "")
+    if not isinstance(raw, str):
+        return frozenset()
+    return frozenset(stage.strip() for stage in raw.split(",") if stage.strip())
+
+
+def stage_cache_enabled(stage: str) -> bool:
+    """Return True when responses of *stage* may be served from the cache."""
+    return getattr(settings, "llm_cache_enabled", False) is True and stage not in _disabled_stages()
+
+
+def _max_age_days() -> int:
+    value = getattr(settings, "llm_cache_max_age_days", 30)
+    return value if isinstance(value, int) and not isinstance(value, bool) and value > 0 else 30
+
+
+def _max_bytes() -> int:
+    value = getattr(settings, "llm_cache_max_size_mb", 256)
+    megabytes = value if isinstance(value, int) and not isinstance(value, bool) and value > 0 else 256
+    return megabytes * 1024 * 1024
+
+
+def cache_key(stage: str, provider: AIProvider, call_kwargs: dict[str, Any]) -> str:
+    """Return the SHA-256 hex digest identifying a *stage* request."""
+    payload = {
+        "stage": stage,
+        "version": STAGE_VERSIONS.get(stage, "1"),
+        "provider": type(provider).__name__,
+        "call": call_kwargs,
+    }
+    encoded = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def _usage_tokens(usages: list[Any]) -> tuple[int, int]:
+    totals = [0, 0]
+    for usage in usages:
+        for index, kind in enumerate(("prompt_tokens", "completion_tokens")):
+            tokens = usage.get(kind) if isinstance(usage, dict) else getattr(usage, kind, None)
+            if isinstance(tokens, int) and tokens > 0:
+                totals[index] += tokens
+    return totals[0], totals[1]
+
+
+def _lookup(key: str) -> Optional[tuple[str, int, int]]:
+    now = datetime.now(timezone.utc)
+    try:
+        with SessionLocal() as db:
+            row = db.execute(
+                select(
+                    LLMResponseCache.response,
+                    LLMResponseCache.prompt_tokens,
+                    LLMResponseCache.completion_tokens,
+                ).where(
+                    LLMResponseCache.cache_key == key,
+                    LLMResponseCache.created_at >= now - timedelta(days=_max_age_days()),
+                )
+            ).first()
+            if row is None:
+                return None
+            db.execute(
+                update(LLMResponseCache)
+                .where(LLMResponseCache.cache_key == key)
+                .values(hit_count=LLMResponseCache.hit_count + 1, last_used_at=now)
+            )
+            db.commit()
+            return row.response, row.prompt_tokens, row.completion_tokens
+    except SQLAlchemyError as exc:
+        logger.warning("LLM cache lookup failed, calling the model: %s", exc)
+        return None
+
+
+def _store(key: str, stage: str, model: str, response: str, usages: list[Any], file_id: int) -> None:
+    prompt_tokens, completion_tokens = _usage_tokens(usages)
+    now = datetime.now(timezone.utc)
+    try:
+        with SessionLocal() as db:
+            db.merge(
+                LLMResponseCache(
+                    cache_key=key,
+                    file_id=file_id,
+                    stage=stage,
+                    model=model,
+                    response=response,
+                    prompt_tokens=prompt_tokens,
+                    completion_tokens=completion_tokens,
+                    size_bytes=len(response.encode("utf-8")),
+                    hit_count=0,
+                    created_at=now,
+                    last_used_at=now,
+                )
+            )
+            db.commit()
+    except SQLAlchemyError as exc:
+        logger.warning("Could not store LLM response in the cache: %s", exc)
+
+
+def cached_chat_completion(
+    provider: AIProvider,
+    stage: str,
+    *,
+    validate: Optional[Callable[[str], bool]] = None,
+    file_id: Optional[int] = None,
+    **call_kwargs: Any,
+) -> str:
+    """Return ``provider.chat_completion(**call_kwargs)``, reusing a stored response for identical requests.
+
+    Args:
+        provider: The AI provider to call on a cache miss.
+        stage: Pipeline stage name, one of :data:`STAGE_VERSIONS`.
+        validate: Optional check of the response text; responses it rejects
+            (e.g. unparsable JSON) are returned but not stored, so a retry
+            asks the model again.
+        file_id: Document the request was built from (default: the one set
+            by :func:`llm_cache_file`).  Without one the response is not stored.
+        **call_kwargs: Arguments for :meth:`AIProvider.chat_completion`
+            (``messages``, ``model``, ``temperature``, ...).
+
+    Returns:
+        The model's response text.
+    """
+    if not stage_cache_enabled(stage):
+        return provider.chat_completion(**call_kwargs)
+
+    key = cache_key(stage, provider, call_kwargs)
+    cached = _lookup(key)
+    record_cache_lookup(f"llm:{stage}", cached is not None)
+    if cached is not None:
+        response, prompt_tokens, completion_tokens = cached
+        record_llm_cache_savings(stage, prompt_tokens, completion_tokens)
+        logger.info("LLM cache hit for stage %s (%s...)", stage, key[:12])
+        return response
+
+    with capture_usage() as usages:
+        response = provider.chat_completion(**call_kwargs)
+    if file_id is None:
+        file_id = _current_file.get()
+    if file_id is not None and isinstance(response, str) and response and (validate is None or validate(response)):
+        _store(key, stage, str(call_kwargs.get("model", "")), response, usages, file_id)
+    return response
+
+
+def purge_llm_cache_for_files(db: Session, file_ids: Sequence[int]) -> int:
+    """Delete the cached responses computed for *file_ids*; the caller commits.
+
+    Returns:
+        The number of deleted rows.
+    """
+    if not file_ids:
+        return 0
+    return db.execute(delete(LLMResponseCache).where(LLMResponseCache.file_id.in_(list(file_ids)))).rowcount or 0
+
+
+def prune_llm_cache(db: Session, max_age_days: Optional[int] = None, max_bytes: Optional[int] = None) -> dict:
+    """Evict expired entries, then least recently used entries beyond the size budget.
+
+    Args:
+        db: Session used for the deletes; the caller commits.
+        max_age_days: Entries created earlier are deleted (default: ``LLM_CACHE_MAX_AGE_DAYS``).
+        max_bytes: Budget for the summed response sizes (default: ``LLM_CACHE_MAX_SIZE_MB``).
+
+    Returns:
+        ``{"expired": n, "evicted": n}`` row counts.
+    """
+    max_age_days = max_age_days or _max_age_days()
+    max_bytes = max_bytes or _max_bytes()
+    cutoff = datetime.now(timezone.utc) - timedelta(days=max_age_days)
+    expired = db.execute(delete(LLMResponseCache).where(LLMResponseCache.created_at < cutoff)).rowcount or 0
+
+    evicted = 0
+    total = db.execute(select(func.coalesce(func.sum(LLMResponseCache.size_bytes), 0))).scalar_one()
+    if total > max_bytes:
+        kept = 0
+        doomed: list[str] = []
+        rows = db.execute(
+            select(LLMResponseCache.cache_key, LLMResponseCache.size_bytes).order_by(
+                LLMResponseCache.last_used_at.desc()
+            )
+        )
+        for key, size in rows:
+            kept += size or 0
+            if kept > max_bytes:
+                doomed.append(key)
+        for start in range(0, len(doomed), _DELETE_BATCH):
+            batch = doomed[start : start + _DELETE_BATCH]
+            db.execute(delete(LLMResponseCache).where(LLMResponseCache.cache_key.in_(batch)))
+        evicted = len(doomed)
+    return {"expired": expired, "evicted": evicted}
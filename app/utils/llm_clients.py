@@ -0,0 +1,145 @@
+"""Per-process registry of long-lived OpenAI SDK clients.
+
+Constructing an ``openai.OpenAI`` client creates a new ``httpx`` connection
+pool, so building one per completion or embedding request pays a TCP and TLS
+handshake every time.  :func:`get_openai_client` instead returns a shared
+client per *(kind, endpoint, API version, credential fingerprint, pool
+limits)*.  A changed key, URL or pool setting simply produces a new key, so
+clients are rebuilt exactly when the relevant settings change; the registry
+keeps at most :data:`MAX_CLIENTS` entries and drops the least recently used.
+
+The SDK clients are thread-safe, so one client serves every thread of a
+process.  :func:`get_async_openai_client` is the ``AsyncOpenAI`` twin for
+concurrent callers.  Async connection pools are bound to the event loop that
+first used them, so async clients are cached per running loop and released
+with it.
+
+Credentials are never used as dictionary keys directly: only a truncated
+SHA-256 fingerprint of them is.
+"""
+
+import asyncio
+import hashlib
+import logging
+import threading
+import weakref
+from collections import OrderedDict
+from typing import Any
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+#: Maximum number of distinct clients kept per registry.
+MAX_CLIENTS = 16
+
+_lock = threading.Lock()
+_sync_clients: OrderedDict[tuple, Any] = OrderedDict()
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, OrderedDict[tuple, Any]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def credential_fingerprint(*secrets: Any) -> str:
+    """Return a short, non-reversible fingerprint of *secrets* for use in cache keys."""
+    digest = hashlib.sha256()
+    for secret in secrets:
+        digest.update(repr(secret).encode())
+        digest.update(b"\0")
+    return digest.hexdigest()[:16]
+
+
+def _pool_limits() -> tuple[int, int, float]:
+    """Return (max connections, max keep-alive connections, keep-alive expiry) from settings."""
+
+    def _number(name: str, default: float) -> float:
+        value = getattr(settings, name, default)
+        return value if isinstance(value, (int, float)) and not isinstance(value, bool) and value > 0 else default
+
+    max_connections = int(_number("llm_http_max_connections", 20))
+    keepalive = min(int(_number("llm_http_max_keepalive_connections", 10)), max_connections)
+    return max_connections, keepalive, float(_number("llm_http_keepalive_expiry", 60.0))
+
+
+def _client_key(kind: str, options: dict[str, Any]) -> tuple:
+    return (
+        kind,
+        options.get("base_url") or options.get("azure_endpoint"),
+        options.get("api_version"),
+        credential_fingerprint(options.get("api_key"), sorted((options.get("default_headers") or {}).items())),
+        _pool_limits(),
+    )
+
+
+def _build_client(options: dict[str, Any], asynchronous: bool) -> Any:
+    import httpx
+    import openai
+
+    max_connections, keepalive, expiry = _pool_limits()
+    limits = httpx.Limits(
+        max_connections=max_connections,
+        max_keepalive_connections=keepalive,
+        keepalive_expiry=expiry,
+    )
+    if asynchronous:
+        http_client: Any = openai.DefaultAsyncHttpxClient(limits=limits)
+        client_class = openai.AsyncAzureOpenAI if options.get("azure_endpoint") else openai.AsyncOpenAI
+    else:
+        http_client = openai.DefaultHttpxClient(limits=limits)
+        client_class = openai.AzureOpenAI if options.get("azure_endpoint") else openai.OpenAI
+    return client_class(**options, http_client=http_client)
+
+
+def _remember(clients: OrderedDict[tuple, Any], key: tuple, client: Any) -> None:
+    clients[key] = client
+    clients.move_to_end(key)
+    while len(clients) > MAX_CLIENTS:
+        clients.popitem(last=False)
+
+
+def get_openai_client(**options: Any) -> Any:
+    """Return the shared ``OpenAI``/``AzureOpenAI`` client for *options*.
+
+    *options* are the SDK constructor arguments (``api_key``, ``base_url``,
+    ``default_headers``, or ``azure_endpoint`` and ``api_version`` for Azure).
+    """
+    kind = "azure" if options.get("azure_endpoint") else "openai"
+    key = _client_key(kind, options)
+    with _lock:
+        client = _sync_clients.get(key)
+        if client is not None:
+            _sync_clients.move_to_end(key)
+            return client
+        client = _build_client(options, asynchronous=False)
+        _remember(_sync_clients, key, client)
+    logger.debug("Created pooled %s client for %s", kind, key[1])
+    return client
+
+
+def get_async_openai_client(**options: Any) -> Any:
+    """Return the shared ``AsyncOpenAI``/``AsyncAzureOpenAI`` client for *options* on the running loop.
+
+    Raises:
+        RuntimeError: If called outside a running event loop.
+    """
+    loop = asyncio.get_running_loop()
+    kind = "azure" if options.get("azure_endpoint") else "openai"
+    key = _client_key(kind, options)
+    with _lock:
+        clients = _async_clients.get(loop)
+        if clients is None:
+            clients = _async_clients[loop] = OrderedDict()
+        client = clients.get(key)
+        if client is not None:
+            clients.move_to_end(key)
+            return client
+        client = _build_client(options, asynchronous=True)
+        _remember(clients, key, client)
+    return client
+
+
+def clear_clients() -> None:
+    """Forget every cached client; in-flight requests keep their own reference."""
+    with _lock:
+        _sync_clients.clear()
+        _async_clients.clear()
@@ -5,6 +5,8 @@ from datetime import datetime, timezone
 
 from app.database import SessionLocal
 from app.models import FileProcessingStep, ProcessingLog
+from app.utils.live_events import publish_file_status
+from app.utils.metrics import observe_step
 
 
 class TaskLogCollector(logging.Handler):
@@ -85,6 +87,8 @@ def log_task_progress(
         detail: Optional verbose log output for diagnostics.
                 If not provided, buffered logger output is used automatically.
     """
+    observe_step(task_id, step_name, status)
+
     # Auto-capture buffered log output when no explicit detail is given
     if not detail and task_id:
         _ensure_collector_installed()
@@ -138,6 +142,8 @@ def log_task_progress(
                         step_record.error_message = message or detail
 
             db.commit()
+            if file_id and step_name:
+                publish_file_status(db, file_id, step_name, status)
     except Exception:
         # Database errors in logging should never crash the calling task
         logging.getLogger(__name__).debug(
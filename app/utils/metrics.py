@@ -0,0 +1,431 @@
+"""Prometheus metrics for the web application and the Celery workers.
+
+Everything here is a no-op until ``METRICS_ENABLED=true``: the public
+``record_*``/``observe_*`` helpers return after a single boolean check, and
+``prometheus_client`` is not even imported.  When enabled, the following
+series are collected:
+
+* ``docuelevate_task_duration_seconds{task,state}`` – Celery task run time
+  (``task_prerun`` → ``task_postrun``),
+* ``docuelevate_step_duration_seconds{step,status}`` – pipeline step time
+  between the ``in_progress`` and the terminal :func:`log_task_progress` call,
+* ``docuelevate_queue_depth{queue}`` – messages waiting in each Celery queue,
+  read from the Redis broker at scrape time,
+* ``docuelevate_ocr_pages_total{provider}`` and
+  ``docuelevate_ocr_duration_seconds{provider}`` – pages/s is the ratio of
+  their rates,
+* ``docuelevate_llm_request_duration_seconds{provider,model,outcome}`` and
+  ``docuelevate_llm_tokens_total{provider,model,kind}``,
+* ``docuelevate_embedding_batch_size{model}`` and
+  ``docuelevate_embedding_request_duration_seconds{model}``,
+* ``docuelevate_db_connections_checked_out`` – connections currently borrowed
+  from the SQLAlchemy pool,
+* ``docuelevate_cache_requests_total{cache,result}`` – hit ratio per cache,
+* ``docuelevate_llm_cache_saved_tokens_total{stage,kind}`` – tokens not spent
+  because the LLM response cache answered,
+* ``docuelevate_http_request_duration_seconds{method,route,status}`` –
+  labelled by route template, never by raw path.
+
+Multi-process deployments (several Uvicorn workers, Celery prefork pools)
+must set the standard ``PROMETHEUS_MULTIPROC_DIR`` environment variable to an
+empty, writable directory shared by all processes of a host.  Each process
+then writes its samples to memory-mapped files in that directory and
+:func:`render_latest` aggregates them on scrape.
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Iterator
+from typing import TYPE_CHECKING, Any
+
+from app.config import settings
+
+if TYPE_CHECKING:
+    import redis
+    from prometheus_client.core import GaugeMetricFamily
+
+logger = logging.getLogger(__name__)
+
+#: Celery queues reported by ``docuelevate_queue_depth``.
+QUEUES = ("document_processor", "default", "celery", "knowledge_research", "search_index")
+
+#: Kombu stores messages of priority *n* > 0 in ``<queue>\x06\x16<n>``.
+_PRIORITY_SEPARATOR = "\x06\x16"
+_PRIORITY_STEPS = range(1, 10)
+
+#: Upper bound on in-flight task and step start times kept per process.
+MAX_PENDING_TIMINGS = 10_000
+
+_TERMINAL_STEP_STATUSES = frozenset({"success", "failure", "skipped"})
+
+_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800)
+_HTTP_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+_BATCH_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024, 2048)
+
+
+def multiprocess_dir() -> str | None:
+    """Return the multi-process directory, or *None* in single-process mode."""
+    return os.environ.get("PROMETHEUS_MULTIPROC_DIR") or os.environ.get("prometheus_multiproc_dir") or None
+
+
+class PipelineMetrics:
+    """The metric objects plus a cache of their labelled children.
+
+    ``labels()`` hashes and validates its arguments on every call, so children
+    are looked up in a plain dict first; the label sets used by the pipeline
+    are small and fixed.
+    """
+
+    def __init__(self) -> None:
+        from prometheus_client import CollectorRegistry, Counter, Gauge, Histogram
+
+        self.registry = CollectorRegistry(auto_describe=True)
+        registry = self.registry
+        self.task_duration = Histogram(
+            "docuelevate_task_duration_seconds",
+            "Celery task run time",
+            ["task", "state"],
+            buckets=_LATENCY_BUCKETS,
+            registry=registry,
+        )
+        self.step_duration = Histogram(
+            "docuelevate_step_duration_seconds",
+            "Pipeline step time between its in_progress and terminal progress entries",
+            ["step", "status"],
+            buckets=_LATENCY_BUCKETS,
+            registry=registry,
+        )
+        self.ocr_pages = Counter(
+            "docuelevate_ocr_pages", "Pages processed by OCR providers", ["provider"], registry=registry
+        )
+        self.ocr_duration = Histogram(
+            "docuelevate_ocr_duration_seconds",
+            "OCR provider run time per document",
+            ["provider"],
+            buckets=_LATENCY_BUCKETS,
+            registry=registry,
+        )
+        self.llm_duration = Histogram(
+            "docuelevate_llm_request_duration_seconds",
+            "Chat completion latency",
+            ["provider", "model", "outcome"],
+            buckets=_LATENCY_BUCKETS,
+            registry=registry,
+        )
+        self.llm_tokens = Counter(
+            "docuelevate_llm_tokens",
+            "Tokens reported by chat completion responses",
+            ["provider", "model", "kind"],
+            registry=registry,
+        )
+        self.embedding_batch = Histogram(
+            "docuelevate_embedding_batch_size",
+            "Texts per embedding request",
+            ["model"],
+            buckets=_BATCH_BUCKETS,
+            registry=registry,
+        )
+        self.embedding_duration = Histogram(
+            "docuelevate_embedding_request_duration_seconds",
+            "Embedding request latency",
+            ["model"],
+            buckets=_LATENCY_BUCKETS,
+            registry=registry,
+        )
+        self.db_checked_out = Gauge(
+            "docuelevate_db_connections_checked_out",
+            "Database connections currently borrowed from the pool",
+            multiprocess_mode="livesum",
+            registry=registry,
+        )
+        self.cache_requests = Counter(
+            "docuelevate_cache_requests", "Cache lookups by result", ["cache", "result"], registry=registry
+        )
+        self.llm_cache_saved_tokens = Counter(
+            "docuelevate_llm_cache_saved_tokens",
+            "Tokens avoided by LLM response cache hits",
+            ["stage", "kind"],
+            registry=registry,
+        )
+        self.http_duration = Histogram(
+            "docuelevate_http_request_duration_seconds",
+            "HTTP request latency by route template",
+            ["method", "route", "status"],
+            buckets=_HTTP_BUCKETS,
+            registry=registry,
+        )
+        self.queue_depth: QueueDepthCollector | None = None
+        self._children: dict[tuple, Any] = {}
+        self._timings: OrderedDict[tuple, float] = OrderedDict()
+        self._timings_lock = threading.Lock()
+
+    def child(self, metric: Any, *labels: str) -> Any:
+        """Return the cached child of *metric* for *labels*."""
+        key = (metric._name, labels)
+        child = self._children.get(key)
+        if child is None:
+            child = self._children[key] = metric.labels(*labels)
+        return child
+
+    def start_timing(self, key: tuple) -> None:
+        with self._timings_lock:
+            self._timings[key] = time.perf_counter()
+            if len(self._timings) > MAX_PENDING_TIMINGS:
+                self._timings.popitem(last=False)
+
+    def stop_timing(self, key: tuple) -> float | None:
+        with self._timings_lock:
+            started = self._timings.pop(key, None)
+        return None if started is None else time.perf_counter() - started
+
+
+class QueueDepthCollector:
+    """Report Celery queue lengths from the Redis broker when scraped."""
+
+    def __init__(self, broker_url: str, queues: tuple[str, ...] = QUEUES) -> None:
+        self.broker_url = broker_url
+        self.queues = queues
+        self._client: "redis.Redis | None" = None
+
+    def _redis(self) -> "redis.Redis":
+        if self._client is None:
+            import redis
+
+            self._client = redis.from_url(self.broker_url, socket_connect_timeout=2, socket_timeout=2)
+        return self._client
+
+    def collect(self) -> Iterator["GaugeMetricFamily"]:
+        from prometheus_client.core import GaugeMetricFamily
+
+        family = GaugeMetricFamily("docuelevate_queue_depth", "Messages waiting in a Celery queue", labels=["queue"])
+        try:
+            pipe = self._redis().pipeline(transaction=False)
+            for queue in self.queues:
+                pipe.llen(queue)
+                for priority in _PRIORITY_STEPS:
+                    pipe.llen(f"{queue}{_PRIORITY_SEPARATOR}{priority}")
+            lengths = pipe.execute()
+        except Exception as exc:  # noqa: BLE001
+            logger.debug("Could not read Celery queue depths: %s", exc)
+            self._client = None
+            return
+        per_queue = 1 + len(_PRIORITY_STEPS)
+        for position, queue in enumerate(self.queues):
+            chunk = lengths[position * per_queue : (position + 1) * per_queue]
+            family.add_metric([queue], sum(int(length or 0) for length in chunk))
+        yield family
+
+
+_metrics: PipelineMetrics | None = None
+_enabled: bool | None = None
+_init_lock = threading.Lock()
+
+
+def metrics_enabled() -> bool:
+    """Return whether metrics collection is enabled (decided once per process)."""
+    global _enabled
+    if _enabled is None:
+        _enabled = getattr(settings, "metrics_enabled", False) is True
+    return _enabled
+
+
+def get_metrics() -> PipelineMetrics | None:
+    """Return the process-wide metrics, or *None* when metrics are disabled."""
+    global _metrics
+    if _metrics is None and metrics_enabled():
+        with _init_lock:
+            if _metrics is None:
+                _metrics = PipelineMetrics()
+    return _metrics
+
+
+def reset_metrics() -> None:
+    """Forget the enabled decision and all collected samples (used by tests)."""
+    global _metrics, _enabled
+    with _init_lock:
+        _metrics = None
+        _enabled = None
+
+
+def render_latest(include_queue_depth: bool = True) -> tuple[bytes, str]:
+    """Return the exposition body and its content type for a scrape."""
+    from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, generate_latest
+
+    metrics = get_metrics()
+    if metrics is None:
+        raise RuntimeError("Metrics are disabled")
+    path = multiprocess_dir()
+    if path:
+        from prometheus_client import multiprocess
+
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry, path=path)
+    else:
+        registry = metrics.registry
+    body = generate_latest(registry)
+    broker_url = settings.effective_celery_broker_url
+    if include_queue_depth and broker_url.startswith(("redis://", "rediss://")):
+        if metrics.queue_depth is None or metrics.queue_depth.broker_url != broker_url:
+            metrics.queue_depth = QueueDepthCollector(broker_url)
+        # Any object with ``collect()`` can be rendered; the collector keeps
+        # its Redis client between scrapes.
+        body += generate_latest(metrics.queue_depth)
+    return body, CONTENT_TYPE_LATEST
+
+
+def mark_process_dead(pid: int | None = None) -> None:
+    """Drop the live gauges of an exiting process in multi-process mode."""
+    path = multiprocess_dir()
+    if not path or _metrics is None:
+        return
+    from prometheus_client import multiprocess
+
+    try:
+        multiprocess.mark_process_dead(pid or os.getpid(), path)
+    except OSError as exc:
+        logger.debug("Could not mark metrics process dead: %s", exc)
+
+
+# ---------------------------------------------------------------------------
+# Recording helpers
+# ---------------------------------------------------------------------------
+
+
+def task_started(task_id: str | None) -> None:
+    metrics = get_metrics()
+    if metrics is not None and task_id:
+        metrics.start_timing(("task", task_id))
+
+
+def task_finished(task_id: str | None, task_name: str, state: str | None) -> None:
+    metrics = get_metrics()
+    if metrics is None or not task_id:
+        return
+    elapsed = metrics.stop_timing(("task", task_id))
+    if elapsed is not None:
+        metrics.child(metrics.task_duration, task_name, state or "UNKNOWN").observe(elapsed)
+
+
+def observe_step(task_id: str | None, step_name: str, status: str) -> None:
+    """Time a pipeline step from its ``in_progress`` to its terminal progress entry."""
+    metrics = get_metrics()
+    if metrics is None or not task_id or not step_name:
+        return
+    if status == "in_progress":
+        metrics.start_timing(("step", task_id, step_name))
+    elif status in _TERMINAL_STEP_STATUSES:
+        elapsed = metrics.stop_timing(("step", task_id, step_name))
+        if elapsed is not None:
+            metrics.child(metrics.step_duration, step_name, status).observe(elapsed)
+
+
+def record_ocr(provider: str, pages: int | None, seconds: float) -> None:
+    metrics = get_metrics()
+    if metrics is None:
+        return
+    metrics.child(metrics.ocr_duration, provider).observe(seconds)
+    if pages:
+        metrics.child(metrics.ocr_pages, provider).inc(pages)
+
+
+def record_llm_request(provider: str, model: str, seconds: float, usage: Any = None, outcome: str = "success") -> None:
+    """Record one chat completion; *usage* is the response's OpenAI-style ``usage`` object."""
+    metrics = get_metrics()
+    if metrics is None:
+        return
+    metrics.child(metrics.llm_duration, provider, model, outcome).observe(seconds)
+    for kind in ("prompt_tokens", "completion_tokens"):
+        tokens = getattr(usage, kind, None) if not isinstance(usage, dict) else usage.get(kind)
+        if isinstance(tokens, int) and tokens > 0:
+            metrics.child(metrics.llm_tokens, provider, model, kind.removesuffix("_tokens")).inc(tokens)
+
+
+def record_embedding_request(model: str, batch_size: int, seconds: float) -> None:
+    metrics = get_metrics()
+    if metrics is None:
+        return
+    metrics.child(metrics.embedding_batch, model).observe(batch_size)
+    metrics.child(metrics.embedding_duration, model).observe(seconds)
+
+
+def record_cache_lookup(cache: str, hit: bool) -> None:
+    metrics = get_metrics()
+    if metrics is not None:
+        metrics.child(metrics.cache_requests, cache, "hit" if hit else "miss").inc()
+
+
+def record_llm_cache_savings(stage: str, prompt_tokens: int, completion_tokens: int) -> None:
+    """Count the tokens an LLM response cache hit for *stage* did not spend."""
+    metrics = get_metrics()
+    if metrics is None:
+        return
+    for kind, tokens in (("prompt", prompt_tokens), ("completion", completion_tokens)):
+        if tokens:
+            metrics.child(metrics.llm_cache_saved_tokens, stage, kind).inc(tokens)
+
+
+def record_http_request(method: str, route: str, status: int, seconds: float) -> None:
+    metrics = get_metrics()
+    if metrics is not None:
+        metrics.child(metrics.http_duration, method, route, str(status)).observe(seconds)
+
+
+def install_db_pool_hooks(engine: Any) -> None:
+    """Track connections checked out of *engine*'s pool."""
+    from sqlalchemy import event
+
+    def _checkout(*_args: Any) -> None:
+        metrics = get_metrics()
+        if metrics is not None:
+            metrics.db_checked_out.inc()
+
+    def _checkin(*_args: Any) -> None:
+        metrics = get_metrics()
+        if metrics is not None:
+            metrics.db_checked_out.dec()
+
+    event.listen(engine, "checkout", _checkout)
+    event.listen(engine, "checkin", _checkin)
+
+
+def install_celery_hooks() -> None:
+    """Time every task and drop a pool child's live gauges when it exits."""
+    from celery.signals import task_postrun, task_prerun, worker_process_shutdown
+
+    @task_prerun.connect(weak=False)
+    def _on_prerun(task_id: str | None = None, **kwargs: Any) -> None:
+        task_started(task_id)
+
+    @task_postrun.connect(weak=False)
+    def _on_postrun(task_id: str | None = None, task: Any = None, state: str | None = None, **kwargs: Any) -> None:
+        task_finished(task_id, getattr(task, "name", None) or "unknown", state)
+
+    @worker_process_shutdown.connect(weak=False)
+    def _on_process_shutdown(**kwargs: Any) -> None:
+        mark_process_dead()
+
+
+def start_worker_metrics_server() -> None:
+    """Serve this worker host's metrics on ``METRICS_WORKER_PORT`` (0 disables)."""
+    port = getattr(settings, "metrics_worker_port", 0)
+    if not metrics_enabled() or not isinstance(port, int) or port <= 0:
+        return
+    from prometheus_client import CollectorRegistry, start_http_server
+
+    path = multiprocess_dir()
+    if path:
+        from prometheus_client import multiprocess
+
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry, path=path)
+    else:
+        logger.warning(
+            "METRICS_WORKER_PORT is set without PROMETHEUS_MULTIPROC_DIR; "
+            "samples recorded in prefork pool processes will not be exported"
+        )
+        registry = get_metrics().registry
+    start_http_server(port, registry=registry)
+    logger.info("Serving worker metrics on port %d", port)
@@ -883,6 +883,7 @@ def merge_ocr_results(results: List[OCRResult], filename: str) -> Tuple[str, Opt
     # Default: ai_merge – ask AI to pick/merge the best text
     try:
         from app.utils.ai_provider import get_ai_provider
+        from app.utils.llm_cache import cached_chat_completion
 
         provider = get_ai_provider()
         model = settings.ai_model or settings.openai_model
@@ -909,7 +910,7 @@ def merge_ocr_results(results: List[OCRResult], filename: str) -> Tuple[str, Opt
                 ),
             },
         ]
-        merged_text = provider.chat_completion(messages, model=model, temperature=0)
+        merged_text = cached_chat_completion(provider, "ocr_merge", messages=messages, model=model, temperature=0)
         logger.info(f"AI-merged OCR text: {len(merged_text)} chars for {filename}")
         return merged_text, searchable_pdf_path, rotation_data
     except Exception as exc:
@@ -0,0 +1,270 @@
+"""Single-pass PDF edits: document info, XMP metadata and page rotation.
+
+Setting ``/Info`` or ``/Rotate`` touches a handful of small objects, yet
+copying every page into a fresh ``PdfWriter`` re-serialises the whole
+document, which for 100+ MB scans costs a full parse and a full write per
+stage.  :func:`apply_pdf_edits` applies all requested changes in one pass
+and, whenever possible, appends them as an *incremental update*: the
+original bytes stay untouched and only the modified objects plus a new
+cross-reference section are written after them.
+
+If the incremental update cannot be produced (for example because pypdf
+has to repair a damaged cross-reference table), the document is rewritten
+in full instead, still in a single pass.  Every call returns a
+:class:`PdfEditResult` with the bytes written and the time spent per stage.
+"""
+
+import logging
+import os
+import shutil
+import tempfile
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import BinaryIO
+
+import pypdf
+from pypdf.xmp import XmpInformation
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PdfEditResult:
+    """Outcome of :func:`apply_pdf_edits`."""
+
+    #: ``"incremental"`` (update appended), ``"rewrite"`` (full rewrite) or ``"unchanged"``.
+    mode: str
+    #: Bytes written for the edit itself (the appended update or the rewritten file).
+    bytes_written: int
+    #: Bytes copied verbatim from the source when writing to a separate output file.
+    bytes_copied: int = 0
+    #: Rotation applied per zero-based page index, in clockwise degrees.
+    applied_rotations: dict[int, int] = field(default_factory=dict)
+    #: Milliseconds spent per stage (``copy``, ``parse``, ``edit``, ``write``).
+    timings_ms: dict[str, float] = field(default_factory=dict)
+
+    def as_detail(self) -> dict:
+        """Return a JSON-serialisable summary for processing logs."""
+        return {
+            "mode": self.mode,
+            "bytes_written": self.bytes_written,
+            "bytes_copied": self.bytes_copied,
+            "applied_rotations": {str(page): angle for page, angle in self.applied_rotations.items()},
+            "timings_ms": self.timings_ms,
+        }
+
+
+class _AppendOnlyStream:
+    """Write target that drops pypdf's copy of the original revision.
+
+    In incremental mode ``PdfWriter.write`` first emits the original file and
+    then the update.  The original bytes are already on disk, so they are
+    skipped and only the update is appended; ``tell()`` reports absolute
+    file offsets, which the new cross-reference section relies on.
+    """
+
+    def __init__(self, handle: BinaryIO, original_size: int) -> None:
+        self._handle = handle
+        self._skip = original_size
+        self.appended = 0
+
+    def write(self, data: bytes) -> int:
+        size = len(data)
+        if self._skip:
+            skipped = min(self._skip, size)
+            self._skip -= skipped
+            data = data[skipped:]
+        if data:
+            self._handle.write(data)
+            self.appended += len(data)
+        return size
+
+    def tell(self) -> int:
+        return self._handle.tell()
+
+    def flush(self) -> None:
+        self._handle.flush()
+
+
+def _elapsed_ms(started: float) -> float:
+    return round((time.perf_counter() - started) * 1000, 2)
+
+
+def _sync_xmp(writer: pypdf.PdfWriter, info: dict[str, str]) -> None:
+    """Mirror the document info entries into the XMP packet.
+
+    PDF/A requires ``/Info`` and XMP to agree, so existing packets (including
+    their ``pdfaid`` identification) are updated rather than replaced.
+    """
+    xmp = writer.xmp_metadata or XmpInformation.create()
+    if "/Title" in info:
+        xmp.dc_title = {"x-default": info["/Title"]}
+    if "/Author" in info:
+        xmp.dc_creator = [info["/Author"]]
+    if "/Subject" in info:
+        xmp.dc_description = {"x-default": info["/Subject"]}
+    if "/Keywords" in info:
+        xmp.pdf_keywords = info["/Keywords"]
+        xmp.dc_subject = [keyword.strip() for keyword in info["/Keywords"].split(",") if keyword.strip()]
+    now = datetime.now(timezone.utc)
+    xmp.xmp_modify_date = now
+    xmp.xmp_metadata_date = now
+    writer.xmp_metadata = xmp
+
+
+def _apply_edits(
+    writer: pypdf.PdfWriter,
+    info: dict[str, str] | None,
+    rotations: dict[int, int] | None,
+    update_xmp: bool,
+) -> dict[int, int]:
+    applied: dict[int, int] = {}
+    page_count = len(writer.pages)
+    for page_index, angle in sorted((rotations or {}).items()):
+        if angle % 360 and 0 <= page_index < page_count:
+            writer.pages[page_index].rotate(angle)
+            applied[page_index] = angle
+    if info:
+        writer.add_metadata(info)
+        if update_xmp:
+            _sync_xmp(writer, info)
+    return applied
+
+
+def _reserve_object_numbers(writer: pypdf.PdfWriter, reader: pypdf.PdfReader) -> None:
+    """Keep new objects from reusing object numbers of the previous revision.
+
+    pypdf numbers new objects (including the update's cross-reference stream)
+    after the objects it loaded, which excludes earlier cross-reference
+    streams.  A second incremental update would then redefine the previous
+    xref stream's number and break the chain, so every number below the
+    trailer's ``/Size`` is reserved before editing.
+
+    pypdf has no public API for this, so its object table (``_objects``,
+    where object ``n`` is entry ``n - 1``) is padded directly.  The pypdf
+    pin in ``requirements.txt`` and ``test_object_number_reservation``
+    guard that layout.
+
+    Raises:
+        RuntimeError: If the object table or ``/Size`` is not as expected;
+            :func:`apply_pdf_edits` then rewrites the document instead of
+            appending an update that could break the chain.
+    """
+    objects = getattr(writer, "_objects", None)
+    size = reader.trailer.get("/Size")
+    if not isinstance(objects, list) or not isinstance(size, int):
+        raise RuntimeError("cannot reserve object numbers for an incremental update")
+    objects.extend([None] * max(0, size - 1 - len(objects)))
+
+
+def _write_incremental(
+    source_path: str, target_path: str, edit: Callable[[pypdf.PdfWriter], dict[int, int]]
+) -> PdfEditResult:
+    timings: dict[str, float] = {}
+    original_size = os.path.getsize(source_path)
+    with open(source_path, "rb") as source:
+        started = time.perf_counter()
+        reader = pypdf.PdfReader(source)
+        writer = pypdf.PdfWriter(reader, incremental=True)
+        _reserve_object_numbers(writer, reader)
+        timings["parse"] = _elapsed_ms(started)
+
+        started = time.perf_counter()
+        applied = edit(writer)
+        timings["edit"] = _elapsed_ms(started)
+
+        if not writer.list_objects_in_increment():
+            timings["write"] = 0.0
+            return PdfEditResult("unchanged", 0, applied_rotations=applied, timings_ms=timings)
+
+        started = time.perf_counter()
+        with open(target_path, "r+b") as target:
+            target.seek(0, os.SEEK_END)
+            if target.tell() != original_size:
+                raise RuntimeError(f"{target_path} does not match {source_path}; refusing to append")
+            appender = _AppendOnlyStream(target, original_size)
+            try:
+                writer.write(appender)
+            except BaseException:
+                target.truncate(original_size)
+                raise
+        timings["write"] = _elapsed_ms(started)
+    return PdfEditResult("incremental", appender.appended, applied_rotations=applied, timings_ms=timings)
+
+
+def _write_rewrite(
+    source_path: str, target_path: str, edit: Callable[[pypdf.PdfWriter], dict[int, int]]
+) -> PdfEditResult:
+    timings: dict[str, float] = {}
+    started = time.perf_counter()
+    reader = pypdf.PdfReader(source_path)
+    writer = pypdf.PdfWriter(clone_from=reader)
+    timings["parse"] = _elapsed_ms(started)
+
+    started = time.perf_counter()
+    applied = edit(writer)
+    timings["edit"] = _elapsed_ms(started)
+
+    started = time.perf_counter()
+    directory = os.path.dirname(os.path.abspath(target_path))
+    fd, tmp_path = tempfile.mkstemp(suffix=".pdf", prefix=".rewrite_", dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as handle:
+            writer.write(handle)
+        bytes_written = os.path.getsize(tmp_path)
+        os.replace(tmp_path, target_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    timings["write"] = _elapsed_ms(started)
+    return PdfEditResult("rewrite", bytes_written, applied_rotations=applied, timings_ms=timings)
+
+
+def apply_pdf_edits(
+    source_path: str,
+    output_path: str | None = None,
+    *,
+    info: dict[str, str] | None = None,
+    rotations: dict[int, int] | None = None,
+    update_xmp: bool = True,
+) -> PdfEditResult:
+    """Apply document info, XMP and rotation changes to a PDF in one pass.
+
+    Args:
+        source_path: PDF to edit.
+        output_path: Where to write the result.  Defaults to editing
+            *source_path* in place; otherwise the source is copied first and
+            left untouched.
+        info: Document info entries such as ``{"/Title": "..."}``.
+        rotations: Clockwise rotation in degrees (multiples of 90) to add per
+            zero-based page index.  Zero angles and unknown pages are ignored.
+        update_xmp: Also write *info* into the XMP metadata packet.
+
+    Returns:
+        A :class:`PdfEditResult` describing what was written.
+    """
+    target_path = output_path or source_path
+    bytes_copied = 0
+    copy_ms = None
+    if os.path.abspath(target_path) != os.path.abspath(source_path):
+        started = time.perf_counter()
+        shutil.copyfile(source_path, target_path)
+        bytes_copied = os.path.getsize(target_path)
+        copy_ms = _elapsed_ms(started)
+
+    def edit(writer: pypdf.PdfWriter) -> dict[int, int]:
+        return _apply_edits(writer, info, rotations, update_xmp)
+
+    try:
+        result = _write_incremental(source_path, target_path, edit)
+    except Exception as exc:
+        logger.info(f"Incremental PDF update not possible for {source_path}, rewriting: {exc}")
+        result = _write_rewrite(source_path, target_path, edit)
+
+    result.bytes_copied = bytes_copied
+    if copy_ms is not None:
+        result.timings_ms = {"copy": copy_ms, **result.timings_ms}
+    return result
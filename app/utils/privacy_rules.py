@@ -9,9 +9,12 @@ from __future__ import annotations
 
 import json
 import re
+from collections.abc import Iterable
 from dataclasses import dataclass
 from typing import Any
 
+from app.utils.rule_sets import KeywordMatcher, KeywordScan, split_keywords
+
 RULE_TYPE_FILENAME = "filename_pattern"
 RULE_TYPE_CONTENT = "content_keyword"
 RULE_TYPE_METADATA = "metadata_match"
@@ -92,3 +95,82 @@ def match_rule_to_file(rule: Any, file_record: Any) -> PrivacyMatch:
         text=file_record.ocr_text,
         metadata=parse_metadata(file_record.ai_metadata),
     )
+
+
+@dataclass(frozen=True)
+class _CompiledPrivacyRule:
+    rule_id: int
+    rule_type: str
+    case_sensitive: bool
+    regex: re.Pattern[str] | None = None
+    keywords: tuple[str, ...] = ()
+    field: str | None = None
+    expected: str | None = None
+    comparable: str | None = None
+
+
+class CompiledPrivacyRules:
+    """An owner's privacy rules compiled once for repeated first-match evaluation.
+
+    *rules* must already be in evaluation order.  Results are identical to
+    calling :func:`match_rule_to_file` for each rule in turn, but filename
+    patterns are pre-compiled, the metadata JSON is parsed by the caller once
+    and all content keywords are found with one pass over the text.
+    """
+
+    def __init__(self, rules: Iterable[Any]) -> None:
+        self._rules: list[_CompiledPrivacyRule] = []
+        keywords: dict[bool, set[str]] = {False: set(), True: set()}
+        for rule in rules:
+            rule_type, pattern, case_sensitive = rule.rule_type, rule.pattern, bool(rule.case_sensitive)
+            if rule_type == RULE_TYPE_FILENAME:
+                try:
+                    regex = re.compile(pattern, 0 if case_sensitive else re.IGNORECASE)
+                except re.error:
+                    continue
+                self._rules.append(_CompiledPrivacyRule(rule.id, rule_type, case_sensitive, regex=regex))
+            elif rule_type == RULE_TYPE_CONTENT:
+                rule_keywords = split_keywords(pattern)
+                keywords[case_sensitive].update(rule_keywords)
+                self._rules.append(_CompiledPrivacyRule(rule.id, rule_type, case_sensitive, keywords=rule_keywords))
+            elif rule_type == RULE_TYPE_METADATA and "=" in pattern:
+                field, expected = (part.strip() for part in pattern.split("=", 1))
+                comparable = expected if case_sensitive else expected.casefold()
+                self._rules.append(
+                    _CompiledPrivacyRule(
+                        rule.id, rule_type, case_sensitive, field=field, expected=expected, comparable=comparable
+                    )
+                )
+        self._keyword_matchers = {
+            case_sensitive: KeywordMatcher(values, case_sensitive) for case_sensitive, values in keywords.items()
+        }
+
+    def first_match(
+        self,
+        filename: str | None,
+        text: str | None,
+        metadata: dict[str, Any] | None,
+    ) -> tuple[int, PrivacyMatch] | None:
+        """Return ``(rule_id, match)`` for the first matching rule, or *None*."""
+        scans: dict[bool, KeywordScan] = {}
+        for rule in self._rules:
+            if rule.rule_type == RULE_TYPE_FILENAME:
+                match = rule.regex.search(filename) if filename else None
+                if match:
+                    return rule.rule_id, PrivacyMatch(True, f"filename matched {match.group(0)!r}", 70)
+            elif rule.rule_type == RULE_TYPE_CONTENT:
+                # Keywords are checked lazily; earlier rules usually decide before the text is fully scanned.
+                if rule.case_sensitive not in scans:
+                    scans[rule.case_sensitive] = self._keyword_matchers[rule.case_sensitive].scan(text)
+                present = scans[rule.case_sensitive]
+                for keyword in rule.keywords:
+                    if (keyword if rule.case_sensitive else keyword.lower()) in present:
+                        return rule.rule_id, PrivacyMatch(True, f"content contained {keyword!r}", 80)
+            elif metadata:
+                actual = metadata.get(rule.field)
+                if actual is None:
+                    continue
+                actual_text = str(actual) if rule.case_sensitive else str(actual).casefold()
+                if actual_text == rule.comparable:
+                    return rule.rule_id, PrivacyMatch(True, f"metadata {rule.field!r} matched {rule.expected!r}", 95)
+        return None
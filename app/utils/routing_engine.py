@@ -23,12 +23,14 @@ Supported comparison operators
 import json
 import logging
 import re
+from collections.abc import Callable, Iterable, Iterator
 from dataclasses import dataclass
 from typing import Any
 
 from sqlalchemy.orm import Session
 
 from app.models import Pipeline, PipelineRoutingRule
+from app.utils.rule_sets import RULE_KIND_ROUTING, rule_fingerprint, rule_set_cache
 
 logger = logging.getLogger(__name__)
 
@@ -184,6 +186,143 @@ def _evaluate_condition(actual: Any, operator: str, expected: str) -> bool:
     return bool(numeric_result) if numeric_result is not None else False
 
 
+def _compile_condition(operator: str, expected: str) -> Callable[[Any], bool]:
+    """Return a predicate equivalent to ``_evaluate_condition(actual, operator, expected)``."""
+    missing_result = operator in {"not_equals", "not_contains"}
+
+    if operator in TEXT_OPERATORS:
+        evaluator = TEXT_OPERATORS[operator]
+        expected_lower = expected.lower()
+
+        def predicate(actual: Any) -> bool:
+            return missing_result if actual is None else evaluator(str(actual).lower(), expected_lower)
+
+    elif operator == "regex":
+        regex = None
+        if len(expected) > MAX_REGEX_PATTERN_LENGTH:
+            logger.warning("Regex in routing rule exceeds maximum length: %s", len(expected))
+        else:
+            try:
+                regex = re.compile(expected, flags=re.IGNORECASE)
+            except re.error:
+                logger.warning("Invalid regex in routing rule: %s", expected)
+
+        def predicate(actual: Any) -> bool:
+            return actual is not None and regex is not None and regex.fullmatch(str(actual)) is not None
+
+    elif operator in NUMERIC_OPERATORS:
+        evaluator = NUMERIC_OPERATORS[operator]
+        expected_num = _to_float(expected)
+
+        def predicate(actual: Any) -> bool:
+            actual_num = _to_float(actual)
+            return actual_num is not None and expected_num is not None and evaluator(actual_num, expected_num)
+
+    else:
+
+        def predicate(actual: Any) -> bool:
+            return False
+
+    return predicate
+
+
+@dataclass(frozen=True)
+class CompiledRoutingRule:
+    """One routing rule reduced to the data needed for evaluation."""
+
+    rule_id: int
+    name: str
+    field: str
+    target_pipeline_id: int
+    predicate: Callable[[Any], bool]
+
+
+class CompiledRoutingRules:
+    """An owner's routing rules compiled once for repeated first-match evaluation.
+
+    *rules* must already be in evaluation order.  Conditions are turned into
+    predicates with pre-compiled regexes and pre-parsed numbers, and
+    ``equals`` rules are indexed by field and value so that they cost one
+    dictionary lookup per field instead of one comparison per rule.
+    """
+
+    def __init__(self, rules: Iterable[Any]) -> None:
+        self.rules: list[CompiledRoutingRule] = []
+        self._scanned: list[int] = []
+        self._equals_index: dict[str, dict[str, list[int]]] = {}
+        for order, rule in enumerate(rules):
+            self.rules.append(
+                CompiledRoutingRule(
+                    rule_id=rule.id,
+                    name=rule.name,
+                    field=rule.field,
+                    target_pipeline_id=rule.target_pipeline_id,
+                    predicate=_compile_condition(rule.operator, rule.value),
+                )
+            )
+            if rule.operator == "equals":
+                self._equals_index.setdefault(rule.field, {}).setdefault(rule.value.lower(), []).append(order)
+            else:
+                self._scanned.append(order)
+
+    def matches(
+        self,
+        doc_props: dict[str, Any],
+        allowed_fields: frozenset[str] | None = None,
+    ) -> Iterator[CompiledRoutingRule]:
+        """Yield the rules that match *doc_props*, in evaluation order."""
+        indexed: list[int] = []
+        for field, values in self._equals_index.items():
+            if not _field_matches_allowed_stage(field, allowed_fields):
+                continue
+            actual = _resolve_field(field, doc_props)
+            if actual is not None:
+                indexed.extend(values.get(str(actual).lower(), ()))
+        indexed.sort()
+
+        pending = iter(indexed)
+        next_indexed = next(pending, None)
+        for order in self._scanned:
+            while next_indexed is not None and next_indexed < order:
+                yield self.rules[next_indexed]
+                next_indexed = next(pending, None)
+            rule = self.rules[order]
+            if _field_matches_allowed_stage(rule.field, allowed_fields) and rule.predicate(
+                _resolve_field(rule.field, doc_props)
+            ):
+                yield rule
+        while next_indexed is not None:
+            yield self.rules[next_indexed]
+            next_indexed = next(pending, None)
+
+
+def _owner_rules_query(db: Session, owner_id: str | None) -> Any:
+    return db.query(PipelineRoutingRule).filter(
+        PipelineRoutingRule.is_active.is_(True),
+        (PipelineRoutingRule.owner_id == owner_id) | (PipelineRoutingRule.owner_id.is_(None)),
+    )
+
+
+def get_routing_rule_set(db: Session, owner_id: str | None) -> CompiledRoutingRules:
+    """Return the compiled active rules for *owner_id* plus system rules.
+
+    Owner rules are evaluated first (by position), then system rules.  The
+    compiled set is cached per owner until the rules change.
+    """
+    query = _owner_rules_query(db, owner_id)
+    return rule_set_cache(RULE_KIND_ROUTING).get(
+        owner_id,
+        rule_fingerprint(query, PipelineRoutingRule),
+        lambda: CompiledRoutingRules(
+            query.order_by(
+                # Owner-specific rules take priority over system rules.
+                PipelineRoutingRule.owner_id.is_(None).asc(),
+                PipelineRoutingRule.position.asc(),
+            ).all()
+        ),
+    )
+
+
 def build_document_properties(file_record: Any) -> dict[str, Any]:
     """Build the property dict that the engine evaluates against.
 
@@ -239,41 +378,25 @@ def evaluate_routing_decision(
         The first matching :class:`RoutingDecision`, or ``None`` when no rule
         matches.
     """
-    # Fetch active rules for the owner + system rules, ordered by position.
-    rules = (
-        db.query(PipelineRoutingRule)
-        .filter(
-            PipelineRoutingRule.is_active.is_(True),
-            (PipelineRoutingRule.owner_id == owner_id) | (PipelineRoutingRule.owner_id.is_(None)),
-        )
-        .order_by(
-            # Owner-specific rules take priority over system rules.
-            PipelineRoutingRule.owner_id.is_(None).asc(),
-            PipelineRoutingRule.position.asc(),
-        )
-        .all()
-    )
-
-    for rule in rules:
-        if not _field_matches_allowed_stage(rule.field, allowed_fields):
-            continue
-
-        actual = _resolve_field(rule.field, doc_props)
-        if _evaluate_condition(actual, rule.operator, rule.value):
-            pipeline = db.query(Pipeline).filter(Pipeline.id == rule.target_pipeline_id).first()
-            if pipeline and pipeline.is_active:
-                logger.info(
-                    "Routing rule matched: rule_id=%s, name=%s, target_pipeline=%s",
-                    rule.id,
-                    rule.name,
-                    rule.target_pipeline_id,
-                )
-                return RoutingDecision(pipeline=pipeline, rule=rule)
-            logger.warning(
-                "Routing rule %s matched but target pipeline %s is inactive or missing",
-                rule.id,
-                rule.target_pipeline_id,
+    rule_set = get_routing_rule_set(db, owner_id)
+    for compiled in rule_set.matches(doc_props, allowed_fields):
+        pipeline = db.query(Pipeline).filter(Pipeline.id == compiled.target_pipeline_id).first()
+        if pipeline and pipeline.is_active:
+            rule = db.get(PipelineRoutingRule, compiled.rule_id)
+            if rule is None:
+                continue
+            logger.info(
+                "Routing rule matched: rule_id=%s, name=%s, target_pipeline=%s",
+                compiled.rule_id,
+                compiled.name,
+                compiled.target_pipeline_id,
             )
+            return RoutingDecision(pipeline=pipeline, rule=rule)
+        logger.warning(
+            "Routing rule %s matched but target pipeline %s is inactive or missing",
+            compiled.rule_id,
+            compiled.target_pipeline_id,
+        )
 
     return None
 
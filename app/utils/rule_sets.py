@@ -0,0 +1,348 @@
+"""Shared building blocks for compiled, per-owner rule sets.
+
+Routing, classification and privacy rules are evaluated for every processed
+document.  Loading the owner's rules from the database, re-compiling their
+regular expressions and scanning the OCR text once per keyword rule on every
+evaluation costs far more than the evaluation itself once owners have
+hundreds of rules.  The engines therefore compile an owner's rules once into
+an immutable rule-set object and keep it in a :class:`RuleSetCache`:
+
+* :class:`KeywordMatcher` finds all ``content_keyword`` keywords of a rule set
+  in a single pass over the text (Aho–Corasick) once there are enough of them
+  for that to beat one substring search per keyword.  First-match engines
+  (privacy) check keywords lazily via :meth:`KeywordMatcher.scan` so an early
+  matching rule still ends the evaluation early.
+* Cached rule sets are validated on every lookup against a cheap
+  :func:`rule_fingerprint` query (row count, highest id and latest
+  ``updated_at`` of the matching rules) and against the version published in
+  the Redis hash :data:`RULE_VERSIONS_KEY` by :func:`notify_rules_changed`,
+  which the rule APIs call after every change.  The fingerprint catches rules
+  written outside the API; the version catches edits within the same
+  timestamp tick and tells every other process to recompile.
+
+While Redis is unreachable, cached rule sets are trusted for at most
+:data:`UNVERIFIED_ENTRY_TTL` seconds.
+"""
+
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from collections.abc import Callable, Iterable
+from typing import Any, Generic, TypeVar
+
+import redis
+from sqlalchemy import func
+
+from app.config import settings
+from app.utils.metrics import record_cache_lookup
+
+logger = logging.getLogger(__name__)
+
+RULE_KIND_ROUTING = "routing"
+RULE_KIND_CLASSIFICATION = "classification"
+RULE_KIND_PRIVACY = "privacy"
+
+#: Redis hash holding one opaque version per ``<kind>:<owner>`` (``<kind>:*`` for system rules).
+RULE_VERSIONS_KEY = "docuelevate:rule_versions"
+
+#: Seconds a cached rule set may be used without confirming its version in Redis.
+UNVERIFIED_ENTRY_TTL = 5.0
+
+#: Maximum number of compiled rule sets kept per rule kind.
+MAX_CACHED_RULE_SETS = 512
+
+#: Minimum number of distinct keywords for which the Aho–Corasick scan is used.
+#: Below this, one C-level substring search per keyword is faster than a
+#: pure-Python pass over the text (measured with scripts/benchmark_rule_engines.py).
+AHO_CORASICK_MIN_KEYWORDS = 128
+
+_SYSTEM_SCOPE = "*"
+
+#: Seconds to wait before reconnecting after Redis was found unavailable.
+_REDIS_RETRY_INTERVAL = 30.0
+
+_redis_client: redis.Redis | None = None
+_redis_failed_at: float | None = None
+
+T = TypeVar("T")
+
+
+def _get_redis() -> redis.Redis | None:
+    """Return a shared Redis client, or *None* while Redis is unavailable."""
+    global _redis_client, _redis_failed_at
+    if _redis_client is not None:
+        return _redis_client
+    if _redis_failed_at is not None and time.monotonic() - _redis_failed_at < _REDIS_RETRY_INTERVAL:
+        return None
+    try:
+        client = redis.Redis.from_url(
+            settings.redis_url,
+            decode_responses=True,
+            socket_connect_timeout=2,
+            socket_timeout=2,
+        )
+        client.ping()
+    except Exception:  # noqa: BLE001
+        logger.debug("Redis unavailable for rule-set versions", exc_info=True)
+        _redis_failed_at = time.monotonic()
+        return None
+    _redis_client = client
+    _redis_failed_at = None
+    return client
+
+
+def _redis_failed() -> None:
+    global _redis_client, _redis_failed_at
+    _redis_client = None
+    _redis_failed_at = time.monotonic()
+
+
+def _version_field(kind: str, owner_id: str | None) -> str:
+    return f"{kind}:{owner_id if owner_id is not None else _SYSTEM_SCOPE}"
+
+
+# ---------------------------------------------------------------------------
+# Keyword matching
+# ---------------------------------------------------------------------------
+
+
+class _AhoCorasick:
+    """Aho–Corasick automaton reporting which keywords occur in a text."""
+
+    def __init__(self, keywords: list[str]) -> None:
+        self.keywords = keywords
+        goto: list[dict[str, int]] = [{}]
+        outputs: list[tuple[int, ...]] = [()]
+        for index, keyword in enumerate(keywords):
+            state = 0
+            for char in keyword:
+                nxt = goto[state].get(char)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[state][char] = nxt
+                    goto.append({})
+                    outputs.append(())
+                state = nxt
+            outputs[state] += (index,)
+
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, nxt in goto[state].items():
+                queue.append(nxt)
+                fallback = fail[state]
+                while fallback and char not in goto[fallback]:
+                    fallback = fail[fallback]
+                target = goto[fallback].get(char, 0)
+                fail[nxt] = target if target != nxt else 0
+                outputs[nxt] += outputs[fail[nxt]]
+        self._goto = goto
+        self._fail = fail
+        self._outputs = outputs
+
+    def search(self, text: str) -> set[int]:
+        goto, fail, outputs = self._goto, self._fail, self._outputs
+        found: set[int] = set()
+        state = 0
+        for char in text:
+            while True:
+                nxt = goto[state].get(char)
+                if nxt is not None:
+                    state = nxt
+                    break
+                if not state:
+                    break
+                state = fail[state]
+            if outputs[state]:
+                found.update(outputs[state])
+                if len(found) == len(self.keywords):
+                    break
+        return found
+
+
+class KeywordMatcher:
+    """Find which of a fixed set of keywords occur in a text.
+
+    Keywords are normalised once (lower-cased unless *case_sensitive*).
+    :meth:`search` returns all normalised keywords present in a text;
+    :meth:`scan` answers membership questions lazily for first-match
+    evaluation, where usually only a few keywords need to be checked.
+    """
+
+    def __init__(self, keywords: Iterable[str], case_sensitive: bool = False) -> None:
+        self.case_sensitive = case_sensitive
+        self.keywords = sorted({self.normalize(keyword) for keyword in keywords if keyword})
+        self._automaton = _AhoCorasick(self.keywords) if len(self.keywords) >= AHO_CORASICK_MIN_KEYWORDS else None
+
+    def normalize(self, value: str) -> str:
+        return value if self.case_sensitive else value.lower()
+
+    @property
+    def uses_automaton(self) -> bool:
+        """Whether :meth:`search_normalized` makes one Aho–Corasick pass instead of a scan per keyword."""
+        return self._automaton is not None
+
+    def search_normalized(self, haystack: str) -> frozenset[str]:
+        """Like :meth:`search` for a *haystack* already passed through :meth:`normalize`."""
+        if self._automaton is None:
+            return frozenset(keyword for keyword in self.keywords if keyword in haystack)
+        return frozenset(self.keywords[index] for index in self._automaton.search(haystack))
+
+    def search(self, text: str | None) -> frozenset[str]:
+        if not text or not self.keywords:
+            return frozenset()
+        return self.search_normalized(self.normalize(text))
+
+    def scan(self, text: str | None) -> "KeywordScan":
+        return KeywordScan(self, self.normalize(text) if text else "")
+
+
+class KeywordScan:
+    """Lazy ``keyword in text`` checks for one text.
+
+    Each keyword is searched for at most once.  Once more keywords have been
+    checked than a full Aho–Corasick pass is worth, the remaining questions
+    are answered from one full pass instead.
+    """
+
+    def __init__(self, matcher: KeywordMatcher, haystack: str) -> None:
+        self._matcher = matcher
+        self._haystack = haystack
+        self._checked: dict[str, bool] = {}
+        self._found: frozenset[str] | None = None
+
+    def __contains__(self, keyword: str) -> bool:
+        if self._found is not None:
+            return keyword in self._found
+        hit = self._checked.get(keyword)
+        if hit is None:
+            if self._matcher.uses_automaton and len(self._checked) >= AHO_CORASICK_MIN_KEYWORDS:
+                self._found = self._matcher.search_normalized(self._haystack)
+                return keyword in self._found
+            hit = self._checked[keyword] = keyword in self._haystack
+        return hit
+
+
+def split_keywords(pattern: str) -> tuple[str, ...]:
+    """Split a ``content_keyword`` pattern (``a|b|c``) into stripped, non-empty keywords."""
+    return tuple(keyword for keyword in (part.strip() for part in pattern.split("|")) if keyword)
+
+
+# ---------------------------------------------------------------------------
+# Cache and invalidation
+# ---------------------------------------------------------------------------
+
+
+def rule_fingerprint(query: Any, model: Any) -> tuple:
+    """Return ``(count, max id, max updated_at)`` of the rows selected by *query*."""
+    row = query.with_entities(func.count(model.id), func.max(model.id), func.max(model.updated_at)).one()
+    return tuple(row)
+
+
+class RuleSetCache(Generic[T]):
+    """Thread-safe per-owner LRU of compiled rule sets for one rule *kind*."""
+
+    def __init__(
+        self,
+        kind: str,
+        redis_getter: Callable[[], redis.Redis | None] = _get_redis,
+        clock: Callable[[], float] = time.monotonic,
+        max_entries: int = MAX_CACHED_RULE_SETS,
+    ) -> None:
+        self.kind = kind
+        self._redis_getter = redis_getter
+        self._clock = clock
+        self._max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str | None, tuple[tuple, tuple | None, float, T]] = OrderedDict()
+
+    def _read_versions(self, owner_id: str | None) -> tuple | None:
+        client = self._redis_getter()
+        if client is None:
+            return None
+        fields = [_version_field(self.kind, owner_id), _version_field(self.kind, None)]
+        try:
+            return tuple(client.hmget(RULE_VERSIONS_KEY, fields))
+        except Exception as exc:  # noqa: BLE001
+            logger.debug("Could not read %s rule versions: %s", self.kind, exc)
+            _redis_failed()
+            return None
+
+    def get(self, owner_id: str | None, fingerprint: tuple, compile_rules: Callable[[], T]) -> T:
+        """Return the compiled rule set for *owner_id*, compiling it on a miss."""
+        versions = self._read_versions(owner_id)
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(owner_id)
+            if entry is not None:
+                cached_fingerprint, cached_versions, compiled_at, rule_set = entry
+                if (
+                    cached_fingerprint == fingerprint
+                    and cached_versions == versions
+                    and (versions is not None or now - compiled_at < UNVERIFIED_ENTRY_TTL)
+                ):
+                    self._entries.move_to_end(owner_id)
+                    record_cache_lookup(f"rules:{self.kind}", True)
+                    return rule_set
+
+        record_cache_lookup(f"rules:{self.kind}", False)
+        rule_set = compile_rules()
+        with self._lock:
+            self._entries[owner_id] = (fingerprint, versions, now, rule_set)
+            self._entries.move_to_end(owner_id)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+        return rule_set
+
+    def invalidate(self, owner_id: str | None = None) -> None:
+        """Drop the entry of *owner_id*, or every entry when system rules (``None``) changed."""
+        with self._lock:
+            if owner_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(owner_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+_caches: dict[str, RuleSetCache] = {}
+_caches_lock = threading.Lock()
+
+
+def rule_set_cache(kind: str) -> RuleSetCache:
+    """Return the process-wide cache for rule *kind*."""
+    with _caches_lock:
+        cache = _caches.get(kind)
+        if cache is None:
+            cache = _caches[kind] = RuleSetCache(kind)
+        return cache
+
+
+def clear_rule_set_caches() -> None:
+    """Drop every compiled rule set held by this process."""
+    with _caches_lock:
+        caches = list(_caches.values())
+    for cache in caches:
+        cache.clear()
+
+
+def notify_rules_changed(kind: str, owner_id: str | None) -> None:
+    """Invalidate compiled *kind* rule sets after the rules of *owner_id* changed.
+
+    Pass ``owner_id=None`` when system-wide rules changed; that invalidates
+    the rule sets of every owner.  Call this after the change is committed.
+    """
+    rule_set_cache(kind).invalidate(owner_id)
+    client = _get_redis()
+    if client is None:
+        return
+    try:
+        client.hset(RULE_VERSIONS_KEY, _version_field(kind, owner_id), uuid.uuid4().hex)
+    except Exception as exc:  # noqa: BLE001
+        logger.debug("Could not publish %s rule version: %s", kind, exc)
+        _redis_failed()
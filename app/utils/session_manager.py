@@ -16,6 +16,7 @@ from sqlalchemy.orm import Session
 
 from app.config import settings
 from app.models import ApiToken, QRLoginChallenge, UserSession
+from app.utils.api_token_cache import notify_tokens_changed
 
 logger = logging.getLogger(__name__)
 
@@ -229,6 +230,9 @@ def revoke_all_sessions(
         db.rollback()
         raise
 
+    if revoke_api_tokens:
+        notify_tokens_changed()
+
     logger.info(
         "[SESSION] Revoked all sessions for user=%s (count=%d, except_session_id=%s, tokens_revoked=%s)",
         user_id,
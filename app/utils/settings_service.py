@@ -160,6 +160,14 @@ SETTING_METADATA = {
         "required": True,
         "restart_required": True,
     },
+    "local_image_conversion_enabled": {
+        "category": "Core",
+        "description": "Convert raster images to PDF inside the worker (lossless for JPEG) instead of calling Gotenberg",
+        "type": "boolean",
+        "sensitive": False,
+        "required": False,
+        "restart_required": False,
+    },
     # Authentication Settings
     "auth_enabled": {
         "category": "Authentication",
@@ -251,6 +259,25 @@ SETTING_METADATA = {
         "required": False,
         "restart_required": True,
     },
+    "api_token_cache_ttl": {
+        "category": "Authentication",
+        "description": (
+            "Seconds a verified Bearer API token stays cached so repeated requests skip PBKDF2 verification "
+            "(default 60, 0 disables). Revocations invalidate the cache immediately."
+        ),
+        "type": "integer",
+        "sensitive": False,
+        "required": False,
+        "restart_required": False,
+    },
+    "api_token_usage_flush_interval": {
+        "category": "Authentication",
+        "description": "Seconds between batched last-used updates for cached API tokens (default 60, 0 = every request).",
+        "type": "integer",
+        "sensitive": False,
+        "required": False,
+        "restart_required": False,
+    },
     "qr_login_enabled": {
         "category": "Authentication",
         "description": "Enable QR code-based login for mobile device authentication.",
@@ -925,6 +952,86 @@ SETTING_METADATA = {
         "required": False,
         "restart_required": False,
     },
+    "llm_http_max_connections": {
+        "category": "AI Services",
+        "description": "Maximum concurrent connections per pooled LLM/embedding client (default: 20)",
+        "type": "integer",
+        "sensitive": False,
+        "required": False,
+        "restart_required": False,
+    },
+    "llm_http_max_keepalive_connections": {
+        "category": "AI Services",
+        "description": "Idle connections each pooled LLM/embedding client keeps open (default: 10)",
+        "type": "integer",
+        "sensitive": False,
+        "required": False,
+        "restart_required": False,
+    },
+    "llm_http_keepalive_expiry": {
+        "category": "AI Services",
+        "description": "Seconds an idle pooled LLM/embedding connection stays open (default: 60)",
+        "type": "float",
+        "sensitive": False,
+        "required": False,
+        "restart_required": False,
+    },
+    "llm_cache_enabled": {
+        "category": "AI Services",
+        "description": "Reuse stored LLM responses for identical pipeline-stage input (default: true)",
+        "type": "boolean",
+        "sensitive": False,
+        "required": False,
+        "restart_required": False,
+    },
+    "llm_cache_disabled_stages": {
+        "category": "AI Services",
+        "description": "Comma-separated pipeline stages that bypass the LLM response cache",
+        "type": "string",
+        "sensitive": False,
+        "required": False,
+        "restart_required": False,
+    },
+    "llm_cache_max_age_days": {
+        "category": "AI Services",
+        "description": "Days after which cached LLM responses are evicted (default: 30)",
+        "type": "integer",
+        "sensitive": False,
+        "required": False,
+        "restart_required": False,
+    },
+    "llm_cache_max_size_mb": {
+        "category": "AI Services",
+        "description": "Size budget of the LLM response cache in MB (default: 256)",
+        "type": "integer",
+        "sensitive": False,
+        "required": False,
+        "restart_required": False,
+    },
+    "llm_batch_mode_enabled": {
+        "category": "AI Services",
+        "description": "Submit metadata and embedding backfills as offline batches (default: false)",
+        "type": "boolean",
+        "sensitive": False,
+        "required": False,
+        "restart_required": True,
+    },
+    "llm_batch_backend": {
+        "category": "AI Services",
+        "description": "Batch backend: openai (Batch API) or local (in-process stand-in)",
+        "type": "string",
+        "sensitive": False,
+        "required": False,
+        "restart_required": False,
+    },
+    "llm_batch_max_requests": {
+        "category": "AI Services",
+        "description": "Maximum documents per submitted batch (default: 500)",
+        "type": "integer",
+        "sensitive": False,
+        "required": False,
+        "restart_required": False,
+    },
     # Azure Document Intelligence (OCR) – separate from the AI provider above
     "azure_ai_key": {
         "category": "AI Services",
@@ -2243,6 +2350,33 @@ SETTING_METADATA = {
         "required": False,
         "restart_required": False,
     },
+    "imap_uid_sync_enabled": {
+        "category": "IMAP",
+        "description": (
+            "Use incremental UID-based IMAP sync: store the last seen UID per mailbox, inspect messages via "
+            "BODYSTRUCTURE in batches and download only allowed attachment parts."
+        ),
+        "type": "boolean",
+        "sensitive": False,
+        "required": False,
+        "restart_required": False,
+    },
+    "imap_uid_fetch_batch_size": {
+        "category": "IMAP",
+        "description": "Message UIDs per BODYSTRUCTURE FETCH command in UID sync mode (default: 50)",
+        "type": "integer",
+        "sensitive": False,
+        "required": False,
+        "restart_required": False,
+    },
+    "imap_poll_concurrency": {
+        "category": "IMAP",
+        "description": "Maximum number of per-user IMAP mailboxes polled concurrently (default: 4)",
+        "type": "integer",
+        "sensitive": False,
+        "required": False,
+        "restart_required": False,
+    },
     # Monitoring - Uptime Kuma
     "uptime_kuma_url": {
         "category": "Monitoring",
@@ -2260,6 +2394,46 @@ SETTING_METADATA = {
         "required": False,
         "restart_required": False,
     },
+    "worker_telemetry_interval": {
+        "category": "Monitoring",
+        "description": "Seconds between worker queue snapshots published to Redis for the queue dashboard (default: 5)",
+        "type": "integer",
+        "sensitive": False,
+        "required": False,
+        "restart_required": True,
+    },
+    "live_events_enabled": {
+        "category": "Monitoring",
+        "description": "Push file status, notification badge and queue banner updates to open pages (falls back to polling)",
+        "type": "boolean",
+        "sensitive": False,
+        "required": False,
+        "restart_required": False,
+    },
+    "metrics_enabled": {
+        "category": "Monitoring",
+        "description": "Collect Prometheus metrics and serve them on GET /metrics",
+        "type": "boolean",
+        "sensitive": False,
+        "required": False,
+        "restart_required": True,
+    },
+    "metrics_token": {
+        "category": "Monitoring",
+        "description": "Bearer token required to scrape GET /metrics (unset = unauthenticated)",
+        "type": "string",
+        "sensitive": True,
+        "required": False,
+        "restart_required": False,
+    },
+    "metrics_worker_port": {
+        "category": "Monitoring",
+        "description": "Port on which Celery workers serve their own metrics (0 = disabled)",
+        "type": "integer",
+        "sensitive": False,
+        "required": False,
+        "restart_required": True,
+    },
     # Processing Settings
     "http_request_timeout": {
         "category": "Processing",
@@ -2584,6 +2758,60 @@ SETTING_METADATA = {
         "required": False,
         "restart_required": False,
     },
+    "webhook_max_concurrency_per_endpoint": {
+        "category": "Feature Flags",
+        "description": (
+            "Default maximum number of concurrent webhook requests to one endpoint per worker process. "
+            "Webhooks can override this individually. Default: 4."
+        ),
+        "type": "integer",
+        "sensitive": False,
+        "required": False,
+        "restart_required": False,
+    },
+    "webhook_rate_limit_per_minute": {
+        "category": "Feature Flags",
+        "description": (
+            "Default webhook requests per minute to one endpoint per worker process. "
+            "Webhooks can override this individually. 0 disables the limit. Default: 0."
+        ),
+        "type": "integer",
+        "sensitive": False,
+        "required": False,
+        "restart_required": False,
+    },
+    "webhook_pool_max_idle_per_host": {
+        "category": "Feature Flags",
+        "description": "Idle keep-alive connections kept per webhook endpoint and resolved IP address. Default: 4.",
+        "type": "integer",
+        "sensitive": False,
+        "required": False,
+        "restart_required": False,
+    },
+    "webhook_pool_idle_timeout": {
+        "category": "Feature Flags",
+        "description": "Seconds an idle keep-alive webhook connection may be reused before it is closed. Default: 30.",
+        "type": "integer",
+        "sensitive": False,
+        "required": False,
+        "restart_required": False,
+    },
+    "webhook_batch_max_size": {
+        "category": "Feature Flags",
+        "description": "Maximum number of events sent in one POST to webhooks with batched delivery. Default: 100.",
+        "type": "integer",
+        "sensitive": False,
+        "required": False,
+        "restart_required": False,
+    },
+    "webhook_batch_interval": {
+        "category": "Feature Flags",
+        "description": "Seconds between flushes of buffered events for batched webhooks. Default: 10.",
+        "type": "integer",
+        "sensitive": False,
+        "required": False,
+        "restart_required": True,
+    },
     "automation_hooks_enabled": {
         "category": "Feature Flags",
         "description": (
@@ -2708,6 +2936,34 @@ SETTING_METADATA = {
         "required": False,
         "restart_required": False,
     },
+    "backup_mode": {
+        "category": "Backup",
+        "description": (
+            "Backup format: 'full' (one compressed dump per backup) or 'incremental' (deduplicated snapshots of the "
+            "database and documents in a local chunk store)."
+        ),
+        "type": "string",
+        "sensitive": False,
+        "required": False,
+        "restart_required": False,
+        "options": ["full", "incremental"],
+    },
+    "backup_include_documents": {
+        "category": "Backup",
+        "description": "Include the 'original' and 'processed' document trees in incremental snapshots.",
+        "type": "boolean",
+        "sensitive": False,
+        "required": False,
+        "restart_required": False,
+    },
+    "backup_compression_threads": {
+        "category": "Backup",
+        "description": "Threads compressing new chunks of incremental snapshots. Zero uses up to 4 CPU cores.",
+        "type": "integer",
+        "sensitive": False,
+        "required": False,
+        "restart_required": False,
+    },
     "backup_adaptive_cleanup_enabled": {
         "category": "Backup",
         "description": (
@@ -3015,6 +3271,36 @@ SETTING_METADATA = {
         "required": False,
         "restart_required": True,
     },
+    "upload_io_threads": {
+        "category": "Core",
+        "description": (
+            "Threads per web worker that run blocking upload work (disk writes, hashing, duplicate and quota "
+            "queries, task enqueueing) off the event loop. Default: 8."
+        ),
+        "type": "integer",
+        "sensitive": False,
+        "required": False,
+        "restart_required": True,
+    },
+    "resumable_upload_max_chunk_size": {
+        "category": "Core",
+        "description": (
+            "Maximum body size in bytes of one chunk of a resumable upload. The whole upload is still limited "
+            "by MAX_UPLOAD_SIZE. Default: 64MB."
+        ),
+        "type": "integer",
+        "sensitive": False,
+        "required": False,
+        "restart_required": True,
+    },
+    "resumable_upload_expiry_hours": {
+        "category": "Core",
+        "description": "Hours an unfinished resumable upload is kept after its last chunk. Default: 24.",
+        "type": "integer",
+        "sensitive": False,
+        "required": False,
+        "restart_required": False,
+    },
     # Task Retry Settings
     "task_retry_max_retries": {
         "category": "Processing",
@@ -3046,6 +3332,35 @@ SETTING_METADATA = {
         "required": False,
         "restart_required": True,
     },
+    "distribution_concurrency": {
+        "category": "Processing",
+        "description": (
+            "Destinations uploaded to at once by a single distribution task reading one spooled copy of the file. "
+            "0 queues a separate upload task per destination. Default: 0."
+        ),
+        "type": "integer",
+        "sensitive": False,
+        "required": False,
+        "restart_required": False,
+    },
+    "distribution_destination_limits": {
+        "category": "Processing",
+        "description": (
+            "Per-destination caps on concurrent in-process uploads per worker process, e.g. email=1,sftp=2."
+        ),
+        "type": "string",
+        "sensitive": False,
+        "required": False,
+        "restart_required": False,
+    },
+    "distribution_spool_dir": {
+        "category": "Processing",
+        "description": "Directory for the spooled copy of distributed files. Default: /dev/shm or the temp directory.",
+        "type": "string",
+        "sensitive": False,
+        "required": False,
+        "restart_required": False,
+    },
     "step_timeout": {
         "category": "Processing",
         "description": (
@@ -3192,12 +3507,15 @@ SETTING_METADATA = {
     },
     "audit_siem_syslog_protocol": {
         "category": "Security",
-        "description": "Protocol for syslog transport: 'udp' or 'tcp'. Default: udp.",
+        "description": (
+            "Protocol for syslog transport: 'udp', 'tcp' or 'tls'. "
+            "TCP and TLS use RFC 5425 octet-counting framing. Default: udp."
+        ),
         "type": "string",
         "sensitive": False,
         "required": False,
         "restart_required": False,
-        "options": ["udp", "tcp"],
+        "options": ["udp", "tcp", "tls"],
     },
     "audit_siem_http_url": {
         "category": "Security",
@@ -3226,6 +3544,33 @@ SETTING_METADATA = {
         "required": False,
         "restart_required": False,
     },
+    "audit_siem_batch_size": {
+        "category": "Security",
+        "description": "Maximum number of audit events sent to the SIEM in one syslog write or HTTP request. Default: 200.",
+        "type": "integer",
+        "sensitive": False,
+        "required": False,
+        "restart_required": False,
+    },
+    "audit_siem_flush_interval": {
+        "category": "Security",
+        "description": "Seconds after which a partially filled SIEM batch is sent. Default: 1.0.",
+        "type": "float",
+        "sensitive": False,
+        "required": False,
+        "restart_required": False,
+    },
+    "audit_siem_queue_size": {
+        "category": "Security",
+        "description": (
+            "Maximum number of audit events waiting for SIEM delivery per process; "
+            "events are dropped while the queue is full. Default: 10000."
+        ),
+        "type": "integer",
+        "sensitive": False,
+        "required": False,
+        "restart_required": True,
+    },
     # Per-user upload rate limiting
     "upload_rate_limit_per_user": {
         "category": "Security",
@@ -3671,6 +4016,14 @@ SETTING_METADATA = {
         "required": False,
         "restart_required": True,
     },
+    "vector_index_datatype": {
+        "category": "Knowledge Bridge",
+        "description": "Vector datatype for new Qdrant collections: float32 or float16 (half the storage)",
+        "type": "string",
+        "sensitive": False,
+        "required": False,
+        "restart_required": True,
+    },
     "document_intake_shared_secret": {
         "category": "Knowledge Bridge",
         "description": "Dedicated secret accepted only from the controlled legacy intake sender.",
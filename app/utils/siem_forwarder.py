@@ -0,0 +1,418 @@
+"""Batched, per-process delivery of audit events to an external SIEM.
+
+:func:`app.utils.audit_service.record_event` used to start one thread and
+open one socket or HTTP connection per audit event, which falls over during
+bulk operations that emit thousands of events.  Events are now handed to the
+process-wide :data:`siem_forwarder`:
+
+* a bounded queue (``audit_siem_queue_size``) decouples the request path from
+  delivery.  Producers wait at most :data:`ENQUEUE_TIMEOUT` seconds for space
+  and the event is dropped (and counted) when the queue stays full;
+* one daemon thread drains the queue and sends a batch once it holds
+  ``audit_siem_batch_size`` events or ``audit_siem_flush_interval`` seconds
+  after its first event;
+* the transport keeps its connection open between batches.  Syslog over TCP
+  or TLS uses RFC 5425 octet-counting framing, so a batch is one write; UDP
+  sends one datagram per event.  HTTP sends a JSON array per batch, or
+  newline-separated HEC envelopes for Splunk ``/services/collector`` URLs.
+
+Transport settings are re-read for every batch; a change reconnects.  After
+a fork (Celery prefork workers) the child starts its own queue and thread.
+Counters are available via :meth:`SiemForwarder.stats`.
+"""
+
+import atexit
+import json
+import logging
+import os
+import queue
+import re
+import socket
+import ssl
+import threading
+import time
+from collections.abc import Callable, Iterable
+from datetime import datetime, timezone
+from typing import Any, Protocol
+
+import httpx
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+#: Seconds a producer waits for queue space before the event is dropped.
+ENQUEUE_TIMEOUT = 0.05
+
+#: Minimum seconds between two "events dropped" warnings.
+_DROP_WARNING_INTERVAL = 60.0
+
+_SYSLOG_FACILITY_LOCAL0 = 16
+_SYSLOG_SEVERITY_MAP = {
+    "info": 6,
+    "warning": 4,
+    "error": 3,
+    "critical": 2,
+}
+
+_PROTECTED_HEADERS = {"authorization", "content-type", "host"}
+_VALID_HEADER_NAME = re.compile(r"^[A-Za-z0-9!#$%&'*+\-.^_`|~]+$")
+
+
+def _int_setting(name: str, default: int) -> int:
+    value = getattr(settings, name, default)
+    return value if isinstance(value, int) and not isinstance(value, bool) and value > 0 else default
+
+
+def _float_setting(name: str, default: float) -> float:
+    value = getattr(settings, name, default)
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or value <= 0:
+        return default
+    return float(value)
+
+
+# ---------------------------------------------------------------------------
+# Transports
+# ---------------------------------------------------------------------------
+
+
+class SiemTransport(Protocol):
+    def send(self, payloads: list[dict[str, Any]]) -> None: ...
+
+    def close(self) -> None: ...
+
+
+def format_syslog_message(payload: dict[str, Any]) -> str:
+    """Render one audit payload as an RFC 5424 syslog message."""
+    severity_num = _SYSLOG_SEVERITY_MAP.get(payload.get("severity", "info"), 6)
+    priority = _SYSLOG_FACILITY_LOCAL0 * 8 + severity_num
+    ts = payload.get("timestamp", datetime.now(timezone.utc).isoformat())
+    hostname = socket.gethostname()
+    app_name = "docuelevate"
+    msg_id = payload.get("action", "-")
+
+    # Structured data (SD) element with key event fields.
+    sd = (
+        f'[docuelevate@0 user="{payload.get("user", "-")}" '
+        f'action="{payload.get("action", "-")}" '
+        f'resource_type="{payload.get("resource_type", "-")}" '
+        f'resource_id="{payload.get("resource_id", "-")}" '
+        f'ip="{payload.get("ip_address", "-")}"]'
+    )
+    message = json.dumps(payload, default=str)
+    return f"<{priority}>1 {ts} {hostname} {app_name} - {msg_id} {sd} {message}"
+
+
+def frame_octet_counting(message: bytes) -> bytes:
+    """Prefix *message* with its length (RFC 5425 / RFC 6587 octet counting)."""
+    return str(len(message)).encode("ascii") + b" " + message
+
+
+class SyslogTransport:
+    """Persistent syslog connection over UDP, TCP or TLS."""
+
+    def __init__(self, host: str, port: int, protocol: str) -> None:
+        self.host = host
+        self.port = port
+        self.protocol = protocol
+        self._sock: socket.socket | None = None
+
+    def _connect(self) -> socket.socket:
+        if self.protocol == "udp":
+            sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            sock.settimeout(5)
+            return sock
+        sock = socket.create_connection((self.host, self.port), timeout=5)
+        if self.protocol == "tls":
+            try:
+                sock = ssl.create_default_context().wrap_socket(sock, server_hostname=self.host)
+            except Exception:
+                sock.close()
+                raise
+        return sock
+
+    def send(self, payloads: list[dict[str, Any]]) -> None:
+        messages = [format_syslog_message(payload).encode("utf-8") for payload in payloads]
+        if self._sock is None:
+            self._sock = self._connect()
+        if self.protocol == "udp":
+            for message in messages:
+                self._sock.sendto(message, (self.host, self.port))
+            return
+
+        data = b"".join(frame_octet_counting(message) for message in messages)
+        try:
+            self._sock.sendall(data)
+        except OSError:
+            # The receiver may have closed an idle connection; reconnect once.
+            self.close()
+            self._sock = self._connect()
+            self._sock.sendall(data)
+
+    def close(self) -> None:
+        if self._sock is not None:
+            try:
+                self._sock.close()
+            except OSError:
+                pass
+            self._sock = None
+
+
+def _parse_custom_headers(raw_custom: str) -> dict[str, str]:
+    """Parse comma-separated ``Key:Value`` pairs, skipping invalid and protected names."""
+    headers: dict[str, str] = {}
+    for raw_pair in raw_custom.split(","):
+        pair = raw_pair.strip()
+        if ":" not in pair:
+            continue
+        k, _, v = pair.partition(":")
+        name = k.strip()
+        if not name or not _VALID_HEADER_NAME.match(name):
+            logger.warning("Skipping invalid SIEM custom header name: %r", name)
+            continue
+        if name.lower() in _PROTECTED_HEADERS:
+            logger.warning("Skipping protected SIEM custom header: %r", name)
+            continue
+        headers[name] = v.strip()
+    return headers
+
+
+class HttpTransport:
+    """Keep-alive HTTP client posting one request per batch."""
+
+    def __init__(self, url: str, token: str, custom_headers: str) -> None:
+        self.url = url
+        self.headers: dict[str, str] = {"Content-Type": "application/json"}
+        if token:
+            self.headers["Authorization"] = f"Bearer {token}"
+        if custom_headers:
+            self.headers.update(_parse_custom_headers(custom_headers))
+        self._client = httpx.Client(timeout=10)
+
+    def send(self, payloads: list[dict[str, Any]]) -> None:
+        if "/services/collector" in self.url:
+            # Splunk HEC accepts several event envelopes in one request body.
+            content = "\n".join(
+                json.dumps({"event": payload, "sourcetype": "docuelevate:audit", "source": "docuelevate"}, default=str)
+                for payload in payloads
+            )
+        else:
+            content = json.dumps(payloads, default=str)
+        resp = self._client.post(self.url, content=content, headers=self.headers)
+        resp.raise_for_status()
+
+    def close(self) -> None:
+        self._client.close()
+
+
+def _transport_config() -> tuple:
+    """Return the settings that determine the transport (compared between batches)."""
+    transport = str(settings.audit_siem_transport).lower()
+    if transport == "syslog":
+        return (
+            transport,
+            settings.audit_siem_syslog_host,
+            settings.audit_siem_syslog_port,
+            str(settings.audit_siem_syslog_protocol).lower(),
+        )
+    if transport == "http":
+        return (
+            transport,
+            settings.audit_siem_http_url,
+            settings.audit_siem_http_token,
+            settings.audit_siem_http_custom_headers,
+        )
+    return (transport,)
+
+
+def build_transport(config: tuple) -> SiemTransport | None:
+    """Create the transport described by a :func:`_transport_config` tuple."""
+    transport = config[0]
+    if transport == "syslog":
+        _, host, port, protocol = config
+        return SyslogTransport(host, port, protocol)
+    if transport == "http":
+        _, url, token, custom_headers = config
+        if not url:
+            logger.warning("SIEM HTTP URL not configured; skipping HTTP forwarding")
+            return None
+        return HttpTransport(url, token, custom_headers)
+    logger.warning("Unknown SIEM transport %r; skipping forwarding", transport)
+    return None
+
+
+# ---------------------------------------------------------------------------
+# Forwarder
+# ---------------------------------------------------------------------------
+
+
+class _Marker:
+    """Queue item asking the worker to send its partial batch (and optionally stop)."""
+
+    def __init__(self, stop: bool = False) -> None:
+        self.stop = stop
+        self.done = threading.Event()
+
+
+class SiemForwarder:
+    """Bounded queue plus one background thread delivering batched SIEM events."""
+
+    def __init__(
+        self,
+        transport_factory: Callable[[tuple], SiemTransport | None] = build_transport,
+        config_getter: Callable[[], tuple] = _transport_config,
+    ) -> None:
+        self._transport_factory = transport_factory
+        self._config_getter = config_getter
+        self._stats_lock = threading.Lock()
+        self._counters = {"enqueued": 0, "sent": 0, "dropped": 0, "failed": 0, "batches": 0}
+        self._last_drop_warning = 0.0
+        self._reset()
+
+    def _reset(self) -> None:
+        self._pid = os.getpid()
+        self._lock = threading.Lock()
+        self._queue: queue.Queue = queue.Queue(maxsize=_int_setting("audit_siem_queue_size", 10_000))
+        self._thread: threading.Thread | None = None
+        self._transport: SiemTransport | None = None
+        self._transport_key: tuple | None = None
+
+    def _ensure_worker(self) -> None:
+        if self._pid != os.getpid():
+            # Forked child: the parent's thread and connections are not ours.
+            self._reset()
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="siem-forwarder", daemon=True)
+                self._thread.start()
+
+    def _count(self, name: str, amount: int = 1) -> None:
+        with self._stats_lock:
+            self._counters[name] += amount
+
+    def _put(self, payload: dict[str, Any], timeout: float) -> bool:
+        try:
+            if timeout > 0:
+                self._queue.put(payload, timeout=timeout)
+            else:
+                self._queue.put_nowait(payload)
+        except queue.Full:
+            self._count("dropped")
+            now = time.monotonic()
+            if now - self._last_drop_warning >= _DROP_WARNING_INTERVAL:
+                self._last_drop_warning = now
+                logger.warning("SIEM forwarding queue is full; dropping audit events (%s)", self.stats())
+            return False
+        self._count("enqueued")
+        return True
+
+    def submit(self, payload: dict[str, Any]) -> bool:
+        """Queue one event; return ``False`` if it was dropped because the queue is full."""
+        self._ensure_worker()
+        return self._put(payload, ENQUEUE_TIMEOUT)
+
+    def submit_many(self, payloads: Iterable[dict[str, Any]]) -> int:
+        """Queue several events; return how many were accepted.
+
+        Only the first event that finds the queue full waits for space; the
+        rest of the batch is dropped immediately, so a backlog never stalls
+        the caller for longer than :data:`ENQUEUE_TIMEOUT`.
+        """
+        self._ensure_worker()
+        accepted = 0
+        timeout = ENQUEUE_TIMEOUT
+        for payload in payloads:
+            if self._put(payload, timeout):
+                accepted += 1
+            else:
+                timeout = 0.0
+        return accepted
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Send everything queued so far; return ``False`` if that took longer than *timeout*."""
+        return self._send_marker(_Marker(), timeout)
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Flush, stop the worker thread and close the transport."""
+        if self._pid == os.getpid() and self._thread is not None and self._thread.is_alive():
+            self._send_marker(_Marker(stop=True), timeout)
+
+    def _send_marker(self, marker: _Marker, timeout: float) -> bool:
+        self._ensure_worker()
+        try:
+            self._queue.put(marker, timeout=timeout)
+        except queue.Full:
+            return False
+        return marker.done.wait(timeout)
+
+    def stats(self) -> dict[str, int]:
+        """Return delivery counters plus the current queue depth."""
+        with self._stats_lock:
+            counters = dict(self._counters)
+        counters["queued"] = self._queue.qsize()
+        return counters
+
+    def _run(self) -> None:
+        batch: list[dict[str, Any]] = []
+        deadline = 0.0
+        while True:
+            timeout = max(0.0, deadline - time.monotonic()) if batch else None
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+
+            if item is None or isinstance(item, _Marker):
+                if batch:
+                    self._deliver(batch)
+                    batch = []
+                if isinstance(item, _Marker):
+                    if item.stop:
+                        self._close_transport()
+                        item.done.set()
+                        return
+                    item.done.set()
+                continue
+
+            if not batch:
+                deadline = time.monotonic() + _float_setting("audit_siem_flush_interval", 1.0)
+            batch.append(item)
+            if len(batch) >= _int_setting("audit_siem_batch_size", 200):
+                self._deliver(batch)
+                batch = []
+
+    def _close_transport(self) -> None:
+        if self._transport is not None:
+            try:
+                self._transport.close()
+            except Exception:  # noqa: BLE001
+                logger.debug("Error closing SIEM transport", exc_info=True)
+        self._transport = None
+        self._transport_key = None
+
+    def _deliver(self, batch: list[dict[str, Any]]) -> None:
+        try:
+            config = self._config_getter()
+            if config != self._transport_key:
+                self._close_transport()
+                self._transport = self._transport_factory(config)
+                self._transport_key = config
+            if self._transport is None:
+                self._count("failed", len(batch))
+                return
+            self._transport.send(batch)
+        except Exception:
+            self._count("failed", len(batch))
+            # Reconnect on the next batch.
+            self._close_transport()
+            logger.exception("Failed to forward %d audit event(s) to SIEM", len(batch))
+            return
+        self._count("sent", len(batch))
+        self._count("batches")
+
+
+#: Process-wide forwarder used by :mod:`app.utils.audit_service`.
+siem_forwarder = SiemForwarder()
+atexit.register(siem_forwarder.close)
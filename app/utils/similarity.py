@@ -6,14 +6,20 @@ Embeddings are cached in the ``FileRecord.embedding`` column to avoid
 redundant API calls.
 """
 
+import base64
 import json
 import logging
 import math
+import sys
+import time
+from array import array
 from typing import Any
 
 from sqlalchemy.orm import Session
 
 from app.config import settings
+from app.utils.llm_clients import get_openai_client
+from app.utils.metrics import record_embedding_request
 
 logger = logging.getLogger(__name__)
 
@@ -26,7 +32,10 @@ EMBEDDING_TOKEN_SAFETY_MARGIN = 64
 
 
 def _get_embedding_client() -> Any:
-    """Create an OpenAI client for embedding generation.
+    """Return the pooled OpenAI client for embedding generation.
+
+    The client is shared per process (see :mod:`app.utils.llm_clients`) and
+    only rebuilt when the configured key or endpoint changes.
 
     Returns:
         An ``openai.OpenAI`` client instance configured from application settings.
@@ -35,14 +44,14 @@ def _get_embedding_client() -> Any:
         RuntimeError: If the ``openai`` package is not installed.
     """
     try:
-        import openai
+        import openai  # noqa: F401
     except ImportError as exc:
         raise RuntimeError("The 'openai' package is required for embedding generation") from exc
 
     base_url = str(settings.openai_base_url or "").rstrip("/")
     uses_keyless_compatible_endpoint = bool(base_url and base_url != "https://api.openai.com/v1")
 
-    return openai.OpenAI(
+    return get_openai_client(
         # The OpenAI SDK requires a non-empty value even when a local or proxy
         # endpoint does not authenticate requests.  Never invent a credential
         # for the public OpenAI endpoint; the readiness probe must fail closed
@@ -131,23 +140,49 @@ def generate_embedding(text: str, model: str | None = None) -> list[float]:
     truncated = _truncate_text_for_embedding(text, model, settings.embedding_max_tokens)
     client = _get_embedding_client()
     logger.debug("Generating embedding for %d chars using model=%s", len(truncated), model)
+    started = time.perf_counter()
     response = client.embeddings.create(input=truncated, model=model)
+    record_embedding_request(model, 1, time.perf_counter() - started)
     return response.data[0].embedding
 
 
-def generate_embeddings(texts: list[str], model: str | None = None) -> list[list[float]]:
-    """Generate embeddings for a batch while preserving input order."""
+def _decode_embedding(value: Any) -> array:
+    """Return one embedding as a packed float32 array.
+
+    With ``encoding_format="base64"`` the API returns the little-endian
+    float32 buffer itself, which is copied straight into the array.  Plain
+    float lists (providers that ignore the parameter) are packed as well.
+    """
+    if isinstance(value, str):
+        vector = array("f")
+        vector.frombytes(base64.b64decode(value))
+        if sys.byteorder == "big":
+            vector.byteswap()
+        return vector
+    return array("f", value)
+
+
+def generate_embeddings(texts: list[str], model: str | None = None) -> list[array]:
+    """Generate embeddings for a batch while preserving input order.
+
+    Vectors are requested as base64 and returned as packed float32
+    ``array('f')`` objects, so large chunk batches are never expanded into
+    Python float lists.  Use :func:`generate_embedding` when a JSON-ready
+    list is needed.
+    """
     if not texts:
         return []
     model = model or settings.embedding_model
     truncated = [_truncate_text_for_embedding(text, model, settings.embedding_max_tokens) for text in texts]
     client = _get_embedding_client()
     logger.debug("Generating %d embeddings using model=%s", len(truncated), model)
-    response = client.embeddings.create(input=truncated, model=model)
+    started = time.perf_counter()
+    response = client.embeddings.create(input=truncated, model=model, encoding_format="base64")
+    record_embedding_request(model, len(truncated), time.perf_counter() - started)
     rows = list(response.data)
     if all(isinstance(getattr(row, "index", None), int) for row in rows):
         rows.sort(key=lambda row: row.index)
-    return [row.embedding for row in rows]
+    return [_decode_embedding(row.embedding) for row in rows]
 
 
 def cosine_similarity(vec_a: list[float], vec_b: list[float]) -> float:
@@ -13,6 +13,7 @@ from sqlalchemy.orm import Session
 
 from app.config import settings
 from app.models import FileProcessingStep, FileRecord
+from app.utils.live_events import publish_file_status
 from app.utils.pipeline_stages import normalize_stage_name, stage_keys_for_pipeline_steps
 
 # Define the expected processing steps for a standard file workflow
@@ -144,6 +145,7 @@ def update_step_status(
             step.completed_at = completed_at
 
     db.commit()
+    publish_file_status(db, file_id, step_name, status)
 
 
 def get_file_step_status(db: Session, file_id: int) -> Dict[str, Dict]:
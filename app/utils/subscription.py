@@ -29,10 +29,9 @@ At average usage (~40 % of quota) margins improve to 55-65 % after tax.
 from __future__ import annotations
 
 import logging
-from datetime import date, datetime, time, timedelta, timezone
+from datetime import date, datetime, timezone
 from typing import Any
 
-from sqlalchemy import func
 from sqlalchemy.orm import Session
 
 from app.config import settings
@@ -317,75 +316,35 @@ def _today_utc() -> date:
     return datetime.now(timezone.utc).date()
 
 
-def _day_bounds_utc(day: date) -> tuple[datetime, datetime]:
-    start = datetime.combine(day, time.min, tzinfo=timezone.utc)
-    return start, start + timedelta(days=1)
-
-
-def _month_bounds_utc(day: date) -> tuple[datetime, datetime]:
-    start = datetime.combine(day.replace(day=1), time.min, tzinfo=timezone.utc)
-    if start.month == 12:
-        end = start.replace(year=start.year + 1, month=1)
-    else:
-        end = start.replace(month=start.month + 1)
-    return start, end
-
-
-def _scalar_count(query: Any) -> int:
-    """Execute a count query and return an int, defaulting to 0 for NULL."""
-    return query.scalar() or 0
-
-
 def get_lifetime_file_count(db: Session, owner_id: str) -> int:
     """Total files ever processed by this user (not counting duplicates)."""
-    from app.models import FileRecord
+    from app.utils.usage_counters import PERIOD_LIFETIME, get_usage_count
 
-    return _scalar_count(
-        db.query(func.count(FileRecord.id)).filter(FileRecord.owner_id == owner_id, FileRecord.is_duplicate.is_(False))
-    )
+    return get_usage_count(db, owner_id, PERIOD_LIFETIME)
 
 
 def get_today_file_count(db: Session, owner_id: str) -> int:
     """Files processed by this user today (UTC, not counting duplicates)."""
-    from app.models import FileRecord
-
-    day_start, day_end = _day_bounds_utc(_today_utc())
-    return _scalar_count(
-        db.query(func.count(FileRecord.id)).filter(
-            FileRecord.owner_id == owner_id,
-            FileRecord.is_duplicate.is_(False),
-            FileRecord.created_at >= day_start,
-            FileRecord.created_at < day_end,
-        )
-    )
+    from app.utils.usage_counters import PERIOD_DAY, day_bucket, get_usage_count
+
+    return get_usage_count(db, owner_id, PERIOD_DAY, day_bucket(_today_utc()))
 
 
 def get_month_file_count(db: Session, owner_id: str) -> int:
     """Files processed by this user this calendar month (UTC, not counting duplicates)."""
-    from app.models import FileRecord
-
-    month_start, month_end = _month_bounds_utc(_today_utc())
-    return _scalar_count(
-        db.query(func.count(FileRecord.id)).filter(
-            FileRecord.owner_id == owner_id,
-            FileRecord.is_duplicate.is_(False),
-            FileRecord.created_at >= month_start,
-            FileRecord.created_at < month_end,
-        )
-    )
+    from app.utils.usage_counters import PERIOD_MONTH, get_usage_count, month_bucket
+
+    return get_usage_count(db, owner_id, PERIOD_MONTH, month_bucket(_today_utc()))
 
 
 def get_year_file_count(db: Session, owner_id: str, period_start: datetime) -> int:
-    """Files processed since the start of the current annual subscription period."""
-    from app.models import FileRecord
-
-    return _scalar_count(
-        db.query(func.count(FileRecord.id)).filter(
-            FileRecord.owner_id == owner_id,
-            FileRecord.is_duplicate.is_(False),
-            FileRecord.created_at >= period_start,
-        )
-    )
+    """Files processed since the start of the current annual subscription period.
+
+    Counted from the start of the (UTC) day on which the period started.
+    """
+    from app.utils.usage_counters import get_usage_since
+
+    return get_usage_since(db, owner_id, period_start)
 
 
 def _months_elapsed(period_start: datetime, now: datetime) -> int:
@@ -35,6 +35,7 @@ from typing import Optional
 
 from app.config import settings
 from app.utils.ai_provider import get_ai_provider
+from app.utils.llm_cache import cached_chat_completion
 
 logger = logging.getLogger(__name__)
 
@@ -139,6 +140,20 @@ class TextComparisonResult:
     ai_response_raw: Optional[str] = None
 
 
+def _parse_json_response(response_text: str) -> dict:
+    """Parse the AI's JSON reply, stripping optional markdown code fences."""
+    clean = re.sub(r"```(?:json)?\s*", "", response_text).strip().rstrip("`").strip()
+    return json.loads(clean)
+
+
+def _is_json_object(response_text: str) -> bool:
+    """Return True when *response_text* parses to a JSON object (worth caching)."""
+    try:
+        return isinstance(_parse_json_response(response_text), dict)
+    except ValueError:
+        return False
+
+
 # ---------------------------------------------------------------------------
 # Public API
 # ---------------------------------------------------------------------------
@@ -299,7 +314,10 @@ def check_text_quality(text: str, text_source: TextSource) -> TextQualityResult:
     try:
         provider = get_ai_provider()
         model = settings.ai_model or settings.openai_model or "gpt-4o-mini"
-        response_text = provider.chat_completion(
+        response_text = cached_chat_completion(
+            provider,
+            "text_quality",
+            validate=_is_json_object,
             messages=[
                 {
                     "role": "system",
@@ -313,9 +331,7 @@ def check_text_quality(text: str, text_source: TextSource) -> TextQualityResult:
 
         logger.info(f"[text_quality] AI quality check raw response: {response_text[:500]}")
 
-        # Strip optional markdown code fences before parsing.
-        clean = re.sub(r"```(?:json)?\s*", "", response_text).strip().rstrip("`").strip()
-        parsed: dict = json.loads(clean)
+        parsed: dict = _parse_json_response(response_text)
 
         quality_score = int(parsed.get("quality_score", 0))
         is_good_ai = bool(parsed.get("is_good_quality", quality_score >= threshold))
@@ -417,7 +433,10 @@ def compare_text_quality(original_text: str, ocr_text: str) -> TextComparisonRes
     try:
         provider = get_ai_provider()
         model = settings.ai_model or settings.openai_model or "gpt-4o-mini"
-        response_text = provider.chat_completion(
+        response_text = cached_chat_completion(
+            provider,
+            "text_quality_compare",
+            validate=_is_json_object,
             messages=[
                 {
                     "role": "system",
@@ -431,8 +450,7 @@ def compare_text_quality(original_text: str, ocr_text: str) -> TextComparisonRes
 
         logger.info(f"[text_quality] AI comparison raw response: {response_text[:500]}")
 
-        clean = re.sub(r"```(?:json)?\s*", "", response_text).strip().rstrip("`").strip()
-        parsed: dict = json.loads(clean)
+        parsed: dict = _parse_json_response(response_text)
 
         original_score = int(parsed.get("original_score", 0))
         ocr_score = int(parsed.get("ocr_score", 0))
@@ -0,0 +1,280 @@
+"""Materialised per-owner file counters used by subscription quota checks.
+
+Counting ``FileRecord`` rows on every upload and every billing page view
+gets expensive for owners with hundreds of thousands of documents.  Instead,
+:class:`app.models.UsageCounter` keeps one row per owner and UTC bucket:
+
+* ``lifetime`` – all processed files (bucket ``""``)
+* ``month``    – files processed in a calendar month (bucket ``YYYY-MM``)
+* ``day``      – files processed on a day (bucket ``YYYY-MM-DD``)
+
+Only non-duplicate files with an owner are counted, matching the previous
+``COUNT(*)`` queries.  Counters are adjusted in the caller's transaction via
+:func:`adjust_usage` / :func:`adjust_usage_for_records`, so they commit or
+roll back together with the ``FileRecord`` change.  Writes that bypass these
+helpers (bulk SQL, restores, manual fixes) are corrected by
+:func:`reconcile_usage_counters`, which the ``reconcile-usage-counters``
+beat job runs daily.
+"""
+
+from __future__ import annotations
+
+import logging
+from collections import Counter
+from collections.abc import Iterable
+from datetime import date, datetime, timezone
+from typing import Any
+
+from sqlalchemy import func, insert, update
+from sqlalchemy.orm import Session
+
+from app.models import FileRecord, UsageCounter
+
+logger = logging.getLogger(__name__)
+
+PERIOD_LIFETIME = "lifetime"
+PERIOD_MONTH = "month"
+PERIOD_DAY = "day"
+
+#: Calendar months of day/month buckets kept (and reconciled).  Covers an
+#: annual subscription period plus the month it started in.
+RETENTION_MONTHS = 13
+
+
+def _as_utc(value: datetime | None) -> datetime:
+    if value is None:
+        return datetime.now(timezone.utc)
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def day_bucket(day: date) -> str:
+    return day.strftime("%Y-%m-%d")
+
+
+def month_bucket(day: date) -> str:
+    return day.strftime("%Y-%m")
+
+
+def _buckets(at: datetime) -> tuple[tuple[str, str], ...]:
+    day = _as_utc(at).date()
+    return ((PERIOD_LIFETIME, ""), (PERIOD_MONTH, month_bucket(day)), (PERIOD_DAY, day_bucket(day)))
+
+
+def _upsert(db: Session, owner_id: str, period: str, bucket: str, delta: int) -> None:
+    """Add *delta* to one counter row, creating it when missing."""
+    now = datetime.now(timezone.utc)
+    values = {"owner_id": owner_id, "period": period, "bucket": bucket, "count": max(delta, 0), "updated_at": now}
+    dialect = db.get_bind().dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+
+        statement = dialect_insert(UsageCounter).values(**values)
+        db.execute(
+            statement.on_conflict_do_update(
+                index_elements=[UsageCounter.owner_id, UsageCounter.period, UsageCounter.bucket],
+                set_={"count": UsageCounter.count + delta, "updated_at": now},
+            )
+        )
+        return
+
+    result = db.execute(
+        update(UsageCounter)
+        .where(UsageCounter.owner_id == owner_id, UsageCounter.period == period, UsageCounter.bucket == bucket)
+        .values(count=UsageCounter.count + delta, updated_at=now)
+    )
+    if result.rowcount == 0:
+        db.execute(insert(UsageCounter).values(**values))
+
+
+def _insert_if_missing(db: Session, owner_id: str, period: str, bucket: str, count: int) -> None:
+    """Create one counter row with *count*, leaving a row inserted concurrently untouched."""
+    values = {"owner_id": owner_id, "period": period, "bucket": bucket, "count": max(count, 0)}
+    dialect = db.get_bind().dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+
+        db.execute(dialect_insert(UsageCounter).values(**values).on_conflict_do_nothing())
+        return
+
+    exists = (
+        db.query(UsageCounter.count)
+        .filter(UsageCounter.owner_id == owner_id, UsageCounter.period == period, UsageCounter.bucket == bucket)
+        .first()
+    )
+    if exists is None:
+        db.execute(insert(UsageCounter).values(**values))
+
+
+def adjust_usage(db: Session, owner_id: str | None, delta: int = 1, at: datetime | None = None) -> None:
+    """Add *delta* files created at *at* (default: now) to *owner_id*'s counters.
+
+    Does not commit; call it before committing the ``FileRecord`` change it
+    accounts for.  Files without an owner are not counted.
+    """
+    if owner_id is None or delta == 0:
+        return
+    for period, bucket in _buckets(at):
+        _upsert(db, owner_id, period, bucket, delta)
+
+
+def adjust_usage_for_records(db: Session, records: Iterable[Any], delta: int) -> None:
+    """Add (``delta=1``) or remove (``delta=-1``) *records* from their owners' counters.
+
+    Duplicates and records without an owner are ignored, as they are not
+    counted towards quotas.
+    """
+    changes: Counter[tuple[str, str, str]] = Counter()
+    for record in records:
+        if record.owner_id is None or record.is_duplicate:
+            continue
+        for period, bucket in _buckets(record.created_at):
+            changes[(record.owner_id, period, bucket)] += delta
+    for (owner_id, period, bucket), change in sorted(changes.items()):
+        if change:
+            _upsert(db, owner_id, period, bucket, change)
+
+
+def get_usage_count(db: Session, owner_id: str, period: str, bucket: str = "") -> int:
+    """Return one counter value (0 when the row does not exist)."""
+    count = (
+        db.query(UsageCounter.count)
+        .filter(UsageCounter.owner_id == owner_id, UsageCounter.period == period, UsageCounter.bucket == bucket)
+        .scalar()
+    )
+    return max(count or 0, 0)
+
+
+def get_usage_since(db: Session, owner_id: str, start: datetime) -> int:
+    """Return the files processed since the UTC day of *start*.
+
+    Whole months after the start month come from month buckets, the rest of
+    the start month from day buckets, so at most ~43 rows are read.
+    """
+    start_day = _as_utc(start).date()
+    start_month = month_bucket(start_day)
+    months = (
+        db.query(func.sum(UsageCounter.count))
+        .filter(
+            UsageCounter.owner_id == owner_id,
+            UsageCounter.period == PERIOD_MONTH,
+            UsageCounter.bucket > start_month,
+        )
+        .scalar()
+    )
+    days = (
+        db.query(func.sum(UsageCounter.count))
+        .filter(
+            UsageCounter.owner_id == owner_id,
+            UsageCounter.period == PERIOD_DAY,
+            UsageCounter.bucket >= day_bucket(start_day),
+            UsageCounter.bucket < f"{start_month}-99",
+        )
+        .scalar()
+    )
+    return max((months or 0) + (days or 0), 0)
+
+
+def _window_start(now: datetime) -> date:
+    """First day of the oldest month whose day/month buckets are kept."""
+    months = now.year * 12 + now.month - 1 - (RETENTION_MONTHS - 1)
+    return date(months // 12, months % 12 + 1, 1)
+
+
+def _utc_date(db: Session, column: Any) -> Any:
+    """SQL expression for the UTC calendar day of a timestamp *column*, as :func:`_buckets` computes it.
+
+    PostgreSQL's ``DATE(timestamptz)`` uses the session time zone, so the
+    value is converted to UTC first; SQLite stores UTC wall-clock times.
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        return func.date(func.timezone("UTC", column))
+    return func.date(column)
+
+
+def _expected_counters(db: Session, owner_id: str, window_start: date) -> dict[tuple[str, str], int]:
+    counted = db.query(FileRecord).filter(FileRecord.owner_id == owner_id, FileRecord.is_duplicate.is_(False))
+    expected: Counter[tuple[str, str]] = Counter()
+    lifetime = counted.with_entities(func.count(FileRecord.id)).scalar() or 0
+    if lifetime:
+        expected[(PERIOD_LIFETIME, "")] = lifetime
+    created_day = _utc_date(db, FileRecord.created_at)
+    window = datetime.combine(window_start, datetime.min.time(), tzinfo=timezone.utc)
+    for day, count in (
+        counted.filter(FileRecord.created_at >= window)
+        .with_entities(created_day, func.count(FileRecord.id))
+        .group_by(created_day)
+    ):
+        if day is None:
+            continue
+        # SQLite returns "YYYY-MM-DD" strings, PostgreSQL returns dates.
+        key = str(day)[:10]
+        expected[(PERIOD_DAY, key)] += count
+        expected[(PERIOD_MONTH, key[:7])] += count
+    return dict(expected)
+
+
+def reconcile_usage_counters(db: Session, now: datetime | None = None) -> dict[str, int]:
+    """Recompute every owner's counters from ``FileRecord`` and fix any drift.
+
+    Day and month buckets older than :data:`RETENTION_MONTHS` are deleted.
+    Each owner is corrected and committed separately to keep transactions
+    short.  The owner's counter rows are locked before the files are
+    counted and corrections are applied as deltas, so uploads committed
+    meanwhile are neither lost nor counted twice.
+
+    Returns:
+        ``{"owners": <checked>, "corrected": <rows changed>, "pruned": <rows deleted>}``.
+    """
+    window_start = _window_start(_as_utc(now))
+    pruned = (
+        db.query(UsageCounter)
+        .filter(
+            ((UsageCounter.period == PERIOD_DAY) & (UsageCounter.bucket < day_bucket(window_start)))
+            | ((UsageCounter.period == PERIOD_MONTH) & (UsageCounter.bucket < month_bucket(window_start)))
+        )
+        .delete(synchronize_session=False)
+    )
+    db.commit()
+
+    owners = {owner for (owner,) in db.query(FileRecord.owner_id).filter(FileRecord.owner_id.isnot(None)).distinct()}
+    owners.update(owner for (owner,) in db.query(UsageCounter.owner_id).distinct())
+
+    corrected = 0
+    for owner_id in sorted(owners):
+        # Increments of these rows wait for this owner's commit, so the counts
+        # read here and the files counted below describe the same uploads.
+        current: dict[tuple[str, str], int] = {
+            (period, bucket): count
+            for period, bucket, count in db.query(UsageCounter.period, UsageCounter.bucket, UsageCounter.count)
+            .filter(UsageCounter.owner_id == owner_id)
+            .with_for_update()
+        }
+        expected = _expected_counters(db, owner_id, window_start)
+        for (period, bucket), count in current.items():
+            if (period, bucket) not in expected:
+                db.query(UsageCounter).filter(
+                    UsageCounter.owner_id == owner_id, UsageCounter.period == period, UsageCounter.bucket == bucket
+                ).delete(synchronize_session=False)
+                corrected += 1
+            elif count != expected[(period, bucket)]:
+                _upsert(db, owner_id, period, bucket, expected[(period, bucket)] - count)
+                corrected += 1
+        for (period, bucket), count in expected.items():
+            if (period, bucket) not in current:
+                # An upload may have created this bucket since the rows were read;
+                # its row already counts that upload, so it is left as is.
+                _insert_if_missing(db, owner_id, period, bucket, count)
+                corrected += 1
+        db.commit()
+
+    if corrected:
+        logger.warning("Usage counters drifted: corrected %d row(s) across %d owner(s)", corrected, len(owners))
+    return {"owners": len(owners), "corrected": corrected, "pruned": pruned}
@@ -18,6 +18,7 @@ import httpx
 
 from app.database import SessionLocal
 from app.models import InAppNotification, UserNotificationPreference, UserNotificationTarget
+from app.utils.live_events import EVENT_NOTIFICATIONS, publish_event
 from app.utils.network import is_private_ip
 
 logger = logging.getLogger(__name__)
@@ -61,6 +62,7 @@ def create_in_app_notification(
         db.add(notif)
         db.commit()
         db.refresh(notif)
+        publish_event(EVENT_NOTIFICATIONS, owner_id=owner_id)
         return notif
     except Exception:
         db.rollback()
@@ -70,6 +72,15 @@ def create_in_app_notification(
         db.close()
 
 
+def count_unread_notifications(db: Any, owner_id: str) -> int:
+    """Return the number of unread in-app notifications of *owner_id*."""
+    return (
+        db.query(InAppNotification)
+        .filter(InAppNotification.owner_id == owner_id, InAppNotification.is_read == False)  # noqa: E712
+        .count()
+    )
+
+
 def _send_email_notification(target_config: dict[str, Any], title: str, message: str) -> bool:
     """Send an email notification via the configured SMTP target.
 
@@ -4,13 +4,25 @@ The existing ``FileRecord.embedding`` remains the document-level vector used
 for duplicate detection.  This module creates a separate, optional index of
 overlapping OCR-text chunks so external assistants can retrieve precise,
 source-backed passages without changing the stable ingestion pipeline.
+
+Chunk embeddings arrive as packed float32 arrays (see
+:func:`app.utils.similarity.generate_embeddings`) and stay packed until the
+request body is encoded.  Vectors are then written with just enough digits
+to round-trip the stored precision: nine significant digits for the default
+``float32`` collections and five for ``VECTOR_INDEX_DATATYPE=float16``,
+which also halves Qdrant's vector storage.  Requests share one keep-alive
+HTTP session per process.
 """
 
 from __future__ import annotations
 
 import hashlib
+import json
 import logging
+import os
+import threading
 import uuid
+from array import array
 from dataclasses import dataclass
 from typing import Any, Iterable
 
@@ -26,6 +38,46 @@ class VectorIndexError(RuntimeError):
     """Raised when the external vector index cannot satisfy a request."""
 
 
+#: Significant digits that round-trip each supported Qdrant vector datatype.
+_DATATYPE_DIGITS = {"float32": 9, "float16": 5}
+
+_session_lock = threading.Lock()
+_session: requests.Session | None = None
+_session_pid: int | None = None
+
+
+def _http_session() -> requests.Session:
+    """Return this process's keep-alive session (rebuilt after a fork)."""
+    global _session, _session_pid
+    with _session_lock:
+        if _session is None or _session_pid != os.getpid():
+            _session = requests.Session()
+            _session_pid = os.getpid()
+        return _session
+
+
+def vector_datatype() -> str:
+    """Return the configured Qdrant vector datatype (``float32`` or ``float16``)."""
+    datatype = getattr(settings, "vector_index_datatype", "float32")
+    return datatype if datatype in _DATATYPE_DIGITS else "float32"
+
+
+def encode_body(body: dict[str, Any], datatype: str = "float32") -> bytes:
+    """Serialize a Qdrant request body as compact JSON.
+
+    Packed ``array('f')`` vectors are written with the digits *datatype*
+    can store instead of the 17-digit ``repr`` of each widened float.
+    """
+    spec = f".{_DATATYPE_DIGITS.get(datatype, 9)}g"
+
+    def _vector(value: Any) -> list[float]:
+        if isinstance(value, array):
+            return [float(format(component, spec)) for component in value]
+        raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+    return json.dumps(body, separators=(",", ":"), default=_vector).encode("utf-8")
+
+
 @dataclass(frozen=True)
 class TextChunk:
     """A stable, ordered excerpt of a document's OCR text."""
@@ -134,6 +186,7 @@ class QdrantVectorIndex:
         self.base_url = settings.vector_index_url.rstrip("/")
         self.collection = settings.vector_index_collection
         self.timeout = settings.vector_index_timeout_seconds
+        self.datatype = vector_datatype()
         self.headers = {"Content-Type": "application/json"}
         if settings.vector_index_api_key:
             self.headers["api-key"] = settings.vector_index_api_key
@@ -147,11 +200,11 @@ class QdrantVectorIndex:
         expected: Iterable[int] = (200,),
     ) -> requests.Response:
         try:
-            response = requests.request(
+            response = _http_session().request(
                 method,
                 f"{self.base_url}{path}",
                 headers=self.headers,
-                json=body,
+                data=encode_body(body, self.datatype) if body is not None else None,
                 timeout=self.timeout,
             )
         except requests.RequestException as exc:
@@ -168,10 +221,13 @@ class QdrantVectorIndex:
             expected=(200, 404),
         )
         if response.status_code == 404:
+            vectors: dict[str, Any] = {"size": dimensions, "distance": "Cosine"}
+            if self.datatype != "float32":
+                vectors["datatype"] = self.datatype
             self._request(
                 "PUT",
                 f"/collections/{self.collection}",
-                {"vectors": {"size": dimensions, "distance": "Cosine"}},
+                {"vectors": vectors},
                 expected=(200, 201),
             )
         else:
@@ -322,7 +378,7 @@ class QdrantVectorIndex:
         if not chunks:
             return 0
 
-        vectors: list[list[float]] = []
+        vectors: list[array] = []
         for batch_number, batch in enumerate(
             _embedding_batches(chunks, settings.vector_embedding_batch_tokens),
             start=1,
@@ -506,6 +562,53 @@ class QdrantVectorIndex:
             result = result.get("points", [])
         return result if isinstance(result, list) else []
 
+    def top_passages(
+        self,
+        vector: Any,
+        *,
+        document_ids: list[int],
+        per_document: int,
+    ) -> dict[int, list[dict[str, Any]]]:
+        """Return the payloads of each document's best-matching chunks, best first.
+
+        One grouped query covers a whole batch of documents.  Callers must
+        pass only authorized IDs; documents without indexed chunks are absent
+        from the result.
+        """
+        if not document_ids:
+            return {}
+        body: dict[str, Any] = {
+            "query": vector,
+            "group_by": "document_id",
+            "group_size": per_document,
+            "limit": len(document_ids),
+            "filter": {"must": [{"key": "document_id", "match": {"any": document_ids}}]},
+            "with_payload": ["document_id", "chunk_index", "chunk_count", "text"],
+            "with_vector": False,
+        }
+        response = self._request(
+            "POST",
+            f"/collections/{self.collection}/points/query/groups",
+            body,
+            expected=(200, 404),
+        )
+        if response.status_code == 404:
+            legacy_body = dict(body)
+            legacy_body["vector"] = legacy_body.pop("query")
+            response = self._request(
+                "POST",
+                f"/collections/{self.collection}/points/search/groups",
+                legacy_body,
+            )
+        result = response.json().get("result") or {}
+        passages: dict[int, list[dict[str, Any]]] = {}
+        for group in result.get("groups", []) if isinstance(result, dict) else []:
+            document_id = group.get("id")
+            payloads = [hit.get("payload") or {} for hit in group.get("hits", [])]
+            if isinstance(document_id, int) and document_id in document_ids and payloads:
+                passages[document_id] = payloads
+        return passages
+
     def status(self) -> dict[str, Any]:
         response = self._request(
             "GET",
@@ -22,10 +22,14 @@ import json
 import logging
 import socket
 import ssl
+import threading
 import time
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
 from typing import Any
 from urllib.parse import ParseResult, urlparse
 
+from app.config import settings
 from app.database import SessionLocal
 from app.models import WebhookConfig
 
@@ -94,54 +98,215 @@ def _resolve_public_address(hostname: str, port: int) -> str | None:
     return candidates[0] if candidates else None
 
 
+def _endpoint_port(parsed_url: ParseResult) -> int:
+    return parsed_url.port or (443 if parsed_url.scheme == "https" else 80)
+
+
+def _open_pinned_connection(parsed_url: ParseResult, address: str) -> http.client.HTTPConnection:
+    """Open an HTTP(S) connection whose socket is pinned to *address*.
+
+    TLS still verifies the certificate against the URL's hostname.  The
+    connection has ``auto_open`` disabled, so once the socket is closed it can
+    never silently reconnect by resolving the hostname again.
+    """
+    hostname = parsed_url.hostname or ""
+    port = _endpoint_port(parsed_url)
+    raw_socket = socket.create_connection((address, port), timeout=WEBHOOK_TIMEOUT)
+    if parsed_url.scheme == "https":
+        context = ssl.create_default_context()
+        context.minimum_version = ssl.TLSVersion.TLSv1_2
+        try:
+            raw_socket = context.wrap_socket(raw_socket, server_hostname=hostname)
+        except Exception:
+            raw_socket.close()
+            raise
+
+    connection_cls = http.client.HTTPSConnection if parsed_url.scheme == "https" else http.client.HTTPConnection
+    connection = connection_cls(hostname, port, timeout=WEBHOOK_TIMEOUT)
+    connection.sock = raw_socket
+    connection.auto_open = 0
+    return connection
+
+
+class _PinnedConnectionPool:
+    """Keep-alive connections keyed by ``(scheme, host, port, resolved address)``.
+
+    Idle connections are reused for later deliveries to the same endpoint
+    while DNS keeps resolving to the same validated address, skipping the TCP
+    and TLS handshakes.  Connections idle for longer than
+    ``webhook_pool_idle_timeout`` seconds are closed instead of reused.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._idle: dict[tuple[str, str, int, str], list[tuple[http.client.HTTPConnection, float]]] = {}
+
+    def acquire(self, key: tuple[str, str, int, str]) -> http.client.HTTPConnection | None:
+        """Return a live idle connection for *key*, or *None* if there is none."""
+        now = time.monotonic()
+        idle_timeout = float(settings.webhook_pool_idle_timeout)
+        expired: list[http.client.HTTPConnection] = []
+        connection = None
+        with self._lock:
+            idle = self._idle.get(key, [])
+            while idle:
+                candidate, idle_since = idle.pop()
+                if now - idle_since < idle_timeout:
+                    connection = candidate
+                    break
+                expired.append(candidate)
+        for stale in expired:
+            stale.close()
+        return connection
+
+    def release(self, key: tuple[str, str, int, str], connection: http.client.HTTPConnection) -> None:
+        """Return *connection* to the pool, closing it if the pool is full."""
+        max_idle = int(settings.webhook_pool_max_idle_per_host)
+        with self._lock:
+            idle = self._idle.setdefault(key, [])
+            if len(idle) < max_idle:
+                idle.append((connection, time.monotonic()))
+                return
+        connection.close()
+
+    def clear(self) -> None:
+        """Close every idle connection."""
+        with self._lock:
+            idle, self._idle = self._idle, {}
+        for connections in idle.values():
+            for connection, _ in connections:
+                connection.close()
+
+
+class WebhookThrottled(Exception):
+    """Raised when an endpoint's concurrency or rate limit has no room for a delivery right now.
+
+    ``retry_after`` is the number of seconds after which a retry is likely to
+    get a slot.
+    """
+
+    def __init__(self, url: str, retry_after: float) -> None:
+        super().__init__(f"Webhook to {url} throttled; retry in {retry_after:.1f}s")
+        self.retry_after = retry_after
+
+
+class _EndpointLimiter:
+    """Per-endpoint concurrency semaphore and token-bucket rate limit.
+
+    Limits apply within one process: with N Celery worker processes an
+    endpoint sees up to N times the configured concurrency and rate.  The
+    limiter never waits, because a delivery waiting for a slot would occupy
+    a worker; callers get the delay after which to try again instead.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._semaphores: dict[tuple[str, str, int], tuple[int, threading.BoundedSemaphore]] = {}
+        self._buckets: dict[tuple[str, str, int], list[float]] = {}
+
+    def _semaphore(self, key: tuple[str, str, int], limit: int) -> threading.BoundedSemaphore:
+        with self._lock:
+            current = self._semaphores.get(key)
+            if current is None or current[0] != limit:
+                current = (limit, threading.BoundedSemaphore(limit))
+                self._semaphores[key] = current
+            return current[1]
+
+    def _take_token(self, key: tuple[str, str, int], rate_per_minute: int) -> float:
+        """Take a token and return 0, or return the seconds until one is available."""
+        rate = rate_per_minute / 60.0
+        capacity = max(1.0, rate)
+        with self._lock:
+            now = time.monotonic()
+            tokens, updated = self._buckets.get(key, [capacity, now])
+            tokens = min(capacity, tokens + (now - updated) * rate)
+            if tokens >= 1.0:
+                self._buckets[key] = [tokens - 1.0, now]
+                return 0.0
+            self._buckets[key] = [tokens, now]
+            return (1.0 - tokens) / rate
+
+    @contextmanager
+    def slot(self, key: tuple[str, str, int], max_concurrency: int, rate_per_minute: int) -> Iterator[float]:
+        """Yield 0 when a delivery slot is free, else the seconds to wait before trying again."""
+        semaphore = self._semaphore(key, max(1, max_concurrency))
+        if not semaphore.acquire(blocking=False):
+            # A running request frees its slot within the request timeout.
+            yield float(WEBHOOK_TIMEOUT)
+            return
+        try:
+            yield self._take_token(key, rate_per_minute) if rate_per_minute > 0 else 0.0
+        finally:
+            semaphore.release()
+
+
+_connection_pool = _PinnedConnectionPool()
+_endpoint_limiter = _EndpointLimiter()
+
+#: Errors that indicate a pooled keep-alive connection was closed by the peer.
+_STALE_CONNECTION_ERRORS = (
+    http.client.RemoteDisconnected,
+    http.client.NotConnected,
+    http.client.CannotSendRequest,
+    BrokenPipeError,
+    ConnectionResetError,
+)
+
+
 def _send_pinned_post(
     parsed_url: ParseResult,
     address: str,
     body_bytes: bytes,
     headers: dict[str, str],
 ) -> tuple[bool, int]:
-    """Send the webhook over a socket pinned to a pre-validated address."""
+    """Send the webhook over a keep-alive connection pinned to a pre-validated address."""
     hostname = parsed_url.hostname
     if not hostname:
         return False, 0
 
-    port = parsed_url.port or (443 if parsed_url.scheme == "https" else 80)
-    raw_socket = socket.create_connection((address, port), timeout=WEBHOOK_TIMEOUT)
-    connection = None
-    if parsed_url.scheme == "https":
-        context = ssl.create_default_context()
-        context.minimum_version = ssl.TLSVersion.TLSv1_2
+    port = _endpoint_port(parsed_url)
+    path = parsed_url.path or "/"
+    if parsed_url.query:
+        path = f"{path}?{parsed_url.query}"
+
+    host_header = hostname
+    if ":" in hostname and not hostname.startswith("["):
+        host_header = f"[{hostname}]"
+    default_port = 443 if parsed_url.scheme == "https" else 80
+    if port != default_port:
+        host_header = f"{host_header}:{port}"
+    request_headers = {key: value for key, value in headers.items() if key.lower() != "host"}
+    request_headers["Host"] = host_header
+
+    pool_key = (parsed_url.scheme, hostname, port, address)
+    connection = _connection_pool.acquire(pool_key)
+    reused = connection is not None
+    while True:
+        if connection is None:
+            connection = _open_pinned_connection(parsed_url, address)
         try:
-            raw_socket = context.wrap_socket(raw_socket, server_hostname=hostname)
+            connection.request("POST", path, body=body_bytes, headers=request_headers)
+            response = connection.getresponse()
+            # Drain the body so the connection can carry the next request.
+            response.read()
+        except _STALE_CONNECTION_ERRORS:
+            connection.close()
+            if not reused:
+                raise
+            # The server closed an idle keep-alive connection; retry once fresh.
+            connection = None
+            reused = False
+            continue
         except Exception:
-            raw_socket.close()
+            connection.close()
             raise
+        break
 
-    try:
-        path = parsed_url.path or "/"
-        if parsed_url.query:
-            path = f"{path}?{parsed_url.query}"
-
-        host_header = hostname
-        if ":" in hostname and not hostname.startswith("["):
-            host_header = f"[{hostname}]"
-        default_port = 443 if parsed_url.scheme == "https" else 80
-        if port != default_port:
-            host_header = f"{host_header}:{port}"
-        request_headers = {key: value for key, value in headers.items() if key.lower() != "host"}
-        request_headers["Host"] = host_header
-
-        connection_cls = http.client.HTTPSConnection if parsed_url.scheme == "https" else http.client.HTTPConnection
-        connection = connection_cls(hostname, port, timeout=WEBHOOK_TIMEOUT)
-        connection.sock = raw_socket
-        connection.request("POST", path, body=body_bytes, headers=request_headers)
-        response = connection.getresponse()
-        return 200 <= response.status < 300, response.status
-    finally:
-        if connection is not None:
-            connection.close()
-        else:
-            raw_socket.close()
+    if response.will_close:
+        connection.close()
+    else:
+        _connection_pool.release(pool_key, connection)
+    return 200 <= response.status < 300, response.status
 
 
 def compute_signature(payload_bytes: bytes, secret: str) -> str:
@@ -171,17 +336,31 @@ def verify_signature(payload_bytes: bytes, secret: str, signature: str | None) -
 
 
 def deliver_webhook_with_status(
-    url: str, payload: dict[str, Any], secret: str | None = None
+    url: str,
+    payload: dict[str, Any] | list[dict[str, Any]],
+    secret: str | None = None,
+    *,
+    max_concurrency: int | None = None,
+    rate_limit_per_minute: int | None = None,
 ) -> tuple[bool, int | None]:
     """Send a single webhook POST request.
 
     Args:
         url: Target URL.
-        payload: JSON-serialisable dictionary.
+        payload: JSON-serialisable dictionary, or a list of payload envelopes
+            for subscribers that opted into batched delivery.
         secret: If provided, an ``X-Webhook-Signature`` header is included.
+        max_concurrency: Concurrent requests allowed to this endpoint;
+            defaults to ``webhook_max_concurrency_per_endpoint``.
+        rate_limit_per_minute: Requests per minute allowed to this endpoint
+            (``0`` = unlimited); defaults to ``webhook_rate_limit_per_minute``.
 
     Returns:
         A tuple containing success and the remote HTTP status, when available.
+
+    Raises:
+        WebhookThrottled: The endpoint's limits leave no room right now; nothing
+            was sent.
     """
     parsed_url = urlparse(url)
     if parsed_url.scheme not in {"http", "https"}:
@@ -198,7 +377,7 @@ def deliver_webhook_with_status(
         logger.warning("Webhook to %s blocked: private or metadata endpoint", url)
         return False, None
 
-    port = parsed_url.port or (443 if parsed_url.scheme == "https" else 80)
+    port = _endpoint_port(parsed_url)
     address = _resolve_public_address(normalised_hostname, port)
     if address is None:
         logger.warning("Webhook to %s blocked: private, metadata, or unresolved endpoint", url)
@@ -208,28 +387,48 @@ def deliver_webhook_with_status(
     body_bytes = body.encode("utf-8")
 
     headers: dict[str, str] = {"Content-Type": "application/json"}
-    if payload.get("event"):
-        headers["X-DocuElevate-Event"] = str(payload["event"])
-    if payload.get("version"):
-        headers["X-DocuElevate-Webhook-Version"] = str(payload["version"])
+    if isinstance(payload, list):
+        headers["X-DocuElevate-Event"] = "batch"
+        headers["X-DocuElevate-Batch-Size"] = str(len(payload))
+        envelope = payload[0] if payload else {}
+    else:
+        envelope = payload
+        if payload.get("event"):
+            headers["X-DocuElevate-Event"] = str(payload["event"])
+    if envelope.get("version"):
+        headers["X-DocuElevate-Webhook-Version"] = str(envelope["version"])
     if secret:
         headers["X-Webhook-Signature"] = compute_signature(body_bytes, secret)
 
-    try:
-        ok, status_code = _send_pinned_post(parsed_url, address, body_bytes, headers)
-        if ok:
-            logger.info("Webhook delivered to %s (status %d)", url, status_code)
-            return True, status_code
-        logger.warning("Webhook to %s returned status %d", url, status_code)
-        return False, status_code
-    except (OSError, http.client.HTTPException) as exc:
-        logger.error("Webhook delivery to %s failed: %s", url, exc)
-        return False, None
+    if max_concurrency is None:
+        max_concurrency = int(settings.webhook_max_concurrency_per_endpoint)
+    if rate_limit_per_minute is None:
+        rate_limit_per_minute = int(settings.webhook_rate_limit_per_minute)
+
+    endpoint = (parsed_url.scheme, normalised_hostname, port)
+    with _endpoint_limiter.slot(endpoint, max_concurrency, rate_limit_per_minute) as retry_after:
+        if retry_after:
+            logger.info("Webhook to %s throttled by per-endpoint concurrency or rate limit", url)
+            raise WebhookThrottled(url, retry_after)
+        try:
+            ok, status_code = _send_pinned_post(parsed_url, address, body_bytes, headers)
+        except (OSError, http.client.HTTPException) as exc:
+            logger.error("Webhook delivery to %s failed: %s", url, exc)
+            return False, None
+
+    if ok:
+        logger.info("Webhook delivered to %s (status %d)", url, status_code)
+        return True, status_code
+    logger.warning("Webhook to %s returned status %d", url, status_code)
+    return False, status_code
 
 
 def deliver_webhook(url: str, payload: dict[str, Any], secret: str | None = None) -> bool:
     """Send a webhook and retain the legacy boolean result contract."""
-    success, _status_code = deliver_webhook_with_status(url, payload, secret)
+    try:
+        success, _status_code = deliver_webhook_with_status(url, payload, secret)
+    except WebhookThrottled:
+        return False
     return success
 
 
@@ -251,11 +450,49 @@ def build_payload(event: str, data: dict[str, Any]) -> dict[str, Any]:
     }
 
 
+def load_webhook_subscriptions(db: Any) -> dict[str, list[dict[str, Any]]]:
+    """Return active webhook configs grouped by subscribed event.
+
+    Each config is loaded and its ``events`` JSON decoded once, so callers
+    that need several events (such as the subscription registry) can answer
+    them from a single query.
+
+    Args:
+        db: An open SQLAlchemy session.
+
+    Returns:
+        A mapping of event name to dicts with ``id``, ``url``, ``secret``,
+        and ``events`` keys.
+    """
+    index: dict[str, list[dict[str, Any]]] = {}
+    configs = db.query(WebhookConfig).filter(WebhookConfig.is_active.is_(True)).order_by(WebhookConfig.id).all()
+    for cfg in configs:
+        try:
+            subscribed = json.loads(cfg.events)
+        except (json.JSONDecodeError, TypeError):
+            subscribed = []
+        if not isinstance(subscribed, list):
+            continue
+        entry = {
+            "id": cfg.id,
+            "url": cfg.url,
+            "secret": cfg.secret,
+            "events": subscribed,
+            "batch_delivery": bool(cfg.batch_delivery),
+            "max_concurrency": cfg.max_concurrency,
+            "rate_limit_per_minute": cfg.rate_limit_per_minute,
+        }
+        for event in dict.fromkeys(subscribed):
+            index.setdefault(event, []).append(entry)
+    return index
+
+
 def get_active_webhooks_for_event(event: str) -> list[dict[str, Any]]:
     """Return all active webhook configs subscribed to *event*.
 
     Queries the database directly so this helper can be called from both the
-    API layer and Celery tasks.
+    API layer and Celery tasks.  Event dispatch uses the cached
+    :func:`get_cached_webhooks_for_event` instead.
 
     Args:
         event: The event name to filter on.
@@ -265,27 +502,18 @@ def get_active_webhooks_for_event(event: str) -> list[dict[str, Any]]:
     """
     db = SessionLocal()
     try:
-        configs = db.query(WebhookConfig).filter(WebhookConfig.is_active.is_(True)).all()
-        result: list[dict[str, Any]] = []
-        for cfg in configs:
-            try:
-                subscribed = json.loads(cfg.events)
-            except (json.JSONDecodeError, TypeError):
-                subscribed = []
-            if event in subscribed:
-                result.append(
-                    {
-                        "id": cfg.id,
-                        "url": cfg.url,
-                        "secret": cfg.secret,
-                        "events": subscribed,
-                    }
-                )
-        return result
+        return load_webhook_subscriptions(db).get(event, [])
     finally:
         db.close()
 
 
+def get_cached_webhooks_for_event(event: str) -> list[dict[str, Any]]:
+    """Return active webhook configs for *event* from the per-process registry."""
+    from app.utils.webhook_registry import registry
+
+    return registry.webhooks_for(event)
+
+
 def dispatch_webhook_event(event: str, data: dict[str, Any]) -> None:
     """Fan-out a webhook event to all matching active configurations.
 
@@ -299,30 +527,67 @@ def dispatch_webhook_event(event: str, data: dict[str, Any]) -> None:
         event: Event name (must be in :data:`VALID_EVENTS`).
         data: Event-specific payload data.
     """
-    if event not in VALID_EVENTS:
-        logger.warning("Ignoring unknown webhook event: %s", event)
-        return
+    dispatch_webhook_events([(event, data)])
 
-    webhooks = get_active_webhooks_for_event(event)
-    if not webhooks:
-        logger.debug("No active webhooks for event %s", event)
-    else:
+
+def dispatch_webhook_events(events: Iterable[tuple[str, dict[str, Any]]]) -> None:
+    """Fan-out several webhook events, sending one Celery message per endpoint.
+
+    Subscribers are looked up in the cached registry.  Payloads for webhooks
+    with ``batch_delivery`` enabled are buffered in Redis for the periodic
+    batch flush.  Other deliveries that share the same URL and secret are
+    grouped: a single delivery is queued as :func:`deliver_webhook_task`,
+    several as one :func:`~app.tasks.webhook_tasks.deliver_webhook_batch_task`
+    message.
+
+    Args:
+        events: ``(event, data)`` pairs; unknown events are skipped.
+    """
+    groups: dict[tuple[str, str | None], list[dict[str, Any]]] = {}
+    dispatched: list[tuple[str, dict[str, Any]]] = []
+    for event, data in events:
+        if event not in VALID_EVENTS:
+            logger.warning("Ignoring unknown webhook event: %s", event)
+            continue
+        dispatched.append((event, data))
+
+        webhooks = get_cached_webhooks_for_event(event)
+        if not webhooks:
+            logger.debug("No active webhooks for event %s", event)
+            continue
         payload = build_payload(event, data)
+        for wh in webhooks:
+            if wh.get("batch_delivery") and wh.get("id") is not None:
+                from app.utils.webhook_batching import buffer_delivery
 
+                if buffer_delivery(wh["id"], payload):
+                    continue
+            groups.setdefault((wh["url"], wh["secret"]), []).append(
+                {"payload": payload, "webhook_config_id": wh.get("id")}
+            )
+
+    if groups:
         # Import here to avoid circular dependency with celery_app
-        from app.tasks.webhook_tasks import deliver_webhook_task
+        from app.tasks.webhook_tasks import deliver_webhook_batch_task, deliver_webhook_task
 
-        for wh in webhooks:
+        for (url, secret), deliveries in groups.items():
             try:
-                deliver_webhook_task.delay(wh["url"], payload, wh["secret"], webhook_config_id=wh.get("id"))
-                logger.debug("Queued webhook delivery to %s for event %s", wh["url"], event)
+                if len(deliveries) == 1:
+                    delivery = deliveries[0]
+                    deliver_webhook_task.delay(
+                        url, delivery["payload"], secret, webhook_config_id=delivery["webhook_config_id"]
+                    )
+                else:
+                    deliver_webhook_batch_task.delay(url, deliveries, secret)
+                logger.debug("Queued %d webhook delivery(ies) to %s", len(deliveries), url)
             except Exception as exc:
-                logger.error("Failed to queue webhook to %s: %s", wh["url"], exc)
+                logger.error("Failed to queue webhook to %s: %s", url, exc)
 
     # Also fan-out to Zapier / Make.com automation hooks
-    try:
-        from app.utils.automation_hooks import dispatch_automation_hooks
+    for event, data in dispatched:
+        try:
+            from app.utils.automation_hooks import dispatch_automation_hooks
 
-        dispatch_automation_hooks(event, data)
-    except Exception as exc:
-        logger.error("Failed to dispatch automation hooks for event %s: %s", event, exc)
+            dispatch_automation_hooks(event, data)
+        except Exception as exc:
+            logger.error("Failed to dispatch automation hooks for event %s: %s", event, exc)
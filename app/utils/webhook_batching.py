@@ -0,0 +1,164 @@
+"""Redis buffers for webhooks that receive events in batches.
+
+Webhooks with ``batch_delivery`` enabled do not get one Celery task per
+event.  :func:`dispatch_webhook_events` appends their payloads to a per-webhook
+Redis list instead, and the periodic ``webhook.flush_batches`` task drains
+each list into ``webhook.deliver_batch`` messages that POST a JSON array of
+up to ``webhook_batch_max_size`` envelopes.
+
+Payloads leave a buffer only after their delivery message was queued, so a
+broker outage delays them to the next flush instead of losing them.  The
+flush also visits buffers of webhooks that were disabled, deleted or
+switched to single deliveries since; buffers additionally expire after
+:data:`BUFFER_TTL_SECONDS` as a last resort.
+"""
+
+import json
+import logging
+import uuid
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from typing import Any
+
+from app.utils.webhook_registry import _get_redis
+
+logger = logging.getLogger(__name__)
+
+#: Redis list holding buffered payloads for one webhook config.
+BATCH_BUFFER_KEY = "docuelevate:webhook_batch:{webhook_id}"
+
+#: Seconds a buffer survives without new events.
+BUFFER_TTL_SECONDS = 24 * 60 * 60
+
+#: Redis key held by the flush currently draining the buffers.
+FLUSH_LOCK_KEY = "docuelevate:webhook_batch_flush_lock"
+
+#: Seconds after which the flush lock of a crashed worker expires.
+FLUSH_LOCK_SECONDS = 5 * 60
+
+_RELEASE_LOCK_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+
+def buffer_delivery(webhook_id: int, payload: dict[str, Any]) -> bool:
+    """Append *payload* to the webhook's batch buffer.
+
+    Returns:
+        ``True`` when buffered, ``False`` when Redis is unavailable and the
+        caller should deliver the payload immediately instead.
+    """
+    client = _get_redis()
+    if client is None:
+        return False
+    key = BATCH_BUFFER_KEY.format(webhook_id=webhook_id)
+    try:
+        pipe = client.pipeline()
+        pipe.rpush(key, json.dumps(payload, default=str))
+        pipe.expire(key, BUFFER_TTL_SECONDS)
+        pipe.execute()
+        return True
+    except Exception as exc:  # noqa: BLE001
+        logger.warning("Could not buffer batched webhook delivery for webhook %s: %s", webhook_id, exc)
+        return False
+
+
+@contextmanager
+def flush_lock() -> Iterator[bool]:
+    """Yield whether this caller may drain the buffers.
+
+    Buffers are read before they are trimmed, so two flushes running at once
+    would queue the same payloads twice; the second one skips its run.
+    Without Redis there is nothing to drain and the lock is granted.
+    """
+    client = _get_redis()
+    if client is None:
+        yield True
+        return
+    token = str(uuid.uuid4())
+    try:
+        acquired = bool(client.set(FLUSH_LOCK_KEY, token, ex=FLUSH_LOCK_SECONDS, nx=True))
+    except Exception as exc:  # noqa: BLE001
+        logger.warning("Could not take the webhook batch flush lock: %s", exc)
+        acquired = False
+    try:
+        yield acquired
+    finally:
+        if acquired:
+            try:
+                client.eval(_RELEASE_LOCK_SCRIPT, 1, FLUSH_LOCK_KEY, token)
+            except Exception as exc:  # noqa: BLE001
+                logger.warning("Could not release the webhook batch flush lock: %s", exc)
+
+
+def buffered_webhook_ids() -> list[int]:
+    """Return the ids of all webhooks with a non-empty batch buffer."""
+    client = _get_redis()
+    if client is None:
+        return []
+    prefix = BATCH_BUFFER_KEY.format(webhook_id="")
+    try:
+        keys = list(client.scan_iter(match=f"{prefix}*"))
+    except Exception as exc:  # noqa: BLE001
+        logger.warning("Could not list batched webhook buffers: %s", exc)
+        return []
+    return sorted(int(suffix) for key in keys if (suffix := str(key)[len(prefix) :]).isdigit())
+
+
+def drain_buffer(webhook_id: int, max_items: int, hand_off: Callable[[list[dict[str, Any]]], None]) -> int:
+    """Pass up to *max_items* buffered payloads to *hand_off*, then remove them from the buffer.
+
+    The payloads are removed only once *hand_off* returned; when it raises
+    they stay buffered for the next flush and the error propagates.
+
+    Returns:
+        The number of payloads handed off (0 when the buffer is empty or
+        Redis is unavailable).
+    """
+    client = _get_redis()
+    if client is None:
+        return 0
+    key = BATCH_BUFFER_KEY.format(webhook_id=webhook_id)
+    try:
+        raw_items = client.lrange(key, 0, max_items - 1)
+    except Exception as exc:  # noqa: BLE001
+        logger.warning("Could not read batched webhook buffer for webhook %s: %s", webhook_id, exc)
+        return 0
+
+    payloads: list[dict[str, Any]] = []
+    for raw in raw_items:
+        try:
+            payloads.append(json.loads(raw))
+        except (json.JSONDecodeError, TypeError):
+            logger.warning("Dropping malformed buffered payload for webhook %s", webhook_id)
+    if payloads:
+        hand_off(payloads)
+    if raw_items:
+        try:
+            client.ltrim(key, len(raw_items), -1)
+        except Exception as exc:  # noqa: BLE001
+            # The payloads were queued but stay buffered; report nothing drained
+            # so the caller stops instead of queueing them again right away.
+            logger.warning("Could not trim batched webhook buffer for webhook %s: %s", webhook_id, exc)
+            return 0
+    return len(payloads)
+
+
+def discard_buffer(webhook_id: int) -> int:
+    """Delete the webhook's buffer and return how many payloads it held."""
+    client = _get_redis()
+    if client is None:
+        return 0
+    key = BATCH_BUFFER_KEY.format(webhook_id=webhook_id)
+    try:
+        pipe = client.pipeline(transaction=True)
+        pipe.llen(key)
+        pipe.delete(key)
+        count, _ = pipe.execute()
+    except Exception as exc:  # noqa: BLE001
+        logger.warning("Could not discard batched webhook buffer for webhook %s: %s", webhook_id, exc)
+        return 0
+    return int(count)
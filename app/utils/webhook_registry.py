@@ -0,0 +1,203 @@
+"""Per-process event→subscriber index for webhooks and automation hooks.
+
+Every document event used to open a database session, load every active
+:class:`~app.models.WebhookConfig` and :class:`~app.models.AutomationHook`
+row and ``json.loads`` its ``events`` column just to find the subscribers.
+Subscriptions change rarely, so each process now keeps an index keyed by event
+name and rebuilds it only when the subscription version changes:
+
+1. **Publish** (API side): :func:`notify_subscriptions_changed` writes a new
+   value to the Redis key ``docuelevate:webhook_registry_version`` and drops
+   the local index.  It is called after every create, update or delete of a
+   webhook or automation hook.
+
+2. **Lookup** (any process): :meth:`SubscriptionRegistry.webhooks_for` and
+   :meth:`SubscriptionRegistry.automation_hooks_for` compare the cached
+   version with the Redis key and rebuild both indexes with a single session
+   when it differs.
+
+The database stays authoritative.  While Redis is unreachable the index is
+trusted for at most :data:`UNVERIFIED_INDEX_TTL` seconds, and every index is
+rebuilt after :data:`MAX_INDEX_AGE` seconds regardless, so rows edited outside
+the API are picked up eventually.
+"""
+
+import logging
+import threading
+import time
+import uuid
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from typing import Any
+
+import redis
+
+from app.config import settings
+from app.database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+#: Redis key holding the current subscription version (opaque string).
+REGISTRY_VERSION_KEY = "docuelevate:webhook_registry_version"
+
+#: Seconds an index may be served without confirming its version in Redis.
+UNVERIFIED_INDEX_TTL = 5.0
+
+#: Seconds after which an index is rebuilt even if the version is unchanged.
+MAX_INDEX_AGE = 300.0
+
+#: Seconds to wait before reconnecting after Redis was found unavailable.
+_REDIS_RETRY_INTERVAL = 30.0
+
+_redis_client: redis.Redis | None = None
+_redis_failed_at: float | None = None
+
+
+def _get_redis() -> redis.Redis | None:
+    """Return a shared Redis client, or *None* while Redis is unavailable."""
+    global _redis_client, _redis_failed_at
+    if _redis_client is not None:
+        return _redis_client
+    if _redis_failed_at is not None and time.monotonic() - _redis_failed_at < _REDIS_RETRY_INTERVAL:
+        return None
+    try:
+        client = redis.Redis.from_url(
+            settings.redis_url,
+            decode_responses=True,
+            socket_connect_timeout=2,
+            socket_timeout=2,
+        )
+        client.ping()
+    except Exception:  # noqa: BLE001
+        logger.debug("Redis unavailable for webhook registry versioning", exc_info=True)
+        _redis_failed_at = time.monotonic()
+        return None
+    _redis_client = client
+    _redis_failed_at = None
+    return client
+
+
+def _read_version() -> str | None:
+    """Return the published subscription version, ``""`` if unset, or *None* on error."""
+    global _redis_client, _redis_failed_at
+    client = _get_redis()
+    if client is None:
+        return None
+    try:
+        return client.get(REGISTRY_VERSION_KEY) or ""
+    except Exception as exc:  # noqa: BLE001
+        logger.debug("Could not read webhook registry version: %s", exc)
+        _redis_client = None
+        _redis_failed_at = time.monotonic()
+        return None
+
+
+@dataclass(frozen=True)
+class SubscriptionIndex:
+    """Immutable snapshot of active subscriptions grouped by event name."""
+
+    version: str | None
+    built_at: float
+    webhooks: dict[str, tuple[dict[str, Any], ...]] = field(default_factory=dict)
+    automation_hooks: dict[str, tuple[dict[str, Any], ...]] = field(default_factory=dict)
+    webhooks_by_id: dict[int, dict[str, Any]] = field(default_factory=dict)
+
+
+def _load_index(version: str | None, built_at: float) -> SubscriptionIndex:
+    """Build a fresh :class:`SubscriptionIndex` from the database."""
+    from app.utils.automation_hooks import load_hook_subscriptions
+    from app.utils.webhook import load_webhook_subscriptions
+
+    db = SessionLocal()
+    try:
+        webhooks = load_webhook_subscriptions(db)
+        hooks = load_hook_subscriptions(db)
+    finally:
+        db.close()
+    return SubscriptionIndex(
+        version=version,
+        built_at=built_at,
+        webhooks={event: tuple(subs) for event, subs in webhooks.items()},
+        automation_hooks={event: tuple(subs) for event, subs in hooks.items()},
+        webhooks_by_id={sub["id"]: sub for subs in webhooks.values() for sub in subs},
+    )
+
+
+class SubscriptionRegistry:
+    """Thread-safe cache of the subscription index for this process."""
+
+    def __init__(
+        self,
+        loader: Callable[[str | None, float], SubscriptionIndex] = _load_index,
+        version_reader: Callable[[], str | None] = _read_version,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._loader = loader
+        self._version_reader = version_reader
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._index: SubscriptionIndex | None = None
+
+    def webhooks_for(self, event: str) -> list[dict[str, Any]]:
+        """Return copies of the active webhook configs subscribed to *event*."""
+        return [dict(sub) for sub in self._current().webhooks.get(event, ())]
+
+    def automation_hooks_for(self, event: str) -> list[dict[str, Any]]:
+        """Return copies of the active automation hooks subscribed to *event*."""
+        return [dict(sub) for sub in self._current().automation_hooks.get(event, ())]
+
+    def webhook_by_id(self, webhook_id: int) -> dict[str, Any] | None:
+        """Return a copy of the active webhook config with *webhook_id*, if any."""
+        sub = self._current().webhooks_by_id.get(webhook_id)
+        return dict(sub) if sub is not None else None
+
+    def invalidate(self) -> None:
+        """Drop the cached index so the next lookup reloads it."""
+        with self._lock:
+            self._index = None
+
+    def _is_fresh(self, index: SubscriptionIndex, version: str | None, now: float) -> bool:
+        age = now - index.built_at
+        if age >= MAX_INDEX_AGE:
+            return False
+        if version is None:
+            return age < UNVERIFIED_INDEX_TTL
+        return version == index.version
+
+    def _current(self) -> SubscriptionIndex:
+        version = self._version_reader()
+        now = self._clock()
+        index = self._index
+        if index is not None and self._is_fresh(index, version, now):
+            return index
+        with self._lock:
+            index = self._index
+            if index is not None and self._is_fresh(index, version, now):
+                return index
+            index = self._loader(version, now)
+            self._index = index
+            logger.debug("Rebuilt webhook subscription index (version=%s)", version)
+            return index
+
+
+#: Process-wide registry used by the dispatch helpers.
+registry = SubscriptionRegistry()
+
+
+def notify_subscriptions_changed() -> None:
+    """Publish a new subscription version and drop this process's index.
+
+    Call this after committing any change to webhook configs or automation
+    hooks.  Redis errors are logged rather than raised so that the primary
+    write still succeeds; other processes then catch up within
+    :data:`UNVERIFIED_INDEX_TTL` or :data:`MAX_INDEX_AGE` seconds.
+    """
+    registry.invalidate()
+    client = _get_redis()
+    if client is None:
+        logger.warning("Could not publish webhook subscription change: Redis unavailable")
+        return
+    try:
+        client.set(REGISTRY_VERSION_KEY, uuid.uuid4().hex)
+    except Exception as exc:  # noqa: BLE001
+        logger.warning("Could not publish webhook subscription change to Redis: %s", exc)
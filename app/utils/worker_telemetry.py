@@ -0,0 +1,274 @@
+"""Heartbeat-based queue and worker telemetry.
+
+``celery.control.inspect()`` broadcasts a request to every worker and waits
+for replies, so each call from a web request blocks for up to the inspect
+timeout and adds broker traffic for every open dashboard.  Instead, every
+worker runs :class:`WorkerTelemetryStep`, which publishes a compact snapshot
+of its own state every ``WORKER_TELEMETRY_INTERVAL`` seconds to the Redis hash
+:data:`TELEMETRY_KEY` (one field per worker hostname):
+
+* active, reserved and scheduled (ETA) task counts per queue,
+* the longest-running active tasks with their current runtime,
+* concurrency, prefetch limit and currently prefetched message count,
+* resident memory of the worker and its pool processes.
+
+Readers fetch the whole hash with a single ``HGETALL`` and combine it with
+:func:`aggregate_snapshots`; cost does not depend on the number of tasks or
+on worker responsiveness.  Snapshots older than :data:`STALE_INTERVALS`
+intervals are treated as offline workers.
+"""
+
+import json
+import logging
+import os
+import socket
+import time
+from collections import Counter
+from typing import TYPE_CHECKING, Any
+
+import redis
+from celery import bootsteps
+
+from app.config import settings
+from app.utils.live_events import EVENT_QUEUE, publish_event
+
+if TYPE_CHECKING:
+    from celery.worker import WorkController
+    from celery.worker.request import Request
+
+logger = logging.getLogger(__name__)
+
+#: Redis hash holding the latest snapshot of every worker (field = hostname).
+TELEMETRY_KEY = "docuelevate:worker_telemetry"
+
+#: Snapshots older than this many publish intervals are ignored.
+STALE_INTERVALS = 3
+
+#: Maximum number of tasks of each kind listed per snapshot.
+MAX_TASKS_PER_SNAPSHOT = 50
+
+#: Maximum length of a task's argument representation.
+MAX_ARGS_DISPLAY_LENGTH = 200
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def telemetry_interval() -> int:
+    """Return the configured publish interval in seconds (at least 1)."""
+    value = getattr(settings, "worker_telemetry_interval", 5)
+    return max(1, value) if isinstance(value, int) else 5
+
+
+def _rss_bytes(pid: int) -> int | None:
+    """Return the resident set size of *pid*, or *None* where /proc is unavailable."""
+    try:
+        with open(f"/proc/{pid}/statm", encoding="ascii") as handle:
+            return int(handle.read().split()[1]) * _PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def _queue_of(request: "Request") -> str:
+    delivery_info = getattr(request, "delivery_info", None) or {}
+    return delivery_info.get("routing_key") or "unknown"
+
+
+def _task_summary(request: "Request", now: float) -> dict[str, Any]:
+    started = getattr(request, "time_start", None)
+    return {
+        "id": getattr(request, "id", "") or "",
+        "name": getattr(request, "name", None) or "unknown",
+        "args": str(getattr(request, "argsrepr", None) or getattr(request, "args", None) or "[]")[
+            :MAX_ARGS_DISPLAY_LENGTH
+        ],
+        "queue": _queue_of(request),
+        "started": started,
+        "runtime": round(now - started, 3) if started else None,
+    }
+
+
+def _scheduled_requests(worker: "WorkController") -> list:
+    """Return requests waiting in the worker timer for their ETA (as ``inspect scheduled`` does)."""
+    from celery.worker.request import Request
+
+    timer = getattr(worker, "timer", None)
+    requests = []
+    for waiting in list(getattr(timer, "queue", None) or []):
+        try:
+            candidate = waiting.entry.args[0]
+        except (AttributeError, IndexError, TypeError):
+            continue
+        if isinstance(candidate, Request):
+            requests.append(candidate)
+    return requests
+
+
+def _pool_pids(worker: "WorkController") -> list[int]:
+    try:
+        info = worker.pool.info
+    except Exception:  # noqa: BLE001
+        return []
+    processes = info.get("processes") if isinstance(info, dict) else None
+    return [pid for pid in processes or [] if isinstance(pid, int)]
+
+
+def build_snapshot(worker: "WorkController", now: float | None = None) -> dict[str, Any]:
+    """Summarise the state of *worker* (a Celery ``WorkController``)."""
+    from celery.worker import state
+
+    now = time.time() if now is None else now
+    active = list(state.active_requests)
+    active_ids = {request.id for request in active}
+    reserved = [request for request in list(state.reserved_requests) if request.id not in active_ids]
+    scheduled = _scheduled_requests(worker)
+
+    active.sort(key=lambda request: getattr(request, "time_start", None) or now)
+    concurrency = getattr(worker, "concurrency", None) or 0
+    multiplier = getattr(getattr(worker.app, "conf", None), "worker_prefetch_multiplier", 0) or 0
+    consumer = getattr(worker, "consumer", None)
+    qos = getattr(consumer, "qos", None)
+    task_consumer = getattr(consumer, "task_consumer", None)
+    queues = sorted(queue.name for queue in getattr(task_consumer, "queues", None) or [])
+
+    pids = [os.getpid(), *_pool_pids(worker)]
+    rss_values = [rss for rss in (_rss_bytes(pid) for pid in pids) if rss is not None]
+    active_summaries = [_task_summary(request, now) for request in active[:MAX_TASKS_PER_SNAPSHOT]]
+
+    return {
+        "hostname": getattr(worker, "hostname", None) or socket.gethostname(),
+        "pid": os.getpid(),
+        "ts": now,
+        "queues": queues,
+        "concurrency": concurrency,
+        "prefetch_limit": concurrency * multiplier,
+        "prefetch_count": getattr(qos, "value", None),
+        "active_by_queue": dict(Counter(_queue_of(request) for request in active)),
+        "reserved_by_queue": dict(Counter(_queue_of(request) for request in reserved)),
+        "scheduled_by_queue": dict(Counter(_queue_of(request) for request in scheduled)),
+        "active": active_summaries,
+        "reserved": [_task_summary(request, now) for request in reserved[:MAX_TASKS_PER_SNAPSHOT]],
+        "scheduled": [
+            {
+                "id": request.id,
+                "name": request.name,
+                "eta": request.eta.isoformat() if getattr(request, "eta", None) else None,
+            }
+            for request in scheduled[:MAX_TASKS_PER_SNAPSHOT]
+        ],
+        "max_runtime": active_summaries[0]["runtime"] if active_summaries else None,
+        "processed": sum(state.total_count.values()),
+        "memory_rss": sum(rss_values) if rss_values else None,
+    }
+
+
+def publish_snapshot(client: redis.Redis, snapshot: dict[str, Any], interval: int) -> None:
+    """Store *snapshot* under its hostname and keep the hash alive for a few intervals."""
+    pipe = client.pipeline(transaction=False)
+    pipe.hset(TELEMETRY_KEY, snapshot["hostname"], json.dumps(snapshot, separators=(",", ":"), default=str))
+    pipe.expire(TELEMETRY_KEY, interval * STALE_INTERVALS * 4)
+    pipe.execute()
+
+
+def read_worker_snapshots(client: redis.Redis, now: float | None = None, max_age: float | None = None) -> list[dict]:
+    """Return the current snapshot of every live worker, ordered by hostname."""
+    now = time.time() if now is None else now
+    max_age = telemetry_interval() * STALE_INTERVALS if max_age is None else max_age
+    snapshots = []
+    for hostname, raw in (client.hgetall(TELEMETRY_KEY) or {}).items():
+        try:
+            snapshot = json.loads(raw)
+        except (TypeError, ValueError):
+            continue
+        if not isinstance(snapshot, dict) or now - float(snapshot.get("ts", 0)) > max_age:
+            continue
+        snapshot.setdefault("hostname", hostname)
+        snapshots.append(snapshot)
+    return sorted(snapshots, key=lambda snapshot: snapshot["hostname"])
+
+
+def aggregate_snapshots(snapshots: list[dict]) -> dict[str, Any]:
+    """Combine worker snapshots into the ``celery`` section of ``/api/queue/stats``."""
+    per_queue: dict[str, dict[str, int]] = {}
+    result: dict[str, Any] = {
+        "active": [],
+        "reserved": [],
+        "scheduled": [],
+        "workers_online": len(snapshots),
+        "per_queue": per_queue,
+        "workers": [],
+        "updated_at": max((snapshot.get("ts", 0) for snapshot in snapshots), default=None),
+    }
+    for snapshot in snapshots:
+        for kind in ("active", "reserved", "scheduled"):
+            result[kind].extend(snapshot.get(kind) or [])
+            for queue, count in (snapshot.get(f"{kind}_by_queue") or {}).items():
+                counts = per_queue.setdefault(queue, {"active": 0, "reserved": 0, "scheduled": 0})
+                counts[kind] += count
+        result["workers"].append(
+            {
+                "hostname": snapshot["hostname"],
+                "last_seen": snapshot.get("ts"),
+                "queues": snapshot.get("queues") or [],
+                "concurrency": snapshot.get("concurrency"),
+                "prefetch_limit": snapshot.get("prefetch_limit"),
+                "prefetch_count": snapshot.get("prefetch_count"),
+                "active": sum((snapshot.get("active_by_queue") or {}).values()),
+                "reserved": sum((snapshot.get("reserved_by_queue") or {}).values()),
+                "scheduled": sum((snapshot.get("scheduled_by_queue") or {}).values()),
+                "max_runtime": snapshot.get("max_runtime"),
+                "processed": snapshot.get("processed"),
+                "memory_rss": snapshot.get("memory_rss"),
+            }
+        )
+    return result
+
+
+class WorkerTelemetryStep(bootsteps.StartStopStep):
+    """Worker bootstep that publishes a telemetry snapshot on the worker timer."""
+
+    label = "Queue telemetry heartbeat"
+    requires = ("celery.worker.components:Timer", "celery.worker.components:Pool")
+
+    def __init__(self, worker: "WorkController", **kwargs: Any) -> None:
+        super().__init__(worker, **kwargs)
+        self.tref = None
+        self.client: redis.Redis | None = None
+        self.hostname: str | None = None
+        self.last_counts: tuple[int, int, int] | None = None
+
+    def start(self, worker: "WorkController") -> None:
+        interval = telemetry_interval()
+        self.client = redis.Redis.from_url(
+            settings.redis_url,
+            decode_responses=True,
+            socket_connect_timeout=2,
+            socket_timeout=2,
+        )
+        self.hostname = worker.hostname
+        self.tref = worker.timer.call_repeatedly(interval, self.publish, (worker, interval), priority=10)
+        logger.info("Publishing worker telemetry every %ss", interval)
+
+    def publish(self, worker: "WorkController", interval: int) -> None:
+        try:
+            snapshot = build_snapshot(worker)
+            publish_snapshot(self.client, snapshot, interval)
+        except Exception as exc:  # noqa: BLE001
+            logger.debug("Could not publish worker telemetry: %s", exc)
+            return
+        # Tell open pages that the queue moved; unchanged heartbeats stay silent.
+        counts = tuple(
+            sum((snapshot.get(f"{kind}_by_queue") or {}).values()) for kind in ("active", "reserved", "scheduled")
+        )
+        if counts != self.last_counts:
+            self.last_counts = counts
+            publish_event(EVENT_QUEUE)
+
+    def stop(self, worker: "WorkController") -> None:
+        if self.tref is not None:
+            self.tref.cancel()
+            self.tref = None
+        if self.client is not None and self.hostname:
+            try:
+                self.client.hdel(TELEMETRY_KEY, self.hostname)
+            except Exception as exc:  # noqa: BLE001
+                logger.debug("Could not remove worker telemetry on shutdown: %s", exc)
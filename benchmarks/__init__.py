@@ -0,0 +1,13 @@
+"""End-to-end pipeline benchmarks for DocuElevate.
+
+* :mod:`benchmarks.corpus` – reproducible synthetic corpora (digital PDFs,
+  scanned image PDFs, multi-page TIFFs and e-mails with attachments).
+* :mod:`benchmarks.standins` – in-process HTTP stand-ins for the LLM and
+  embedding API, Gotenberg, Meilisearch and Qdrant, plus a local OCR provider.
+* :mod:`benchmarks.metrics` – per-stage latency, SQL query and RSS recording.
+* :mod:`benchmarks.run` – runs the Celery pipeline eagerly over a corpus and
+  writes a JSON result.
+* :mod:`benchmarks.compare` – diffs two results, e.g. from two commits.
+
+See ``docs/PipelineBenchmarks.md``.
+"""
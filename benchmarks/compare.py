@@ -0,0 +1,110 @@
+"""Compare two benchmark results written by :mod:`benchmarks.run`.
+
+Prints the change of every headline metric and exits with status 1 when a
+metric regressed by more than ``--threshold`` percent, so the comparison can
+gate a CI job.  Latencies and query counts regress when they grow, throughput
+when it shrinks.  Stage latencies below ``--min-ms`` in both runs are shown but
+never flagged, since their noise dominates.
+
+Usage::
+
+    python -m benchmarks.compare baseline.json candidate.json
+    python -m benchmarks.compare baseline.json candidate.json --threshold 15 --metric p95_ms
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Any
+
+HIGHER_IS_BETTER = {"documents_per_second", "pages_per_second", "megabytes_per_second"}
+
+
+def _flatten(result: dict[str, Any], metric: str) -> dict[str, float]:
+    ingest = result.get("ingest", {})
+    values: dict[str, float] = {
+        f"ingest.{name}": ingest[name]
+        for name in ("documents_per_second", "pages_per_second", "queries_per_document")
+        if ingest.get(name) is not None
+    }
+    for kind, summary in ingest.get("document_latency", {}).items():
+        values[f"document.{kind}.{metric}"] = summary[metric]
+    for stage, summary in result.get("stages", {}).items():
+        values[f"stage.{stage}.{metric}"] = summary[metric]
+        if summary.get("queries_per_call") is not None:
+            values[f"stage.{stage}.queries_per_call"] = summary["queries_per_call"]
+    for name in ("full_text", "vector"):
+        if name in result.get("search", {}):
+            values[f"search.{name}.{metric}"] = result["search"][name][metric]
+    if "peak_rss_mib" in result:
+        values["peak_rss_mib"] = result["peak_rss_mib"]
+    return values
+
+
+def compare(
+    baseline: dict[str, Any],
+    candidate: dict[str, Any],
+    *,
+    metric: str = "p50_ms",
+    threshold: float = 10.0,
+    min_ms: float = 5.0,
+) -> list[dict[str, Any]]:
+    """Return one row per metric present in both results with its change and regression flag."""
+    before, after = _flatten(baseline, metric), _flatten(candidate, metric)
+    rows = []
+    for name in sorted(before.keys() & after.keys()):
+        old, new = before[name], after[name]
+        change = ((new - old) / old * 100) if old else (0.0 if new == old else float("inf"))
+        worse = -change if name.rsplit(".", 1)[-1] in HIGHER_IS_BETTER else change
+        noisy = name.endswith("_ms") and max(old, new) < min_ms
+        rows.append(
+            {
+                "metric": name,
+                "baseline": old,
+                "candidate": new,
+                "change_pct": change,
+                "regressed": worse > threshold and not noisy,
+            }
+        )
+    return rows
+
+
+def _describe(result: dict[str, Any]) -> str:
+    git = result.get("git") or {}
+    commit = (git.get("commit") or "unknown")[:12]
+    return f"{commit}{' (dirty)' if git.get('dirty') else ''}"
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("baseline", type=Path)
+    parser.add_argument("candidate", type=Path)
+    parser.add_argument("--metric", default="p50_ms", choices=("mean_ms", "p50_ms", "p95_ms", "p99_ms", "max_ms"))
+    parser.add_argument("--threshold", type=float, default=10.0, help="Regression threshold in percent (default: 10)")
+    parser.add_argument("--min-ms", type=float, default=5.0, help="Ignore latencies below this (default: 5)")
+    args = parser.parse_args(argv)
+
+    baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+    candidate = json.loads(args.candidate.read_text(encoding="utf-8"))
+    if baseline.get("corpus", {}).get("documents") != candidate.get("corpus", {}).get("documents"):
+        print("warning: the runs used corpora of different sizes", file=sys.stderr)
+
+    rows = compare(baseline, candidate, metric=args.metric, threshold=args.threshold, min_ms=args.min_ms)
+    print(f"baseline {_describe(baseline)}  ->  candidate {_describe(candidate)}")
+    width = max((len(row["metric"]) for row in rows), default=10)
+    for row in rows:
+        marker = "  REGRESSION" if row["regressed"] else ""
+        print(
+            f"{row['metric']:<{width}}  {row['baseline']:>12.3f}  {row['candidate']:>12.3f}  "
+            f"{row['change_pct']:>+8.1f}%{marker}"
+        )
+    regressions = sum(row["regressed"] for row in rows)
+    print(f"{regressions} regression(s) above {args.threshold:g}%")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,336 @@
+"""Reproducible synthetic document corpora for the pipeline benchmarks.
+
+Four kinds of input are generated, mirroring what reaches DocuElevate in
+production:
+
+* ``digital_pdf`` – text PDFs as produced by office suites and billing systems.
+* ``scanned_pdf`` – image-only PDFs (no text layer) that take the OCR path.
+* ``multipage_tiff`` – bilevel Group 4 TIFFs as produced by scanners and fax
+  gateways, converted in-process by ``convert_to_pdf``.
+* ``email`` – RFC 822 messages carrying a digital PDF, a scanned page and an
+  HTML note, ingested like IMAP mail.
+
+The same ``seed`` and ``scale`` always produce the same documents, so results
+from different commits are comparable.  ``manifest.json`` lists every file
+with its page count and SHA-256, the ground-truth text of every scanned PDF
+(keyed by SHA-256, returned by the OCR stand-in) and a set of search queries.
+Images converted inside the pipeline (TIFFs, scanned e-mail attachments) no
+longer match a corpus hash; the OCR stand-in derives their text instead.
+
+Usage::
+
+    python -m benchmarks.corpus /tmp/corpus --scale 20
+    python -m benchmarks.corpus /tmp/corpus --scale 5 --kinds digital_pdf scanned_pdf
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import io
+import json
+import random
+from datetime import datetime, timedelta, timezone
+from email.message import EmailMessage
+from email.utils import format_datetime
+from pathlib import Path
+from typing import Any
+
+import img2pdf
+from fpdf import FPDF
+from PIL import Image, ImageDraw, ImageFont
+
+MANIFEST_NAME = "manifest.json"
+MANIFEST_VERSION = 1
+KINDS = ("digital_pdf", "scanned_pdf", "multipage_tiff", "email")
+
+WORDS_PER_PAGE = 220
+# A4 at 100 dpi keeps generation fast while staying a realistic OCR input.
+PAGE_SIZE = (827, 1169)
+PAGE_DPI = 100
+LINE_WIDTH_CHARS = 95
+CREATION_DATE = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+_DOCUMENT_TYPES = ("Invoice", "Contract", "Statement", "Letter", "Receipt", "Notice")
+_COMPANIES = (
+    "Acme GmbH",
+    "Northwind Traders",
+    "Globex Insurance",
+    "Initech Energy",
+    "Umbrella Health",
+    "Stadtwerke Musterstadt",
+    "Contoso Bank",
+    "Hooli Telecom",
+)
+
+
+def _word(rng: random.Random) -> str:
+    return "".join(rng.choices("abcdefghiklmnoprstuvw", k=rng.randint(4, 9)))
+
+
+def build_vocabulary(seed: int, size: int = 4000) -> list[str]:
+    """Return the corpus vocabulary: pronounceable pseudo-words, unique per seed."""
+    # Seeded for a reproducible corpus – not cryptographic, S311 is intentional.
+    rng = random.Random(seed)  # noqa: S311
+    vocabulary: dict[str, None] = {}
+    while len(vocabulary) < size:
+        vocabulary[_word(rng)] = None
+    return list(vocabulary)
+
+
+def document_text(rng: random.Random, vocabulary: list[str], pages: int) -> list[str]:
+    """Return the text of a synthetic business document, one string per page."""
+    document_type = rng.choice(_DOCUMENT_TYPES)
+    company = rng.choice(_COMPANIES)
+    issued = datetime(2020, 1, 1) + timedelta(days=rng.randint(0, 2000))
+    header = (
+        f"{company}\n{document_type} No. {rng.randint(10000, 99999)}-{rng.randint(100, 999)}\n"
+        f"Date: {issued:%Y-%m-%d}\nCustomer reference: C{rng.randint(100000, 999999)}\n"
+        f"Total amount: EUR {rng.randint(10, 9999)}.{rng.randint(0, 99):02d}\n\n"
+    )
+    result = []
+    for page in range(pages):
+        sentences = []
+        remaining = WORDS_PER_PAGE
+        while remaining > 0:
+            length = min(remaining, rng.randint(6, 16))
+            words = rng.choices(vocabulary, k=length)
+            sentences.append(" ".join(words).capitalize() + ".")
+            remaining -= length
+        body = " ".join(sentences)
+        result.append((header if page == 0 else f"{company} - page {page + 1}\n\n") + body)
+    return result
+
+
+def _wrap(text: str, width: int = LINE_WIDTH_CHARS) -> list[str]:
+    lines: list[str] = []
+    for paragraph in text.split("\n"):
+        line = ""
+        for word in paragraph.split(" "):
+            if line and len(line) + 1 + len(word) > width:
+                lines.append(line)
+                line = word
+            else:
+                line = f"{line} {word}" if line else word
+        lines.append(line)
+    return lines
+
+
+def render_digital_pdf(pages: list[str]) -> bytes:
+    """Render *pages* as a text PDF."""
+    pdf = FPDF(format="A4")
+    # A fixed creation date keeps the bytes (and SHA-256) reproducible.
+    pdf.set_creation_date(CREATION_DATE)
+    pdf.set_font("Helvetica", size=10)
+    pdf.set_auto_page_break(auto=False)
+    for text in pages:
+        pdf.add_page()
+        pdf.set_xy(15, 15)
+        pdf.multi_cell(0, 4.5, text)
+    return bytes(pdf.output())
+
+
+_FONT: Any = None
+
+
+def _font() -> Any:
+    global _FONT
+    if _FONT is None:
+        try:
+            _FONT = ImageFont.load_default(size=12)
+        except TypeError:  # Pillow < 10.1 has no scalable default font
+            _FONT = ImageFont.load_default()
+    return _FONT
+
+
+def render_page_image(text: str, rng: random.Random) -> Image.Image:
+    """Render one page of *text* as a greyscale scan with a slight skew and speckle."""
+    image = Image.new("L", PAGE_SIZE, 255)
+    draw = ImageDraw.Draw(image)
+    y = 60
+    for line in _wrap(text):
+        draw.text((60, y), line, fill=0, font=_font())
+        y += 16
+        if y > PAGE_SIZE[1] - 60:
+            break
+    for _ in range(400):
+        draw.point((rng.randrange(PAGE_SIZE[0]), rng.randrange(PAGE_SIZE[1])), fill=rng.randint(0, 160))
+    return image.rotate(rng.uniform(-0.8, 0.8), fillcolor=255)
+
+
+def _png(image: Image.Image) -> bytes:
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG", dpi=(PAGE_DPI, PAGE_DPI))
+    return buffer.getvalue()
+
+
+def render_scanned_pdf(pages: list[str], rng: random.Random) -> bytes:
+    """Render *pages* as an image-only PDF, one scanned page per text page."""
+    images = [_png(render_page_image(text, rng)) for text in pages]
+    # img2pdf's pikepdf engine writes a random document ID; the internal engine is reproducible.
+    return img2pdf.convert(images, creationdate=CREATION_DATE, moddate=CREATION_DATE, engine=img2pdf.Engine.internal)
+
+
+def render_tiff(pages: list[str], rng: random.Random) -> bytes:
+    """Render *pages* as a bilevel, Group 4 compressed multi-page TIFF."""
+    images = [
+        render_page_image(text, rng).point(lambda value: 255 if value > 128 else 0).convert("1") for text in pages
+    ]
+    buffer = io.BytesIO()
+    images[0].save(
+        buffer,
+        format="TIFF",
+        save_all=True,
+        append_images=images[1:],
+        compression="group4",
+        dpi=(PAGE_DPI, PAGE_DPI),
+    )
+    return buffer.getvalue()
+
+
+def render_email(
+    rng: random.Random,
+    vocabulary: list[str],
+    index: int,
+    max_pages: int,
+) -> tuple[bytes, str, int]:
+    """Return an e-mail with attachments, the text of its PDF attachment and its page count."""
+    pdf_pages = document_text(rng, vocabulary, rng.randint(1, max_pages))
+    scan_pages = document_text(rng, vocabulary, 1)
+    note = " ".join(rng.choices(vocabulary, k=80))
+    scan = _png(render_page_image(scan_pages[0], rng))
+
+    message = EmailMessage()
+    message["From"] = f"{rng.choice(_COMPANIES)} <billing@example.com>"
+    message["To"] = "inbox@example.org"
+    message["Subject"] = f"Documents {index}"
+    message["Date"] = format_datetime(datetime(2024, 1, 1, tzinfo=timezone.utc) + timedelta(hours=index))
+    message["Message-ID"] = f"<benchmark-{index}@example.com>"
+    message.set_content("Please find the requested documents attached.\n")
+    message.add_attachment(
+        render_digital_pdf(pdf_pages),
+        maintype="application",
+        subtype="pdf",
+        filename=f"statement_{index}.pdf",
+    )
+    message.add_attachment(scan, maintype="image", subtype="png", filename=f"scan_{index}.png")
+    message.add_attachment(
+        f"<html><body><h1>Note {index}</h1><p>{note}</p></body></html>",
+        subtype="html",
+        filename=f"note_{index}.html",
+    )
+    message.set_boundary(f"benchmark-boundary-{index}")
+    return message.as_bytes(), "\n".join(pdf_pages), len(pdf_pages) + 2
+
+
+def generate_corpus(
+    output_dir: str | Path,
+    *,
+    scale: int = 10,
+    seed: int = 1,
+    kinds: tuple[str, ...] = KINDS,
+    max_pages: int = 4,
+    queries: int = 20,
+) -> dict[str, Any]:
+    """Write *scale* documents of each kind to *output_dir* and return the manifest.
+
+    Args:
+        output_dir: Directory to write into; created when missing.
+        scale: Number of documents generated per kind.
+        seed: Random seed; the same seed and scale reproduce the same files.
+        kinds: Subset of :data:`KINDS` to generate.
+        max_pages: Upper bound of the per-document page count.
+        queries: Number of search queries to sample from the generated text.
+    """
+    unknown = set(kinds) - set(KINDS)
+    if unknown:
+        raise ValueError(f"Unknown corpus kinds: {sorted(unknown)}")
+    output = Path(output_dir)
+    output.mkdir(parents=True, exist_ok=True)
+    vocabulary = build_vocabulary(seed)
+    # Seeded for a reproducible corpus – not cryptographic, S311 is intentional.
+    rng = random.Random(seed + 1)  # noqa: S311
+
+    documents: list[dict[str, Any]] = []
+    ocr_text: dict[str, str] = {}
+    texts: list[str] = []
+    for kind in kinds:
+        for index in range(scale):
+            page_count = rng.randint(1, max_pages)
+            if kind == "email":
+                data, text, page_count = render_email(rng, vocabulary, index, max_pages)
+                texts.append(text)
+                name = f"email_{index:04d}.eml"
+            else:
+                pages = document_text(rng, vocabulary, page_count)
+                if kind == "digital_pdf":
+                    data, name = render_digital_pdf(pages), f"digital_{index:04d}.pdf"
+                    texts.append("\n".join(pages))
+                elif kind == "scanned_pdf":
+                    data, name = render_scanned_pdf(pages, rng), f"scanned_{index:04d}.pdf"
+                    ocr_text[hashlib.sha256(data).hexdigest()] = "\n".join(pages)
+                    texts.append("\n".join(pages))
+                else:
+                    data, name = render_tiff(pages, rng), f"fax_{index:04d}.tif"
+            (output / name).write_bytes(data)
+            documents.append(
+                {
+                    "path": name,
+                    "kind": kind,
+                    "pages": page_count,
+                    "bytes": len(data),
+                    "sha256": hashlib.sha256(data).hexdigest(),
+                }
+            )
+
+    manifest = {
+        "version": MANIFEST_VERSION,
+        "seed": seed,
+        "scale": scale,
+        "kinds": list(kinds),
+        "documents": documents,
+        "ocr_text": ocr_text,
+        "queries": sample_queries(texts, rng, queries),
+    }
+    (output / MANIFEST_NAME).write_text(json.dumps(manifest, indent=1), encoding="utf-8")
+    return manifest
+
+
+def sample_queries(texts: list[str], rng: random.Random, count: int) -> list[str]:
+    """Return *count* one- and two-word queries taken from *texts* (the text that reaches the indexes)."""
+    if not texts:
+        return []
+    queries = []
+    for _ in range(count):
+        words = [word.strip(".").lower() for word in rng.choice(texts).split() if len(word) > 4]
+        start = rng.randrange(max(1, len(words) - 1))
+        queries.append(" ".join(words[start : start + rng.randint(1, 2)]))
+    return queries
+
+
+def load_corpus(corpus_dir: str | Path) -> dict[str, Any]:
+    """Read the manifest written by :func:`generate_corpus`."""
+    manifest = json.loads((Path(corpus_dir) / MANIFEST_NAME).read_text(encoding="utf-8"))
+    if manifest.get("version") != MANIFEST_VERSION:
+        raise ValueError(f"Unsupported corpus manifest version: {manifest.get('version')!r}")
+    return manifest
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("output", help="Directory to write the corpus to")
+    parser.add_argument("--scale", type=int, default=10, help="Documents per kind (default: 10)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--kinds", nargs="+", choices=KINDS, default=list(KINDS))
+    parser.add_argument("--max-pages", type=int, default=4)
+    args = parser.parse_args(argv)
+
+    manifest = generate_corpus(
+        args.output, scale=args.scale, seed=args.seed, kinds=tuple(args.kinds), max_pages=args.max_pages
+    )
+    total = sum(document["bytes"] for document in manifest["documents"])
+    print(f"Wrote {len(manifest['documents'])} documents ({total / 1e6:.1f} MB) to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
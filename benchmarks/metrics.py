@@ -0,0 +1,128 @@
+"""Per-stage timing, SQL query counting and memory sampling for benchmark runs.
+
+Stages are Celery tasks.  With ``task_always_eager`` a task's ``.delay()``
+runs its child tasks inline, so :class:`StageRecorder` keeps a stack of the
+running tasks and records each task's *self* time: the child tasks' time is
+subtracted from the parent's.  SQL statements are attributed to the innermost
+running task, or to ``(outside tasks)``.
+"""
+
+from __future__ import annotations
+
+import math
+import resource
+import sys
+import threading
+import time
+from collections import defaultdict
+from collections.abc import Iterator
+from contextlib import contextmanager
+from typing import Any
+
+OUTSIDE_TASKS = "(outside tasks)"
+
+
+def percentile(values: list[float], q: float) -> float:
+    """Return the *q*-th percentile (0–100) of *values* with linear interpolation."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * q / 100
+    low, high = math.floor(rank), math.ceil(rank)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def summarize(seconds: list[float]) -> dict[str, float]:
+    """Return count, mean, p50/p95/p99 and max of *seconds*, in milliseconds."""
+    milliseconds = [value * 1000 for value in seconds]
+    return {
+        "count": len(milliseconds),
+        "mean_ms": round(sum(milliseconds) / len(milliseconds), 3) if milliseconds else 0.0,
+        "p50_ms": round(percentile(milliseconds, 50), 3),
+        "p95_ms": round(percentile(milliseconds, 95), 3),
+        "p99_ms": round(percentile(milliseconds, 99), 3),
+        "max_ms": round(max(milliseconds), 3) if milliseconds else 0.0,
+    }
+
+
+def peak_rss_bytes() -> int:
+    """Peak resident set size of this process (``ru_maxrss`` is KiB on Linux, bytes on macOS)."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return int(peak if sys.platform == "darwin" else peak * 1024)
+
+
+class StageRecorder:
+    """Collect per-task self time, failures and SQL statements while connected."""
+
+    def __init__(self) -> None:
+        self.samples: dict[str, list[float]] = defaultdict(list)
+        self.queries: dict[str, int] = defaultdict(int)
+        self.failures: dict[str, int] = defaultdict(int)
+        self._local = threading.local()
+        self._engine: Any = None
+
+    @property
+    def _stack(self) -> list[list[Any]]:
+        if not hasattr(self._local, "stack"):
+            self._local.stack = []
+        return self._local.stack
+
+    def _on_prerun(self, task_id: str | None = None, task: Any = None, **_kwargs: Any) -> None:
+        self._stack.append([task.name.rsplit(".", 1)[-1], time.perf_counter(), 0.0])
+
+    def _on_postrun(self, task_id: str | None = None, task: Any = None, **_kwargs: Any) -> None:
+        if not self._stack:
+            return
+        name, started, children = self._stack.pop()
+        elapsed = time.perf_counter() - started
+        self.samples[name].append(max(0.0, elapsed - children))
+        if self._stack:
+            self._stack[-1][2] += elapsed
+
+    def _on_failure(self, sender: Any = None, **_kwargs: Any) -> None:
+        self.failures[sender.name.rsplit(".", 1)[-1] if sender is not None else "unknown"] += 1
+
+    def _on_query(self, *_args: Any, **_kwargs: Any) -> None:
+        self.queries[self._stack[-1][0] if self._stack else OUTSIDE_TASKS] += 1
+
+    def connect(self, engine: Any) -> None:
+        """Attach to Celery's task signals and *engine*'s statement events."""
+        from celery.signals import task_failure, task_postrun, task_prerun
+        from sqlalchemy import event
+
+        task_prerun.connect(self._on_prerun, weak=False)
+        task_postrun.connect(self._on_postrun, weak=False)
+        task_failure.connect(self._on_failure, weak=False)
+        event.listen(engine, "before_cursor_execute", self._on_query)
+        self._engine = engine
+
+    def disconnect(self) -> None:
+        from celery.signals import task_failure, task_postrun, task_prerun
+        from sqlalchemy import event
+
+        task_prerun.disconnect(self._on_prerun)
+        task_postrun.disconnect(self._on_postrun)
+        task_failure.disconnect(self._on_failure)
+        if self._engine is not None:
+            event.remove(self._engine, "before_cursor_execute", self._on_query)
+            self._engine = None
+
+    @contextmanager
+    def recording(self, engine: Any) -> Iterator[StageRecorder]:
+        self.connect(engine)
+        try:
+            yield self
+        finally:
+            self.disconnect()
+
+    def stages(self) -> dict[str, dict[str, Any]]:
+        """Latency summary, SQL statements and failures per stage."""
+        names = sorted(set(self.samples) | set(self.queries))
+        result = {}
+        for name in names:
+            summary: dict[str, Any] = summarize(self.samples.get(name, []))
+            summary["queries"] = self.queries.get(name, 0)
+            summary["queries_per_call"] = round(summary["queries"] / summary["count"], 2) if summary["count"] else None
+            summary["failures"] = self.failures.get(name, 0)
+            result[name] = summary
+        return result
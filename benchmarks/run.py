@@ -0,0 +1,296 @@
+"""Run the document pipeline end to end over a synthetic corpus and record metrics.
+
+The Celery tasks run eagerly in this process (``task_always_eager``), from
+``process_document``/``convert_to_pdf`` through OCR, metadata extraction,
+PDF embedding, finalisation, Meilisearch indexing, embeddings and Qdrant
+chunk indexing.  Every external service is replaced by
+:mod:`benchmarks.standins`, so a run needs no network, API keys, Redis or
+containers; the database is a fresh SQLite file unless ``--database-url`` is
+given.  Search and vector-search queries are timed after ingestion.
+
+The JSON result contains throughput, per-stage latency percentiles (task self
+time), SQL statements per stage, peak RSS, stand-in call counts and the git
+commit, and can be diffed with :mod:`benchmarks.compare`.
+
+Usage::
+
+    python -m benchmarks.run --scale 10 --output results/$(git rev-parse --short HEAD).json
+    python -m benchmarks.run --corpus /tmp/corpus --llm-latency-ms 800 --ocr-latency-ms 1500
+"""
+
+from __future__ import annotations
+
+import argparse
+import email
+import json
+import logging
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+from benchmarks.corpus import KINDS, build_vocabulary, document_text, generate_corpus, load_corpus, render_digital_pdf
+from benchmarks.metrics import StageRecorder, peak_rss_bytes, summarize
+from benchmarks.standins import DEFAULT_EMBEDDING_DIMENSIONS, StandInServices, ocr_provider_class
+
+RESULT_VERSION = 1
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+
+def git_revision() -> dict[str, Any]:
+    """Commit hash and dirty flag of the checkout being benchmarked."""
+
+    def git(*args: str) -> str:
+        result = subprocess.run(  # noqa: S603
+            ["git", *args],  # noqa: S607
+            cwd=REPO_ROOT,
+            capture_output=True,
+            text=True,
+            check=False,
+        )
+        return result.stdout.strip()
+
+    return {
+        "commit": git("rev-parse", "HEAD") or None,
+        "dirty": bool(git("status", "--porcelain", "--untracked-files=no")),
+    }
+
+
+def configure_environment(workdir: Path, services: StandInServices, database_url: str | None) -> None:
+    """Point the application settings at the stand-ins; must run before ``app`` is imported."""
+    if "app.config" in sys.modules:
+        raise RuntimeError("benchmarks.run must configure the environment before app.config is imported")
+    os.environ.update(
+        {
+            "DATABASE_URL": database_url or f"sqlite:///{workdir / 'benchmark.db'}",
+            "WORKDIR": str(workdir),
+            "AUTH_ENABLED": "false",
+            # Unreachable on purpose: Redis-backed helpers degrade to their fallbacks.
+            "REDIS_URL": "redis://127.0.0.1:1/0",
+            "AI_PROVIDER": "openai",
+            "OPENAI_API_KEY": "benchmark",
+            "OPENAI_BASE_URL": services.openai_url,
+            "GOTENBERG_URL": services.gotenberg_url,
+            "ENABLE_SEARCH": "true",
+            "MEILISEARCH_URL": services.meilisearch_url,
+            "VECTOR_INDEX_ENABLED": "true",
+            "VECTOR_INDEX_URL": services.qdrant_url,
+            "OCR_PROVIDERS": "benchmark",
+        }
+    )
+
+
+def _ingest(path: Path, kind: str) -> None:
+    """Queue one corpus file the way the upload and IMAP paths do."""
+    from app.tasks.convert_to_pdf import convert_to_pdf
+    from app.tasks.imap_tasks import fetch_attachments_and_enqueue
+    from app.tasks.process_document import process_document
+
+    if kind == "email":
+        fetch_attachments_and_enqueue(email.message_from_bytes(path.read_bytes()))
+    elif path.suffix.lower() == ".pdf":
+        process_document.delay(str(path), original_filename=path.name)
+    else:
+        convert_to_pdf.delay(str(path), original_filename=path.name)
+
+
+def _warm_up(incoming: Path, count: int, seed: int) -> None:
+    """Run *count* throw-away digital PDFs through the pipeline to load lazy imports and caches."""
+    # Seeded so warm-up documents never collide with corpus documents – S311 is intentional.
+    rng = random.Random(seed)  # noqa: S311
+    vocabulary = build_vocabulary(seed)
+    for index in range(count):
+        path = incoming / f"warmup_{index}.pdf"
+        path.write_bytes(render_digital_pdf(document_text(rng, vocabulary, 1)))
+        _ingest(path, "digital_pdf")
+
+
+def _timed(function: Any, *args: Any, **kwargs: Any) -> tuple[float, Any]:
+    started = time.perf_counter()
+    result = function(*args, **kwargs)
+    return time.perf_counter() - started, result
+
+
+def run_benchmark(
+    corpus_dir: Path,
+    workdir: Path,
+    services: StandInServices,
+    *,
+    ocr_latency: float = 0.0,
+    warmup: int = 1,
+) -> dict[str, Any]:
+    """Ingest every corpus document, run the search queries and return the metrics."""
+    import app.models  # noqa: F401 - registers every table before create_all
+    from app.celery_app import celery
+    from app.database import SessionLocal, engine, init_db
+    from app.models import FileRecord
+    from app.utils import ocr_provider
+    from app.utils.meilisearch_client import search_documents
+    from app.utils.vector_index import QdrantVectorIndex
+
+    manifest = load_corpus(corpus_dir)
+    init_db()
+    celery.conf.task_always_eager = True
+    celery.conf.task_eager_propagates = False
+    ocr_provider._PROVIDER_MAP["benchmark"] = ocr_provider_class(manifest["ocr_text"], ocr_latency)
+
+    incoming = workdir / "incoming"
+    incoming.mkdir(parents=True, exist_ok=True)
+    _warm_up(incoming, warmup, manifest["seed"] + 1000)
+    services.calls.clear()
+    services.tokens.clear()
+    recorder = StageRecorder()
+    per_kind: dict[str, list[float]] = {kind: [] for kind in manifest["kinds"]}
+    with recorder.recording(engine):
+        started = time.perf_counter()
+        for document in manifest["documents"]:
+            path = incoming / document["path"]
+            shutil.copyfile(corpus_dir / document["path"], path)
+            elapsed, _ = _timed(_ingest, path, document["kind"])
+            per_kind[document["kind"]].append(elapsed)
+        ingest_seconds = time.perf_counter() - started
+        ingest_stages = recorder.stages()
+        ingest_queries = sum(recorder.queries.values())
+
+        search_latency, vector_latency = [], []
+        search_hits = vector_hits = 0
+        index = QdrantVectorIndex()
+        for query in manifest["queries"]:
+            elapsed, result = _timed(search_documents, query)
+            search_latency.append(elapsed)
+            search_hits += bool(result["results"])
+            elapsed, points = _timed(index.search, query, limit=10, include_unowned=True)
+            vector_latency.append(elapsed)
+            vector_hits += bool(points)
+
+    with SessionLocal() as db:
+        stored = db.query(FileRecord).count() - warmup
+        with_text = (
+            db.query(FileRecord).filter(FileRecord.ocr_text.isnot(None), FileRecord.ocr_text != "").count() - warmup
+        )
+
+    documents = len(manifest["documents"])
+    pages = sum(document["pages"] for document in manifest["documents"])
+    corpus_bytes = sum(document["bytes"] for document in manifest["documents"])
+    return {
+        "corpus": {
+            "seed": manifest["seed"],
+            "scale": manifest["scale"],
+            "documents": documents,
+            "pages": pages,
+            "bytes": corpus_bytes,
+            "by_kind": {kind: len(samples) for kind, samples in per_kind.items()},
+        },
+        "ingest": {
+            "wall_seconds": round(ingest_seconds, 3),
+            "documents_per_second": round(documents / ingest_seconds, 3) if ingest_seconds else None,
+            "pages_per_second": round(pages / ingest_seconds, 3) if ingest_seconds else None,
+            "megabytes_per_second": round(corpus_bytes / 1e6 / ingest_seconds, 3) if ingest_seconds else None,
+            "document_latency": {kind: summarize(samples) for kind, samples in per_kind.items()},
+            "file_records": stored,
+            "file_records_with_text": with_text,
+            "queries": ingest_queries,
+            "queries_per_document": round(ingest_queries / documents, 2) if documents else None,
+            "task_failures": sum(recorder.failures.values()),
+        },
+        "stages": ingest_stages,
+        "search": {
+            "queries": len(manifest["queries"]),
+            "full_text": summarize(search_latency) | {"queries_with_hits": search_hits},
+            "vector": summarize(vector_latency) | {"queries_with_hits": vector_hits},
+        },
+        "peak_rss_mib": round(peak_rss_bytes() / 2**20, 1),
+        "standin_calls": dict(sorted(services.calls.items())),
+        "standin_tokens": dict(services.tokens),
+    }
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", type=Path, help="Existing corpus directory (default: generate one)")
+    parser.add_argument("--scale", type=int, default=5, help="Documents per kind when generating (default: 5)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--kinds", nargs="+", choices=KINDS, default=list(KINDS))
+    parser.add_argument("--max-pages", type=int, default=4)
+    parser.add_argument("--queries", type=int, default=20, help="Search queries sampled when generating")
+    parser.add_argument("--output", type=Path, help="Write the JSON result here instead of stdout")
+    parser.add_argument("--database-url", help="Benchmark against this (empty) database instead of SQLite")
+    parser.add_argument("--workdir", type=Path, help="Pipeline workdir (default: a temporary directory)")
+    parser.add_argument("--llm-latency-ms", type=float, default=0.0)
+    parser.add_argument("--embedding-latency-ms", type=float, default=0.0)
+    parser.add_argument("--ocr-latency-ms", type=float, default=0.0, help="Per page")
+    parser.add_argument("--search-latency-ms", type=float, default=0.0, help="Meilisearch and Qdrant")
+    parser.add_argument("--gotenberg-latency-ms", type=float, default=0.0)
+    parser.add_argument("--embedding-dimensions", type=int, default=DEFAULT_EMBEDDING_DIMENSIONS)
+    parser.add_argument("--warmup", type=int, default=1, help="Unmeasured documents run first (default: 1)")
+    parser.add_argument("--log-level", default="ERROR")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=args.log_level.upper())
+    workdir = args.workdir or Path(tempfile.mkdtemp(prefix="docuelevate-benchmark-"))
+    workdir.mkdir(parents=True, exist_ok=True)
+    corpus_dir = args.corpus
+    if corpus_dir is None:
+        corpus_dir = workdir / "corpus"
+        generate_corpus(
+            corpus_dir,
+            scale=args.scale,
+            seed=args.seed,
+            kinds=tuple(args.kinds),
+            max_pages=args.max_pages,
+            queries=args.queries,
+        )
+
+    latency = {
+        "llm": args.llm_latency_ms / 1000,
+        "embedding": args.embedding_latency_ms / 1000,
+        "qdrant": args.search_latency_ms / 1000,
+        "meilisearch": args.search_latency_ms / 1000,
+        "gotenberg": args.gotenberg_latency_ms / 1000,
+    }
+    with StandInServices(latency, embedding_dimensions=args.embedding_dimensions) as services:
+        configure_environment(workdir, services, args.database_url)
+        metrics = run_benchmark(
+            corpus_dir, workdir, services, ocr_latency=args.ocr_latency_ms / 1000, warmup=args.warmup
+        )
+
+    result = {
+        "version": RESULT_VERSION,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "git": git_revision(),
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "database": os.environ["DATABASE_URL"].split(":", 1)[0],
+        },
+        "settings": {"latency_ms": {name: seconds * 1000 for name, seconds in latency.items()}}
+        | {
+            "ocr_latency_ms_per_page": args.ocr_latency_ms,
+            "embedding_dimensions": args.embedding_dimensions,
+            "warmup": args.warmup,
+        },
+        **metrics,
+    }
+    text = json.dumps(result, indent=2)
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(text + "\n", encoding="utf-8")
+        print(
+            f"{result['corpus']['documents']} documents in {result['ingest']['wall_seconds']}s "
+            f"({result['ingest']['documents_per_second']} docs/s), peak RSS {result['peak_rss_mib']} MiB "
+            f"-> {args.output}"
+        )
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
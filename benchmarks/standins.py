@@ -0,0 +1,620 @@
+"""Local stand-ins for the external services the document pipeline calls.
+
+:class:`StandInServices` runs one threaded HTTP server on ``127.0.0.1`` that
+answers the subset of each service's API DocuElevate uses, so the real client
+code (``openai``, ``meilisearch``, ``requests``) is exercised end to end:
+
+* ``/openai/v1`` – chat completions and embeddings.  Chat answers are one JSON
+  object that satisfies the metadata, text-quality and OCR-comparison prompts;
+  embeddings are deterministic hashed bag-of-words vectors, so similar texts
+  get similar vectors.
+* ``/qdrant`` – collections, payload indexes, point upsert/delete/payload and
+  ``points/query`` with Qdrant's ``must``/``should``/``must_not`` filters.
+* ``/meili`` – indexes, settings, documents, tasks and keyword ``search``.
+* ``/gotenberg`` – the Chromium and LibreOffice convert routes, answering with
+  a text PDF of the uploaded content.
+
+Every route sleeps for the configured per-service latency before answering,
+which lets a run model a slow LLM or OCR service without touching the
+network.  :func:`ocr_provider_class` builds the matching OCR provider.
+
+Nothing in this module imports ``app`` at import time: the benchmark runner
+starts the services first and then points the application settings at them.
+"""
+
+from __future__ import annotations
+
+import base64
+import hashlib
+import json
+import math
+import re
+import struct
+import threading
+import time
+import zlib
+from collections import Counter
+from datetime import datetime, timezone
+from email.parser import BytesParser
+from email.policy import HTTP
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+from urllib.parse import unquote, urlsplit
+
+from fpdf import FPDF
+
+DEFAULT_EMBEDDING_DIMENSIONS = 256
+SERVICES = ("llm", "embedding", "qdrant", "meilisearch", "gotenberg", "ocr")
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+_TAG = re.compile(r"<[^>]+>")
+_REFERENCE = re.compile(r"No\. ([0-9-]+)")
+_AMOUNT = re.compile(r"EUR ([0-9]+\.[0-9]{2})")
+_DATE = re.compile(r"Date: ([0-9]{4}-[0-9]{2}-[0-9]{2})")
+_DOCUMENT_TYPE = re.compile(r"\b(Invoice|Contract|Statement|Letter|Receipt|Notice)\b")
+
+
+def tokenize(text: str) -> list[str]:
+    """Lower-case alphanumeric tokens of *text*."""
+    return _TOKEN.findall(text.lower())
+
+
+def embed(text: str, dimensions: int = DEFAULT_EMBEDDING_DIMENSIONS) -> list[float]:
+    """Return a unit-length hashed bag-of-words vector for *text*."""
+    vector = [0.0] * dimensions
+    for token in tokenize(text):
+        digest = zlib.crc32(token.encode("utf-8"))
+        vector[digest % dimensions] += 1.0 if digest & 0x80000000 else -1.0
+    norm = math.sqrt(sum(value * value for value in vector)) or 1.0
+    return [value / norm for value in vector]
+
+
+def metadata_answer(prompt: str) -> dict[str, Any]:
+    """Return a chat answer accepted by every JSON prompt of the pipeline."""
+    document_type = _DOCUMENT_TYPE.search(prompt)
+    reference = _REFERENCE.search(prompt)
+    amount = _AMOUNT.search(prompt)
+    date = _DATE.search(prompt)
+    title = document_type.group(1) if document_type else "Document"
+    return {
+        # extract_metadata_with_gpt
+        "filename": f"{date.group(1) if date else '2024-01-01'}_{title}",
+        "empfaenger": "Unknown",
+        "absender": "Benchmark Sender",
+        "correspondent": "Benchmark",
+        "kommunikationsart": "Rechnung" if title == "Invoice" else "Sonstiges",
+        "kommunikationskategorie": "Finanz_und_Vertragsdokumente",
+        "document_type": title,
+        "tags": ["benchmark", title.lower()],
+        "language": "en",
+        "title": f"{title} {reference.group(1) if reference else ''}".strip(),
+        "confidence_score": 90,
+        "reference_number": reference.group(1) if reference else "",
+        "monetary_amounts": [amount.group(1)] if amount else [],
+        # check_text_quality
+        "quality_score": 95,
+        "is_good_quality": True,
+        "feedback": "Readable text.",
+        "issues": [],
+        # compare_text_quality
+        "original_score": 90,
+        "ocr_score": 90,
+        "preferred": "original",
+        "explanation": "Both extractions are equivalent.",
+    }
+
+
+def text_pdf(text: str) -> bytes:
+    """Render *text* into a small text PDF."""
+    pdf = FPDF(format="A4")
+    pdf.set_font("Helvetica", size=10)
+    pdf.add_page()
+    pdf.multi_cell(0, 4.5, text.encode("latin-1", "replace").decode("latin-1") or " ")
+    return bytes(pdf.output())
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
+
+
+# ---------------------------------------------------------------------------
+# Qdrant filter evaluation
+# ---------------------------------------------------------------------------
+
+
+def _condition_matches(payload: dict[str, Any], condition: dict[str, Any]) -> bool:
+    if any(key in condition for key in ("must", "should", "must_not")):
+        return filter_matches(payload, condition)
+    if "is_null" in condition:
+        return payload.get(condition["is_null"]["key"]) is None
+    value = payload.get(condition["key"])
+    match = condition.get("match", {})
+    if "value" in match:
+        return value == match["value"] and type(value) is type(match["value"])
+    if "any" in match:
+        return value in match["any"]
+    return False
+
+
+def filter_matches(payload: dict[str, Any], query_filter: dict[str, Any] | None) -> bool:
+    """Evaluate a Qdrant filter (``must``/``should``/``must_not``) against *payload*."""
+    if not query_filter:
+        return True
+    if not all(_condition_matches(payload, c) for c in query_filter.get("must") or []):
+        return False
+    should = query_filter.get("should") or []
+    if should and not any(_condition_matches(payload, c) for c in should):
+        return False
+    return not any(_condition_matches(payload, c) for c in query_filter.get("must_not") or [])
+
+
+# ---------------------------------------------------------------------------
+# Meilisearch filter evaluation
+# ---------------------------------------------------------------------------
+
+_MEILI_CONDITION = re.compile(r"^\s*(\w+)\s*(IN|>=|<=|!=|=|>|<)\s*(.+?)\s*$")
+
+
+def _meili_value(raw: str) -> Any:
+    raw = raw.strip()
+    if raw.startswith('"') and raw.endswith('"'):
+        return raw[1:-1].replace('\\"', '"')
+    try:
+        return float(raw)
+    except ValueError:
+        return raw
+
+
+def meili_filter_matches(document: dict[str, Any], expression: str | None) -> bool:
+    """Evaluate the ``AND``-joined filter expressions built by ``search_documents``."""
+    if not expression:
+        return True
+    for clause in expression.split(" AND "):
+        match = _MEILI_CONDITION.match(clause)
+        if not match:
+            raise ValueError(f"Unsupported filter clause: {clause!r}")
+        field, operator, raw = match.groups()
+        value = document.get(field)
+        if operator == "IN":
+            options = [_meili_value(item) for item in raw.strip("[]").split(",") if item.strip()]
+            if value not in options and not (isinstance(value, list) and set(value) & set(options)):
+                return False
+            continue
+        expected = _meili_value(raw)
+        if isinstance(value, list) and operator == "=":
+            if expected not in value:
+                return False
+            continue
+        if value is None:
+            return False
+        ok = {
+            "=": value == expected,
+            "!=": value != expected,
+            ">=": value >= expected,
+            "<=": value <= expected,
+            ">": value > expected,
+            "<": value < expected,
+        }[operator]
+        if not ok:
+            return False
+    return True
+
+
+# ---------------------------------------------------------------------------
+# HTTP server
+# ---------------------------------------------------------------------------
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: _Server
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format: str, *args: Any) -> None:  # noqa: A002 - BaseHTTPRequestHandler signature
+        pass
+
+    def _body(self) -> bytes:
+        length = int(self.headers.get("Content-Length") or 0)
+        return self.rfile.read(length) if length else b""
+
+    def _dispatch(self) -> None:
+        url = urlsplit(self.path)
+        parts = [unquote(part) for part in url.path.strip("/").split("/")]
+        body = self._body()
+        service, route = parts[0], parts[1:]
+        services: StandInServices = self.server.services
+        handler = {
+            "openai": services.handle_openai,
+            "qdrant": services.handle_qdrant,
+            "meili": services.handle_meilisearch,
+            "gotenberg": services.handle_gotenberg,
+        }.get(service)
+        if handler is None:
+            self._send(404, {"error": f"unknown service {service!r}"})
+            return
+        try:
+            status, payload = handler(self.command, route, body, self.headers)
+        except Exception as exc:  # surfaced to the client like a real 500
+            status, payload = 500, {"error": f"{type(exc).__name__}: {exc}"}
+        self._send(status, payload)
+
+    def _send(self, status: int, payload: Any) -> None:
+        if isinstance(payload, bytes):
+            data, content_type = payload, "application/pdf"
+        else:
+            data, content_type = json.dumps(payload).encode("utf-8"), "application/json"
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    do_GET = do_POST = do_PUT = do_PATCH = do_DELETE = _dispatch
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    services: StandInServices
+
+
+class StandInServices:
+    """In-memory LLM, embedding, Qdrant, Meilisearch and Gotenberg services.
+
+    Use as a context manager; the ``*_url`` attributes are valid once started.
+
+    Args:
+        latency: Seconds to sleep per request, keyed by a name in :data:`SERVICES`.
+        embedding_dimensions: Size of the vectors returned by the embeddings route.
+    """
+
+    def __init__(
+        self,
+        latency: dict[str, float] | None = None,
+        embedding_dimensions: int = DEFAULT_EMBEDDING_DIMENSIONS,
+    ) -> None:
+        self.latency = {service: 0.0 for service in SERVICES} | (latency or {})
+        self.embedding_dimensions = embedding_dimensions
+        self.calls: Counter[str] = Counter()
+        self.tokens: Counter[str] = Counter()
+        self._lock = threading.Lock()
+        self._task_uid = 0
+        self._collections: dict[str, dict[str, Any]] = {}
+        self._indexes: dict[str, dict[str, Any]] = {}
+        self._tasks: dict[int, dict[str, Any]] = {}
+        self._server: _Server | None = None
+        self._thread: threading.Thread | None = None
+
+    # -- lifecycle ---------------------------------------------------------
+
+    def start(self) -> StandInServices:
+        self._server = _Server(("127.0.0.1", 0), _Handler)
+        self._server.services = self
+        self._thread = threading.Thread(target=self._server.serve_forever, name="benchmark-standins", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self) -> StandInServices:
+        return self.start()
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.stop()
+
+    @property
+    def url(self) -> str:
+        if self._server is None:
+            raise RuntimeError("Stand-in services are not running")
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def openai_url(self) -> str:
+        return f"{self.url}/openai/v1"
+
+    @property
+    def qdrant_url(self) -> str:
+        return f"{self.url}/qdrant"
+
+    @property
+    def meilisearch_url(self) -> str:
+        return f"{self.url}/meili"
+
+    @property
+    def gotenberg_url(self) -> str:
+        return f"{self.url}/gotenberg"
+
+    def _hit(self, service: str, route: str) -> None:
+        with self._lock:
+            self.calls[f"{service} {route}"] += 1
+        if self.latency.get(service):
+            time.sleep(self.latency[service])
+
+    # -- OpenAI ------------------------------------------------------------
+
+    def handle_openai(self, method: str, route: list[str], body: bytes, headers: Any) -> tuple[int, Any]:
+        request = json.loads(body or b"{}")
+        if method == "POST" and route[-2:] == ["chat", "completions"]:
+            self._hit("llm", "chat.completions")
+            prompt = "\n".join(str(message.get("content", "")) for message in request.get("messages", []))
+            content = json.dumps(metadata_answer(prompt))
+            prompt_tokens, completion_tokens = len(prompt) // 4, len(content) // 4
+            with self._lock:
+                self.tokens["llm_prompt"] += prompt_tokens
+                self.tokens["llm_completion"] += completion_tokens
+            return 200, {
+                "id": f"chatcmpl-{hashlib.sha1(prompt.encode(), usedforsecurity=False).hexdigest()[:12]}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": request.get("model", "benchmark"),
+                "choices": [
+                    {"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}
+                ],
+                "usage": {
+                    "prompt_tokens": prompt_tokens,
+                    "completion_tokens": completion_tokens,
+                    "total_tokens": prompt_tokens + completion_tokens,
+                },
+            }
+        if method == "POST" and route[-1:] == ["embeddings"]:
+            self._hit("embedding", "embeddings")
+            inputs = request.get("input", [])
+            inputs = [inputs] if isinstance(inputs, str) else inputs
+            as_base64 = request.get("encoding_format") == "base64"
+            data = []
+            for index, text in enumerate(inputs):
+                vector = embed(str(text), self.embedding_dimensions)
+                if as_base64:
+                    encoded: Any = base64.b64encode(struct.pack(f"<{len(vector)}f", *vector)).decode("ascii")
+                else:
+                    encoded = vector
+                data.append({"object": "embedding", "index": index, "embedding": encoded})
+            tokens = sum(len(str(text)) // 4 for text in inputs)
+            with self._lock:
+                self.tokens["embedding"] += tokens
+            return 200, {
+                "object": "list",
+                "data": data,
+                "model": request.get("model", "benchmark"),
+                "usage": {"prompt_tokens": tokens, "total_tokens": tokens},
+            }
+        return 404, {"error": {"message": f"Unsupported route {method} {'/'.join(route)}"}}
+
+    # -- Qdrant ------------------------------------------------------------
+
+    def handle_qdrant(self, method: str, route: list[str], body: bytes, headers: Any) -> tuple[int, Any]:
+        request = json.loads(body or b"{}")
+        if len(route) < 2 or route[0] != "collections":
+            return 404, {"status": {"error": "Not found"}}
+        name, action = route[1], "/".join(route[2:])
+        self._hit("qdrant", f"{method} {action or 'collection'}")
+        with self._lock:
+            collection = self._collections.get(name)
+            if not action:
+                if method == "PUT":
+                    self._collections[name] = {"vectors": request.get("vectors", {}), "points": {}}
+                    return 200, {"result": True, "status": "ok"}
+                if collection is None:
+                    return 404, {"status": {"error": f"Collection `{name}` doesn't exist!"}}
+                return 200, {
+                    "result": {
+                        "status": "green",
+                        "points_count": len(collection["points"]),
+                        "indexed_vectors_count": len(collection["points"]),
+                        "config": {"params": {"vectors": collection["vectors"]}},
+                    },
+                    "status": "ok",
+                }
+            if collection is None:
+                return 404, {"status": {"error": f"Collection `{name}` doesn't exist!"}}
+            points = collection["points"]
+            if action == "index":
+                return 200, {"result": {"status": "completed"}, "status": "ok"}
+            if action == "points" and method == "PUT":
+                for point in request.get("points", []):
+                    points[str(point["id"])] = {"vector": point["vector"], "payload": point.get("payload") or {}}
+                return 200, {"result": {"status": "completed"}, "status": "ok"}
+            if action == "points/delete":
+                for point_id in [
+                    pid for pid, point in points.items() if filter_matches(point["payload"], request.get("filter"))
+                ]:
+                    del points[point_id]
+                return 200, {"result": {"status": "completed"}, "status": "ok"}
+            if action == "points/payload":
+                for point in points.values():
+                    if filter_matches(point["payload"], request.get("filter")):
+                        point["payload"].update(request.get("payload") or {})
+                return 200, {"result": {"status": "completed"}, "status": "ok"}
+            if action in ("points/query", "points/search"):
+                query = request.get("query") if action == "points/query" else request.get("vector")
+                hits = self._qdrant_search(points, query, request)
+                return 200, {"result": {"points": hits} if action == "points/query" else hits, "status": "ok"}
+        return 404, {"status": {"error": f"Unsupported route {method} {action}"}}
+
+    @staticmethod
+    def _qdrant_search(points: dict[str, Any], query: list[float], request: dict[str, Any]) -> list[dict[str, Any]]:
+        threshold = request.get("score_threshold")
+        scored = []
+        for point_id, point in points.items():
+            if not filter_matches(point["payload"], request.get("filter")):
+                continue
+            score = sum(a * b for a, b in zip(query, point["vector"], strict=False))
+            if threshold is None or score >= threshold:
+                scored.append((score, point_id, point))
+        scored.sort(key=lambda item: item[0], reverse=True)
+        return [
+            {
+                "id": point_id,
+                "version": 0,
+                "score": score,
+                "payload": point["payload"] if request.get("with_payload") else None,
+            }
+            for score, point_id, point in scored[: int(request.get("limit", 10))]
+        ]
+
+    # -- Meilisearch -------------------------------------------------------
+
+    def _meili_task(self, index_uid: str | None, task_type: str) -> tuple[int, dict[str, Any]]:
+        self._task_uid += 1
+        now = _now()
+        self._tasks[self._task_uid] = {
+            "uid": self._task_uid,
+            "indexUid": index_uid,
+            "status": "succeeded",
+            "type": task_type,
+            "details": {},
+            "error": None,
+            "duration": "PT0S",
+            "enqueuedAt": now,
+            "startedAt": now,
+            "finishedAt": now,
+        }
+        return 202, {
+            "taskUid": self._task_uid,
+            "indexUid": index_uid,
+            "status": "enqueued",
+            "type": task_type,
+            "enqueuedAt": now,
+        }
+
+    def handle_meilisearch(self, method: str, route: list[str], body: bytes, headers: Any) -> tuple[int, Any]:
+        request = json.loads(body or b"{}") if body else {}
+        action = "/".join(route[2:]) if len(route) > 2 else ""
+        self._hit("meilisearch", f"{method} {route[0] if route else ''}{'/' + action.split('/')[0] if action else ''}")
+        with self._lock:
+            if route[:1] == ["tasks"] and len(route) == 2:
+                task = self._tasks.get(int(route[1]))
+                return (200, task) if task else (404, {"message": "Task not found", "code": "task_not_found"})
+            if route[:1] != ["indexes"]:
+                return 404, {"message": "Not found", "code": "not_found"}
+            if len(route) == 1 and method == "POST":
+                uid = request["uid"]
+                now = _now()
+                self._indexes.setdefault(
+                    uid,
+                    {
+                        "uid": uid,
+                        "primaryKey": request.get("primaryKey"),
+                        "createdAt": now,
+                        "updatedAt": now,
+                        "documents": {},
+                    },
+                )
+                return self._meili_task(uid, "indexCreation")
+            uid = route[1]
+            index = self._indexes.get(uid)
+            if index is None:
+                return 404, {
+                    "message": f"Index `{uid}` not found.",
+                    "code": "index_not_found",
+                    "type": "invalid_request",
+                    "link": "https://docs.meilisearch.com/errors#index_not_found",
+                }
+            if not action and method == "GET":
+                return 200, {key: value for key, value in index.items() if key != "documents"}
+            if action == "settings":
+                return self._meili_task(uid, "settingsUpdate")
+            if action == "documents" and method in ("POST", "PUT"):
+                documents = request if isinstance(request, list) else [request]
+                key = index["primaryKey"] or "id"
+                for document in documents:
+                    index["documents"][str(document[key])] = document
+                return self._meili_task(uid, "documentAdditionOrUpdate")
+            if action.startswith("documents/") and method == "DELETE":
+                index["documents"].pop(route[-1], None)
+                return self._meili_task(uid, "documentDeletion")
+            if action == "search":
+                return 200, self._meili_search(index, request)
+        return 404, {"message": f"Unsupported route {method} {'/'.join(route)}", "code": "not_found"}
+
+    @staticmethod
+    def _meili_search(index: dict[str, Any], request: dict[str, Any]) -> dict[str, Any]:
+        started = time.perf_counter()
+        terms = tokenize(request.get("q") or "")
+        require_all = request.get("matchingStrategy") == "all"
+        hits = []
+        for document in index["documents"].values():
+            if not meili_filter_matches(document, request.get("filter")):
+                continue
+            searchable = " ".join(
+                str(document.get(field) or "") for field in ("document_title", "original_filename", "ocr_text", "tags")
+            )
+            tokens = set(tokenize(searchable))
+            matched = sum(term in tokens for term in terms)
+            if terms and (matched == 0 or (require_all and matched < len(terms))):
+                continue
+            score = matched / len(terms) if terms else 1.0
+            hits.append((score, document))
+        hits.sort(key=lambda item: item[0], reverse=True)
+        offset, limit = int(request.get("offset", 0)), int(request.get("limit", 20))
+        page = [
+            {**document, "_rankingScore": score, "_rankingScoreDetails": {"words": {"score": score}}}
+            for score, document in hits[offset : offset + limit]
+        ]
+        return {
+            "hits": page,
+            "query": request.get("q") or "",
+            "offset": offset,
+            "limit": limit,
+            "estimatedTotalHits": len(hits),
+            "processingTimeMs": int((time.perf_counter() - started) * 1000),
+        }
+
+    # -- Gotenberg ---------------------------------------------------------
+
+    def handle_gotenberg(self, method: str, route: list[str], body: bytes, headers: Any) -> tuple[int, Any]:
+        if route == ["health"]:
+            return 200, {"status": "up"}
+        if method != "POST" or route[:1] != ["forms"]:
+            return 404, {"error": "not found"}
+        self._hit("gotenberg", "/".join(route[1:]))
+        message = BytesParser(policy=HTTP).parsebytes(
+            f"Content-Type: {headers.get('Content-Type')}\r\n\r\n".encode("latin-1") + body
+        )
+        texts = []
+        for part in message.iter_parts():
+            if part.get_filename():
+                content = part.get_payload(decode=True) or b""
+                texts.append(_TAG.sub(" ", content.decode("utf-8", "replace")))
+        return 200, text_pdf("\n".join(texts))
+
+
+def ocr_provider_class(ocr_text: dict[str, str], latency: float = 0.0) -> type:
+    """Return an OCR provider returning the corpus ground truth for known files.
+
+    Files are matched by SHA-256.  Files the corpus did not produce directly
+    (e.g. TIFFs after ``img2pdf`` conversion) receive deterministic text
+    derived from their hash, one paragraph per page, so the downstream stages
+    still see page-proportional input.  *latency* is slept per page.
+    """
+    from pypdf import PdfReader
+
+    from app.utils.ocr_provider import OCRProvider, OCRResult
+
+    vocabulary = sorted({token for text in ocr_text.values() for token in tokenize(text)}) or ["benchmark"]
+
+    class StandInOCRProvider(OCRProvider):
+        name = "benchmark"
+
+        def __init__(self, language: str | None = None) -> None:
+            self.language = language
+
+        def process(self, file_path: str) -> OCRResult:
+            with open(file_path, "rb") as handle:
+                digest = hashlib.sha256(handle.read()).hexdigest()
+            pages = len(PdfReader(file_path).pages)
+            if latency:
+                time.sleep(latency * pages)
+            text = ocr_text.get(digest)
+            if text is None:
+                seed = int(digest[:8], 16)
+                text = "\n\n".join(
+                    " ".join(vocabulary[(seed + page * 7919 + word * 104729) % len(vocabulary)] for word in range(200))
+                    for page in range(pages)
+                )
+            return OCRResult(provider=self.name, text=text, metadata={"pages": pages})
+
+    return StandInOCRProvider
@@ -0,0 +1,35 @@
+"""Store Dropbox-compatible content hashes for ingested files.
+
+Revision ID: 064_add_file_content_hash
+Revises: 063_add_backup_error_detail
+"""
+
+from typing import Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "064_add_file_content_hash"
+down_revision: Union[str, None] = "063_add_backup_error_detail"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    columns = {column["name"] for column in inspector.get_columns("files")}
+    indexes = {index["name"] for index in inspector.get_indexes("files")}
+    if "content_hash" not in columns:
+        op.add_column("files", sa.Column("content_hash", sa.String(length=64), nullable=True))
+    if "ix_files_content_hash" not in indexes:
+        op.create_index("ix_files_content_hash", "files", ["content_hash"])
+
+
+def downgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    indexes = {index["name"] for index in inspector.get_indexes("files")}
+    columns = {column["name"] for column in inspector.get_columns("files")}
+    if "ix_files_content_hash" in indexes:
+        op.drop_index("ix_files_content_hash", table_name="files")
+    if "content_hash" in columns:
+        op.drop_column("files", "content_hash")
@@ -0,0 +1,40 @@
+"""Track incremental IMAP UID sync positions.
+
+Revision ID: 065_add_imap_sync_states
+Revises: 064_add_file_content_hash
+"""
+
+from typing import Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "065_add_imap_sync_states"
+down_revision: Union[str, None] = "064_add_file_content_hash"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if "imap_sync_states" in inspector.get_table_names():
+        return
+    op.create_table(
+        "imap_sync_states",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("mailbox_key", sa.String(length=255), nullable=False),
+        sa.Column("folder", sa.String(length=255), nullable=False),
+        sa.Column("uid_validity", sa.BigInteger(), nullable=False),
+        sa.Column("last_seen_uid", sa.BigInteger(), nullable=False, server_default="0"),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.UniqueConstraint("mailbox_key", "folder", name="uq_imap_sync_state_mailbox_folder"),
+    )
+    op.create_index("ix_imap_sync_states_mailbox_key", "imap_sync_states", ["mailbox_key"])
+
+
+def downgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if "imap_sync_states" not in inspector.get_table_names():
+        return
+    op.drop_index("ix_imap_sync_states_mailbox_key", table_name="imap_sync_states")
+    op.drop_table("imap_sync_states")
@@ -0,0 +1,38 @@
+"""Add per-webhook batching and delivery limit options.
+
+Revision ID: 066_add_webhook_delivery_options
+Revises: 065_add_imap_sync_states
+"""
+
+from typing import Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "066_add_webhook_delivery_options"
+down_revision: Union[str, None] = "065_add_imap_sync_states"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    columns = {column["name"] for column in inspector.get_columns("webhook_configs")}
+    if "batch_delivery" not in columns:
+        op.add_column(
+            "webhook_configs",
+            sa.Column("batch_delivery", sa.Boolean(), nullable=False, server_default=sa.false()),
+        )
+    if "max_concurrency" not in columns:
+        op.add_column("webhook_configs", sa.Column("max_concurrency", sa.Integer(), nullable=True))
+    if "rate_limit_per_minute" not in columns:
+        op.add_column("webhook_configs", sa.Column("rate_limit_per_minute", sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    columns = {column["name"] for column in inspector.get_columns("webhook_configs")}
+    with op.batch_alter_table("webhook_configs") as batch_op:
+        for name in ("rate_limit_per_minute", "max_concurrency", "batch_delivery"):
+            if name in columns:
+                batch_op.drop_column(name)
@@ -0,0 +1,103 @@
+"""Add materialised per-owner usage counters for quota checks.
+
+Creates ``usage_counters`` and backfills lifetime, month and day buckets
+(last 13 calendar months) from existing non-duplicate files.
+
+Revision ID: 067_add_usage_counters
+Revises: 066_add_webhook_delivery_options
+"""
+
+from collections import Counter
+from datetime import date, datetime, timezone
+from typing import Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "067_add_usage_counters"
+down_revision: Union[str, None] = "066_add_webhook_delivery_options"
+branch_labels = None
+depends_on = None
+
+_RETENTION_MONTHS = 13
+
+_DAILY_COUNTS = (
+    "SELECT owner_id, DATE(created_at), COUNT(id) FROM files "
+    "WHERE owner_id IS NOT NULL AND is_duplicate = :false AND created_at >= :start "
+    "GROUP BY owner_id, DATE(created_at)"
+)
+_DAILY_COUNTS_POSTGRESQL = (
+    "SELECT owner_id, DATE(timezone('UTC', created_at)), COUNT(id) FROM files "
+    "WHERE owner_id IS NOT NULL AND is_duplicate = :false AND created_at >= :start "
+    "GROUP BY owner_id, DATE(timezone('UTC', created_at))"
+)
+
+
+def _window_start() -> date:
+    now = datetime.now(timezone.utc)
+    months = now.year * 12 + now.month - 1 - (_RETENTION_MONTHS - 1)
+    return date(months // 12, months % 12 + 1, 1)
+
+
+def _backfill(bind: sa.engine.Connection) -> None:
+    # Buckets are UTC days; PostgreSQL's DATE(timestamptz) would use the session time zone.
+    daily = _DAILY_COUNTS_POSTGRESQL if bind.dialect.name == "postgresql" else _DAILY_COUNTS
+    counters: Counter[tuple[str, str, str]] = Counter()
+    for owner_id, total in bind.execute(
+        sa.text(
+            "SELECT owner_id, COUNT(id) FROM files "
+            "WHERE owner_id IS NOT NULL AND is_duplicate = :false GROUP BY owner_id"
+        ),
+        {"false": False},
+    ):
+        counters[(owner_id, "lifetime", "")] = total
+    for owner_id, day, total in bind.execute(
+        sa.text(daily),
+        {"false": False, "start": datetime.combine(_window_start(), datetime.min.time(), tzinfo=timezone.utc)},
+    ):
+        if day is None:
+            continue
+        key = str(day)[:10]
+        counters[(owner_id, "day", key)] += total
+        counters[(owner_id, "month", key[:7])] += total
+    if not counters:
+        return
+    table = sa.table(
+        "usage_counters",
+        sa.column("owner_id", sa.String),
+        sa.column("period", sa.String),
+        sa.column("bucket", sa.String),
+        sa.column("count", sa.Integer),
+    )
+    op.bulk_insert(
+        table,
+        [
+            {"owner_id": owner_id, "period": period, "bucket": bucket, "count": count}
+            for (owner_id, period, bucket), count in counters.items()
+        ],
+    )
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    if "usage_counters" in inspector.get_table_names():
+        return
+    op.create_table(
+        "usage_counters",
+        sa.Column("owner_id", sa.String(), nullable=False),
+        sa.Column("period", sa.String(length=16), nullable=False),
+        sa.Column("bucket", sa.String(length=10), nullable=False, server_default=""),
+        sa.Column("count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.PrimaryKeyConstraint("owner_id", "period", "bucket"),
+    )
+    if "files" in inspector.get_table_names():
+        _backfill(bind)
+
+
+def downgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if "usage_counters" not in inspector.get_table_names():
+        return
+    op.drop_table("usage_counters")
@@ -0,0 +1,51 @@
+"""Add the content-addressed LLM response cache table.
+
+Revision ID: 068_add_llm_response_cache
+Revises: 067_add_usage_counters
+"""
+
+from typing import Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "068_add_llm_response_cache"
+down_revision: Union[str, None] = "067_add_usage_counters"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if "llm_response_cache" in inspector.get_table_names():
+        return
+    op.create_table(
+        "llm_response_cache",
+        sa.Column("cache_key", sa.String(length=64), nullable=False),
+        sa.Column("file_id", sa.Integer(), nullable=True),
+        sa.Column("stage", sa.String(length=64), nullable=False),
+        sa.Column("model", sa.String(length=255), nullable=False),
+        sa.Column("response", sa.Text(), nullable=False),
+        sa.Column("prompt_tokens", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("completion_tokens", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("size_bytes", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("hit_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("last_used_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.PrimaryKeyConstraint("cache_key"),
+    )
+    op.create_index("ix_llm_response_cache_file_id", "llm_response_cache", ["file_id"])
+    op.create_index("ix_llm_response_cache_stage", "llm_response_cache", ["stage"])
+    op.create_index("ix_llm_response_cache_created_at", "llm_response_cache", ["created_at"])
+    op.create_index("ix_llm_response_cache_last_used_at", "llm_response_cache", ["last_used_at"])
+
+
+def downgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if "llm_response_cache" not in inspector.get_table_names():
+        return
+    op.drop_index("ix_llm_response_cache_last_used_at", table_name="llm_response_cache")
+    op.drop_index("ix_llm_response_cache_created_at", table_name="llm_response_cache")
+    op.drop_index("ix_llm_response_cache_stage", table_name="llm_response_cache")
+    op.drop_index("ix_llm_response_cache_file_id", table_name="llm_response_cache")
+    op.drop_table("llm_response_cache")
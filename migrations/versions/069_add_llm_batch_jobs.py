@@ -0,0 +1,51 @@
+"""Add the llm_batch_jobs table for offline batch-API backfills.
+
+Revision ID: 069_add_llm_batch_jobs
+Revises: 068_add_llm_response_cache
+"""
+
+from typing import Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "069_add_llm_batch_jobs"
+down_revision: Union[str, None] = "068_add_llm_response_cache"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if "llm_batch_jobs" in inspector.get_table_names():
+        return
+    op.create_table(
+        "llm_batch_jobs",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("kind", sa.String(length=32), nullable=False),
+        sa.Column("backend", sa.String(length=32), nullable=False),
+        sa.Column("endpoint", sa.String(length=64), nullable=False),
+        sa.Column("batch_id", sa.String(length=255), nullable=True),
+        sa.Column("status", sa.String(length=20), nullable=False, server_default="submitted"),
+        sa.Column("file_ids", sa.Text(), nullable=False, server_default="[]"),
+        sa.Column("request_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("succeeded_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("failed_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("error", sa.Text(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("completed_at", sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("batch_id"),
+    )
+    op.create_index("ix_llm_batch_jobs_kind", "llm_batch_jobs", ["kind"])
+    op.create_index("ix_llm_batch_jobs_status", "llm_batch_jobs", ["status"])
+
+
+def downgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if "llm_batch_jobs" not in inspector.get_table_names():
+        return
+    op.drop_index("ix_llm_batch_jobs_status", table_name="llm_batch_jobs")
+    op.drop_index("ix_llm_batch_jobs_kind", table_name="llm_batch_jobs")
+    op.drop_table("llm_batch_jobs")
@@ -0,0 +1,57 @@
+"""Add the resumable_uploads table for chunked document intake.
+
+Revision ID: 070_add_resumable_uploads
+Revises: 069_add_llm_batch_jobs
+"""
+
+from typing import Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "070_add_resumable_uploads"
+down_revision: Union[str, None] = "069_add_llm_batch_jobs"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if "resumable_uploads" in inspector.get_table_names():
+        return
+    op.create_table(
+        "resumable_uploads",
+        sa.Column("id", sa.String(length=36), nullable=False),
+        sa.Column("principal_id", sa.String(), nullable=False),
+        sa.Column("idempotency_key", sa.String(length=255), nullable=False),
+        sa.Column("source", sa.String(length=100), nullable=False),
+        sa.Column("original_filename", sa.String(), nullable=False),
+        sa.Column("content_type", sa.String(length=255), nullable=True),
+        sa.Column("metadata_json", sa.Text(), nullable=True),
+        sa.Column("upload_length", sa.BigInteger(), nullable=False),
+        sa.Column("upload_offset", sa.BigInteger(), nullable=False, server_default="0"),
+        sa.Column("expected_sha256", sa.String(length=64), nullable=True),
+        sa.Column("sha256", sa.String(length=64), nullable=True),
+        sa.Column("local_path", sa.String(), nullable=False),
+        sa.Column("state", sa.String(length=20), nullable=False, server_default="uploading"),
+        sa.Column("intake_id", sa.Integer(), nullable=True),
+        sa.Column("expires_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.ForeignKeyConstraint(["intake_id"], ["document_intakes.id"], ondelete="SET NULL"),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("principal_id", "idempotency_key", name="uq_resumable_upload_principal_key"),
+    )
+    op.create_index("ix_resumable_uploads_principal_id", "resumable_uploads", ["principal_id"])
+    op.create_index("ix_resumable_uploads_state", "resumable_uploads", ["state"])
+    op.create_index("ix_resumable_uploads_expires_at", "resumable_uploads", ["expires_at"])
+
+
+def downgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if "resumable_uploads" not in inspector.get_table_names():
+        return
+    op.drop_index("ix_resumable_uploads_expires_at", table_name="resumable_uploads")
+    op.drop_index("ix_resumable_uploads_state", table_name="resumable_uploads")
+    op.drop_index("ix_resumable_uploads_principal_id", table_name="resumable_uploads")
+    op.drop_table("resumable_uploads")
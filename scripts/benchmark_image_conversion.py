@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""Throughput benchmark for image-to-PDF conversion.
+
+Compares the in-worker img2pdf path used by ``convert_to_pdf`` for raster
+images against Gotenberg's LibreOffice route, for a synthetic corpus of
+phone-scan-like images:
+
+* **jpeg** – ``--width`` x ``--height`` photo-like JPEGs (quality 90, 300 DPI).
+* **tiff** – 3-page greyscale TIFFs, as produced by scanners and fax gateways.
+
+For each path and format the script prints images/second, p50 / p99 latency
+and the average output size.  Gotenberg is only measured when
+``--gotenberg-url`` is reachable; the Gotenberg request streams its response
+to disk exactly as the task does.
+
+Usage::
+
+    python scripts/benchmark_image_conversion.py                 # local path only
+    python scripts/benchmark_image_conversion.py --gotenberg-url http://localhost:3000 --images 20
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import requests  # noqa: E402
+from PIL import Image, ImageDraw  # noqa: E402
+
+from app.tasks.convert_to_pdf import _convert_image_locally, _stream_response_to_file  # noqa: E402
+
+
+def _scan_like_image(width: int, height: int, seed: int, mode: str = "RGB") -> Image.Image:
+    """Return a page-like image: paper background, text-like bars and sensor noise."""
+    # Seeded for a reproducible corpus – not cryptographic, S311 is intentional.
+    rng = random.Random(seed)  # noqa: S311
+    image = Image.new(mode, (width, height), "white" if mode == "RGB" else 255)
+    draw = ImageDraw.Draw(image)
+    line_height = max(8, height // 60)
+    for top in range(height // 10, height - height // 10, line_height * 2):
+        left = width // 10
+        while left < width - width // 10:
+            word = rng.randint(width // 40, width // 12)
+            draw.rectangle((left, top, left + word, top + line_height), fill="black" if mode == "RGB" else 0)
+            left += word + width // 60
+    noise = Image.effect_noise((width, height), 12).convert(mode)
+    return Image.blend(image, noise, 0.08)
+
+
+def build_corpus(directory: str, count: int, width: int, height: int) -> dict[str, list[str]]:
+    """Write *count* JPEGs and *count* multi-page TIFFs into *directory*."""
+    corpus: dict[str, list[str]] = {"jpeg": [], "tiff": []}
+    for index in range(count):
+        jpeg_path = os.path.join(directory, f"scan_{index}.jpg")
+        _scan_like_image(width, height, index).save(jpeg_path, "JPEG", quality=90, dpi=(300, 300))
+        corpus["jpeg"].append(jpeg_path)
+
+        pages = [_scan_like_image(width // 2, height // 2, index * 10 + page, mode="L") for page in range(3)]
+        tiff_path = os.path.join(directory, f"fax_{index}.tiff")
+        pages[0].save(tiff_path, "TIFF", save_all=True, append_images=pages[1:], dpi=(200, 200))
+        corpus["tiff"].append(tiff_path)
+    return corpus
+
+
+def convert_local(path: str, output: str) -> None:
+    _convert_image_locally(path, output)
+
+
+def convert_gotenberg(gotenberg_url: str, path: str, output: str) -> None:
+    with open(path, "rb") as handle:
+        response = requests.post(
+            f"{gotenberg_url}/forms/libreoffice/convert",
+            files={"files": (os.path.basename(path), handle)},
+            data={"losslessImageCompression": "true", "pdfa": "PDF/A-2b"},
+            timeout=300,
+            stream=True,
+        )
+    try:
+        response.raise_for_status()
+        _stream_response_to_file(response, output)
+    finally:
+        response.close()
+
+
+def measure(convert, paths: list[str], output_dir: str) -> dict[str, float]:
+    latencies = []
+    sizes = []
+    started = time.perf_counter()
+    for index, path in enumerate(paths):
+        output = os.path.join(output_dir, f"out_{index}.pdf")
+        t0 = time.perf_counter()
+        convert(path, output)
+        latencies.append(time.perf_counter() - t0)
+        sizes.append(os.path.getsize(output))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "ips": len(paths) / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000,
+        "avg_kb": statistics.mean(sizes) / 1024,
+    }
+
+
+def gotenberg_available(gotenberg_url: str | None) -> bool:
+    if not gotenberg_url:
+        return False
+    try:
+        return requests.get(f"{gotenberg_url}/health", timeout=5).ok
+    except requests.RequestException:
+        return False
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--images", type=int, default=10, help="images per format")
+    parser.add_argument("--width", type=int, default=2480, help="JPEG width in pixels (A4 at 300 DPI)")
+    parser.add_argument("--height", type=int, default=3508, help="JPEG height in pixels (A4 at 300 DPI)")
+    parser.add_argument("--gotenberg-url", default=os.environ.get("GOTENBERG_URL"), help="Gotenberg base URL")
+    args = parser.parse_args()
+
+    paths = {"local": convert_local}
+    if gotenberg_available(args.gotenberg_url):
+        paths["gotenberg"] = lambda path, output: convert_gotenberg(args.gotenberg_url, path, output)
+    else:
+        print(f"Gotenberg not reachable at {args.gotenberg_url!r}; measuring the local path only.\n")
+
+    with tempfile.TemporaryDirectory() as workdir:
+        corpus = build_corpus(workdir, args.images, args.width, args.height)
+        input_kb = {fmt: statistics.mean(os.path.getsize(p) for p in files) / 1024 for fmt, files in corpus.items()}
+        print(f"{'path':<10} {'format':<6} {'img/s':>8} {'p50 ms':>10} {'p99 ms':>10} {'in KB':>9} {'out KB':>9}")
+        for label, convert in paths.items():
+            for fmt, files in corpus.items():
+                result = measure(convert, files, workdir)
+                print(
+                    f"{label:<10} {fmt:<6} {result['ips']:>8.2f} {result['p50_ms']:>10.1f} {result['p99_ms']:>10.1f}"
+                    f" {input_kb[fmt]:>9.0f} {result['avg_kb']:>9.0f}"
+                )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""Micro-benchmark for the HTTP middleware stack.
+
+Compares the pure ASGI middlewares in ``app/middleware/`` against the same
+four layers implemented on Starlette's ``BaseHTTPMiddleware`` (the previous
+implementation), for two workloads:
+
+* **trivial** – a JSON endpoint returning ``{"ok": true}``.
+* **download** – a ``StreamingResponse`` of ``--download-mb`` megabytes
+  (default 100) sent in 64 KiB chunks.
+
+Requests are driven directly through the ASGI interface so the numbers
+measure middleware overhead only, without socket or HTTP parsing noise.
+For each stack and workload the script prints requests/second and the
+p50 / p99 latency.
+
+Usage::
+
+    python scripts/benchmark_middleware.py                 # from repo root
+    python scripts/benchmark_middleware.py --requests 5000 --downloads 10
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import statistics
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from fastapi import FastAPI  # noqa: E402
+from fastapi.responses import StreamingResponse  # noqa: E402
+from starlette.middleware.base import BaseHTTPMiddleware  # noqa: E402
+from starlette.responses import JSONResponse  # noqa: E402
+
+from app.middleware.audit_log import AuditLogMiddleware  # noqa: E402
+from app.middleware.csrf import CSRFMiddleware  # noqa: E402
+from app.middleware.request_size_limit import RequestSizeLimitMiddleware  # noqa: E402
+from app.middleware.security_headers import SecurityHeadersMiddleware  # noqa: E402
+
+CHUNK_SIZE = 64 * 1024
+
+# Mirrors the production defaults with authentication (and thus CSRF) disabled.
+CONFIG = SimpleNamespace(
+    security_headers_enabled=True,
+    security_header_hsts_enabled=True,
+    security_header_hsts_value="max-age=31536000; includeSubDomains",
+    security_header_csp_enabled=True,
+    security_header_csp_value="default-src 'self'",
+    security_header_x_frame_options_enabled=True,
+    security_header_x_frame_options_value="DENY",
+    security_header_x_content_type_options_enabled=True,
+    max_request_body_size=1024 * 1024,
+    max_upload_size=1024 * 1024 * 1024,
+    auth_enabled=False,
+    audit_logging_enabled=True,
+    audit_log_include_client_ip=True,
+)
+
+MIDDLEWARES = (AuditLogMiddleware, CSRFMiddleware, RequestSizeLimitMiddleware, SecurityHeadersMiddleware)
+
+
+class _LegacyLayer(BaseHTTPMiddleware):
+    """Runs one middleware's request/response logic through ``BaseHTTPMiddleware``."""
+
+    def __init__(self, app, middleware_cls):
+        super().__init__(app)
+        self.inner = middleware_cls(app, CONFIG)
+
+    async def dispatch(self, request, call_next):
+        inner = self.inner
+        if isinstance(inner, RequestSizeLimitMiddleware):
+            length = request.headers.get("content-length")
+            if length is not None and length.isdigit() and int(length) > inner.max_body_size:
+                return JSONResponse(status_code=413, content={"detail": "Request body too large"})
+        start = time.monotonic()
+        response = await call_next(request)
+        if isinstance(inner, SecurityHeadersMiddleware) and inner.enabled:
+            inner._add_security_headers(response.headers)
+        elif isinstance(inner, AuditLogMiddleware) and inner.enabled:
+            inner._log_request(request, response.status_code, int((time.monotonic() - start) * 1000))
+        return response
+
+
+def build_app(stack: str, download_bytes: int) -> FastAPI:
+    """Return an app with the *stack* ("asgi" or "legacy") middleware layers."""
+    app = FastAPI()
+
+    @app.get("/ping")
+    async def ping():
+        return {"ok": True}
+
+    @app.get("/download")
+    async def download():
+        async def chunks():
+            chunk = b"\0" * CHUNK_SIZE
+            remaining = download_bytes
+            while remaining > 0:
+                yield chunk[: min(CHUNK_SIZE, remaining)]
+                remaining -= CHUNK_SIZE
+
+        return StreamingResponse(chunks(), media_type="application/octet-stream")
+
+    for middleware_cls in MIDDLEWARES:
+        if stack == "asgi":
+            app.add_middleware(middleware_cls, config=CONFIG)
+        else:
+            app.add_middleware(_LegacyLayer, middleware_cls=middleware_cls)
+    return app
+
+
+async def _request(app, path: str) -> int:
+    """Send one GET through *app* and return the number of body bytes received."""
+    received = 0
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"host", b"bench")],
+        "client": ("127.0.0.1", 50000),
+        "server": ("bench", 80),
+    }
+    request_sent = False
+
+    async def receive():
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await asyncio.Event().wait()
+
+    async def send(message):
+        nonlocal received
+        if message["type"] == "http.response.body":
+            received += len(message.get("body", b""))
+
+    await app(scope, receive, send)
+    return received
+
+
+async def _measure(app, path: str, count: int, expected_bytes: int | None) -> dict[str, float]:
+    latencies = []
+    started = time.perf_counter()
+    for _ in range(count):
+        t0 = time.perf_counter()
+        received = await _request(app, path)
+        latencies.append(time.perf_counter() - t0)
+        if expected_bytes is not None and received != expected_bytes:
+            raise RuntimeError(f"expected {expected_bytes} bytes from {path}, got {received}")
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "rps": count / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000,
+    }
+
+
+async def run(requests: int, downloads: int, download_mb: int) -> None:
+    download_bytes = download_mb * 1024 * 1024
+    print(f"{'stack':<8} {'workload':<16} {'req/s':>10} {'p50 ms':>10} {'p99 ms':>10}")
+    for stack in ("legacy", "asgi"):
+        app = build_app(stack, download_bytes)
+        await _measure(app, "/ping", min(200, requests), None)  # warm-up
+        for label, path, count, expected in (
+            ("trivial", "/ping", requests, None),
+            (f"download {download_mb}MB", "/download", downloads, download_bytes),
+        ):
+            result = await _measure(app, path, count, expected)
+            print(f"{stack:<8} {label:<16} {result['rps']:>10.1f} {result['p50_ms']:>10.2f} {result['p99_ms']:>10.2f}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000, help="requests for the trivial endpoint")
+    parser.add_argument("--downloads", type=int, default=5, help="requests for the streamed download")
+    parser.add_argument("--download-mb", type=int, default=100, help="size of the streamed download")
+    args = parser.parse_args()
+
+    # Audit lines are formatted but not written, as with a WARNING-level production logger.
+    logging.getLogger("app.middleware").setLevel(logging.WARNING)
+    asyncio.run(run(args.requests, args.downloads, args.download_mb))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""Rules x documents benchmark for the routing, classification and privacy engines.
+
+Generates a synthetic corpus of OCR-like documents and per-owner rule sets of
+increasing size, then measures documents/second for:
+
+* **classification** – compiling the rule set for every document (what every
+  evaluation cost before rule sets were cached) versus reusing one compiled
+  :class:`CompiledClassificationRules`.
+* **privacy** – evaluating :func:`match_privacy_rule` rule by rule with the
+  metadata JSON parsed per rule (the previous first-match loop) versus
+  :class:`CompiledPrivacyRules`.
+* **routing** – calling ``_evaluate_condition`` for every rule in order
+  versus :class:`CompiledRoutingRules`.
+
+Half of the keyword rules are drawn from the document vocabulary, so
+documents match some rules but usually not the first ones.  No database or
+Redis is needed.
+
+Usage::
+
+    python scripts/benchmark_rule_engines.py
+    python scripts/benchmark_rule_engines.py --rules 10 100 500 --documents 200 --words 3000
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.utils.classification_rules import (  # noqa: E402
+    RULE_TYPE_CONTENT,
+    RULE_TYPE_FILENAME,
+    RULE_TYPE_METADATA,
+    ClassificationRule,
+    compile_classification_rules,
+)
+from app.utils.privacy_rules import CompiledPrivacyRules, match_privacy_rule, parse_metadata  # noqa: E402
+from app.utils.routing_engine import (  # noqa: E402
+    CompiledRoutingRules,
+    _evaluate_condition,
+    _resolve_field,
+)
+
+
+def _word(rng: random.Random) -> str:
+    return "".join(rng.choices("abcdefghijklmnopqrstuvwxyz", k=rng.randint(3, 10)))
+
+
+def build_documents(count: int, words: int, seed: int) -> tuple[list[dict], list[str]]:
+    """Return *count* documents of *words* words each and the shared vocabulary."""
+    # Seeded for a reproducible corpus – not cryptographic, S311 is intentional.
+    rng = random.Random(seed)  # noqa: S311
+    vocabulary = [_word(rng) for _ in range(5000)]
+    documents = []
+    for index in range(count):
+        metadata = {"document_type": rng.choice(["Invoice", "Letter", "Contract"]), "absender": _word(rng)}
+        documents.append(
+            {
+                "filename": f"{rng.choice(['scan', 'invoice', 'letter'])}_{index}.pdf",
+                "text": " ".join(rng.choices(vocabulary, k=words)),
+                "metadata": metadata,
+                "ai_metadata": json.dumps(metadata),
+                "file_type": rng.choice(["application/pdf", "image/png"]),
+                "size": rng.randint(10_000, 10_000_000),
+            }
+        )
+    return documents, vocabulary
+
+
+def _keyword(rng: random.Random, vocabulary: list[str]) -> str:
+    # Half of the keywords can occur in documents, half never do.
+    return rng.choice(vocabulary) if rng.random() < 0.5 else f"{_word(rng)}-{_word(rng)}"
+
+
+def build_rules(count: int, vocabulary: list[str], seed: int) -> tuple[list, list, list]:
+    """Return classification, privacy and routing rules (60% keyword, 20% filename, 20% metadata)."""
+    # Seeded for a reproducible corpus – not cryptographic, S311 is intentional.
+    rng = random.Random(seed)  # noqa: S311
+    classification, privacy, routing = [], [], []
+    for index in range(count):
+        kind = index % 5
+        if kind < 3:
+            rule_type, pattern = RULE_TYPE_CONTENT, "|".join(_keyword(rng, vocabulary) for _ in range(3))
+        elif kind == 3:
+            rule_type, pattern = RULE_TYPE_FILENAME, rf"{_word(rng)}_\d+"
+        else:
+            rule_type, pattern = RULE_TYPE_METADATA, f"absender={_word(rng)}"
+        classification.append(ClassificationRule(f"rule_{index}", f"cat_{index % 9}", rule_type, pattern))
+        privacy.append(SimpleNamespace(id=index, rule_type=rule_type, pattern=pattern, case_sensitive=False))
+
+        field, operator, value = rng.choice(
+            [
+                ("file_type", "equals", "image/tiff"),
+                ("filename", "contains", _word(rng)),
+                ("filename", "regex", rf"{_word(rng)}_\d+\.pdf"),
+                ("size", "gt", str(rng.randint(10_000_000, 20_000_000))),
+                ("metadata.absender", "equals", _word(rng)),
+            ]
+        )
+        routing.append(
+            SimpleNamespace(
+                id=index, name=f"r{index}", field=field, operator=operator, value=value, target_pipeline_id=1
+            )
+        )
+    return classification, privacy, routing
+
+
+def _docs_per_second(documents: list[dict], evaluate) -> float:
+    started = time.perf_counter()
+    for document in documents:
+        evaluate(document)
+    return len(documents) / (time.perf_counter() - started)
+
+
+def _linear_privacy(rules: list, document: dict):
+    for rule in rules:
+        match = match_privacy_rule(
+            rule_type=rule.rule_type,
+            pattern=rule.pattern,
+            case_sensitive=rule.case_sensitive,
+            filename=document["filename"],
+            text=document["text"],
+            metadata=parse_metadata(document["ai_metadata"]),
+        )
+        if match.matched:
+            return rule.id, match
+    return None
+
+
+def _linear_routing(rules: list, document: dict):
+    return next(
+        (
+            rule
+            for rule in rules
+            if _evaluate_condition(_resolve_field(rule.field, document), rule.operator, rule.value)
+        ),
+        None,
+    )
+
+
+def _engines(classification: list, privacy: list, routing: list) -> list[tuple]:
+    """Return ``(name, before, after)`` evaluators for one rule count."""
+    compiled_classification = compile_classification_rules(classification)
+    compiled_privacy = CompiledPrivacyRules(privacy)
+    compiled_routing = CompiledRoutingRules(routing)
+    return [
+        (
+            "classification",
+            lambda d: compile_classification_rules(classification).classify(d["filename"], d["text"], d["metadata"]),
+            lambda d: compiled_classification.classify(d["filename"], d["text"], d["metadata"]),
+        ),
+        (
+            "privacy",
+            lambda d: _linear_privacy(privacy, d),
+            lambda d: compiled_privacy.first_match(d["filename"], d["text"], parse_metadata(d["ai_metadata"])),
+        ),
+        (
+            "routing",
+            lambda d: _linear_routing(routing, d),
+            lambda d: next(compiled_routing.matches(d), None),
+        ),
+    ]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rules", type=int, nargs="+", default=[10, 100, 500], help="rule counts to measure")
+    parser.add_argument("--documents", type=int, default=100, help="documents per measurement")
+    parser.add_argument("--words", type=int, default=2000, help="words of OCR text per document")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    documents, vocabulary = build_documents(args.documents, args.words, args.seed)
+    print(
+        f"{args.documents} documents, ~{sum(len(d['text']) for d in documents) // len(documents)} chars of text each\n"
+    )
+    print(f"{'engine':<15} {'rules':>6} {'before docs/s':>14} {'compiled docs/s':>16} {'speed-up':>9}")
+    for count in args.rules:
+        rows = _engines(*build_rules(count, vocabulary, args.seed + count))
+
+        for name, before, after in rows:
+            before_rate = _docs_per_second(documents, before)
+            after_rate = _docs_per_second(documents, after)
+            print(f"{name:<15} {count:>6} {before_rate:>14.1f} {after_rate:>16.1f} {after_rate / before_rate:>8.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
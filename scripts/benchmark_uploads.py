@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""Load benchmark for the upload and intake endpoints.
+
+Sends ``--uploads`` concurrent multipart uploads (``--concurrency`` in
+flight) of ``--size-kb`` each to ``POST /api/ui-upload`` or
+``POST /api/intake/documents``, and samples event-loop lag the whole time
+with a 5 ms ticker.  Slow storage and a slow broker are simulated by adding
+``--latency-ms`` to every hash and every task enqueue.
+
+Each run compares two modes:
+
+* **offload** – the shipped code; blocking work runs on the
+  ``UPLOAD_IO_THREADS`` pool (:mod:`app.utils.blocking_io`).
+* **inline** – the same endpoints with :func:`run_blocking` replaced by a
+  direct call, i.e. the blocking work runs on the event loop as before.
+
+For each mode the script prints uploads/second plus p50 / p99 / max
+event-loop lag.  Requests are driven through the ASGI interface in
+process, so the numbers isolate the endpoint code from socket overhead.
+
+Usage::
+
+    python scripts/benchmark_uploads.py                      # from repo root
+    python scripts/benchmark_uploads.py --endpoint intake --uploads 400 --latency-ms 20
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import patch
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+_WORKDIR = tempfile.mkdtemp(prefix="docuelevate-upload-bench-")
+os.environ.update(
+    {
+        "DATABASE_URL": f"sqlite:///{_WORKDIR}/bench.db",
+        "REDIS_URL": "redis://localhost:6379/15",
+        "OPENAI_API_KEY": "bench",
+        "AZURE_AI_KEY": "bench",
+        "AZURE_REGION": "bench",
+        "AZURE_ENDPOINT": "https://bench.invalid/",
+        "GOTENBERG_URL": "http://localhost:3000",
+        "WORKDIR": _WORKDIR,
+        "AUTH_ENABLED": "False",
+        "SESSION_SECRET": "benchmark-session-secret-that-is-long-enough",
+        "ENABLE_DEDUPLICATION": "True",
+        "LIVE_EVENTS_ENABLED": "False",
+    }
+)
+
+import httpx  # noqa: E402
+from fastapi import FastAPI  # noqa: E402
+from starlette.middleware.sessions import SessionMiddleware  # noqa: E402
+
+from app.api import files as files_api  # noqa: E402
+from app.api import intake as intake_api  # noqa: E402
+from app.database import Base, engine  # noqa: E402
+from app.middleware.upload_rate_limit import require_upload_rate_limit  # noqa: E402
+from app.utils import file_operations  # noqa: E402
+
+TICK_SECONDS = 0.005
+
+
+def build_app() -> FastAPI:
+    """Return an app exposing only the upload and intake routers."""
+    Base.metadata.create_all(bind=engine)
+    app = FastAPI()
+    app.add_middleware(SessionMiddleware, secret_key=os.environ["SESSION_SECRET"])
+    app.include_router(files_api.router, prefix="/api")
+    app.include_router(intake_api.router, prefix="/api")
+    app.dependency_overrides[require_upload_rate_limit] = lambda: None
+    return app
+
+
+async def _inline(func, /, *args, **kwargs):
+    """Stand-in for ``run_blocking`` that blocks the event loop like the previous code."""
+    return func(*args, **kwargs)
+
+
+async def _sample_lag(samples: list[float], stop: asyncio.Event) -> None:
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        started = loop.time()
+        await asyncio.sleep(TICK_SECONDS)
+        samples.append(max(0.0, loop.time() - started - TICK_SECONDS))
+
+
+async def _run(app: FastAPI, endpoint: str, uploads: int, concurrency: int, size: int) -> tuple[float, list[float]]:
+    payload = os.urandom(size)
+    semaphore = asyncio.Semaphore(concurrency)
+    transport = httpx.ASGITransport(app=app)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=300) as client:
+
+        async def upload(index: int) -> None:
+            # Unique content per upload so duplicate rejection does not short-circuit the work.
+            body = payload[:-16] + uuid.uuid4().bytes
+            async with semaphore:
+                if endpoint == "intake":
+                    response = await client.post(
+                        "/api/intake/documents",
+                        files={"file": (f"doc{index}.pdf", body, "application/pdf")},
+                        data={"source": "benchmark", "idempotency_key": f"bench-{uuid.uuid4().hex}"},
+                    )
+                else:
+                    response = await client.post(
+                        "/api/ui-upload", files={"file": (f"doc{index}.pdf", body, "application/pdf")}
+                    )
+                response.raise_for_status()
+
+        lag: list[float] = []
+        stop = asyncio.Event()
+        sampler = asyncio.create_task(_sample_lag(lag, stop))
+        started = time.perf_counter()
+        await asyncio.gather(*(upload(index) for index in range(uploads)))
+        elapsed = time.perf_counter() - started
+        stop.set()
+        await sampler
+    return elapsed, lag
+
+
+def _report(mode: str, uploads: int, elapsed: float, lag: list[float]) -> None:
+    ordered = sorted(lag) or [0.0]
+    p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+    print(
+        f"{mode:<8} {uploads / elapsed:>9.1f} uploads/s   "
+        f"loop lag p50 {statistics.median(ordered) * 1000:>7.1f} ms   "
+        f"p99 {p99 * 1000:>7.1f} ms   max {ordered[-1] * 1000:>7.1f} ms"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--endpoint", choices=("ui-upload", "intake"), default="ui-upload")
+    parser.add_argument("--uploads", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--size-kb", type=int, default=512)
+    parser.add_argument("--latency-ms", type=float, default=10.0, help="Added to every hash and task enqueue.")
+    args = parser.parse_args()
+
+    latency = args.latency_ms / 1000
+    real_hash = file_operations.hash_file
+
+    def slow_hash(path):
+        time.sleep(latency)
+        return real_hash(path)
+
+    def slow_enqueue(*_args, **_kwargs):
+        time.sleep(latency)
+        return SimpleNamespace(id=str(uuid.uuid4()))
+
+    app = build_app()
+    print(
+        f"{args.uploads} uploads of {args.size_kb} KiB to /{args.endpoint}, {args.concurrency} in flight, "
+        f"{args.latency_ms:g} ms simulated storage/broker latency"
+    )
+    with (
+        patch.object(files_api, "hash_file", slow_hash),
+        patch.object(files_api.process_document, "delay", slow_enqueue),
+        patch.object(intake_api, "_queue_document", slow_enqueue),
+    ):
+        for mode in ("offload", "inline"):
+            overrides = (
+                (patch.object(files_api, "run_blocking", _inline), patch.object(intake_api, "run_blocking", _inline))
+                if mode == "inline"
+                else ()
+            )
+            for override in overrides:
+                override.start()
+            try:
+                elapsed, lag = asyncio.run(
+                    _run(app, args.endpoint, args.uploads, args.concurrency, args.size_kb * 1024)
+                )
+            finally:
+                for override in overrides:
+                    override.stop()
+            _report(mode, args.uploads, elapsed, lag)
+
+
+if __name__ == "__main__":
+    main()
@@ -56,6 +56,10 @@ os.environ["AUTH_ENABLED"] = "False"
 os.environ["ADMIN_PASSWORD"] = "test_admin_password_for_completed_setup"
 os.environ["SESSION_SECRET"] = "test_secret_key_for_testing_must_be_at_least_32_characters_long"
 os.environ["LOG_FORMAT"] = "text"
+# Stage LLM calls are mocked per test; stored responses must not leak between tests.
+os.environ["LLM_CACHE_ENABLED"] = "False"
+# No Redis in the test run: step and notification writes must not try to publish live events.
+os.environ["LIVE_EVENTS_ENABLED"] = "False"
 
 # Keep pytest-created files inside WORKDIR on macOS, where the system TMPDIR
 # otherwise resolves to /private/var while /tmp resolves to /private/tmp.
@@ -98,6 +102,38 @@ def test_workdir() -> Generator[str, None, None]:
         yield tmpdir
 
 
+@pytest.fixture(autouse=True)
+def _reset_api_token_cache():
+    """Keep verified API tokens from leaking between tests."""
+    from app.utils.api_token_cache import usage_recorder, verified_tokens
+
+    verified_tokens.clear()
+    usage_recorder.discard()
+    yield
+    verified_tokens.clear()
+    usage_recorder.discard()
+
+
+@pytest.fixture(autouse=True)
+def _reset_rule_set_caches():
+    """Keep compiled routing/classification/privacy rule sets from leaking between tests."""
+    from app.utils.rule_sets import clear_rule_set_caches
+
+    clear_rule_set_caches()
+    yield
+    clear_rule_set_caches()
+
+
+@pytest.fixture(autouse=True)
+def _reset_llm_clients():
+    """Keep pooled LLM/embedding clients (often built from mocked SDK classes) from leaking between tests."""
+    from app.utils.llm_clients import clear_clients
+
+    clear_clients()
+    yield
+    clear_clients()
+
+
 @pytest.fixture(scope="function")
 def db_session():
     """Create a fresh database session for each test."""
@@ -1,7 +1,7 @@
 """Unit tests for the AI provider abstraction layer (app/utils/ai_provider.py)."""
 
 from types import SimpleNamespace
-from unittest.mock import MagicMock, patch
+from unittest.mock import ANY, MagicMock, patch
 
 import pytest
 
@@ -187,6 +187,7 @@ class TestOpenAIProvider:
         mock_openai_cls.assert_called_once_with(
             api_key="sk-test",
             base_url="https://api.openai.com/v1",
+            http_client=ANY,
         )
 
     @patch("openai.OpenAI")
@@ -196,6 +197,7 @@ class TestOpenAIProvider:
         mock_openai_cls.assert_called_once_with(
             api_key="sk-test",
             base_url="http://localhost:8000/v1",
+            http_client=ANY,
         )
 
     @patch("openai.OpenAI")
@@ -274,6 +276,7 @@ class TestAzureOpenAIProvider:
             api_key="azure-key",
             azure_endpoint="https://my-resource.openai.azure.com",
             api_version="2024-02-01",
+            http_client=ANY,
         )
 
     @patch("openai.AzureOpenAI")
@@ -403,6 +406,7 @@ class TestOllamaProvider:
         mock_openai_cls.assert_called_once_with(
             api_key="ollama",
             base_url="http://localhost:11434/v1",
+            http_client=ANY,
         )
 
     @patch("openai.OpenAI")
@@ -412,6 +416,7 @@ class TestOllamaProvider:
         mock_openai_cls.assert_called_once_with(
             api_key="ollama",
             base_url="http://my-ollama:11434/v1",
+            http_client=ANY,
         )
 
     @patch("openai.OpenAI")
@@ -453,6 +458,7 @@ class TestOpenRouterProvider:
         mock_openai_cls.assert_called_once_with(
             api_key="or-key",
             base_url="https://openrouter.ai/api/v1",
+            http_client=ANY,
         )
 
     @patch("openai.OpenAI")
@@ -3131,12 +3131,16 @@ class TestBulkAssignPipelineToFiles:
         db_session.add_all([*files, pipeline])
         db_session.commit()
 
-        response = client.post(
-            "/api/files/bulk-assign-pipeline",
-            json={"file_ids": [file.id for file in files], "pipeline_id": pipeline.id},
-        )
+        with patch("app.utils.webhook.dispatch_webhook_events") as dispatch:
+            response = client.post(
+                "/api/files/bulk-assign-pipeline",
+                json={"file_ids": [file.id for file in files], "pipeline_id": pipeline.id},
+            )
 
         assert response.status_code == 200
+        dispatch.assert_called_once()
+        events = list(dispatch.call_args.args[0])
+        assert [(event, data["pipeline_id"]) for event, data in events] == [("document.routed", pipeline.id)] * 2
         data = response.json()
         assert data["updated_count"] == 2
         assert data["bulk_action"] == {
@@ -3215,7 +3219,7 @@ class TestBulkTagFiles:
         db_session.add_all(files)
         db_session.commit()
 
-        with patch("app.utils.webhook.dispatch_webhook_event") as dispatch:
+        with patch("app.utils.webhook.dispatch_webhook_events") as dispatch:
             response = client.post(
                 "/api/files/bulk-tag",
                 json={"file_ids": [file.id for file in files], "tags": ["Finance", " urgent ", "urgent"]},
@@ -3224,9 +3228,10 @@ class TestBulkTagFiles:
         assert response.status_code == 200
         data = response.json()
         assert data["updated_count"] == 2
-        assert dispatch.call_count == 2
-        assert {call.args[0] for call in dispatch.call_args_list} == {"document.metadata_updated"}
-        assert all(call.args[1]["updated_fields"] == ["tags"] for call in dispatch.call_args_list)
+        dispatch.assert_called_once()
+        events = list(dispatch.call_args.args[0])
+        assert [event for event, _ in events] == ["document.metadata_updated"] * 2
+        assert all(data["updated_fields"] == ["tags"] for _, data in events)
         assert data["bulk_action"] == {
             "action": "tag",
             "state": "completed",
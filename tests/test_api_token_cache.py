@@ -0,0 +1,252 @@
+"""Tests for the verified API token cache and coalesced usage tracking."""
+
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from app.api.api_tokens import generate_api_token, hash_token
+from app.models import ApiToken
+from app.utils import api_token_cache
+from app.utils.api_token_cache import (
+    TOKEN_CACHE_KEY_PREFIX,
+    TOKEN_VERSION_KEY,
+    UNVERIFIED_ENTRY_TTL,
+    TokenUsageRecorder,
+    VerifiedTokenCache,
+    notify_tokens_changed,
+    token_digest,
+)
+
+
+class _FakeRedis:
+    def __init__(self) -> None:
+        self.data: dict[str, str] = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, ex=None):
+        self.data[key] = value
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 1_000_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _request(token: str, ip: str = "203.0.113.7"):
+    request = MagicMock()
+    request.headers = {"authorization": f"Bearer {token}", "x-forwarded-for": ip}
+    return request
+
+
+def _add_token(db, **kwargs) -> tuple[str, ApiToken]:
+    plaintext = generate_api_token()
+    row = ApiToken(
+        owner_id="owner@example.com",
+        name="Scanner",
+        token_hash=hash_token(plaintext),
+        token_prefix=plaintext[:12],
+        is_active=True,
+        **kwargs,
+    )
+    db.add(row)
+    db.commit()
+    return plaintext, row
+
+
+@pytest.mark.unit
+class TestVerifiedTokenCache:
+    """Tests for the two-level verified-token cache."""
+
+    def _cache(self, version="v1", redis_client=None, clock=None):
+        versions = version if callable(version) else (lambda: version)
+        return VerifiedTokenCache(version_reader=versions, redis_getter=lambda: redis_client, clock=clock or _Clock())
+
+    def test_hit_within_ttl(self):
+        """A cached verification is returned while the version is unchanged."""
+        cache = self._cache()
+        cache.put("d", 1, "alice", None)
+
+        entry = cache.get("d")
+
+        assert (entry.token_id, entry.owner_id) == (1, "alice")
+
+    def test_version_change_invalidates(self):
+        """Publishing a new version (revocation) makes entries misses."""
+        current = {"v": "v1"}
+        cache = self._cache(version=lambda: current["v"])
+        cache.put("d", 1, "alice", None)
+
+        current["v"] = "v2"
+
+        assert cache.get("d") is None
+
+    def test_entry_never_outlives_token_expiry(self):
+        """Tokens expiring before the TTL are dropped at their expiry."""
+        clock = _Clock()
+        cache = self._cache(clock=clock)
+        expires = datetime.fromtimestamp(clock.now + 10, tz=timezone.utc)
+        cache.put("d", 1, "alice", expires)
+
+        assert cache.get("d") is not None
+        clock.now += 10
+        assert cache.get("d") is None
+
+    def test_expired_token_is_not_cached(self):
+        """A naive expiry in the past never creates an entry."""
+        clock = _Clock()
+        cache = self._cache(clock=clock)
+        cache.put("d", 1, "alice", datetime.fromtimestamp(clock.now - 1, tz=timezone.utc).replace(tzinfo=None))
+
+        assert cache.get("d") is None
+
+    def test_unverified_entries_expire_quickly_without_redis(self):
+        """Without a readable version, local entries are trusted only briefly."""
+        clock = _Clock()
+        cache = self._cache(version=None, clock=clock)
+        cache.put("d", 1, "alice", None)
+
+        assert cache.get("d") is not None
+        clock.now += UNVERIFIED_ENTRY_TTL
+        assert cache.get("d") is None
+
+    def test_shared_entry_is_used_by_other_processes(self):
+        """An entry written to Redis by one process is a hit in another."""
+        shared = _FakeRedis()
+        self._cache(redis_client=shared).put("d", 7, "bob", None)
+
+        other = self._cache(redis_client=shared)
+
+        assert other.get("d").token_id == 7
+        assert set(shared.data) == {TOKEN_CACHE_KEY_PREFIX + "d"}
+
+    def test_shared_entry_from_old_version_is_ignored(self):
+        """Redis entries cached under a previous version are not trusted."""
+        shared = _FakeRedis()
+        self._cache(version="v1", redis_client=shared).put("d", 7, "bob", None)
+
+        assert self._cache(version="v2", redis_client=shared).get("d") is None
+
+    def test_zero_ttl_disables_cache(self):
+        """API_TOKEN_CACHE_TTL=0 turns the cache off."""
+        cache = self._cache()
+        with patch.object(api_token_cache.settings, "api_token_cache_ttl", 0):
+            cache.put("d", 1, "alice", None)
+            assert cache.get("d") is None
+
+    def test_local_entries_are_bounded(self):
+        """The in-process LRU evicts the least recently used entry."""
+        cache = VerifiedTokenCache(version_reader=lambda: "v1", redis_getter=lambda: None, max_entries=2)
+        cache.put("a", 1, "o", None)
+        cache.put("b", 2, "o", None)
+        cache.get("a")
+        cache.put("c", 3, "o", None)
+
+        assert cache.get("b") is None
+        assert cache.get("a") is not None
+
+    def test_digest_is_keyed_and_stable(self):
+        """The digest is deterministic and differs from the stored PBKDF2 hash."""
+        token = generate_api_token()
+        assert token_digest(token) == token_digest(token)
+        assert token_digest(token) != hash_token(token)
+
+    def test_notify_bumps_version_and_clears(self, mocker):
+        """Revocations publish a new version and clear this process's entries."""
+        client = _FakeRedis()
+        mocker.patch("app.utils.api_token_cache._get_redis", return_value=client)
+        api_token_cache.verified_tokens._store_local("d", MagicMock())
+
+        notify_tokens_changed()
+
+        assert client.data[TOKEN_VERSION_KEY]
+        assert api_token_cache.verified_tokens._entries == {}
+
+
+@pytest.mark.unit
+class TestResolveBearerUserCached:
+    """Tests for the cached path of auth._resolve_bearer_user."""
+
+    def test_second_request_skips_pbkdf2(self, db_session):
+        """Only the first request pays for hash_token and the database lookup."""
+        from app.auth import _resolve_bearer_user
+
+        plaintext, row = _add_token(db_session)
+        first = _resolve_bearer_user(_request(plaintext), db_session)
+
+        with patch("app.api.api_tokens.hash_token", side_effect=AssertionError("PBKDF2 called")):
+            second = _resolve_bearer_user(_request(plaintext), MagicMock())
+
+        assert second == first
+        assert second["_api_token_id"] == row.id
+
+    def test_revocation_takes_effect_immediately(self, db_session, mocker):
+        """Revoking a token invalidates its cache entry."""
+        from app.auth import _resolve_bearer_user
+
+        mocker.patch("app.utils.api_token_cache._get_redis", return_value=None)
+        plaintext, row = _add_token(db_session)
+        assert _resolve_bearer_user(_request(plaintext), db_session) is not None
+
+        row.is_active = False
+        db_session.commit()
+        notify_tokens_changed()
+
+        assert _resolve_bearer_user(_request(plaintext), db_session) is None
+
+
+@pytest.mark.unit
+class TestTokenUsageRecorder:
+    """Tests for coalesced last_used_* updates."""
+
+    def test_uses_are_coalesced_into_one_write(self, db_session):
+        """Many uses inside the interval become one row update with the latest IP."""
+        _, row = _add_token(db_session)
+        token_id = row.id
+        clock = _Clock()
+        recorder = TokenUsageRecorder(session_factory=lambda: db_session, clock=clock)
+
+        with patch.object(api_token_cache.settings, "api_token_usage_flush_interval", 60):
+            recorder.record(token_id, "198.51.100.1")
+            recorder.record(token_id, "198.51.100.2")
+            assert db_session.get(ApiToken, token_id).last_used_at is None
+
+            clock.now += 60
+            recorder.record(token_id, "198.51.100.3")
+
+        stored = db_session.get(ApiToken, token_id)
+        assert stored.last_used_ip == "198.51.100.3"
+        assert stored.last_used_at is not None
+        assert recorder.flush() == 0
+
+    def test_flush_failure_is_swallowed(self):
+        """Database errors while flushing never reach the request."""
+        db = MagicMock()
+        db.commit.side_effect = RuntimeError("db down")
+        recorder = TokenUsageRecorder(session_factory=lambda: db)
+        recorder.record(1, None)
+
+        assert recorder.flush() == 0
+        db.rollback.assert_called_once()
+        db.close.assert_called_once()
+
+    def test_flush_records_time_of_use(self, db_session):
+        """last_used_at is taken when the token is used, not when the batch is written."""
+        _, row = _add_token(db_session)
+        token_id = row.id
+        recorder = TokenUsageRecorder(session_factory=lambda: db_session)
+        before = datetime.now(timezone.utc) - timedelta(seconds=1)
+
+        with patch.object(api_token_cache.settings, "api_token_usage_flush_interval", 3600):
+            recorder.record(token_id, None)
+        assert recorder.flush() == 1
+
+        used_at = db_session.get(ApiToken, token_id).last_used_at
+        if used_at.tzinfo is None:
+            used_at = used_at.replace(tzinfo=timezone.utc)
+        assert used_at >= before
@@ -202,52 +202,85 @@ class TestAuditLogMiddlewareInit:
 
 
 # ---------------------------------------------------------------------------
-# AuditLogMiddleware.dispatch
+# AuditLogMiddleware ASGI call
 # ---------------------------------------------------------------------------
 
 
+async def _noop_receive():
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+
 @pytest.mark.unit
-class TestAuditLogMiddlewareDispatch:
-    """Tests for AuditLogMiddleware.dispatch."""
+class TestAuditLogMiddlewareCall:
+    """Tests for AuditLogMiddleware as an ASGI application."""
 
-    def _make_middleware(self, enabled=True, include_ip=True):
+    def _make_middleware(self, app, enabled=True, include_ip=True):
         cfg = MagicMock()
         cfg.audit_logging_enabled = enabled
         cfg.audit_log_include_client_ip = include_ip
-        return AuditLogMiddleware(app=None, config=cfg)
+        return AuditLogMiddleware(app=app, config=cfg)
 
-    def _make_request(self, path="/test", query="", method="GET", session_user=None):
-        req = MagicMock()
-        req.method = method
-        req.url.path = path
-        req.url.query = query
-        req.headers = {}
-        req.client = MagicMock()
-        req.client.host = "127.0.0.1"
-        req.session = {"user": session_user} if session_user else {}
-        return req
+    def _make_scope(self, path="/test", query="", method="GET", session_user=None):
+        return {
+            "type": "http",
+            "method": method,
+            "path": path,
+            "query_string": query.encode(),
+            "headers": [],
+            "client": ("127.0.0.1", 50000),
+            "session": {"user": session_user} if session_user else {},
+        }
+
+    async def _call(self, mw, scope):
+        messages = []
+
+        async def send(message):
+            messages.append(message)
+
+        await mw(scope, _noop_receive, send)
+        return messages
 
     @pytest.mark.asyncio
     async def test_disabled_middleware_passes_through(self):
-        mw = self._make_middleware(enabled=False)
-        mock_response = Response(content="ok", status_code=200)
-        call_next = AsyncMock(return_value=mock_response)
+        app = AsyncMock()
+        mw = self._make_middleware(app, enabled=False)
+        scope = self._make_scope()
 
-        req = self._make_request()
-        result = await mw.dispatch(req, call_next)
+        with patch("app.middleware.audit_log.logger") as mock_logger:
+            await mw(scope, _noop_receive, AsyncMock())
+
+        app.assert_awaited_once()
+        assert app.await_args.args[0] is scope
+        mock_logger.info.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_response_is_forwarded_unmodified(self):
+        mw = self._make_middleware(Response(content="ok", status_code=200))
+
+        with patch("app.middleware.audit_log.logger"):
+            messages = await self._call(mw, self._make_scope())
 
-        assert result is mock_response
-        call_next.assert_awaited_once_with(req)
+        assert [m["type"] for m in messages] == ["http.response.start", "http.response.body"]
+        assert messages[0]["status"] == 200
+        assert messages[1]["body"] == b"ok"
+
+    @pytest.mark.asyncio
+    async def test_non_http_scope_is_not_logged(self):
+        app = AsyncMock()
+        mw = self._make_middleware(app)
+
+        with patch("app.middleware.audit_log.logger") as mock_logger:
+            await mw({"type": "lifespan"}, _noop_receive, AsyncMock())
+
+        app.assert_awaited_once()
+        mock_logger.info.assert_not_called()
 
     @pytest.mark.asyncio
     async def test_enabled_middleware_logs_request(self):
-        mw = self._make_middleware(enabled=True)
-        mock_response = Response(content="ok", status_code=200)
-        call_next = AsyncMock(return_value=mock_response)
-        req = self._make_request(path="/api/test", method="GET")
+        mw = self._make_middleware(Response(content="ok", status_code=200))
 
         with patch("app.middleware.audit_log.logger") as mock_logger:
-            await mw.dispatch(req, call_next)
+            await self._call(mw, self._make_scope(path="/api/test", method="GET"))
 
         # At least one info call should contain [AUDIT]
         info_calls = [str(c) for c in mock_logger.info.call_args_list]
@@ -255,13 +288,10 @@ class TestAuditLogMiddlewareDispatch:
 
     @pytest.mark.asyncio
     async def test_sensitive_query_param_masked_in_log(self):
-        mw = self._make_middleware(enabled=True)
-        mock_response = Response(content="ok", status_code=200)
-        call_next = AsyncMock(return_value=mock_response)
-        req = self._make_request(path="/search", query="q=hello&password=supersecret")
+        mw = self._make_middleware(Response(content="ok", status_code=200))
 
         with patch("app.middleware.audit_log.logger") as mock_logger:
-            await mw.dispatch(req, call_next)
+            await self._call(mw, self._make_scope(path="/search", query="q=hello&password=supersecret"))
 
         all_calls = " ".join(str(c) for c in mock_logger.info.call_args_list)
         assert "supersecret" not in all_calls
@@ -269,65 +299,60 @@ class TestAuditLogMiddlewareDispatch:
 
     @pytest.mark.asyncio
     async def test_401_triggers_security_warning(self):
-        mw = self._make_middleware(enabled=True)
-        mock_response = Response(content="unauth", status_code=401)
-        call_next = AsyncMock(return_value=mock_response)
-        req = self._make_request(path="/api/protected")
+        mw = self._make_middleware(Response(content="unauth", status_code=401))
 
         with patch("app.middleware.audit_log.logger") as mock_logger:
-            await mw.dispatch(req, call_next)
+            await self._call(mw, self._make_scope(path="/api/protected"))
 
         warning_calls = [str(c) for c in mock_logger.warning.call_args_list]
         assert any("AUTH_FAILURE" in c for c in warning_calls)
 
     @pytest.mark.asyncio
     async def test_403_triggers_security_warning(self):
-        mw = self._make_middleware(enabled=True)
-        mock_response = Response(content="forbidden", status_code=403)
-        call_next = AsyncMock(return_value=mock_response)
-        req = self._make_request(path="/admin")
+        mw = self._make_middleware(Response(content="forbidden", status_code=403))
 
         with patch("app.middleware.audit_log.logger") as mock_logger:
-            await mw.dispatch(req, call_next)
+            await self._call(mw, self._make_scope(path="/admin"))
 
         warning_calls = [str(c) for c in mock_logger.warning.call_args_list]
         assert any("ACCESS_DENIED" in c for c in warning_calls)
 
     @pytest.mark.asyncio
     async def test_5xx_triggers_security_error(self):
-        mw = self._make_middleware(enabled=True)
-        mock_response = Response(content="error", status_code=500)
-        call_next = AsyncMock(return_value=mock_response)
-        req = self._make_request(path="/api/crash")
+        mw = self._make_middleware(Response(content="error", status_code=500))
 
         with patch("app.middleware.audit_log.logger") as mock_logger:
-            await mw.dispatch(req, call_next)
+            await self._call(mw, self._make_scope(path="/api/crash"))
 
         error_calls = [str(c) for c in mock_logger.error.call_args_list]
         assert any("SERVER_ERROR" in c for c in error_calls)
 
     @pytest.mark.asyncio
     async def test_login_post_triggers_auth_attempt_log(self):
-        mw = self._make_middleware(enabled=True)
-        mock_response = Response(content="ok", status_code=302)
-        call_next = AsyncMock(return_value=mock_response)
-        req = self._make_request(path="/auth", method="POST")
+        mw = self._make_middleware(Response(content="ok", status_code=302))
 
         with patch("app.middleware.audit_log.logger") as mock_logger:
-            await mw.dispatch(req, call_next)
+            await self._call(mw, self._make_scope(path="/auth", method="POST"))
 
         info_calls = [str(c) for c in mock_logger.info.call_args_list]
         assert any("AUTH_ATTEMPT" in c for c in info_calls)
 
+    @pytest.mark.asyncio
+    async def test_username_from_session_is_logged(self):
+        mw = self._make_middleware(Response(content="ok", status_code=200))
+
+        with patch("app.middleware.audit_log.logger") as mock_logger:
+            await self._call(mw, self._make_scope(session_user={"preferred_username": "alice"}))
+
+        info_calls = [str(c) for c in mock_logger.info.call_args_list]
+        assert any("alice" in c for c in info_calls)
+
     @pytest.mark.asyncio
     async def test_ip_included_in_log_when_enabled(self):
-        mw = self._make_middleware(enabled=True, include_ip=True)
-        mock_response = Response(content="ok", status_code=200)
-        call_next = AsyncMock(return_value=mock_response)
-        req = self._make_request()
+        mw = self._make_middleware(Response(content="ok", status_code=200), include_ip=True)
 
         with patch("app.middleware.audit_log.logger") as mock_logger:
-            await mw.dispatch(req, call_next)
+            await self._call(mw, self._make_scope())
 
         info_calls = [str(c) for c in mock_logger.info.call_args_list]
         # 127.0.0.1 should appear somewhere in the log
@@ -335,13 +360,10 @@ class TestAuditLogMiddlewareDispatch:
 
     @pytest.mark.asyncio
     async def test_ip_excluded_from_log_when_disabled(self):
-        mw = self._make_middleware(enabled=True, include_ip=False)
-        mock_response = Response(content="ok", status_code=200)
-        call_next = AsyncMock(return_value=mock_response)
-        req = self._make_request()
+        mw = self._make_middleware(Response(content="ok", status_code=200), include_ip=False)
 
         with patch("app.middleware.audit_log.logger") as mock_logger:
-            await mw.dispatch(req, call_next)
+            await self._call(mw, self._make_scope())
 
         info_calls = [str(c) for c in mock_logger.info.call_args_list]
         assert not any("127.0.0.1" in c for c in info_calls)
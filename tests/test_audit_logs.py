@@ -7,7 +7,8 @@ the REST API endpoints, and the admin viewer page.
 
 import base64
 import json
-import socket
+import queue
+import time
 from datetime import datetime, timezone
 from unittest.mock import MagicMock, Mock, PropertyMock, patch
 
@@ -242,16 +243,41 @@ class TestAuditService:
         until_ts = datetime(2022, 1, 1)
         assert count_events(audit_db, until=until_ts) >= 1
 
-    @patch("app.utils.audit_service._forward_to_siem")
+    @patch("app.utils.audit_service.siem_forwarder")
     @patch("app.utils.audit_service.settings")
-    def test_record_event_siem_enabled(self, mock_settings, mock_forward, audit_db):
-        """record_event starts SIEM forwarding thread when siem is enabled."""
+    def test_record_event_siem_enabled(self, mock_settings, mock_forwarder, audit_db):
+        """record_event queues the event for the SIEM forwarder when SIEM is enabled."""
         mock_settings.audit_siem_enabled = True
         from app.utils.audit_service import record_event
 
         entry = record_event(audit_db, action="login", user="alice")
         assert entry.id is not None
-        mock_forward.assert_called_once()
+        mock_forwarder.submit.assert_called_once()
+        assert mock_forwarder.submit.call_args.args[0]["id"] == entry.id
+
+    @patch("app.utils.audit_service.siem_forwarder")
+    @patch("app.utils.audit_service.settings")
+    def test_record_events_inserts_batch(self, mock_settings, mock_forwarder, audit_db):
+        """record_events returns the rows in input order and queues them for SIEM together."""
+        mock_settings.audit_siem_enabled = True
+        from app.utils.audit_service import record_events
+
+        entries = record_events(
+            audit_db,
+            [
+                {"action": "document.delete", "resource_id": 1, "details": {"bulk": True}},
+                {"action": "document.delete", "resource_id": 2, "user": "bob", "severity": "warning"},
+            ],
+        )
+
+        assert [(entry.resource_id, entry.user, entry.severity) for entry in entries] == [
+            ("1", "system", "info"),
+            ("2", "bob", "warning"),
+        ]
+        assert json.loads(entries[0].details) == {"bulk": True}
+        payloads = list(mock_forwarder.submit_many.call_args.args[0])
+        assert [payload["id"] for payload in payloads] == [entry.id for entry in entries]
+        assert record_events(audit_db, []) == []
 
     @patch("app.utils.audit_service.settings")
     def test_record_event_from_request(self, mock_settings, audit_db):
@@ -288,7 +314,7 @@ class TestAuditService:
 
 @pytest.mark.unit
 class TestSIEMForwarding:
-    """Verify SIEM transport helpers."""
+    """Verify SIEM payloads, transports and the batching forwarder."""
 
     @patch("app.utils.audit_service.settings")
     def test_build_siem_payload(self, mock_settings):
@@ -310,263 +336,215 @@ class TestSIEMForwarding:
         assert "timestamp" in payload
 
     @patch("app.utils.audit_service.settings")
-    @patch("app.utils.audit_service.socket")
-    def test_send_syslog_udp(self, mock_socket_mod, mock_settings):
-        """_send_syslog sends a UDP datagram to the configured host."""
-        mock_settings.audit_siem_syslog_protocol = "udp"
-        mock_settings.audit_siem_syslog_host = "127.0.0.1"
-        mock_settings.audit_siem_syslog_port = 5140
-
-        mock_sock = MagicMock()
-        mock_socket_mod.AF_INET = socket.AF_INET
-        mock_socket_mod.SOCK_DGRAM = socket.SOCK_DGRAM
-        mock_socket_mod.gethostname.return_value = "test-host"
-        mock_socket_mod.socket.return_value.__enter__ = MagicMock(return_value=mock_sock)
-        mock_socket_mod.socket.return_value.__exit__ = MagicMock(return_value=False)
-
-        from app.utils.audit_service import _send_syslog
-
-        _send_syslog({"user": "test", "action": "login", "severity": "info", "timestamp": "2026-01-01T00:00:00"})
-        mock_sock.sendto.assert_called_once()
-
-    @patch("app.utils.audit_service.settings")
-    @patch("app.utils.audit_service.httpx")
-    def test_send_http_generic(self, mock_httpx, mock_settings):
-        """_send_http POSTs JSON to a generic endpoint."""
-        mock_settings.audit_siem_http_url = "https://siem.example.com/ingest"
-        mock_settings.audit_siem_http_token = "my-token"
-        mock_settings.audit_siem_http_custom_headers = ""
-
-        mock_client = MagicMock()
-        mock_resp = MagicMock()
-        mock_resp.status_code = 200
-        mock_client.post.return_value = mock_resp
-        mock_httpx.Client.return_value.__enter__ = MagicMock(return_value=mock_client)
-        mock_httpx.Client.return_value.__exit__ = MagicMock(return_value=False)
-
-        from app.utils.audit_service import _send_http
-
-        _send_http({"user": "test", "action": "login"})
-        mock_client.post.assert_called_once()
-        call_kwargs = mock_client.post.call_args
-        assert call_kwargs.kwargs["headers"]["Authorization"] == "Bearer my-token"
-
-    @patch("app.utils.audit_service.settings")
-    @patch("app.utils.audit_service.httpx")
-    def test_send_http_splunk_hec(self, mock_httpx, mock_settings):
-        """_send_http wraps payload in Splunk HEC envelope when URL contains /services/collector."""
-        mock_settings.audit_siem_http_url = "https://splunk:8088/services/collector/event"
-        mock_settings.audit_siem_http_token = "hec-token"
-        mock_settings.audit_siem_http_custom_headers = ""
-
-        mock_client = MagicMock()
-        mock_resp = MagicMock()
-        mock_resp.status_code = 200
-        mock_client.post.return_value = mock_resp
-        mock_httpx.Client.return_value.__enter__ = MagicMock(return_value=mock_client)
-        mock_httpx.Client.return_value.__exit__ = MagicMock(return_value=False)
-
-        from app.utils.audit_service import _send_http
-
-        _send_http({"user": "test", "action": "login"})
-        call_kwargs = mock_client.post.call_args
-        body = call_kwargs.kwargs["json"]
-        assert "event" in body
-        assert body["sourcetype"] == "docuelevate:audit"
-
-    @patch("app.utils.audit_service.settings")
-    @patch("app.utils.audit_service._send_syslog")
-    def test_forward_to_siem_syslog(self, mock_send_syslog, mock_settings):
-        """_forward_to_siem routes to _send_syslog when transport is syslog."""
-        mock_settings.audit_siem_transport = "syslog"
-        from app.utils.audit_service import _forward_to_siem
-
-        payload = {"user": "test", "action": "login", "severity": "info"}
-        _forward_to_siem(payload)
-        mock_send_syslog.assert_called_once_with(payload)
+    def test_build_siem_payload_no_timestamp(self, mock_settings):
+        """_build_siem_payload uses current UTC time when entry.timestamp is None."""
+        from app.utils.audit_service import _build_siem_payload
 
-    @patch("app.utils.audit_service.settings")
-    @patch("app.utils.audit_service._send_http")
-    def test_forward_to_siem_http(self, mock_send_http, mock_settings):
-        """_forward_to_siem routes to _send_http when transport is http."""
-        mock_settings.audit_siem_transport = "http"
-        from app.utils.audit_service import _forward_to_siem
+        entry = AuditLog(user="admin", action="login", severity="info")
+        entry.timestamp = None  # type: ignore[assignment]
+        payload = _build_siem_payload(entry)
+        assert "timestamp" in payload
+        # Should be a valid ISO timestamp string
+        datetime.fromisoformat(payload["timestamp"])
 
-        payload = {"user": "test", "action": "login", "severity": "info"}
-        _forward_to_siem(payload)
-        mock_send_http.assert_called_once_with(payload)
+    @patch("app.utils.siem_forwarder.socket")
+    def test_syslog_udp_reuses_socket(self, mock_socket_mod):
+        """UDP syslog sends one datagram per event over a single socket."""
+        from app.utils.siem_forwarder import SyslogTransport
 
-    @patch("app.utils.audit_service.settings")
-    def test_forward_to_siem_unknown_transport(self, mock_settings):
-        """_forward_to_siem logs a warning for an unknown transport."""
-        mock_settings.audit_siem_transport = "unknown_proto"
-        from app.utils.audit_service import _forward_to_siem
+        mock_socket_mod.gethostname.return_value = "test-host"
+        transport = SyslogTransport("127.0.0.1", 5140, "udp")
 
-        # Should not raise; just log a warning
-        _forward_to_siem({"user": "test", "action": "login"})
+        transport.send([{"action": "login"}, {"action": "logout"}])
+        transport.send([{"action": "login"}])
 
-    @patch("app.utils.audit_service.settings")
-    def test_forward_to_siem_exception_is_caught(self, mock_settings):
-        """_forward_to_siem catches exceptions from transports and logs them."""
-        mock_settings.audit_siem_transport = "syslog"
-        from app.utils.audit_service import _forward_to_siem
+        mock_socket_mod.socket.assert_called_once_with(mock_socket_mod.AF_INET, mock_socket_mod.SOCK_DGRAM)
+        assert mock_socket_mod.socket.return_value.sendto.call_count == 3
 
-        with patch("app.utils.audit_service._send_syslog", side_effect=OSError("network error")):
-            # Must not propagate
-            _forward_to_siem({"user": "test", "action": "login"})
+    @patch("app.utils.siem_forwarder.socket")
+    def test_syslog_tcp_batches_with_octet_counting(self, mock_socket_mod):
+        """TCP syslog writes a whole batch at once using RFC 5425 octet-counting frames."""
+        from app.utils.siem_forwarder import SyslogTransport
 
-    @patch("app.utils.audit_service.settings")
-    @patch("app.utils.audit_service.socket")
-    def test_send_syslog_tcp(self, mock_socket_mod, mock_settings):
-        """_send_syslog opens a TCP stream socket when protocol is tcp."""
-        mock_settings.audit_siem_syslog_protocol = "tcp"
-        mock_settings.audit_siem_syslog_host = "127.0.0.1"
-        mock_settings.audit_siem_syslog_port = 601
-
-        mock_sock = MagicMock()
-        mock_socket_mod.AF_INET = socket.AF_INET
-        mock_socket_mod.SOCK_STREAM = socket.SOCK_STREAM
         mock_socket_mod.gethostname.return_value = "test-host"
-        mock_socket_mod.socket.return_value.__enter__ = MagicMock(return_value=mock_sock)
-        mock_socket_mod.socket.return_value.__exit__ = MagicMock(return_value=False)
+        sock = mock_socket_mod.create_connection.return_value
+        payloads = [{"action": "login", "severity": "warning"}, {"action": "logout"}]
+
+        SyslogTransport("127.0.0.1", 601, "tcp").send(payloads)
+
+        mock_socket_mod.create_connection.assert_called_once_with(("127.0.0.1", 601), timeout=5)
+        data = sock.sendall.call_args.args[0]
+        frames = []
+        while data:
+            length, _, rest = data.partition(b" ")
+            frames.append(rest[: int(length)])
+            data = rest[int(length) :]
+        assert [frame.split(b" ", 1)[0] for frame in frames] == [b"<132>1", b"<134>1"]
+        assert frames[1].endswith(b'{"action": "logout"}')
+
+    @patch("app.utils.siem_forwarder.socket")
+    def test_syslog_tcp_reconnects_once_after_error(self, mock_socket_mod):
+        """A connection closed by the receiver is re-established before giving up."""
+        from app.utils.siem_forwarder import SyslogTransport
+
+        stale, fresh = MagicMock(), MagicMock()
+        stale.sendall.side_effect = BrokenPipeError()
+        mock_socket_mod.create_connection.side_effect = [stale, fresh]
+
+        SyslogTransport("127.0.0.1", 601, "tcp").send([{"action": "login"}])
+
+        stale.close.assert_called_once()
+        fresh.sendall.assert_called_once()
+
+    @patch("app.utils.siem_forwarder.httpx")
+    def test_http_posts_json_array_per_batch(self, mock_httpx):
+        """Generic HTTP endpoints receive one JSON array per batch over a kept-alive client."""
+        from app.utils.siem_forwarder import HttpTransport
+
+        transport = HttpTransport("https://siem.example.com/ingest", "my-token", "")
+        transport.send([{"action": "login"}, {"action": "logout"}])
+        transport.send([{"action": "view"}])
+
+        client = mock_httpx.Client.return_value
+        mock_httpx.Client.assert_called_once()
+        assert client.post.call_count == 2
+        first = client.post.call_args_list[0].kwargs
+        assert json.loads(first["content"]) == [{"action": "login"}, {"action": "logout"}]
+        assert first["headers"]["Authorization"] == "Bearer my-token"
+
+    @patch("app.utils.siem_forwarder.httpx")
+    def test_http_splunk_hec_envelopes(self, mock_httpx):
+        """Splunk HEC URLs receive newline-separated event envelopes."""
+        from app.utils.siem_forwarder import HttpTransport
+
+        HttpTransport("https://splunk:8088/services/collector/event", "hec-token", "").send(
+            [{"action": "login"}, {"action": "logout"}]
+        )
 
-        from app.utils.audit_service import _send_syslog
+        content = mock_httpx.Client.return_value.post.call_args.kwargs["content"]
+        envelopes = [json.loads(line) for line in content.splitlines()]
+        assert [envelope["event"]["action"] for envelope in envelopes] == ["login", "logout"]
+        assert envelopes[0]["sourcetype"] == "docuelevate:audit"
+
+    def test_http_without_url_builds_no_transport(self):
+        """No transport is created when the HTTP URL is missing."""
+        from app.utils.siem_forwarder import build_transport
+
+        assert build_transport(("http", "", "", "")) is None
+        assert build_transport(("carrier-pigeon",)) is None
+
+    @pytest.mark.parametrize(
+        ("raw", "expected"),
+        [
+            ("X-Tenant-ID: acme, X-Source: audit", {"X-Tenant-ID": "acme", "X-Source": "audit"}),
+            ("Bad Header!: value", {}),
+            ("Authorization: evil-token", {}),
+            ("MalformedHeader", {}),
+        ],
+    )
+    @patch("app.utils.siem_forwarder.httpx")
+    def test_http_custom_headers(self, mock_httpx, raw, expected):
+        """Valid custom headers are added; invalid, protected and malformed entries are skipped."""
+        from app.utils.siem_forwarder import HttpTransport
 
-        _send_syslog({"user": "test", "action": "login", "severity": "info", "timestamp": "2026-01-01T00:00:00"})
-        mock_sock.connect.assert_called_once()
-        mock_sock.sendall.assert_called_once()
+        headers = HttpTransport("https://siem.example.com/ingest", "", raw).headers
 
-    @patch("app.utils.audit_service.settings")
-    @patch("app.utils.audit_service.httpx")
-    def test_send_http_no_url(self, mock_httpx, mock_settings):
-        """_send_http returns early and logs a warning when no URL is configured."""
-        mock_settings.audit_siem_http_url = ""
-        from app.utils.audit_service import _send_http
+        assert headers == {"Content-Type": "application/json", **expected}
 
-        _send_http({"user": "test", "action": "login"})
-        mock_httpx.Client.assert_not_called()
 
-    @patch("app.utils.audit_service.settings")
-    @patch("app.utils.audit_service.httpx")
-    def test_send_http_no_token(self, mock_httpx, mock_settings):
-        """_send_http omits Authorization header when no token is configured."""
-        mock_settings.audit_siem_http_url = "https://siem.example.com/ingest"
-        mock_settings.audit_siem_http_token = ""
-        mock_settings.audit_siem_http_custom_headers = ""
-
-        mock_client = MagicMock()
-        mock_resp = MagicMock()
-        mock_resp.status_code = 200
-        mock_client.post.return_value = mock_resp
-        mock_httpx.Client.return_value.__enter__ = MagicMock(return_value=mock_client)
-        mock_httpx.Client.return_value.__exit__ = MagicMock(return_value=False)
-
-        from app.utils.audit_service import _send_http
-
-        _send_http({"user": "test", "action": "login"})
-        call_kwargs = mock_client.post.call_args
-        assert "Authorization" not in call_kwargs.kwargs["headers"]
+class _RecordingTransport:
+    def __init__(self, fail: bool = False):
+        self.batches: list[list[dict]] = []
+        self.fail = fail
+        self.closed = 0
 
-    @patch("app.utils.audit_service.settings")
-    @patch("app.utils.audit_service.httpx")
-    def test_send_http_custom_headers_valid(self, mock_httpx, mock_settings):
-        """_send_http adds valid custom headers."""
-        mock_settings.audit_siem_http_url = "https://siem.example.com/ingest"
-        mock_settings.audit_siem_http_token = ""
-        mock_settings.audit_siem_http_custom_headers = "X-Tenant-ID: acme, X-Source: audit"
-
-        mock_client = MagicMock()
-        mock_resp = MagicMock()
-        mock_resp.status_code = 200
-        mock_client.post.return_value = mock_resp
-        mock_httpx.Client.return_value.__enter__ = MagicMock(return_value=mock_client)
-        mock_httpx.Client.return_value.__exit__ = MagicMock(return_value=False)
-
-        from app.utils.audit_service import _send_http
-
-        _send_http({"user": "test", "action": "login"})
-        call_kwargs = mock_client.post.call_args
-        headers = call_kwargs.kwargs["headers"]
-        assert headers.get("X-Tenant-ID") == "acme"
-        assert headers.get("X-Source") == "audit"
+    def send(self, payloads):
+        if self.fail:
+            raise OSError("receiver down")
+        self.batches.append(list(payloads))
 
-    @patch("app.utils.audit_service.settings")
-    @patch("app.utils.audit_service.httpx")
-    def test_send_http_custom_headers_invalid_name(self, mock_httpx, mock_settings):
-        """_send_http skips custom headers with invalid names."""
-        mock_settings.audit_siem_http_url = "https://siem.example.com/ingest"
-        mock_settings.audit_siem_http_token = ""
-        mock_settings.audit_siem_http_custom_headers = "Bad Header!: value"
-
-        mock_client = MagicMock()
-        mock_resp = MagicMock()
-        mock_resp.status_code = 200
-        mock_client.post.return_value = mock_resp
-        mock_httpx.Client.return_value.__enter__ = MagicMock(return_value=mock_client)
-        mock_httpx.Client.return_value.__exit__ = MagicMock(return_value=False)
-
-        from app.utils.audit_service import _send_http
-
-        _send_http({"user": "test", "action": "login"})
-        call_kwargs = mock_client.post.call_args
-        headers = call_kwargs.kwargs["headers"]
-        assert "Bad Header!" not in headers
+    def close(self):
+        self.closed += 1
 
-    @patch("app.utils.audit_service.settings")
-    @patch("app.utils.audit_service.httpx")
-    def test_send_http_custom_headers_protected_name(self, mock_httpx, mock_settings):
-        """_send_http skips custom headers that match protected names."""
-        mock_settings.audit_siem_http_url = "https://siem.example.com/ingest"
-        mock_settings.audit_siem_http_token = ""
-        mock_settings.audit_siem_http_custom_headers = "Authorization: evil-token"
-
-        mock_client = MagicMock()
-        mock_resp = MagicMock()
-        mock_resp.status_code = 200
-        mock_client.post.return_value = mock_resp
-        mock_httpx.Client.return_value.__enter__ = MagicMock(return_value=mock_client)
-        mock_httpx.Client.return_value.__exit__ = MagicMock(return_value=False)
-
-        from app.utils.audit_service import _send_http
-
-        _send_http({"user": "test", "action": "login"})
-        call_kwargs = mock_client.post.call_args
-        headers = call_kwargs.kwargs["headers"]
-        # Authorization should not have been overwritten by the custom header
-        assert headers.get("Authorization") != "evil-token"
 
-    @patch("app.utils.audit_service.settings")
-    @patch("app.utils.audit_service.httpx")
-    def test_send_http_custom_headers_no_colon(self, mock_httpx, mock_settings):
-        """_send_http ignores custom header entries that contain no colon separator."""
-        mock_settings.audit_siem_http_url = "https://siem.example.com/ingest"
-        mock_settings.audit_siem_http_token = ""
-        mock_settings.audit_siem_http_custom_headers = "MalformedHeader"
-
-        mock_client = MagicMock()
-        mock_resp = MagicMock()
-        mock_resp.status_code = 200
-        mock_client.post.return_value = mock_resp
-        mock_httpx.Client.return_value.__enter__ = MagicMock(return_value=mock_client)
-        mock_httpx.Client.return_value.__exit__ = MagicMock(return_value=False)
-
-        from app.utils.audit_service import _send_http
-
-        # Should not raise; malformed entry is silently skipped
-        _send_http({"user": "test", "action": "login"})
-        mock_client.post.assert_called_once()
-
-    @patch("app.utils.audit_service.settings")
-    def test_build_siem_payload_no_timestamp(self, mock_settings):
-        """_build_siem_payload uses current UTC time when entry.timestamp is None."""
-        from app.utils.audit_service import _build_siem_payload
-
-        entry = AuditLog(user="admin", action="login", severity="info")
-        entry.timestamp = None  # type: ignore[assignment]
-        payload = _build_siem_payload(entry)
-        assert "timestamp" in payload
-        # Should be a valid ISO timestamp string
-        datetime.fromisoformat(payload["timestamp"])
+@pytest.mark.unit
+class TestSiemForwarder:
+    """Tests for the per-process batching SiemForwarder."""
+
+    def _forwarder(self, transport, **overrides):
+        from app.utils.siem_forwarder import SiemForwarder
+
+        values = {"audit_siem_batch_size": 3, "audit_siem_flush_interval": 60.0, "audit_siem_queue_size": 100}
+        values.update(overrides)
+        patcher = patch.multiple("app.utils.siem_forwarder.settings", **values)
+        patcher.start()
+        forwarder = SiemForwarder(transport_factory=lambda config: transport, config_getter=lambda: ("test",))
+        return forwarder, patcher
+
+    def test_sends_full_batches_and_flushes_remainder(self):
+        """Events go out in batches of audit_siem_batch_size; flush sends the rest."""
+        transport = _RecordingTransport()
+        forwarder, patcher = self._forwarder(transport)
+        try:
+            assert forwarder.submit_many({"n": n} for n in range(7)) == 7
+            assert forwarder.flush()
+            forwarder.close()
+        finally:
+            patcher.stop()
+
+        assert [len(batch) for batch in transport.batches] == [3, 3, 1]
+        assert [event["n"] for batch in transport.batches for event in batch] == list(range(7))
+        assert forwarder.stats()["sent"] == 7
+        assert forwarder.stats()["batches"] == 3
+        assert transport.closed == 1
+
+    def test_partial_batch_is_sent_after_flush_interval(self):
+        """A batch that never fills up is sent once the flush interval elapses."""
+        transport = _RecordingTransport()
+        forwarder, patcher = self._forwarder(transport, audit_siem_batch_size=100, audit_siem_flush_interval=0.05)
+        try:
+            forwarder.submit({"n": 1})
+            deadline = time.monotonic() + 5
+            while not transport.batches and time.monotonic() < deadline:
+                time.sleep(0.01)
+            forwarder.close()
+        finally:
+            patcher.stop()
+
+        assert transport.batches == [[{"n": 1}]]
+
+    def test_full_queue_drops_and_counts(self):
+        """Events beyond the queue capacity are dropped without blocking the caller."""
+        from app.utils.siem_forwarder import SiemForwarder
+
+        forwarder = SiemForwarder(transport_factory=lambda config: _RecordingTransport(), config_getter=lambda: ())
+        forwarder._queue = queue.Queue(maxsize=2)
+        forwarder._ensure_worker = lambda: None  # keep the worker from draining the queue
+
+        started = time.monotonic()
+        accepted = forwarder.submit_many({"n": n} for n in range(50))
+
+        assert accepted == 2
+        assert forwarder.stats()["dropped"] == 48
+        assert time.monotonic() - started < 1.0
+
+    def test_failed_batches_are_counted_and_transport_rebuilt(self):
+        """A send error counts the batch as failed and reconnects for the next batch."""
+        transports = [_RecordingTransport(fail=True), _RecordingTransport()]
+        forwarder, patcher = self._forwarder(None)
+        forwarder._transport_factory = lambda config: transports.pop(0)
+        try:
+            forwarder.submit_many({"n": n} for n in range(3))
+            forwarder.flush()
+            forwarder.submit({"n": 3})
+            forwarder.close()
+        finally:
+            patcher.stop()
+
+        stats = forwarder.stats()
+        assert stats["failed"] == 3
+        assert stats["sent"] == 1
+        assert transports == []
 
 
 # ---------------------------------------------------------------------------
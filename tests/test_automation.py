@@ -155,14 +155,14 @@ class TestDispatchAutomationHooks:
     def test_ignores_unknown_events(self, mocker):
         """Unknown events should be silently ignored."""
         mocker.patch("app.utils.automation_hooks.settings", MagicMock(automation_hooks_enabled=True))
-        mock_get = mocker.patch("app.utils.automation_hooks.get_active_hooks_for_event")
+        mock_get = mocker.patch("app.utils.automation_hooks.get_cached_hooks_for_event")
         dispatch_automation_hooks("bad.event", {})
         mock_get.assert_not_called()
 
     def test_skips_when_disabled(self, mocker):
         """No hooks should fire when automation_hooks_enabled is False."""
         mocker.patch("app.utils.automation_hooks.settings", MagicMock(automation_hooks_enabled=False))
-        mock_get = mocker.patch("app.utils.automation_hooks.get_active_hooks_for_event")
+        mock_get = mocker.patch("app.utils.automation_hooks.get_cached_hooks_for_event")
         dispatch_automation_hooks("document.uploaded", {"file_id": 1})
         mock_get.assert_not_called()
 
@@ -170,7 +170,7 @@ class TestDispatchAutomationHooks:
         """A Celery task is queued for each matching hook."""
         mocker.patch("app.utils.automation_hooks.settings", MagicMock(automation_hooks_enabled=True))
         mocker.patch(
-            "app.utils.automation_hooks.get_active_hooks_for_event",
+            "app.utils.automation_hooks.get_cached_hooks_for_event",
             return_value=[
                 {"id": 1, "target_url": "https://hooks.zapier.com/a", "secret": "s", "events": ["document.uploaded"]},
                 {"id": 2, "target_url": "https://hooks.zapier.com/b", "secret": None, "events": ["document.uploaded"]},
@@ -185,7 +185,7 @@ class TestDispatchAutomationHooks:
     def test_no_tasks_when_no_hooks(self, mocker):
         """No tasks should be queued when there are no matching hooks."""
         mocker.patch("app.utils.automation_hooks.settings", MagicMock(automation_hooks_enabled=True))
-        mocker.patch("app.utils.automation_hooks.get_active_hooks_for_event", return_value=[])
+        mocker.patch("app.utils.automation_hooks.get_cached_hooks_for_event", return_value=[])
         mock_task = mocker.patch("app.tasks.automation_tasks.deliver_automation_hook_task.delay")
 
         dispatch_automation_hooks("document.uploaded", {})
@@ -237,7 +237,7 @@ class TestWebhookDispatchIntegration:
 
     def test_dispatch_triggers_automation_hooks(self, mocker):
         """dispatch_webhook_event should also call dispatch_automation_hooks."""
-        mocker.patch("app.utils.webhook.get_active_webhooks_for_event", return_value=[])
+        mocker.patch("app.utils.webhook.get_cached_webhooks_for_event", return_value=[])
         mock_auto = mocker.patch("app.utils.automation_hooks.dispatch_automation_hooks")
 
         from app.utils.webhook import dispatch_webhook_event
@@ -0,0 +1,219 @@
+"""Tests for the pipeline benchmark suite (benchmarks/)."""
+
+import base64
+import json
+import struct
+from email import message_from_bytes
+from types import SimpleNamespace
+
+import pytest
+import requests
+from PIL import Image
+
+from benchmarks.compare import compare
+from benchmarks.corpus import MANIFEST_NAME, generate_corpus, load_corpus
+from benchmarks.metrics import StageRecorder, percentile
+from benchmarks.standins import StandInServices, embed, filter_matches, meili_filter_matches
+
+
+@pytest.fixture
+def services():
+    with StandInServices() as running:
+        yield running
+
+
+@pytest.mark.unit
+class TestCorpus:
+    """Tests for the synthetic corpus generator."""
+
+    def test_generates_every_kind_reproducibly(self, tmp_path):
+        """The same seed reproduces byte-identical files and a complete manifest."""
+        first = generate_corpus(tmp_path / "a", scale=1, seed=7, max_pages=2, queries=3)
+        second = generate_corpus(tmp_path / "b", scale=1, seed=7, max_pages=2, queries=3)
+
+        assert [document["kind"] for document in first["documents"]] == [
+            "digital_pdf",
+            "scanned_pdf",
+            "multipage_tiff",
+            "email",
+        ]
+        assert [d["sha256"] for d in first["documents"]] == [d["sha256"] for d in second["documents"]]
+        assert len(first["queries"]) == 3
+        assert load_corpus(tmp_path / "a")["documents"] == first["documents"]
+
+    def test_documents_have_the_expected_structure(self, tmp_path):
+        """TIFFs carry one frame per page, e-mails three attachments, scans their ground truth."""
+        manifest = generate_corpus(tmp_path, scale=1, seed=3, max_pages=3, queries=1)
+        by_kind = {document["kind"]: document for document in manifest["documents"]}
+
+        with Image.open(tmp_path / by_kind["multipage_tiff"]["path"]) as tiff:
+            assert tiff.n_frames == by_kind["multipage_tiff"]["pages"]
+        message = message_from_bytes((tmp_path / by_kind["email"]["path"]).read_bytes())
+        assert sorted(part.get_content_type() for part in message.walk() if part.get_filename()) == [
+            "application/pdf",
+            "image/png",
+            "text/html",
+        ]
+        assert list(manifest["ocr_text"]) == [by_kind["scanned_pdf"]["sha256"]]
+
+    def test_unknown_kind_and_manifest_version_are_rejected(self, tmp_path):
+        with pytest.raises(ValueError, match="Unknown corpus kinds"):
+            generate_corpus(tmp_path, kinds=("audio",))
+        (tmp_path / MANIFEST_NAME).write_text(json.dumps({"version": 99}))
+        with pytest.raises(ValueError, match="Unsupported"):
+            load_corpus(tmp_path)
+
+
+@pytest.mark.unit
+class TestStandIns:
+    """Tests for the local service stand-ins."""
+
+    def test_qdrant_filters(self):
+        """must/should/must_not, match value/any and is_null follow Qdrant semantics."""
+        payload = {"document_id": 4, "owner_id": None, "is_private": False}
+        assert filter_matches(payload, {"must": [{"key": "document_id", "match": {"any": [3, 4]}}]})
+        assert filter_matches(
+            payload, {"should": [{"is_null": {"key": "owner_id"}}, {"key": "x", "match": {"value": 1}}]}
+        )
+        assert not filter_matches(payload, {"must_not": [{"key": "is_private", "match": {"value": False}}]})
+        assert not filter_matches(payload, {"must": [{"key": "is_private", "match": {"value": 0}}]})
+        assert filter_matches(payload, {"must": [{"should": [{"key": "document_id", "match": {"value": 4}}]}]})
+
+    def test_meilisearch_filters(self):
+        document = {"file_id": 5, "tags": ["a", "b"], "created_at_ts": 100, "mime_type": "application/pdf"}
+        assert meili_filter_matches(document, 'file_id IN [1, 5] AND mime_type = "application/pdf"')
+        assert meili_filter_matches(document, 'tags = "b" AND created_at_ts >= 50')
+        assert not meili_filter_matches(document, "created_at_ts < 50")
+
+    def test_embeddings_are_normalised_and_content_sensitive(self):
+        vector = embed("invoice from acme")
+        assert sum(value * value for value in vector) == pytest.approx(1.0)
+        assert vector == embed("Invoice from ACME")
+        assert vector != embed("contract with globex")
+
+    def test_openai_routes(self, services):
+        """Chat answers are JSON for every pipeline prompt; embeddings honour base64 encoding."""
+        chat = requests.post(
+            f"{services.openai_url}/chat/completions",
+            json={"model": "m", "messages": [{"role": "user", "content": "Invoice No. 123-4\nDate: 2024-02-03"}]},
+            timeout=5,
+        ).json()
+        answer = json.loads(chat["choices"][0]["message"]["content"])
+        assert answer["document_type"] == "Invoice"
+        assert answer["reference_number"] == "123-4"
+        assert answer["is_good_quality"] is True
+
+        response = requests.post(
+            f"{services.openai_url}/embeddings",
+            json={"model": "m", "input": ["a b", "c"], "encoding_format": "base64"},
+            timeout=5,
+        ).json()
+        raw = base64.b64decode(response["data"][1]["embedding"])
+        assert list(struct.unpack(f"<{len(raw) // 4}f", raw)) == pytest.approx(embed("c"))
+        assert services.calls == {"llm chat.completions": 1, "embedding embeddings": 1}
+
+    def test_qdrant_round_trip_with_application_client(self, services, monkeypatch):
+        """QdrantVectorIndex can index, search and delete against the stand-in."""
+        from app.utils import vector_index
+
+        monkeypatch.setattr(vector_index.settings, "vector_index_url", services.qdrant_url)
+        monkeypatch.setattr(vector_index.settings, "vector_index_api_key", None)
+        monkeypatch.setattr(vector_index, "generate_embeddings", lambda texts: [embed(text) for text in texts])
+        monkeypatch.setattr(
+            vector_index,
+            "chunk_text",
+            lambda text: [vector_index.TextChunk(index=0, text=text, token_start=0, token_end=len(text.split()))],
+        )
+        index = vector_index.QdrantVectorIndex()
+        for file_id, text in ((1, "acme invoice total"), (2, "globex contract terms")):
+            record = SimpleNamespace(
+                id=file_id,
+                ocr_text=text,
+                owner_id=None,
+                filehash=f"h{file_id}",
+                original_filename=f"{file_id}.pdf",
+                document_title=None,
+                mime_type="application/pdf",
+            )
+            assert index.index_document(record) == 1
+
+        hits = index.search("globex contract", limit=1, include_unowned=True)
+        assert hits[0]["payload"]["document_id"] == 2
+        index.delete_documents([2], owner_id=None)
+        assert index.status()["points_count"] == 1
+
+    def test_meilisearch_round_trip_with_client(self, services):
+        """The meilisearch client can create an index, add documents and search."""
+        import meilisearch
+
+        client = meilisearch.Client(services.meilisearch_url)
+        client.wait_for_task(client.create_index("documents", {"primaryKey": "file_id"}).task_uid)
+        index = client.get_index("documents")
+        task = index.add_documents([{"file_id": 1, "ocr_text": "acme invoice"}, {"file_id": 2, "ocr_text": "globex"}])
+        assert client.wait_for_task(task.task_uid).status == "succeeded"
+
+        result = index.search("invoice", {"filter": "file_id IN [1, 2]"})
+        assert [hit["file_id"] for hit in result["hits"]] == [1]
+
+    def test_gotenberg_returns_pdf(self, services):
+        response = requests.post(
+            f"{services.gotenberg_url}/forms/chromium/convert/html",
+            files={"files": ("index.html", b"<p>Hello</p>", "text/html")},
+            timeout=5,
+        )
+        assert response.status_code == 200
+        assert response.content.startswith(b"%PDF")
+
+
+@pytest.mark.unit
+class TestMetrics:
+    """Tests for StageRecorder and the result comparison."""
+
+    def test_percentile_interpolates(self):
+        assert percentile([1, 2, 3, 4], 50) == 2.5
+        assert percentile([5], 99) == 5
+        assert percentile([], 95) == 0.0
+
+    def test_recorder_records_self_time_and_queries(self, monkeypatch):
+        """Nested eager tasks are charged only their own time; queries go to the innermost task."""
+        clock = iter([0.0, 1.0, 3.0, 4.0])
+        monkeypatch.setattr("benchmarks.metrics.time.perf_counter", lambda: next(clock))
+        recorder = StageRecorder()
+        parent, child = SimpleNamespace(name="app.tasks.parent"), SimpleNamespace(name="app.tasks.child")
+
+        recorder._on_prerun(task=parent)
+        recorder._on_query()
+        recorder._on_prerun(task=child)
+        recorder._on_query()
+        recorder._on_query()
+        recorder._on_postrun(task=child)
+        recorder._on_postrun(task=parent)
+        recorder._on_query()
+
+        stages = recorder.stages()
+        assert stages["child"]["mean_ms"] == 2000
+        assert stages["parent"]["mean_ms"] == 2000
+        assert stages["child"]["queries"] == 2
+        assert stages["parent"]["queries_per_call"] == 1
+        assert stages["(outside tasks)"]["queries"] == 1
+
+    def test_compare_flags_regressions_in_the_right_direction(self):
+        def result(throughput, p50, queries):
+            return {
+                "ingest": {"documents_per_second": throughput, "queries_per_document": queries},
+                "stages": {
+                    "ocr": {"p50_ms": p50, "queries_per_call": 2},
+                    "tiny": {"p50_ms": 1, "queries_per_call": None},
+                },
+            }
+
+        rows = {row["metric"]: row for row in compare(result(10, 100, 50), result(8, 90, 60), threshold=10)}
+        assert rows["ingest.documents_per_second"]["regressed"]
+        assert not rows["stage.ocr.p50_ms"]["regressed"]
+        assert rows["ingest.queries_per_document"]["regressed"]
+
+        rows = {
+            row["metric"]: row
+            for row in compare(result(10, 100, 50), result(10, 100, 50) | {"stages": {"tiny": {"p50_ms": 3}}})
+        }
+        assert not rows["stage.tiny.p50_ms"]["regressed"]
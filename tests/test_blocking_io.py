@@ -0,0 +1,73 @@
+"""Tests for the upload I/O thread offload (app/utils/blocking_io.py)."""
+
+import asyncio
+import contextvars
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+
+from app.utils.blocking_io import run_blocking
+
+_request_id: contextvars.ContextVar[str] = contextvars.ContextVar("request_id", default="-")
+
+
+@pytest.mark.unit
+class TestRunBlocking:
+    """Tests for run_blocking."""
+
+    @pytest.mark.asyncio
+    async def test_runs_on_the_pool_with_the_callers_context(self):
+        _request_id.set("req-1")
+
+        def work(value, *, suffix):
+            return threading.current_thread().name, _request_id.get(), value + suffix
+
+        thread_name, request_id, result = await run_blocking(work, "a", suffix="b")
+
+        assert thread_name.startswith("upload-io")
+        assert (request_id, result) == ("req-1", "ab")
+
+    @pytest.mark.asyncio
+    async def test_event_loop_keeps_running_during_blocking_work(self):
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        task = asyncio.create_task(ticker())
+        await run_blocking(time.sleep, 0.2)
+        task.cancel()
+
+        assert ticks >= 5
+
+
+@pytest.mark.unit
+class TestUploadEndpointsOffload:
+    """The upload endpoints keep hashing and enqueueing off the event loop."""
+
+    def test_ui_upload_hashes_and_enqueues_on_the_pool(self, client):
+        threads = {}
+
+        def fake_hash(path):
+            threads["hash"] = threading.current_thread().name
+            return "0" * 64
+
+        def fake_delay(*args, **kwargs):
+            threads["enqueue"] = threading.current_thread().name
+            return type("Task", (), {"id": "task-1"})()
+
+        with (
+            patch("app.api.files.hash_file", side_effect=fake_hash),
+            patch("app.api.files.process_document.delay", side_effect=fake_delay),
+        ):
+            response = client.post("/api/ui-upload", files={"file": ("doc.pdf", b"%PDF-1.4 test", "application/pdf")})
+
+        assert response.status_code == 200, response.text
+        assert response.json()["task_id"] == "task-1"
+        assert threads["hash"].startswith("upload-io")
+        assert threads["enqueue"].startswith("upload-io")
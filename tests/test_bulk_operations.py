@@ -9,7 +9,15 @@ from unittest.mock import MagicMock, patch
 import pytest
 from fastapi.testclient import TestClient
 
-from app.models import BulkOperation, FileProcessingStep, FileRecord
+from app.models import BulkOperation, FileProcessingStep, FileRecord, LLMResponseCache
+
+
+def _cache_response(db_session, file_id, key):
+    """Store a cached LLM response computed for *file_id*."""
+    db_session.add(
+        LLMResponseCache(cache_key=key, file_id=file_id, stage="extract_metadata", model="m", response="secret")
+    )
+    db_session.commit()
 
 
 @pytest.mark.integration
@@ -49,6 +57,23 @@ class TestSingleFileOperations:
         data = response.json()
         assert "not found" in data["detail"].lower()
 
+    def test_single_file_delete_purges_cached_llm_responses(self, client: TestClient, db_session):
+        """Cached LLM output derived from the document must not outlive it."""
+        kept = FileRecord(filehash="keep", original_filename="keep.pdf", local_filename="/tmp/keep.pdf", file_size=1)
+        doomed = FileRecord(
+            filehash="doomed", original_filename="doom.pdf", local_filename="/tmp/doom.pdf", file_size=1
+        )
+        db_session.add_all([kept, doomed])
+        db_session.commit()
+        _cache_response(db_session, doomed.id, "a" * 64)
+        _cache_response(db_session, kept.id, "b" * 64)
+
+        response = client.delete(f"/api/files/{doomed.id}")
+        assert response.status_code == 200
+
+        db_session.expire_all()
+        assert [row.file_id for row in db_session.query(LLMResponseCache)] == [kept.id]
+
 
 @pytest.mark.integration
 @pytest.mark.requires_db
@@ -111,6 +136,40 @@ class TestBulkOperations:
             file_record = db_session.query(FileRecord).filter(FileRecord.id == file_id).first()
             assert file_record is None
 
+    def test_bulk_delete_purges_cached_llm_responses(self, client: TestClient, db_session):
+        """Bulk deletion removes every cached LLM response of the deleted documents."""
+        records = [
+            FileRecord(
+                filehash=f"cached{i}", original_filename=f"c{i}.pdf", local_filename=f"/tmp/c{i}.pdf", file_size=1
+            )
+            for i in range(3)
+        ]
+        db_session.add_all(records)
+        db_session.commit()
+        for index, record in enumerate(records):
+            _cache_response(db_session, record.id, str(index) * 64)
+
+        response = client.post("/api/files/bulk-delete", json=[records[0].id, records[1].id])
+        assert response.status_code == 200
+
+        db_session.expire_all()
+        assert [row.file_id for row in db_session.query(LLMResponseCache)] == [records[2].id]
+
+    def test_bulk_delete_warns_when_audit_events_cannot_be_written(self, client: TestClient, db_session):
+        """A failing audit write does not block the deletion but is logged as a warning."""
+        record = FileRecord(filehash="audit", original_filename="a.pdf", local_filename="/tmp/a.pdf", file_size=1)
+        db_session.add(record)
+        db_session.commit()
+
+        with (
+            patch("app.api.files.record_events_from_request", side_effect=RuntimeError("audit down")),
+            patch("app.api.files.logger") as mock_logger,
+        ):
+            response = client.post("/api/files/bulk-delete", json=[record.id])
+
+        assert response.status_code == 200
+        mock_logger.warning.assert_any_call("Failed to write document deletion audit events", exc_info=True)
+
     def test_bulk_delete_empty_list(self, client: TestClient, db_session):
         """Test bulk deletion with empty list."""
         response = client.post("/api/files/bulk-delete", json=[])
@@ -0,0 +1,143 @@
+"""Tests for the content-addressed backup chunk store (app/utils/chunk_store.py)."""
+
+import io
+import os
+import time
+
+import pytest
+
+from app.utils.chunk_store import ChunkStore, fixed_chunks, line_chunks
+
+
+def _lines(count, prefix=b"INSERT INTO t VALUES"):
+    return [b"%s(%d, 'row %d');\n" % (prefix, n, n) for n in range(count)]
+
+
+@pytest.mark.unit
+class TestChunkers:
+    """Tests for fixed_chunks and line_chunks."""
+
+    def test_fixed_chunks(self):
+        """Files are split into fixed-size blocks."""
+        assert [len(block) for block in fixed_chunks(io.BytesIO(b"x" * 10), size=4)] == [4, 4, 2]
+
+    def test_line_chunks_reassemble_and_respect_bounds(self):
+        """Chunks concatenate to the input, cut at line ends and stay within max_size."""
+        lines = _lines(5000)
+        chunks = list(line_chunks(lines, min_size=1024, max_size=16 * 1024, bits=6))
+
+        assert b"".join(chunks) == b"".join(lines)
+        assert len(chunks) > 1
+        assert all(len(chunk) <= 16 * 1024 for chunk in chunks)
+        assert all(chunk.endswith(b"\n") for chunk in chunks[:-1])
+
+    def test_line_chunks_resynchronise_after_insert(self):
+        """An inserted line only changes the chunks around it, not every later chunk."""
+        lines = _lines(5000)
+        edited = lines[:100] + [b"INSERT INTO t VALUES(-1, 'new');\n"] + lines[100:]
+
+        before = set(line_chunks(lines, min_size=1024, max_size=64 * 1024, bits=6))
+        after = list(line_chunks(edited, min_size=1024, max_size=64 * 1024, bits=6))
+
+        changed = [chunk for chunk in after if chunk not in before]
+        assert len(changed) <= 2
+        assert len(after) > 20
+
+    def test_line_chunks_split_oversized_lines(self):
+        """A single line longer than max_size is split."""
+        chunks = list(line_chunks([b"a" * 25], min_size=1, max_size=10))
+        assert [len(chunk) for chunk in chunks] == [10, 10, 5]
+
+
+@pytest.mark.unit
+class TestChunkStore:
+    """Tests for ChunkWriter, manifests and garbage collection."""
+
+    def test_writer_deduplicates_and_round_trips(self, tmp_path):
+        """Identical chunks are stored once; compressible and incompressible data both round-trip."""
+        store = ChunkStore(tmp_path)
+        random_block = os.urandom(4096)
+        with store.writer(threads=2) as writer:
+            first = writer.put_stream([b"a" * 4096, random_block, b"a" * 4096])
+
+        assert writer.new_chunks == 2
+        assert writer.reused_chunks == 1
+        assert writer.logical_bytes == 3 * 4096
+        assert writer.stored_bytes < 4096 + 4096 + 2
+        assert b"".join(store.iter_entry(first)) == b"a" * 4096 + random_block + b"a" * 4096
+
+        with store.writer() as writer:
+            second = writer.put_stream([random_block])
+        assert writer.new_chunks == 0
+        assert second["chunks"] == [first["chunks"][1]]
+
+    def test_corrupt_chunk_is_rejected(self, tmp_path):
+        """Reading a chunk whose content does not match its digest raises ValueError."""
+        store = ChunkStore(tmp_path)
+        with store.writer() as writer:
+            digest = writer.put(b"payload" * 100)
+        store.chunk_path(digest).write_bytes(b"r" + b"tampered")
+
+        with pytest.raises(ValueError, match="corrupt"):
+            store.read_chunk(digest)
+        with pytest.raises(ValueError, match="missing"):
+            store.read_chunk("0" * 64)
+
+    def test_manifest_round_trip_and_version_check(self, tmp_path):
+        """Manifests are written atomically and unknown versions are refused."""
+        store = ChunkStore(tmp_path)
+        path = store.write_manifest("snap.manifest.json.gz", {"database": None, "documents": {}})
+
+        assert store.load_manifest(path)["version"] == 1
+        assert store.manifests() == [path]
+        (tmp_path / "manifests" / "bad.manifest.json.gz").write_bytes(b"not gzip")
+        with pytest.raises(ValueError):
+            store.referenced_chunks()
+
+    def test_collect_garbage_keeps_referenced_and_recent_chunks(self, tmp_path):
+        """Only unreferenced chunks older than the grace period are deleted."""
+        store = ChunkStore(tmp_path)
+        with store.writer() as writer:
+            kept = writer.put_stream([b"kept" * 100])
+            orphan = writer.put(b"orphan" * 100)
+            recent = writer.put(b"recent" * 100)
+        store.write_manifest("snap.manifest.json.gz", {"database": {**kept, "backend": "sqlite"}, "documents": {}})
+        old = time.time() - 7 * 24 * 3600
+        for digest in (*kept["chunks"], orphan):
+            os.utime(store.chunk_path(digest), (old, old))
+
+        result = store.collect_garbage()
+
+        assert result["deleted"] == 1
+        assert not store.chunk_path(orphan).exists()
+        assert store.chunk_path(kept["chunks"][0]).exists()
+        assert store.chunk_path(recent).exists()
+        assert store.size_bytes() > 0
+
+    def test_reuse_refreshes_carried_over_chunks(self, tmp_path):
+        """Chunks carried into a new snapshot survive a collection that runs before its manifest exists."""
+        store = ChunkStore(tmp_path)
+        with store.writer() as writer:
+            entry = writer.put_stream([b"carried" * 100])
+        old = time.time() - 7 * 24 * 3600
+        os.utime(store.chunk_path(entry["chunks"][0]), (old, old))
+
+        with store.writer() as writer:
+            assert writer.reuse(entry) is True
+        result = store.collect_garbage()
+
+        assert result["deleted"] == 0
+        assert store.chunk_path(entry["chunks"][0]).exists()
+        assert writer.reused_chunks == 1
+        assert writer.logical_bytes == entry["size"]
+
+    def test_reuse_reports_missing_chunks(self, tmp_path):
+        """An entry whose chunk has disappeared cannot be reused."""
+        store = ChunkStore(tmp_path)
+        with store.writer() as writer:
+            entry = writer.put_stream([b"gone" * 100])
+        store.chunk_path(entry["chunks"][0]).unlink()
+
+        with store.writer() as writer:
+            assert writer.reuse(entry) is False
+        assert writer.reused_chunks == 0
@@ -363,6 +363,149 @@ class TestUploadCommand:
         assert result.exit_code == 1
 
 
+@pytest.mark.unit
+class TestResumableUpload:
+    def test_chunks_resume_after_a_dropped_connection(self, tmp_path):
+        f = tmp_path / "scan.pdf"
+        f.write_bytes(b"x" * (3 * 1024 * 1024))
+        created = _make_response(
+            201,
+            json_data={"upload_id": "u1", "upload_offset": 0, "intake": None},
+            headers={"Location": "/api/intake/uploads/u1"},
+        )
+        finalized = _make_response(202, json_data={"intake_id": 4, "task_id": "t-4", "duplicate": False})
+        session = MagicMock()
+        session.post.side_effect = [created, finalized]
+        session.patch.side_effect = [
+            _make_response(204, headers={"Upload-Offset": str(2 * 1024 * 1024)}),
+            req_module.ConnectionError("reset"),
+            _make_response(204, headers={"Upload-Offset": str(3 * 1024 * 1024)}),
+        ]
+        session.head.return_value = _make_response(200, headers={"Upload-Offset": str(2 * 1024 * 1024)})
+        with patch("app.cli.requests.Session", return_value=session), patch("app.cli.time.sleep"):
+            result = CliRunner().invoke(
+                cli, ["--token", "de_tok", "--format", "json", "upload", "--resumable", "--chunk-size", "2", str(f)]
+            )
+
+        assert result.exit_code == 0, result.output
+        assert [call.kwargs["headers"]["Upload-Offset"] for call in session.patch.call_args_list] == [
+            "0",
+            str(2 * 1024 * 1024),
+            str(2 * 1024 * 1024),
+        ]
+        assert session.post.call_args_list[0].kwargs["json"]["idempotency_key"].startswith("cli:")
+        assert session.post.call_args_list[1].args[0] == "http://localhost:8000/api/intake/uploads/u1/finalize"
+        assert "t-4" in result.output
+
+    def test_content_already_taken_in_is_not_sent(self, tmp_path):
+        f = tmp_path / "scan.pdf"
+        f.write_bytes(b"%PDF")
+        existing = _make_response(200, json_data={"upload_id": None, "intake": {"intake_id": 9, "duplicate": True}})
+        session = MagicMock()
+        session.post.return_value = existing
+        with patch("app.cli.requests.Session", return_value=session):
+            result = CliRunner().invoke(cli, ["--token", "de_tok", "--format", "json", "upload", "--resumable", str(f)])
+
+        assert result.exit_code == 0, result.output
+        session.patch.assert_not_called()
+        assert '"status": "duplicate"' in result.output
+
+
+@pytest.mark.unit
+class TestBulkUploadCommand:
+    @staticmethod
+    def _run(tmp_path, known=None, post=None, extra_args=(), deduplication_enabled=True):
+        session = MagicMock()
+        session.post.side_effect = post or (lambda *a, **kw: _make_response(200, json_data={"task_id": "t"}))
+        check = _make_response(200, json_data={"known": known or {}, "deduplication_enabled": deduplication_enabled})
+        manifest = tmp_path / "manifest.jsonl"
+        with (
+            patch("app.cli._api", return_value=check) as api,
+            patch("app.cli.requests.Session", return_value=session),
+            patch("app.cli.time.sleep") as sleep,
+        ):
+            result = CliRunner().invoke(
+                cli,
+                ["--token", "de_tok", "--format", "json", "bulk-upload", "--manifest", str(manifest), *extra_args]
+                + [str(tmp_path / "docs")],
+            )
+        return result, api, session, sleep, manifest
+
+    @staticmethod
+    def _docs(tmp_path, **files):
+        folder = tmp_path / "docs"
+        (folder / "sub").mkdir(parents=True)
+        for name, content in files.items():
+            (folder / name.replace("__", "/")).write_bytes(content)
+
+    def test_known_and_repeated_contents_are_not_uploaded(self, tmp_path):
+        import hashlib
+
+        self._docs(tmp_path, **{"a.pdf": b"A", "b.pdf": b"B", "sub__b-copy.pdf": b"B", ".hidden": b"H"})
+        known = {hashlib.sha256(b"A").hexdigest(): 7}
+
+        result, api, session, _, manifest = self._run(tmp_path, known=known)
+
+        assert result.exit_code == 0, result.output
+        assert sorted(api.call_args.kwargs["json"]["hashes"]) == sorted(
+            hashlib.sha256(content).hexdigest() for content in (b"A", b"B")
+        )
+        assert session.post.call_count == 1
+        summary = json.loads(result.output[result.output.index("{") : result.output.rindex("}") + 1])
+        assert (summary["uploaded"], summary["known"], summary["duplicate"], summary["failed"]) == (1, 1, 1, 0)
+        statuses = [json.loads(line)["status"] for line in manifest.read_text().splitlines()]
+        assert statuses.count("hashed") == 3
+
+    def test_known_contents_are_uploaded_when_server_deduplication_is_off(self, tmp_path):
+        import hashlib
+
+        self._docs(tmp_path, **{"a.pdf": b"A", "b.pdf": b"B"})
+        known = {hashlib.sha256(b"A").hexdigest(): 7}
+
+        result, _, session, _, _ = self._run(tmp_path, known=known, deduplication_enabled=False)
+
+        assert result.exit_code == 0, result.output
+        assert session.post.call_count == 2
+        assert "deduplication is disabled" in result.output
+        summary = json.loads(result.output[result.output.index("{") : result.output.rindex("}") + 1])
+        assert (summary["uploaded"], summary["known"]) == (2, 0)
+
+    def test_rerun_resumes_from_the_manifest(self, tmp_path):
+        self._docs(tmp_path, **{"a.pdf": b"A", "b.pdf": b"B"})
+        self._run(tmp_path)
+
+        result, api, session, _, _ = self._run(tmp_path)
+
+        assert result.exit_code == 0
+        session.post.assert_not_called()
+        api.assert_not_called()
+        assert "2 already done" in result.output
+
+    def test_rate_limits_are_retried_after_the_server_delay(self, tmp_path):
+        self._docs(tmp_path, **{"a.pdf": b"A"})
+        responses = iter(
+            [_make_response(429, headers={"Retry-After": "3"}), _make_response(200, json_data={"task_id": "t"})]
+        )
+
+        result, _, session, sleep, _ = self._run(tmp_path, post=lambda *a, **kw: next(responses))
+
+        assert result.exit_code == 0
+        assert session.post.call_count == 2
+        sleep.assert_called_once_with(3.0)
+
+    def test_failures_exit_non_zero_and_are_retried_next_run(self, tmp_path):
+        self._docs(tmp_path, **{"a.pdf": b"A"})
+        failing = lambda *a, **kw: _make_response(415, json_data={"detail": "Unsupported"})  # noqa: E731
+
+        result, _, _, _, manifest = self._run(tmp_path, post=failing)
+        assert result.exit_code == 1
+        assert json.loads(manifest.read_text().splitlines()[-1])["detail"] == "Unsupported"
+
+        result, _, session, _, _ = self._run(tmp_path)
+        assert result.exit_code == 0
+        assert session.post.call_count == 1
+
+
 @pytest.mark.unit
 class TestDownloadCommand:
     def test_download_with_explicit_output(self, tmp_path):
@@ -118,6 +118,12 @@ class TestConfigurationValidation:
         assert config.effective_celery_broker_url == "redis://broker:6379/0"
         assert config.effective_celery_result_backend == "redis://results-primary:6379/0"
 
+    @pytest.mark.parametrize("field", ["audit_siem_batch_size", "audit_siem_flush_interval", "audit_siem_queue_size"])
+    def test_siem_batching_settings_must_be_positive(self, field):
+        """Zero would make the SIEM queue unbounded or the forwarder busy-loop."""
+        with pytest.raises(ValidationError, match=field):
+            Settings(database_url="sqlite:///test.db", auth_enabled=False, **{field: 0})
+
 
 @pytest.mark.unit
 class TestBuildMetadataConfiguration:
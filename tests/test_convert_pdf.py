@@ -1,5 +1,6 @@
 """Comprehensive unit tests for app/tasks/convert_to_pdf.py module."""
 
+import io
 from unittest.mock import MagicMock, mock_open, patch
 
 import pytest
@@ -9,6 +10,7 @@ from app.tasks.convert_to_pdf import (
     _detect_extension,
     _detect_mime_type,
     _detect_mime_type_from_magic,
+    _is_local_image,
     convert_to_pdf,
 )
 
@@ -191,7 +193,7 @@ class TestConvertToPdf:
         # Mock successful Gotenberg response
         mock_response = MagicMock()
         mock_response.status_code = 200
-        mock_response.content = b"%PDF-1.4 converted content"
+        mock_response.iter_content.return_value = [b"%PDF-1.4 converted content"]
         mock_post.return_value = mock_response
 
         # Mock file type detection
@@ -268,10 +270,10 @@ class TestConvertToPdf:
     @patch("app.tasks.convert_to_pdf.log_task_progress")
     @patch("builtins.open", new_callable=mock_open, read_data=b"image content")
     def test_converts_image_file(self, mock_file, mock_log_progress, mock_post, mock_process):
-        """Test conversion of image file."""
+        """Test images go to Gotenberg when local conversion is disabled."""
         mock_response = MagicMock()
         mock_response.status_code = 200
-        mock_response.content = b"%PDF-1.4 converted image"
+        mock_response.iter_content.return_value = [b"%PDF-1.4 converted image"]
         mock_post.return_value = mock_response
 
         with patch("app.tasks.convert_to_pdf._detect_mime_type") as mock_detect_mime:
@@ -279,6 +281,7 @@ class TestConvertToPdf:
                 with patch("app.tasks.convert_to_pdf.settings") as mock_settings:
                     mock_settings.gotenberg_url = "http://gotenberg:3000"
                     mock_settings.http_request_timeout = 60
+                    mock_settings.local_image_conversion_enabled = False
                     mock_detect_mime.return_value = ("image/jpeg", None)
                     mock_detect_ext.return_value = ".jpg"
 
@@ -299,7 +302,7 @@ class TestConvertToPdf:
         """Test conversion of HTML file."""
         mock_response = MagicMock()
         mock_response.status_code = 200
-        mock_response.content = b"%PDF-1.4 converted html"
+        mock_response.iter_content.return_value = [b"%PDF-1.4 converted html"]
         mock_post.return_value = mock_response
 
         with patch("app.tasks.convert_to_pdf._detect_mime_type") as mock_detect_mime:
@@ -326,7 +329,7 @@ class TestConvertToPdf:
         """Test conversion of Markdown file."""
         mock_response = MagicMock()
         mock_response.status_code = 200
-        mock_response.content = b"%PDF-1.4 converted markdown"
+        mock_response.iter_content.return_value = [b"%PDF-1.4 converted markdown"]
         mock_post.return_value = mock_response
 
         with patch("app.tasks.convert_to_pdf._detect_mime_type") as mock_detect_mime:
@@ -404,7 +407,7 @@ class TestConvertToPdf:
         """Test that original filename is preserved and passed to process_document."""
         mock_response = MagicMock()
         mock_response.status_code = 200
-        mock_response.content = b"%PDF-1.4"
+        mock_response.iter_content.return_value = [b"%PDF-1.4"]
         mock_post.return_value = mock_response
 
         with patch("app.tasks.convert_to_pdf._detect_mime_type") as mock_detect_mime:
@@ -422,3 +425,111 @@ class TestConvertToPdf:
                     mock_process.delay.assert_called_once()
                     call_args = mock_process.delay.call_args
                     assert call_args[1]["original_filename"] == "report.pdf"
+
+
+def _jpeg_bytes(orientation: int | None = None, dpi: int = 200) -> bytes:
+    from PIL import Image
+
+    image = Image.new("RGB", (400, 200), "white")
+    exif = Image.Exif()
+    if orientation is not None:
+        exif[0x0112] = orientation
+    buffer = io.BytesIO()
+    image.save(buffer, "JPEG", quality=85, dpi=(dpi, dpi), exif=exif.tobytes())
+    return buffer.getvalue()
+
+
+@pytest.mark.unit
+class TestLocalImageConversion:
+    """Tests for the in-worker img2pdf fast path."""
+
+    def _run(self, path, **settings_overrides):
+        with (
+            patch("app.tasks.convert_to_pdf.log_task_progress"),
+            patch("app.tasks.convert_to_pdf.process_document") as mock_process,
+            patch("app.tasks.convert_to_pdf.requests.post") as mock_post,
+            patch("app.tasks.convert_to_pdf.settings") as mock_settings,
+        ):
+            mock_settings.gotenberg_url = "http://gotenberg:3000"
+            mock_settings.http_request_timeout = 60
+            mock_settings.local_image_conversion_enabled = True
+            for name, value in settings_overrides.items():
+                setattr(mock_settings, name, value)
+            convert_to_pdf.request.id = "test-task-id"
+            result = convert_to_pdf.__wrapped__(str(path), "scan.jpg", owner_id="owner", file_id=7)
+        return result, mock_post, mock_process
+
+    def test_jpeg_is_embedded_without_reencoding(self, tmp_path):
+        """The JPEG stream is copied byte-for-byte into the PDF and Gotenberg is not called."""
+        from pypdf import PdfReader
+
+        jpeg = _jpeg_bytes()
+        source = tmp_path / "upload.jpg"
+        source.write_bytes(jpeg)
+
+        result, mock_post, mock_process = self._run(source)
+
+        assert result == str(tmp_path / "upload.pdf")
+        mock_post.assert_not_called()
+        mock_process.delay.assert_called_once_with(result, original_filename="scan.pdf", file_id=7, owner_id="owner")
+        page = PdfReader(result).pages[0]
+        image = page["/Resources"]["/XObject"].get_object()
+        stream = next(iter(image.values())).get_object()
+        assert stream["/Filter"] == "/DCTDecode"
+        assert stream.get_data() == jpeg
+        # 400x200 px at 200 DPI -> 144x72 pt
+        assert (float(page.mediabox.width), float(page.mediabox.height)) == (144.0, 72.0)
+
+    def test_multipage_tiff_keeps_every_page(self, tmp_path):
+        """Each TIFF frame becomes one PDF page."""
+        from PIL import Image
+        from pypdf import PdfReader
+
+        frames = [Image.new("L", (100, 140), shade) for shade in (0, 128, 255)]
+        source = tmp_path / "fax.tiff"
+        frames[0].save(source, "TIFF", save_all=True, append_images=frames[1:])
+
+        result, mock_post, _ = self._run(source)
+
+        assert len(PdfReader(result).pages) == 3
+        mock_post.assert_not_called()
+
+    def test_exif_orientation_becomes_page_rotation(self, tmp_path):
+        """A rotated phone photo is displayed upright without touching the pixels."""
+        from pypdf import PdfReader
+
+        source = tmp_path / "photo.jpg"
+        source.write_bytes(_jpeg_bytes(orientation=6))
+
+        result, _, _ = self._run(source)
+
+        assert PdfReader(result).pages[0].get("/Rotate") == 90
+
+    def test_falls_back_to_gotenberg_when_img2pdf_fails(self, tmp_path):
+        """Unreadable images are still sent to Gotenberg."""
+        source = tmp_path / "broken.jpg"
+        source.write_bytes(b"\xff\xd8\xff not really a jpeg")
+
+        with patch("app.tasks.convert_to_pdf._detect_mime_type", return_value=("image/jpeg", None)):
+            with patch("app.tasks.convert_to_pdf.requests.post") as mock_post:
+                mock_post.return_value.status_code = 200
+                mock_post.return_value.iter_content.return_value = [b"%PDF-1.4 ", b"from gotenberg"]
+                with (
+                    patch("app.tasks.convert_to_pdf.log_task_progress"),
+                    patch("app.tasks.convert_to_pdf.process_document"),
+                    patch("app.tasks.convert_to_pdf.settings") as mock_settings,
+                ):
+                    mock_settings.gotenberg_url = "http://gotenberg:3000"
+                    mock_settings.http_request_timeout = 60
+                    mock_settings.local_image_conversion_enabled = True
+                    convert_to_pdf.request.id = "test-task-id"
+                    result = convert_to_pdf.__wrapped__(str(source))
+
+        assert mock_post.call_args.kwargs["stream"] is True
+        assert (tmp_path / "broken.pdf").read_bytes() == b"%PDF-1.4 from gotenberg"
+        assert result == str(tmp_path / "broken.pdf")
+
+    def test_svg_is_not_converted_locally(self):
+        """Vector images still need Gotenberg."""
+        assert _is_local_image("image/svg+xml", ".svg") is False
+        assert _is_local_image(None, ".tif") is True
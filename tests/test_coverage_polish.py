@@ -306,7 +306,7 @@ class TestConvertToPdfDetection:
 
         mock_response = Mock()
         mock_response.status_code = 200
-        mock_response.content = b"%PDF-1.4 fake"
+        mock_response.iter_content.return_value = [b"%PDF-1.4 fake"]
         mock_requests.post.return_value = mock_response
 
         mock_process.delay = Mock()
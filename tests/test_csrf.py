@@ -1,11 +1,12 @@
 """Tests for the CSRF protection middleware (app/middleware/csrf.py)."""
 
+import json
 import secrets
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 from fastapi import Request
-from starlette.responses import JSONResponse, RedirectResponse
+from starlette.responses import JSONResponse
 
 from app.middleware.csrf import CSRF_EXEMPT_PATHS, CSRF_PROTECTED_METHODS, CSRFMiddleware
 
@@ -78,12 +79,11 @@ class TestGetSubmittedToken:
     async def test_body_is_cached_before_form_parse(self):
         """body() is called before form() so downstream handlers can re-read the body.
 
-        This covers the Starlette BaseHTTPMiddleware body-replay bug: if form()
-        is called without first calling body(), _stream_consumed is set to True
-        but _body remains unset.  _CachedRequest.wrapped_receive then forwards
-        an empty body to downstream apps (e.g. the /auth endpoint) causing
+        If form() is called without first calling body(), the receive channel
+        is consumed but _body remains unset, so the middleware would have
+        nothing to replay to downstream apps (e.g. the /auth endpoint), causing
         form_keys=[] and login failures.  Calling body() first caches _body so
-        wrapped_receive correctly replays the full body.
+        the full body is replayed.
         """
         mock_request = MagicMock(spec=Request)
         mock_request.headers = {"content-type": "application/x-www-form-urlencoded"}
@@ -140,13 +140,42 @@ class TestGetSubmittedToken:
         assert token is None
 
 
-# Unit tests – CSRFMiddleware.dispatch
+# Unit tests – CSRFMiddleware ASGI call
 # ---------------------------------------------------------------------------
 
 
+def _make_scope(method="GET", path="/", session=None, headers=None):
+    return {
+        "type": "http",
+        "method": method,
+        "path": path,
+        "query_string": b"",
+        "headers": [(name.lower().encode(), value.encode()) for name, value in (headers or {}).items()],
+        "session": session if session is not None else {},
+    }
+
+
+async def _call(middleware, scope, body=b""):
+    """Run *middleware* for *scope* and return the ASGI messages it sent."""
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    await middleware(scope, receive, send)
+    return messages
+
+
+def _header(message, name):
+    return dict(message["headers"]).get(name.encode(), b"").decode()
+
+
 @pytest.mark.unit
-class TestCSRFMiddlewareDispatch:
-    """Unit tests for the CSRFMiddleware.dispatch method."""
+class TestCSRFMiddlewareCall:
+    """Unit tests for CSRFMiddleware as an ASGI application."""
 
     def _make_middleware(self, auth_enabled: bool = True):
         mock_app = AsyncMock()
@@ -154,42 +183,32 @@ class TestCSRFMiddlewareDispatch:
         mock_config.auth_enabled = auth_enabled
         return CSRFMiddleware(mock_app, mock_config)
 
-    def _make_request(self, method="GET", path="/", session=None, headers=None, state=None):
-        mock_request = MagicMock(spec=Request)
-        mock_request.method = method
-        mock_request.url = MagicMock()
-        mock_request.url.path = path
-        mock_request.session = session if session is not None else {}
-        mock_request.headers = headers or {}
-        mock_request.state = MagicMock()
-        mock_request.state.csrf_token = None
-        return mock_request
+    def _assert_passed_through(self, middleware, scope):
+        middleware.app.assert_awaited_once()
+        assert middleware.app.await_args.args[0] is scope
 
     @pytest.mark.asyncio
     async def test_noop_when_auth_disabled(self):
         """Middleware is a no-op when AUTH_ENABLED is False."""
         middleware = self._make_middleware(auth_enabled=False)
-        request = self._make_request(method="POST", path="/api/test")
-
-        next_response = MagicMock()
-        call_next = AsyncMock(return_value=next_response)
+        scope = _make_scope(method="POST", path="/api/test")
 
-        result = await middleware.dispatch(request, call_next)
+        messages = await _call(middleware, scope)
 
-        call_next.assert_called_once_with(request)
-        assert result is next_response
+        self._assert_passed_through(middleware, scope)
+        assert messages == []
+        assert "csrf_token" not in scope["session"]
 
     @pytest.mark.asyncio
     async def test_generates_token_when_not_in_session(self):
         """A new CSRF token is generated and stored in the session when absent."""
         middleware = self._make_middleware()
-        request = self._make_request(method="GET", session={})
-        call_next = AsyncMock(return_value=MagicMock())
+        scope = _make_scope(method="GET", session={})
 
-        await middleware.dispatch(request, call_next)
+        await _call(middleware, scope)
 
-        assert "csrf_token" in request.session
-        token = request.session["csrf_token"]
+        assert "csrf_token" in scope["session"]
+        token = scope["session"]["csrf_token"]
         assert len(token) == 64  # secrets.token_hex(32) -> 64 hex chars
 
     @pytest.mark.asyncio
@@ -197,25 +216,24 @@ class TestCSRFMiddlewareDispatch:
         """An existing session token is reused instead of regenerating."""
         existing_token = secrets.token_hex(32)
         middleware = self._make_middleware()
-        request = self._make_request(method="GET", session={"csrf_token": existing_token})
-        call_next = AsyncMock(return_value=MagicMock())
+        scope = _make_scope(method="GET", session={"csrf_token": existing_token})
 
-        await middleware.dispatch(request, call_next)
+        await _call(middleware, scope)
 
-        assert request.session["csrf_token"] == existing_token
-        assert request.state.csrf_token == existing_token
+        assert scope["session"]["csrf_token"] == existing_token
+        assert scope["state"]["csrf_token"] == existing_token
 
     @pytest.mark.asyncio
     async def test_attaches_token_to_request_state(self):
         """Token is always attached to request.state.csrf_token."""
         middleware = self._make_middleware()
-        request = self._make_request(method="GET", session={})
-        call_next = AsyncMock(return_value=MagicMock())
+        scope = _make_scope(method="GET", session={})
 
-        await middleware.dispatch(request, call_next)
+        await _call(middleware, scope)
 
-        assert request.state.csrf_token is not None
-        assert len(request.state.csrf_token) == 64
+        downstream_request = Request(middleware.app.await_args.args[0])
+        assert downstream_request.state.csrf_token is not None
+        assert len(downstream_request.state.csrf_token) == 64
 
     @pytest.mark.asyncio
     async def test_safe_methods_pass_without_token(self):
@@ -223,119 +241,152 @@ class TestCSRFMiddlewareDispatch:
         middleware = self._make_middleware()
 
         for method in ("GET", "HEAD", "OPTIONS"):
-            request = self._make_request(method=method, session={})
-            call_next = AsyncMock(return_value=MagicMock())
-            result = await middleware.dispatch(request, call_next)
-            call_next.assert_called_once_with(request)
-            call_next.reset_mock()
+            scope = _make_scope(method=method, session={})
+            await _call(middleware, scope)
+            self._assert_passed_through(middleware, scope)
+            middleware.app.reset_mock()
 
     @pytest.mark.asyncio
     async def test_post_with_valid_header_token_passes(self):
         """POST with a matching X-CSRF-Token header passes validation."""
         token = secrets.token_hex(32)
         middleware = self._make_middleware()
-        request = self._make_request(
+        scope = _make_scope(
             method="POST",
             path="/api/process/",
             session={"csrf_token": token},
             headers={"X-CSRF-Token": token},
         )
-        call_next = AsyncMock(return_value=MagicMock())
 
-        with patch.object(CSRFMiddleware, "_get_submitted_token", new=AsyncMock(return_value=token)):
-            result = await middleware.dispatch(request, call_next)
+        await _call(middleware, scope)
 
-        call_next.assert_called_once_with(request)
+        self._assert_passed_through(middleware, scope)
 
     @pytest.mark.asyncio
     async def test_post_with_invalid_token_returns_403_for_api(self):
         """POST with a wrong token on an API route returns HTTP 403."""
         token = secrets.token_hex(32)
         middleware = self._make_middleware()
-        request = self._make_request(
+        scope = _make_scope(
             method="POST",
             path="/api/process/",
             session={"csrf_token": token},
         )
-        call_next = AsyncMock(return_value=MagicMock())
 
         with patch.object(CSRFMiddleware, "_get_submitted_token", new=AsyncMock(return_value="wrong_token")):
-            result = await middleware.dispatch(request, call_next)
+            messages = await _call(middleware, scope)
 
-        assert isinstance(result, JSONResponse)
-        assert result.status_code == 403
-        call_next.assert_not_called()
+        assert messages[0]["status"] == 403
+        assert json.loads(messages[1]["body"]) == {"detail": "CSRF token missing or invalid"}
+        middleware.app.assert_not_called()
 
     @pytest.mark.asyncio
     async def test_post_with_missing_token_returns_403_for_api(self):
         """POST with no CSRF token on an API route returns HTTP 403."""
         token = secrets.token_hex(32)
         middleware = self._make_middleware()
-        request = self._make_request(
+        scope = _make_scope(
             method="POST",
             path="/api/settings/bulk-update",
             session={"csrf_token": token},
         )
-        call_next = AsyncMock(return_value=MagicMock())
 
         with patch.object(CSRFMiddleware, "_get_submitted_token", new=AsyncMock(return_value=None)):
-            result = await middleware.dispatch(request, call_next)
+            messages = await _call(middleware, scope)
 
-        assert isinstance(result, JSONResponse)
-        assert result.status_code == 403
+        assert messages[0]["status"] == 403
+        assert _header(messages[0], "content-type") == "application/json"
 
     @pytest.mark.asyncio
     async def test_post_with_invalid_token_redirects_for_frontend(self):
         """POST with a wrong token on a frontend route redirects to /login."""
         token = secrets.token_hex(32)
         middleware = self._make_middleware()
-        request = self._make_request(
+        scope = _make_scope(
             method="POST",
             path="/auth",
             session={"csrf_token": token},
         )
-        call_next = AsyncMock(return_value=MagicMock())
 
         with patch.object(CSRFMiddleware, "_get_submitted_token", new=AsyncMock(return_value="bad_token")):
-            result = await middleware.dispatch(request, call_next)
+            messages = await _call(middleware, scope)
 
-        assert isinstance(result, RedirectResponse)
-        assert result.status_code == 302
-        assert "/login?error=Invalid+request" in result.headers["location"]
-        call_next.assert_not_called()
+        assert messages[0]["status"] == 302
+        assert "/login?error=Invalid+request" in _header(messages[0], "location")
+        middleware.app.assert_not_called()
 
     @pytest.mark.asyncio
     async def test_delete_with_valid_token_passes(self):
         """DELETE with a matching token passes through."""
         token = secrets.token_hex(32)
         middleware = self._make_middleware()
-        request = self._make_request(
+        scope = _make_scope(
             method="DELETE",
             path="/api/files/1",
             session={"csrf_token": token},
         )
-        call_next = AsyncMock(return_value=MagicMock())
 
         with patch.object(CSRFMiddleware, "_get_submitted_token", new=AsyncMock(return_value=token)):
-            result = await middleware.dispatch(request, call_next)
+            await _call(middleware, scope)
+
+        self._assert_passed_through(middleware, scope)
+
+    @pytest.mark.asyncio
+    async def test_bearer_requests_are_exempt(self):
+        """Bearer-authenticated requests skip token validation."""
+        middleware = self._make_middleware()
+        scope = _make_scope(
+            method="POST",
+            path="/api/process/",
+            session={},
+            headers={"Authorization": "Bearer de_abc"},
+        )
 
-        call_next.assert_called_once_with(request)
+        with patch.object(CSRFMiddleware, "_get_submitted_token", new=AsyncMock(return_value=None)) as submitted:
+            await _call(middleware, scope)
+
+        self._assert_passed_through(middleware, scope)
+        submitted.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_form_body_is_replayed_to_downstream(self):
+        """A URL-encoded body read for the token is still delivered to the route."""
+        token = secrets.token_hex(32)
+        seen_forms = []
+
+        async def downstream(scope, receive, send):
+            seen_forms.append(dict(await Request(scope, receive).form()))
+            await JSONResponse({"ok": True})(scope, receive, send)
+
+        config = MagicMock()
+        config.auth_enabled = True
+        middleware = CSRFMiddleware(downstream, config)
+        scope = _make_scope(
+            method="POST",
+            path="/auth",
+            session={"csrf_token": token},
+            headers={"content-type": "application/x-www-form-urlencoded"},
+        )
+
+        messages = await _call(middleware, scope, body=f"csrf_token={token}&username=alice".encode())
+
+        assert messages[0]["status"] == 200
+        assert seen_forms == [{"csrf_token": token, "username": "alice"}]
 
     @pytest.mark.asyncio
     async def test_oauth_callback_is_exempt(self):
         """OAuth callback path is exempt from CSRF validation even on POST."""
         middleware = self._make_middleware()
-        request = self._make_request(
+        scope = _make_scope(
             method="POST",
             path="/oauth-callback",
             session={"csrf_token": secrets.token_hex(32)},
         )
-        call_next = AsyncMock(return_value=MagicMock())
 
         with patch.object(CSRFMiddleware, "_get_submitted_token", new=AsyncMock(return_value=None)):
-            result = await middleware.dispatch(request, call_next)
+            await _call(middleware, scope)
 
-        call_next.assert_called_once_with(request)
+        self._assert_passed_through(middleware, scope)
 
     @pytest.mark.asyncio
     async def test_qr_auth_claim_is_exempt(self):
@@ -346,17 +397,16 @@ class TestCSRFMiddlewareDispatch:
         single-use challenge token provides equivalent protection.
         """
         middleware = self._make_middleware()
-        request = self._make_request(
+        scope = _make_scope(
             method="POST",
             path="/api/qr-auth/claim",
             session={},
         )
-        call_next = AsyncMock(return_value=MagicMock())
 
         with patch.object(CSRFMiddleware, "_get_submitted_token", new=AsyncMock(return_value=None)):
-            result = await middleware.dispatch(request, call_next)
+            await _call(middleware, scope)
 
-        call_next.assert_called_once_with(request)
+        self._assert_passed_through(middleware, scope)
 
 
 # ---------------------------------------------------------------------------
@@ -386,7 +436,7 @@ class TestCSRFIntegration:
         assert "/api/qr-auth/claim" in CSRF_EXEMPT_PATHS
 
     def test_csrf_middleware_noop_when_auth_disabled(self):
-        """When AUTH_ENABLED=False the middleware dispatch is a no-op (no validation)."""
+        """When AUTH_ENABLED=False the middleware is a no-op (no validation)."""
         # Build a middleware instance with auth disabled.
         mock_app = AsyncMock()
         mock_config = MagicMock()
@@ -395,16 +445,10 @@ class TestCSRFIntegration:
 
         import asyncio
 
-        mock_request = MagicMock(spec=Request)
-        mock_request.method = "POST"
-        mock_request.url = MagicMock()
-        mock_request.url.path = "/api/process/"
-        mock_request.session = {}
-
-        call_next = AsyncMock(return_value=MagicMock())
-        asyncio.run(middleware.dispatch(mock_request, call_next))
+        scope = _make_scope(method="POST", path="/api/process/", session={})
+        asyncio.run(_call(middleware, scope))
 
-        # call_next must have been called (request was not blocked).
-        call_next.assert_called_once_with(mock_request)
+        # The wrapped app must have been called (request was not blocked).
+        mock_app.assert_awaited_once()
         # Session should remain untouched (no token generated).
-        assert "csrf_token" not in mock_request.session
+        assert "csrf_token" not in scope["session"]
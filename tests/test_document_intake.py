@@ -2,6 +2,8 @@
 
 from unittest.mock import patch
 
+import pytest
+
 
 def _pdf_request(key: str = "legacy:42:abc") -> dict:
     return {
@@ -100,3 +102,140 @@ def test_index_only_non_pdf_bypasses_conversion_pipeline():
         task_id="source-task",
     )
     convert_delay.assert_not_called()
+
+
+def _create_upload(client, body: bytes, key: str = "mobile:scan:0001", **fields):
+    return client.post(
+        "/api/intake/uploads",
+        json={"filename": "scan.pdf", "upload_length": len(body), "source": "mobile", "idempotency_key": key, **fields},
+    )
+
+
+def _send_chunk(client, location: str, offset: int, chunk: bytes):
+    return client.patch(
+        location,
+        content=chunk,
+        headers={"Upload-Offset": str(offset), "Content-Type": "application/offset+octet-stream"},
+    )
+
+
+def test_resumable_upload_resumes_and_finalizes_into_intake(client, tmp_path):
+    import hashlib
+
+    from app.api import intake
+
+    body = b"%PDF-1.4\n" + bytes(range(256)) * 64 + b"%%EOF"
+    with (
+        patch("app.api.intake.settings.workdir", str(tmp_path)),
+        patch("app.api.intake.process_document.delay") as delay,
+    ):
+        delay.return_value.id = "task-r1"
+        created = _create_upload(client, body)
+        location = created.headers["Location"]
+        assert created.status_code == 201
+        assert created.headers["Upload-Offset"] == "0"
+
+        assert _send_chunk(client, location, 0, body[:5000]).headers["Upload-Offset"] == "5000"
+        # A client that lost the response asks for the offset and gets 409 for a stale one.
+        assert client.head(location).headers["Upload-Offset"] == "5000"
+        stale = _send_chunk(client, location, 0, body[:5000])
+        assert (stale.status_code, stale.headers["Upload-Offset"]) == (409, "5000")
+        # Restarting the same upload (e.g. after an app restart) resumes it.
+        resumed = _create_upload(client, body)
+        assert (resumed.status_code, resumed.json()["upload_offset"]) == (200, 5000)
+        assert client.post(f"{location}/finalize").status_code == 409
+
+        # Another worker without the in-memory digest state takes the last chunk.
+        intake._hashers.clear()
+        assert _send_chunk(client, location, 5000, body[5000:]).status_code == 204
+        finalized = client.post(f"{location}/finalize")
+        retried = client.post(f"{location}/finalize")
+        again = _create_upload(client, body)
+
+    assert finalized.status_code == 202
+    assert finalized.json()["state"] == "queued"
+    assert finalized.json()["sha256"] == hashlib.sha256(body).hexdigest()
+    assert retried.json()["intake_id"] == finalized.json()["intake_id"]
+    assert retried.json()["duplicate"] is True
+    assert again.json()["intake"]["intake_id"] == finalized.json()["intake_id"]
+    delay.assert_called_once()
+    (stored,) = tmp_path.glob("intake_*.pdf")
+    assert stored.read_bytes() == body
+    assert not list((tmp_path / "resumable_uploads").iterdir())
+
+
+def test_resumable_upload_rejects_bad_chunks_and_checksum(client, tmp_path):
+    body = b"%PDF-1.4\n%%EOF"
+    with (
+        patch("app.api.intake.settings.workdir", str(tmp_path)),
+        patch("app.api.intake.process_document.delay") as delay,
+    ):
+        location = _create_upload(client, body, sha256="0" * 64).headers["Location"]
+        wrong_type = client.patch(
+            location, content=body, headers={"Upload-Offset": "0", "Content-Type": "application/pdf"}
+        )
+        too_long = _send_chunk(client, location, 0, body + b"extra")
+        _send_chunk(client, location, 0, body)
+        mismatch = client.post(f"{location}/finalize")
+        after_failure = _send_chunk(client, location, len(body), b"x")
+
+    assert wrong_type.status_code == 415
+    assert too_long.status_code == 413
+    assert mismatch.status_code == 422
+    assert after_failure.status_code == 410
+    assert client.get(location).json()["state"] == "failed"
+    delay.assert_not_called()
+    assert _create_upload(client, b"MZ", key="mobile:scan:0002", filename="tool.exe").status_code == 415
+
+
+def test_expired_resumable_uploads_are_cleaned_up(client, db_session, tmp_path):
+    from datetime import datetime, timedelta, timezone
+
+    from app.models import ResumableUpload
+    from app.tasks.resumable_uploads import cleanup_expired_resumable_uploads
+
+    with patch("app.api.intake.settings.workdir", str(tmp_path)):
+        location = _create_upload(client, b"%PDF-1.4").headers["Location"]
+        assert client.delete(location).status_code == 204
+        _create_upload(client, b"%PDF-1.4", key="mobile:scan:0003")
+    upload = db_session.query(ResumableUpload).one()
+    upload.expires_at = datetime.now(timezone.utc) - timedelta(minutes=1)
+    db_session.commit()
+
+    with patch("app.tasks.resumable_uploads.SessionLocal", return_value=db_session):
+        assert cleanup_expired_resumable_uploads() == {"deleted": 1}
+    assert not list((tmp_path / "resumable_uploads").iterdir())
+
+
+def test_failed_finalize_releases_the_upload(client, tmp_path):
+    body = b"%PDF-1.4\n%%EOF"
+    with (
+        patch("app.api.intake.settings.workdir", str(tmp_path)),
+        patch("app.api.intake._reserve_intake", side_effect=RuntimeError("database unavailable")),
+    ):
+        location = _create_upload(client, body).headers["Location"]
+        _send_chunk(client, location, 0, body)
+        with pytest.raises(RuntimeError):
+            client.post(f"{location}/finalize")
+
+    assert client.get(location).json()["state"] == "failed"
+    assert client.delete(location).status_code == 204
+
+
+def test_abandoned_finalizing_uploads_are_reclaimed(client, db_session, tmp_path):
+    from datetime import datetime, timedelta, timezone
+
+    from app.models import ResumableUpload
+    from app.tasks.resumable_uploads import cleanup_expired_resumable_uploads
+
+    with patch("app.api.intake.settings.workdir", str(tmp_path)):
+        _create_upload(client, b"%PDF-1.4", key="mobile:scan:0004")
+        _create_upload(client, b"%PDF-1.4", key="mobile:scan:0005")
+    abandoned, active = db_session.query(ResumableUpload).order_by(ResumableUpload.idempotency_key).all()
+    abandoned.state = active.state = "finalizing"
+    abandoned.expires_at = datetime.now(timezone.utc) - timedelta(minutes=1)
+    db_session.commit()
+
+    with patch("app.tasks.resumable_uploads.SessionLocal", return_value=db_session):
+        assert cleanup_expired_resumable_uploads() == {"deleted": 1}
+    assert [upload.idempotency_key for upload in db_session.query(ResumableUpload)] == ["mobile:scan:0005"]
@@ -26,6 +26,10 @@ def _owned_import_coordinator_lock():
         yield
 
 
+def _download_response(body: bytes) -> SimpleNamespace:
+    return SimpleNamespace(iter_content=lambda chunk_size: iter([body]), close=lambda: None)
+
+
 def _integration(db_session) -> UserIntegration:
     integration = UserIntegration(
         owner_id="owner@example.com",
@@ -180,7 +184,7 @@ def test_dropbox_file_revision_is_idempotent(db_session, tmp_path):
         path_lower="/documents/invoice.pdf",
         path_display="/Documents/invoice.pdf",
     )
-    client = SimpleNamespace(files_download=lambda _path: (None, SimpleNamespace(content=b"%PDF-1")))
+    client = SimpleNamespace(files_download=lambda _path: (None, _download_response(b"%PDF-1")))
 
     with (
         patch("app.tasks.dropbox_corpus_import.settings.workdir", str(tmp_path)),
@@ -220,7 +224,7 @@ def test_dropbox_import_removes_download_when_queueing_fails(db_session, tmp_pat
         path_lower="/documents/invoice.pdf",
         path_display="/Documents/invoice.pdf",
     )
-    client = SimpleNamespace(files_download=lambda _path: (None, SimpleNamespace(content=b"%PDF-1")))
+    client = SimpleNamespace(files_download=lambda _path: (None, _download_response(b"%PDF-1")))
 
     with (
         patch("app.tasks.dropbox_corpus_import.settings.workdir", str(tmp_path)),
@@ -519,7 +523,7 @@ def test_index_first_backfill_bypasses_llm_budget_and_queues_direct_processing(d
         path_lower="/documents/notes.docx",
         path_display="/Documents/notes.docx",
     )
-    client = SimpleNamespace(files_download=lambda _path: (None, SimpleNamespace(content=b"document")))
+    client = SimpleNamespace(files_download=lambda _path: (None, _download_response(b"document")))
 
     with (
         patch("app.tasks.dropbox_corpus_import.settings.workdir", str(tmp_path)),
@@ -602,7 +606,7 @@ def test_prefetch_reuses_one_dropbox_client_per_worker_thread(tmp_path):
         for index in range(2)
     ]
     client = MagicMock()
-    client.files_download.return_value = (None, SimpleNamespace(content=b"document"))
+    client.files_download.return_value = (None, _download_response(b"document"))
 
     with (
         patch("app.tasks.dropbox_corpus_import.settings.workdir", str(tmp_path)),
@@ -1145,3 +1149,107 @@ def test_dropbox_import_ignores_invalid_provider_batch_size(db_session, override
         include_deleted=False,
         limit=10,
     )
+
+
+@pytest.mark.unit
+def test_dropbox_import_skips_known_content_hash_without_downloading(db_session, tmp_path):
+    from app.models import DropboxImportObject, FileRecord
+
+    integration = _integration(db_session)
+    job = DropboxImportJob(
+        id="job-known-content",
+        integration_id=integration.id,
+        owner_id=integration.owner_id,
+        root_path="/Documents",
+    )
+    db_session.add_all(
+        [
+            job,
+            FileRecord(
+                owner_id=integration.owner_id,
+                filehash="sha-known",
+                content_hash="a" * 64,
+                local_filename="/workdir/original/known.pdf",
+                file_size=8,
+            ),
+        ]
+    )
+    db_session.commit()
+    entry = SimpleNamespace(
+        id="id:known",
+        rev="rev-1",
+        name="invoice.pdf",
+        size=8,
+        content_hash="A" * 64,
+        path_lower="/documents/invoice.pdf",
+        path_display="/Documents/invoice.pdf",
+    )
+    client = MagicMock()
+
+    with (
+        patch("app.tasks.dropbox_corpus_import.settings.workdir", str(tmp_path)),
+        patch("app.tasks.dropbox_corpus_import.settings.multi_user_enabled", True),
+        patch("app.tasks.dropbox_corpus_import.settings.enable_deduplication", True),
+        patch("app.api.intake._queue_document") as queue_document,
+    ):
+        from app.tasks.dropbox_corpus_import import _import_file
+
+        assert _import_file(db_session, job, integration, client, entry) == "skipped"
+
+    client.files_download.assert_not_called()
+    queue_document.assert_not_called()
+    imported = db_session.query(DropboxImportObject).filter_by(dropbox_file_id="id:known").one()
+    assert imported.state == "duplicate"
+    assert imported.revision == "rev-1"
+
+
+@pytest.mark.unit
+def test_dropbox_import_content_hash_is_scoped_to_owner(db_session):
+    from app.models import FileRecord
+    from app.tasks.dropbox_corpus_import import _known_content_hashes
+
+    db_session.add(
+        FileRecord(
+            owner_id="someone-else@example.com",
+            filehash="sha-other",
+            content_hash="b" * 64,
+            local_filename="/workdir/original/other.pdf",
+            file_size=8,
+        )
+    )
+    db_session.commit()
+    entries = [SimpleNamespace(content_hash="b" * 64), SimpleNamespace(content_hash=None)]
+
+    with (
+        patch("app.tasks.dropbox_corpus_import.settings.multi_user_enabled", True),
+        patch("app.tasks.dropbox_corpus_import.settings.enable_deduplication", True),
+    ):
+        assert _known_content_hashes(db_session, "owner@example.com", entries) == set()
+        assert _known_content_hashes(db_session, "someone-else@example.com", entries) == {"b" * 64}
+
+
+@pytest.mark.unit
+def test_dropbox_download_streams_chunks_and_enforces_upload_limit(tmp_path):
+    from app.tasks.dropbox_corpus_import import _download_dropbox_entry
+
+    response = MagicMock()
+    response.iter_content.return_value = iter([b"1234", b"5678", b"90"])
+    client = MagicMock()
+    client.files_download.return_value = (None, response)
+    target = tmp_path / "document.pdf"
+
+    with patch("app.tasks.dropbox_corpus_import.settings.max_upload_size", 8):
+        with pytest.raises(ValueError, match="upload limit"):
+            _download_dropbox_entry(client, SimpleNamespace(path_lower="/big.pdf"), str(target))
+
+    assert not target.exists()
+    assert not list(tmp_path.iterdir())
+    response.close.assert_called_once()
+
+    response = MagicMock()
+    response.iter_content.return_value = iter([b"1234", b"5678"])
+    client.files_download.return_value = (None, response)
+    with patch("app.tasks.dropbox_corpus_import.settings.max_upload_size", 8):
+        _download_dropbox_entry(client, SimpleNamespace(path_lower="/ok.pdf"), str(target))
+
+    assert target.read_bytes() == b"12345678"
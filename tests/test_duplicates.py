@@ -402,6 +402,31 @@ class TestUploadDuplicateRejection:
         assert not os.path.exists(os.path.join(settings.workdir, stored))
 
 
+# ---------------------------------------------------------------------------
+# POST /api/files/check-hashes  — pre-upload duplicate lookup
+# ---------------------------------------------------------------------------
+
+
+class TestCheckUploadHashes:
+    """Tests for the bulk-upload hash lookup."""
+
+    @pytest.mark.integration
+    def test_reports_only_original_documents(self, client: TestClient, db_session):
+        original = _make_file(db_session, filehash="a" * 64, filename="orig.pdf")
+        _make_file(db_session, filehash="a" * 64, filename="copy.pdf", is_duplicate=True, duplicate_of_id=original.id)
+        _make_file(db_session, filehash="b" * 64, filename="dup-only.pdf", is_duplicate=True)
+
+        response = client.post("/api/files/check-hashes", json={"hashes": ["A" * 64, "b" * 64, "c" * 64]})
+
+        assert response.status_code == 200
+        assert response.json()["known"] == {"a" * 64: original.id}
+
+    @pytest.mark.integration
+    def test_rejects_malformed_hashes(self, client: TestClient):
+        assert client.post("/api/files/check-hashes", json={"hashes": ["not-a-hash"]}).status_code == 422
+        assert client.post("/api/files/check-hashes", json={"hashes": []}).status_code == 422
+
+
 # ---------------------------------------------------------------------------
 # GET /duplicates  — duplicate management UI page
 # ---------------------------------------------------------------------------
@@ -5,6 +5,9 @@ from unittest.mock import MagicMock, mock_open, patch
 import pytest
 
 from app.tasks.embed_metadata_into_pdf import embed_metadata_into_pdf, persist_metadata
+from app.utils.pdf_edit import PdfEditResult
+
+_EDIT_RESULT = PdfEditResult("incremental", 512, bytes_copied=4096)
 
 
 @pytest.mark.unit
@@ -72,12 +75,10 @@ class TestEmbedMetadataIntoPdf:
     @patch("app.tasks.embed_metadata_into_pdf.SessionLocal")
     @patch("app.tasks.embed_metadata_into_pdf.log_task_progress")
     @patch("builtins.open", new_callable=mock_open, read_data=b"%PDF-1.4 content")
-    @patch("app.tasks.embed_metadata_into_pdf.pypdf.PdfReader")
-    @patch("app.tasks.embed_metadata_into_pdf.pypdf.PdfWriter")
+    @patch("app.tasks.embed_metadata_into_pdf.apply_pdf_edits", return_value=_EDIT_RESULT)
     def test_successful_metadata_embedding(
         self,
-        mock_pdf_writer_class,
-        mock_pdf_reader_class,
+        mock_apply_edits,
         mock_file,
         mock_log_progress,
         mock_session_local,
@@ -89,14 +90,6 @@ class TestEmbedMetadataIntoPdf:
         mock_finalize,
     ):
         """Test successful embedding of metadata into PDF."""
-        # Mock PDF reader/writer
-        mock_reader = MagicMock()
-        mock_reader.pages = [MagicMock(), MagicMock()]
-        mock_pdf_reader_class.return_value = mock_reader
-
-        mock_writer = MagicMock()
-        mock_pdf_writer_class.return_value = mock_writer
-
         # Mock database session
         mock_db = MagicMock()
         mock_session_local.return_value.__enter__.return_value = mock_db
@@ -135,9 +128,10 @@ class TestEmbedMetadataIntoPdf:
                                 "/workdir/tmp/test.pdf", "Sample text", metadata, file_id=123
                             )
 
-                            # Verify PDF metadata was set
-                            mock_writer.add_metadata.assert_called_once()
-                            metadata_call = mock_writer.add_metadata.call_args[0][0]
+                            # Verify PDF metadata was written in a single edit of the temp copy
+                            mock_apply_edits.assert_called_once()
+                            assert mock_apply_edits.call_args[0] == ("/workdir/tmp/test.pdf", "/tmp/processed_123.pdf")
+                            metadata_call = mock_apply_edits.call_args[1]["info"]
                             assert metadata_call["/Title"] == "2024-01-15_Invoice.pdf"
                             assert metadata_call["/Author"] == "Amazon"
                             assert metadata_call["/Subject"] == "Invoice"
@@ -209,27 +203,26 @@ class TestEmbedMetadataIntoPdf:
                 with patch("app.tasks.embed_metadata_into_pdf.os.remove"):
                     with patch("app.tasks.embed_metadata_into_pdf.settings") as mock_settings:
                         with patch("builtins.open", new_callable=mock_open, read_data=b"%PDF-1.4"):
-                            with patch("app.tasks.embed_metadata_into_pdf.pypdf.PdfReader"):
-                                with patch("app.tasks.embed_metadata_into_pdf.pypdf.PdfWriter"):
-                                    with patch("app.tasks.embed_metadata_into_pdf.tempfile.NamedTemporaryFile"):
-                                        mock_settings.workdir = "/workdir"
+                            with patch("app.tasks.embed_metadata_into_pdf.apply_pdf_edits", return_value=_EDIT_RESULT):
+                                with patch("app.tasks.embed_metadata_into_pdf.tempfile.NamedTemporaryFile"):
+                                    mock_settings.workdir = "/workdir"
 
-                                        embed_metadata_into_pdf.request.id = "test-task-id"
+                                    embed_metadata_into_pdf.request.id = "test-task-id"
 
-                                        result = embed_metadata_into_pdf.__wrapped__(
-                                            "/workdir/tmp/test.pdf", "text", {"filename": "test.pdf"}
-                                        )
+                                    result = embed_metadata_into_pdf.__wrapped__(
+                                        "/workdir/tmp/test.pdf", "text", {"filename": "test.pdf"}
+                                    )
 
-                                        # Verify database was queried
-                                        mock_db.query.assert_called()
+                                    # Verify database was queried
+                                    mock_db.query.assert_called()
 
     @patch("app.tasks.embed_metadata_into_pdf.log_task_progress")
     @patch("app.tasks.embed_metadata_into_pdf.SessionLocal")
     @patch("builtins.open", new_callable=mock_open, read_data=b"%PDF-1.4")
-    @patch("app.tasks.embed_metadata_into_pdf.pypdf.PdfReader")
-    def test_handles_pdf_processing_exception(self, mock_pdf_reader, mock_file, mock_session_local, mock_log_progress):
+    @patch("app.tasks.embed_metadata_into_pdf.apply_pdf_edits")
+    def test_handles_pdf_processing_exception(self, mock_apply_edits, mock_file, mock_session_local, mock_log_progress):
         """Test handling of PDF processing exceptions."""
-        mock_pdf_reader.side_effect = Exception("Invalid PDF structure")
+        mock_apply_edits.side_effect = Exception("Invalid PDF structure")
 
         mock_db = MagicMock()
         mock_session_local.return_value.__enter__.return_value = mock_db
@@ -268,12 +261,10 @@ class TestEmbedMetadataIntoPdf:
     @patch("app.tasks.embed_metadata_into_pdf.SessionLocal")
     @patch("app.tasks.embed_metadata_into_pdf.log_task_progress")
     @patch("builtins.open", new_callable=mock_open, read_data=b"%PDF-1.4")
-    @patch("app.tasks.embed_metadata_into_pdf.pypdf.PdfReader")
-    @patch("app.tasks.embed_metadata_into_pdf.pypdf.PdfWriter")
+    @patch("app.tasks.embed_metadata_into_pdf.apply_pdf_edits", return_value=_EDIT_RESULT)
     def test_sanitizes_malicious_filename(
         self,
-        mock_pdf_writer_class,
-        mock_pdf_reader_class,
+        mock_apply_edits,
         mock_file,
         mock_log_progress,
         mock_session_local,
@@ -285,12 +276,6 @@ class TestEmbedMetadataIntoPdf:
         mock_finalize,
     ):
         """Test filename sanitization to prevent path traversal."""
-        # Mock PDF reader/writer
-        mock_reader = MagicMock()
-        mock_reader.pages = [MagicMock()]
-        mock_pdf_reader_class.return_value = mock_reader
-        mock_pdf_writer_class.return_value = MagicMock()
-
         # Mock database
         mock_db = MagicMock()
         mock_session_local.return_value.__enter__.return_value = mock_db
@@ -333,12 +318,10 @@ class TestEmbedMetadataIntoPdf:
     @patch("app.tasks.embed_metadata_into_pdf.SessionLocal")
     @patch("app.tasks.embed_metadata_into_pdf.log_task_progress")
     @patch("builtins.open", new_callable=mock_open, read_data=b"%PDF-1.4")
-    @patch("app.tasks.embed_metadata_into_pdf.pypdf.PdfReader")
-    @patch("app.tasks.embed_metadata_into_pdf.pypdf.PdfWriter")
+    @patch("app.tasks.embed_metadata_into_pdf.apply_pdf_edits", return_value=_EDIT_RESULT)
     def test_handles_missing_metadata_fields(
         self,
-        mock_pdf_writer_class,
-        mock_pdf_reader_class,
+        mock_apply_edits,
         mock_file,
         mock_log_progress,
         mock_session_local,
@@ -350,13 +333,6 @@ class TestEmbedMetadataIntoPdf:
         mock_finalize,
     ):
         """Test handling of metadata with missing fields."""
-        mock_reader = MagicMock()
-        mock_reader.pages = [MagicMock()]
-        mock_pdf_reader_class.return_value = mock_reader
-
-        mock_writer = MagicMock()
-        mock_pdf_writer_class.return_value = mock_writer
-
         mock_db = MagicMock()
         mock_session_local.return_value.__enter__.return_value = mock_db
         mock_db.query.return_value.filter_by.return_value.first.return_value = None
@@ -386,8 +362,8 @@ class TestEmbedMetadataIntoPdf:
                             )
 
                             # Verify PDF metadata was set with defaults
-                            mock_writer.add_metadata.assert_called_once()
-                            metadata_call = mock_writer.add_metadata.call_args[0][0]
+                            mock_apply_edits.assert_called_once()
+                            metadata_call = mock_apply_edits.call_args[1]["info"]
                             assert metadata_call["/Title"] == "Unknown Document"
                             assert metadata_call["/Author"] == "Unknown"
                             assert metadata_call["/Subject"] == "Unknown"
@@ -402,12 +378,10 @@ class TestEmbedMetadataIntoPdf:
     @patch("app.tasks.embed_metadata_into_pdf.SessionLocal")
     @patch("app.tasks.embed_metadata_into_pdf.log_task_progress")
     @patch("builtins.open", new_callable=mock_open, read_data=b"%PDF-1.4")
-    @patch("app.tasks.embed_metadata_into_pdf.pypdf.PdfReader")
-    @patch("app.tasks.embed_metadata_into_pdf.pypdf.PdfWriter")
+    @patch("app.tasks.embed_metadata_into_pdf.apply_pdf_edits", return_value=_EDIT_RESULT)
     def test_deletes_original_file_from_tmp(
         self,
-        mock_pdf_writer_class,
-        mock_pdf_reader_class,
+        mock_apply_edits,
         mock_file,
         mock_log_progress,
         mock_session_local,
@@ -419,11 +393,6 @@ class TestEmbedMetadataIntoPdf:
         mock_finalize,
     ):
         """Test that original file in tmp directory is deleted after processing."""
-        mock_reader = MagicMock()
-        mock_reader.pages = [MagicMock()]
-        mock_pdf_reader_class.return_value = mock_reader
-        mock_pdf_writer_class.return_value = MagicMock()
-
         mock_db = MagicMock()
         mock_session_local.return_value.__enter__.return_value = mock_db
         mock_db.query.return_value.filter_by.return_value.first.return_value = None
@@ -742,6 +742,7 @@ class TestPullInbox:
         self, mock_settings, mock_save, mock_load, mock_imap_class, mock_fetch
     ):
         """Test processing messages and marking them as read."""
+        mock_settings.imap_uid_sync_enabled = False
         mock_settings.workdir = "/tmp"
         mock_settings.imap_readonly_mode = False
         mock_load.return_value = {}
@@ -785,6 +786,7 @@ class TestPullInbox:
         self, mock_settings, mock_save, mock_load, mock_imap_class, mock_fetch, _mock_private_ip
     ):
         """Test deleting messages after processing."""
+        mock_settings.imap_uid_sync_enabled = False
         mock_settings.workdir = "/tmp"
         mock_settings.imap_readonly_mode = False
         mock_load.return_value = {}
@@ -838,6 +840,7 @@ class TestPullInbox:
         mock_has_label,
     ):
         """Test that Gmail messages are starred and labeled."""
+        mock_settings.imap_uid_sync_enabled = False
         mock_settings.workdir = "/tmp"
         mock_settings.imap_readonly_mode = False
         mock_load.return_value = {}
@@ -891,6 +894,7 @@ class TestPullInbox:
         mock_has_label,
     ):
         """Gmail star/label operations should be skipped when gmail_apply_labels=False."""
+        mock_settings.imap_uid_sync_enabled = False
         mock_settings.workdir = "/tmp"
         mock_settings.imap_readonly_mode = False
         mock_load.return_value = {}
@@ -1093,6 +1097,7 @@ class TestPullInbox:
         mock_has_label,
     ):
         """Test that readonly mode skips starring and labeling Gmail messages."""
+        mock_settings.imap_uid_sync_enabled = False
         mock_settings.workdir = "/tmp"
         mock_settings.imap_readonly_mode = True
         mock_load.return_value = {}
@@ -1140,6 +1145,7 @@ class TestPullInbox:
         self, mock_settings, mock_save, mock_load, mock_imap_class, mock_fetch, _mock_private_ip
     ):
         """Test that readonly mode skips deletion even when delete_after_process is True."""
+        mock_settings.imap_uid_sync_enabled = False
         mock_settings.workdir = "/tmp"
         mock_settings.imap_readonly_mode = True
         mock_load.return_value = {}
@@ -1498,6 +1504,7 @@ class TestPullInboxEdgeCases:
     @patch("app.tasks.imap_tasks.settings")
     def test_pull_inbox_search_failed_status(self, mock_settings, mock_imap_class, mock_load, _mock_private_ip):
         """Test pull_inbox when search returns non-OK status."""
+        mock_settings.imap_uid_sync_enabled = False
         mock_settings.workdir = "/tmp"
         mock_load.return_value = {}
 
@@ -1549,6 +1556,7 @@ class TestPullInboxEdgeCases:
     @patch("app.tasks.imap_tasks.settings")
     def test_pull_inbox_fetch_failed_status(self, mock_settings, mock_imap_class, mock_load, _mock_private_ip):
         """Test pull_inbox when fetch returns non-OK status."""
+        mock_settings.imap_uid_sync_enabled = False
         mock_settings.workdir = "/tmp"
         mock_load.return_value = {}
 
@@ -0,0 +1,307 @@
+"""Tests for incremental UID-based IMAP ingestion (app/utils/imap.py helpers and imap_tasks)."""
+
+import base64
+import re
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from app.models import ImapSyncState
+from app.tasks.imap_tasks import _poll_mailboxes, _sync_mailbox_by_uid
+from app.utils.allowed_types import DEFAULT_CATEGORIES, get_allowed_types_for_categories
+from app.utils.imap import BodyPart, iter_body_parts, parse_fetch_items, stream_body_part, uid_ranges
+
+_PDF_BYTES = b"%PDF-1.4 streamed attachment body " * 20
+
+_STRUCTURE_PREFIX = (
+    b'1 (UID 7 BODYSTRUCTURE (("TEXT" "PLAIN" ("CHARSET" "utf-8") NIL NIL "7BIT" 12 1 NIL NIL NIL NIL)'
+    b'("IMAGE" "PNG" ("NAME" "logo.png") "<logo>" NIL "BASE64" 400 NIL ("INLINE" NIL) NIL NIL)'
+    b'("APPLICATION" "PDF" ("NAME" "report.pdf") NIL NIL "BASE64" 1000 NIL ("ATTACHMENT" ("FILENAME" {16}'
+)
+
+
+def _structure_response(uid: int = 7) -> list:
+    prefix = _STRUCTURE_PREFIX.replace(b"UID 7", f"UID {uid}".encode())
+    return [(prefix, b"Quarterly Q3.pdf"), b')) NIL NIL) "MIXED" ("BOUNDARY" "b1") NIL NIL NIL))']
+
+
+class _FakeMailbox:
+    """Scripted IMAP connection answering the UID commands used by the sync."""
+
+    def __init__(self, uid_validity=100, uids=(), structures=None, body=b""):
+        self.uid_validity = uid_validity
+        self.uids = list(uids)
+        self.structures = structures or {}
+        self.body = body
+        self.commands: list[tuple] = []
+        self.expunge = MagicMock()
+
+    def response(self, name):
+        return name, [str(self.uid_validity).encode()] if self.uid_validity is not None else [None]
+
+    def uid(self, command, *args):
+        self.commands.append((command, *args))
+        if command == "SEARCH":
+            return "OK", [b" ".join(str(uid).encode() for uid in self.uids)]
+        if command == "FETCH" and args[1] == "(UID BODYSTRUCTURE)":
+            data = []
+            for uid in self.uids:
+                data.extend(self.structures.get(uid, []))
+            return "OK", data
+        if command == "FETCH":
+            match = re.search(r"<(\d+)\.(\d+)>", args[1])
+            offset, length = int(match.group(1)), int(match.group(2))
+            chunk = self.body[offset : offset + length]
+            return "OK", [(f"{args[0]} (UID {args[0]} BODY[3]<{offset}> {{{len(chunk)}}}".encode(), chunk), b")"]
+        return "OK", [None]
+
+
+@pytest.mark.unit
+class TestFetchParsing:
+    """Tests for FETCH response parsing and BODYSTRUCTURE walking."""
+
+    def test_parses_literal_filename_and_sections(self):
+        """Literals inside BODYSTRUCTURE are resolved and parts get section numbers."""
+        items = parse_fetch_items(_structure_response())
+        assert len(items) == 1
+        assert items[0]["UID"] == 7
+
+        parts = list(iter_body_parts(items[0]["BODYSTRUCTURE"]))
+        assert [part.section for part in parts] == ["1", "2", "3"]
+        assert parts[0] == BodyPart("1", "text/plain", "7bit", 12, None)
+        assert parts[1].filename == "logo.png"
+        assert parts[2].filename == "Quarterly Q3.pdf"
+        assert parts[2].mime_type == "application/pdf"
+        assert parts[2].encoding == "base64"
+
+    def test_decodes_rfc2231_filename(self):
+        """Extended filename* parameters are decoded."""
+        data = [
+            b"1 (UID 3 BODYSTRUCTURE "
+            b'("APPLICATION" "PDF" NIL NIL NIL "BASE64" 10 NIL ("ATTACHMENT" ("FILENAME*" "utf-8\'\'R%C3%A9sum%C3%A9.pdf")) NIL NIL))'
+        ]
+        parts = list(iter_body_parts(parse_fetch_items(data)[0]["BODYSTRUCTURE"]))
+        assert parts[0].section == "1"
+        assert parts[0].filename == "Résumé.pdf"
+
+    def test_uid_ranges_collapse_and_batch(self):
+        """Consecutive UIDs collapse into ranges and batches respect the size limit."""
+        assert list(uid_ranges([7, 1, 2, 3], 10)) == ["1:3,7"]
+        assert list(uid_ranges([1, 2, 3, 4, 5], 2)) == ["1:2", "3:4", "5"]
+        assert list(uid_ranges([], 5)) == []
+
+
+@pytest.mark.unit
+class TestStreamBodyPart:
+    """Tests for chunked attachment downloads."""
+
+    def test_decodes_base64_across_chunk_boundaries(self, tmp_path):
+        """Base64 split at arbitrary offsets is decoded to the original bytes."""
+        encoded = base64.encodebytes(_PDF_BYTES)
+        mail = _FakeMailbox(body=encoded)
+        part = BodyPart("3", "application/pdf", "base64", len(encoded), "a.pdf")
+        target = tmp_path / "a.pdf"
+
+        written = stream_body_part(mail, 7, part, str(target), max_bytes=10_000, chunk_size=37)
+
+        assert target.read_bytes() == _PDF_BYTES
+        assert written == len(_PDF_BYTES)
+        fetches = [cmd for cmd in mail.commands if cmd[0] == "FETCH"]
+        assert len(fetches) > 1
+        assert all("BODY.PEEK[3]" in cmd[2] for cmd in fetches)
+
+    def test_raises_when_over_limit(self, tmp_path):
+        """Parts larger than the upload limit are rejected mid-stream."""
+        mail = _FakeMailbox(body=base64.encodebytes(_PDF_BYTES))
+        part = BodyPart("3", "application/pdf", "base64", 0, "a.pdf")
+
+        with pytest.raises(ValueError):
+            stream_body_part(mail, 7, part, str(tmp_path / "a.pdf"), max_bytes=100, chunk_size=64)
+
+
+@pytest.mark.unit
+class TestSyncMailboxByUid:
+    """Tests for the UID sync engine in imap_tasks."""
+
+    @pytest.fixture
+    def types(self):
+        return get_allowed_types_for_categories(DEFAULT_CATEGORIES)
+
+    def _sync(self, mail, db_session, types, tmp_path, **overrides):
+        mime_types, extensions = types
+        kwargs = {
+            "mailbox_key": "user@example.com",
+            "folder": "INBOX",
+            "is_gmail_host": False,
+            "gmail_apply_labels": False,
+            "delete_after_process": False,
+            "owner_id": "owner-1",
+            "effective_mime_types": mime_types,
+            "effective_extensions": extensions,
+        }
+        kwargs.update(overrides)
+        with (
+            patch("app.tasks.imap_tasks._get_db_session", return_value=db_session),
+            patch("app.tasks.imap_tasks.settings") as mock_settings,
+            patch("app.tasks.imap_tasks.process_document") as mock_process,
+            patch("app.tasks.imap_tasks.convert_to_pdf") as mock_convert,
+        ):
+            mock_settings.workdir = str(tmp_path)
+            mock_settings.max_upload_size = 10_000_000
+            mock_settings.imap_uid_fetch_batch_size = 50
+            mock_settings.imap_readonly_mode = False
+            _sync_mailbox_by_uid(mail, **kwargs)
+        return mock_process, mock_convert
+
+    def test_streams_only_allowed_attachment_and_records_uid(self, db_session, types, tmp_path):
+        """Only the named PDF part is fetched; the inline image and body text are not."""
+        mail = _FakeMailbox(uids=[7], structures={7: _structure_response()}, body=base64.encodebytes(_PDF_BYTES))
+
+        mock_process, mock_convert = self._sync(mail, db_session, types, tmp_path)
+
+        mock_process.delay.assert_called_once()
+        saved_path = mock_process.delay.call_args[0][0]
+        assert saved_path.endswith("_Quarterly Q3.pdf")
+        assert mock_process.delay.call_args.kwargs["owner_id"] == "owner-1"
+        with open(saved_path, "rb") as handle:
+            assert handle.read() == _PDF_BYTES
+        mock_convert.delay.assert_not_called()
+
+        sections = {cmd[2] for cmd in mail.commands if cmd[0] == "FETCH" and "BODY.PEEK" in cmd[2]}
+        assert all("BODY.PEEK[3]" in section for section in sections)
+        assert not any("RFC822" in str(cmd) for cmd in mail.commands)
+
+        state = db_session.query(ImapSyncState).one()
+        assert state.last_seen_uid == 7
+        assert state.uid_validity == 100
+
+    def test_incremental_search_starts_after_last_seen_uid(self, db_session, types, tmp_path):
+        """A stored sync position limits the search to newer UIDs."""
+        db_session.add(ImapSyncState(mailbox_key="user@example.com", folder="INBOX", uid_validity=100, last_seen_uid=7))
+        db_session.commit()
+        # "8:*" still returns UID 7 when nothing newer exists.
+        mail = _FakeMailbox(uids=[7])
+
+        mock_process, _ = self._sync(mail, db_session, types, tmp_path)
+
+        assert mail.commands[0] == ("SEARCH", None, "UID 8:*")
+        assert not any(cmd[0] == "FETCH" for cmd in mail.commands)
+        mock_process.delay.assert_not_called()
+
+    def test_uidvalidity_change_resets_position(self, db_session, types, tmp_path):
+        """A new UIDVALIDITY discards the stored position and falls back to the recent window."""
+        db_session.add(ImapSyncState(mailbox_key="user@example.com", folder="INBOX", uid_validity=1, last_seen_uid=900))
+        db_session.commit()
+        mail = _FakeMailbox(uid_validity=200, uids=[])
+
+        self._sync(mail, db_session, types, tmp_path)
+
+        search = mail.commands[0]
+        assert search[0] == "SEARCH"
+        assert search[2].startswith("SINCE ")
+        assert "UNSEEN" in search
+        state = db_session.query(ImapSyncState).one()
+        assert state.uid_validity == 200
+        assert state.last_seen_uid == 0
+
+    def test_gmail_labels_and_delete_use_uid_store(self, db_session, types, tmp_path):
+        """Processed messages are labelled and deleted by UID, then expunged once."""
+        mail = _FakeMailbox(uids=[9], structures={9: _structure_response(9)}, body=base64.encodebytes(b"%PDF"))
+
+        self._sync(
+            mail,
+            db_session,
+            types,
+            tmp_path,
+            is_gmail_host=True,
+            gmail_apply_labels=True,
+            delete_after_process=True,
+        )
+
+        stores = [cmd for cmd in mail.commands if cmd[0] == "STORE"]
+        assert ("STORE", "9", "+X-GM-LABELS", "Ingested") in stores
+        assert ("STORE", "9", "+FLAGS", "\\Deleted") in stores
+        assert "X-GM-RAW" in mail.commands[0]
+        mail.expunge.assert_called_once()
+
+    def test_oversized_part_is_skipped(self, db_session, types, tmp_path):
+        """Parts above the upload limit are dropped but the UID is still recorded."""
+        mail = _FakeMailbox(uids=[7], structures={7: _structure_response()}, body=base64.encodebytes(_PDF_BYTES))
+
+        with patch("app.tasks.imap_tasks.stream_body_part", side_effect=ValueError("too big")):
+            mock_process, _ = self._sync(mail, db_session, types, tmp_path)
+
+        mock_process.delay.assert_not_called()
+        assert list(tmp_path.iterdir()) == []
+        assert db_session.query(ImapSyncState).one().last_seen_uid == 7
+
+    def test_failure_keeps_position_of_messages_already_queued(self, db_session, types, tmp_path):
+        """A failure mid-batch does not roll back the UIDs whose attachments were already queued."""
+        structures = {uid: _structure_response(uid) for uid in (7, 8)}
+        mail = _FakeMailbox(uids=[7, 8], structures=structures)
+
+        def stream(_mail, uid, _part, path, max_bytes):
+            if uid == 8:
+                raise ConnectionError("connection reset")
+            with open(path, "wb") as handle:
+                handle.write(b"%PDF")
+
+        with (
+            patch("app.tasks.imap_tasks.stream_body_part", side_effect=stream),
+            pytest.raises(ConnectionError),
+        ):
+            self._sync(mail, db_session, types, tmp_path)
+
+        assert db_session.query(ImapSyncState).one().last_seen_uid == 7
+
+    def test_missing_uidvalidity_raises(self, db_session, types, tmp_path):
+        """Servers that do not report UIDVALIDITY cannot be synced incrementally."""
+        import imaplib
+
+        with pytest.raises(imaplib.IMAP4.error):
+            self._sync(_FakeMailbox(uid_validity=None), db_session, types, tmp_path)
+
+
+@pytest.mark.unit
+class TestPollMailboxes:
+    """Tests for concurrent mailbox polling."""
+
+    def test_returns_errors_in_submission_order(self):
+        """Each poll reports its own exception (or None) in the original order."""
+
+        def fake_pull(**kwargs):
+            if kwargs["mailbox_key"] == "bad":
+                raise RuntimeError("boom")
+
+        with (
+            patch("app.tasks.imap_tasks.pull_inbox", side_effect=fake_pull),
+            patch("app.tasks.imap_tasks.settings") as mock_settings,
+        ):
+            mock_settings.imap_poll_concurrency = 4
+            results = _poll_mailboxes([{"mailbox_key": "a"}, {"mailbox_key": "bad"}, {"mailbox_key": "c"}])
+
+        assert results[0] is None
+        assert isinstance(results[1], RuntimeError)
+        assert results[2] is None
+
+    def test_legacy_mailboxes_are_polled_concurrently(self):
+        """The IMAP1/IMAP2 mailboxes share the bounded pool instead of being polled one after another."""
+        import threading
+
+        from app.tasks.imap_tasks import pull_all_inboxes
+
+        both_running = threading.Barrier(2, timeout=5)
+        with (
+            patch("app.tasks.imap_tasks.settings") as mock_settings,
+            patch("app.tasks.imap_tasks.acquire_lock", return_value=True),
+            patch("app.tasks.imap_tasks.release_lock"),
+            patch("app.tasks.imap_tasks._pull_user_imap_accounts"),
+            patch("app.tasks.imap_tasks._pull_user_integration_imap"),
+            patch("app.tasks.imap_tasks.check_and_pull_mailbox", side_effect=lambda **_: both_running.wait()) as check,
+        ):
+            mock_settings.imap_poll_concurrency = 2
+            for slot in ("imap1", "imap2"):
+                setattr(mock_settings, f"{slot}_host", f"{slot}.example.com")
+            pull_all_inboxes()
+
+        assert sorted(call.kwargs["mailbox_key"] for call in check.call_args_list) == ["imap1", "imap2"]
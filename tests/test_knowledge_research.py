@@ -6,6 +6,7 @@ from types import SimpleNamespace
 from unittest.mock import MagicMock, patch
 
 import pytest
+from sqlalchemy import event
 from sqlalchemy.exc import OperationalError
 from sqlalchemy.orm import Session
 
@@ -19,9 +20,12 @@ from app.tasks.knowledge_research import (
     _deduplicate_evidence,
     _excerpt,
     _filter_evidence_for_question,
+    _load_research_documents,
     _no_evidence_answer,
     _numeric,
+    _passage_excerpt,
     _plan_research,
+    _ResearchDocument,
     _should_stop_mapping,
     _synthesize,
     cleanup_knowledge_research_jobs,
@@ -407,7 +411,7 @@ def test_deduplication_merges_transport_legs_and_duplicate_documents():
 def test_map_batch_rejects_evidence_for_documents_outside_batch():
     from app.tasks.knowledge_research import _map_batch
 
-    record = SimpleNamespace(id=7, document_title="Lab", original_filename="lab.pdf", ocr_text="HbA1c 5.8 %")
+    record = _ResearchDocument(id=7, document_title="Lab", original_filename="lab.pdf", excerpt="HbA1c 5.8 %")
     provider = SimpleNamespace(
         chat_completion=lambda **_kwargs: (
             '{"evidence":[{"document_id":7,"event_key":"lab-1"},{"document_id":99,"event_key":"leak"}]}'
@@ -558,12 +562,8 @@ def test_occurrence_filter_requires_named_entity_in_cited_source():
         {"document_id": 2, "evidence_type": "hotel_stay", "claim": "Motel One stay"},
     ]
     records = {
-        1: SimpleNamespace(document_title="OTTO delivery", original_filename="delivery.pdf", ocr_text="Hermes"),
-        2: SimpleNamespace(
-            document_title="Motel One invoice",
-            original_filename="motel-one.pdf",
-            ocr_text="Motel One München-Garching",
-        ),
+        1: _ResearchDocument(1, "OTTO delivery", "delivery.pdf", "Hermes"),
+        2: _ResearchDocument(2, "Motel One invoice", "motel-one.pdf", "Motel One München-Garching"),
     }
 
     assert _filter_evidence_for_question("Wie oft war ich im Motel One?", evidence, records) == [evidence[1]]
@@ -589,6 +589,66 @@ def test_excerpt_does_not_let_frequent_generic_terms_starve_entity_terms():
     assert "AMAZON amount 387,70 EUR" in excerpt
 
 
+def test_passage_excerpt_keeps_reading_order_within_budget():
+    payloads = [
+        {"chunk_index": 7, "chunk_count": 40, "text": "Total 387,70 EUR"},
+        {"chunk_index": 2, "chunk_count": 40, "text": "Amazon order 302-1"},
+        {"chunk_index": 7, "chunk_count": 40, "text": "Total 387,70 EUR"},
+    ]
+
+    excerpt, truncated = _passage_excerpt(payloads)
+
+    assert excerpt == "Amazon order 302-1\n…\nTotal 387,70 EUR"
+    assert truncated is True
+    assert _passage_excerpt([{"chunk_index": 0, "chunk_count": 1, "text": "x" * 9_000}])[0] == "x" * 6_000
+
+
+def test_map_batches_load_indexed_passages_instead_of_full_text(db_session):
+    from app.models import FileRecord
+
+    long_text = "Amazon order " + ("filler " * 2_000)
+    indexed = FileRecord(filehash="a", local_filename="/tmp/a.pdf", file_size=1, ocr_text=long_text)
+    unindexed = FileRecord(filehash="b", local_filename="/tmp/b.pdf", file_size=1, ocr_text="Motel One")
+    db_session.add_all([indexed, unindexed])
+    db_session.commit()
+    indexed_id, unindexed_id = indexed.id, unindexed.id
+    passages = {indexed_id: [{"chunk_index": 3, "chunk_count": 30, "text": "Amazon order 387,70 EUR"}]}
+    statements = []
+
+    def record_statement(_conn, _cursor, statement, *_args):
+        statements.append(statement)
+
+    event.listen(db_session.get_bind(), "before_cursor_execute", record_statement)
+    try:
+        with patch("app.utils.vector_index.QdrantVectorIndex.top_passages", return_value=passages) as top_passages:
+            documents = _load_research_documents(db_session, [indexed_id, unindexed_id], "Amazon?", [0.1, 0.2])
+    finally:
+        event.remove(db_session.get_bind(), "before_cursor_execute", record_statement)
+
+    assert top_passages.call_args.kwargs["document_ids"] == [indexed_id, unindexed_id]
+    assert [(document.excerpt, document.truncated) for document in documents] == [
+        ("Amazon order 387,70 EUR", True),
+        ("Motel One", False),
+    ]
+    # Only the document without indexed chunks has its OCR text read.
+    text_queries = [statement for statement in statements if "ocr_text" in statement]
+    assert len(text_queries) == 1
+
+
+def test_map_batches_fall_back_to_full_text_without_the_vector_index(db_session):
+    from app.models import FileRecord
+
+    record = FileRecord(filehash="c", local_filename="/tmp/c.pdf", file_size=1, ocr_text="HbA1c 5.8 %")
+    db_session.add(record)
+    db_session.commit()
+
+    with patch("app.utils.vector_index.QdrantVectorIndex.top_passages") as top_passages:
+        (document,) = _load_research_documents(db_session, [record.id], "HbA1c", None)
+
+    top_passages.assert_not_called()
+    assert (document.excerpt, document.truncated) == ("HbA1c 5.8 %", False)
+
+
 def test_bounded_synthesis_reports_when_it_truncates():
     small, small_truncated = _bounded_synthesis_evidence([{"event_key": "one"}])
     large, large_truncated = _bounded_synthesis_evidence(
@@ -0,0 +1,173 @@
+"""Tests for live UI events (app/utils/live_events.py, app/api/events.py)."""
+
+import json
+import time
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from app.utils import live_events
+
+
+@pytest.fixture
+def enabled(monkeypatch):
+    """Enable publishing with a fresh, mocked Redis client."""
+    monkeypatch.setattr(live_events.settings, "live_events_enabled", True, raising=False)
+    monkeypatch.setattr(live_events, "_suspended_until", 0.0)
+    client = MagicMock()
+    monkeypatch.setattr(live_events, "_redis", lambda: client)
+    return client
+
+
+def _published(client):
+    return [(call.args[0], json.loads(call.args[1])) for call in client.publish.call_args_list]
+
+
+@pytest.mark.unit
+class TestPublishing:
+    """Tests for publish_event and publish_file_status."""
+
+    def test_disabled_publishing_is_a_no_op(self, monkeypatch):
+        monkeypatch.setattr(live_events.settings, "live_events_enabled", False, raising=False)
+        with patch.object(live_events, "_redis") as client:
+            assert live_events.publish_event(live_events.EVENT_QUEUE) is False
+        client.assert_not_called()
+
+    def test_events_go_to_the_owner_or_everyone(self, enabled):
+        assert live_events.publish_event(live_events.EVENT_NOTIFICATIONS, owner_id="alice") is True
+        assert live_events.publish_event(live_events.EVENT_QUEUE, {"n": 1}) is True
+
+        assert _published(enabled) == [
+            ("docuelevate:events:user:alice", {"event": "notifications", "data": {}}),
+            ("docuelevate:events:all", {"event": "queue", "data": {"n": 1}}),
+        ]
+        assert live_events.parse_event(enabled.publish.call_args.args[1]) == ("queue", {"n": 1})
+        assert live_events.parse_event("not json") is None
+
+    def test_redis_failures_pause_publishing(self, enabled):
+        enabled.publish.side_effect = ConnectionError("redis down")
+
+        assert live_events.publish_event(live_events.EVENT_QUEUE) is False
+        assert live_events.publish_event(live_events.EVENT_QUEUE) is False
+        assert enabled.publish.call_count == 1
+
+    def test_file_status_is_private_to_the_owner_in_multi_user_mode(self, enabled, monkeypatch, db_session):
+        from app.models import FileRecord
+
+        monkeypatch.setattr(live_events.settings, "multi_user_enabled", True, raising=False)
+        owned = FileRecord(filehash="a", local_filename="/tmp/a.pdf", file_size=1, owner_id="alice")
+        ownerless = FileRecord(filehash="b", local_filename="/tmp/b.pdf", file_size=1)
+        db_session.add_all([owned, ownerless])
+        db_session.commit()
+
+        live_events.publish_file_status(db_session, owned.id, "extract_text", "in_progress")
+        live_events.publish_file_status(db_session, ownerless.id, "extract_text", "in_progress")
+
+        assert _published(enabled) == [
+            (
+                "docuelevate:events:user:alice",
+                {
+                    "event": "file_status",
+                    "data": {"file_id": owned.id, "step_name": "extract_text", "status": "in_progress"},
+                },
+            )
+        ]
+
+    def test_file_status_is_broadcast_in_single_user_mode(self, enabled, monkeypatch):
+        monkeypatch.setattr(live_events.settings, "multi_user_enabled", False, raising=False)
+        db = MagicMock()
+
+        live_events.publish_file_status(db, 5, "compute_embedding", "success")
+
+        db.query.assert_not_called()
+        assert _published(enabled)[0][0] == "docuelevate:events:all"
+
+    def test_step_writer_publishes_changes(self, db_session):
+        from app.utils.step_manager import update_step_status
+
+        with patch("app.utils.step_manager.publish_file_status") as publish:
+            update_step_status(db_session, 9, "check_text", "success")
+        publish.assert_called_once_with(db_session, 9, "check_text", "success")
+
+    def test_worker_heartbeat_announces_only_changed_queues(self):
+        from app.utils.worker_telemetry import WorkerTelemetryStep
+
+        step = WorkerTelemetryStep.__new__(WorkerTelemetryStep)
+        step.client, step.last_counts = MagicMock(), None
+        snapshots = [
+            {"hostname": "w1", "active_by_queue": {"default": 1}},
+            {"hostname": "w1", "active_by_queue": {"default": 1}},
+            {"hostname": "w1", "active_by_queue": {}, "reserved_by_queue": {"default": 2}},
+        ]
+        with (
+            patch("app.utils.worker_telemetry.build_snapshot", side_effect=snapshots),
+            patch("app.utils.worker_telemetry.publish_event") as publish,
+        ):
+            for _ in snapshots:
+                step.publish(MagicMock(), 5)
+        assert publish.call_count == 2
+
+
+def _pubsub(*messages):
+    data = [None if message is None else {"type": "message", "data": json.dumps(message)} for message in messages]
+    return SimpleNamespace(get_message=AsyncMock(side_effect=data), aclose=AsyncMock())
+
+
+@pytest.mark.unit
+class TestEventStream:
+    """Tests for GET /api/events/stream."""
+
+    @pytest.mark.asyncio
+    async def test_stream_sends_snapshot_then_only_changes(self):
+        from app.api import events
+
+        messages = [
+            {"event": "file_status", "data": {"file_id": 3, "step_name": "check_text", "status": "success"}},
+            {"event": "notifications", "data": {}},
+            {"event": "queue", "data": {}},
+            {"event": "notifications", "data": {}},
+        ]
+        request = MagicMock()
+        request.is_disconnected = AsyncMock(side_effect=[False] * len(messages) + [True])
+        pubsub = _pubsub(*messages)
+        pending = iter([4, 3, 3])
+        unread = iter([1, 2, 2])
+
+        with (
+            patch.object(events, "_pending_count", side_effect=lambda: (time.monotonic(), next(pending))),
+            patch.object(events, "_unread_count", side_effect=lambda owner_id: next(unread)),
+        ):
+            frames = [frame async for frame in events._live_events(request, pubsub, "alice")]
+
+        assert frames == [
+            'event: queue\ndata: {"total_pending":4}\n\n',
+            'event: unread_count\ndata: {"count":1}\n\n',
+            'event: file_status\ndata: {"file_id":3,"step_name":"check_text","status":"success"}\n\n',
+            'event: queue\ndata: {"total_pending":3}\n\n',
+            'event: unread_count\ndata: {"count":2}\n\n',
+        ]
+        pubsub.aclose.assert_awaited_once()
+
+    def test_pending_count_is_shared_between_streams(self, monkeypatch):
+        from app.api import events
+
+        monkeypatch.setattr(events, "_pending_cache", None)
+        with (
+            patch.object(events, "SessionLocal", MagicMock()),
+            patch.object(events, "count_pending", return_value=6) as count,
+        ):
+            assert events._pending_count()[1] == events._pending_count()[1] == 6
+        count.assert_called_once()
+
+    def test_disabled_stream_answers_503_so_pages_poll(self, client, monkeypatch):
+        monkeypatch.setattr(live_events.settings, "live_events_enabled", False, raising=False)
+        assert client.get("/api/events/stream").status_code == 503
+
+    def test_unreachable_redis_answers_503(self, client, monkeypatch):
+        monkeypatch.setattr(live_events.settings, "live_events_enabled", True, raising=False)
+        pubsub = MagicMock(subscribe=AsyncMock(side_effect=ConnectionError("down")), aclose=AsyncMock())
+        redis_client = MagicMock(pubsub=MagicMock(return_value=pubsub), aclose=AsyncMock())
+        with patch("app.api.events.aioredis.Redis.from_url", return_value=redis_client):
+            assert client.get("/api/events/stream").status_code == 503
+        redis_client.aclose.assert_awaited_once()
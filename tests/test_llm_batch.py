@@ -0,0 +1,265 @@
+"""Tests for offline batch-API backfills (app/utils/llm_batch.py, app/tasks/llm_batch_tasks.py)."""
+
+import json
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.database import Base
+from app.models import FileRecord, LLMBatchJob
+from app.tasks import llm_batch_tasks
+from app.utils import llm_batch
+
+METADATA_JSON = '{"filename": "2024-01-05_Invoice", "title": "Invoice", "tags": ["acme"]}'
+
+
+@pytest.fixture
+def batch_env(monkeypatch, tmp_path):
+    """Batch mode with the local backend and a private database shared by every task module."""
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    session_factory = sessionmaker(bind=engine)
+    for module in ("app.tasks.llm_batch_tasks", "app.tasks.batch_tasks", "app.tasks.compute_embedding"):
+        monkeypatch.setattr(f"{module}.SessionLocal", session_factory)
+    monkeypatch.setattr(llm_batch.settings, "workdir", str(tmp_path), raising=False)
+    monkeypatch.setattr(llm_batch.settings, "llm_batch_mode_enabled", True, raising=False)
+    monkeypatch.setattr(llm_batch.settings, "llm_batch_backend", "local", raising=False)
+    monkeypatch.setattr(llm_batch.settings, "llm_batch_max_requests", 10, raising=False)
+    monkeypatch.setattr(llm_batch.settings, "ai_provider", "openai", raising=False)
+    monkeypatch.setattr(llm_batch_tasks, "log_task_progress", MagicMock())
+    yield session_factory
+    engine.dispose()
+
+
+def _add_file(session_factory, index, **fields):
+    with session_factory() as db:
+        record = FileRecord(
+            filehash=f"hash-{index}",
+            original_filename=f"doc{index}.pdf",
+            local_filename=f"/tmp/doc{index}.pdf",
+            file_size=100,
+            mime_type="application/pdf",
+            is_duplicate=False,
+            ocr_text=f"Invoice number {index} from ACME",
+            **fields,
+        )
+        db.add(record)
+        db.commit()
+        return record.id
+
+
+def _jobs(session_factory):
+    with session_factory() as db:
+        return db.query(LLMBatchJob).order_by(LLMBatchJob.id).all()
+
+
+@pytest.mark.unit
+class TestBackends:
+    """Tests for the batch backends and result helpers."""
+
+    def test_local_backend_runs_chat_and_embedding_requests(self, tmp_path):
+        backend = llm_batch.LocalBatchBackend(str(tmp_path / "batches"))
+        input_path = tmp_path / "in.jsonl"
+        llm_batch.write_jsonl(
+            str(input_path),
+            [
+                llm_batch.batch_request(
+                    "file-1", llm_batch.CHAT_ENDPOINT, {"model": "m", "messages": [{"role": "user", "content": "hi"}]}
+                ),
+                llm_batch.batch_request("file-2", llm_batch.EMBEDDINGS_ENDPOINT, {"model": "e", "input": "text"}),
+                llm_batch.batch_request("file-3", llm_batch.CHAT_ENDPOINT, {"model": "m", "messages": []}),
+            ],
+        )
+        provider = MagicMock()
+        provider.chat_completion.side_effect = ["hello", RuntimeError("rate limited")]
+
+        batch_id = backend.submit(str(input_path), llm_batch.CHAT_ENDPOINT)
+        with (
+            patch("app.utils.ai_provider.get_ai_provider", return_value=provider),
+            patch("app.utils.similarity.generate_embedding", return_value=[0.5, 0.25]),
+        ):
+            first = backend.poll(batch_id)
+        # Results are persisted: polling again does not call the model again.
+        second = backend.poll(batch_id)
+
+        assert first.status == second.status == "completed"
+        by_id = {result["custom_id"]: result for result in second.results}
+        assert llm_batch.result_content(by_id["file-1"]) == "hello"
+        assert llm_batch.result_embedding(by_id["file-2"]) == [0.5, 0.25]
+        assert llm_batch.result_content(by_id["file-3"]) is None
+        assert llm_batch.result_error(by_id["file-3"]) == "rate limited"
+        assert provider.chat_completion.call_count == 2
+
+    def test_openai_backend_submits_and_reads_output_and_error_files(self, tmp_path):
+        client = MagicMock()
+        client.files.create.return_value = SimpleNamespace(id="file-in")
+        client.batches.create.return_value = SimpleNamespace(id="batch_1")
+        input_path = tmp_path / "in.jsonl"
+        input_path.write_text("{}\n")
+        backend = llm_batch.OpenAIBatchBackend(client=client)
+
+        assert backend.submit(str(input_path), llm_batch.EMBEDDINGS_ENDPOINT) == "batch_1"
+        assert client.files.create.call_args.kwargs["purpose"] == "batch"
+        assert client.batches.create.call_args.kwargs == {
+            "input_file_id": "file-in",
+            "endpoint": "/v1/embeddings",
+            "completion_window": "24h",
+        }
+
+        client.batches.retrieve.return_value = SimpleNamespace(status="in_progress", errors=None)
+        assert backend.poll("batch_1").status == "in_progress"
+
+        client.batches.retrieve.return_value = SimpleNamespace(
+            status="completed", output_file_id="out", error_file_id="err"
+        )
+        client.files.content.side_effect = lambda file_id: SimpleNamespace(text=f'{{"custom_id": "{file_id}"}}\n')
+        assert [result["custom_id"] for result in backend.poll("batch_1").results] == ["out", "err"]
+
+    def test_base64_embedding_results_are_decoded(self):
+        import base64
+        from array import array
+
+        encoded = base64.b64encode(array("f", [0.5, -0.25]).tobytes()).decode()
+        result = {"custom_id": "file-1", "response": {"status_code": 200, "body": {"data": [{"embedding": encoded}]}}}
+        assert llm_batch.result_embedding(result) == [0.5, -0.25]
+
+    def test_unknown_backend_is_rejected(self):
+        with pytest.raises(ValueError):
+            llm_batch.get_batch_backend("carrier-pigeon")
+
+    def test_http_errors_are_failures(self):
+        result = {"custom_id": "file-1", "response": {"status_code": 429, "body": {"error": "slow down"}}}
+        assert llm_batch.result_content(result) is None
+        assert llm_batch.result_error(result) == "HTTP 429"
+
+
+@pytest.mark.unit
+class TestMetadataBackfill:
+    """Tests for backfill_missing_metadata in batch mode."""
+
+    def test_results_continue_the_pipeline_once(self, batch_env):
+        from app.tasks.batch_tasks import backfill_missing_metadata
+
+        first = _add_file(batch_env, 1)
+        second = _add_file(batch_env, 2)
+        provider = MagicMock()
+        provider.chat_completion.return_value = METADATA_JSON
+
+        result = backfill_missing_metadata()
+        assert result["queued"] == 2
+        # Files in an outstanding batch are not submitted again.
+        assert backfill_missing_metadata()["queued"] == 0
+
+        with (
+            patch("app.utils.ai_provider.get_ai_provider", return_value=provider),
+            patch("app.tasks.embed_metadata_into_pdf.embed_metadata_into_pdf.delay") as embed,
+        ):
+            assert llm_batch_tasks.poll_llm_batches() == {"applied": 1, "failed": 0, "pending": 0}
+            assert llm_batch_tasks.poll_llm_batches() == {"applied": 0, "failed": 0, "pending": 0}
+
+        assert sorted(call.args[3] for call in embed.call_args_list) == [first, second]
+        filename, ocr_text, metadata, _ = embed.call_args_list[0].args
+        assert metadata["title"] == "Invoice"
+        assert ocr_text.startswith("Invoice number")
+        (job,) = _jobs(batch_env)
+        assert (job.status, job.succeeded_count, job.failed_count) == ("applied", 2, 0)
+        steps = llm_batch_tasks.log_task_progress.call_args_list
+        assert sorted((call.kwargs["file_id"], call.args[1], call.args[2]) for call in steps) == [
+            (first, "extract_metadata_with_gpt", "success"),
+            (second, "extract_metadata_with_gpt", "success"),
+        ]
+
+    def test_invalid_responses_fail_the_metadata_step(self, batch_env):
+        from app.tasks.batch_tasks import backfill_missing_metadata
+
+        file_id = _add_file(batch_env, 1)
+        backfill_missing_metadata()
+        provider = MagicMock(chat_completion=MagicMock(return_value="no json here"))
+        with (
+            patch("app.utils.ai_provider.get_ai_provider", return_value=provider),
+            patch("app.tasks.embed_metadata_into_pdf.embed_metadata_into_pdf.delay") as embed,
+        ):
+            llm_batch_tasks.poll_llm_batches()
+
+        embed.assert_not_called()
+        (step,) = llm_batch_tasks.log_task_progress.call_args_list
+        assert step.args[1:3] == ("extract_metadata_with_gpt", "failure") and step.kwargs["file_id"] == file_id
+
+    def test_other_ai_providers_run_metadata_batches_locally(self, batch_env, monkeypatch):
+        from app.tasks.batch_tasks import backfill_missing_metadata
+
+        monkeypatch.setattr(llm_batch.settings, "llm_batch_backend", "openai", raising=False)
+        monkeypatch.setattr(llm_batch.settings, "ai_provider", "anthropic", raising=False)
+        _add_file(batch_env, 1)
+        with patch.object(llm_batch, "OpenAIBatchBackend") as openai_backend:
+            assert backfill_missing_metadata()["queued"] == 1
+
+        openai_backend.assert_not_called()
+        (job,) = _jobs(batch_env)
+        assert job.backend == "local"
+
+    def test_documents_completed_meanwhile_are_skipped(self, batch_env):
+        from app.tasks.batch_tasks import backfill_missing_metadata
+
+        file_id = _add_file(batch_env, 1)
+        backfill_missing_metadata()
+        with batch_env() as db:
+            db.query(FileRecord).filter(FileRecord.id == file_id).update({"ai_metadata": "{}"})
+            db.commit()
+
+        provider = MagicMock(chat_completion=MagicMock(return_value=METADATA_JSON))
+        with (
+            patch("app.utils.ai_provider.get_ai_provider", return_value=provider),
+            patch("app.tasks.embed_metadata_into_pdf.embed_metadata_into_pdf.delay") as embed,
+        ):
+            llm_batch_tasks.poll_llm_batches()
+        embed.assert_not_called()
+
+    def test_failed_batches_release_their_files(self, batch_env):
+        from app.tasks.batch_tasks import backfill_missing_metadata
+
+        _add_file(batch_env, 1)
+        backfill_missing_metadata()
+        failed = llm_batch.BatchPoll(status="expired", error="window elapsed")
+        with patch.object(llm_batch.LocalBatchBackend, "poll", return_value=failed):
+            assert llm_batch_tasks.poll_llm_batches()["failed"] == 1
+
+        (job,) = _jobs(batch_env)
+        assert job.status == "failed" and "window elapsed" in job.error
+        assert backfill_missing_metadata()["queued"] == 1
+
+    def test_disabled_batch_mode_keeps_per_document_tasks(self, batch_env, monkeypatch):
+        from app.tasks.batch_tasks import backfill_missing_metadata
+
+        monkeypatch.setattr(llm_batch.settings, "llm_batch_mode_enabled", False, raising=False)
+        _add_file(batch_env, 1)
+        with patch("app.tasks.extract_metadata_with_gpt.extract_metadata_with_gpt.delay") as extract:
+            assert backfill_missing_metadata() == {"queued": 1}
+        extract.assert_called_once()
+        assert _jobs(batch_env) == []
+
+
+@pytest.mark.unit
+class TestEmbeddingBackfill:
+    """Tests for backfill_missing_embeddings in batch mode."""
+
+    def test_embeddings_are_stored_and_indexed(self, batch_env):
+        from app.tasks.compute_embedding import backfill_missing_embeddings
+
+        file_id = _add_file(batch_env, 1)
+        with patch("app.tasks.compute_embedding.is_ai_provider_configured", return_value=True):
+            assert backfill_missing_embeddings.apply().get()["queued"] == 1
+
+        with (
+            patch("app.utils.similarity.generate_embedding", return_value=[0.1, 0.2, 0.3]),
+            patch("app.tasks.compute_embedding._queue_vector_index") as index,
+        ):
+            llm_batch_tasks.poll_llm_batches()
+
+        with batch_env() as db:
+            assert json.loads(db.get(FileRecord, file_id).embedding) == [0.1, 0.2, 0.3]
+        index.assert_called_once_with(file_id)
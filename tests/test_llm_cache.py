@@ -0,0 +1,209 @@
+"""Tests for the content-addressed LLM response cache (app/utils/llm_cache.py)."""
+
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.database import Base
+from app.models import LLMResponseCache
+from app.utils import llm_cache
+from app.utils import metrics as metrics_module
+from app.utils.ai_provider import AIProvider, _collect_usage
+
+MESSAGES = [{"role": "user", "content": "Invoice 42 from ACME"}]
+
+
+class CountingProvider(AIProvider):
+    """Provider that answers with a counter and reports usage like a real SDK call."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def chat_completion(self, messages, model, temperature=0, **kwargs):
+        self.calls += 1
+        _collect_usage(SimpleNamespace(prompt_tokens=100, completion_tokens=20))
+        return f"answer {self.calls}"
+
+
+@pytest.fixture
+def cache_db(monkeypatch):
+    """Enable the cache and back it with a private in-memory database."""
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine, tables=[LLMResponseCache.__table__])
+    session_factory = sessionmaker(bind=engine)
+    monkeypatch.setattr(llm_cache, "SessionLocal", session_factory)
+    monkeypatch.setattr(llm_cache.settings, "llm_cache_enabled", True, raising=False)
+    monkeypatch.setattr(llm_cache.settings, "llm_cache_disabled_stages", "", raising=False)
+    yield session_factory
+    engine.dispose()
+
+
+def _complete(provider, stage="refine_text", **overrides):
+    call = {"messages": MESSAGES, "model": "gpt-4o-mini", "temperature": 0, "file_id": 7, **overrides}
+    return llm_cache.cached_chat_completion(provider, stage, **call)
+
+
+@pytest.mark.unit
+class TestCachedChatCompletion:
+    """Tests for cached_chat_completion."""
+
+    def test_identical_requests_are_answered_from_the_cache(self, cache_db):
+        provider = CountingProvider()
+        assert _complete(provider) == "answer 1"
+        assert _complete(provider) == "answer 1"
+        assert provider.calls == 1
+
+        with cache_db() as db:
+            row = db.query(LLMResponseCache).one()
+        assert (row.stage, row.prompt_tokens, row.completion_tokens, row.hit_count) == ("refine_text", 100, 20, 1)
+        assert row.size_bytes == len("answer 1")
+
+    @pytest.mark.parametrize(
+        "overrides",
+        [
+            {"model": "gpt-4o"},
+            {"temperature": 0.3},
+            {"messages": [{"role": "user", "content": "Invoice 43 from ACME"}]},
+        ],
+    )
+    def test_model_temperature_and_input_are_part_of_the_key(self, cache_db, overrides):
+        provider = CountingProvider()
+        _complete(provider)
+        assert _complete(provider, **overrides) == "answer 2"
+
+    def test_stage_and_template_version_are_part_of_the_key(self, cache_db, monkeypatch):
+        provider = CountingProvider()
+        _complete(provider, stage="refine_text")
+        assert _complete(provider, stage="translate") == "answer 2"
+
+        monkeypatch.setitem(llm_cache.STAGE_VERSIONS, "refine_text", "2")
+        assert _complete(provider, stage="refine_text") == "answer 3"
+
+    def test_disabled_stage_always_calls_the_model(self, cache_db, monkeypatch):
+        monkeypatch.setattr(llm_cache.settings, "llm_cache_disabled_stages", "translate, refine_text", raising=False)
+        provider = CountingProvider()
+        _complete(provider)
+        _complete(provider)
+        assert provider.calls == 2
+        with cache_db() as db:
+            assert db.query(LLMResponseCache).count() == 0
+
+    def test_mocked_settings_leave_the_cache_off(self, monkeypatch):
+        monkeypatch.setattr(llm_cache, "settings", MagicMock())
+        assert llm_cache.stage_cache_enabled("refine_text") is False
+
+    def test_responses_without_a_document_are_not_stored(self, cache_db):
+        provider = CountingProvider()
+        _complete(provider, file_id=None)
+        assert _complete(provider, file_id=None) == "answer 2"
+        with cache_db() as db:
+            assert db.query(LLMResponseCache).count() == 0
+
+    def test_document_scope_attributes_stored_responses(self, cache_db):
+        provider = CountingProvider()
+        with llm_cache.llm_cache_file(42):
+            _complete(provider, file_id=None)
+        with cache_db() as db:
+            assert db.query(LLMResponseCache.file_id).scalar() == 42
+
+    def test_purge_deletes_only_the_given_documents(self, cache_db):
+        provider = CountingProvider()
+        _complete(provider, file_id=1)
+        _complete(provider, stage="translate", file_id=2)
+        with cache_db() as db:
+            assert llm_cache.purge_llm_cache_for_files(db, [1]) == 1
+            db.commit()
+            assert [row.file_id for row in db.query(LLMResponseCache)] == [2]
+
+    def test_rejected_responses_are_not_stored(self, cache_db):
+        provider = CountingProvider()
+        _complete(provider, stage="extract_metadata", validate=lambda text: False)
+        assert _complete(provider, stage="extract_metadata") == "answer 2"
+
+    def test_expired_entries_are_misses(self, cache_db, monkeypatch):
+        provider = CountingProvider()
+        _complete(provider)
+        with cache_db() as db:
+            db.query(LLMResponseCache).update({"created_at": datetime.now(timezone.utc) - timedelta(days=40)})
+            db.commit()
+        assert _complete(provider) == "answer 2"
+
+    def test_database_errors_fail_open(self, cache_db, monkeypatch):
+        from sqlalchemy.exc import OperationalError
+
+        def broken_session():
+            raise OperationalError("SELECT", {}, Exception("database is locked"))
+
+        monkeypatch.setattr(llm_cache, "SessionLocal", broken_session)
+        provider = CountingProvider()
+        assert _complete(provider) == "answer 1"
+        assert _complete(provider) == "answer 2"
+
+    def test_hits_and_saved_tokens_are_exported(self, cache_db, monkeypatch):
+        monkeypatch.setattr(metrics_module.settings, "metrics_enabled", True, raising=False)
+        metrics_module.reset_metrics()
+        try:
+            provider = CountingProvider()
+            _complete(provider)
+            _complete(provider)
+            _complete(provider)
+            registry = metrics_module.get_metrics().registry
+            sample = registry.get_sample_value
+            assert sample("docuelevate_cache_requests_total", {"cache": "llm:refine_text", "result": "hit"}) == 2
+            assert sample("docuelevate_cache_requests_total", {"cache": "llm:refine_text", "result": "miss"}) == 1
+            assert sample("docuelevate_llm_cache_saved_tokens_total", {"stage": "refine_text", "kind": "prompt"}) == 200
+        finally:
+            metrics_module.reset_metrics()
+
+
+def _entry(key, size, last_used, created=None):
+    now = datetime.now(timezone.utc)
+    return LLMResponseCache(
+        cache_key=key,
+        stage="refine_text",
+        model="m",
+        response="x" * size,
+        size_bytes=size,
+        created_at=created or now,
+        last_used_at=now - timedelta(hours=last_used),
+    )
+
+
+@pytest.mark.unit
+class TestPrune:
+    """Tests for prune_llm_cache and the batch task."""
+
+    def test_evicts_expired_then_least_recently_used(self, cache_db):
+        old = datetime.now(timezone.utc) - timedelta(days=31)
+        with cache_db() as db:
+            db.add_all(
+                [
+                    _entry("expired", 10, last_used=0, created=old),
+                    _entry("fresh", 40, last_used=1),
+                    _entry("recent", 40, last_used=2),
+                    _entry("stale", 40, last_used=3),
+                ]
+            )
+            db.commit()
+            result = llm_cache.prune_llm_cache(db, max_age_days=30, max_bytes=100)
+            db.commit()
+            remaining = {row.cache_key for row in db.query(LLMResponseCache)}
+
+        assert result == {"expired": 1, "evicted": 1}
+        assert remaining == {"fresh", "recent"}
+
+    def test_batch_task_reports_counts(self, cache_db):
+        from app.tasks.batch_tasks import prune_llm_response_cache
+
+        with (
+            patch("app.tasks.batch_tasks.SessionLocal", cache_db),
+            patch("app.tasks.batch_tasks._update_job_status") as update_status,
+        ):
+            assert prune_llm_response_cache() == {"expired": 0, "evicted": 0}
+        update_status.assert_called_once()
+        assert update_status.call_args.args[:2] == ("prune-llm-response-cache", "success")
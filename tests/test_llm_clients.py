@@ -0,0 +1,105 @@
+"""Tests for the pooled LLM/embedding client registry (app/utils/llm_clients.py)."""
+
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import openai
+import pytest
+
+from app.utils import llm_clients
+from app.utils.ai_provider import AIProvider, OpenAIProvider, PortkeyProvider
+
+
+@pytest.mark.unit
+class TestRegistry:
+    """Tests for get_openai_client / get_async_openai_client."""
+
+    def test_clients_are_shared_per_endpoint_and_credential(self):
+        first = llm_clients.get_openai_client(api_key="sk-a", base_url="http://llm.local/v1")
+        assert llm_clients.get_openai_client(api_key="sk-a", base_url="http://llm.local/v1") is first
+        assert llm_clients.get_openai_client(api_key="sk-b", base_url="http://llm.local/v1") is not first
+        assert llm_clients.get_openai_client(api_key="sk-a", base_url="http://other.local/v1") is not first
+        assert isinstance(first, openai.OpenAI)
+
+    def test_keys_hold_fingerprints_not_secrets(self):
+        llm_clients.get_openai_client(api_key="sk-very-secret", base_url="http://llm.local/v1")
+        (key,) = llm_clients._sync_clients
+        assert "sk-very-secret" not in repr(key)
+        assert llm_clients.credential_fingerprint("sk-very-secret", []) in key
+
+    def test_pool_settings_are_applied_and_rebuild_the_client(self, monkeypatch):
+        monkeypatch.setattr(llm_clients.settings, "llm_http_max_connections", 8, raising=False)
+        monkeypatch.setattr(llm_clients.settings, "llm_http_max_keepalive_connections", 4, raising=False)
+        monkeypatch.setattr(llm_clients.settings, "llm_http_keepalive_expiry", 15.0, raising=False)
+        with patch.object(openai, "DefaultHttpxClient", wraps=openai.DefaultHttpxClient) as http_client:
+            first = llm_clients.get_openai_client(api_key="sk-a", base_url="http://llm.local/v1")
+            limits = http_client.call_args.kwargs["limits"]
+            assert (limits.max_connections, limits.max_keepalive_connections, limits.keepalive_expiry) == (8, 4, 15.0)
+
+            monkeypatch.setattr(llm_clients.settings, "llm_http_max_connections", 16, raising=False)
+            assert llm_clients.get_openai_client(api_key="sk-a", base_url="http://llm.local/v1") is not first
+
+    def test_registry_is_bounded(self, monkeypatch):
+        monkeypatch.setattr(llm_clients, "MAX_CLIENTS", 2)
+        for index in range(4):
+            llm_clients.get_openai_client(api_key=f"sk-{index}", base_url="http://llm.local/v1")
+        assert len(llm_clients._sync_clients) == 2
+
+    def test_azure_options_build_an_azure_client(self):
+        client = llm_clients.get_openai_client(
+            api_key="az", azure_endpoint="https://res.openai.azure.com", api_version="2024-02-01"
+        )
+        assert isinstance(client, openai.AzureOpenAI)
+
+    def test_async_clients_are_cached_per_event_loop(self):
+        async def fetch_twice():
+            options = {"api_key": "sk-a", "base_url": "http://llm.local/v1"}
+            return llm_clients.get_async_openai_client(**options), llm_clients.get_async_openai_client(**options)
+
+        first, again = asyncio.run(fetch_twice())
+        other_loop, _ = asyncio.run(fetch_twice())
+        assert first is again
+        assert isinstance(first, openai.AsyncOpenAI)
+        assert other_loop is not first
+
+    def test_async_client_requires_a_running_loop(self):
+        with pytest.raises(RuntimeError):
+            llm_clients.get_async_openai_client(api_key="sk-a")
+
+
+def _completion(content):
+    return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))], usage=None)
+
+
+@pytest.mark.unit
+class TestProviders:
+    """Tests for providers built on the registry."""
+
+    def test_providers_reuse_the_pooled_client(self):
+        first = OpenAIProvider(api_key="sk-a", base_url="http://llm.local/v1")
+        second = OpenAIProvider(api_key="sk-a", base_url="http://llm.local/v1")
+        assert first._client is second._client
+
+    def test_portkey_headers_are_part_of_the_key(self):
+        with_vk = PortkeyProvider(api_key="pk", virtual_key="vk-1")
+        other_vk = PortkeyProvider(api_key="pk", virtual_key="vk-2")
+        assert with_vk._client is not other_vk._client
+
+    def test_achat_completion_uses_the_async_client(self):
+        provider = OpenAIProvider(api_key="sk-a", base_url="http://llm.local/v1")
+        async_client = MagicMock()
+        async_client.chat.completions.create = AsyncMock(return_value=_completion("async answer"))
+
+        with patch("app.utils.ai_provider.get_async_openai_client", return_value=async_client):
+            result = asyncio.run(provider.achat_completion([{"role": "user", "content": "hi"}], model="gpt-4o"))
+
+        assert result == "async answer"
+        assert async_client.chat.completions.create.await_args.kwargs["model"] == "gpt-4o"
+
+    def test_default_achat_completion_runs_the_sync_call_in_a_thread(self):
+        class EchoProvider(AIProvider):
+            def chat_completion(self, messages, model, temperature=0, **kwargs):
+                return f"{model}:{messages[0]['content']}"
+
+        assert asyncio.run(EchoProvider().achat_completion([{"role": "user", "content": "x"}], model="m")) == "m:x"
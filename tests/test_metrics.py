@@ -0,0 +1,209 @@
+"""Tests for the Prometheus metrics subsystem (app/utils/metrics.py, /metrics, MetricsMiddleware)."""
+
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from prometheus_client.parser import text_string_to_metric_families
+
+from app.api.metrics import router as metrics_router
+from app.middleware.metrics import MetricsMiddleware
+from app.utils import metrics as metrics_module
+
+
+@pytest.fixture
+def enabled(monkeypatch):
+    """Enable metrics for the test with a fresh registry, single-process mode."""
+    monkeypatch.delenv("PROMETHEUS_MULTIPROC_DIR", raising=False)
+    monkeypatch.delenv("prometheus_multiproc_dir", raising=False)
+    monkeypatch.setattr(metrics_module.settings, "metrics_enabled", True, raising=False)
+    metrics_module.reset_metrics()
+    yield metrics_module.get_metrics()
+    metrics_module.reset_metrics()
+
+
+def _sample(metrics, name, **labels):
+    return metrics.registry.get_sample_value(name, labels)
+
+
+@pytest.mark.unit
+class TestRecording:
+    """Tests for the recording helpers."""
+
+    def test_disabled_helpers_are_no_ops(self, monkeypatch):
+        monkeypatch.setattr(metrics_module.settings, "metrics_enabled", False, raising=False)
+        metrics_module.reset_metrics()
+        metrics_module.record_cache_lookup("x", True)
+        metrics_module.observe_step("task-1", "ocr", "in_progress")
+        assert metrics_module.get_metrics() is None
+
+    def test_mocked_settings_do_not_enable_metrics(self, monkeypatch):
+        """A MagicMock settings object (common in tests) is not an explicit True."""
+        monkeypatch.setattr(metrics_module, "settings", MagicMock())
+        metrics_module.reset_metrics()
+        assert metrics_module.metrics_enabled() is False
+        metrics_module.reset_metrics()
+
+    def test_step_and_task_durations(self, enabled, monkeypatch):
+        clock = iter([10.0, 12.5, 20.0, 21.0])
+        monkeypatch.setattr(metrics_module.time, "perf_counter", lambda: next(clock))
+
+        metrics_module.observe_step("task-1", "run_ocr_providers", "in_progress")
+        metrics_module.observe_step("task-1", "run_ocr_providers", "success")
+        metrics_module.task_started("task-2")
+        metrics_module.task_finished("task-2", "app.tasks.process_document", "SUCCESS")
+        # A terminal entry without a matching in_progress entry is ignored.
+        metrics_module.observe_step("task-3", "run_ocr_providers", "failure")
+
+        assert (
+            _sample(enabled, "docuelevate_step_duration_seconds_sum", step="run_ocr_providers", status="success") == 2.5
+        )
+        assert (
+            _sample(enabled, "docuelevate_step_duration_seconds_count", step="run_ocr_providers", status="failure")
+            is None
+        )
+        assert (
+            _sample(
+                enabled, "docuelevate_task_duration_seconds_sum", task="app.tasks.process_document", state="SUCCESS"
+            )
+            == 1.0
+        )
+
+    def test_pending_timings_are_bounded(self, enabled, monkeypatch):
+        monkeypatch.setattr(metrics_module, "MAX_PENDING_TIMINGS", 3)
+        for index in range(5):
+            metrics_module.task_started(f"task-{index}")
+        assert len(enabled._timings) == 3
+        assert ("task", "task-0") not in enabled._timings
+
+    def test_llm_ocr_embedding_and_cache(self, enabled):
+        usage = SimpleNamespace(prompt_tokens=120, completion_tokens=30)
+        metrics_module.record_llm_request("openai", "gpt-4o", 0.4, usage)
+        metrics_module.record_llm_request("openai", "gpt-4o", 0.1, outcome="error")
+        metrics_module.record_ocr("tesseract", 3, 1.5)
+        metrics_module.record_embedding_request("text-embedding-3-small", 16, 0.2)
+        metrics_module.record_cache_lookup("mime_types", True)
+        metrics_module.record_cache_lookup("mime_types", False)
+        metrics_module.record_cache_lookup("mime_types", True)
+
+        assert _sample(enabled, "docuelevate_llm_tokens_total", provider="openai", model="gpt-4o", kind="prompt") == 120
+        assert (
+            _sample(
+                enabled,
+                "docuelevate_llm_request_duration_seconds_count",
+                provider="openai",
+                model="gpt-4o",
+                outcome="error",
+            )
+            == 1
+        )
+        assert _sample(enabled, "docuelevate_ocr_pages_total", provider="tesseract") == 3
+        assert _sample(enabled, "docuelevate_embedding_batch_size_sum", model="text-embedding-3-small") == 16
+        assert _sample(enabled, "docuelevate_cache_requests_total", cache="mime_types", result="hit") == 2
+
+    def test_db_pool_gauge_tracks_checkouts(self, enabled):
+        from sqlalchemy import create_engine, text
+        from sqlalchemy.pool import StaticPool
+
+        engine = create_engine("sqlite://", poolclass=StaticPool)
+        metrics_module.install_db_pool_hooks(engine)
+        with engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+            assert _sample(enabled, "docuelevate_db_connections_checked_out") == 1
+        assert _sample(enabled, "docuelevate_db_connections_checked_out") == 0
+
+    def test_ai_provider_records_latency_and_tokens(self, enabled):
+        from app.utils.ai_provider import OpenAIProvider
+
+        with patch("openai.OpenAI"):
+            provider = OpenAIProvider(api_key="sk-test")
+        provider._client.chat.completions.create.return_value = SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content="ok"))],
+            usage=SimpleNamespace(prompt_tokens=5, completion_tokens=2),
+        )
+        assert provider.chat_completion([{"role": "user", "content": "hi"}], model="gpt-4o-mini") == "ok"
+        assert (
+            _sample(enabled, "docuelevate_llm_tokens_total", provider="openai", model="gpt-4o-mini", kind="completion")
+            == 2
+        )
+
+
+@pytest.mark.unit
+class TestQueueDepthCollector:
+    """Tests for the scrape-time queue depth collector."""
+
+    def test_sums_priority_lists_per_queue(self):
+        collector = metrics_module.QueueDepthCollector("redis://broker", queues=("a", "b"))
+        pipe = MagicMock()
+        pipe.execute.return_value = [1, 0, 0, 0, 0, 0, 0, 0, 0, 4] + [2] + [0] * 9
+        collector._client = MagicMock(pipeline=MagicMock(return_value=pipe))
+
+        (family,) = list(collector.collect())
+        assert {sample.labels["queue"]: sample.value for sample in family.samples} == {"a": 5, "b": 2}
+        assert pipe.llen.call_args_list[1].args == ("a\x06\x161",)
+
+    def test_redis_errors_yield_nothing(self):
+        collector = metrics_module.QueueDepthCollector("redis://broker")
+        collector._client = MagicMock(pipeline=MagicMock(side_effect=ConnectionError("down")))
+        assert list(collector.collect()) == []
+        assert collector._client is None
+
+
+def _app():
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware)
+    app.include_router(metrics_router)
+
+    @app.get("/items/{item_id}")
+    def read_item(item_id: int):
+        return {"id": item_id}
+
+    return app
+
+
+@pytest.mark.unit
+class TestEndpointAndMiddleware:
+    """Tests for GET /metrics and the HTTP latency middleware."""
+
+    def test_metrics_endpoint_is_hidden_when_disabled(self, monkeypatch):
+        monkeypatch.setattr(metrics_module.settings, "metrics_enabled", False, raising=False)
+        metrics_module.reset_metrics()
+        assert TestClient(_app()).get("/metrics").status_code == 404
+
+    def test_routes_are_labelled_by_template(self, enabled, monkeypatch):
+        monkeypatch.setattr(metrics_module.settings, "metrics_token", None, raising=False)
+        monkeypatch.setattr(metrics_module.settings, "celery_broker_url", "memory://", raising=False)
+        client = TestClient(_app())
+        client.get("/items/1")
+        client.get("/items/2")
+        client.get("/missing")
+
+        response = client.get("/metrics")
+        assert response.status_code == 200
+        families = {family.name: family for family in text_string_to_metric_families(response.text)}
+        counts = {
+            (sample.labels["route"], sample.labels["status"]): sample.value
+            for sample in families["docuelevate_http_request_duration_seconds"].samples
+            if sample.name.endswith("_count")
+        }
+        assert counts[("/items/{item_id}", "200")] == 2
+        assert counts[("<unmatched>", "404")] == 1
+
+    def test_token_is_required_when_configured(self, enabled, monkeypatch):
+        monkeypatch.setattr(metrics_module.settings, "metrics_token", "s3cret", raising=False)
+        monkeypatch.setattr(metrics_module.settings, "celery_broker_url", "memory://", raising=False)
+        client = TestClient(_app())
+        assert client.get("/metrics").status_code == 401
+        assert client.get("/metrics", headers={"Authorization": "Bearer wrong"}).status_code == 401
+        assert client.get("/metrics", headers={"Authorization": "Bearer s3cret"}).status_code == 200
+
+    def test_multiprocess_mode_aggregates_directory(self, enabled, monkeypatch, tmp_path):
+        """With PROMETHEUS_MULTIPROC_DIR the scrape reads the shared directory, not the local registry."""
+        monkeypatch.setenv("PROMETHEUS_MULTIPROC_DIR", str(tmp_path))
+        monkeypatch.setattr(metrics_module.settings, "celery_broker_url", "memory://", raising=False)
+        with patch("prometheus_client.multiprocess.MultiProcessCollector") as collector:
+            body, _ = metrics_module.render_latest()
+        assert collector.call_args.kwargs["path"] == str(tmp_path)
+        assert b"docuelevate_http_request_duration_seconds" not in body
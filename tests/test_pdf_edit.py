@@ -0,0 +1,151 @@
+"""Tests for the single-pass PDF editor in app/utils/pdf_edit.py."""
+
+import io
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pypdf
+import pytest
+
+from app.utils.pdf_edit import _reserve_object_numbers, apply_pdf_edits
+
+INFO = {
+    "/Title": "2024-01-15_Invoice",
+    "/Author": "Amazon",
+    "/Subject": "Invoice",
+    "/Keywords": "invoice, amazon",
+}
+
+
+@pytest.fixture
+def sample_pdf(tmp_path):
+    """Write a three-page PDF and return its path."""
+    writer = pypdf.PdfWriter()
+    for _ in range(3):
+        writer.add_blank_page(width=595, height=842)
+    path = tmp_path / "sample.pdf"
+    with open(path, "wb") as handle:
+        writer.write(handle)
+    return path
+
+
+def _strict_reader(path) -> pypdf.PdfReader:
+    return pypdf.PdfReader(io.BytesIO(path.read_bytes()), strict=True)
+
+
+@pytest.mark.unit
+class TestApplyPdfEdits:
+    """Tests for apply_pdf_edits."""
+
+    def test_metadata_is_appended_as_incremental_update(self, sample_pdf):
+        """The original bytes stay untouched and only a small update is appended."""
+        original = sample_pdf.read_bytes()
+
+        result = apply_pdf_edits(str(sample_pdf), info=INFO)
+
+        edited = sample_pdf.read_bytes()
+        assert result.mode == "incremental"
+        assert edited.startswith(original)
+        assert len(edited) - len(original) == result.bytes_written
+        assert set(result.timings_ms) == {"parse", "edit", "write"}
+
+        reader = _strict_reader(sample_pdf)
+        assert reader.metadata.title == "2024-01-15_Invoice"
+        assert reader.metadata.author == "Amazon"
+        assert len(reader.pages) == 3
+
+    def test_xmp_mirrors_document_info(self, sample_pdf):
+        """Title, creator, description and keywords are written to XMP as well."""
+        apply_pdf_edits(str(sample_pdf), info=INFO)
+
+        xmp = _strict_reader(sample_pdf).xmp_metadata
+        assert xmp.dc_title == {"x-default": "2024-01-15_Invoice"}
+        assert xmp.dc_creator == ["Amazon"]
+        assert xmp.dc_description == {"x-default": "Invoice"}
+        assert xmp.pdf_keywords == "invoice, amazon"
+        assert xmp.dc_subject == ["invoice", "amazon"]
+
+    def test_rotations_skip_zero_angles_and_unknown_pages(self, sample_pdf):
+        """Only valid pages with non-zero angles are rotated."""
+        result = apply_pdf_edits(str(sample_pdf), rotations={0: 90, 1: 0, 7: 180}, update_xmp=False)
+
+        assert result.applied_rotations == {0: 90}
+        assert [page.rotation for page in _strict_reader(sample_pdf).pages] == [90, 0, 0]
+
+    def test_chained_updates_stay_readable(self, sample_pdf):
+        """Rotation followed by metadata embedding produces a valid multi-revision file."""
+        apply_pdf_edits(str(sample_pdf), rotations={2: 270}, update_xmp=False)
+        apply_pdf_edits(str(sample_pdf), info=INFO)
+        apply_pdf_edits(str(sample_pdf), info={"/Title": "Renamed"})
+
+        reader = _strict_reader(sample_pdf)
+        assert reader.metadata.title == "Renamed"
+        assert reader.metadata.author == "Amazon"
+        assert reader.pages[2].rotation == 270
+
+    def test_object_number_reservation(self, sample_pdf):
+        """New objects are numbered from the previous revision's /Size.
+
+        Guards the pypdf internals _reserve_object_numbers relies on; if this
+        fails after a pypdf upgrade, revisit that function and the pin.
+        """
+        apply_pdf_edits(str(sample_pdf), info=INFO)
+        reader = pypdf.PdfReader(str(sample_pdf))
+        writer = pypdf.PdfWriter(reader, incremental=True)
+
+        _reserve_object_numbers(writer, reader)
+
+        assert isinstance(writer._objects, list)
+        assert writer._add_object(pypdf.generic.NullObject()).idnum == reader.trailer["/Size"]
+
+    def test_unexpected_writer_internals_fall_back_to_rewrite(self, sample_pdf):
+        """Without the expected object table no incremental update is attempted."""
+        reader = pypdf.PdfReader(str(sample_pdf))
+        with pytest.raises(RuntimeError):
+            _reserve_object_numbers(SimpleNamespace(), reader)
+
+        with patch("app.utils.pdf_edit._reserve_object_numbers", side_effect=RuntimeError("no object table")):
+            result = apply_pdf_edits(str(sample_pdf), info=INFO)
+
+        assert result.mode == "rewrite"
+        assert _strict_reader(sample_pdf).metadata.title == "2024-01-15_Invoice"
+
+    def test_output_path_leaves_source_untouched(self, sample_pdf, tmp_path):
+        """Editing into a separate file copies the source and reports the copied bytes."""
+        original = sample_pdf.read_bytes()
+        output = tmp_path / "processed.pdf"
+
+        result = apply_pdf_edits(str(sample_pdf), str(output), info=INFO)
+
+        assert sample_pdf.read_bytes() == original
+        assert result.bytes_copied == len(original)
+        assert "copy" in result.timings_ms
+        assert _strict_reader(output).metadata.subject == "Invoice"
+
+    def test_no_changes_leaves_file_unchanged(self, sample_pdf):
+        """Nothing is written when there is nothing to edit."""
+        original = sample_pdf.read_bytes()
+
+        result = apply_pdf_edits(str(sample_pdf), rotations={0: 0})
+
+        assert result.mode == "unchanged"
+        assert result.bytes_written == 0
+        assert sample_pdf.read_bytes() == original
+
+    def test_falls_back_to_full_rewrite(self, sample_pdf):
+        """A failed incremental update falls back to rewriting the document once."""
+        with patch("app.utils.pdf_edit._write_incremental", side_effect=ValueError("broken xref")):
+            result = apply_pdf_edits(str(sample_pdf), info=INFO, rotations={1: 90})
+
+        assert result.mode == "rewrite"
+        assert result.bytes_written == sample_pdf.stat().st_size
+        reader = _strict_reader(sample_pdf)
+        assert reader.metadata.title == "2024-01-15_Invoice"
+        assert reader.pages[1].rotation == 90
+        assert list(sample_pdf.parent.glob(".rewrite_*")) == []
+
+    def test_as_detail_is_json_friendly(self, sample_pdf):
+        """Rotation keys are strings so the detail can be logged as JSON."""
+        result = apply_pdf_edits(str(sample_pdf), rotations={1: 180}, update_xmp=False)
+
+        assert result.as_detail()["applied_rotations"] == {"1": 180}
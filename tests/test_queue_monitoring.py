@@ -1,7 +1,9 @@
 """Tests for app/api/queue.py and app/views/queue.py modules."""
 
+import json
+import time
 from pathlib import Path
-from unittest.mock import MagicMock, Mock, patch
+from unittest.mock import AsyncMock, MagicMock, Mock, patch
 
 import pytest
 
@@ -29,71 +31,69 @@ class TestGetRedisQueueLength:
 
 
 @pytest.mark.unit
-class TestGetCeleryInspectStats:
-    """Tests for the _get_celery_inspect_stats helper."""
-
-    @patch("app.celery_app.celery")
-    def test_returns_worker_stats(self, mock_celery_mod):
-        """Test returns active, reserved, scheduled tasks."""
-        from app.api.queue import _get_celery_inspect_stats
-
-        mock_inspector = MagicMock()
-        mock_inspector.active.return_value = {
-            "worker1": [
-                {"id": "task-1", "name": "app.tasks.process_document.process_document", "args": [1], "time_start": 123}
-            ]
-        }
-        mock_inspector.reserved.return_value = {
-            "worker1": [{"id": "task-2", "name": "app.tasks.upload_to_s3.upload_to_s3", "args": [2]}]
+class TestGetWorkerTelemetry:
+    """Tests for the _get_worker_telemetry helper."""
+
+    def test_returns_worker_stats(self):
+        """Test aggregates the snapshots published by the workers."""
+        from app.api.queue import _get_worker_telemetry
+
+        snapshot = {
+            "hostname": "worker1",
+            "ts": time.time(),
+            "active_by_queue": {"document_processor": 1},
+            "reserved_by_queue": {"document_processor": 1},
+            "scheduled_by_queue": {"default": 1},
+            "active": [{"id": "task-1", "name": "app.tasks.process_document.process_document", "args": "[1]"}],
+            "reserved": [{"id": "task-2", "name": "app.tasks.upload_to_s3.upload_to_s3", "args": "[2]"}],
+            "scheduled": [{"id": "task-3", "name": "app.tasks.check_credentials.check_credentials", "eta": None}],
         }
-        mock_inspector.scheduled.return_value = {
-            "worker1": [
-                {
-                    "request": {"id": "task-3", "name": "app.tasks.check_credentials.check_credentials"},
-                    "eta": "2026-01-01",
-                }
-            ]
-        }
-        mock_celery_mod.control.inspect.return_value = mock_inspector
+        mock_redis = MagicMock()
+        mock_redis.hgetall.return_value = {"worker1": json.dumps(snapshot)}
 
-        result = _get_celery_inspect_stats()
+        result = _get_worker_telemetry(mock_redis)
 
         assert result["workers_online"] == 1
-        assert len(result["active"]) == 1
         assert result["active"][0]["id"] == "task-1"
         assert len(result["reserved"]) == 1
         assert len(result["scheduled"]) == 1
+        assert result["per_queue"]["document_processor"] == {"active": 1, "reserved": 1, "scheduled": 0}
 
-    @patch("app.celery_app.celery")
-    def test_handles_no_workers(self, mock_celery_mod):
+    def test_handles_no_workers(self):
         """Test handles case where no workers are online."""
-        from app.api.queue import _get_celery_inspect_stats
+        from app.api.queue import _get_worker_telemetry
 
-        mock_inspector = MagicMock()
-        mock_inspector.active.return_value = None
-        mock_inspector.reserved.return_value = None
-        mock_inspector.scheduled.return_value = None
-        mock_celery_mod.control.inspect.return_value = mock_inspector
+        mock_redis = MagicMock()
+        mock_redis.hgetall.return_value = {}
 
-        result = _get_celery_inspect_stats()
+        result = _get_worker_telemetry(mock_redis)
 
         assert result["workers_online"] == 0
         assert result["active"] == []
         assert result["reserved"] == []
         assert result["scheduled"] == []
 
-    @patch("app.celery_app.celery")
-    def test_handles_inspect_exception(self, mock_celery_mod):
-        """Test handles exception during inspect."""
-        from app.api.queue import _get_celery_inspect_stats
+    def test_handles_redis_exception(self):
+        """Test handles Redis errors while reading telemetry."""
+        from app.api.queue import _get_worker_telemetry
 
-        mock_celery_mod.control.inspect.side_effect = Exception("Broker unreachable")
+        mock_redis = MagicMock()
+        mock_redis.hgetall.side_effect = Exception("Redis unreachable")
 
-        result = _get_celery_inspect_stats()
+        result = _get_worker_telemetry(mock_redis)
 
         assert result["workers_online"] == 0
         assert result["active"] == []
 
+    @patch("app.celery_app.celery")
+    def test_does_not_broadcast_inspect(self, mock_celery_mod):
+        """Test never falls back to a synchronous celery inspect round-trip."""
+        from app.api.queue import _get_worker_telemetry
+
+        _get_worker_telemetry(MagicMock())
+
+        mock_celery_mod.control.inspect.assert_not_called()
+
 
 @pytest.mark.unit
 class TestGetDbProcessingSummary:
@@ -141,21 +141,14 @@ class TestQueueStatsEndpoint:
     """Tests for the GET /api/queue/stats endpoint."""
 
     @patch("app.api.queue.redis.Redis")
-    @patch("app.celery_app.celery")
-    def test_queue_stats_returns_200(self, mock_celery_mod, mock_redis_cls, client):
+    def test_queue_stats_returns_200(self, mock_redis_cls, client):
         """Test queue stats endpoint returns 200 with data."""
         # Mock Redis
         mock_redis_instance = MagicMock()
         mock_redis_instance.llen.return_value = 5
+        mock_redis_instance.hgetall.return_value = {"worker1": json.dumps({"hostname": "worker1", "ts": time.time()})}
         mock_redis_cls.from_url.return_value = mock_redis_instance
 
-        # Mock Celery inspector
-        mock_inspector = MagicMock()
-        mock_inspector.active.return_value = {}
-        mock_inspector.reserved.return_value = {}
-        mock_inspector.scheduled.return_value = {}
-        mock_celery_mod.control.inspect.return_value = mock_inspector
-
         response = client.get("/api/queue/stats")
         assert response.status_code == 200
 
@@ -164,6 +157,7 @@ class TestQueueStatsEndpoint:
         assert "total_queued" in data
         assert "celery" in data
         assert "db_summary" in data
+        assert data["celery"]["workers_online"] == 1
 
     @patch("app.api.queue.redis.Redis")
     def test_queue_stats_handles_redis_error(self, mock_redis_cls, client):
@@ -174,6 +168,61 @@ class TestQueueStatsEndpoint:
         assert response.status_code == 200
         data = response.json()
         assert data["total_queued"] == 0
+        assert data["celery"]["workers_online"] == 0
+
+
+@pytest.mark.unit
+class TestQueueStatsStream:
+    """Tests for the GET /api/queue/stats/stream server-sent events."""
+
+    @pytest.mark.asyncio
+    async def test_stream_sends_only_changed_payloads(self):
+        """Test identical consecutive payloads are not re-sent."""
+        from app.api.queue import _queue_stats_events
+
+        request = MagicMock()
+        request.is_disconnected = AsyncMock(side_effect=[False, False, False, True])
+        payloads = iter([{"total_queued": 1}, {"total_queued": 1}, {"total_queued": 2}])
+
+        with (
+            patch("app.api.queue._build_queue_stats_with_session", side_effect=lambda: next(payloads)),
+            patch("app.api.queue.STATS_CACHE_SECONDS", 0),
+            patch("app.api.queue.asyncio.sleep", new=AsyncMock()),
+        ):
+            events = [event async for event in _queue_stats_events(request)]
+
+        assert events == ['data: {"total_queued": 1}\n\n', 'data: {"total_queued": 2}\n\n']
+
+    @pytest.mark.asyncio
+    async def test_streams_share_one_snapshot(self):
+        """Test concurrent streams of one process reuse the same statistics snapshot."""
+        from app.api.queue import _queue_stats_events
+
+        def stream_request():
+            request = MagicMock()
+            request.is_disconnected = AsyncMock(side_effect=[False, False, True])
+            return request
+
+        with (
+            patch("app.api.queue._stats_cache", None),
+            patch("app.api.queue._build_queue_stats_with_session", return_value={"total_queued": 1}) as build,
+            patch("app.api.queue.asyncio.sleep", new=AsyncMock()),
+        ):
+            first = [event async for event in _queue_stats_events(stream_request())]
+            second = [event async for event in _queue_stats_events(stream_request())]
+
+        assert first == second == ['data: {"total_queued": 1}\n\n']
+        build.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_stream_endpoint_uses_event_stream(self):
+        """Test the endpoint returns an uncached text/event-stream response."""
+        from app.api.queue import stream_queue_stats
+
+        response = await stream_queue_stats(MagicMock())
+
+        assert response.media_type == "text/event-stream"
+        assert response.headers["cache-control"] == "no-cache"
 
 
 @pytest.mark.integration
@@ -68,6 +68,25 @@ class TestRequestSizeLimitMiddleware:
         detail = response.json()["detail"]
         assert "MAX_UPLOAD_SIZE" in detail
 
+    def test_middleware_rejects_oversized_resumable_chunk(self, client: TestClient):
+        """Resumable upload chunks are limited by RESUMABLE_UPLOAD_MAX_CHUNK_SIZE, not the JSON body limit."""
+        from app.config import settings
+
+        headers = {"Content-Type": "application/offset+octet-stream", "Upload-Offset": "0"}
+        oversized = client.patch(
+            "/api/intake/uploads/unknown",
+            content=b"x" * 10,
+            headers={**headers, "Content-Length": str(settings.resumable_upload_max_chunk_size + 1)},
+        )
+        within_limit = client.patch(
+            "/api/intake/uploads/unknown",
+            content=b"x" * 10,
+            headers={**headers, "Content-Length": str(settings.max_request_body_size + 1)},
+        )
+        assert oversized.status_code == 413
+        assert "RESUMABLE_UPLOAD_MAX_CHUNK_SIZE" in oversized.json()["detail"]
+        assert within_limit.status_code != 413
+
     def test_middleware_allows_multipart_within_upload_limit(self, client: TestClient):
         """Multipart upload with Content-Length within MAX_UPLOAD_SIZE passes middleware."""
         from app.config import settings
@@ -0,0 +1,284 @@
+"""Tests for compiled rule sets (app/utils/rule_sets.py and the engines using it)."""
+
+import random
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from app.models import Pipeline, PipelineRoutingRule
+from app.utils.classification_rules import (
+    RULE_TYPE_CONTENT,
+    ClassificationRule,
+    CompiledClassificationRules,
+    classify_document,
+)
+from app.utils.privacy_rules import CompiledPrivacyRules, match_privacy_rule
+from app.utils.routing_engine import CompiledRoutingRules, evaluate_routing_decision
+from app.utils.rule_sets import (
+    RULE_KIND_ROUTING,
+    RULE_VERSIONS_KEY,
+    KeywordMatcher,
+    RuleSetCache,
+    notify_rules_changed,
+    rule_set_cache,
+)
+
+
+class _FakeRedis:
+    def __init__(self):
+        self.hash: dict[str, str] = {}
+
+    def hmget(self, key, fields):
+        return [self.hash.get(field) for field in fields]
+
+    def hset(self, key, field, value):
+        self.hash[field] = value
+
+
+def _routing_rule(rule_id, field, operator, value, target=1):
+    return SimpleNamespace(
+        id=rule_id, name=f"rule{rule_id}", field=field, operator=operator, value=value, target_pipeline_id=target
+    )
+
+
+def _privacy_rule(rule_id, rule_type, pattern, case_sensitive=False):
+    return SimpleNamespace(id=rule_id, rule_type=rule_type, pattern=pattern, case_sensitive=case_sensitive)
+
+
+@pytest.mark.unit
+class TestKeywordMatcher:
+    """Tests for KeywordMatcher."""
+
+    @pytest.mark.parametrize("threshold", [1, 10_000])
+    def test_automaton_and_substring_scan_agree(self, threshold):
+        """The Aho–Corasick path finds exactly the keywords a substring scan finds."""
+        # Seeded for a reproducible corpus – not cryptographic, S311 is intentional.
+        rng = random.Random(7)  # noqa: S311
+        words = ["".join(rng.choices("abcde", k=rng.randint(1, 5))) for _ in range(300)]
+        text = "".join(rng.choices("abcdef ", k=2000))
+
+        with patch("app.utils.rule_sets.AHO_CORASICK_MIN_KEYWORDS", threshold):
+            matcher = KeywordMatcher(words)
+            found = matcher.search(text)
+
+        assert matcher.uses_automaton is (threshold == 1)
+        assert found == {word for word in words if word in text}
+
+    def test_overlapping_keywords(self):
+        """Keywords that are suffixes or prefixes of each other are all reported."""
+        with patch("app.utils.rule_sets.AHO_CORASICK_MIN_KEYWORDS", 1):
+            matcher = KeywordMatcher(["he", "she", "his", "hers"])
+
+        assert matcher.search("USHERS") == {"he", "she", "hers"}
+
+    def test_scan_switches_to_full_pass_after_many_checks(self):
+        """Lazy membership checks give the same answers before and after the automaton takes over."""
+        keywords = [f"kw{index}" for index in range(20)]
+        with patch("app.utils.rule_sets.AHO_CORASICK_MIN_KEYWORDS", 5):
+            matcher = KeywordMatcher(keywords)
+            scan = matcher.scan("contains KW3, kw17.")
+
+            answers = [keyword in scan for keyword in keywords]
+
+        assert [keyword for keyword, hit in zip(keywords, answers, strict=True) if hit] == ["kw1", "kw3", "kw17"]
+
+    def test_case_sensitive(self):
+        """Case-sensitive matchers keep the original case."""
+        matcher = KeywordMatcher(["IBAN", "iban"], case_sensitive=True)
+
+        assert matcher.search("Your IBAN") == {"IBAN"}
+        assert matcher.search(None) == frozenset()
+
+
+@pytest.mark.unit
+class TestRuleSetCache:
+    """Tests for RuleSetCache."""
+
+    def test_reuses_compiled_set_until_fingerprint_changes(self):
+        """Compilation happens once per fingerprint."""
+        client = _FakeRedis()
+        cache = RuleSetCache("test", redis_getter=lambda: client)
+        compile_rules = MagicMock(side_effect=["v1", "v2"])
+
+        assert cache.get("alice", (1, 1, None), compile_rules) == "v1"
+        assert cache.get("alice", (1, 1, None), compile_rules) == "v1"
+        assert cache.get("alice", (2, 2, None), compile_rules) == "v2"
+        assert compile_rules.call_count == 2
+
+    def test_published_version_invalidates_other_processes(self):
+        """A version bump in Redis (owner or system scope) forces a recompile."""
+        client = _FakeRedis()
+        cache = RuleSetCache("test", redis_getter=lambda: client)
+        compile_rules = MagicMock(side_effect=["v1", "v2", "v3"])
+
+        cache.get("alice", (), compile_rules)
+        client.hset(RULE_VERSIONS_KEY, "test:alice", "x")
+        assert cache.get("alice", (), compile_rules) == "v2"
+        client.hset(RULE_VERSIONS_KEY, "test:*", "y")
+        assert cache.get("alice", (), compile_rules) == "v3"
+
+    def test_entries_expire_quickly_without_redis(self):
+        """Without Redis, entries are only trusted for UNVERIFIED_ENTRY_TTL seconds."""
+        now = [100.0]
+        cache = RuleSetCache("test", redis_getter=lambda: None, clock=lambda: now[0])
+        compile_rules = MagicMock(side_effect=["v1", "v2"])
+
+        cache.get(None, (), compile_rules)
+        now[0] += 1
+        assert cache.get(None, (), compile_rules) == "v1"
+        now[0] += 10
+        assert cache.get(None, (), compile_rules) == "v2"
+
+    def test_notify_invalidates_locally_and_publishes(self):
+        """notify_rules_changed drops local entries and writes a new version."""
+        client = _FakeRedis()
+        compile_rules = MagicMock(side_effect=["v1", "v2"])
+        with patch("app.utils.rule_sets._get_redis", return_value=client):
+            cache = rule_set_cache(RULE_KIND_ROUTING)
+            cache.get("alice", (), compile_rules)
+            notify_rules_changed(RULE_KIND_ROUTING, "alice")
+
+        assert "routing:alice" in client.hash
+        assert cache.get("alice", (), compile_rules) == "v2"
+
+
+@pytest.mark.unit
+class TestCompiledClassificationRules:
+    """Tests for CompiledClassificationRules."""
+
+    def test_many_keyword_rules_match_like_plain_rules(self):
+        """A large keyword rule set (automaton path) gives the same result as before."""
+        custom = [
+            ClassificationRule(f"kw_{index}", f"cat_{index % 7}", RULE_TYPE_CONTENT, f"token{index}|alias{index}")
+            for index in range(400)
+        ]
+        custom.append(ClassificationRule("acme", "invoice", RULE_TYPE_CONTENT, "Acme GmbH", case_sensitive=True))
+        text = "Invoice number 12 from Acme GmbH, see token3 and ALIAS10 and token17"
+
+        result = CompiledClassificationRules(custom).classify("", text, None)
+
+        assert result.category == "cat_3"
+        assert [rule.rule_name for rule in result.matched_rules] == ["kw_3", "kw_10", "kw_17"]
+        assert classify_document("", text, None, custom).category == "cat_3"
+
+    def test_invalid_filename_regex_is_skipped(self):
+        """A broken custom pattern no longer breaks classification of every document."""
+        rules = [ClassificationRule("broken", "invoice", "filename_pattern", "(unclosed")]
+
+        assert classify_document("invoice.pdf", "", None, rules).category == "invoice"
+
+
+@pytest.mark.unit
+class TestCompiledRoutingRules:
+    """Tests for CompiledRoutingRules."""
+
+    def test_indexed_and_scanned_rules_keep_evaluation_order(self):
+        """Equals rules found via the index are interleaved with scanned rules by position."""
+        rule_set = CompiledRoutingRules(
+            [
+                _routing_rule(1, "filename", "contains", "report"),
+                _routing_rule(2, "file_type", "equals", "Application/PDF"),
+                _routing_rule(3, "size", "gt", "10"),
+                _routing_rule(4, "file_type", "equals", "image/png"),
+                _routing_rule(5, "metadata.kind", "regex", "inv.*"),
+            ]
+        )
+        doc = {"file_type": "application/pdf", "filename": "scan.pdf", "size": 50, "metadata": {"kind": "Invoice"}}
+
+        assert [rule.rule_id for rule in rule_set.matches(doc)] == [2, 3, 5]
+        assert [rule.rule_id for rule in rule_set.matches(doc, frozenset({"file_type"}))] == [2]
+
+    def test_missing_values_follow_negative_operators(self):
+        """Missing properties only satisfy not_equals / not_contains, as before."""
+        rule_set = CompiledRoutingRules(
+            [
+                _routing_rule(1, "document_type", "equals", "Invoice"),
+                _routing_rule(2, "document_type", "not_contains", "Invoice"),
+            ]
+        )
+
+        assert [rule.rule_id for rule in rule_set.matches({"document_type": None})] == [2]
+
+    def test_evaluation_reuses_compiled_rules_until_rules_change(self, db_session):
+        """Rules are loaded once; adding a rule is picked up through the fingerprint."""
+        pipeline = Pipeline(name="Target", owner_id="alice", is_active=True)
+        db_session.add(pipeline)
+        db_session.commit()
+        db_session.add(
+            PipelineRoutingRule(
+                owner_id="alice",
+                name="png",
+                position=0,
+                field="file_type",
+                operator="equals",
+                value="image/png",
+                target_pipeline_id=pipeline.id,
+            )
+        )
+        db_session.commit()
+        doc = {"file_type": "application/pdf", "metadata": {}}
+
+        with patch("app.utils.routing_engine.CompiledRoutingRules", wraps=CompiledRoutingRules) as compiled:
+            assert evaluate_routing_decision(db_session, "alice", doc) is None
+            assert evaluate_routing_decision(db_session, "alice", doc) is None
+            assert compiled.call_count == 1
+
+            db_session.add(
+                PipelineRoutingRule(
+                    owner_id="alice",
+                    name="pdf",
+                    position=1,
+                    field="file_type",
+                    operator="equals",
+                    value="application/pdf",
+                    target_pipeline_id=pipeline.id,
+                )
+            )
+            db_session.commit()
+            decision = evaluate_routing_decision(db_session, "alice", doc)
+
+        assert compiled.call_count == 2
+        assert decision.rule.name == "pdf"
+
+
+@pytest.mark.unit
+class TestCompiledPrivacyRules:
+    """Tests for CompiledPrivacyRules."""
+
+    def test_first_match_matches_per_rule_evaluation(self):
+        """Results and evidence equal evaluating match_privacy_rule rule by rule."""
+        rules = [
+            _privacy_rule(1, "metadata_match", "document_type=Payslip"),
+            _privacy_rule(2, "content_keyword", "diagnosis | Befund", case_sensitive=True),
+            _privacy_rule(3, "content_keyword", "salary|iban"),
+            _privacy_rule(4, "filename_pattern", r"private_\d+"),
+        ]
+        rule_set = CompiledPrivacyRules(rules)
+        cases = [
+            ("private_12.pdf", "Your IBAN: DE00", {"document_type": "payslip"}),
+            ("private_12.pdf", "ärztlicher Befund", {}),
+            ("private_12.pdf", "Salary statement", None),
+            ("PRIVATE_7.pdf", "", None),
+            ("scan.pdf", "nothing", {"document_type": "Invoice"}),
+        ]
+
+        for filename, text, metadata in cases:
+            expected = next(
+                (
+                    (rule.id, result)
+                    for rule in rules
+                    if (
+                        result := match_privacy_rule(
+                            rule_type=rule.rule_type,
+                            pattern=rule.pattern,
+                            case_sensitive=rule.case_sensitive,
+                            filename=filename,
+                            text=text,
+                            metadata=metadata,
+                        )
+                    ).matched
+                ),
+                None,
+            )
+            assert rule_set.first_match(filename, text, metadata) == expected
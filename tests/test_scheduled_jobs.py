@@ -363,7 +363,7 @@ class TestSeedDefaultScheduledJobs:
         assert disabled == 0
 
     def test_default_jobs_cover_all_batch_tasks(self, sj_session):
-        """All 8 batch tasks are represented in the default job list."""
+        """All 9 batch tasks are represented in the default job list."""
         from app.api.scheduled_jobs import DEFAULT_JOBS
 
         task_names = {j["task_name"] for j in DEFAULT_JOBS}
@@ -374,6 +374,7 @@ class TestSeedDefaultScheduledJobs:
             "app.tasks.batch_tasks.expire_shared_links",
             "app.tasks.batch_tasks.prune_processing_logs",
             "app.tasks.batch_tasks.prune_old_notifications",
+            "app.tasks.batch_tasks.prune_llm_response_cache",
             "app.tasks.batch_tasks.backfill_missing_metadata",
             "app.tasks.batch_tasks.sync_search_index",
         }
@@ -205,34 +205,43 @@ class TestSecurityHeadersMiddleware:
         assert middleware.enabled == settings.security_headers_enabled
 
     @pytest.mark.asyncio
-    async def test_dispatch_adds_headers_when_enabled(self):
-        """Test dispatch adds security headers when enabled."""
+    async def test_call_adds_headers_when_enabled(self):
+        """Test the ASGI call adds security headers to the response start message."""
         from fastapi import Response
 
-        from app.config import settings
         from app.middleware.security_headers import SecurityHeadersMiddleware
 
-        if not settings.security_headers_enabled:
-            pytest.skip("Security headers disabled in configuration")
+        mock_config = Mock()
+        mock_config.security_headers_enabled = True
+        mock_config.security_header_hsts_enabled = True
+        mock_config.security_header_hsts_value = "max-age=31536000"
+        mock_config.security_header_csp_enabled = False
+        mock_config.security_header_x_frame_options_enabled = True
+        mock_config.security_header_x_frame_options_value = "DENY"
+        mock_config.security_header_x_content_type_options_enabled = True
 
-        middleware = SecurityHeadersMiddleware(app=None, config=settings)
+        middleware = SecurityHeadersMiddleware(app=Response(content="test", status_code=200), config=mock_config)
+        messages = []
 
-        # Mock request and call_next
-        mock_request = Mock()
-        mock_response = Response(content="test", status_code=200)
+        async def receive():
+            return {"type": "http.request", "body": b"", "more_body": False}
 
-        async def mock_call_next(request):
-            return mock_response
+        async def send(message):
+            messages.append(message)
 
-        result = await middleware.dispatch(mock_request, mock_call_next)
+        await middleware({"type": "http", "method": "GET", "path": "/", "headers": []}, receive, send)
 
-        # At least some headers should be present
-        assert isinstance(result, Response)
+        headers = {k.decode(): v.decode() for k, v in messages[0]["headers"]}
+        assert headers["strict-transport-security"] == "max-age=31536000"
+        assert headers["x-frame-options"] == "DENY"
+        assert headers["x-content-type-options"] == "nosniff"
+        assert "content-security-policy" not in headers
+        assert messages[1]["body"] == b"test"
 
     @pytest.mark.asyncio
-    async def test_dispatch_skips_headers_when_disabled(self):
-        """Test dispatch skips headers when disabled."""
-        from fastapi import Response
+    async def test_call_skips_headers_when_disabled(self):
+        """Test the ASGI call leaves the response untouched when disabled."""
+        from unittest.mock import AsyncMock
 
         from app.middleware.security_headers import SecurityHeadersMiddleware
 
@@ -240,18 +249,15 @@ class TestSecurityHeadersMiddleware:
         mock_config = Mock()
         mock_config.security_headers_enabled = False
 
-        middleware = SecurityHeadersMiddleware(app=None, config=mock_config)
-
-        mock_request = Mock()
-        mock_response = Response(content="test", status_code=200)
-
-        async def mock_call_next(request):
-            return mock_response
+        app = AsyncMock()
+        middleware = SecurityHeadersMiddleware(app=app, config=mock_config)
+        scope = {"type": "http", "method": "GET", "path": "/", "headers": []}
+        receive, send = AsyncMock(), AsyncMock()
 
-        result = await middleware.dispatch(mock_request, mock_call_next)
+        await middleware(scope, receive, send)
 
-        # Headers should not be added
-        assert isinstance(result, Response)
+        # The original send callable is handed through unwrapped
+        app.assert_awaited_once_with(scope, receive, send)
 
     def test_add_security_headers_hsts(self):
         """Test _add_security_headers adds HSTS header."""
@@ -270,7 +276,7 @@ class TestSecurityHeadersMiddleware:
         middleware = SecurityHeadersMiddleware(app=None, config=mock_config)
 
         response = Response(content="test")
-        middleware._add_security_headers(response)
+        middleware._add_security_headers(response.headers)
 
         assert "Strict-Transport-Security" in response.headers
         assert "max-age" in response.headers["Strict-Transport-Security"]
@@ -292,7 +298,7 @@ class TestSecurityHeadersMiddleware:
         middleware = SecurityHeadersMiddleware(app=None, config=mock_config)
 
         response = Response(content="test")
-        middleware._add_security_headers(response)
+        middleware._add_security_headers(response.headers)
 
         assert "Content-Security-Policy" in response.headers
         assert "default-src" in response.headers["Content-Security-Policy"]
@@ -314,7 +320,7 @@ class TestSecurityHeadersMiddleware:
         middleware = SecurityHeadersMiddleware(app=None, config=mock_config)
 
         response = Response(content="test")
-        middleware._add_security_headers(response)
+        middleware._add_security_headers(response.headers)
 
         assert "X-Frame-Options" in response.headers
         assert response.headers["X-Frame-Options"] == "DENY"
@@ -335,7 +341,7 @@ class TestSecurityHeadersMiddleware:
         middleware = SecurityHeadersMiddleware(app=None, config=mock_config)
 
         response = Response(content="test")
-        middleware._add_security_headers(response)
+        middleware._add_security_headers(response.headers)
 
         assert "X-Content-Type-Options" in response.headers
         assert response.headers["X-Content-Type-Options"] == "nosniff"
@@ -359,7 +365,7 @@ class TestSecurityHeadersMiddleware:
         middleware = SecurityHeadersMiddleware(app=None, config=mock_config)
 
         response = Response(content="test")
-        middleware._add_security_headers(response)
+        middleware._add_security_headers(response.headers)
 
         assert "Strict-Transport-Security" in response.headers
         assert "Content-Security-Policy" in response.headers
@@ -4,6 +4,8 @@ from unittest.mock import MagicMock, patch
 
 import pytest
 
+from app.celery_app import celery
+from app.tasks.retry_config import UploadTaskWithRetry
 from app.tasks.send_to_all import (
     _should_upload_to_dropbox,
     _should_upload_to_email,
@@ -923,3 +925,157 @@ class TestSendToAllDestinations:
         result = send_to_all_destinations.apply(args=[str(test_file), False, 1])
 
         assert result.result["status"] == "Queued"
+
+
+_uploads: list[dict] = []
+
+
+@celery.task(base=UploadTaskWithRetry, bind=True)
+def _recording_upload(self, file_path, file_id=None, folder_override=None, remote_source_path=None):
+    with open(file_path) as pdf, open(file_path.replace(".pdf", ".json")) as sidecar:
+        _uploads.append(
+            {
+                "path": file_path,
+                "content": pdf.read(),
+                "sidecar": sidecar.read(),
+                "folder": folder_override,
+                "source": remote_source_path,
+            }
+        )
+    return {"status": "Completed"}
+
+
+@celery.task(base=UploadTaskWithRetry, bind=True)
+def _failing_upload(self, file_path, file_id=None, folder_override=None):
+    raise ConnectionError("server unavailable")
+
+
+@pytest.mark.unit
+class TestInProcessDistribution:
+    """Tests for DISTRIBUTION_CONCURRENCY > 0: one task uploads to every destination."""
+
+    @pytest.fixture
+    def fan_out(self, monkeypatch, tmp_path):
+        from app.tasks import send_to_all
+
+        _uploads.clear()
+        spool_root = tmp_path / "spool"
+        spool_root.mkdir()
+        monkeypatch.setattr(send_to_all.settings, "distribution_concurrency", 4, raising=False)
+        monkeypatch.setattr(send_to_all.settings, "distribution_destination_limits", "s3=1", raising=False)
+        monkeypatch.setattr(send_to_all.settings, "distribution_spool_dir", str(spool_root), raising=False)
+        monkeypatch.setattr(send_to_all, "log_task_progress", MagicMock())
+        monkeypatch.setattr(send_to_all, "SessionLocal", MagicMock())
+        steps = MagicMock()
+        monkeypatch.setattr(send_to_all, "update_step_status", steps)
+        services = {"dropbox": True, "s3": True, "sftp": True}
+        monkeypatch.setattr(send_to_all, "get_configured_services_from_validator", lambda: services)
+        for name in ("nextcloud", "paperless", "google_drive", "webdav", "ftp", "email", "evernote", "onedrive"):
+            monkeypatch.setattr(send_to_all, f"_should_upload_to_{name}", lambda: False)
+        monkeypatch.setattr(send_to_all, "_should_upload_to_sharepoint", lambda: False)
+        monkeypatch.setattr(send_to_all, "_should_upload_to_icloud", lambda: False)
+
+        document = tmp_path / "work" / "invoice.pdf"
+        document.parent.mkdir()
+        document.write_text("pdf bytes")
+        (tmp_path / "work" / "invoice.json").write_text('{"title": "Invoice"}')
+        return document, spool_root, steps
+
+    def test_destinations_read_one_spooled_copy(self, fan_out, monkeypatch):
+        from app.tasks import send_to_all
+
+        document, spool_root, steps = fan_out
+        monkeypatch.setattr(send_to_all, "upload_to_dropbox", _recording_upload)
+        monkeypatch.setattr(send_to_all, "upload_to_s3", _recording_upload)
+        monkeypatch.setattr(send_to_all, "upload_to_sftp", _recording_upload)
+
+        result = send_to_all_destinations.apply(args=[str(document), True, 7, {"s3": "archive/"}]).get()
+
+        assert result["status"] == "Completed"
+        assert {name: outcome["status"] for name, outcome in result["destinations"].items()} == {
+            "dropbox": "success",
+            "s3": "success",
+            "sftp": "success",
+        }
+        assert len(_uploads) == 3
+        assert {upload["path"] for upload in _uploads} != {str(document)}
+        assert all(upload["path"].startswith(str(spool_root)) for upload in _uploads)
+        assert {(upload["content"], upload["sidecar"]) for upload in _uploads} == {
+            ("pdf bytes", '{"title": "Invoice"}')
+        }
+        assert sorted(str(upload["folder"]) for upload in _uploads) == ["None", "None", "archive/"]
+        # Dropbox and SFTP derive the remote folder from the original path, not the spool.
+        assert [upload["source"] for upload in _uploads].count(str(document)) == 2
+        # The spool is removed once every destination is done.
+        assert list(spool_root.iterdir()) == []
+
+        recorded = {call.args[2]: call for call in steps.call_args_list}
+        assert set(recorded) == {"upload_to_dropbox", "upload_to_s3", "upload_to_sftp"}
+        for call in recorded.values():
+            assert call.args[1] == 7 and call.args[3] == "success"
+            assert call.kwargs["started_at"] <= call.kwargs["completed_at"]
+
+    def test_spooled_copy_keeps_the_remote_folder_layout(self, fan_out, monkeypatch, tmp_path):
+        """A spooled upload lands at the same remote path as one reading the work directory."""
+        from app.tasks import send_to_all, upload_to_nextcloud
+
+        document = tmp_path / "work" / "pdfa" / "original" / "Invoice.pdf"
+        document.parent.mkdir(parents=True)
+        document.write_bytes(b"%PDF-1.7")
+        monkeypatch.setattr(send_to_all.settings, "workdir", str(tmp_path / "work"))
+        monkeypatch.setattr(send_to_all.settings, "nextcloud_upload_url", "https://cloud.example/dav", raising=False)
+        monkeypatch.setattr(send_to_all.settings, "nextcloud_username", "user", raising=False)
+        monkeypatch.setattr(send_to_all.settings, "nextcloud_password", "secret", raising=False)
+        monkeypatch.setattr(send_to_all.settings, "nextcloud_folder", "Docs", raising=False)
+        services = {"nextcloud": True, "dropbox": False, "s3": False, "sftp": False}
+        monkeypatch.setattr(send_to_all, "get_configured_services_from_validator", lambda: services)
+        monkeypatch.setattr(upload_to_nextcloud, "log_task_progress", MagicMock())
+        http = MagicMock()
+        http.request.return_value.text = ""
+        http.put.return_value.status_code = 201
+        monkeypatch.setattr(upload_to_nextcloud, "requests", http)
+
+        upload_to_nextcloud.upload_to_nextcloud.apply(args=[str(document)]).get()
+        send_to_all_destinations.apply(args=[str(document), True, 7]).get()
+
+        direct, spooled = (call.args[0] for call in http.put.call_args_list)
+        assert direct == "https://cloud.example/dav/Docs/pdfa/original/Invoice.pdf"
+        assert spooled == direct
+
+    def test_failed_destination_retries_on_its_own(self, fan_out, monkeypatch):
+        from app.tasks import send_to_all
+
+        document, _, steps = fan_out
+        monkeypatch.setattr(send_to_all, "upload_to_dropbox", _recording_upload)
+        monkeypatch.setattr(send_to_all, "upload_to_s3", _failing_upload)
+        monkeypatch.setattr(send_to_all, "upload_to_sftp", _recording_upload)
+
+        with (
+            patch.object(_failing_upload, "apply_async") as failing_retry,
+            patch.object(_recording_upload, "apply_async") as recording_retry,
+        ):
+            result = send_to_all_destinations.apply(args=[str(document), True, 7]).get()
+
+        assert result["destinations"]["s3"]["status"] == "retrying"
+        assert "server unavailable" in result["destinations"]["s3"]["error"]
+        assert result["destinations"]["dropbox"]["status"] == "success"
+        recording_retry.assert_not_called()
+        # The retry is an ordinary queued attempt for the original file, with backoff.
+        (retry_args, retry_kwargs), options = failing_retry.call_args.args, failing_retry.call_args.kwargs
+        assert list(retry_args) == [str(document)] and retry_kwargs == {"file_id": 7}
+        assert options["retries"] == 1 and options["countdown"] >= 1
+        assert options["task_id"] == result["tasks"]["s3_task_id"]
+        s3_step = next(call for call in steps.call_args_list if call.args[2] == "upload_to_s3")
+        assert s3_step.args[3] == "pending" and s3_step.kwargs["completed_at"] is None
+
+    def test_disabled_by_default(self):
+        from app.tasks import send_to_all
+
+        with patch.object(send_to_all, "settings", MagicMock()):
+            assert send_to_all.distribution_concurrency() == 0
+
+    def test_destination_limits_are_parsed(self):
+        from app.tasks.send_to_all import parse_destination_limits
+
+        assert parse_destination_limits("email=1, SFTP=2,bogus,s3=0,ftp=x,") == {"email": 1, "sftp": 2}
+        assert parse_destination_limits("") == {}
@@ -7,7 +7,7 @@ Tests the similarity utility functions and the API endpoint
 import json
 import sys
 from types import SimpleNamespace
-from unittest.mock import MagicMock, patch
+from unittest.mock import ANY, MagicMock, patch
 
 import pytest
 from fastapi.testclient import TestClient
@@ -21,6 +21,7 @@ from app.utils.similarity import (
     cosine_similarity,
     find_similar_documents,
     generate_embedding,
+    generate_embeddings,
 )
 
 # ---------------------------------------------------------------------------
@@ -1119,6 +1120,7 @@ class TestGetEmbeddingClient:
         mock_openai_class.assert_called_once_with(
             api_key="not-required",
             base_url="http://embeddings.internal/v1/",
+            http_client=ANY,
         )
 
 
@@ -1240,6 +1242,51 @@ class TestGenerateEmbedding:
         truncated.encode("utf-8")
 
 
+# ---------------------------------------------------------------------------
+# Unit tests for generate_embeddings (packed base64 transport)
+# ---------------------------------------------------------------------------
+
+
+class TestGenerateEmbeddings:
+    """Unit tests for the batch embedding helper."""
+
+    @pytest.mark.unit
+    @patch("app.utils.similarity._get_embedding_client")
+    def test_base64_vectors_are_decoded_into_packed_arrays_in_input_order(self, mock_get_client):
+        """base64 payloads should become float32 arrays, sorted by the response index."""
+        import base64
+        from array import array
+
+        def encoded(*values):
+            return base64.b64encode(array("f", values).tobytes()).decode()
+
+        mock_client = MagicMock()
+        mock_client.embeddings.create.return_value = MagicMock(
+            data=[
+                SimpleNamespace(index=1, embedding=encoded(0.5, -1.0)),
+                SimpleNamespace(index=0, embedding=encoded(0.25, 2.0)),
+            ]
+        )
+        mock_get_client.return_value = mock_client
+
+        result = generate_embeddings(["first", "second"], model="text-embedding-3-small")
+
+        assert all(isinstance(vector, array) and vector.typecode == "f" for vector in result)
+        assert [vector.tolist() for vector in result] == [[0.25, 2.0], [0.5, -1.0]]
+        assert mock_client.embeddings.create.call_args.kwargs["encoding_format"] == "base64"
+
+    @pytest.mark.unit
+    @patch("app.utils.similarity._get_embedding_client")
+    def test_float_lists_from_providers_ignoring_the_format_are_packed(self, mock_get_client):
+        """Providers that still return JSON floats should yield the same packed arrays."""
+        mock_client = MagicMock()
+        mock_client.embeddings.create.return_value = MagicMock(data=[SimpleNamespace(index=0, embedding=[1.0, 0.5])])
+        mock_get_client.return_value = mock_client
+
+        assert generate_embeddings(["text"], model="m")[0].tolist() == [1.0, 0.5]
+        assert generate_embeddings([]) == []
+
+
 # ---------------------------------------------------------------------------
 # Unit tests for _get_cached_embedding (invalid JSON paths)
 # ---------------------------------------------------------------------------
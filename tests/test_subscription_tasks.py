@@ -183,3 +183,28 @@ class TestApplyPendingSubscriptionChangesAll:
             apply_pending_subscription_changes_all.name
             == "app.tasks.subscription_tasks.apply_pending_subscription_changes_all"
         )
+
+
+@pytest.mark.unit
+class TestReconcileUsageCounters:
+    """Tests for the reconcile_usage_counters Celery task."""
+
+    @patch("app.utils.usage_counters.reconcile_usage_counters")
+    @patch("app.database.SessionLocal")
+    def test_returns_reconcile_result(self, mock_session_local, mock_reconcile):
+        """The task delegates to the utility and closes its session."""
+        from app.tasks.subscription_tasks import reconcile_usage_counters
+
+        mock_reconcile.return_value = {"owners": 2, "corrected": 1, "pruned": 0}
+
+        assert reconcile_usage_counters() == {"owners": 2, "corrected": 1, "pruned": 0}
+        mock_session_local.return_value.close.assert_called_once()
+
+    @patch("app.utils.usage_counters.reconcile_usage_counters", side_effect=RuntimeError("db down"))
+    @patch("app.database.SessionLocal")
+    def test_errors_are_logged_not_raised(self, mock_session_local, _mock_reconcile):
+        """A failing run rolls back and reports zero counts."""
+        from app.tasks.subscription_tasks import reconcile_usage_counters
+
+        assert reconcile_usage_counters() == {"owners": 0, "corrected": 0, "pruned": 0}
+        mock_session_local.return_value.rollback.assert_called_once()
@@ -769,7 +769,10 @@ class TestProcessDocumentTextQuality:
         with (
             patch("app.tasks.process_document.SessionLocal") as mock_sl,
             patch("app.tasks.process_document.settings") as mock_settings,
-            patch("app.tasks.process_document.hash_file", return_value="quality-fallback-hash"),
+            patch(
+                "app.tasks.process_document.hash_file_with_content_hash",
+                return_value=("quality-fallback-hash", "quality-fallback-content-hash"),
+            ),
             patch("app.tasks.process_document.log_task_progress") as mock_progress,
             patch("app.tasks.process_document.extract_metadata_with_gpt") as mock_gpt,
             patch("app.tasks.process_document.process_with_ocr") as mock_ocr,
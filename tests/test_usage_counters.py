@@ -0,0 +1,175 @@
+"""Tests for the materialised usage counters (app/utils/usage_counters.py)."""
+
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from app.models import FileRecord, UsageCounter
+from app.utils.subscription import get_lifetime_file_count, get_month_file_count, get_today_file_count
+from app.utils.usage_counters import (
+    PERIOD_DAY,
+    PERIOD_LIFETIME,
+    PERIOD_MONTH,
+    adjust_usage,
+    adjust_usage_for_records,
+    get_usage_count,
+    get_usage_since,
+    reconcile_usage_counters,
+)
+
+NOW = datetime(2026, 10, 18, 12, 0, tzinfo=timezone.utc)
+
+
+def _file(db, owner_id, created_at, is_duplicate=False):
+    record = FileRecord(
+        filehash=f"h{created_at.isoformat()}{is_duplicate}",
+        local_filename="x.pdf",
+        file_size=1,
+        owner_id=owner_id,
+        is_duplicate=is_duplicate,
+        created_at=created_at,
+    )
+    db.add(record)
+    return record
+
+
+def _counters(db):
+    return {(row.owner_id, row.period, row.bucket): row.count for row in db.query(UsageCounter)}
+
+
+@pytest.mark.unit
+class TestAdjustUsage:
+    """Tests for adjust_usage and adjust_usage_for_records."""
+
+    def test_increments_lifetime_month_and_day(self, db_session):
+        """One new file bumps its lifetime, month and day buckets atomically with the caller."""
+        adjust_usage(db_session, "alice", at=NOW)
+        adjust_usage(db_session, "alice", at=NOW)
+        adjust_usage(db_session, None, at=NOW)
+        db_session.commit()
+
+        assert _counters(db_session) == {
+            ("alice", PERIOD_LIFETIME, ""): 2,
+            ("alice", PERIOD_MONTH, "2026-10"): 2,
+            ("alice", PERIOD_DAY, "2026-10-18"): 2,
+        }
+
+    def test_rollback_discards_increment(self, db_session):
+        """Counters roll back together with the FileRecord change they account for."""
+        adjust_usage(db_session, "alice", at=NOW)
+        db_session.rollback()
+
+        assert get_usage_count(db_session, "alice", PERIOD_LIFETIME) == 0
+
+    def test_records_skip_duplicates_and_unowned(self, db_session):
+        """Deleting records only decrements counted (owned, non-duplicate) files."""
+        adjust_usage(db_session, "alice", delta=3, at=NOW)
+        records = [
+            SimpleNamespace(owner_id="alice", is_duplicate=False, created_at=NOW.replace(tzinfo=None)),
+            SimpleNamespace(owner_id="alice", is_duplicate=True, created_at=NOW),
+            SimpleNamespace(owner_id=None, is_duplicate=False, created_at=NOW),
+        ]
+
+        adjust_usage_for_records(db_session, records, -1)
+        db_session.commit()
+
+        assert get_usage_count(db_session, "alice", PERIOD_LIFETIME) == 2
+        assert get_usage_count(db_session, "alice", PERIOD_DAY, "2026-10-18") == 2
+
+    def test_update_then_insert_fallback(self):
+        """Dialects without ON CONFLICT update first and insert when no row was updated."""
+        db = MagicMock()
+        db.get_bind.return_value.dialect.name = "mssql"
+        db.execute.return_value.rowcount = 0
+
+        adjust_usage(db, "alice", at=NOW)
+
+        assert db.execute.call_count == 6
+
+
+@pytest.mark.unit
+class TestUsageReads:
+    """Tests for the quota reads backed by counters."""
+
+    def test_subscription_counts_read_counters(self, db_session):
+        """Lifetime, today and month counts are single counter rows."""
+        adjust_usage(db_session, "alice", delta=5, at=NOW)
+        adjust_usage(db_session, "alice", delta=2, at=datetime(2026, 9, 30, tzinfo=timezone.utc))
+        db_session.commit()
+
+        with patch("app.utils.subscription._today_utc", return_value=NOW.date()):
+            assert get_lifetime_file_count(db_session, "alice") == 7
+            assert get_month_file_count(db_session, "alice") == 5
+            assert get_today_file_count(db_session, "alice") == 5
+        assert get_lifetime_file_count(db_session, "bob") == 0
+
+    def test_usage_since_combines_day_and_month_buckets(self, db_session):
+        """Year-to-date counts the start day onwards, using month buckets for later months."""
+        for day, count in [("2025-11-02", 4), ("2025-11-10", 1), ("2025-12-24", 2), ("2026-10-18", 3)]:
+            adjust_usage(db_session, "alice", delta=count, at=datetime.fromisoformat(day))
+        db_session.commit()
+
+        assert get_usage_since(db_session, "alice", datetime(2025, 11, 10, 15, 30, tzinfo=timezone.utc)) == 6
+        assert get_usage_since(db_session, "alice", datetime(2025, 11, 1)) == 10
+
+
+@pytest.mark.unit
+class TestReconcileUsageCounters:
+    """Tests for reconcile_usage_counters."""
+
+    def test_corrects_drift_and_prunes_old_buckets(self, db_session):
+        """Counters are rebuilt from FileRecord; stale owners and old buckets are removed."""
+        _file(db_session, "alice", datetime(2026, 10, 18, 9, 0))
+        _file(db_session, "alice", datetime(2026, 10, 18, 9, 5), is_duplicate=True)
+        _file(db_session, "alice", datetime(2026, 9, 1, 8, 0))
+        _file(db_session, "alice", datetime(2020, 1, 1, 8, 0))
+        adjust_usage(db_session, "alice", delta=7, at=NOW)
+        adjust_usage(db_session, "ghost", at=NOW)
+        db_session.add(UsageCounter(owner_id="alice", period=PERIOD_DAY, bucket="2024-01-01", count=1))
+        db_session.commit()
+
+        result = reconcile_usage_counters(db_session, now=NOW)
+
+        assert result["owners"] == 2
+        assert result["pruned"] == 1
+        assert _counters(db_session) == {
+            ("alice", PERIOD_LIFETIME, ""): 3,
+            ("alice", PERIOD_MONTH, "2026-10"): 1,
+            ("alice", PERIOD_DAY, "2026-10-18"): 1,
+            ("alice", PERIOD_MONTH, "2026-09"): 1,
+            ("alice", PERIOD_DAY, "2026-09-01"): 1,
+        }
+        assert reconcile_usage_counters(db_session, now=NOW)["corrected"] == 0
+
+    def test_uploads_during_reconcile_are_kept(self, db_session):
+        """Corrections are deltas, so an increment committed after the files were counted survives."""
+        from app.utils import usage_counters
+
+        _file(db_session, "alice", datetime(2026, 10, 18, 9, 0))
+        adjust_usage(db_session, "alice", delta=5, at=NOW)
+        db_session.commit()
+        count_files = usage_counters._expected_counters
+
+        def upload_meanwhile(db, owner_id, window_start):
+            expected = count_files(db, owner_id, window_start)
+            adjust_usage(db, owner_id, at=NOW)
+            return expected
+
+        with patch.object(usage_counters, "_expected_counters", side_effect=upload_meanwhile):
+            reconcile_usage_counters(db_session, now=NOW)
+
+        assert _counters(db_session)[("alice", PERIOD_LIFETIME, "")] == 2
+
+    def test_days_are_bucketed_in_utc_on_postgresql(self):
+        """PostgreSQL converts created_at to UTC before truncating, matching the write path."""
+        from sqlalchemy.dialects import postgresql
+
+        from app.utils.usage_counters import _utc_date
+
+        db = MagicMock()
+        db.get_bind.return_value.dialect.name = "postgresql"
+        expression = _utc_date(db, FileRecord.created_at)
+        sql = str(expression.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+        assert sql == "date(timezone('UTC', files.created_at))"
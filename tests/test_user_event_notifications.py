@@ -201,7 +201,7 @@ class TestWebhookValidEvents:
         mock_task = mocker.patch("app.tasks.webhook_tasks.deliver_webhook_task")
         mock_task.delay = MagicMock()
         mocker.patch(
-            "app.utils.webhook.get_active_webhooks_for_event",
+            "app.utils.webhook.get_cached_webhooks_for_event",
             return_value=[{"id": 1, "url": "https://hook.example.com", "secret": None}],
         )
 
@@ -214,7 +214,7 @@ class TestWebhookValidEvents:
         mock_task = mocker.patch("app.tasks.webhook_tasks.deliver_webhook_task")
         mock_task.delay = MagicMock()
         mocker.patch(
-            "app.utils.webhook.get_active_webhooks_for_event",
+            "app.utils.webhook.get_cached_webhooks_for_event",
             return_value=[{"id": 2, "url": "https://hook.example.com", "secret": "s"}],
         )
 
@@ -227,7 +227,7 @@ class TestWebhookValidEvents:
         mock_task = mocker.patch("app.tasks.webhook_tasks.deliver_webhook_task")
         mock_task.delay = MagicMock()
         mocker.patch(
-            "app.utils.webhook.get_active_webhooks_for_event",
+            "app.utils.webhook.get_cached_webhooks_for_event",
             return_value=[{"id": 3, "url": "https://hook.example.com", "secret": None}],
         )
 
@@ -48,3 +48,23 @@ class TestUtils:
             assert len(hash_result) == 64  # SHA-256 hashes are 64 characters long
         finally:
             os.unlink(tmp_file.name)
+
+    def test_hash_file_with_content_hash_matches_dropbox_block_algorithm(self):
+        """The content hash is SHA-256 over the SHA-256 digests of 4 MiB blocks"""
+        import hashlib
+
+        from app.utils.file_operations import DROPBOX_CONTENT_HASH_BLOCK_SIZE, hash_file_with_content_hash
+
+        content = b"a" * DROPBOX_CONTENT_HASH_BLOCK_SIZE + b"b" * 1000
+        with tempfile.NamedTemporaryFile(delete=False) as tmp_file:
+            tmp_file.write(content)
+            tmp_file.flush()
+
+        try:
+            block_digests = hashlib.sha256(content[:DROPBOX_CONTENT_HASH_BLOCK_SIZE]).digest()
+            block_digests += hashlib.sha256(content[DROPBOX_CONTENT_HASH_BLOCK_SIZE:]).digest()
+            filehash, content_hash = hash_file_with_content_hash(tmp_file.name)
+            assert filehash == hashlib.sha256(content).hexdigest()
+            assert content_hash == hashlib.sha256(block_digests).hexdigest()
+        finally:
+            os.unlink(tmp_file.name)
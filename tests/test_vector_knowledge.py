@@ -202,29 +202,67 @@ def test_qdrant_request_wraps_transport_and_http_errors():
 
     index = QdrantVectorIndex()
     response = SimpleNamespace(status_code=201, text="", json=lambda: {})
-    with patch("app.utils.vector_index.requests.request", return_value=response) as request:
+    with patch("app.utils.vector_index._http_session") as session:
+        session.return_value.request.return_value = response
         assert index._request("PUT", "/collections/test", {"value": 1}, expected=(201,)) is response
-    request.assert_called_once_with(
+    session.return_value.request.assert_called_once_with(
         "PUT",
         f"{index.base_url}/collections/test",
         headers=index.headers,
-        json={"value": 1},
+        data=b'{"value":1}',
         timeout=index.timeout,
     )
 
-    with patch(
-        "app.utils.vector_index.requests.request",
-        side_effect=requests.ConnectionError("offline"),
-    ):
+    with patch("app.utils.vector_index._http_session") as session:
+        session.return_value.request.side_effect = requests.ConnectionError("offline")
         with pytest.raises(VectorIndexError, match="request failed"):
             index._request("GET", "/collections/test")
+    assert session.return_value.request.call_args.kwargs["data"] is None
 
     failure = SimpleNamespace(status_code=503, text="unavailable", json=lambda: {})
-    with patch("app.utils.vector_index.requests.request", return_value=failure):
+    with patch("app.utils.vector_index._http_session") as session:
+        session.return_value.request.return_value = failure
         with pytest.raises(VectorIndexError, match="returned 503"):
             index._request("GET", "/collections/test")
 
 
+def test_qdrant_session_is_reused_per_process():
+    from app.utils import vector_index
+
+    assert vector_index._http_session() is vector_index._http_session()
+
+
+def test_packed_vectors_are_written_with_datatype_precision():
+    from array import array
+
+    from app.utils.vector_index import encode_body
+
+    vector = array("f", [0.1, -2.5, 1e-7])
+    body = {"points": [{"id": "p", "vector": vector, "payload": {"text": "ä"}}]}
+
+    assert array("f", json.loads(encode_body(body))["points"][0]["vector"]) == vector
+    assert encode_body(body).startswith(b'{"points":[{"id":"p","vector":[0.100000001,-2.5,1.00000001e-07]')
+    assert json.loads(encode_body(body, "float16"))["points"][0]["vector"] == [0.1, -2.5, 1e-07]
+    assert len(encode_body(body, "float16")) < len(encode_body(body)) < len(json.dumps(body, default=list))
+    with pytest.raises(TypeError):
+        encode_body({"value": object()})
+
+
+def test_float16_collections_declare_their_datatype():
+    from app.utils.vector_index import QdrantVectorIndex
+
+    with (
+        patch("app.utils.vector_index.settings.vector_index_datatype", "float16"),
+        patch.object(
+            QdrantVectorIndex,
+            "_request",
+            side_effect=[SimpleNamespace(status_code=404)] + [SimpleNamespace(status_code=200)] * 6,
+        ) as request,
+    ):
+        QdrantVectorIndex().ensure_collection(8)
+    assert request.call_args_list[1].args[2] == {"vectors": {"size": 8, "distance": "Cosine", "datatype": "float16"}}
+
+
 def test_qdrant_collection_creation_and_dimension_guard():
     from app.utils.vector_index import QdrantVectorIndex, VectorIndexError
 
@@ -319,6 +357,32 @@ def test_qdrant_search_uses_legacy_fallback_and_normalizes_results():
     assert "query" not in request.call_args_list[1].args[2]
 
 
+def test_qdrant_top_passages_groups_chunks_by_requested_document():
+    from app.utils.vector_index import QdrantVectorIndex
+
+    missing = SimpleNamespace(status_code=404, json=lambda: {})
+    legacy = SimpleNamespace(
+        status_code=200,
+        json=lambda: {
+            "result": {
+                "groups": [
+                    {"id": 7, "hits": [{"payload": {"document_id": 7, "chunk_index": 4, "text": "match"}}]},
+                    {"id": 99, "hits": [{"payload": {"document_id": 99, "text": "not requested"}}]},
+                ]
+            }
+        },
+    )
+    with patch.object(QdrantVectorIndex, "_request", side_effect=[missing, legacy]) as request:
+        result = QdrantVectorIndex().top_passages([0.1, 0.2], document_ids=[7, 8], per_document=3)
+
+    assert result == {7: [{"document_id": 7, "chunk_index": 4, "text": "match"}]}
+    body = request.call_args_list[0].args[2]
+    assert request.call_args_list[0].args[1].endswith("/points/query/groups")
+    assert (body["group_by"], body["group_size"], body["limit"]) == ("document_id", 3, 2)
+    assert body["filter"] == {"must": [{"key": "document_id", "match": {"any": [7, 8]}}]}
+    assert request.call_args_list[1].args[2]["vector"] == [0.1, 0.2]
+
+
 def test_qdrant_search_filters_owner_shares_and_unowned_before_ranking():
     from app.utils.vector_index import QdrantVectorIndex
 
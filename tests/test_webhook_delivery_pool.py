@@ -0,0 +1,342 @@
+"""Tests for pooled webhook delivery, per-endpoint limits and batched mode."""
+
+import http.client
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import MagicMock
+from urllib.parse import urlparse
+
+import pytest
+
+from app.utils.webhook import (
+    WebhookThrottled,
+    _connection_pool,
+    _EndpointLimiter,
+    _open_pinned_connection,
+    _send_pinned_post,
+    compute_signature,
+    deliver_webhook_with_status,
+    dispatch_webhook_events,
+)
+from app.utils.webhook_batching import drain_buffer
+
+
+class _RecordingHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    client_ports: list[int] = []
+    bodies: list[bytes] = []
+
+    def do_POST(self):  # noqa: N802
+        length = int(self.headers.get("Content-Length", 0))
+        type(self).bodies.append(self.rfile.read(length))
+        type(self).client_ports.append(self.client_address[1])
+        self.send_response(204)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def keepalive_server():
+    _RecordingHandler.client_ports = []
+    _RecordingHandler.bodies = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _RecordingHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    _connection_pool.clear()
+    yield server
+    _connection_pool.clear()
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.mark.unit
+class TestPinnedConnectionPool:
+    """Tests for keep-alive reuse of pinned connections."""
+
+    def test_reuses_connection_for_same_endpoint(self, keepalive_server):
+        """Consecutive deliveries share one TCP connection."""
+        port = keepalive_server.server_address[1]
+        parsed = urlparse(f"http://hooks.example:{port}/hook")
+
+        assert _send_pinned_post(parsed, "127.0.0.1", b'{"n":1}', {"Content-Type": "application/json"}) == (True, 204)
+        assert _send_pinned_post(parsed, "127.0.0.1", b'{"n":2}', {"Content-Type": "application/json"}) == (True, 204)
+
+        assert _RecordingHandler.bodies == [b'{"n":1}', b'{"n":2}']
+        assert len(set(_RecordingHandler.client_ports)) == 1
+
+    def test_stale_pooled_connection_is_replaced(self, mocker):
+        """A keep-alive connection closed by the server is retried once on a fresh connection."""
+        stale = MagicMock()
+        stale.request.side_effect = http.client.RemoteDisconnected("closed")
+        fresh = MagicMock()
+        fresh.getresponse.return_value = MagicMock(status=200, will_close=True)
+        mocker.patch.object(_connection_pool, "acquire", return_value=stale)
+        opener = mocker.patch("app.utils.webhook._open_pinned_connection", return_value=fresh)
+
+        result = _send_pinned_post(urlparse("https://example.com/hook"), "93.184.216.34", b"{}", {})
+
+        assert result == (True, 200)
+        stale.close.assert_called_once()
+        opener.assert_called_once()
+        fresh.close.assert_called_once()
+
+    def test_fresh_connection_errors_are_not_retried(self, mocker):
+        """Errors on a newly opened connection propagate to the caller."""
+        fresh = MagicMock()
+        fresh.request.side_effect = ConnectionResetError("reset")
+        mocker.patch.object(_connection_pool, "acquire", return_value=None)
+        opener = mocker.patch("app.utils.webhook._open_pinned_connection", return_value=fresh)
+
+        with pytest.raises(ConnectionResetError):
+            _send_pinned_post(urlparse("https://example.com/hook"), "93.184.216.34", b"{}", {})
+        opener.assert_called_once()
+
+    def test_pinned_connection_never_reopens_by_hostname(self, mocker):
+        """Auto-reconnect is disabled so DNS is never consulted after validation."""
+        raw_socket = MagicMock()
+        create = mocker.patch("app.utils.webhook.socket.create_connection", return_value=raw_socket)
+
+        connection = _open_pinned_connection(urlparse("http://example.com/hook"), "93.184.216.34")
+
+        create.assert_called_once_with(("93.184.216.34", 80), timeout=10)
+        assert connection.sock is raw_socket
+        assert connection.auto_open == 0
+
+
+@pytest.mark.unit
+class TestEndpointLimiter:
+    """Tests for per-endpoint concurrency and rate limits."""
+
+    def test_concurrency_limit_refuses_extra_slot_without_waiting(self):
+        """A second concurrent slot is refused at once with a retry delay when the limit is one."""
+        limiter = _EndpointLimiter()
+        key = ("https", "erp.example", 443)
+        with limiter.slot(key, 1, 0) as first:
+            assert first == 0
+            with limiter.slot(key, 1, 0) as second:
+                assert second > 0
+        with limiter.slot(key, 1, 0) as third:
+            assert third == 0
+
+    def test_rate_limit_reports_time_until_next_token(self):
+        """Requests beyond the per-minute budget get the delay until the bucket refills."""
+        limiter = _EndpointLimiter()
+        key = ("https", "erp.example", 443)
+        with limiter.slot(key, 4, 60) as first:
+            assert first == 0
+        with limiter.slot(key, 4, 60) as second:
+            assert 0 < second <= 1.0
+
+    def test_throttled_delivery_is_not_sent(self, mocker):
+        """deliver_webhook_with_status raises WebhookThrottled without sending when no slot is free."""
+        mocker.patch("app.utils.webhook._resolve_public_address", return_value="93.184.216.34")
+        send = mocker.patch("app.utils.webhook._send_pinned_post")
+        limiter = _EndpointLimiter()
+        mocker.patch("app.utils.webhook._endpoint_limiter", limiter)
+        key = ("https", "throttled.example", 443)
+
+        with limiter.slot(key, 1, 0), pytest.raises(WebhookThrottled) as throttled:
+            deliver_webhook_with_status("https://throttled.example/hook", {"event": "x"}, max_concurrency=1)
+
+        assert throttled.value.retry_after > 0
+        send.assert_not_called()
+
+
+@pytest.mark.unit
+class TestBatchedDelivery:
+    """Tests for JSON-array batched deliveries."""
+
+    def test_list_payload_sent_as_signed_array(self, mocker):
+        """Batched payloads are signed over the array body and flagged in headers."""
+        mocker.patch("app.utils.webhook._resolve_public_address", return_value="93.184.216.34")
+        send = mocker.patch("app.utils.webhook._send_pinned_post", return_value=(True, 200))
+        payloads = [{"version": "1.0", "event": "document.uploaded"}, {"version": "1.0", "event": "document.failed"}]
+
+        assert deliver_webhook_with_status("https://erp.example/hook", payloads, "s") == (True, 200)
+
+        body, headers = send.call_args.args[2], send.call_args.args[3]
+        assert json.loads(body) == payloads
+        assert headers["X-DocuElevate-Event"] == "batch"
+        assert headers["X-DocuElevate-Batch-Size"] == "2"
+        assert headers["X-DocuElevate-Webhook-Version"] == "1.0"
+        assert headers["X-Webhook-Signature"] == compute_signature(body, "s")
+
+    def test_dispatch_buffers_batch_subscribers(self, mocker):
+        """Batch-enabled webhooks are buffered instead of queued immediately."""
+        mocker.patch(
+            "app.utils.webhook.get_cached_webhooks_for_event",
+            return_value=[{"id": 5, "url": "https://erp.example/hook", "secret": None, "batch_delivery": True}],
+        )
+        mocker.patch("app.utils.automation_hooks.dispatch_automation_hooks")
+        buffer = mocker.patch("app.utils.webhook_batching.buffer_delivery", return_value=True)
+        single = mocker.patch("app.tasks.webhook_tasks.deliver_webhook_task.delay")
+
+        dispatch_webhook_events([("document.uploaded", {"file_id": 1})])
+
+        buffer.assert_called_once()
+        assert buffer.call_args[0][0] == 5
+        single.assert_not_called()
+
+    def test_dispatch_falls_back_when_buffer_unavailable(self, mocker):
+        """Without Redis, batch subscribers still get an immediate delivery."""
+        mocker.patch(
+            "app.utils.webhook.get_cached_webhooks_for_event",
+            return_value=[{"id": 5, "url": "https://erp.example/hook", "secret": None, "batch_delivery": True}],
+        )
+        mocker.patch("app.utils.automation_hooks.dispatch_automation_hooks")
+        mocker.patch("app.utils.webhook_batching.buffer_delivery", return_value=False)
+        single = mocker.patch("app.tasks.webhook_tasks.deliver_webhook_task.delay")
+
+        dispatch_webhook_events([("document.uploaded", {"file_id": 1})])
+
+        single.assert_called_once()
+
+    def test_batched_task_failure_requeues_each_item(self, mocker, db_session):
+        """A failed array POST hands every item to the per-delivery retry task."""
+        mocker.patch("app.tasks.webhook_tasks.SessionLocal", return_value=db_session)
+        mocker.patch("app.tasks.webhook_tasks._delivery_limits", return_value={"max_concurrency": 2})
+        deliver = mocker.patch("app.tasks.webhook_tasks.deliver_webhook_with_status", return_value=(False, 502))
+        retry = mocker.patch("app.tasks.webhook_tasks.deliver_webhook_task.apply_async")
+
+        from app.tasks.webhook_tasks import deliver_webhook_batch_task
+
+        deliver_webhook_batch_task.request.id = "batch-array"
+        result = deliver_webhook_batch_task.__wrapped__(
+            "https://erp.example/hook",
+            [
+                {"payload": {"event": "document.uploaded"}, "webhook_config_id": 5},
+                {"payload": {"event": "document.failed"}, "webhook_config_id": 5},
+            ],
+            None,
+            batched=True,
+        )
+
+        deliver.assert_called_once()
+        assert deliver.call_args.args[1] == [{"event": "document.uploaded"}, {"event": "document.failed"}]
+        assert deliver.call_args.kwargs == {"max_concurrency": 2}
+        assert result["requeued"] == 2
+        assert retry.call_count == 2
+
+    def test_throttled_array_is_requeued_whole(self, mocker, db_session):
+        """A throttled batch keeps its payloads together and reuses their attempt records."""
+        mocker.patch("app.tasks.webhook_tasks.SessionLocal", return_value=db_session)
+        mocker.patch("app.tasks.webhook_tasks._delivery_limits", return_value={})
+        mocker.patch(
+            "app.tasks.webhook_tasks.deliver_webhook_with_status",
+            side_effect=WebhookThrottled("https://erp.example/hook", 3.0),
+        )
+        single = mocker.patch("app.tasks.webhook_tasks.deliver_webhook_task.apply_async")
+
+        from app.tasks.webhook_tasks import deliver_webhook_batch_task
+
+        requeue = mocker.patch.object(deliver_webhook_batch_task, "apply_async")
+        deliver_webhook_batch_task.request.id = "batch-throttled"
+        result = deliver_webhook_batch_task.__wrapped__(
+            "https://erp.example/hook",
+            [{"payload": {"event": "a"}, "webhook_config_id": 5}, {"payload": {"event": "b"}, "webhook_config_id": 5}],
+            None,
+            batched=True,
+        )
+
+        assert result["status"] == "throttled"
+        single.assert_not_called()
+        deliveries = requeue.call_args.kwargs["args"][1]
+        assert [d["payload"]["event"] for d in deliveries] == ["a", "b"]
+        assert all(d["delivery_id"] is not None for d in deliveries)
+        assert requeue.call_args.kwargs["countdown"] == 3.0
+
+    def test_flush_drains_buffers_in_chunks(self, mocker):
+        """Each drained chunk becomes one batched delivery message."""
+        mocker.patch("app.tasks.webhook_tasks.buffered_webhook_ids", return_value=[5])
+        mocker.patch(
+            "app.tasks.webhook_tasks.registry.webhook_by_id",
+            return_value={"id": 5, "url": "https://erp.example/hook", "secret": "s", "batch_delivery": True},
+        )
+        mocker.patch("app.tasks.webhook_tasks.settings.webhook_batch_max_size", 2)
+        chunks = iter([[{"event": "a"}, {"event": "b"}], [{"event": "c"}]])
+
+        def drain(webhook_id, max_items, hand_off):
+            payloads = next(chunks)
+            hand_off(payloads)
+            return len(payloads)
+
+        mocker.patch("app.tasks.webhook_tasks.drain_buffer", side_effect=drain)
+        delay = mocker.patch("app.tasks.webhook_tasks.deliver_webhook_batch_task.delay")
+
+        from app.tasks.webhook_tasks import flush_webhook_batches
+
+        assert flush_webhook_batches() == {"batches": 2, "events": 3}
+        first = delay.call_args_list[0]
+        assert first.args[0] == "https://erp.example/hook"
+        assert [d["payload"]["event"] for d in first.args[1]] == ["a", "b"]
+        assert first.kwargs == {"batched": True}
+
+    def test_flush_handles_buffers_of_unbatched_and_inactive_webhooks(self, mocker):
+        """Buffers outliving batch mode are sent as single POSTs; those of inactive webhooks are dropped."""
+        mocker.patch("app.tasks.webhook_tasks.buffered_webhook_ids", return_value=[5, 6])
+        mocker.patch(
+            "app.tasks.webhook_tasks.registry.webhook_by_id",
+            side_effect=lambda webhook_id: (
+                {"id": 5, "url": "https://erp.example/hook", "secret": None, "batch_delivery": False}
+                if webhook_id == 5
+                else None
+            ),
+        )
+
+        def drain(webhook_id, max_items, hand_off):
+            hand_off([{"event": "a"}])
+            return 1
+
+        mocker.patch("app.tasks.webhook_tasks.drain_buffer", side_effect=drain)
+        discard = mocker.patch("app.tasks.webhook_tasks.discard_buffer", return_value=3)
+        delay = mocker.patch("app.tasks.webhook_tasks.deliver_webhook_batch_task.delay")
+
+        from app.tasks.webhook_tasks import flush_webhook_batches
+
+        assert flush_webhook_batches() == {"batches": 1, "events": 1}
+        assert delay.call_args.kwargs == {"batched": False}
+        discard.assert_called_once_with(6)
+
+
+class _ListRedis:
+    """Just enough of a Redis client for the batch buffer helpers."""
+
+    def __init__(self, **lists):
+        self.lists = {key: list(values) for key, values in lists.items()}
+
+    def lrange(self, key, start, end):
+        return self.lists.get(key, [])[start : end + 1]
+
+    def ltrim(self, key, start, end):
+        self.lists[key] = self.lists.get(key, [])[start:]
+
+
+@pytest.mark.unit
+class TestDrainBuffer:
+    """Tests for draining the Redis batch buffer."""
+
+    KEY = "docuelevate:webhook_batch:5"
+
+    def test_payloads_are_removed_after_hand_off(self, mocker):
+        client = _ListRedis(**{self.KEY: ['{"event": "a"}', '{"event": "b"}', '{"event": "c"}']})
+        mocker.patch("app.utils.webhook_batching._get_redis", return_value=client)
+        handed = []
+
+        assert drain_buffer(5, 2, handed.extend) == 2
+        assert handed == [{"event": "a"}, {"event": "b"}]
+        assert client.lists[self.KEY] == ['{"event": "c"}']
+
+    def test_failed_hand_off_keeps_payloads_buffered(self, mocker):
+        client = _ListRedis(**{self.KEY: ['{"event": "a"}']})
+        mocker.patch("app.utils.webhook_batching._get_redis", return_value=client)
+
+        def broker_down(payloads):
+            raise ConnectionError("broker unavailable")
+
+        with pytest.raises(ConnectionError):
+            drain_buffer(5, 10, broker_down)
+        assert client.lists[self.KEY] == ['{"event": "a"}']
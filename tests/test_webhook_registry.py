@@ -0,0 +1,201 @@
+"""Tests for the cached webhook subscription registry and batched dispatch."""
+
+import json
+from unittest.mock import MagicMock
+
+import pytest
+
+from app.models import AutomationHook, WebhookConfig, WebhookDeliveryAttempt
+from app.utils import webhook_registry
+from app.utils.webhook_registry import (
+    MAX_INDEX_AGE,
+    UNVERIFIED_INDEX_TTL,
+    SubscriptionIndex,
+    SubscriptionRegistry,
+    notify_subscriptions_changed,
+)
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _counting_loader(webhooks=None):
+    calls = []
+
+    def loader(version, built_at):
+        calls.append(version)
+        return SubscriptionIndex(version=version, built_at=built_at, webhooks=webhooks or {})
+
+    return loader, calls
+
+
+@pytest.mark.unit
+class TestSubscriptionRegistry:
+    """Tests for version-keyed index caching."""
+
+    def test_reuses_index_while_version_unchanged(self):
+        """Repeated lookups with the same version hit the database once."""
+        loader, calls = _counting_loader({"document.uploaded": ({"id": 1, "url": "https://a.example"},)})
+        registry = SubscriptionRegistry(loader=loader, version_reader=lambda: "v1", clock=_Clock())
+
+        for _ in range(5):
+            assert registry.webhooks_for("document.uploaded") == [{"id": 1, "url": "https://a.example"}]
+        assert registry.webhooks_for("document.failed") == []
+        assert calls == ["v1"]
+
+    def test_version_change_rebuilds(self):
+        """A new published version triggers a rebuild."""
+        loader, calls = _counting_loader()
+        versions = iter(["v1", "v1", "v2"])
+        registry = SubscriptionRegistry(loader=loader, version_reader=lambda: next(versions), clock=_Clock())
+
+        registry.webhooks_for("document.uploaded")
+        registry.webhooks_for("document.uploaded")
+        registry.webhooks_for("document.uploaded")
+
+        assert calls == ["v1", "v2"]
+
+    def test_unverified_index_expires_without_redis(self):
+        """Without Redis the index is trusted only for a short TTL."""
+        loader, calls = _counting_loader()
+        clock = _Clock()
+        registry = SubscriptionRegistry(loader=loader, version_reader=lambda: None, clock=clock)
+
+        registry.webhooks_for("document.uploaded")
+        clock.now += UNVERIFIED_INDEX_TTL / 2
+        registry.webhooks_for("document.uploaded")
+        clock.now += UNVERIFIED_INDEX_TTL
+        registry.webhooks_for("document.uploaded")
+
+        assert len(calls) == 2
+
+    def test_index_rebuilt_after_max_age(self):
+        """Even an unchanged version is re-read from the database eventually."""
+        loader, calls = _counting_loader()
+        clock = _Clock()
+        registry = SubscriptionRegistry(loader=loader, version_reader=lambda: "v1", clock=clock)
+
+        registry.webhooks_for("document.uploaded")
+        clock.now += MAX_INDEX_AGE
+        registry.webhooks_for("document.uploaded")
+
+        assert len(calls) == 2
+
+    def test_returned_entries_are_copies(self):
+        """Callers cannot mutate the cached index."""
+        loader, _ = _counting_loader({"document.uploaded": ({"id": 1},)})
+        registry = SubscriptionRegistry(loader=loader, version_reader=lambda: "v1", clock=_Clock())
+
+        registry.webhooks_for("document.uploaded")[0]["id"] = 99
+
+        assert registry.webhooks_for("document.uploaded") == [{"id": 1}]
+
+    def test_loads_webhooks_and_hooks_in_one_session(self, mocker, db_session):
+        """The default loader indexes active webhooks and automation hooks by event."""
+        db_session.add_all(
+            [
+                WebhookConfig(url="https://a.example/hook", events=json.dumps(["document.uploaded"]), is_active=True),
+                WebhookConfig(url="https://b.example/hook", events=json.dumps(["document.uploaded"]), is_active=False),
+                WebhookConfig(url="https://c.example/hook", events="not json", is_active=True),
+                AutomationHook(
+                    target_url="https://hooks.zapier.com/1",
+                    events=json.dumps(["document.processed"]),
+                    is_active=True,
+                ),
+            ]
+        )
+        db_session.commit()
+        session_factory = mocker.patch("app.utils.webhook_registry.SessionLocal", return_value=db_session)
+        registry = SubscriptionRegistry(version_reader=lambda: "v1", clock=_Clock())
+
+        assert [wh["url"] for wh in registry.webhooks_for("document.uploaded")] == ["https://a.example/hook"]
+        assert [h["target_url"] for h in registry.automation_hooks_for("document.processed")] == [
+            "https://hooks.zapier.com/1"
+        ]
+        assert registry.automation_hooks_for("document.uploaded") == []
+        session_factory.assert_called_once()
+
+    def test_notify_bumps_version_and_invalidates(self, mocker):
+        """Publishing a change drops the local index and writes a new Redis version."""
+        client = MagicMock()
+        mocker.patch("app.utils.webhook_registry._get_redis", return_value=client)
+        invalidate = mocker.patch.object(webhook_registry.registry, "invalidate")
+
+        notify_subscriptions_changed()
+
+        invalidate.assert_called_once()
+        key, value = client.set.call_args[0]
+        assert key == webhook_registry.REGISTRY_VERSION_KEY
+        assert value
+
+    def test_notify_tolerates_missing_redis(self, mocker):
+        """A Redis outage does not raise from the publish helper."""
+        mocker.patch("app.utils.webhook_registry._get_redis", return_value=None)
+
+        notify_subscriptions_changed()
+
+
+@pytest.mark.unit
+class TestBatchedDispatch:
+    """Tests for grouping deliveries by endpoint."""
+
+    def test_groups_deliveries_to_the_same_endpoint(self, mocker):
+        """Two configs sharing URL and secret produce one batch message."""
+        from app.utils.webhook import dispatch_webhook_events
+
+        subscribers = {
+            "document.uploaded": [{"id": 1, "url": "https://erp.example/hook", "secret": "s"}],
+            "document.processed": [
+                {"id": 1, "url": "https://erp.example/hook", "secret": "s"},
+                {"id": 2, "url": "https://other.example/hook", "secret": None},
+            ],
+        }
+        mocker.patch("app.utils.webhook.get_cached_webhooks_for_event", side_effect=lambda e: subscribers.get(e, []))
+        mocker.patch("app.utils.automation_hooks.dispatch_automation_hooks")
+        single = mocker.patch("app.tasks.webhook_tasks.deliver_webhook_task.delay")
+        batch = mocker.patch("app.tasks.webhook_tasks.deliver_webhook_batch_task.delay")
+
+        dispatch_webhook_events([("document.uploaded", {"file_id": 1}), ("document.processed", {"file_id": 1})])
+
+        batch.assert_called_once()
+        url, deliveries, secret = batch.call_args[0]
+        assert url == "https://erp.example/hook"
+        assert secret == "s"
+        assert [d["payload"]["event"] for d in deliveries] == ["document.uploaded", "document.processed"]
+        single.assert_called_once()
+        assert single.call_args[0][0] == "https://other.example/hook"
+        assert single.call_args.kwargs["webhook_config_id"] == 2
+
+    def test_batch_task_requeues_only_failed_deliveries(self, mocker, db_session):
+        """Successful deliveries are recorded; failures are handed to the retrying task."""
+        mocker.patch("app.tasks.webhook_tasks.SessionLocal", return_value=db_session)
+        mocker.patch(
+            "app.tasks.webhook_tasks.deliver_webhook_with_status",
+            side_effect=[(True, 200), (False, 503)],
+        )
+        retry = mocker.patch("app.tasks.webhook_tasks.deliver_webhook_task.apply_async")
+
+        from app.tasks.webhook_tasks import deliver_webhook_batch_task
+
+        deliver_webhook_batch_task.request.id = "batch-1"
+        result = deliver_webhook_batch_task.__wrapped__(
+            "https://erp.example/hook",
+            [
+                {"payload": {"event": "document.uploaded"}, "webhook_config_id": 1},
+                {"payload": {"event": "document.processed"}, "webhook_config_id": 1},
+            ],
+            "s",
+        )
+
+        assert result["delivered"] == 1
+        assert result["requeued"] == 1
+        statuses = {a.event: a.status for a in db_session.query(WebhookDeliveryAttempt).all()}
+        assert statuses == {"document.uploaded": "delivered", "document.processed": "failed"}
+        retry.assert_called_once()
+        assert retry.call_args.kwargs["args"][1] == {"event": "document.processed"}
+        assert retry.call_args.kwargs["kwargs"]["delivery_id"] is not None
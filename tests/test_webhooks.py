@@ -13,6 +13,7 @@ import pytest
 
 from app.models import FileRecord, Pipeline, WebhookConfig, WebhookDeliveryAttempt
 from app.utils.webhook import (
+    WebhookThrottled,
     _send_pinned_post,
     build_payload,
     compute_signature,
@@ -301,19 +302,19 @@ class TestDispatchWebhookEvent:
 
     def test_unknown_event_is_ignored(self, mocker):
         """Unknown events are silently ignored."""
-        mock_get = mocker.patch("app.utils.webhook.get_active_webhooks_for_event")
+        mock_get = mocker.patch("app.utils.webhook.get_cached_webhooks_for_event")
         dispatch_webhook_event("unknown.event", {})
         mock_get.assert_not_called()
 
     def test_no_webhooks_does_not_fail(self, mocker):
         """No error when there are no matching webhooks."""
-        mocker.patch("app.utils.webhook.get_active_webhooks_for_event", return_value=[])
+        mocker.patch("app.utils.webhook.get_cached_webhooks_for_event", return_value=[])
         dispatch_webhook_event("document.uploaded", {"file_id": 1})
 
     def test_queues_celery_task_for_each_webhook(self, mocker):
         """A Celery task is queued for each matching webhook."""
         mocker.patch(
-            "app.utils.webhook.get_active_webhooks_for_event",
+            "app.utils.webhook.get_cached_webhooks_for_event",
             return_value=[
                 {"id": 1, "url": "https://a.com", "secret": "s", "events": ["document.uploaded"]},
                 {"id": 2, "url": "https://b.com", "secret": None, "events": ["document.uploaded"]},
@@ -581,6 +582,25 @@ class TestWebhookAPI:
         assert data["url"] == "https://new.example.com/hook"
         assert data["is_active"] is False
 
+    def test_update_webhook_resets_limits_with_null(self, client, db_session):
+        """PUT with explicit nulls returns the limits to the global defaults; omitted fields stay."""
+        self._with_admin(client)
+        cfg = WebhookConfig(
+            url="https://limits.example.com/hook",
+            events=json.dumps(["document.uploaded"]),
+            is_active=True,
+            max_concurrency=2,
+            rate_limit_per_minute=600,
+        )
+        db_session.add(cfg)
+        db_session.commit()
+
+        kept = client.put(f"/api/webhooks/{cfg.id}", json={"description": "ERP"})
+        reset = client.put(f"/api/webhooks/{cfg.id}", json={"max_concurrency": None, "rate_limit_per_minute": None})
+
+        assert (kept.json()["max_concurrency"], kept.json()["rate_limit_per_minute"]) == (2, 600)
+        assert (reset.json()["max_concurrency"], reset.json()["rate_limit_per_minute"]) == (None, None)
+
     def test_update_webhook_not_found(self, client):
         """PUT /api/webhooks/9999 returns 404."""
         self._with_admin(client)
@@ -737,6 +757,32 @@ class TestDeliverWebhookTask:
         assert "failed" in attempt.error
         assert attempt.response_status == 503
 
+    def test_throttled_delivery_is_requeued_without_spending_a_retry(self, mocker, db_session):
+        """A throttled endpoint re-queues the delivery after the limiter's delay instead of waiting."""
+        mocker.patch(
+            "app.tasks.webhook_tasks.deliver_webhook_with_status",
+            side_effect=WebhookThrottled("https://example.com/hook", 2.5),
+        )
+        mocker.patch("app.tasks.webhook_tasks.SessionLocal", return_value=db_session)
+
+        from app.tasks.webhook_tasks import deliver_webhook_task
+
+        requeue = mocker.patch.object(deliver_webhook_task, "apply_async")
+        deliver_webhook_task.request.retries = 1
+        deliver_webhook_task.request.id = "task-throttled"
+
+        result = deliver_webhook_task.__wrapped__("https://example.com/hook", {"event": "test"}, None, 123)
+
+        assert result["status"] == "throttled"
+        attempt = db_session.query(WebhookDeliveryAttempt).one()
+        assert attempt.status == "queued"
+        requeue.assert_called_once_with(
+            args=("https://example.com/hook", {"event": "test"}, None),
+            kwargs={"webhook_config_id": 123, "delivery_id": attempt.id},
+            countdown=2.5,
+            retries=1,
+        )
+
     def test_final_failure_logs_dead_letter_context(self, mocker):
         """After retry exhaustion, webhook failures are logged with dead-letter context."""
         mock_logger = mocker.patch("app.tasks.webhook_tasks.logger")
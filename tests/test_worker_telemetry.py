@@ -0,0 +1,190 @@
+"""Tests for the heartbeat-based worker telemetry in app/utils/worker_telemetry.py."""
+
+import json
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from app.utils.worker_telemetry import (
+    TELEMETRY_KEY,
+    WorkerTelemetryStep,
+    aggregate_snapshots,
+    build_snapshot,
+    publish_snapshot,
+    read_worker_snapshots,
+)
+
+
+def _request(task_id, queue="document_processor", started=None, **kwargs):
+    return SimpleNamespace(
+        id=task_id,
+        name=kwargs.pop("name", "app.tasks.process_document.process_document"),
+        argsrepr=kwargs.pop("argsrepr", "(1,)"),
+        delivery_info={"routing_key": queue},
+        time_start=started,
+        **kwargs,
+    )
+
+
+def _worker(concurrency=4, multiplier=2, queues=("document_processor",), timer_queue=()):
+    consumer = SimpleNamespace(
+        qos=SimpleNamespace(value=6),
+        task_consumer=SimpleNamespace(queues=[SimpleNamespace(name=name) for name in queues]),
+    )
+    return SimpleNamespace(
+        hostname="celery@worker1",
+        concurrency=concurrency,
+        app=SimpleNamespace(conf=SimpleNamespace(worker_prefetch_multiplier=multiplier)),
+        consumer=consumer,
+        pool=SimpleNamespace(info={"processes": []}),
+        timer=SimpleNamespace(queue=list(timer_queue)),
+    )
+
+
+class _FakeRedis:
+    def __init__(self):
+        self.hashes: dict[str, dict[str, str]] = {}
+
+    def pipeline(self, transaction=False):
+        return self
+
+    def hset(self, key, field, value):
+        self.hashes.setdefault(key, {})[field] = value
+
+    def expire(self, key, seconds):
+        pass
+
+    def execute(self):
+        pass
+
+    def hgetall(self, key):
+        return dict(self.hashes.get(key, {}))
+
+    def hdel(self, key, field):
+        self.hashes.get(key, {}).pop(field, None)
+
+
+@pytest.mark.unit
+class TestBuildSnapshot:
+    """Tests for build_snapshot."""
+
+    def test_counts_active_and_reserved_per_queue(self):
+        """Reserved excludes tasks that are already executing, as ``inspect reserved`` does."""
+        running = _request("a", started=90.0)
+        waiting = _request("b", queue="default")
+        with (
+            patch("celery.worker.state.active_requests", [running]),
+            patch("celery.worker.state.reserved_requests", [running, waiting]),
+            patch("celery.worker.state.total_count", {"t": 7}),
+        ):
+            snapshot = build_snapshot(_worker(), now=100.0)
+
+        assert snapshot["active_by_queue"] == {"document_processor": 1}
+        assert snapshot["reserved_by_queue"] == {"default": 1}
+        assert snapshot["active"][0]["runtime"] == 10.0
+        assert snapshot["max_runtime"] == 10.0
+        assert snapshot["processed"] == 7
+        assert snapshot["prefetch_limit"] == 8
+        assert snapshot["prefetch_count"] == 6
+        assert snapshot["queues"] == ["document_processor"]
+
+    def test_lists_eta_tasks_from_worker_timer(self):
+        """Requests waiting in the timer are reported as scheduled."""
+        from celery.worker.request import Request
+
+        eta_request = MagicMock(spec=Request)
+        eta_request.id = "c"
+        eta_request.name = "app.tasks.check_credentials.check_credentials"
+        eta_request.eta = datetime(2026, 1, 1, tzinfo=timezone.utc)
+        eta_request.delivery_info = {"routing_key": "default"}
+        timer_entry = SimpleNamespace(entry=SimpleNamespace(args=(eta_request,)))
+        unrelated = SimpleNamespace(entry=SimpleNamespace(args=()))
+
+        with (
+            patch("celery.worker.state.active_requests", set()),
+            patch("celery.worker.state.reserved_requests", set()),
+        ):
+            snapshot = build_snapshot(_worker(timer_queue=[timer_entry, unrelated]), now=100.0)
+
+        assert snapshot["scheduled"] == [
+            {"id": "c", "name": eta_request.name, "eta": "2026-01-01T00:00:00+00:00"},
+        ]
+        assert snapshot["scheduled_by_queue"] == {"default": 1}
+
+    def test_snapshot_is_json_serialisable(self):
+        """Snapshots are stored as compact JSON."""
+        with (
+            patch("celery.worker.state.active_requests", [_request("a", started=1.0)]),
+            patch("celery.worker.state.reserved_requests", set()),
+        ):
+            snapshot = build_snapshot(_worker(), now=2.0)
+
+        assert json.loads(json.dumps(snapshot))["hostname"] == "celery@worker1"
+
+
+@pytest.mark.unit
+class TestReadAndAggregate:
+    """Tests for publishing, reading and aggregating snapshots."""
+
+    def test_stale_snapshots_count_as_offline(self):
+        """Workers that stopped publishing drop out after max_age seconds."""
+        client = _FakeRedis()
+        publish_snapshot(client, {"hostname": "fresh", "ts": 95.0}, interval=5)
+        publish_snapshot(client, {"hostname": "gone", "ts": 50.0}, interval=5)
+        client.hset(TELEMETRY_KEY, "broken", "not json")
+
+        snapshots = read_worker_snapshots(client, now=100.0, max_age=15)
+
+        assert [snapshot["hostname"] for snapshot in snapshots] == ["fresh"]
+
+    def test_aggregate_sums_queues_across_workers(self):
+        """Per-queue counts and task lists are combined across workers."""
+        snapshots = [
+            {"hostname": "w1", "ts": 1, "active_by_queue": {"q": 2}, "active": [{"id": "a"}, {"id": "b"}]},
+            {"hostname": "w2", "ts": 2, "active_by_queue": {"q": 1}, "reserved_by_queue": {"q": 3}},
+        ]
+
+        result = aggregate_snapshots(snapshots)
+
+        assert result["workers_online"] == 2
+        assert result["per_queue"]["q"] == {"active": 3, "reserved": 3, "scheduled": 0}
+        assert [task["id"] for task in result["active"]] == ["a", "b"]
+        assert [worker["active"] for worker in result["workers"]] == [2, 1]
+        assert result["updated_at"] == 2
+
+
+@pytest.mark.unit
+class TestWorkerTelemetryStep:
+    """Tests for the Celery bootstep."""
+
+    def test_publishes_on_timer_and_removes_on_stop(self):
+        """The step schedules publishing on the worker timer and cleans up on shutdown."""
+        client = _FakeRedis()
+        worker = _worker()
+        worker.timer = MagicMock()
+        step = WorkerTelemetryStep(worker)
+
+        with patch("app.utils.worker_telemetry.redis.Redis.from_url", return_value=client):
+            step.start(worker)
+        interval, callback, args = worker.timer.call_repeatedly.call_args[0]
+        with (
+            patch("celery.worker.state.active_requests", set()),
+            patch("celery.worker.state.reserved_requests", set()),
+        ):
+            callback(*args)
+        assert "celery@worker1" in client.hgetall(TELEMETRY_KEY)
+
+        step.stop(worker)
+
+        worker.timer.call_repeatedly.return_value.cancel.assert_called_once()
+        assert client.hgetall(TELEMETRY_KEY) == {}
+
+    def test_publish_errors_are_swallowed(self):
+        """Redis outages never raise inside the worker timer."""
+        step = WorkerTelemetryStep(_worker())
+        step.client = MagicMock()
+        step.client.pipeline.side_effect = ConnectionError("down")
+
+        step.publish(_worker(), 5)